@@ -0,0 +1,37 @@
+#!/bin/bash
+
+# This script allows to run all the strategies necessary to 
+# build the DS and PRO databases and to export their content, 
+# using the Build strategy (the strategies that do not depend 
+# on each other are run at the same time, and the strategies 
+# that are up to date are skipped).
+
+# Expected arguments:
+# --config or --configpath
+# --dsdbname
+# --prodbname
+# --dbhost
+# --dbport
+# --dbuser
+# --dbpassword
+
+# =========================================================
+# Parse the command line and define environment variables
+# =========================================================
+
+# See the documentation of the declare_variables.sh file
+# for more information about allowed options
+source ./03_workflow/datafreeze/declare_variables.sh $@
+
+
+
+# =========================================================
+# Start DenCellORF
+# =========================================================
+
+# Build
+echo "Build strategy" >> ${README_FILE_PATH}
+echo "- Started on $(date "+%d/%m/%y, at %H:%M:%S")" >> ${README_FILE_PATH}
+echo "  python $PYTHONPATH/fr/tagc/uorf/uorf.py Build -v $VERBOSITY_LEVEL -T $DB_TYPE -c $CONFIGFILE_PATH" >> ${README_FILE_PATH}
+echo "" >> ${README_FILE_PATH}
+python $PYTHONPATH/fr/tagc/uorf/uorf.py Build -v $VERBOSITY_LEVEL -T $DB_TYPE -c $CONFIGFILE_PATH
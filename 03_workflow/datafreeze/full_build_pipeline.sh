@@ -0,0 +1,37 @@
+#!/bin/bash
+
+# This script allows to run all the strategies necessary to 
+# build the DS and PRO databases in the same process, using 
+# the Pipeline strategy (see the full_build.pipeline file).
+
+# Expected arguments:
+# --config or --configpath
+# --dsdbname
+# --prodbname
+# --dbhost
+# --dbport
+# --dbuser
+# --dbpassword
+
+# =========================================================
+# Parse the command line and define environment variables
+# =========================================================
+
+# See the documentation of the declare_variables.sh file
+# for more information about allowed options
+source ./03_workflow/datafreeze/declare_variables.sh $@
+
+export PIPELINE_FILE_PATH=${RUN_FOLDER_PATH}/03_workflow/datafreeze/full_build.pipeline
+
+
+
+# =========================================================
+# Start DenCellORF
+# =========================================================
+
+# Pipeline
+echo "Pipeline strategy" >> ${README_FILE_PATH}
+echo "- Started on $(date "+%d/%m/%y, at %H:%M:%S")" >> ${README_FILE_PATH}
+echo "  python $PYTHONPATH/fr/tagc/uorf/uorf.py Pipeline -v $VERBOSITY_LEVEL -T $DB_TYPE -i $PIPELINE_FILE_PATH" >> ${README_FILE_PATH}
+echo "" >> ${README_FILE_PATH}
+python $PYTHONPATH/fr/tagc/uorf/uorf.py Pipeline -v $VERBOSITY_LEVEL -T $DB_TYPE -i $PIPELINE_FILE_PATH
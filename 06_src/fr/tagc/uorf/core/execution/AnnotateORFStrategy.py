@@ -3,12 +3,13 @@
 import ConfigParser
 import os
 
-import requests
-import pyensembl
+from sqlalchemy import select
 
 from fr.tagc.uorf.core.model import *
 
 from fr.tagc.uorf.core.execution.DatabaseCheckStrategy import DatabaseCheckStrategy
+from fr.tagc.uorf.core.execution.GenerateBEDContentStrategy import GenerateBEDContentStrategy
+from fr.tagc.uorf.core.execution.filter.FilterPlanner import FilterPlanner
 
 from fr.tagc.uorf.core.util import Constants
 from fr.tagc.uorf.core.util import LogCodes
@@ -20,6 +21,8 @@ from fr.tagc.uorf.core.util.general.FileHandlerUtil import FileHandlerUtil
 from fr.tagc.uorf.core.util.graphics.ProgressionBar import ProgressionBar
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.log.DiagnosticsAggregator import DiagnosticsAggregator
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
         
 
 ## AnnotateORFStrategy
@@ -210,6 +213,10 @@ class AnnotateORFStrategy( object ):
                                             ' and the "forceOverwrite" option has not been selected.' +
                                             ' Hence, the annotation of the ORF using ORF and transcript' +
                                             ' information will not be performed again.' )
+        
+        # Update the content version of the PRO database, such as the key sets
+        # computed by the Filter strategy on the former content are not used
+        FilterPlanner.update_content_version()
     
         
     
@@ -226,6 +233,7 @@ class AnnotateORFStrategy( object ):
     # @throw DenCellORFException: When an error occurs while trying to delete the ORFCategoryCatalog
     #                             entries (when the "-f" option has been selected).
     # 
+    @RunTelemetry.timed_stage()
     def compute_orf_category( self ):
         
         Logger.get_instance().info( 'Starting the computation of the ORF categories' +
@@ -311,13 +319,12 @@ class AnnotateORFStrategy( object ):
                     comp_categories += existing_prov_cat
                         
                 else:
-                    Logger.get_instance().warning( 'The category "' + prov_cat + '" has been found in the' +
-                                                   ' provided categories associated with the ORFTranscriptAsso' +
-                                                   ' with ID "' + str( orftranscriptasso.id ) + 
-                                                   '", and this provided category is not associated to any' +
-                                                   ' "computed" category in the dictionary.' +
-                                                   ' Hence, this ORF annotation will not be considered.' +
-                                                   ' Warning code: ' + LogCodes.WARN_ORFCAT_PROV_NOTIN_DICT + '.' )
+                    DiagnosticsAggregator.get_instance().record( LogCodes.WARN_ORFCAT_PROV_NOTIN_DICT, 'AnnotateORFStrategy.compute_orf_category', orftranscriptasso.id,
+                                                                 'The category "%s" has been found in the provided categories associated' +
+                                                                 ' with the ORFTranscriptAsso with ID "%s", and this provided category is' +
+                                                                 ' not associated to any "computed" category in the dictionary.' +
+                                                                 ' Hence, this ORF annotation will not be considered.',
+                                                                 ( prov_cat, orftranscriptasso.id ) )
             
             # For each unique "computed" category, create an entry in the ORFCategory table
             for comp_cat in set( comp_categories ):
@@ -352,6 +359,7 @@ class AnnotateORFStrategy( object ):
     #                              entries (when the "-f" option has been selected).
     # @throw DenCellORFException - When one "computed" annotation term is belonging to several families.
     # 
+    @RunTelemetry.timed_stage()
     def compute_orf_annotation( self ):
         
         Logger.get_instance().info( 'Starting the computation of the ORF annotations using' +
@@ -533,14 +541,11 @@ class AnnotateORFStrategy( object ):
                     orf_transcript_on_same_str = True
                 else:
                     orf_transcript_on_same_str = False
-                    Logger.get_instance().warning( 'The ORF with ID "' + str( orf.id ) + 
-                                                   '" is located on the ' + orf.strand + ' strand,'
-                                                   ' while its related transcript (ID "' + 
-                                                   str( transcript.id ) + '") is located on the ' + 
-                                                   transcript.strand + ' strand' +
-                                                   ' (ORFTranscriptAsso ID: "' + str( orftranscriptasso.id ) + 
-                                                   '").' +
-                                                   ' Warning code: ' + LogCodes.WARN_ORFANNOT_CONFL_STRD + '.' )
+                    DiagnosticsAggregator.get_instance().record( LogCodes.WARN_ORFANNOT_CONFL_STRD, 'AnnotateORFStrategy.compute_orf_annotation', orf.id,
+                                                                 'The ORF with ID "%s" is located on the %s strand, while its related' +
+                                                                 ' transcript (ID "%s") is located on the %s strand' +
+                                                                 ' (ORFTranscriptAsso ID: "%s").',
+                                                                 ( orf.id, orf.strand, transcript.id, transcript.strand, orftranscriptasso.id ) )
             else:
                 orf_transcript_on_same_str = None
                 
@@ -554,16 +559,13 @@ class AnnotateORFStrategy( object ):
                  and ( transcript.end_pos != None ) 
                  and ( ( transcript.start_pos > orf.start_pos )
                        or ( orf.stop_pos > transcript.end_pos ) ) ):
-                Logger.get_instance().error( 'The ORF with ID "' + str( orf.id ) +
-                                             '"" has been found associated with the transcript with ID "' +
-                                             str( transcript.id ) + '" (biotype: ' + transcript.rna_biotype +
-                                             ', ORFTranscriptAsso ID: "' + str( orftranscriptasso.id )+ 
-                                             '") whilst the ORF coordinates (' + str( orf.start_pos ) + '-' +
-                                             str( orf.stop_pos ) + ') are outside of the transcript bounds (' +
-                                             str( transcript.start_pos ) + '-' + str( transcript.end_pos ) +
-                                             ').' +
-                                             ' Error code: ' + LogCodes.ERR_ORF_ANNOT_CONFL_POS_OUT + '.', 
-                                             ex  = False )
+                DiagnosticsAggregator.get_instance().record( LogCodes.ERR_ORF_ANNOT_CONFL_POS_OUT, 'AnnotateORFStrategy.compute_orf_annotation', orf.id,
+                                                             'The ORF with ID "%s" has been found associated with the transcript with' +
+                                                             ' ID "%s" (biotype: %s, ORFTranscriptAsso ID: "%s") whilst the ORF' +
+                                                             ' coordinates (%s-%s) are outside of the transcript bounds (%s-%s).',
+                                                             ( orf.id, transcript.id, transcript.rna_biotype, orftranscriptasso.id,
+                                                               orf.start_pos, orf.stop_pos, transcript.start_pos, transcript.end_pos ),
+                                                             level = Constants.MODE_ERROR )
                 
             # If the CDS coordinates are avaiable and the ORF is located on the 
             # transcript, then annotate the ORF using the CDS coordinates
@@ -841,6 +843,13 @@ class AnnotateORFStrategy( object ):
         self.batch_insert_to_PRO_db( objects_to_insert = objects_to_insert, 
                                      processfile = 'orf_annotation',
                                      process = 'compute_orf_category(): Computation of ORF categories' )
+        
+        # Register the ORFs which have been annotated in order to refresh their BED lines
+        annotated_orf_ids = select( [ ORFTranscriptAsso.orf_id ] ).where( 
+                                                                            ORFTranscriptAsso.id.in_( select( [ ORFAnnotation.orftranscriptasso_id ] ) ) 
+                                                                        ).distinct()
+        GenerateBEDContentStrategy.register_changed_orfs( orf_ids = annotated_orf_ids,
+                                                          process = 'AnnotateORF' )
                
         Logger.get_instance().info( 'The computation of the ORF annotations using the information' +
                                     ' from the ORF and Transcript tables has finished.')
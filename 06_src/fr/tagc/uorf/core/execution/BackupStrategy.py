@@ -2,19 +2,23 @@
 
 import os
 
+from multiprocessing import cpu_count
+
 
 from fr.tagc.uorf.core.model import *
 
 from fr.tagc.uorf.core.execution.DatabaseCheckStrategy import DatabaseCheckStrategy
+from fr.tagc.uorf.core.execution.backup.BackupEngine import BackupEngine
+from fr.tagc.uorf.core.execution.backup.BackupManifest import BackupManifest
 
 from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
 from fr.tagc.uorf.core.util.sql.SQLManagerDS import SQLManagerDS
 from fr.tagc.uorf.core.util.sql.SQLManagerPRO import SQLManagerPRO
 from fr.tagc.uorf.core.util.sql.SQLManagerFILT import SQLManagerFILT
 from fr.tagc.uorf.core.util.sql import SQLConstants
 from fr.tagc.uorf.core.util.option.OptionManager import OptionManager
 from fr.tagc.uorf.core.util.option import OptionConstants
-from fr.tagc.uorf.core.util.general.FileHandlerUtil import FileHandlerUtil
 from fr.tagc.uorf.core.util.exception.DenCellORFException import DenCellORFException
 from fr.tagc.uorf.core.util.log.Logger import Logger
         
@@ -26,6 +30,15 @@ from fr.tagc.uorf.core.util.log.Logger import Logger
 # separate files (one file / table), allowing to restore the database later
 # if necessary.
 #
+# The content of the tables is streamed from the database and saved by chunks
+# in compressed backup files, several tables being saved in parallel (see the
+# documentation of the BackupEngine class for more information).
+#
+# In incremental mode, only the ranges of entries that changed since the
+# previous incremental backup saved in the same folder are written, and a
+# manifest allowing to restore the database at the time of the backup is
+# saved (see the documentation of the BackupManifest class).
+#
 class BackupStrategy( object ):
     
     ## Constructor of BackupStrategy
@@ -40,8 +53,11 @@ class BackupStrategy( object ):
     #     - db_model: String - The name of the database model to use (PRO / DS).
     #     - output_folder: String - The path of the folder where to save the data.
     #     - file_prefix: String - The prefix to add to the file names.
+    #     - incremental: Boolean - Should an incremental backup be performed?
+    #     - thread_nb: Integer - The number of threads that can be used.
     #
     # @throw DenCellORFException: When the database type provided is not allowed.
+    # @throw DenCellORFException: When the number of threads provided is not valid.
     #
     def __init__( self ):
         
@@ -77,6 +93,37 @@ class BackupStrategy( object ):
         # Get the eventual prefix to add to the file names
         self.file_prefix = OptionManager.get_instance().get_option( OptionConstants.OPTION_FILE_PREFIX, 
                                                                     not_none = False )
+        
+        # Should an incremental backup be performed?
+        self.incremental = OptionManager.get_instance().get_option( OptionConstants.OPTION_INCREMENTAL_BACKUP, 
+                                                                    not_none = False )
+        
+        # Get the number of threads available
+        self.thread_nb = OptionManager.get_instance().get_option( OptionConstants.OPTION_THREAD_NB, 
+                                                                  not_none = False )
+        available_thread_nb = cpu_count()
+        if self.thread_nb:
+            try:
+                self.thread_nb = int( self.thread_nb )
+            except:
+                raise DenCellORFException( 'BackupStrategy: The value provided for the number of threads' +
+                                           ' needs to be an integer (provided value: ' + 
+                                           str( self.thread_nb ) + ').' )
+            else:
+                if ( self.thread_nb < 1 ):
+                    raise DenCellORFException( 'BackupStrategy: The value provided for the number of threads' +
+                                               ' needs to be an integer greater than 1 (provided value: ' + 
+                                               str( self.thread_nb ) + ').' )
+                    
+                if ( self.thread_nb > available_thread_nb ):
+                    Logger.get_instance().info( 'The number of threads provided (' + str( self.thread_nb ) +
+                                                ') is greater than the number of threads actually' +
+                                                ' available(' +  str( available_thread_nb ) +
+                                                '). Hence, ' + str( available_thread_nb ) +
+                                                ' threads will be used for the backup.' )
+                    self.thread_nb = available_thread_nb
+        else:
+            self.thread_nb = available_thread_nb
             
     
     ## execute
@@ -85,7 +132,7 @@ class BackupStrategy( object ):
     # Execute the strategy to save all the entries of the database.
     # 
     # @throw DenCellORFException: When the database provided does not follow the expected model.
-    # @throw DenCellORFException: When the backup of objects into the file failed.
+    # @throw DenCellORFException: When the backup of a table into its file failed.
     #
     def execute( self ):
                 
@@ -105,40 +152,65 @@ class BackupStrategy( object ):
         base = self.get_sqlmanager_instance().get_declarative_base()
         
         # Build a dictionary of the classes defined in the model
-        # where the keys are the classes, and the values their names
+        # where the keys are the names of the classes, and the values 
+        # the names of the corresponding tables
         dict_model_classes = {}
         for ( cl_name, cl_object ) in base._decl_class_registry.items():
             if ( not str( cl_name ) == '_sa_module_registry' ):
-                dict_model_classes[ cl_object ] = str( cl_name )
+                dict_model_classes[ str( cl_name ) ] = cl_object.__tablename__
+        
+        self.get_sqlmanager_instance().close_session()
         
-        # For each table, get the list of all entries and save them in a file
-        for table in dict_model_classes.keys():
+        # Save the content of each table in a backup file
+        backup_engine = BackupEngine( db_model = self.db_model,
+                                      db_settings = self.db_settings,
+                                      output_folder = self.output_folder,
+                                      file_prefix = self.file_prefix,
+                                      thread_nb = self.thread_nb )
+        
+        if self.incremental:
             
-            # Get the name of the tale
-            table_name = str( dict_model_classes[ table ] )
-            Logger.get_instance().debug( 'Starting to save the entries of the ' + table_name + ' table.' )
+            if ( not os.path.exists( self.output_folder ) ):
+                os.makedirs( self.output_folder )
             
-            # Get all the entries to save
-            objects_to_save = self.get_sqlmanager_instance().get_session().query( table ).all()
+            # Get the manifest of the previous backup, and create the one of the current backup
+            previous_manifest = BackupManifest.load( folder = self.output_folder,
+                                                     file_prefix = self.file_prefix )
+            manifest = BackupManifest( folder = self.output_folder,
+                                       file_prefix = self.file_prefix,
+                                       backup_id = BackupManifest.new_backup_id( BackupManifest.list_backup_ids( self.output_folder,
+                                                                                                                 self.file_prefix ) ),
+                                       parent_id = ( previous_manifest.backup_id if previous_manifest else None ),
+                                       db_model = self.db_model,
+                                       range_size = ( previous_manifest.range_size if previous_manifest \
+                                                      else Constants.BACKUP_INCREMENTAL_RANGE_SIZE ) )
+            if ( ( previous_manifest != None ) and ( previous_manifest.db_model != self.db_model ) ):
+                raise DenCellORFException( 'BackupStrategy.execute(): The previous incremental backup saved in ' +
+                                           self.output_folder + ' has been performed on a ' + 
+                                           previous_manifest.db_model + ' database. Please use another' +
+                                           ' output folder or file prefix.' +
+                                           '\n Error code: ' + LogCodes.ERR_BACKUP_MANIFEST + '.' )
             
-            # Expunge the session to the database to detach the objects in the list from the session
-            self.get_sqlmanager_instance().get_session().expunge_all()
-            self.get_sqlmanager_instance().close_session()
+            summaries = backup_engine.backup_tables( table_classes = dict_model_classes,
+                                                     manifest = manifest,
+                                                     previous_manifest = previous_manifest )
+            manifest.save()
             
-            if self.file_prefix:
-                filename = self.file_prefix + table_name
-            else:
-                filename = table_name
-            
-            try:
-                FileHandlerUtil.save_obj_to_file( objects_to_save = objects_to_save,
-                                                  filename = filename,
-                                                  output_folder = self.output_folder )
+            Logger.get_instance().info( 'The incremental backup ' + manifest.backup_id + ' (previous backup: ' +
+                                        str( manifest.parent_id ) + ') has been saved in ' + 
+                                        self.output_folder + ': ' + 
+                                        str( sum( [ summary[ 'changed_range_count' ] for summary in summaries ] ) ) +
+                                        ' / ' + str( sum( [ summary[ 'range_count' ] for summary in summaries ] ) ) +
+                                        ' ranges of entries changed (' + 
+                                        '%.2f' % ( sum( [ summary[ 'file_size' ] for summary in summaries ] ) / ( 1024.0 * 1024.0 ) ) +
+                                        ' MB written).' )
+        
+        else:
+            summaries = backup_engine.backup_tables( dict_model_classes )
             
-            except Exception as e:
-                raise DenCellORFException( 'BackupStrategy.execute(): An error occurred trying to' +
-                                           ' save data in the file.'
-                                           '\n Error code: ' + LogCodes.ERR_FILEHAND + '.', e )
+            Logger.get_instance().info( str( len( summaries ) ) + ' tables (' + 
+                                        str( sum( [ summary[ 'row_count' ] for summary in summaries ] ) ) +
+                                        ' entries) have been saved in ' + self.output_folder + '.' )
                 
             
     
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+
+import os
+from datetime import datetime
+from multiprocessing import cpu_count
+
+
+from fr.tagc.uorf.core.execution.benchmark.SyntheticDataGenerator import SyntheticDataGenerator
+from fr.tagc.uorf.core.execution.benchmark.BenchmarkRunner import BenchmarkRunner
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
+from fr.tagc.uorf.core.util.option.OptionManager import OptionManager
+from fr.tagc.uorf.core.util.option import OptionConstants
+from fr.tagc.uorf.core.util.exception import *
+from fr.tagc.uorf.core.util.log.Logger import Logger
+
+
+## BenchmarkStrategy
+#  =================
+#
+# This class is a strategy aiming to benchmark the other strategies on
+# synthetic datasets of various scales (number of ORFs), without any
+# access to the network.
+#
+# For each scale, a synthetic dataset is generated (if it does not exist
+# yet, see the documentation of the SyntheticDataGenerator class), then
+# the requested strategies are run on it and measured (wall time, CPU
+# time and peak memory, see the documentation of the BenchmarkRunner class).
+# The results are saved in a JSON file and compared to the baseline of
+# the dataset. The baseline of a dataset is recorded at the first run of
+# each strategy on it, and may be updated using the updateBaseline option.
+#
+class BenchmarkStrategy( object ):
+
+    ## Constructor of BenchmarkStrategy
+    #  --------------------------------
+    #
+    # Instance variables:
+    #     - scales: List - The scales (numbers of ORFs) of the datasets to use.
+    #     - seed: Integer - The seed used to generate the datasets.
+    #     - steps: List - The names of the strategies to benchmark.
+    #     - repeats: Integer - The number of times each strategy is run.
+    #     - output_folder: String - The folder where the datasets, results and baselines are saved.
+    #     - update_baseline: Boolean - Should the baselines be replaced by the results?
+    #     - force_overwrite: Boolean - Should the datasets and their databases be generated again?
+    #     - verbosity: String - The level of verbosity of the strategies run.
+    #     - thread_nb: Integer - The number of threads used by the strategies (or None).
+    #
+    # @throw DenCellORFException: When a scale provided is not valid.
+    # @throw DenCellORFException: When a strategy provided cannot be benchmarked.
+    # @throw DenCellORFException: When the seed or the number of repeats provided is not valid.
+    # @throw DenCellORFException: When the number of threads provided is not valid.
+    #
+    def __init__( self ):
+
+        # Get the scales of the datasets
+        scales = OptionManager.get_instance().get_option( OptionConstants.OPTION_BENCHMARK_SCALES,
+                                                          not_none = False )
+        if scales:
+            self.scales = []
+            for scale in scales.split( Constants.BENCHMARK_LIST_SEPARATOR ):
+                try:
+                    # NB: The scales may be provided in scientific notation (e.g. 1e6)
+                    scale = int( float( scale.strip() ) )
+                except:
+                    raise DenCellORFException( 'BenchmarkStrategy: The scales provided need to be a list of' +
+                                               ' integers separated by "' + Constants.BENCHMARK_LIST_SEPARATOR +
+                                               '" (provided value: ' + scales + ').' )
+                if ( ( scale < Constants.BENCHMARK_MIN_SCALE ) or ( scale > Constants.BENCHMARK_MAX_SCALE ) ):
+                    raise DenCellORFException( 'BenchmarkStrategy: The scales provided need to be between ' +
+                                               str( Constants.BENCHMARK_MIN_SCALE ) + ' and ' +
+                                               str( Constants.BENCHMARK_MAX_SCALE ) + ' (provided value: ' +
+                                               str( scale ) + ').' )
+                self.scales.append( scale )
+        else:
+            self.scales = Constants.BENCHMARK_DEFAULT_SCALES
+
+        # Get the seed and the number of repeats
+        self.seed = self.get_integer_option( OptionConstants.OPTION_BENCHMARK_SEED,
+                                             Constants.BENCHMARK_DEFAULT_SEED, 'seed', 0 )
+        self.repeats = self.get_integer_option( OptionConstants.OPTION_BENCHMARK_REPEATS,
+                                                Constants.BENCHMARK_DEFAULT_REPEATS, 'number of repeats', 1 )
+
+        # Get the strategies to benchmark
+        steps = OptionManager.get_instance().get_option( OptionConstants.OPTION_BENCHMARK_STEPS,
+                                                         not_none = False )
+        if steps:
+            self.steps = [ step.strip() for step in steps.split( Constants.BENCHMARK_LIST_SEPARATOR ) ]
+            unknown_steps = [ step for step in self.steps if ( step not in BenchmarkRunner.STEP_NAMES ) ]
+            if unknown_steps:
+                raise DenCellORFException( 'BenchmarkStrategy: The following strategies cannot be benchmarked: ' +
+                                           ', '.join( unknown_steps ) + '. The strategies provided have to be' +
+                                           ' in the following list: ' + ', '.join( BenchmarkRunner.STEP_NAMES ) + '.' )
+        else:
+            self.steps = BenchmarkRunner.STEP_NAMES
+
+        # Get the output folder
+        self.output_folder = OptionManager.get_instance().get_option( OptionConstants.OPTION_OUTPUT_FOLDER,
+                                                                      not_none = False )
+        if ( not self.output_folder ):
+            self.output_folder = Constants.BENCHMARK_FOLDER
+
+        # Should the baselines be updated?
+        self.update_baseline = OptionManager.get_instance().get_option( OptionConstants.OPTION_BENCHMARK_UPDATE_BASELINE,
+                                                                        not_none = False )
+
+        # Should the datasets be generated again?
+        self.force_overwrite = OptionManager.get_instance().get_option( OptionConstants.OPTION_FORCE_OVERWRITE,
+                                                                        not_none = False )
+
+        # Get the verbosity, in order to run the strategies with the same one
+        self.verbosity = OptionManager.get_instance().get_option( OptionConstants.OPTION_VERBOSITY,
+                                                                  not_none = False )
+        if ( not self.verbosity ):
+            self.verbosity = Constants.LOG_MODE_INFO
+
+        # Get the number of threads to use
+        # NB: If no number of threads is provided, the strategies
+        #     are run with their own default number of threads
+        self.thread_nb = OptionManager.get_instance().get_option( OptionConstants.OPTION_THREAD_NB,
+                                                                  not_none = False )
+        available_thread_nb = cpu_count()
+        if self.thread_nb:
+            try:
+                self.thread_nb = int( self.thread_nb )
+            except:
+                raise DenCellORFException( 'BenchmarkStrategy: The value provided for the number of threads' +
+                                           ' needs to be an integer (provided value: ' +
+                                           str( self.thread_nb ) + ').' )
+            else:
+                if ( self.thread_nb < 1 ):
+                    raise DenCellORFException( 'BenchmarkStrategy: The value provided for the number of threads' +
+                                               ' needs to be an integer greater than 1 (provided value: ' +
+                                               str( self.thread_nb ) + ').' )
+
+                if ( self.thread_nb > available_thread_nb ):
+                    Logger.get_instance().info( 'The number of threads provided (' + str( self.thread_nb ) +
+                                                ') is greater than the number of threads actually' +
+                                                ' available(' +  str( available_thread_nb ) +
+                                                '). Hence, ' + str( available_thread_nb ) +
+                                                ' threads will be used by the strategies.' )
+                    self.thread_nb = available_thread_nb
+        else:
+            self.thread_nb = None
+
+
+
+    ## get_integer_option
+    #  ------------------
+    #
+    # This method allows to get the value of an option expected to be an integer.
+    #
+    # @param option: String - The name of the option.
+    # @param default: Integer - The default value of the option.
+    # @param description: String - The description of the option (for error messages).
+    # @param min_value: Integer - The minimal value allowed.
+    #
+    # @return Integer - The value of the option.
+    #
+    # @throw DenCellORFException: When the value provided is not an integer or is too small.
+    #
+    def get_integer_option( self, option, default, description, min_value ):
+
+        value = OptionManager.get_instance().get_option( option, not_none = False )
+        if ( value == None ):
+            return default
+
+        try:
+            value = int( value )
+        except:
+            raise DenCellORFException( 'BenchmarkStrategy: The value provided for the ' + description +
+                                       ' needs to be an integer (provided value: ' + str( value ) + ').' )
+        if ( value < min_value ):
+            raise DenCellORFException( 'BenchmarkStrategy: The value provided for the ' + description +
+                                       ' needs to be an integer greater than or equal to ' + str( min_value ) +
+                                       ' (provided value: ' + str( value ) + ').' )
+
+        return value
+
+
+
+    ## execute
+    #  -------
+    #
+    # Execute the strategy to benchmark the strategies on each dataset.
+    #
+    # @throw DenCellORFException: When a strategy failed.
+    # @throw DenCellORFException: When a strategy regressed compared to the baseline.
+    #
+    def execute( self ):
+
+        regressions = []
+
+        for scale in self.scales:
+
+            ## Generate the dataset
+            #  --------------------
+            generator = SyntheticDataGenerator( folder = os.path.join( self.output_folder,
+                                                                       Constants.BENCHMARK_DATASETS_FOLDER_NAME ),
+                                                scale = scale,
+                                                seed = self.seed )
+            manifest = generator.generate( force_overwrite = self.force_overwrite )
+
+
+            ## Run the strategies
+            #  ------------------
+            runner = BenchmarkRunner( manifest = manifest,
+                                      dataset_folder = generator.dataset_folder,
+                                      benchmark_folder = self.output_folder,
+                                      verbosity = self.verbosity,
+                                      thread_nb = self.thread_nb,
+                                      repeats = self.repeats )
+
+            results = {}
+            error = None
+            try:
+                results = runner.run( step_names = self.steps, rebuild = self.force_overwrite )
+            except DenCellORFException as e:
+                # Keep the results of the steps run before the failure
+                results = runner.results
+                error = e
+
+            # Compare the results to the baseline and save them
+            ( comparison, scale_regressions ) = runner.compare_to_baseline( results )
+            results_path = runner.save_results( { 'dataset': os.path.basename( generator.dataset_folder ),
+                                                  'manifest': manifest,
+                                                  'date': str( datetime.now() ),
+                                                  'repeats': self.repeats,
+                                                  'thread_nb': self.thread_nb,
+                                                  'steps': results,
+                                                  'comparison': comparison,
+                                                  'regressions': scale_regressions } )
+            Logger.get_instance().info( 'The results of the benchmark have been saved in ' + results_path + '.' )
+
+            # Save the baseline of the steps that have no baseline yet
+            # (or of all the steps if the baseline has to be updated)
+            runner.update_baseline( results, only_missing = ( not self.update_baseline ) )
+
+            if error:
+                raise error
+
+            regressions += [ ( str( scale ) + ' ORFs: ' + step + ' (' + metric + ')' )
+                             for ( step, metric ) in scale_regressions ]
+
+        if ( regressions and ( not self.update_baseline ) ):
+            raise DenCellORFException( 'BenchmarkStrategy.execute(): The following strategies regressed' +
+                                       ' compared to the baseline: ' + ', '.join( regressions ) +
+                                       '. Please see the results of the benchmark for more information,' +
+                                       ' and use the updateBaseline option if this is expected.' +
+                                       '\n Error code: ' + LogCodes.ERR_BENCHMARK_REGRESSION + '.' )
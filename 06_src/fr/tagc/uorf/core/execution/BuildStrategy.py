@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+
+from fr.tagc.uorf.core.execution.dbcheck.CheckDSDatabase import CheckDSDatabase
+from fr.tagc.uorf.core.execution.dbcheck.CheckPRODatabase import CheckPRODatabase
+from fr.tagc.uorf.core.execution.build.BuildGraph import BuildGraph
+from fr.tagc.uorf.core.execution.build.BuildRunner import BuildRunner
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util.sql import SQLConstants
+from fr.tagc.uorf.core.util.option.OptionManager import OptionManager
+from fr.tagc.uorf.core.util.option import OptionConstants
+from fr.tagc.uorf.core.util.exception import *
+from fr.tagc.uorf.core.util.log.Logger import Logger
+
+
+## BuildStrategy
+#  =============
+#
+# This class is a strategy aiming to build the DS and PRO databases and to
+# export their content, running the strategies in parallel when they do not
+# depend on each other, and skipping the ones that are up to date.
+#
+# The strategies run, their inputs and their outputs are declared in the
+# BuildGraph class, and the build is run by the BuildRunner class (see their
+# documentation for more information). The names of the databases and the
+# information used by the strategies are get from the config file.
+#
+class BuildStrategy( object ):
+
+    ## Constructor of BuildStrategy
+    #  ----------------------------
+    #
+    # Instance variables:
+    #     - config_file: String - The path to the config file.
+    #     - db_settings: Dictionary - The settings of the DS and PRO databases (where
+    #                                 the keys are the models of the databases).
+    #     - verbosity: String - The level of verbosity of the strategies run.
+    #     - jobs: Integer - The maximal number of strategies run at the same time.
+    #     - release: String - The release number declared in the metadata tables.
+    #     - output_folder: String - The folder where the exported files and the outputs
+    #                               of the strategies are saved.
+    #     - force_overwrite: Boolean - Should the strategies up to date be run?
+    #     - dry_run: Boolean - Should the status of the strategies be displayed without running them?
+    #
+    # @throw DenCellORFException: When the config file cannot be found.
+    # @throw DenCellORFException: When the number of jobs provided is not valid.
+    #
+    def __init__( self ):
+
+        # Get the config file
+        self.config_file = OptionManager.get_instance().get_option( OptionConstants.OPTION_CONFIG_FILE_PATH,
+                                                                    not_none = True )
+        if ( not os.path.exists( self.config_file ) ):
+            raise DenCellORFException( 'BuildStrategy: No config file may be found at the path provided (' +
+                                       self.config_file + ').' )
+
+        # Get the settings of the databases from the config file
+        # NB: The type of database is set, as it is needed to get
+        #     the settings of the connections from the config file
+        if ( OptionManager.get_instance().get_option( OptionConstants.OPTION_DB_TYPE ) == None ):
+            OptionManager.get_instance().set_option( OptionConstants.OPTION_DB_TYPE, SQLConstants.DEFAULT_DB_TYPE )
+        self.db_settings = { OptionConstants.DATABASE_DECLARATIVE_DS: CheckDSDatabase().db_settings,
+                             OptionConstants.DATABASE_DECLARATIVE_PRO: CheckPRODatabase().db_settings }
+
+        # Get the verbosity, in order to run the strategies with the same one
+        self.verbosity = OptionManager.get_instance().get_option( OptionConstants.OPTION_VERBOSITY,
+                                                                  not_none = False )
+        if ( not self.verbosity ):
+            self.verbosity = Constants.LOG_MODE_INFO
+
+        # Get the maximal number of strategies run at the same time
+        jobs = OptionManager.get_instance().get_option( OptionConstants.OPTION_BUILD_JOBS, not_none = False )
+        if ( jobs == None ):
+            self.jobs = Constants.BUILD_DEFAULT_JOBS_NB
+        else:
+            try:
+                self.jobs = int( jobs )
+            except:
+                raise DenCellORFException( 'BuildStrategy: The value provided for the number of jobs needs' +
+                                           ' to be an integer (provided value: ' + str( jobs ) + ').' )
+            if ( self.jobs < 1 ):
+                raise DenCellORFException( 'BuildStrategy: The value provided for the number of jobs needs' +
+                                           ' to be an integer greater than or equal to 1 (provided value: ' +
+                                           str( jobs ) + ').' )
+
+        # Get the release number
+        self.release = OptionManager.get_instance().get_option( OptionConstants.OPTION_DB_RELEASE_NB,
+                                                                not_none = False )
+        if ( not self.release ):
+            self.release = Constants.BUILD_DEFAULT_RELEASE_NB
+
+        # Get the output folder
+        self.output_folder = OptionManager.get_instance().get_option( OptionConstants.OPTION_OUTPUT_FOLDER,
+                                                                      not_none = False )
+        if ( not self.output_folder ):
+            self.output_folder = Constants.BUILD_FOLDER
+
+        # Should the strategies up to date be run?
+        self.force_overwrite = OptionManager.get_instance().get_option( OptionConstants.OPTION_FORCE_OVERWRITE,
+                                                                        not_none = False )
+
+        # Should the status of the strategies only be displayed?
+        self.dry_run = OptionManager.get_instance().get_option( OptionConstants.OPTION_BUILD_DRY_RUN,
+                                                                not_none = False )
+
+
+
+    ## execute
+    #  -------
+    #
+    # Execute the strategy to run the build (or to display its plan).
+    #
+    # @throw DenCellORFException: When a strategy failed.
+    #
+    def execute( self ):
+
+        runner = BuildRunner( graph = BuildGraph(),
+                              config_file = self.config_file,
+                              db_settings = self.db_settings,
+                              verbosity = self.verbosity,
+                              jobs = self.jobs,
+                              release = self.release,
+                              output_folder = self.output_folder,
+                              force_overwrite = self.force_overwrite )
+
+        if self.dry_run:
+            Logger.get_instance().info( 'Plan of the build:\n' +
+                                        '\n'.join( [ ( '  ' + name + ': ' + status +
+                                                       ( ( ' (' + reason + ')' ) if reason else '' ) )
+                                                     for ( name, status, reason ) in runner.plan() ] ) )
+            return None
+
+        results = runner.run()
+
+        # Log the duration of the strategies
+        Logger.get_instance().info( 'The build has been completed. Duration of the strategies:\n' +
+                                    '\n'.join( [ ( '  ' + name + ': ' + results[ name ][ 'status' ] + ', ' +
+                                                   '%.1f' % results[ name ][ 'wall_time' ] + ' s' )
+                                                 for name in runner.graph.node_names ] ) )
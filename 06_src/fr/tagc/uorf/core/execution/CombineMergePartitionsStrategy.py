@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+from sqlalchemy import inspect
+
+
+from fr.tagc.uorf.core.model import *
+
+from fr.tagc.uorf.core.execution.DatabaseCheckStrategy import DatabaseCheckStrategy
+
+from fr.tagc.uorf.core.execution.merge.MergePartition import MergePartition
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
+from fr.tagc.uorf.core.util.sql.SQLManagerPRO import SQLManagerPRO
+from fr.tagc.uorf.core.util.option.OptionManager import OptionManager
+from fr.tagc.uorf.core.util.option import OptionConstants
+from fr.tagc.uorf.core.util.exception import *
+from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
+
+
+## CombineMergePartitionsStrategy
+#  ==============================
+#
+# This class is a strategy aiming to combine the partial PRO databases
+# generated by a partitioned merging (see the documentation of the
+# MergePartition class for more information) into the PRO database.
+# The content of the tables of the partial databases is concatenated:
+# - The entries that may be shared by several partitions (e.g. entries of the
+#   conserved tables, Transcript entries or entries of the catalogs such as
+#   CellContextCatalog and ProvidedCategoryCatalog) are only inserted once,
+#   such as the catalogs of the PRO database are the union of the catalogs
+#   of the partial databases.
+# - As the ORF and Transcript IDs are consistent between the partitions and as
+#   the ORFTranscriptAsso IDs have been computed in non-overlapping ranges, the
+#   IDs of the entries are kept unchanged.
+#
+class CombineMergePartitionsStrategy( object ):
+
+    ## Class variables
+    #  ---------------
+    #
+    # List of the tables to combine (parent tables first)
+    TABLES_TO_COMBINE = [ PROMetadata, PROGene, PROGeneAlias,
+                          ORF, ORFDSAsso, Transcript, TranscriptDSAsso,
+                          CellContextCatalog, ProvidedCategoryCatalog, FLOSSClassCatalog,
+                          ORFTranscriptAsso, ORFTranscriptAssoDSAsso,
+                          CellContext, ProvidedCategory, FLOSSClass ]
+
+
+    ## Constructor of CombineMergePartitionsStrategy
+    #  ---------------------------------------------
+    #
+    # Instance variables:
+    #     - configfile: String - The path to the config file.
+    #     - partitions: List of lists - The partitions of chromosomes.
+    #
+    # @throw DenCellORFException: When the config file is not provided or cannot be found at the
+    #                             path provided.
+    # @throw DenCellORFException: When the partitions are not provided.
+    #
+    def __init__( self ):
+
+        configfile = OptionManager.get_instance().get_option( OptionConstants.OPTION_CONFIG_FILE_PATH,
+                                                              not_none = True )
+
+        if configfile:
+            self.configfile = configfile
+            if ( not os.path.exists( configfile ) ):
+                raise DenCellORFException( 'No config file may be found at the path provided (' +
+                                           self.configfile + ').' )
+
+        else:
+            raise DenCellORFException( 'A config file has to be provided.' +
+                                       ' See the documentation for more information.' )
+
+        # Get the partitions of chromosomes
+        partitions = OptionManager.get_instance().get_option( OptionConstants.OPTION_MERGE_PARTITIONS,
+                                                              not_none = False )
+        if partitions:
+            self.partitions = MergePartition.parse_partitions( partitions )
+        else:
+            raise DenCellORFException( 'The partitions of chromosomes used for the merging have to be' +
+                                       ' provided. See the documentation for more information.' )
+
+
+
+    ## execute
+    #  -------
+    #
+    # Execute the strategy to combine the partial PRO databases.
+    #
+    # @throw DenCellORFException: When an exception has been raised whilst checking the PRO database.
+    # @throw DenCellORFException: When the PRO database is not empty.
+    # @throw DenCellORFException: When the partial PRO database of a partition cannot be found.
+    #
+    def execute( self ):
+
+        # Run DatabaseCheck in order to check PRO database is reachable
+        # and use the appropriate models prior to combine the partitions
+        Logger.get_instance().info( 'Checking the PRO database prior to combine the partitions...' )
+        try:
+            DatabaseCheckStrategy().execute()
+        except Exception as e:
+            raise DenCellORFException( 'An error occurred whilst checking the database prior to' +
+                                       ' combine the partitions.' +
+                                       '\n Error code: ' + LogCodes.ERR_DBCHECK + '.', e )
+
+        # Check there is no entries in the tables of the PRO database
+        orf_count = SQLManagerPRO.get_instance().get_session().query( ORF ).count()
+        transcript_count = SQLManagerPRO.get_instance().get_session().query( Transcript ).count()
+        orftranscriptasso_count = SQLManagerPRO.get_instance().get_session().query( ORFTranscriptAsso ).count()
+        SQLManagerPRO.get_instance().close_session()
+
+        if ( orf_count, transcript_count, orftranscriptasso_count ) != ( 0, 0, 0 ):
+            raise DenCellORFException( 'Entries have been found in the PRO database.' +
+                                       ' Make sure to use an empty PRO database prior to combine the' +
+                                       ' partitions or to use the "-f" option.' +
+                                       ' Please see the documentation for more information.' )
+
+        # Get a SQLManagerPRO instance for each partial PRO database
+        partition_sql_managers = []
+        for partition_index in range( len( self.partitions ) ):
+
+            partition_db_settings = dict( SQLManagerPRO.get_instance().db_settings )
+            partition_db_settings[ Constants.DB_SETTINGS_DB_NAME ] = MergePartition.get_partial_db_name( SQLManagerPRO.get_instance().get_db_name(),
+                                                                                                         partition_index )
+            partition_sql_manager = SQLManagerPRO()
+            partition_sql_manager.set_db_settings( partition_db_settings )
+
+            if ( not partition_sql_manager.db_exists() ):
+                raise DenCellORFException( 'CombineMergePartitionsStrategy.execute(): The partial PRO' +
+                                           ' database of the partition ' + str( partition_index ) +
+                                           ' (' + partition_sql_manager.get_db_name() + ') cannot be found.' +
+                                           ' Please make sure all the partitions have been merged prior' +
+                                           ' to combine them.' )
+
+            partition_sql_managers.append( partition_sql_manager )
+
+        # Concatenate the content of the tables
+        Logger.get_instance().info( 'Starting to combine the ' + str( len( self.partitions ) ) +
+                                    ' partial PRO databases.' )
+
+        for table_class in CombineMergePartitionsStrategy.TABLES_TO_COMBINE:
+            self.combine_table( table_class, partition_sql_managers )
+
+        for partition_sql_manager in partition_sql_managers:
+            partition_sql_manager.close_session()
+
+        Logger.get_instance().info( 'The partial PRO databases have been combined.' )
+
+
+
+    ## combine_table
+    #  -------------
+    #
+    # This method allows to copy the entries of a table of all the partial
+    # PRO databases into the PRO database. The entries sharing the same
+    # primary key are only inserted once.
+    #
+    # @param table_class: Class - The class of the table (PRO model).
+    # @param partition_sql_managers: List - The SQLManagerPRO instances of the
+    #                                       partial PRO databases.
+    #
+    @RunTelemetry.timed_stage()
+    def combine_table( self, table_class, partition_sql_managers ):
+
+        mapper = inspect( table_class )
+        column_keys = [ column_att.key for column_att in mapper.column_attrs ]
+        primary_key_keys = [ mapper.get_property_by_column( column ).key for column in mapper.primary_key ]
+
+        # Keep track of the primary keys already inserted
+        inserted_primary_keys = set()
+
+        objects_to_insert = []
+        entry_count = 0
+
+        for partition_sql_manager in partition_sql_managers:
+
+            partition_query = partition_sql_manager.get_session().query( table_class ).yield_per( Constants.MAX_COUNT_TO_INSERT )
+
+            for partition_entry in partition_query:
+
+                entry_count += 1
+
+                primary_key = tuple( [ getattr( partition_entry, key ) for key in primary_key_keys ] )
+                if ( primary_key in inserted_primary_keys ):
+                    continue
+                inserted_primary_keys.add( primary_key )
+
+                # Create a new instance with the same values
+                new_entry = table_class()
+                for key in column_keys:
+                    setattr( new_entry, key, getattr( partition_entry, key ) )
+                objects_to_insert.append( new_entry )
+
+                if ( len( objects_to_insert ) >= Constants.MAX_COUNT_TO_INSERT ):
+                    SQLManagerPRO.get_instance().batch_insert_to_db( objects_to_insert = objects_to_insert,
+                                                                     process = 'combination of the ' +
+                                                                               table_class.__tablename__ +
+                                                                               ' table' )
+                    objects_to_insert = []
+
+            partition_sql_manager.close_session()
+
+        if ( objects_to_insert != [] ):
+            SQLManagerPRO.get_instance().batch_insert_to_db( objects_to_insert = objects_to_insert,
+                                                             process = 'combination of the ' +
+                                                                       table_class.__tablename__ +
+                                                                       ' table' )
+
+        Logger.get_instance().debug( 'CombineMergePartitionsStrategy.combine_table(): ' +
+                                     str( len( inserted_primary_keys ) ) + ' entries of the ' +
+                                     table_class.__tablename__ + ' table have been inserted (out of ' +
+                                     str( entry_count ) + ' entries found in the partial databases).' )
@@ -8,6 +8,7 @@ import re
 from fr.tagc.uorf.core.model import *
 
 from fr.tagc.uorf.core.execution.DatabaseCheckStrategy import DatabaseCheckStrategy
+from fr.tagc.uorf.core.execution.GenerateBEDContentStrategy import GenerateBEDContentStrategy
 
 from fr.tagc.uorf.core.util import DefaultTemporaryFolder
 from fr.tagc.uorf.core.util import Constants
@@ -20,6 +21,8 @@ from fr.tagc.uorf.core.util.general.FileHandlerUtil import FileHandlerUtil
 from fr.tagc.uorf.core.util.graphics.ProgressionBar import ProgressionBar
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.log.DiagnosticsAggregator import DiagnosticsAggregator
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
         
 
 ## ComputeKozakContextStrategy
@@ -151,86 +154,95 @@ class ComputeKozakContextStrategy( object ):
         # (i.e. the sequence from the -6 to the +4 position)
         ota_with_kozak_context = {}
                                                                
-        for ota in ota_to_process:
+        with RunTelemetry.get_instance().stage( 'search_kozak_contexts', rows = len( ota_to_process ) ):
+            for ota in ota_to_process:
             
-            # Get the start relative position and the transcript sequence
-            start_pos = ota.rel_start_pos
-            transcript_sequence = ota.sequence
+                # Get the start relative position and the transcript sequence
+                start_pos = ota.rel_start_pos
+                transcript_sequence = ota.sequence
             
-            # Make sure the sequences flanking the start codon 
-            # may be found on the transcript sequence
-            if ( ( start_pos - 7 >= 0 ) 
-                 and ( ( start_pos + 3 ) < len( transcript_sequence ) ) ):
+                # Make sure the sequences flanking the start codon 
+                # may be found on the transcript sequence
+                if ( ( start_pos - 7 >= 0 ) 
+                     and ( ( start_pos + 3 ) < len( transcript_sequence ) ) ):
             
-                # Extract the start codon sequence as well as flanking sequences
-                # (from the -6 position to the +4 position)
-                start_codon_seq = transcript_sequence[ start_pos-1 : start_pos+2 ]
-                start_codon_flanking_seq = transcript_sequence[ start_pos-7 : start_pos+3 ]
+                    # Extract the start codon sequence as well as flanking sequences
+                    # (from the -6 position to the +4 position)
+                    start_codon_seq = transcript_sequence[ start_pos-1 : start_pos+2 ]
+                    start_codon_flanking_seq = transcript_sequence[ start_pos-7 : start_pos+3 ]
                 
-                # Look for Kozak context, starting to search for an optimal context
-                # and pursuing up to find the appropriate type of Kozak context
-                # (optimal, strong, moderate, weak or absent)
-                regex_index = 0
-                match_regex = False
+                    # Look for Kozak context, starting to search for an optimal context
+                    # and pursuing up to find the appropriate type of Kozak context
+                    # (optimal, strong, moderate, weak or absent)
+                    regex_index = 0
+                    match_regex = False
                 
-                while not match_regex:
+                    while not match_regex:
                     
-                    # Get the type of Kozak context to look for
-                    kozak_ctxt_type = ComputeKozakContextStrategy.KOZAK_CONTEXT_PRIORITY_ORDER[ regex_index ]
+                        # Get the type of Kozak context to look for
+                        kozak_ctxt_type = ComputeKozakContextStrategy.KOZAK_CONTEXT_PRIORITY_ORDER[ regex_index ]
                     
-                    # Get the corresponding regex
-                    kozak_regex = ComputeKozakContextStrategy.KOZAK_CONTEXT_REGEX[ kozak_ctxt_type ]
+                        # Get the corresponding regex
+                        kozak_regex = ComputeKozakContextStrategy.KOZAK_CONTEXT_REGEX[ kozak_ctxt_type ]
                     
-                    # Check if the flanking sequence matches the regex
-                    match_regex = re.match( kozak_regex, start_codon_flanking_seq )
-                    regex_index += 1
+                        # Check if the flanking sequence matches the regex
+                        match_regex = re.match( kozak_regex, start_codon_flanking_seq )
+                        regex_index += 1
                     
                     
-                if match_regex:
-                    ota_with_kozak_context[ ota.id ] = ( kozak_ctxt_type, 
-                                                         start_codon_seq,
-                                                         start_codon_flanking_seq )
+                    if match_regex:
+                        ota_with_kozak_context[ ota.id ] = ( kozak_ctxt_type, 
+                                                             start_codon_seq,
+                                                             start_codon_flanking_seq )
         
         
         # Update all the ORFTranscriptAsso entries for which a Kozak context has been found
-        ota_to_process = SQLManagerPRO.get_instance().get_session().query( 
-                                                                                ORFTranscriptAsso 
-                                                                            ).filter(
-                                                                                        ORFTranscriptAsso.id.in_( ota_with_kozak_context.keys() )
-                                                                                    ).all()
+        with RunTelemetry.get_instance().stage( 'update_kozak_contexts', rows = len( ota_with_kozak_context ) ):
+            ota_to_process = SQLManagerPRO.get_instance().get_session().query( 
+                                                                                    ORFTranscriptAsso 
+                                                                                ).filter(
+                                                                                            ORFTranscriptAsso.id.in_( ota_with_kozak_context.keys() )
+                                                                                        ).all()
                                                                                     
-        for ota in ota_to_process:
+            for ota in ota_to_process:
             
-            # Get the information related to the Kozak context description
-            kozak_info = ota_with_kozak_context.get( ota.id )
-            kozak_ctxt_type = kozak_info[ 0 ]
-            start_codon_seq = kozak_info[ 1 ]
-            start_codon_flanking_seq = kozak_info[ 2 ] 
+                # Get the information related to the Kozak context description
+                kozak_info = ota_with_kozak_context.get( ota.id )
+                kozak_ctxt_type = kozak_info[ 0 ]
+                start_codon_seq = kozak_info[ 1 ]
+                start_codon_flanking_seq = kozak_info[ 2 ] 
             
-            # Check if the start codon found matches with the one registered 
-            # in the database.
-            # If not, this is probably due to versionning problem, in such case
-            # log an error message and remove the relative position from the 
-            # entry as they are probably wrong.
-            if ( ( ota.start_codon_seq != None ) 
-                 and ( ota.start_codon_seq != start_codon_seq ) ):            
-                ota.rel_start_pos = None
-                ota.rel_stop_pos = None                
-                Logger.get_instance().warning( 'The ORFTranscriptAsso entry with the ID "' + str( ota.id ) + 
-                                               ' has been registered as starting with the codon ' + 
-                                               ota.start_codon_seq + ' whilst the start codon found using' +
-                                               ' the relative start position and the transcript sequence is ' +
-                                               start_codon_seq + '. This may be relate to versioning' +
-                                               '-related issues when computing the relative start and' +
-                                               ' stop positions. Hence these positions will be removed' +
-                                               ' for this entry.' +
-                                               ' Warning code: ' + LogCodes.WARN_RELCOORD_CONFL_STARTCODON + '.' )
+                # Check if the start codon found matches with the one registered 
+                # in the database.
+                # If not, this is probably due to versionning problem, in such case
+                # log an error message and remove the relative position from the 
+                # entry as they are probably wrong.
+                if ( ( ota.start_codon_seq != None ) 
+                     and ( ota.start_codon_seq != start_codon_seq ) ):            
+                    ota.rel_start_pos = None
+                    ota.rel_stop_pos = None                
+                    DiagnosticsAggregator.get_instance().record( LogCodes.WARN_RELCOORD_CONFL_STARTCODON, 'ComputeKozakContextStrategy', ota.id,
+                                                                 'The ORFTranscriptAsso entry with the ID "%s"' +
+                                                                 ' has been registered as starting with the codon %s' +
+                                                                 ' whilst the start codon found using the relative start' +
+                                                                 ' position and the transcript sequence is %s. This may' +
+                                                                 ' be relate to versioning-related issues when computing' +
+                                                                 ' the relative start and stop positions. Hence these' +
+                                                                 ' positions will be removed for this entry.',
+                                                                 ( ota.id, ota.start_codon_seq, start_codon_seq ) )
                 
-            else:                
-                ota.kozak_context_comp = kozak_ctxt_type
-                ota.start_codon_seq = start_codon_seq
-                ota.start_flanking_seq = start_codon_flanking_seq
+                else:                
+                    ota.kozak_context_comp = kozak_ctxt_type
+                    ota.start_codon_seq = start_codon_seq
+                    ota.start_flanking_seq = start_codon_flanking_seq
+        
+            # Get the IDs of the ORFs related to the updated entries
+            updated_orf_ids = sorted( set( [ ota.orf_id for ota in ota_to_process ] ) )
         
-        SQLManagerPRO.get_instance().commit()
+            SQLManagerPRO.get_instance().commit()
         SQLManagerPRO.get_instance().close_session()
+        
+        # Register these ORFs in order to refresh their BED lines
+        GenerateBEDContentStrategy.register_changed_orfs( orf_ids = updated_orf_ids,
+                                                          process = 'ComputeKozakContext' )
         
\ No newline at end of file
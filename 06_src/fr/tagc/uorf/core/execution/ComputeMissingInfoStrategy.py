@@ -3,12 +3,10 @@
 import ConfigParser
 import os
 
-import requests
-import pyensembl
-
 from fr.tagc.uorf.core.model import *
 
 from fr.tagc.uorf.core.execution.DatabaseCheckStrategy import DatabaseCheckStrategy
+from fr.tagc.uorf.core.execution.filter.FilterPlanner import FilterPlanner
 
 from fr.tagc.uorf.core.util import Constants
 from fr.tagc.uorf.core.util import LogCodes
@@ -23,6 +21,7 @@ from fr.tagc.uorf.core.util.general.GeneralUtil import GeneralUtil
 from fr.tagc.uorf.core.util.graphics.ProgressionBar import ProgressionBar
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
         
 
 ## ComputeMissingInfoStrategy
@@ -220,6 +219,10 @@ class ComputeMissingInfoStrategy( object ):
         
         # Complete the UTRNABiotypeCatalog table with all unique RNA biotypes
         self.complete_utrnabiotypecatalog_table()
+        
+        # Update the content version of the PRO database, such as the key sets
+        # computed by the Filter strategy on the former content are not used
+        FilterPlanner.update_content_version()
          
     
     
@@ -233,6 +236,7 @@ class ComputeMissingInfoStrategy( object ):
     # This method allows to compute the genomic length of the ORFs using
     # their genomic coordinates and splicing information.
     # 
+    @RunTelemetry.timed_stage()
     def compute_orf_gen_len( self ):
         
         Logger.get_instance().info( 'Starting the computation of ORF genomic lengths.')
@@ -294,6 +298,7 @@ class ComputeMissingInfoStrategy( object ):
     # to the genomic length of its related entries in the ORF table (previously computed from 
     # genomics coordinates using the compute_gen_orf_len() method).
     # 
+    @RunTelemetry.timed_stage()
     def compare_gen_orf_len( self ):
         
         Logger.get_instance().info( 'Starting the comparison of ORFTranscriptAsso lengths' +
@@ -362,6 +367,7 @@ class ComputeMissingInfoStrategy( object ):
     # @throw DenCellORFException: When an error occurs trying to delete the CellContextCatalog without
     #                             children.
     # 
+    @RunTelemetry.timed_stage()
     def merge_cell_context( self ):
         
         Logger.get_instance().info( 'Starting to merge and re-annotate the cellular contexts.')
@@ -475,6 +481,7 @@ class ComputeMissingInfoStrategy( object ):
     # @throw DenCellORFException: When an error occurs trying to update the PROMetadata entry containing 
     #                             current ensembl release number.
     #  
+    @RunTelemetry.timed_stage()
     def download_missing_info( self ):
         
         # Get the current genome version
@@ -546,6 +553,7 @@ class ComputeMissingInfoStrategy( object ):
     #
     # This method allows to download the nucleic sequences for each entry of the ORF table.
     #  
+    @RunTelemetry.timed_stage()
     def download_orf_sequences( self ):
         
         ## Download the nucleic sequence
@@ -657,10 +665,13 @@ class ComputeMissingInfoStrategy( object ):
                         # attributes (e.g. a position is missing), discard the ORF
                         if ( orf.sequence == None ):
                             orf_ids_to_discard.append( orf.id )
-                    
-                                            
-                    # Translate the sequence
-                    if orf.sequence:
+                            
+                    objects_to_update.append( orf )
+                
+                # Translate the sequences downloaded for the batch
+                orfs_to_translate = [ orf for orf in objects_to_update if orf.sequence ]
+                with RunTelemetry.get_instance().stage( 'translate_dna', rows = len( orfs_to_translate ) ):
+                    for orf in orfs_to_translate:
                         try:
                             orf.sequence_aa = GeneticsUtil.translate_dna( dna_seq = orf.sequence, 
                                                                           include_stop = False,
@@ -674,11 +685,10 @@ class ComputeMissingInfoStrategy( object ):
                                                            ' nucleotides.' +
                                                            ' Warning code: ' + LogCodes.WARN_TRANSL_SEQSIZE_NOT3 + '.' )
                             
-                    objects_to_update.append( orf )
-                            
                 # Add objects to the session and commit changes
                 self.batch_insert_to_PRO_db( objects_to_update,
                                              process = 'Download of ORF sequences' )
+                RunTelemetry.get_instance().add_rows( len( objects_to_update ) )
                 
                 # Redefine the minimum bound of the interval
                 min_bound = max_bound
@@ -707,6 +717,7 @@ class ComputeMissingInfoStrategy( object ):
     #                         (or None if it cannot be downloaded).
     #
     @staticmethod
+    @RunTelemetry.timed_stage()
     def download_orf_seq( orf, genome_version ):
         
         # If the ORF is not spliced, download the sequence between the start and the stop
@@ -772,6 +783,7 @@ class ComputeMissingInfoStrategy( object ):
     # @param pyensembl_release: EnsemblRelease - The EnsemblRelease to query to find the information 
     #                                            associated with the transcript IDs / names.
     #
+    @RunTelemetry.timed_stage()
     def complete_transcript_table( self, pyensembl_release ):
         
         Logger.get_instance().info( 'Starting to download missing information in Transcript table.' )
@@ -874,6 +886,9 @@ class ComputeMissingInfoStrategy( object ):
                                                            ' Warning code: ' + LogCodes.WARN_DCORF_TR_CONFL + '.' )
                             
                         setattr( transcript, att, pyensembl_tr_att_value )
+                
+                # Update the genomic bin of the transcript
+                transcript.bin = GeneticsUtil.get_genomic_bin( transcript.start_pos, transcript.end_pos )
                         
                         
                 # The Transcript table store the CDS start and stop positions such as:
@@ -1141,6 +1156,7 @@ class ComputeMissingInfoStrategy( object ):
     # @throw DenCellORFException: When an error occurs trying to delete the UTRNABiotypeCatalog
     #                             entries (when the "-f" option has been selected).
     #
+    @RunTelemetry.timed_stage()
     def complete_utrnabiotypecatalog_table( self ):
         
         Logger.get_instance().debug( 'Starting to complete the UTRNABiotypeCatalog table.')
@@ -27,6 +27,7 @@ from fr.tagc.uorf.core.util.general.FileHandlerUtil import FileHandlerUtil
 from fr.tagc.uorf.core.util.graphics.ProgressionBar import ProgressionBar
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
         
 
 ## ComputeRelCoordStrategy
@@ -278,6 +279,7 @@ class ComputeRelCoordStrategy( object ):
     # and Transcript entries.
     # NB: This function run a R script as subprocess.
     #
+    @RunTelemetry.timed_stage()
     def compute_ota_relative_coordinates( self ):
         
         Logger.get_instance().info( 'Starting the computation of relative ORF start and stop coordinates' +
@@ -439,6 +441,7 @@ class ComputeRelCoordStrategy( object ):
     # of all transcripts.
     # NB: This function run a R script as subprocess.
     #
+    @RunTelemetry.timed_stage()
     def compute_tr_cds_relative_coordinates( self ):
         
         Logger.get_instance().info( 'Starting the computation of relative CDS transcript start and stop' +
@@ -15,6 +15,7 @@ from fr.tagc.uorf.core.util.option.OptionManager import OptionManager
 from fr.tagc.uorf.core.util.option import OptionConstants
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
 
 
 ## DeletionStrategy
@@ -137,6 +138,7 @@ class DeletionStrategy( object ):
     #                             objects from the session or trying to commit the session.
     #
     @staticmethod
+    @RunTelemetry.timed_stage()
     def delete_datasource( data_source ):
         
         # For an easier manipulation of data stored in the DataManager, 
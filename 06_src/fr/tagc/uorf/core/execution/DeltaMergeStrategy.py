@@ -0,0 +1,566 @@
+# -*- coding: utf-8 -*-
+
+
+from fr.tagc.uorf.core.model import *
+
+from fr.tagc.uorf.core.execution.DatabaseCheckStrategy import DatabaseCheckStrategy
+from fr.tagc.uorf.core.execution.GenerateBEDContentStrategy import GenerateBEDContentStrategy
+from fr.tagc.uorf.core.execution.MergeStrategy import MergeStrategy
+from fr.tagc.uorf.core.execution.filter.FilterPlanner import FilterPlanner
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
+from fr.tagc.uorf.core.util.data.DataManager import DataManager
+from fr.tagc.uorf.core.util.sql.SQLManagerDS import SQLManagerDS
+from fr.tagc.uorf.core.util.sql.SQLManagerPRO import SQLManagerPRO
+from fr.tagc.uorf.core.util.option.OptionManager import OptionManager
+from fr.tagc.uorf.core.util.option import OptionConstants
+from fr.tagc.uorf.core.util.general.GeneralUtil import GeneralUtil
+from fr.tagc.uorf.core.util.general.FileHandlerUtil import FileHandlerUtil
+from fr.tagc.uorf.core.util.genetics.GeneticsUtil import GeneticsUtil
+from fr.tagc.uorf.core.util.exception import *
+from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
+
+
+## DeltaMergeStrategy
+#  ==================
+#
+# This class inherits from MergeStrategy and is a strategy aiming to merge
+# the entries of new data sources (previously inserted in the DS database)
+# into an existing PRO database, without re-building it from scratch.
+# Only the entries of the DS database provided by these data sources are
+# merged, using the same keys as the MergeStrategy:
+# - The new ORF and Transcript entries that are identical to an existing
+#   entry of the PRO database are merged into this entry (i.e. the IDs of the
+#   existing entries are kept unchanged, their counts are updated and the
+#   conflicting attributes are set to None). The similar ORFs and the "unknown"
+#   transcripts are merged with the existing entries as during the merging.
+# - The ORFTranscriptAsso entries related to the ( ORF, Transcript ) couples
+#   that have new DSORFTranscriptAsso entries are re-computed from all the
+#   DSORFTranscriptAsso entries related to them (i.e. both the ones previously
+#   merged and the new ones) and keep their ID, such as all their aggregated
+#   values (counts, min / max / median lengths, clusters...) are updated. The
+#   new couples are inserted as new entries.
+# - The IDs of the ORFTranscriptAsso and ORF entries that have been created or
+#   updated are saved in a file, such as the strategies computing information
+#   about these entries (AnnotateORF, ComputeRelCoord, ComputeKozakContext and
+#   GenerateBEDContent) know which entries have to be re-computed.
+#
+# NB: To run this strategy you need to ensure the PRO database has been built
+#     from the DS database currently used and that the DS entries previously
+#     merged have not been altered since.
+#
+class DeltaMergeStrategy( MergeStrategy ):
+
+    ## Class variables
+    #  ---------------
+    #
+    # List of the tables containing children of the ORFTranscriptAsso entries
+    OTA_CHILD_TABLES = [ ORFTranscriptAssoDSAsso, CellContext, ProvidedCategory, FLOSSClass,
+                         ORFCategory, ORFAnnotation ]
+
+
+    ## Constructor of DeltaMergeStrategy
+    #  ---------------------------------
+    #
+    # Instance variables:
+    #     - configfile: String - The path to the config file.
+    #     - species: String - The name of the species in the database.
+    #     - sqce_consensus_ambig_threshold: Float[0,1] - The threshold to use to compute the
+    #                                                    sequence consensus interval.
+    #     - max_len_diff_dsota_clust: Integer (>0) - The maximal difference between the max.
+    #                                                and min. lengths of DSORFTranscriptAsso
+    #                                                entries to belong to the same "cluster".
+    #     - thread_nb: Integer (>0) - The number of threads that can be use.
+    #     - data_sources: List - The names of the new data sources to merge.
+    #     - updated_transcript_ids: Set - The IDs of the existing Transcript entries which
+    #                                     attributes have been updated.
+    #
+    # @throw DenCellORFException - When the names of the data sources are not provided.
+    #
+    def __init__( self ):
+
+        MergeStrategy.__init__( self )
+
+        # Get the names of the data sources to merge
+        data_sources = OptionManager.get_instance().get_option( OptionConstants.OPTION_SOURCE_NAME,
+                                                                not_none = False )
+        if data_sources:
+            self.data_sources = [ data_source.strip() for data_source in GeneralUtil.string_to_list( data_sources ) \
+                                  if ( data_source.strip() != '' ) ]
+
+        if ( not self.data_sources ):
+            raise DenCellORFException( 'The name of the data source(s) to merge into the PRO database' +
+                                       ' has to be provided. See the documentation for more information.' )
+
+        self.updated_transcript_ids = set()
+
+
+
+    ## execute
+    #  -------
+    #
+    # Execute the strategy to merge the entries of the new data sources
+    # into the existing PRO database.
+    #
+    # @throw DenCellORFException - When an exception has been raised during the DatabaseCheck.
+    # @throw DenCellORFException - When one of the data sources cannot be found in the DS database.
+    # @throw DenCellORFException - When there is no DSORFTranscriptAsso entry provided by the
+    #                              data sources.
+    # @throw DenCellORFException - When the PRO database does not contain any ORF entry.
+    # @throw DenCellORFException - When one of the data sources has already been merged.
+    #
+    def execute( self ):
+
+        # Run DatabaseCheck in order to check the DS and PRO databases
+        # are reachable prior to the merging of data
+        Logger.get_instance().info( 'Checking the databases prior to the merging step...' )
+        try:
+            DatabaseCheckStrategy().execute()
+        except Exception as e:
+            raise DenCellORFException( 'An error occurred whilst checking the database prior to' +
+                                       ' merging step.' +
+                                       '\n Error code: ' + LogCodes.ERR_DBCHECK + '.', e )
+
+        # Check all the data sources exist in the DS database
+        existing_data_sources = GeneralUtil.query_result_to_list( SQLManagerDS.get_instance().get_session().query( DataSource.name ).filter( DataSource.name.in_( self.data_sources ) ).all() )
+        SQLManagerDS.get_instance().close_session()
+
+        missing_data_sources = [ data_source for data_source in self.data_sources \
+                                 if ( data_source not in existing_data_sources ) ]
+        if ( missing_data_sources != [] ):
+            raise DenCellORFException( 'The following data sources cannot be found in the ' +
+                                       SQLManagerDS.get_instance().get_db_name() + ' database' +
+                                       ' (DS database): ' + ', '.join( missing_data_sources ) +
+                                       '. Make sure to insert them prior to merge them.' )
+
+        # Check there is at least one DSORFTranscriptAsso entry
+        # provided by these data sources
+        dsorftranscriptasso_count = SQLManagerDS.get_instance().get_session().query( DSORFTranscriptAsso ).filter( self.get_ds_source_criterion( DSORFTranscriptAsso ) ).count()
+        SQLManagerDS.get_instance().close_session()
+
+        if ( dsorftranscriptasso_count == 0 ):
+            raise DenCellORFException( 'There is not any entry of the DSORFTranscriptAsso table' +
+                                       ' provided by the data sources ' + ', '.join( self.data_sources ) +
+                                       '. Hence, the merging of data will be stopped.' )
+
+        # Check the PRO database has already been built
+        orf_count = SQLManagerPRO.get_instance().get_session().query( ORF ).count()
+        SQLManagerPRO.get_instance().close_session()
+
+        if ( orf_count == 0 ):
+            raise DenCellORFException( 'There is not any entry found in the ORF table of the ' +
+                                       SQLManagerPRO.get_instance().get_db_name() + ' database' +
+                                       ' (PRO database). Please use the Merge strategy to build' +
+                                       ' the PRO database.' )
+
+        # Check none of the data sources has already been merged
+        merged_data_sources = GeneralUtil.query_result_to_list( SQLManagerPRO.get_instance().get_session().query( ORFDSAsso.data_source ).filter( ORFDSAsso.data_source.in_( self.data_sources ) ).distinct().all() )
+        SQLManagerPRO.get_instance().close_session()
+
+        if ( merged_data_sources != [] ):
+            raise DenCellORFException( 'The following data sources have already been merged into the' +
+                                       ' PRO database: ' + ', '.join( merged_data_sources ) + '.' +
+                                       ' Please use the Merge strategy to re-build the PRO database' +
+                                       ' if their entries have been modified.' )
+
+        Logger.get_instance().info( 'The entries of the following data sources will be merged into' +
+                                    ' the existing PRO database: ' + ', '.join( self.data_sources ) + '.' )
+
+        # Copy the missing entries of the "conserved" tables
+        self.copy_conserved_tables()
+
+        # Regroup the new ORFs together and with the existing ones
+        self.merge_dsorfs()
+
+        # Regroup the new transcripts together and with the existing ones
+        self.merge_dstranscripts()
+
+        # Recover the new DSORFTranscriptAsso, and merge them
+        # with the ones previously merged for the same couples
+        self.merge_dsorftranscriptasso()
+
+        # Clean the database by removing parent entries that have no child
+        self.clean_pro_database()
+
+        # Save the IDs of the entries for which the downstream steps need to be re-computed
+        self.save_entries_to_recompute()
+
+        # Update the content version of the PRO database, such as the key sets
+        # computed by the Filter strategy on the former content are not used
+        FilterPlanner.update_content_version()
+
+
+
+    ## copy_conserved_tables
+    #  ---------------------
+    #
+    # This methods aims to "copy" the entries of the DS database tables for which
+    # there is no need to merge the data into the PRO database, when they do not
+    # already exist in the PRO database (see the documentation of the
+    # MergeStrategy.copy_conserved_tables() method for more information).
+    #
+    @RunTelemetry.timed_stage()
+    def copy_conserved_tables( self ):
+
+        Logger.get_instance().info( 'Copying the new entries of the gene-related and metadata-related' +
+                                    ' tables into the PRO database.')
+
+        # Get the primary keys of the entries already existing in the PRO database
+        existing_parameters = set( GeneralUtil.query_result_to_list( SQLManagerPRO.get_instance().get_session().query( PROMetadata.parameter ).all() ) )
+        existing_gene_ids = set( GeneralUtil.query_result_to_list( SQLManagerPRO.get_instance().get_session().query( PROGene.gene_id ).all() ) )
+        existing_gene_aliases = set( SQLManagerPRO.get_instance().get_session().query( PROGeneAlias.gene_id, PROGeneAlias.alias ).all() )
+        SQLManagerPRO.get_instance().close_session()
+
+        objects_to_insert = []
+
+        # Copy the Metadata entries, except the records of the build nodes
+        ds_metadata_all = SQLManagerDS.get_instance().get_session().query( Metadata ).filter( ~Metadata.parameter.startswith( Constants.METATABLE_BUILD_PREFIX ) ).all()
+
+        for ds_metadata in ds_metadata_all:
+            if ( ds_metadata.parameter not in existing_parameters ):
+                pro_metadata = PROMetadata( parameter = ds_metadata.parameter,
+                                            value = ds_metadata.value,
+                                            description = ds_metadata.description )
+                objects_to_insert.append( pro_metadata )
+
+        # Copy the Gene entries
+        ds_gene_all = SQLManagerDS.get_instance().get_session().query( Gene ).all()
+
+        for ds_gene in ds_gene_all:
+            if ( ds_gene.gene_id not in existing_gene_ids ):
+                pro_gene = PROGene( gene_id = ds_gene.gene_id,
+                                    chromosome = ds_gene.chromosome )
+                objects_to_insert.append( pro_gene )
+
+        # Copy the GeneAlias entries
+        ds_genealias_all = SQLManagerDS.get_instance().get_session().query( GeneAlias ).all()
+
+        for ds_genealias in ds_genealias_all:
+            if ( ( ds_genealias.gene_id, ds_genealias.alias ) not in existing_gene_aliases ):
+                pro_genealias = PROGeneAlias( gene_id = ds_genealias.gene_id,
+                                              alias = ds_genealias.alias )
+                objects_to_insert.append( pro_genealias )
+
+        # Insert the newly created objects in the database
+        self.batch_insert_to_PRO_db( objects_to_insert = objects_to_insert,
+                                     filename = 'conserved_tables',
+                                     process = 'copy the content of the "conserved" tables' )
+        SQLManagerDS.get_instance().close_session()
+
+        Logger.get_instance().info( str( len( objects_to_insert ) ) + ' new entries of the gene and' +
+                                    ' metadata tables have been copied.')
+
+
+
+    ## merge_with_existing_entries
+    #  ---------------------------
+    #
+    # This method allows to merge the new ORF or Transcript entries with the
+    # ones that already exist in the PRO database and share the same values
+    # for the key attributes. When an existing entry is found:
+    # - The numbers of DS entries grouped in the new entry (count_ds) and of
+    #   ambiguous DS entries associated with it (count_ds_ambiguous) are added
+    #   to its counts.
+    # - The attributes which values are conflicting are set to None.
+    #   NB: As a None value may result from a previous conflict, the existing
+    #       attributes set to None are never updated.
+    # - The association entries of the new entry are re-assigned to it.
+    # - The new entry is discarded.
+    #
+    # @param objects_to_insert: List - The list of new objects (entries and association
+    #                                  entries) to insert in the database.
+    # @param entity_class: Class - The class of the entries (ORF or Transcript).
+    # @param key_attributes: List - The attributes that have to be equal for two
+    #                               entries to be merged together.
+    # @param lookup_attribute: String - The attribute used to query the existing entries.
+    # @param asso_class: Class - The class of the association entries (ORFDSAsso or
+    #                            TranscriptDSAsso).
+    # @param asso_fk_attribute: String - The attribute of the association entries
+    #                                    referencing the entries.
+    # @param att_to_check: List - The attributes which values need to be checked prior
+    #                             to merge two entries together. None by default
+    #                             (no attribute to check).
+    #
+    # @return List - The list of objects to insert in the database.
+    #
+    # @throw DenCellORFException: When an exception has been raised trying to commit the
+    #                             changes of the existing entries.
+    #
+    def merge_with_existing_entries( self, objects_to_insert, entity_class, key_attributes, lookup_attribute, \
+                                     asso_class, asso_fk_attribute, att_to_check=None ):
+
+        if ( att_to_check == None ):
+            att_to_check = []
+
+        Logger.get_instance().debug( 'DeltaMergeStrategy.merge_with_existing_entries(): Looking for' +
+                                     ' the existing entries of the ' + entity_class.__tablename__ +
+                                     ' table that are identical to the new ones.' )
+
+        # Get the existing entries sharing the same value for
+        # the lookup attribute as at least one new entry
+        lookup_values = list( set( [ getattr( obj, lookup_attribute ) for obj in objects_to_insert \
+                                     if ( isinstance( obj, entity_class )
+                                          and ( getattr( obj, lookup_attribute ) != None ) ) ] ) )
+
+        existing_entries_dict = {}
+        for min_bound in xrange( 0, len( lookup_values ), Constants.DELTA_MERGE_QUERY_BATCH_SIZE ):
+            lookup_values_chunk = lookup_values[ min_bound : min_bound + Constants.DELTA_MERGE_QUERY_BATCH_SIZE ]
+            existing_entries = SQLManagerPRO.get_instance().get_session().query( entity_class ).filter( getattr( entity_class, lookup_attribute ).in_( lookup_values_chunk ) ).all()
+
+            for existing_entry in existing_entries:
+                key = tuple( [ getattr( existing_entry, att ) for att in key_attributes ] )
+                existing_entries_dict[ key ] = existing_entry
+
+        # Merge the new entries with the existing ones
+        new_to_existing_ids = {}
+        objects_to_keep = []
+
+        for obj in objects_to_insert:
+
+            if isinstance( obj, entity_class ):
+                key = tuple( [ getattr( obj, att ) for att in key_attributes ] )
+                existing_entry = existing_entries_dict.get( key )
+
+                if existing_entry:
+                    existing_entry.count_ds += obj.count_ds
+                    existing_entry.count_ds_ambiguous = ( ( existing_entry.count_ds_ambiguous or 0 ) +
+                                                          ( obj.count_ds_ambiguous or 0 ) )
+
+                    for att in att_to_check:
+                        existing_value = getattr( existing_entry, att )
+                        new_value = getattr( obj, att )
+
+                        if ( ( existing_value != None ) and ( new_value != None )
+                             and ( existing_value != new_value ) ):
+                            setattr( existing_entry, att, None )
+                            if ( entity_class == Transcript ):
+                                self.updated_transcript_ids.add( existing_entry.id )
+                            Logger.get_instance().warning( 'Several values have been found for the' +
+                                                           ' attribute ' + str( att ) + ' whilst merging' +
+                                                           ' the new entries with the ' +
+                                                           entity_class.__tablename__ + ' with ID "' +
+                                                           str( existing_entry.id ) + '" (' +
+                                                           str( [ existing_value, new_value ] ) + ').' +
+                                                           ' Hence the value of this attribute has been' +
+                                                           ' set to None.' +
+                                                           ' Warning code: ' + LogCodes.WARN_MERG_CONFL + '.' )
+
+                    # Update the genomic bin of the transcript as its coordinates may have been reset
+                    if ( entity_class == Transcript ):
+                        existing_entry.bin = GeneticsUtil.get_genomic_bin( existing_entry.start_pos, 
+                                                                           existing_entry.end_pos )
+
+                    new_to_existing_ids[ obj.id ] = existing_entry.id
+
+                else:
+                    objects_to_keep.append( obj )
+
+            else:
+                objects_to_keep.append( obj )
+
+        # Re-assign the association entries to the existing entries
+        for obj in objects_to_keep:
+            if isinstance( obj, asso_class ):
+                existing_id = new_to_existing_ids.get( getattr( obj, asso_fk_attribute ) )
+                if ( existing_id != None ):
+                    setattr( obj, asso_fk_attribute, existing_id )
+
+        # Commit the changes of the existing entries
+        try:
+            SQLManagerPRO.get_instance().commit()
+        except Exception as e:
+            raise DenCellORFException( 'DeltaMergeStrategy.merge_with_existing_entries(): An error' +
+                                       ' occurred trying to commit the changes of the existing entries' +
+                                       ' of the ' + entity_class.__tablename__ + ' table.', e )
+        SQLManagerPRO.get_instance().close_session()
+
+        Logger.get_instance().info( str( len( new_to_existing_ids ) ) + ' new entries of the ' +
+                                    entity_class.__tablename__ + ' table have been merged with' +
+                                    ' existing entries.' )
+
+        return objects_to_keep
+
+
+
+    ## merge_dsorftranscriptasso
+    #  -------------------------
+    #
+    # This method allows to get the ( ORF, Transcript ) couples related to the new
+    # DSORFTranscriptAsso entries, to add to them the DSORFTranscriptAsso entries
+    # previously merged for the couples that already exist in the PRO database, and
+    # to merge all of them into ORFTranscriptAsso entries.
+    #
+    @RunTelemetry.timed_stage()
+    def merge_dsorftranscriptasso( self ):
+
+        Logger.get_instance().info( 'Starting to merge the new entries of the DSORFTranscriptAsso table.' )
+
+        # Get all the ( ORF, Transcript ) couples related
+        # to the new DSORFTranscriptAsso entries
+        self.get_dsorftranscriptasso_to_merge()
+
+        # Get the couples that already exist in the PRO database
+        # and remove their ORFTranscriptAsso entries
+        self.get_existing_orftranscriptasso_to_recompute()
+
+        # Merge the entries of the DSORFTranscriptAsso table
+        self.merge_dsota()
+
+
+
+    ## get_existing_orftranscriptasso_to_recompute
+    #  -------------------------------------------
+    #
+    # This method allows to get the ( ORF, Transcript ) couples related to the new
+    # DSORFTranscriptAsso entries that already have an ORFTranscriptAsso entry in the
+    # PRO database. For each of these couples:
+    # - The DSORFTranscriptAsso entries previously merged into the ORFTranscriptAsso
+    #   are added to the list of DSORFTranscriptAsso to merge.
+    # - The ID of the ORFTranscriptAsso is registered in the existing_ota_ids
+    #   dictionary, such as the new entry keep the same ID.
+    # - The ORFTranscriptAsso entry (and its children) is removed from the database.
+    # NB: It needs the 'all_existing_orf_tr_asso_dict' dictionary stored into the
+    #     DataManager in order to work properly.
+    #
+    # @throw DenCellORFException: When an exception has been raised trying to remove the
+    #                             ORFTranscriptAsso entries to re-compute.
+    #
+    @RunTelemetry.timed_stage()
+    def get_existing_orftranscriptasso_to_recompute( self ):
+
+        all_existing_orf_tr_asso_dict = DataManager.get_instance().get_data( Constants.DM_ALL_EXISTING_ORF_TR_ASSO_DICT )
+
+        Logger.get_instance().debug( 'DeltaMergeStrategy.get_existing_orftranscriptasso_to_recompute():' +
+                                     ' Getting the ( ORF ID, Transcript ID ) couples that already exist' +
+                                     ' in the PRO database.' )
+
+        # Get the ORFTranscriptAsso entries related to the couples
+        # NB: The IDs of the couples are strings
+        orf_ids = list( set( [ int( orf_id ) for ( orf_id, tr_id ) in all_existing_orf_tr_asso_dict.keys() ] ) )
+
+        self.existing_ota_ids = {}
+        for min_bound in xrange( 0, len( orf_ids ), Constants.DELTA_MERGE_QUERY_BATCH_SIZE ):
+            orf_ids_chunk = orf_ids[ min_bound : min_bound + Constants.DELTA_MERGE_QUERY_BATCH_SIZE ]
+            existing_ota_all = SQLManagerPRO.get_instance().get_session().query( ORFTranscriptAsso.id,
+                                                                                  ORFTranscriptAsso.orf_id,
+                                                                                  ORFTranscriptAsso.transcript_id ).filter( ORFTranscriptAsso.orf_id.in_( orf_ids_chunk ) ).all()
+
+            for ( ota_id, orf_id, tr_id ) in existing_ota_all:
+                orf_tr_asso = ( str( orf_id ), str( tr_id ) )
+                if ( orf_tr_asso in all_existing_orf_tr_asso_dict ):
+                    self.existing_ota_ids[ orf_tr_asso ] = ota_id
+
+        # Get the IDs of the DSORFTranscriptAsso entries previously merged for these couples
+        ota_ids = self.existing_ota_ids.values()
+        couple_for_ota_id = { ota_id: orf_tr_asso for ( orf_tr_asso, ota_id ) in self.existing_ota_ids.items() }
+
+        couples_for_dsota_id = {}
+        for min_bound in xrange( 0, len( ota_ids ), Constants.DELTA_MERGE_QUERY_BATCH_SIZE ):
+            ota_ids_chunk = ota_ids[ min_bound : min_bound + Constants.DELTA_MERGE_QUERY_BATCH_SIZE ]
+            otadsasso_all = SQLManagerPRO.get_instance().get_session().query( ORFTranscriptAssoDSAsso.orftranscriptasso_id,
+                                                                               ORFTranscriptAssoDSAsso.dsorftranscriptasso_id ).filter( ORFTranscriptAssoDSAsso.orftranscriptasso_id.in_( ota_ids_chunk ) ).all()
+
+            for ( ota_id, dsota_id ) in otadsasso_all:
+                couples_for_dsota_id.setdefault( dsota_id, [] ).append( couple_for_ota_id[ ota_id ] )
+        SQLManagerPRO.get_instance().close_session()
+
+        # Add these DSORFTranscriptAsso entries to the lists of entries to merge
+        dsota_ids = couples_for_dsota_id.keys()
+        for min_bound in xrange( 0, len( dsota_ids ), Constants.DELTA_MERGE_QUERY_BATCH_SIZE ):
+            dsota_ids_chunk = dsota_ids[ min_bound : min_bound + Constants.DELTA_MERGE_QUERY_BATCH_SIZE ]
+            dsota_all = SQLManagerDS.get_instance().get_session().query( DSORFTranscriptAsso ).filter( DSORFTranscriptAsso.id.in_( dsota_ids_chunk ) ).all()
+
+            for dsota in dsota_all:
+                for orf_tr_asso in couples_for_dsota_id[ dsota.id ]:
+                    all_existing_orf_tr_asso_dict[ orf_tr_asso ].append( dsota )
+        SQLManagerDS.get_instance().close_session()
+
+        Logger.get_instance().info( str( len( self.existing_ota_ids ) ) + ' existing ORFTranscriptAsso' +
+                                    ' entries (out of ' + str( len( all_existing_orf_tr_asso_dict ) ) +
+                                    ' ( ORF, Transcript ) couples to merge) will be re-computed from ' +
+                                    str( len( dsota_ids ) ) + ' DSORFTranscriptAsso entries previously' +
+                                    ' merged and the new ones.' )
+
+        # Remove the ORFTranscriptAsso entries that will be re-computed (and their children)
+        try:
+            for min_bound in xrange( 0, len( ota_ids ), Constants.DELTA_MERGE_QUERY_BATCH_SIZE ):
+                ota_ids_chunk = ota_ids[ min_bound : min_bound + Constants.DELTA_MERGE_QUERY_BATCH_SIZE ]
+                for ota_child_table in DeltaMergeStrategy.OTA_CHILD_TABLES:
+                    SQLManagerPRO.get_instance().get_session().query( ota_child_table ).filter( ota_child_table.orftranscriptasso_id.in_( ota_ids_chunk ) ).delete( synchronize_session = False )
+                SQLManagerPRO.get_instance().get_session().query( ORFTranscriptAsso ).filter( ORFTranscriptAsso.id.in_( ota_ids_chunk ) ).delete( synchronize_session = False )
+        except Exception as e:
+            raise DenCellORFException( 'DeltaMergeStrategy.get_existing_orftranscriptasso_to_recompute():' +
+                                       ' An error occurred trying to delete the ORFTranscriptAsso entries' +
+                                       ' to re-compute.', e )
+        else:
+            SQLManagerPRO.get_instance().commit()
+            SQLManagerPRO.get_instance().close_session()
+
+
+
+    ## save_entries_to_recompute
+    #  -------------------------
+    #
+    # This method allows to save in a file the IDs of the entries for which the
+    # information computed by the downstream strategies need to be re-computed,
+    # i.e. a dictionary that associates to the name of each strategy the list of
+    # IDs of the entries to re-compute:
+    # - AnnotateORF, ComputeRelCoord, ComputeKozakContext: The IDs of the
+    #   ORFTranscriptAsso entries created or re-computed during the merging,
+    #   and of the ORFTranscriptAsso entries related to Transcripts which
+    #   attributes have been updated.
+    # - GenerateBEDContent: The IDs of the ORF entries related to new DSORF
+    #   entries or to the ORFTranscriptAsso entries listed above.
+    # The IDs of these ORF entries are also registered in the UTORFChangeLog 
+    # table, such as their BED lines may be refreshed incrementally.
+    #
+    @RunTelemetry.timed_stage()
+    def save_entries_to_recompute( self ):
+
+        # Get the ORFTranscriptAsso entries created or re-computed
+        ota_ids = set( GeneralUtil.query_result_to_list( SQLManagerPRO.get_instance().get_session().query( ORFTranscriptAssoDSAsso.orftranscriptasso_id ).filter( ORFTranscriptAssoDSAsso.data_source.in_( self.data_sources ) ).distinct().all() ) )
+
+        # Get the ORFTranscriptAsso entries related to the updated Transcripts
+        updated_transcript_ids = list( self.updated_transcript_ids )
+        for min_bound in xrange( 0, len( updated_transcript_ids ), Constants.DELTA_MERGE_QUERY_BATCH_SIZE ):
+            transcript_ids_chunk = updated_transcript_ids[ min_bound : min_bound + Constants.DELTA_MERGE_QUERY_BATCH_SIZE ]
+            ota_ids.update( GeneralUtil.query_result_to_list( SQLManagerPRO.get_instance().get_session().query( ORFTranscriptAsso.id ).filter( ORFTranscriptAsso.transcript_id.in_( transcript_ids_chunk ) ).all() ) )
+
+        # Get the ORF entries related to new DSORFs or to these ORFTranscriptAsso
+        orf_ids = set( GeneralUtil.query_result_to_list( SQLManagerPRO.get_instance().get_session().query( ORFDSAsso.orf_id ).filter( ORFDSAsso.data_source.in_( self.data_sources ) ).distinct().all() ) )
+
+        ota_ids = sorted( ota_ids )
+        for min_bound in xrange( 0, len( ota_ids ), Constants.DELTA_MERGE_QUERY_BATCH_SIZE ):
+            ota_ids_chunk = ota_ids[ min_bound : min_bound + Constants.DELTA_MERGE_QUERY_BATCH_SIZE ]
+            orf_ids.update( GeneralUtil.query_result_to_list( SQLManagerPRO.get_instance().get_session().query( ORFTranscriptAsso.orf_id ).filter( ORFTranscriptAsso.id.in_( ota_ids_chunk ) ).all() ) )
+        SQLManagerPRO.get_instance().close_session()
+
+        orf_ids = sorted( orf_ids )
+
+        entries_to_recompute = { 'AnnotateORF': ota_ids,
+                                 'ComputeRelCoord': ota_ids,
+                                 'ComputeKozakContext': ota_ids,
+                                 'GenerateBEDContent': orf_ids }
+
+        Logger.get_instance().info( 'The information computed by the AnnotateORF, ComputeRelCoord and' +
+                                    ' ComputeKozakContext strategies need to be re-computed for ' +
+                                    str( len( ota_ids ) ) + ' ORFTranscriptAsso entries, and the' +
+                                    ' information computed by the GenerateBEDContent strategy for ' +
+                                    str( len( orf_ids ) ) + ' ORF entries. The IDs of these entries' +
+                                    ' will be saved in the ' + self.merged_data_folder + ' folder (' +
+                                    Constants.DELTA_MERGE_TO_RECOMPUTE_FILENAME + ' file).' )
+        try:
+            FileHandlerUtil.save_obj_to_file( objects_to_save = entries_to_recompute,
+                                              filename = Constants.DELTA_MERGE_TO_RECOMPUTE_FILENAME,
+                                              output_folder = self.merged_data_folder )
+        except Exception as e:
+            Logger.get_instance().error( 'An error occurred trying to save the IDs of the entries for' +
+                                         ' which the downstream steps need to be re-computed. \n' +
+                                         str( e ) +
+                                         ' Error code: ' + LogCodes.ERR_FILEHAND + '.',
+                                         ex = False )
+
+        GenerateBEDContentStrategy.register_changed_orfs( orf_ids = orf_ids,
+                                                          process = 'DeltaMerge' )
@@ -2,13 +2,14 @@
 
 import ConfigParser
 import os
-
-import pandas as pd
+from sqlalchemy import bindparam
 
 
 from fr.tagc.uorf.core.model import *
 
 from fr.tagc.uorf.core.execution.DatabaseCheckStrategy import DatabaseCheckStrategy
+from fr.tagc.uorf.core.execution.filter.FilterCopyEngine import FilterCopyEngine
+from fr.tagc.uorf.core.execution.filter.FilterPlanner import FilterPlanner
 
 from fr.tagc.uorf.core.util import Constants
 from fr.tagc.uorf.core.util import LogCodes
@@ -18,9 +19,10 @@ from fr.tagc.uorf.core.util.sql.SQLManagerFILT import SQLManagerFILT
 from fr.tagc.uorf.core.util.option.OptionManager import OptionManager
 from fr.tagc.uorf.core.util.option import OptionConstants
 from fr.tagc.uorf.core.util.general.GeneralUtil import GeneralUtil
-from fr.tagc.uorf.core.util.graphics.ProgressionBar import ProgressionBar
+from fr.tagc.uorf.core.util.genetics.GeneticsUtil import GeneticsUtil
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
         
 
 ## FilterStrategy
@@ -29,6 +31,8 @@ from fr.tagc.uorf.core.util.log.Logger import Logger
 # This class is a strategy that aims to create a FILT database by copying all the 
 # information of the PRO database related to a provided set of genes or related to
 # a particular cell context.
+# Several criteria (gene list, cell contexts, ORF categories and ORF annotations) may
+# be combined, in which case only the entries respecting all of them are copied.
 #
 class FilterStrategy( object ):
 
@@ -39,6 +43,7 @@ class FilterStrategy( object ):
     #     - configfile: String - The path to the config file.
     #     - gene_list: String - The path to the gene list file.
     #     - cell_context: List - The list of cellular contexts on which perform the filtering.
+    #     - regions: String - The path to the BED file containing the genomic regions.
     #
     # @throw DenCellORFException: When the config file is not provided or cannot be found at the
     #                             path provided.
@@ -68,11 +73,10 @@ class FilterStrategy( object ):
     #
     # @throw DenCellORFException: When expected filter section may not be found in the config file.
     # @throw DenCellORFException: When there is no strategy of filtering provided.
-    # @throw DenCellORFException: When there are several strategies of filtering provided.
     # @throw DenCellORFException: When the type of filtering provided is not allowed 
     #                             (i.e. neither 'intersection' nor 'union').
-    # @throw DenCellORFException: When a list of genes has been provided to perform the filtering 
-    #                             and the type has been set to 'intersection'..
+    # @throw DenCellORFException: When a list of genes has been provided as the only strategy to
+    #                             perform the filtering and the type has been set to 'intersection'..
     #
     def parse_config( self ):
         
@@ -146,6 +150,15 @@ class FilterStrategy( object ):
                 
             else:
                 self.orf_annotations = None
+                
+                
+            # Get the path to the BED file containing the genomic regions
+            if config.has_option( Constants.CONFIG_SECTION_FILTER, Constants.CONFIG_SECTION_FILTER_ITEM_REGION ):
+                self.selected_strat_count += 1
+                self.regions = config.get( Constants.CONFIG_SECTION_FILTER, 
+                                           Constants.CONFIG_SECTION_FILTER_ITEM_REGION )
+            else:
+                self.regions = None
             
             
             # If there is no gene list and no cell context provided, raise an exception
@@ -156,31 +169,24 @@ class FilterStrategy( object ):
                                            ' or a comma-separated list of cellular context (item ' + 
                                            Constants.CONFIG_SECTION_FILTER_ITEM_CELL_CONTEXT + '),' + 
                                            ' or a comma-separated list of ORF categories (item ' +
-                                           Constants.CONFIG_SECTION_FILTER_ITEM_ORF_CAT + 
+                                           Constants.CONFIG_SECTION_FILTER_ITEM_ORF_CAT + '),' +
+                                           ' or a comma-separated list of ORF annotations (item ' +
+                                           Constants.CONFIG_SECTION_FILTER_ITEM_ORF_ANNOT + '),' +
+                                           ' or the path to a BED file containing genomic regions (item ' +
+                                           Constants.CONFIG_SECTION_FILTER_ITEM_REGION + 
                                            ') has to be provided.'  )
             
-            # If several strategies of filtering have been selected, raise an exception
-            if ( self.selected_strat_count > 1 ):
-                # NB: This strategy has been built with the idea that only one strategy of filtering will 
-                #     be applied at a time. If necessary it may be easily updated to use both strategies 
-                #     of filtering. To do so, the easiest way would be to use an intermediate database 
-                #     containing the filtered data from the first list query, and to make the second list 
-                #     of queries on this intermediate database to build the final one. This would probably
-                #     improve the time of computation compared with making the two list of queries at the
-                #     same time.
-                raise DenCellORFException( 'FilterStrategy: Several strategies of filtering cannot be' +
-                                           ' provided at the same time. Please provide only one of the' +
-                                           ' following items in the config file: ' + 
-                                           Constants.CONFIG_SECTION_FILTER_ITEM_GENE_LIST + 
-                                           ', ' + Constants.CONFIG_SECTION_FILTER_ITEM_CELL_CONTEXT + 
-                                           ', ' + Constants.CONFIG_SECTION_FILTER_ITEM_ORF_CAT +
-                                           ', ' + Constants.CONFIG_SECTION_FILTER_ITEM_ORF_ANNOT +
-                                           '. Please see the documentation for more information.' )
+            # NB: When several strategies of filtering are provided, they are combined
+            #     (i.e. only the entries respecting all the criteria are kept) by the
+            #     FilterPlanner (see the documentation of this class for more information).
                 
-            # If a list of gene has been provided, the filtering type should 
-            # necessarily be set to 'union'. If this is not the case, then 
-            # raise an exception.
+            # If a list of gene has been provided as the only strategy of filtering, 
+            # the filtering type should necessarily be set to 'union'. If this is 
+            # not the case, then raise an exception.
+            # NB: When the gene list is combined with other strategies of filtering,
+            #     the filtering type only applies to the other lists.
             if ( self.gene_list 
+                 and ( self.selected_strat_count == 1 )
                  and ( self.filt_type == Constants.FILTER_INTERSECTION ) ):
                 raise DenCellORFException( 'A list of genes has been provided for the filtering whilst' +
                                            ' the type of filtering has been set to ' +  
@@ -217,28 +223,53 @@ class FilterStrategy( object ):
                                        ' compute missing information.' +
                                        '\n Error code: ' + LogCodes.ERR_DBCHECK + '.', e )
         
-        Logger.get_instance().info( 'Starting to perform the queries to copy the appropriate' +
-                                    ' information in the FILT database...' )
-        
-        # Copy the content of the PROMetadata table in the FILT table
-        query_metadata = SQLManagerPRO.get_instance().get_session().query( PROMetadata )
-        self.PRO_to_FILT( query_metadata )
+        Logger.get_instance().info( 'Starting to copy the appropriate information in the FILT' +
+                                    ' database...' )
         
-        # Filter using the gene list
-        if self.gene_list:
-            self.gene_list_filter()
+        # Compute the missing genomic bins of the ORFs, as the 
+        # ORFs without bin cannot be selected by the region filter
+        if self.regions:
+            self.fill_missing_orf_bins()
         
-        # Filter using the list of cell contexts
-        elif self.cell_context:
-            self.cell_context_filter()
+        # NB: The content of the PRO database is copied into the FILT database on the database 
+        #     server, without instantiating any object (see the documentation of the 
+        #     FilterCopyEngine class for more information).
+        copy_engine = FilterCopyEngine()
+        copy_engine.open()
         
-        # Filter using the list of ORF categories
-        elif self.orf_categories:
-            self.orf_categories_filter()
+        try:
+            # Copy the content of the PROMetadata table in the FILT table
+            copy_engine.copy_table( PROMetadata )
+            
+            # Compile all the criteria provided into one single plan
+            # NB: The gene list is always used as an union of genes
+            filter_planner = FilterPlanner( copy_engine )
             
-        # Filter using the list of ORF annotations
-        elif self.orf_annotations:
-            self.orf_annotations_filter()
+            if self.gene_list:
+                filter_planner.add_criterion( FilterPlanner.CRITERION_GENE, 
+                                              self.get_gene_list() )
+            
+            if self.cell_context:
+                filter_planner.add_criterion( FilterPlanner.CRITERION_CELL_CONTEXT, 
+                                              self.cell_context, self.filt_type )
+            
+            if self.orf_categories:
+                filter_planner.add_criterion( FilterPlanner.CRITERION_ORF_CATEGORY, 
+                                              self.orf_categories, self.filt_type )
+                
+            if self.orf_annotations:
+                filter_planner.add_criterion( FilterPlanner.CRITERION_ORF_ANNOTATION, 
+                                              self.orf_annotations, self.filt_type )
+            
+            # NB: The genomic regions are always used as an union of regions
+            if self.regions:
+                filter_planner.add_criterion( FilterPlanner.CRITERION_REGION, 
+                                              self.get_region_list() )
+            
+            filter_planner.execute()
+        
+        finally:
+            copy_engine.close()
         
             
         # Fill in the UTRNABiotypeCatalog with unique biotypes from the Transcript entries
@@ -260,21 +291,27 @@ class FilterStrategy( object ):
         SQLManagerFILT.get_instance().close_session()
          
     
+        
+    
     
     # ===============================================================================
     # Methods related to gene list filtering
     # ===============================================================================
     
-    ## gene_list_filter
-    #  ----------------
+    ## get_gene_list
+    #  -------------
+    #
+    # This methods allows to get the gene list from the file.
     #
-    # This methods allows to get the gene list from the file and to filter the PRO database
-    # information to insert it into the FILT database.
+    # @return gene_list: List - The list of gene symbols, aliases or IDs 
+    #                           to use to filter the database.
     #
     # @throw DenCellORFException: When the format of the gene list provided is unexpected 
     #                            (has to be provided as 1-line or 1-column csv file).
     # 
-    def gene_list_filter( self ):
+    def get_gene_list( self ):
+        
+        import pandas as pd
         
         # Import the gene list
         file_content = pd.read_csv( self.gene_list, 
@@ -296,778 +333,128 @@ class FilterStrategy( object ):
             # Convert the column as a list    
             gene_list = file_content.iloc[:,0].tolist()
         
-        elif ( ncols > 1 ):
-            # Convert the column as a list    
+        else:
+            # Convert the line as a list    
             gene_list = file_content.iloc[0,:].tolist()
         
-        # Get the list of queries to use to insert data
-        queries_list = self.get_gene_list_queries( gene_list )
-        
-        # Proceed to the insertion
-        self.process_queries( queries_list )
-    
-    
-    
-    ## get_gene_list_queries
-    #  ---------------------
-    #
-    # This methods allows to generate the list of appropriate queries to 
-    # be used to get the content of the PRO database information using the 
-    # selected ORF annotations and necessary to perform the insertion in 
-    # the FILT database.
-    #
-    # @param gene_list: List - The list of gene symbols, aliases or IDs 
-    #                          to use to filter the database.
-    # 
-    # @return lists_to_insert: List - The list of queries to be used in order to filter
-    #                                 the content of the PRO database to insert in the 
-    #                                 FILT database.
-    # 
-    def get_gene_list_queries( self, gene_list ):
-        
-        # NB: In order to facilitate the query on the PRO database, 
-        #     the filters are created by concatenation
-        filter_common = ''
-        
-        ## Gene and GeneAlias
-        #  ------------------
-        # Get the IDs of all the PROGene entries associated 
-        # at least with one of the aliases.
-        all_gene_ids = SQLManagerPRO.get_instance().get_session().query( 
-                                                                            PROGeneAlias.gene_id  
-                                                                        ).filter( 
-                                                                                    PROGeneAlias.alias.in_( gene_list )
-                                                                                ).distinct().all()
-        
-        # Get all the PROGene entries related to these ORFTranscriptAsso IDs
-        filter_common = '.filter( PROGene.gene_id.in_(' + str( all_gene_ids ) + ') )' + filter_common
-        all_gene = self.query_PRO( 'PROGene', filter_common )
-        
-        # Get all the PROGeneAlias entries related to the PROGene entries selected
-        filter_genealias = '.filter( PROGeneAlias.gene_id == PROGene.gene_id )' + filter_common
-        all_genealias = self.query_PRO( 'PROGeneAlias', filter_genealias )
-        
-        
-        ## Processed
-        #  ---------
-        
-        # Get the Transcript entries
-        filter_common = '.filter( Transcript.gene_id == PROGene.gene_id )' + filter_common
-        all_transcript = self.query_PRO( 'Transcript', filter_common )
-        
-        # Get the TranscriptDSAsso entries
-        filter_transcriptdsasso = '.filter( TranscriptDSAsso.transcript_id == Transcript.id )' + filter_common
-        all_transcriptds_asso = self.query_PRO( 'TranscriptDSAsso', filter_transcriptdsasso )
-        
-        
-        # Get the ORFTranscriptAsso entries
-        filter_ota = '.filter( ORFTranscriptAsso.transcript_id == Transcript.id )' + filter_common
-        all_orftranscriptasso = self.query_PRO( 'ORFTranscriptAsso', filter_ota )
-        
-        # Get the ORFTranscriptAssoDSAsso entries
-        filter_otadsasso = '.filter( ORFTranscriptAssoDSAsso.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_ota
-        all_otadsasso = self.query_PRO( 'ORFTranscriptAssoDSAsso', filter_otadsasso )
-        
-        
-        # Get the ORF entries
-        filter_orf = '.filter( ORF.id == ORFTranscriptAsso.orf_id )' + filter_ota
-        all_orf = self.query_PRO( 'ORF', filter_orf )
-        
-        # Get the ORFDSAsso entries
-        filter_orfdsasso = '.filter( ORFDSAsso.orf_id == ORF.id )' + filter_orf
-        all_orfdsasso = self.query_PRO( 'ORFDSAsso', filter_orfdsasso )
-        
-            
-        ## Category, Cell context and FLOSS
-        #  --------------------------------
-        
-        # Get the ORFCategory entries
-        filter_orfcat = '.filter( ORFCategory.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_ota
-        all_orfcategory = self.query_PRO( 'ORFCategory', filter_orfcat )
-        
-        # Get the ORFCategoryCatalog entries
-        filter_orfcatcatalog = '.filter( ORFCategoryCatalog.category == ORFCategory.orf_category )' + filter_orfcat
-        all_orfcatcatalog = self.query_PRO( 'ORFCategoryCatalog', filter_orfcatcatalog )
-        
-        
-        # Get the CellContext entries
-        filter_cellcontext = '.filter( CellContext.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_ota
-        all_cellcontext = self.query_PRO( 'CellContext', filter_cellcontext )
-        
-        # Get the CellContextCatalog entries
-        filter_cellcontextcatalog = '.filter( CellContextCatalog.context == CellContext.cell_context )' + filter_cellcontext
-        all_cellcontextcatalog = self.query_PRO( 'CellContextCatalog', filter_cellcontextcatalog )
-
-        
-        # Get the ProvidedCategory entries
-        filter_providedcat = '.filter( ProvidedCategory.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_ota
-        all_providedcat = self.query_PRO( 'ProvidedCategory', filter_providedcat )
-        
-        # Get the ProvidedCategoryCatalog entries
-        filter_providedcatcatalog = '.filter( ProvidedCategoryCatalog.category == ProvidedCategory.provided_category )' + filter_providedcat
-        all_providedcatcatalog = self.query_PRO( 'ProvidedCategoryCatalog', filter_providedcatcatalog )
-
-        
-        # Get the FLOSSClass entries
-        filter_floss = '.filter( FLOSSClass.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_ota
-        all_floss = self.query_PRO( 'FLOSSClass', filter_floss )
-        
-        # Get the FLOSSClassCatalog entries
-        filter_flosscatalog = '.filter( FLOSSClassCatalog.floss_class == FLOSSClass.floss_class )' + filter_floss
-        all_flosscatalog = self.query_PRO( 'FLOSSClassCatalog', filter_flosscatalog )
-        
-        
-        # Get the ORFAnnotation entries
-        filter_orfannotation = '.filter( ORFAnnotation.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_ota
-        all_orfannotation = self.query_PRO( 'ORFAnnotation', filter_orfannotation )
-        
-        # Get the ORFAnnotationCatalog entries
-        filter_orfannotationcatalog = '.filter( ORFAnnotationCatalog.annotation == ORFAnnotation.orf_annotation )' + filter_orfannotation
-        all_orfannotationcatalog = self.query_PRO( 'ORFAnnotationCatalog', filter_orfannotationcatalog )
-
-        
-        # Return the list of queries containing all the data related to the gene symbol / ID / name
-        # previously collected from the PRO database 
-        lists_to_insert = [ all_gene, all_genealias,
-                            all_orf, all_orfdsasso, 
-                            all_transcript, all_transcriptds_asso,
-                            all_orftranscriptasso, all_otadsasso,
-                            all_cellcontextcatalog, all_cellcontext, 
-                            all_providedcatcatalog, all_providedcat,
-                            all_flosscatalog, all_floss,
-                            all_orfcatcatalog, all_orfcategory,
-                            all_orfannotationcatalog, all_orfannotation ]
-        
-        return lists_to_insert
+        return gene_list
          
     
     
     # ===============================================================================
-    # Methods related to cell context filtering
-    # =============================================================================== 
-    
-    ## cell_context_filter
-    #  -------------------
-    #
-    # This methods allows to filter the PRO database information using the provided 
-    # list of cell contexts and to insert it into the FILT database.
-    # 
-    def cell_context_filter( self ):
-        
-        # Get the list of queries to use to insert data
-        queries_list = self.get_cell_ctxt_queries()
-        
-        # Proceed to the insertion
-        self.process_queries( queries_list )
-    
-    
-    
-    ## get_cell_ctxt_queries
-    #  ---------------------
-    #
-    # This methods allows to generate the list of appropriate queries to 
-    # be used to get the content of the PRO database information using the 
-    # selected cell contexts and necessary to perform the insertion in 
-    # the FILT database.
-    # 
-    # @return lists_to_insert: List - The list of queries to be used in order to filter
-    #                                 the content of the PRO database to insert in the 
-    #                                 FILT database.
-    #
-    def get_cell_ctxt_queries( self ):
-        
-        # NB: In order to facilitate the query on the PRO database, 
-        # the filters are created by concatenation
-        filter_common = ''
-        
-        ## CellContextCatalog and CellContext
-        #  ----------------------------------                                                                     
-        # If there is one single entry in the list of cell contexts or if the filtering
-        # type has been set on 'union', then get the IDs of all the ORFTranscriptAsso 
-        # entries associated at least with one of the cell contexts.
-        if ( self.filt_type == Constants.FILTER_UNION ):
-            all_ota_ids = SQLManagerPRO.get_instance().get_session().query( 
-                                                                                CellContext.orftranscriptasso_id 
-                                                                            ).filter( 
-                                                                                        CellContext.cell_context.in_( self.cell_context )
-                                                                                    ).distinct().all()
-        
-        # Otherwise, get the IDs of the ORFTranscriptAsso entries that have been 
-        # associated with ALL the cell contexts of the list.
-        else:
-            # For each of the context selected, get the list of OTA IDs 
-            # related to it, and compute the intersection with the lists
-            # get using the contexts already processed.
-            all_ota_ids_intersect = set()
-            for ctxt in self.cell_context:
-                all_ota_ids = SQLManagerPRO.get_instance().get_session().query( 
-                                                                                    CellContext.orftranscriptasso_id 
-                                                                                ).filter( 
-                                                                                            CellContext.cell_context == ctxt 
-                                                                                        ).distinct().all()
-                all_ota_ids = set( GeneralUtil.query_result_to_list( all_ota_ids ) )
-                # Get the intersection
-                if ( all_ota_ids_intersect ):
-                    all_ota_ids_intersect = all_ota_ids.intersection( all_ota_ids_intersect )
-                else:
-                    all_ota_ids_intersect = all_ota_ids
-            
-            # Convert the set of OTA IDs associated with all of the categories
-            # into a list
-            all_ota_ids = list( all_ota_ids_intersect )
-        
-        # Get all the CellContext entries related to these ORFTranscriptAsso IDs
-        filter_common = '.filter( CellContext.orftranscriptasso_id.in_(' + str( all_ota_ids ) + ') )' + filter_common
-        all_cellcontext = self.query_PRO( 'CellContext', filter_common )
-        
-        # Get all the CellContextCatalog entries that have at least one ORF
-        # registered in the selected cell contexts
-        filter_cellcontextcatalog = '.filter( CellContextCatalog.context == CellContext.cell_context )' + filter_common
-        all_cellcontextcatalog = self.query_PRO( 'CellContextCatalog', filter_cellcontextcatalog )
-        
-        
-        ## Processed
-        #  ---------
-        
-        # Get the ORFTranscriptAsso entries
-        filter_common = '.filter( ORFTranscriptAsso.id == CellContext.orftranscriptasso_id )' + filter_common
-        all_orftranscriptasso = self.query_PRO( 'ORFTranscriptAsso', filter_common )
-        
-        # Get the ORFTranscriptAssoDSAsso entries
-        filter_otadsasso = '.filter( ORFTranscriptAssoDSAsso.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_common
-        all_otadsasso = self.query_PRO( 'ORFTranscriptAssoDSAsso', filter_otadsasso )
-        
-        
-        # Get the ORF entries
-        filter_orf = '.filter( ORF.id == ORFTranscriptAsso.orf_id )' + filter_common
-        all_orf = self.query_PRO( 'ORF', filter_orf )
-        
-        # Get the ORFDSAsso entries
-        filter_orfdsasso = '.filter( ORFDSAsso.orf_id == ORF.id )' + filter_orf
-        all_orfdsasso = self.query_PRO( 'ORFDSAsso', filter_orfdsasso )
-        
-        
-        # Get the Transcript entries
-        filter_transcript = '.filter( Transcript.id == ORFTranscriptAsso.transcript_id )' + filter_common
-        all_transcript = self.query_PRO( 'Transcript', filter_transcript )
-        
-        # Get the TranscriptDSAsso entries
-        filter_transcriptdsasso = '.filter( TranscriptDSAsso.transcript_id == Transcript.id )' + filter_transcript
-        all_transcriptds_asso = self.query_PRO( 'TranscriptDSAsso', filter_transcriptdsasso )
-        
-        
-        ## Gene and GeneAlias
-        #  ------------------
-        
-        # Get the PROGene entries
-        filter_gene = '.filter( PROGene.gene_id == Transcript.gene_id )' + filter_transcript
-        all_gene = self.query_PRO( 'PROGene', filter_gene )
-        
-        # Get the PROGeneAlias entries
-        filter_genealias = '.filter( PROGeneAlias.gene_id == PROGene.gene_id )' + filter_gene
-        all_genealias = self.query_PRO( 'PROGeneAlias', filter_genealias )
-        
-        
-        ## Category, Cell context and FLOSS
-        #  --------------------------------
-                
-        # Get the ProvidedCategory entries
-        filter_providedcat = '.filter( ProvidedCategory.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_common
-        all_providedcat = self.query_PRO( 'ProvidedCategory', filter_providedcat )
-        
-        # Get the ProvidedCategoryCatalog entries
-        filter_providedcatcatalog = '.filter( ProvidedCategoryCatalog.category == ProvidedCategory.provided_category )' + filter_providedcat
-        all_providedcatcatalog = self.query_PRO( 'ProvidedCategoryCatalog', filter_providedcatcatalog )
-
-        
-        # Get the ORFCategory entries
-        filter_orfcat = '.filter( ORFCategory.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_common
-        all_orfcategory = self.query_PRO( 'ORFCategory', filter_orfcat )
-        
-        # Get the ORFCategoryCatalog entries
-        filter_orfcategorycatalog = '.filter( ORFCategoryCatalog.category == ORFCategory.orf_category )' + filter_orfcat
-        all_orfcategorycatalog = self.query_PRO( 'ORFCategoryCatalog', filter_orfcategorycatalog )
-
-        
-        # Get the ORFAnnotation entries
-        filter_orfannotation = '.filter( ORFAnnotation.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_common
-        all_orfannotation = self.query_PRO( 'ORFAnnotation', filter_orfannotation )
-        
-        # Get the ORFAnnotationCatalog entries
-        filter_orfannotationcatalog = '.filter( ORFAnnotationCatalog.annotation == ORFAnnotation.orf_annotation )' + filter_orfannotation
-        all_orfannotationcatalog = self.query_PRO( 'ORFAnnotationCatalog', filter_orfannotationcatalog )
-        
-        
-        # Get the FLOSSClass entries
-        filter_floss = '.filter( FLOSSClass.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_common
-        all_floss = self.query_PRO( 'FLOSSClass', filter_floss )
-        
-        # Get the FLOSSClassCatalog entries
-        filter_flosscatalog = '.filter( FLOSSClassCatalog.floss_class == FLOSSClass.floss_class )' + filter_floss
-        all_flosscatalog = self.query_PRO( 'FLOSSClassCatalog', filter_flosscatalog )
-        
-        
-        # Return the list of queries containing all the data related to the cell context 
-        # previously collected from the PRO database 
-        lists_to_insert = [ all_gene, all_genealias,
-                            all_orf, all_orfdsasso, 
-                            all_transcript, all_transcriptds_asso,
-                            all_orftranscriptasso, all_otadsasso,
-                            all_cellcontextcatalog, all_cellcontext,
-                            all_providedcatcatalog, all_providedcat,
-                            all_orfcategorycatalog, all_orfcategory,
-                            all_orfannotationcatalog, all_orfannotation,
-                            all_flosscatalog, all_floss ]
-        
-        return lists_to_insert
-         
-    
-    
+    # Methods related to genomic region filtering
     # ===============================================================================
-    # Methods related to ORF category filtering
-    # =============================================================================== 
     
-    ## orf_categories_filter
-    #  ---------------------
-    #
-    # This methods allows to filter the PRO database information using the provided 
-    # list of ORF category and to insert it into the FILT database.
-    # 
-    def orf_categories_filter( self ):
-        
-        # Get the list of queries to use to insert data
-        queries_list = self.get_orf_cat_queries()
-        
-        # Proceed to the insertion
-        self.process_queries( queries_list )
-    
-    
-    
-    ## get_orf_cat_queries
-    #  -------------------
+    ## get_region_list
+    #  ---------------
     #
-    # This methods allows to generate the list of appropriate queries to 
-    # be used to get the content of the PRO database information using the 
-    # selected ORF categories and necessary to perform the insertion in 
-    # the FILT database.
-    # 
-    # @return lists_to_insert: List - The list of queries to be used in order to filter
-    #                                 the content of the PRO database to insert in the 
-    #                                 FILT database.
+    # This methods allows to get the list of genomic regions from the BED file.
+    # The 'chr' prefix of the chromosome names is removed, and the names of the
+    # mitochondrial chromosome are converted into Constants.MITOCHONDRIAL_CHR,
+    # such as the names are consistent with the ones registered in the database.
     #
-    def get_orf_cat_queries( self ):
-        
-        # NB: In order to facilitate the query on the PRO database, 
-        # the filters are created by concatenation
-        filter_common = ''
-        
-        ## ORFCategoryCatalog and ORFCategory
-        #  ----------------------------------                                                                               
-        # If there is one single entry in the list of categories or if the filtering
-        # type has been set on 'union', then get the IDs of all the ORFTranscriptAsso 
-        # entries associated at least with one of the categories.
-        if ( self.filt_type == Constants.FILTER_UNION ):
-            all_ota_ids = SQLManagerPRO.get_instance().get_session().query( 
-                                                                                ORFCategory.orftranscriptasso_id 
-                                                                            ).filter( 
-                                                                                        ORFCategory.orf_category.in_( self.orf_categories )
-                                                                                    ).distinct().all()
-        
-        # Otherwise, get the IDs of the ORFTranscriptAsso entries that have been 
-        # associated with ALL the categories of the list.
-        else:
-            # For each of the category selected, get the list of OTA IDs 
-            # related to it, and compute the intersection with the lists
-            # get using the categories already processed.
-            all_ota_ids_intersect = set()
-            for orf_cat in self.orf_categories:
-                all_ota_ids = SQLManagerPRO.get_instance().get_session().query( 
-                                                                                    ORFCategory.orftranscriptasso_id 
-                                                                                ).filter( 
-                                                                                            ORFCategory.orf_category == orf_cat 
-                                                                                        ).distinct().all()
-                all_ota_ids = set( GeneralUtil.query_result_to_list( all_ota_ids ) )
-                # Get the intersection
-                if ( all_ota_ids_intersect ):
-                    all_ota_ids_intersect = all_ota_ids.intersection( all_ota_ids_intersect )
-                else:
-                    all_ota_ids_intersect = all_ota_ids
-            
-            # Convert the set of OTA IDs associated with all of the categories
-            # into a list
-            all_ota_ids = list( all_ota_ids_intersect )
-        
-        # Get all the ORFCategory entries related to these ORFTranscriptAsso IDs
-        filter_common = '.filter( ORFCategory.orftranscriptasso_id.in_(' + str( all_ota_ids ) + ') )' + filter_common
-        all_orfcategory = self.query_PRO( 'ORFCategory', filter_common )
-        
-        # Get all the ORFCategoryCatalog entries that have at least one ORF
-        # registered in the selected category
-        filter_orfcategorycatalog = '.filter( ORFCategoryCatalog.category == ORFCategory.orf_category )' + filter_common
-        all_orfcategorycatalog = self.query_PRO( 'ORFCategoryCatalog', filter_orfcategorycatalog )
-                      
-        
-        ## Processed
-        #  ---------
-        
-        # Get the ORFTranscriptAsso entries
-        filter_common = '.filter( ORFTranscriptAsso.id == ORFCategory.orftranscriptasso_id )' + filter_common
-        all_orftranscriptasso = self.query_PRO( 'ORFTranscriptAsso', filter_common )
-        
-        # Get the ORFTranscriptAssoDSAsso entries
-        filter_otadsasso = '.filter( ORFTranscriptAssoDSAsso.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_common
-        all_otadsasso = self.query_PRO( 'ORFTranscriptAssoDSAsso', filter_otadsasso )
-        
-        
-        # Get the ORF entries
-        filter_orf = '.filter( ORF.id == ORFTranscriptAsso.orf_id )' + filter_common
-        all_orf = self.query_PRO( 'ORF', filter_orf )
-        
-        # Get the ORFDSAsso entries
-        filter_orfdsasso = '.filter( ORFDSAsso.orf_id == ORF.id )' + filter_orf
-        all_orfdsasso = self.query_PRO( 'ORFDSAsso', filter_orfdsasso )
-        
-        
-        # Get the Transcript entries
-        filter_transcript = '.filter( Transcript.id == ORFTranscriptAsso.transcript_id )' + filter_common
-        all_transcript = self.query_PRO( 'Transcript', filter_transcript )
-        
-        # Get the TranscriptDSAsso entries
-        filter_transcriptdsasso = '.filter( TranscriptDSAsso.transcript_id == Transcript.id )' + filter_transcript
-        all_transcriptds_asso = self.query_PRO( 'TranscriptDSAsso', filter_transcriptdsasso )
-        
-        
-        ## Gene and GeneAlias
-        #  ------------------
-        
-        # Get the PROGene entries
-        filter_gene = '.filter( PROGene.gene_id == Transcript.gene_id )' + filter_transcript
-        all_gene = self.query_PRO( 'PROGene', filter_gene )
-        
-        # Get the PROGeneAlias entries
-        filter_genealias = '.filter( PROGeneAlias.gene_id == PROGene.gene_id )' + filter_gene
-        all_genealias = self.query_PRO( 'PROGeneAlias', filter_genealias )
-        
-        
-        ## Category, Cell context and FLOSS
-        #  --------------------------------
-                                
-        # Get the CellContext entries
-        filter_cellcontext = '.filter( CellContext.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_common
-        all_cellcontext = self.query_PRO( 'CellContext', filter_cellcontext )
-        
-        # Get the CellContextCatalog entries
-        filter_cellcontextcatalog = '.filter( CellContextCatalog.context == CellContext.cell_context )' + filter_cellcontext
-        all_cellcontextcatalog = self.query_PRO( 'CellContextCatalog', filter_cellcontextcatalog )
-        
-                
-        # Get the ProvidedCategory entries
-        filter_providedcat = '.filter( ProvidedCategory.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_common
-        all_providedcat = self.query_PRO( 'ProvidedCategory', filter_providedcat )
-        
-        # Get the ProvidedCategoryCatalog entries
-        filter_providedcatcatalog = '.filter( ProvidedCategoryCatalog.category == ProvidedCategory.provided_category )' + filter_providedcat
-        all_providedcatcatalog = self.query_PRO( 'ProvidedCategoryCatalog', filter_providedcatcatalog )
-
-        
-        # Get the ORFAnnotation entries
-        filter_orfannotation = '.filter( ORFAnnotation.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_common
-        all_orfannotation = self.query_PRO( 'ORFAnnotation', filter_orfannotation )
-        
-        # Get the ORFAnnotationCatalog entries
-        filter_orfannotationcatalog = '.filter( ORFAnnotationCatalog.annotation == ORFAnnotation.orf_annotation )' + filter_orfannotation
-        all_orfannotationcatalog = self.query_PRO( 'ORFAnnotationCatalog', filter_orfannotationcatalog )
-        
-        
-        # Get the FLOSSClass entries
-        filter_floss = '.filter( FLOSSClass.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_common
-        all_floss = self.query_PRO( 'FLOSSClass', filter_floss )
-        
-        # Get the FLOSSClassCatalog entries
-        filter_flosscatalog = '.filter( FLOSSClassCatalog.floss_class == FLOSSClass.floss_class )' + filter_floss
-        all_flosscatalog = self.query_PRO( 'FLOSSClassCatalog', filter_flosscatalog )
-        
-        
-        # Return the list of queries containing all the data related to the ORF category
-        # previously collected from the PRO database 
-        lists_to_insert = [ all_gene, all_genealias,
-                            all_orf, all_orfdsasso,
-                            all_transcript, all_transcriptds_asso, 
-                            all_orftranscriptasso, all_otadsasso,
-                            all_orfcategorycatalog, all_orfcategory,
-                            all_cellcontextcatalog, all_cellcontext,
-                            all_providedcatcatalog, all_providedcat, 
-                            all_orfannotationcatalog, all_orfannotation,
-                            all_flosscatalog, all_floss ]
-                
-        return lists_to_insert
-         
-    
-    
-    # ===============================================================================
-    # Methods related to ORF annotation filtering
-    # ===============================================================================
-        
-    ## orf_annotations_filter
-    #  ----------------------
-    #
-    # This methods allows to filter the PRO database information using the provided 
-    # list of ORF annotations and to insert it into the FILT database.
-    # 
-    def orf_annotations_filter( self ):
-        
-        # Get the list of queries to use to insert data
-        queries_list = self.get_orf_annot_queries()
-        
-        # Proceed to the insertion
-        self.process_queries( queries_list )
-    
-    
-    
-    ## get_orf_annot_queries
-    #  ---------------------
+    # @return region_list: List - The list of regions, as ( chromosome, start, end ) 
+    #                             tuples (1-based coordinates, end included).
     #
-    # This methods allows to generate the list of appropriate queries to 
-    # be used to get the content of the PRO database information using the 
-    # selected ORF annotations and necessary to perform the insertion in 
-    # the FILT database.
+    # @throw DenCellORFException: When the BED file cannot be found.
+    # @throw DenCellORFException: When a line of the BED file is not properly formatted.
     # 
-    # @return lists_to_insert: List - The list of queries to be used in order to filter
-    #                                 the content of the PRO database to insert in the 
-    #                                 FILT database.
-    #
-    def get_orf_annot_queries( self ):
+    def get_region_list( self ):
         
-        # NB: In order to facilitate the query on the PRO database, 
-        # the filters are created by concatenation
-        filter_common = ''
+        if ( not os.path.exists( self.regions ) ):
+            raise DenCellORFException( 'No BED file may be found at the path provided (' + 
+                                       self.regions + ').' )
         
+        region_list = []
         
-        ## ORFAnnotationCatalog and ORFAnnotation
-        #  --------------------------------------                                                                        
-        # If there is one single entry in the list of annotations or if the filtering
-        # type has been set on 'union', then get the IDs of all the ORFTranscriptAsso 
-        # entries associated at least with one of the annotation.
-        if ( self.filt_type == Constants.FILTER_UNION ):
-            all_ota_ids = SQLManagerPRO.get_instance().get_session().query( 
-                                                                                ORFAnnotation.orftranscriptasso_id 
-                                                                            ).filter( 
-                                                                                        ORFAnnotation.orf_annotation.in_( self.orf_annotations )
-                                                                                    ).distinct().all()
-        
-        # Otherwise, get the IDs of the ORFTranscriptAsso entries that have been 
-        # associated with ALL the annotations of the list.
-        else:
-            # For each of the annotation selected, get the list of OTA IDs 
-            # related to it, and compute the intersection with the lists
-            # get using the annotations already processed.
-            all_ota_ids_intersect = set()
-            for orf_annot in self.orf_annotations:
-                all_ota_ids = SQLManagerPRO.get_instance().get_session().query( 
-                                                                                    ORFAnnotation.orftranscriptasso_id 
-                                                                                ).filter( 
-                                                                                            ORFAnnotation.orf_annotation == orf_annot 
-                                                                                        ).distinct().all()
-                all_ota_ids = set( GeneralUtil.query_result_to_list( all_ota_ids ) )
-                # Get the intersection
-                if ( all_ota_ids_intersect ):
-                    all_ota_ids_intersect = all_ota_ids.intersection( all_ota_ids_intersect )
-                else:
-                    all_ota_ids_intersect = all_ota_ids
-            
-            # Convert the set of OTA IDs associated with all 
-            # of the annotations into a list
-            all_ota_ids = list( all_ota_ids_intersect )
-        
-        # Get all the ORFAnnotation entries related to these ORFTranscriptAsso IDs
-        filter_common = '.filter( ORFAnnotation.orftranscriptasso_id.in_(' + str( all_ota_ids ) + ') )' + filter_common
-        all_orfannotation = self.query_PRO( 'ORFAnnotation', filter_common )
-        
-        # Get all the ORFAnnotationCatalog entries that have at least one ORF
-        # registered in the selected annotation
-        filter_orfannotationcatalog = '.filter( ORFAnnotationCatalog.annotation == ORFAnnotation.orf_annotation )' + filter_common
-        all_orfannotationcatalog = self.query_PRO( 'ORFAnnotationCatalog', filter_orfannotationcatalog )
+        with open( self.regions, 'r' ) as bed_file:
+            for ( line_index, line ) in enumerate( bed_file ):
                 
-        
-        ## Processed
-        #  ---------
-        
-        # Get the ORFTranscriptAsso entries
-        filter_common = '.filter( ORFTranscriptAsso.id == ORFAnnotation.orftranscriptasso_id )' + filter_common
-        all_orftranscriptasso = self.query_PRO( 'ORFTranscriptAsso', filter_common )
-        
-        # Get the ORFTranscriptAssoDSAsso entries
-        filter_otadsasso = '.filter( ORFTranscriptAssoDSAsso.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_common
-        all_otadsasso = self.query_PRO( 'ORFTranscriptAssoDSAsso', filter_otadsasso )
-        
-        
-        # Get the ORF entries
-        filter_orf = '.filter( ORF.id == ORFTranscriptAsso.orf_id )' + filter_common
-        all_orf = self.query_PRO( 'ORF', filter_orf )
-        
-        # Get the ORFDSAsso entries
-        filter_orfdsasso = '.filter( ORFDSAsso.orf_id == ORF.id )' + filter_orf
-        all_orfdsasso = self.query_PRO( 'ORFDSAsso', filter_orfdsasso )
-        
-        
-        # Get the Transcript entries
-        filter_transcript = '.filter( Transcript.id == ORFTranscriptAsso.transcript_id )' + filter_common
-        all_transcript = self.query_PRO( 'Transcript', filter_transcript )
-        
-        # Get the TranscriptDSAsso entries
-        filter_transcriptdsasso = '.filter( TranscriptDSAsso.transcript_id == Transcript.id )' + filter_transcript
-        all_transcriptds_asso = self.query_PRO( 'TranscriptDSAsso', filter_transcriptdsasso )
-        
-        
-        ## Gene and GeneAlias
-        #  ------------------
-        
-        # Get the PROGene entries
-        filter_gene = '.filter( PROGene.gene_id == Transcript.gene_id )' + filter_transcript
-        all_gene = self.query_PRO( 'PROGene', filter_gene )
-        
-        # Get the PROGeneAlias entries
-        filter_genealias = '.filter( PROGeneAlias.gene_id == PROGene.gene_id )' + filter_gene
-        all_genealias = self.query_PRO( 'PROGeneAlias', filter_genealias )
-        
-        
-        ## Category, Cell context and FLOSS
-        #  --------------------------------
-                                
-        # Get the CellContext entries
-        filter_cellcontext = '.filter( CellContext.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_common
-        all_cellcontext = self.query_PRO( 'CellContext', filter_cellcontext )
-        
-        # Get the CellContextCatalog entries
-        filter_cellcontextcatalog = '.filter( CellContextCatalog.context == CellContext.cell_context )' + filter_cellcontext
-        all_cellcontextcatalog = self.query_PRO( 'CellContextCatalog', filter_cellcontextcatalog )
-        
+                line = line.strip()
                 
-        # Get the ProvidedCategory entries
-        filter_providedcat = '.filter( ProvidedCategory.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_common
-        all_providedcat = self.query_PRO( 'ProvidedCategory', filter_providedcat )
-        
-        # Get the ProvidedCategoryCatalog entries
-        filter_providedcatcatalog = '.filter( ProvidedCategoryCatalog.category == ProvidedCategory.provided_category )' + filter_providedcat
-        all_providedcatcatalog = self.query_PRO( 'ProvidedCategoryCatalog', filter_providedcatcatalog )
-        
+                # Skip the empty lines and the headers
+                if ( ( line == '' ) or line.startswith( Constants.FILTER_BED_HEADER_PREFIXES ) ):
+                    continue
                 
-        # Get the ORFCategory entries
-        filter_orfcategory = '.filter( ORFCategory.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_common
-        all_orfcategory = self.query_PRO( 'ORFCategory', filter_orfcategory )
-        
-        # Get the ORFCategoryCatalog entries
-        filter_orfcategorycatalog = '.filter( ORFCategoryCatalog.category == ORFCategory.orf_category )' + filter_orfcategory
-        all_orfcategorycatalog = self.query_PRO( 'ORFCategoryCatalog', filter_orfcategorycatalog )
-        
-        
-        # Get the FLOSSClass entries
-        filter_floss = '.filter( FLOSSClass.orftranscriptasso_id == ORFTranscriptAsso.id )' + filter_common
-        all_floss = self.query_PRO( 'FLOSSClass', filter_floss )
-        
-        # Get the FLOSSClassCatalog entries
-        filter_flosscatalog = '.filter( FLOSSClassCatalog.floss_class == FLOSSClass.floss_class )' + filter_floss
-        all_flosscatalog = self.query_PRO( 'FLOSSClassCatalog', filter_flosscatalog )
-        
-        
-        # Return the list of queries containing all the data related to the ORF annotation
-        # previously collected from the PRO database 
-        lists_to_insert = [ all_gene, all_genealias,
-                            all_orf, all_orfdsasso, 
-                            all_transcript, all_transcriptds_asso,
-                            all_orftranscriptasso, all_otadsasso,
-                            all_orfannotationcatalog, all_orfannotation,
-                            all_cellcontextcatalog, all_cellcontext,
-                            all_providedcatcatalog, all_providedcat, 
-                            all_orfcategorycatalog, all_orfcategory,
-                            all_flosscatalog, all_floss ]
+                fields = line.split()
+                try:
+                    chromosome = fields[ 0 ]
+                    # NB: As the start position of chromosome equals 0 in BED files,
+                    #     add 1 to the chromStart to get the absolute genomic coordinates
+                    #     (chromEnd is already one-based)
+                    start_pos = int( fields[ 1 ] ) + 1
+                    end_pos = int( fields[ 2 ] )
+                except Exception as e:
+                    raise DenCellORFException( 'FilterStrategy.get_region_list(): The line ' + 
+                                               str( line_index + 1 ) + ' of the BED file (' + 
+                                               self.regions + ') is not properly formatted.', e )
                 
-        return lists_to_insert
-    
-    
+                # Get the chromosome name without the 'chr' prefix
+                if chromosome.startswith( 'chr' ):
+                    chromosome = chromosome[ len( 'chr' ): ]
+                if ( chromosome in Constants.MITOCHONDRIAL_CHR_LIST ):
+                    chromosome = Constants.MITOCHONDRIAL_CHR
+                
+                region_list.append( ( chromosome, start_pos, end_pos ) )
         
-    # ===============================================================================
-    # Common methods to perfom the query and insert data from the PRO database into 
-    # the FILT database
-    # =============================================================================== 
+        return region_list
     
-    ## query_PRO
-    #  ---------
-    #
-    # This method allows to build a particular query to the PRO database,
-    # using a filter built by concatenation and querying a particular table.
-    #
-    # @param classname: String - The name of the DenCellORF class to query.
-    #                            e.g. PROGene.
-    # @param filter: String - The filter to apply on the query.
-    #                         e.g. '.filter( PROGeneAlias.alias == "GADD34" )'
-    # 
-    # @return SQLAlchemy Query - SQLManagerPRO.get_instance().get_session().query( classname ).filter
-    #                            e.g. SQLManagerPRO.get_instance().get_session().query( PROGene \
-    #                                                            ).filter( PROGeneAlias.alias == "GADD34" )
-    # 
-    def query_PRO( self, classname, filter ):
-        
-        return eval( 'SQLManagerPRO.get_instance().get_session().query( ' + classname + ')' + filter + '.distinct()' )
-        
     
     
-    ## process_queries
-    #  ---------------
-    #
-    # This methods allows to process a list of queries previously 
-    # generated and that allows to filter the content of the 
-    # PRO database that needs to be used in the FILT database.
-    # 
-    def process_queries( self, queries_list ):
-    
-        # Get the total number of queries to process and reset 
-        # the ProgressionBar instance to follow the progression
-        ProgressionBar.get_instance().reset_instance( total = len( queries_list ) )
-            
-        for query in queries_list:
-            
-            # Update and display the progression bar on the console
-            ProgressionBar.get_instance().increase_and_display()
-            
-            self.PRO_to_FILT( query )
-    
-    
-    
-    ## PRO_to_FILT
-    #  -----------
+    ## fill_missing_orf_bins
+    #  ---------------------
     #
-    # This method allows to get all the object reported by a query on the PRO database, 
-    # detach them from the session and insert them in the FILT database.
+    # This method allows to compute the genomic bin of the ORFs registered without
+    # bin in the PRO database (e.g. in the databases built prior to the computation 
+    # of the bins during the merging of the DSORFs). The ORFs are processed by chunks 
+    # ordered by ID. As the cached key sets may have been computed without these ORFs,
+    # the content version of the PRO database is updated if any bin has been computed.
     #
-    # @param query: SQLAlchemy Query - The SQLAlchemy query allowing to get the 
-    #                                  entries to insert in the FILT database.
+    # @return updated_count: Integer - The number of ORFs updated.
     #
-    # @throw DenCellORFException: When an exception as been raised trying to insert the data
-    #                             and commit the changes.
+    # @throw DenCellORFException: When the bins cannot be updated.
     # 
-    def PRO_to_FILT( self, query ):
-        
-        if ( query and ( query.count() != 0 ) ):
-            # Expunge the session to the PRO database to detach the objects in the list from the session
-            SQLManagerPRO.get_instance().get_session().expunge_all()
+    @RunTelemetry.timed_stage()
+    def fill_missing_orf_bins( self ):
+        
+        update_statement = ORF.__table__.update().where( 
+                                                            ORF.__table__.c.id == bindparam( 'b_id' ) 
+                                                        ).values( 
+                                                                    bin = bindparam( 'b_bin' ) 
+                                                                )
+        
+        updated_count = 0
+        orfs_wo_bin = [ None ]
+        
+        while ( len( orfs_wo_bin ) != 0 ):
+            orfs_wo_bin = SQLManagerPRO.get_instance().get_session().query( 
+                                                                                ORF.id,
+                                                                                ORF.start_pos,
+                                                                                ORF.stop_pos
+                                                                            ).filter( 
+                                                                                        ORF.bin == None,
+                                                                                        ORF.start_pos != None,
+                                                                                        ORF.stop_pos != None
+                                                                                    ).order_by( ORF.id ).limit( Constants.MAX_COUNT_TO_INSERT ).all()
             SQLManagerPRO.get_instance().close_session()
             
-            # Insert the objects of the list in the FILT database
-            for entry in query.all():
+            if ( len( orfs_wo_bin ) != 0 ):
                 try:
-                    SQLManagerFILT.get_instance().get_session().merge( entry )
+                    with SQLManagerPRO.get_instance().get_engine().begin() as connection:
+                        connection.execute( update_statement,
+                                            [ { 'b_id': orf_id,
+                                                'b_bin': GeneticsUtil.get_genomic_bin( start_pos, stop_pos ) }
+                                              for ( orf_id, start_pos, stop_pos ) in orfs_wo_bin ] )
                 except Exception as e:
-                    raise DenCellORFException( 'FilterStrategy().PRO_to_FILT(): An exception occurred' +
-                                               ' trying to insert the data in the FILT database' +
-                                               ' (using the session.merge() method).', e )
-                
-            try: 
-                SQLManagerFILT.get_instance().commit()
-            except Exception as e:
-                raise DenCellORFException( 'FilterStrategy().PRO_to_FILT(): An exception occurred' +
-                                           ' trying to commit changes after insertion of data in' +
-                                           ' the FILT database.', e )
-                
-        SQLManagerFILT.get_instance().close_session()
-    
\ No newline at end of file
+                    raise DenCellORFException( 'FilterStrategy.fill_missing_orf_bins(): An error occurred' +
+                                               ' trying to update the genomic bins of the ORFs.' +
+                                               '\n Error code: ' + LogCodes.ERR_SQL_SESSION + '.', e )
+                updated_count += len( orfs_wo_bin )
+                RunTelemetry.get_instance().add_rows( len( orfs_wo_bin ) )
+        
+        if ( updated_count != 0 ):
+            FilterPlanner.update_content_version()
+            Logger.get_instance().info( 'The genomic bin of ' + str( updated_count ) + ' ORFs was missing' +
+                                        ' and has been computed.' )
+        
+        return updated_count
@@ -15,6 +15,7 @@ from fr.tagc.uorf.core.util.option import OptionConstants
 from fr.tagc.uorf.core.util.general.FileHandlerUtil import FileHandlerUtil
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
 
 
 ## ForceInsertionStrategy
@@ -135,6 +136,7 @@ class ForceInsertionStrategy( object ):
     #                             related to the data source or trying to commit the session.
     #
     @staticmethod
+    @RunTelemetry.timed_stage()
     def insert_datasource( data_source ):
         
         # For an easier manipulation of data stored in the DataManager, 
@@ -2,19 +2,21 @@
 
 import os
 import subprocess
-import pandas as pd
-from sqlalchemy import or_, func
+from sqlalchemy import func, bindparam
 
 
 from fr.tagc.uorf.core.model.PRO import *
 
 from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
+from fr.tagc.uorf.core.util.general.GeneralUtil import GeneralUtil
 from fr.tagc.uorf.core.util.sql.SQLManagerPRO import SQLManagerPRO
 from fr.tagc.uorf.core.util.sql import SQLConstants
 from fr.tagc.uorf.core.util.option.OptionManager import OptionManager
 from fr.tagc.uorf.core.util.option import OptionConstants
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
 
 
 # ===============================================================================
@@ -141,6 +143,11 @@ class GenerateBEDContentStrategy( object ):
       # RGB colors depending on strand
     BED_DEFAULT_RGB_PLUS_STRAND = '255,0,0'
     BED_DEFAULT_RGB_MINUS_STRAND = '0,0,255'
+      # RGB colors of the spliced ORFs for which the coordinates of the exons are missing
+    BED_SPLICED_WO_COORD_RGB_PLUS_STRAND = '255,100,0'
+    BED_SPLICED_WO_COORD_RGB_MINUS_STRAND = '0,200,255'
+      # RGB color when the strand is unknown
+    BED_UNDEFINED_STRAND_RGB = '0,0,0'
     
     # List of chromosomes accepted in the BED file
     # By default all chromosome with a number in the 1-23 range are accepted,
@@ -159,6 +166,8 @@ class GenerateBEDContentStrategy( object ):
     #                                    - The database type (SQLite / MySQL).
     #                                    - For SQLite databases: the folder of SQLite file.
     #                                    - For MySQL databases: the MySQL user, password, host IP and port.
+    #     - incremental: Boolean - Should the content be refreshed only for the ORFs 
+    #                              registered in the UTORFChangeLog table?
     #
     def __init__( self ):
         
@@ -177,6 +186,9 @@ class GenerateBEDContentStrategy( object ):
         elif ( self.db_settings[ Constants.DB_SETTINGS_DB_TYPE ] == SQLConstants.DB_TYPE_SQLITE ):
             self.db_settings[ Constants.DB_SETTINGS_DB_FOLDER ] = OptionManager.get_instance().get_option( OptionConstants.OPTION_DB_FOLDER )
         
+        # Get the incremental option
+        self.incremental = OptionManager.get_instance().get_option( OptionConstants.OPTION_BED_INCREMENTAL )
+        
     
     
     ## execute
@@ -199,7 +211,7 @@ class GenerateBEDContentStrategy( object ):
                                         '\n Error code: ' + LogCodes.ERR_SQL_SESSION + '.', e)
         SQLManagerPRO.get_instance().close_session()
         
-        self.compute_bed_content()
+        self.compute_bed_content( incremental = self.incremental )
         
     
     
@@ -207,440 +219,509 @@ class GenerateBEDContentStrategy( object ):
     #  -------------------
     #
     # Generate the content of the UTBEDContent table and fill the table.
+    #
+    # All the information necessary to build the BED line of each ORF (including 
+    # the lists of transcripts, RNA biotypes, cellular contexts, annotations and
+    # Kozak contexts) is fetched using one single grouped query, by chunks, and 
+    # the lines are computed at once for all the ORFs of a chunk. The lines of
+    # each chunk are inserted as soon as they have been computed.
+    #
+    # In incremental mode, only the lines of the ORFs registered in the 
+    # UTORFChangeLog table (i.e. the ORFs which information has been updated
+    # since the last computation) are deleted and computed again. The full 
+    # content is computed if the UTBEDContent table is empty.
+    # In both modes, only the ORFs registered in the UTORFChangeLog table when 
+    # the computation starts are removed from this table, such as the ORFs 
+    # registered in the meantime are refreshed during the next computation.
     # 
-    def compute_bed_content( self ):        
+    # @param incremental: Boolean - Should the content be refreshed only for the ORFs 
+    #                               registered in the UTORFChangeLog table? False by default.
+    #
+    # @throw DenCellORFException: When the existing content cannot be deleted.
+    # @throw DenCellORFException: When the lines of a chunk cannot be inserted.
+    # 
+    @RunTelemetry.timed_stage()
+    def compute_bed_content( self, incremental=False ):        
         
-        Logger.get_instance().info( 'Starting to compute the content of the BEDContent table.' )
+        # NB: pandas is imported here as this module is also imported 
+        #     by the strategies registering changed ORFs
+        import pandas as pd
         
-        # Remove the content of the UTBEDContent table prior to compute it again
-        try:
-            SQLManagerPRO.get_instance().get_session().query( UTBEDContent ).delete()
-            SQLManagerPRO.get_instance().commit()
-        except Exception as e:
-            raise DenCellORFException( 'GenerateBEDContentStrategy.execute(): An error occurred trying to' +
-                                       ' delete the existing content of the UTBEDContent table.', e )
+        # Make sure the UTORFChangeLog table exists (e.g. for the 
+        # databases that have been built prior to its addition)
+        UTORFChangeLog.__table__.create( bind = SQLManagerPRO.get_instance().get_engine(),
+                                         checkfirst = True )
+        
+        if incremental:
+            utbedcontent_count = SQLManagerPRO.get_instance().get_session().query( UTBEDContent ).count()
+            SQLManagerPRO.get_instance().close_session()
+            
+            if ( utbedcontent_count == 0 ):
+                Logger.get_instance().info( 'The UTBEDContent table is empty, hence its full content' +
+                                            ' will be computed.' )
+                incremental = False
+        
+        # Get the IDs of the ORFs registered in the UTORFChangeLog table
+        changelog_orf_ids = SQLManagerPRO.get_instance().get_session().query( UTORFChangeLog.orf_id ).all()
+        changelog_orf_ids = sorted( GeneralUtil.query_result_to_list( changelog_orf_ids ) )
         SQLManagerPRO.get_instance().close_session()
         
+        if incremental:
+            if ( len( changelog_orf_ids ) == 0 ):
+                Logger.get_instance().info( 'The content of the BEDContent table is up to date.' )
+                return
+            
+            Logger.get_instance().info( 'Starting to refresh the content of the BEDContent table for ' +
+                                        str( len( changelog_orf_ids ) ) + ' ORFs.' )
+            
+        else:
+            Logger.get_instance().info( 'Starting to compute the content of the BEDContent table.' )
+            
+            # Remove the content of the UTBEDContent table prior to compute it again
+            try:
+                SQLManagerPRO.get_instance().get_session().query( UTBEDContent ).delete( synchronize_session = False )
+                SQLManagerPRO.get_instance().commit()
+            except Exception as e:
+                raise DenCellORFException( 'GenerateBEDContentStrategy.compute_bed_content(): An error occurred' +
+                                           ' trying to delete the existing content of the UTBEDContent table.', e )
+            SQLManagerPRO.get_instance().close_session()
+        
+        
+        # Compute and insert the BED lines
+        # --------------------------------
+        # NB: Each chunk of ORFs is fetched using a distinct query that is 
+        #     entirely read prior to insert the lines, as SQLite does not 
+        #     allow to write in the database while a query is being read.
+        #     In incremental mode, the chunks are defined by the list of IDs
+        #     of the ORFs to refresh, otherwise the ORFs are fetched by 
+        #     chunks ordered by ID.
+        Logger.get_instance().debug( 'Starting to compute the BED lines.' )
+        
+        inserted_count = 0
+        
+        if incremental:
+            for min_bound in xrange( 0, len( changelog_orf_ids ), Constants.BED_CONTENT_QUERY_BATCH_SIZE ):
+                orf_ids_chunk = changelog_orf_ids[ min_bound : min_bound + Constants.BED_CONTENT_QUERY_BATCH_SIZE ]
+                
+                bed_content_query = self.get_bed_content_query( orf_ids_chunk )
+                bed_content_df = pd.read_sql( bed_content_query.statement, 
+                                              SQLManagerPRO.get_instance().get_engine() )
+                SQLManagerPRO.get_instance().close_session()
+                
+                # Replace the existing lines of the ORFs of the chunk and 
+                # unregister these ORFs from the UTORFChangeLog table
+                inserted_count += self.insert_bed_lines( bed_content_df, 
+                                                         orf_ids_to_replace = orf_ids_chunk )
         
-        # In order to reduce the computation time, 
-        # the BED file is build sequentially by:
-        # - Adding the information related to the non-spliced ORFs
-        # - Adding the information related to the ORFs harboring several exons        
-        
-        # Unspliced ORFs
-        # --------------
-        Logger.get_instance().debug( 'Starting to compute the BED lines for all unspliced ORFs.' )
-        
-        # First get all the entries of the ORF table without splicing information
-        all_orfs_not_spliced_query = SQLManagerPRO.get_instance().get_session().query(  ORF.id, 
-                                                                                        ORF.chromosome, 
-                                                                                        ORF.strand, 
-                                                                                        ORF.start_pos,
-                                                                                        ORF.stop_pos,
-                                                                                        ORF.spliced,
-                                                                                        ORF.genomic_length
-                                                                                       ).filter( 
-                                                                                                 or_( ORF.spliced == None,
-                                                                                                      ORF.spliced == False,
-                                                                                                      ORF.splice_starts == None,
-                                                                                                      ORF.splice_ends == None ) )
-        all_orfs_not_spliced_df = pd.read_sql( all_orfs_not_spliced_query.statement, 
-                                               SQLManagerPRO.get_instance().get_engine() )
-        SQLManagerPRO.get_instance().close_session()
+        else:
+            last_orf_id = None
+            bed_content_df_size = Constants.BED_CONTENT_CHUNK_SIZE
+            
+            while ( bed_content_df_size == Constants.BED_CONTENT_CHUNK_SIZE ):
+                bed_content_query = self.get_bed_content_query()
+                if ( last_orf_id != None ):
+                    bed_content_query = bed_content_query.filter( ORF.id > last_orf_id )
+                bed_content_query = bed_content_query.order_by( ORF.id ).limit( Constants.BED_CONTENT_CHUNK_SIZE )
                 
-        # Set name of the line as the ORF ID with 'ORF' prefix
-        all_orfs_not_spliced_df[ self.BED_HEADER_NAME ] = map( lambda id: 'ORF' + str( id ),
-                                                               all_orfs_not_spliced_df[ 'id' ] )
+                bed_content_df = pd.read_sql( bed_content_query.statement, 
+                                              SQLManagerPRO.get_instance().get_engine() )
+                SQLManagerPRO.get_instance().close_session()
+                
+                bed_content_df_size = bed_content_df.shape[ 0 ]
+                if ( bed_content_df_size != 0 ):
+                    last_orf_id = int( bed_content_df[ 'id' ].max() )
+                    inserted_count += self.insert_bed_lines( bed_content_df )
+            
+            # Unregister the ORFs from the UTORFChangeLog table, 
+            # as all the lines are now up to date
+            with SQLManagerPRO.get_instance().get_engine().begin() as connection:
+                for min_bound in xrange( 0, len( changelog_orf_ids ), Constants.BED_CONTENT_QUERY_BATCH_SIZE ):
+                    orf_ids_chunk = changelog_orf_ids[ min_bound : min_bound + Constants.BED_CONTENT_QUERY_BATCH_SIZE ]
+                    connection.execute( UTORFChangeLog.__table__.delete().where( UTORFChangeLog.orf_id.in_( orf_ids_chunk ) ) )
         
-        # Add the 'chr' prefix to chromosome names
-        all_orfs_not_spliced_df[ 'chromosome' ] = map( lambda x: 'chr' + x, 
-                                                       all_orfs_not_spliced_df[ 'chromosome' ] )
+        # Compute the index of each line
+        # NB: The index of the lines are computed once all the lines have been inserted
+        updated_index_count = self.update_bed_indexes()
         
-        # As the start position of chromosome equals 0 in BED files,
-        # remove 1 from the absolute genomic coordinates to get 
-        # the appropriate coordinates
-        all_orfs_not_spliced_df[ self.BED_HEADER_CHROM_START ] = map( lambda x: int( x ) - 1,
-                                                                      all_orfs_not_spliced_df[ 'start_pos' ] )
-        # NB: Stop positions are left unmodified as chromEnd is one-based
-                
-        # Unspliced ORFs obviously contain one single exon, 
-        # then draw thickly the whole feature
-        all_orfs_not_spliced_df[ self.BED_HEADER_THICK_START ] = all_orfs_not_spliced_df[ self.BED_HEADER_CHROM_START ]
-        all_orfs_not_spliced_df[ self.BED_HEADER_THICK_END ] = all_orfs_not_spliced_df[ 'stop_pos' ]
-        # and define one single block
-        all_orfs_not_spliced_df[ self.BED_HEADER_BLOCK_COUNT ] = 1
-        all_orfs_not_spliced_df[ self.BED_HEADER_BLOCK_STARTS ] = 0
-            # If  the genomic lengths have already been computed, then use them.  
-        if ( any( [ ( gen_len != None ) for gen_len in all_orfs_not_spliced_df[ 'genomic_length' ] ] ) ):
-            all_orfs_not_spliced_df[ self.BED_HEADER_BLOCK_SIZES ] = all_orfs_not_spliced_df[ 'genomic_length' ]
-        else:
-            all_orfs_not_spliced_df[ self.BED_HEADER_BLOCK_SIZES ] = all_orfs_not_spliced_df[ 'stop_pos' ] - all_orfs_not_spliced_df[ 'start_pos' ] + 1
-
-        # Compute the RGB column
-        rgb_col = all_orfs_not_spliced_df.apply( self.compute_color, axis=1 ).to_frame()
-        rgb_col = rgb_col.rename( columns = { 0: self.BED_HEADER_RGB } )
-        all_orfs_not_spliced_df = pd.concat( [ all_orfs_not_spliced_df, rgb_col ],
-                                             axis = 1 )
+        Logger.get_instance().info( str( inserted_count ) + ' lines have been computed and inserted in the' +
+                                    ' UTBEDContent table (the index of ' + str( updated_index_count ) + 
+                                    ' lines has been updated).' )
         
-        # Leave the score columns empty
-        all_orfs_not_spliced_df[ self.BED_HEADER_SCORE ] = self.BED_DEFAULT_SCORE
         
-        # Rename columns
-        all_orfs_not_spliced_df = all_orfs_not_spliced_df.rename( columns = { 'chromosome': self.BED_HEADER_CHROM,
-                                                                              'stop_pos': self.BED_HEADER_CHROM_END } )
         
-        # Select and reorder the columns of the data frame
-        all_orfs_not_spliced_df = all_orfs_not_spliced_df[ [ 'id' ] + self.BED_HEADER_LIST ]
+    ## insert_bed_lines
+    #  ----------------
+    #
+    # This method allows to compute the BED lines of a chunk of ORFs and to 
+    # insert them in the UTBEDContent table, in one single transaction.
+    #
+    # @param bed_content_df: Pandas DataFrame - The data frame returned by the query 
+    #                                           of the get_bed_content_query() method.
+    # @param orf_ids_to_replace: List - The list of IDs of the ORFs for which the existing
+    #                                   lines have to be deleted and which have to be removed
+    #                                   from the UTORFChangeLog table. None by default.
+    #
+    # @return Integer - The number of lines inserted.
+    #
+    # @throw DenCellORFException: When the lines cannot be inserted.
+    #
+    def insert_bed_lines( self, bed_content_df, orf_ids_to_replace=None ):
+        
+        if ( bed_content_df.shape[ 0 ] != 0 ):
+            bed_lines = self.compute_bed_lines( bed_content_df )
+        else:
+            bed_lines = bed_content_df
+        
+        try:
+            with SQLManagerPRO.get_instance().get_engine().begin() as connection:
+                if ( orf_ids_to_replace is not None ):
+                    connection.execute( UTBEDContent.__table__.delete().where( UTBEDContent.orf_id.in_( orf_ids_to_replace ) ) )
                 
+                if ( bed_lines.shape[ 0 ] != 0 ):
+                    connection.execute( UTBEDContent.__table__.insert(), 
+                                        bed_lines.to_dict( orient = 'records' ) )
+                
+                if ( orf_ids_to_replace is not None ):
+                    connection.execute( UTORFChangeLog.__table__.delete().where( UTORFChangeLog.orf_id.in_( orf_ids_to_replace ) ) )
+        except Exception as e:
+            raise DenCellORFException( 'GenerateBEDContentStrategy.insert_bed_lines(): An error occurred' +
+                                       ' trying to insert the lines in the UTBEDContent table.', e )
         
-        # Spliced ORFs
-        # ------------
-        Logger.get_instance().debug( 'Starting to compute the BED lines for all spliced ORFs.' )
-        
-        # First get all the entries of the ORF table without splicing information
-        all_orfs_spliced_query = SQLManagerPRO.get_instance().get_session().query(  ORF.id, 
-                                                                                    ORF.chromosome, 
-                                                                                    ORF.strand, 
-                                                                                    ORF.start_pos,
-                                                                                    ORF.stop_pos,
-                                                                                    ORF.spliced_parts_count,
-                                                                                    ORF.splice_starts,
-                                                                                    ORF.splice_ends
-                                                                                  ).filter( ORF.spliced == True,
-                                                                                            ORF.splice_starts != None,
-                                                                                            ORF.splice_ends != None )
-        all_orfs_spliced_df = pd.read_sql( all_orfs_spliced_query.statement,
-                                           SQLManagerPRO.get_instance().get_engine() )
-        SQLManagerPRO.get_instance().close_session()
+        return bed_lines.shape[ 0 ]
         
-        # Set name of the line as the ORF ID with 'ORF' prefix
-        all_orfs_spliced_df[ self.BED_HEADER_NAME ] = map( lambda id: 'ORF' + str( id ),
-                                                           all_orfs_spliced_df[ 'id' ] )
         
-        # Add the 'chr' prefix to chromosome names
-        all_orfs_spliced_df[ 'chromosome' ] = map( lambda x: 'chr' + x, 
-                                                   all_orfs_spliced_df[ 'chromosome' ] )
+        
+    ## get_bed_content_query
+    #  ---------------------
+    #
+    # This method allows to get the query returning, for each ORF, all the 
+    # information necessary to compute its BED line.
+    # The lists of distinct transcripts, RNA biotypes, cellular contexts, 
+    # annotations and Kozak contexts related to the ORF are aggregated in 
+    # the same grouped query.
+    #
+    # @param orf_ids_to_refresh: List - The list of IDs of the ORFs to compute. 
+    #                                   If None, all the ORFs are returned.
+    #
+    # @return Query - The query.
+    #
+    def get_bed_content_query( self, orf_ids_to_refresh=None ):
+        
+        bed_content_query = SQLManagerPRO.get_instance().get_session().query(
+                                                                                ORF.id, 
+                                                                                ORF.chromosome, 
+                                                                                ORF.strand, 
+                                                                                ORF.start_pos,
+                                                                                ORF.stop_pos,
+                                                                                ORF.spliced,
+                                                                                ORF.genomic_length,
+                                                                                ORF.splice_starts,
+                                                                                ORF.splice_ends,
+                                                                                func.group_concat( Transcript.transcript_id.distinct().op( 'ORDER BY' )( Transcript.transcript_id ) ).label( self.BED_HEADER_TRANSCRIPTS ),
+                                                                                func.group_concat( Transcript.rna_biotype.distinct().op( 'ORDER BY' )( Transcript.rna_biotype ) ).label( self.BED_HEADER_RNA_BIOTYPES ),
+                                                                                func.group_concat( CellContext.cell_context.distinct().op( 'ORDER BY' )( CellContext.cell_context ) ).label( self.BED_HEADER_CELL_TYPES ),
+                                                                                func.group_concat( ORFAnnotation.orf_annotation.distinct().op( 'ORDER BY' )( ORFAnnotation.orf_annotation ) ).label( self.BED_HEADER_ORF_ANNOTATIONS ),
+                                                                                func.group_concat( ORFTranscriptAsso.kozak_context_comp.distinct().op( 'ORDER BY' )( ORFTranscriptAsso.kozak_context_comp ) ).label( self.BED_HEADER_KOZAK_CONTEXTS )
+                                                                            ).outerjoin( 
+                                                                                            ORFTranscriptAsso, ORFTranscriptAsso.orf_id == ORF.id 
+                                                                                        ).outerjoin( 
+                                                                                                        Transcript, Transcript.id == ORFTranscriptAsso.transcript_id 
+                                                                                                    ).outerjoin( 
+                                                                                                                    CellContext, CellContext.orftranscriptasso_id == ORFTranscriptAsso.id 
+                                                                                                                ).outerjoin( 
+                                                                                                                                ORFAnnotation, ORFAnnotation.orftranscriptasso_id == ORFTranscriptAsso.id 
+                                                                                                                            )
+        
+        if ( orf_ids_to_refresh is not None ):
+            bed_content_query = bed_content_query.filter( ORF.id.in_( orf_ids_to_refresh ) )
+        
+        bed_content_query = bed_content_query.group_by( ORF.id )
+        
+        return bed_content_query
+        
+        
+        
+    ## compute_bed_lines
+    #  -----------------
+    #
+    # This method allows to compute the BED lines (and their additional 
+    # columns) of a set of ORFs, using array operations.
+    #
+    # @param bed_content_df: Pandas DataFrame - The data frame returned by the query 
+    #                                           of the get_bed_content_query() method.
+    #
+    # @return bed_lines: Pandas DataFrame - The data frame containing the 'orf_id', 
+    #                                       'bed_index' (None), 'bed_col' and 
+    #                                       'bed_add_col' columns.
+    #
+    def compute_bed_lines( self, bed_content_df ):
+        
+        import numpy as np
+        import pandas as pd
+        
+        bed_content_df = bed_content_df.reset_index( drop = True )
+        
+        # Get the ORFs for which the BED line is made of several blocks, 
+        # i.e. the spliced ORFs for which the coordinates of the exons are known
+        spliced_with_coord = ( ( bed_content_df[ 'spliced' ] == True )
+                               & bed_content_df[ 'splice_starts' ].notnull()
+                               & bed_content_df[ 'splice_ends' ].notnull() )
+        
+        bed_df = pd.DataFrame( index = bed_content_df.index )
+        
+        # Set name of the line as the ORF ID with 'ORF' prefix
+        # and add the 'chr' prefix to chromosome names
+        bed_df[ self.BED_HEADER_CHROM ] = 'chr' + bed_content_df[ 'chromosome' ].astype( str )
         
         # As the start position of chromosome equals 0 in BED files,
         # remove 1 from the absolute genomic coordinates to get 
         # the appropriate coordinates
-        all_orfs_spliced_df[ self.BED_HEADER_CHROM_START ] = map( lambda x: int( x ) - 1,
-                                                                  all_orfs_spliced_df[ 'start_pos' ] )
         # NB: Stop positions are left unmodified as chromEnd is one-based
-          
-        # Draw thickly the whole feature
-        all_orfs_spliced_df[ self.BED_HEADER_THICK_START ] = all_orfs_spliced_df[ self.BED_HEADER_CHROM_START ]
-        all_orfs_spliced_df[ self.BED_HEADER_THICK_END ] = all_orfs_spliced_df[ 'stop_pos' ]
-        
-        # Define the block-related values
-        all_orfs_spliced_df[ self.BED_HEADER_BLOCK_COUNT ] = all_orfs_spliced_df[ 'spliced_parts_count' ]
-        
-        # Get the comma-separated lists of the exon start positions
-        block_starts_col = all_orfs_spliced_df.apply( self.compute_block_starts, axis=1 ).to_frame()
-        block_starts_col = block_starts_col.rename( columns = { 0: self.BED_HEADER_BLOCK_STARTS } )
-        all_orfs_spliced_df = pd.concat( [ all_orfs_spliced_df, block_starts_col ],
-                                         axis = 1 )
-        
-        # Compute the comma-separated list of the exon sizes
-        block_sizes_col = all_orfs_spliced_df.apply( self.compute_block_sizes, axis=1 ).to_frame()
-        block_sizes_col = block_sizes_col.rename( columns = { 0: self.BED_HEADER_BLOCK_SIZES } )
-        all_orfs_spliced_df = pd.concat( [ all_orfs_spliced_df, block_sizes_col ],
-                                         axis = 1 )
-        
-        # Leave the RGB and score columns empty
-        all_orfs_spliced_df[ self.BED_HEADER_RGB ] = map( self.compute_color_from_strd,
-                                                          all_orfs_spliced_df[ 'strand' ] )
-        all_orfs_spliced_df[ self.BED_HEADER_SCORE ] = self.BED_DEFAULT_SCORE
-        
-        # Rename columns
-        all_orfs_spliced_df = all_orfs_spliced_df.rename( columns = { 'chromosome': self.BED_HEADER_CHROM,
-                                                                      'stop_pos': self.BED_HEADER_CHROM_END } )
-        
-        # Select and reorder the columns of the data frame
-        all_orfs_spliced_df = all_orfs_spliced_df[ [ 'id' ] + self.BED_HEADER_LIST ]
-        
-        
-        # Merge the two data frames
-        # -------------------------
-        # Merge all the data frames containing the data of the BED
-        bed_full_content = pd.concat( [ all_orfs_not_spliced_df, 
-                                        all_orfs_spliced_df ] )
-        
-        
-        # Add extra columns
-        # -----------------
-        Logger.get_instance().debug( 'Starting to compute the additional columns for bed detail format.' )     
-        
-        # For each feature, add the list of distinct official 
-        # transcript IDs corresponding to the ORF
-        transcript_id_orf_asso_qr = SQLManagerPRO.get_instance().get_session().query( 
-                                                                                        ORF.id,
-                                                                                        func.group_concat( Transcript.transcript_id.distinct().op( 'ORDER BY' )( Transcript.transcript_id ) ).label( self.BED_HEADER_TRANSCRIPTS )
-                                                                                    ).filter(
-                                                                                                Transcript.id == ORFTranscriptAsso.transcript_id,
-                                                                                                ORFTranscriptAsso.orf_id == ORF.id
-                                                                                            ).group_by( 
-                                                                                                        ORF.id 
-                                                                                                      )
-        transcript_id_orf_asso_df = pd.read_sql( transcript_id_orf_asso_qr.statement,
-                                                 SQLManagerPRO.get_instance().get_engine() )
-        SQLManagerPRO.get_instance().close_session()
+        bed_df[ self.BED_HEADER_CHROM_START ] = bed_content_df[ 'start_pos' ] - 1
+        bed_df[ self.BED_HEADER_CHROM_END ] = bed_content_df[ 'stop_pos' ]
+        bed_df[ self.BED_HEADER_NAME ] = 'ORF' + bed_content_df[ 'id' ].astype( str )
         
-        bed_full_content = bed_full_content.merge( transcript_id_orf_asso_df,
-                                                   on = 'id',
-                                                   how = 'left',
-                                                   validate = 'one_to_one' )
-        
-        # For each feature, add the list of distinct
-        # RNA biotypes corresponding to the ORF
-        rna_biotypes_orf_asso_qr = SQLManagerPRO.get_instance().get_session().query( 
-                                                                                        ORF.id,
-                                                                                        func.group_concat( Transcript.rna_biotype.distinct().op( 'ORDER BY' )( Transcript.rna_biotype ) ).label( self.BED_HEADER_RNA_BIOTYPES )
-                                                                                    ).filter(
-                                                                                                Transcript.id == ORFTranscriptAsso.transcript_id,
-                                                                                                ORFTranscriptAsso.orf_id == ORF.id
-                                                                                            ).group_by( 
-                                                                                                        ORF.id 
-                                                                                                      )
-        rna_biotypes_orf_asso_df = pd.read_sql( rna_biotypes_orf_asso_qr.statement,
-                                                SQLManagerPRO.get_instance().get_engine() )
-        SQLManagerPRO.get_instance().close_session()
-        
-        bed_full_content = bed_full_content.merge( rna_biotypes_orf_asso_df,
-                                                   on = 'id',
-                                                   how = 'left',
-                                                   validate = 'one_to_one' )
-        
-        
-        
-        # For each feature, add the list of distinct cellular
-        # contexts corresponding to the ORF
-        cell_context_orf_asso_qr = SQLManagerPRO.get_instance().get_session().query( 
-                                                                                        ORF.id,
-                                                                                        func.group_concat( CellContext.cell_context.distinct().op( 'ORDER BY' )( CellContext.cell_context ) ).label( self.BED_HEADER_CELL_TYPES )
-                                                                                    ).filter(
-                                                                                                CellContext.orftranscriptasso_id == ORFTranscriptAsso.id,
-                                                                                                ORFTranscriptAsso.orf_id == ORF.id
-                                                                                            ).group_by( 
-                                                                                                        ORF.id 
-                                                                                              )
-        cell_context_orf_asso_df = pd.read_sql( cell_context_orf_asso_qr.statement,
-                                                SQLManagerPRO.get_instance().get_engine() )
-        SQLManagerPRO.get_instance().close_session()
-        
-        # Replace any splace or tabulation in cell context names
-        # by underscores
-        cell_context_orf_asso_df[ 'cell_types' ] = map( lambda x: x.replace( ' ', '_' ).replace( '\t', '_' ),
-                                                        cell_context_orf_asso_df[ 'cell_types' ] )
-        
-        bed_full_content = bed_full_content.merge( cell_context_orf_asso_df,
-                                                   on = 'id',
-                                                   how = 'left',
-                                                   validate = 'one_to_many' )
-        
-        
-        # For each feature, add the list of distinct ORF annotations
-        # corresponding to the ORF
-        orf_annot_orf_asso_qr = SQLManagerPRO.get_instance().get_session().query(
-                                                                                    ORF.id,
-                                                                                    func.group_concat( ORFAnnotation.orf_annotation.distinct().op( 'ORDER BY' )( ORFAnnotation.orf_annotation ) ).label( self.BED_HEADER_ORF_ANNOTATIONS )
-                                                                                  ).filter(
-                                                                                                ORFAnnotation.orftranscriptasso_id == ORFTranscriptAsso.id,
-                                                                                                ORFTranscriptAsso.orf_id == ORF.id
-                                                                                            ).group_by( 
-                                                                                                        ORF.id 
-                                                                                              )
-        orf_annot_orf_asso_df = pd.read_sql( orf_annot_orf_asso_qr.statement,
-                                             SQLManagerPRO.get_instance().get_engine() )
-        SQLManagerPRO.get_instance().close_session()
+        # Leave the score columns empty
+        bed_df[ self.BED_HEADER_SCORE ] = self.BED_DEFAULT_SCORE
+        bed_df[ self.BED_HEADER_STRAND ] = bed_content_df[ 'strand' ]
         
-        bed_full_content = bed_full_content.merge( orf_annot_orf_asso_df,
-                                                   on = 'id',
-                                                   how = 'left',
-                                                   validate = 'one_to_many' )
-        
-        
-        # For each feature, add the list of distinct Kozak contexts
-        # corresponding to the ORF
-        kozak_ctxt_orf_asso_qr = SQLManagerPRO.get_instance().get_session().query(
-                                                                                    ORF.id,
-                                                                                    func.group_concat( ORFTranscriptAsso.kozak_context_comp.distinct().op( 'ORDER BY' )( ORFTranscriptAsso.kozak_context_comp ) ).label( self.BED_HEADER_KOZAK_CONTEXTS )
-                                                                                  ).filter(
-                                                                                                ORFTranscriptAsso.orf_id == ORF.id
-                                                                                            ).group_by( 
-                                                                                                        ORF.id 
-                                                                                              )
-        kozak_ctxt_orf_asso_df = pd.read_sql( kozak_ctxt_orf_asso_qr.statement,
-                                              SQLManagerPRO.get_instance().get_engine() )
-        SQLManagerPRO.get_instance().close_session()
+        # Draw thickly the whole feature
+        bed_df[ self.BED_HEADER_THICK_START ] = bed_df[ self.BED_HEADER_CHROM_START ]
+        bed_df[ self.BED_HEADER_THICK_END ] = bed_df[ self.BED_HEADER_CHROM_END ]
+        
+        # Compute the RGB column:
+        # Display the ORF in red if it is located on plus strand and in blue if it 
+        # is located on the minus strand. If the ORF is spliced but the start and 
+        # end positions of the exons are missing, then display an intermediate color.
+        plus_strand = ( bed_content_df[ 'strand' ] == '+' )
+        minus_strand = ( bed_content_df[ 'strand' ] == '-' )
+        spliced_without_coord = ( ( bed_content_df[ 'spliced' ] == True ) & ( ~ spliced_with_coord ) )
+        bed_df[ self.BED_HEADER_RGB ] = np.select( [ spliced_without_coord & plus_strand,
+                                                     spliced_without_coord & minus_strand,
+                                                     plus_strand,
+                                                     minus_strand ],
+                                                   [ self.BED_SPLICED_WO_COORD_RGB_PLUS_STRAND,
+                                                     self.BED_SPLICED_WO_COORD_RGB_MINUS_STRAND,
+                                                     self.BED_DEFAULT_RGB_PLUS_STRAND,
+                                                     self.BED_DEFAULT_RGB_MINUS_STRAND ],
+                                                   default = self.BED_UNDEFINED_STRAND_RGB )
         
-        bed_full_content = bed_full_content.merge( kozak_ctxt_orf_asso_df,
-                                                   on = 'id',
-                                                   how = 'left',
-                                                   validate = 'one_to_many' )
-            
-            
+        # Unspliced ORFs obviously contain one single exon, 
+        # hence define one single block
+        # NB: If the genomic length has already been computed, then use it
+        bed_df[ self.BED_HEADER_BLOCK_COUNT ] = 1
+        bed_df[ self.BED_HEADER_BLOCK_SIZES ] = bed_content_df[ 'genomic_length' ].fillna( bed_content_df[ 'stop_pos' ] 
+                                                                                           - bed_content_df[ 'start_pos' ] + 1 )
+        bed_df[ self.BED_HEADER_BLOCK_STARTS ] = 0
+        
+        # Convert the numeric columns into integers (when there is no missing value)
+        for col in [ self.BED_HEADER_CHROM_START, self.BED_HEADER_CHROM_END, 
+                     self.BED_HEADER_THICK_START, self.BED_HEADER_THICK_END,
+                     self.BED_HEADER_BLOCK_SIZES ]:
+            if bed_df[ col ].notnull().all():
+                bed_df[ col ] = bed_df[ col ].astype( np.int64 )
+        bed_df = bed_df.astype( object )
+        
+        # Compute the blocks of the spliced ORFs
+        if spliced_with_coord.any():
+            ( block_counts, block_sizes, block_starts ) = self.compute_blocks( bed_content_df[ spliced_with_coord ] )
+            bed_df.loc[ spliced_with_coord, self.BED_HEADER_BLOCK_COUNT ] = block_counts
+            bed_df.loc[ spliced_with_coord, self.BED_HEADER_BLOCK_SIZES ] = block_sizes
+            bed_df.loc[ spliced_with_coord, self.BED_HEADER_BLOCK_STARTS ] = block_starts
+        
+        # Get the additional columns, replacing any space 
+        # or tabulation in cell context names by underscores
+        bed_add_df = bed_content_df[ self.BED_HEADER_ADD_LIST ].copy()
+        bed_add_df[ self.BED_HEADER_CELL_TYPES ] = bed_add_df[ self.BED_HEADER_CELL_TYPES ].str.replace( ' ', '_' ).str.replace( '\t', '_' )
         
-        # Save the content of the data frame
-        # ----------------------------------
         # Replace missing values by '.'
-        bed_full_content.fillna( value = self.BED_UNDEFINED_FIELD,
-                                 inplace = True )
-        
-        # Reorder the rows by chromosome, then start and stop positions, then ID.
-        # This allows the features to be ordered by (in this order):
-        # - Chromosome (chrom)
-        # - Start position (chromStart)
-        # - End position (chromEnd)
-        # - ID (name)
-        bed_full_content = bed_full_content.sort_values( by = [ self.BED_HEADER_CHROM,
-                                                                self.BED_HEADER_CHROM_START,
-                                                                self.BED_HEADER_CHROM_END,
-                                                                self.BED_HEADER_NAME ] )
-        bed_full_content.reset_index( drop = True,
-                                      inplace = True )
-        
-        # Create an entry for each ORF in the UTBEDContent table
-        objects_to_insert = []
-        for ( index, row ) in bed_full_content.iterrows():
-            
-            bed_col = '\t'.join( map( str,
-                                      row[ self.BED_HEADER_LIST ].tolist() ) )
-            bed_add_col = '\t'.join( map( str,
-                                          row[ self.BED_HEADER_ADD_LIST ].tolist() ) )
-            
-            utbedcontent = UTBEDContent( orf_id = row[ 'id' ],
-                                         bed_index = index,
-                                         bed_col = bed_col,
-                                         bed_add_col = bed_add_col )
-            objects_to_insert.append( utbedcontent )
+        bed_df = bed_df.fillna( value = self.BED_UNDEFINED_FIELD )
+        bed_add_df = bed_add_df.fillna( value = self.BED_UNDEFINED_FIELD )
         
-        SQLManagerPRO.get_instance().batch_insert_to_db( objects_to_insert = objects_to_insert,
-                                                         process = 'BED content' )
+        bed_lines = pd.DataFrame( { 'orf_id': bed_content_df[ 'id' ].values,
+                                    'bed_index': None,
+                                    'bed_col': self.join_columns( bed_df, self.BED_HEADER_LIST ).values,
+                                    'bed_add_col': self.join_columns( bed_add_df, self.BED_HEADER_ADD_LIST ).values },
+                                  columns = [ 'orf_id', 'bed_index', 'bed_col', 'bed_add_col' ] )
+        bed_lines[ 'orf_id' ] = bed_lines[ 'orf_id' ].astype( object )
         
+        return bed_lines
         
-    ## compute_color
-    #  -------------
-    #
-    # This is a static method allowing to compute the RGB color 
-    # to give to the feature depending on the ORF strand and 
-    # splicing status.
-    # 
-    # @param row: Pandas Series - A row from a Pandas data frame.
-    # 
-    # @return color: String <R,G,B>- The color at RGB format.
-    #
-    @staticmethod
-    def compute_color( row ):
-        
-        # Display the ORF in red if it is located on plus strand 
-        # and in blue if it is located on the minus strand
-        
-        # If the ORF is spliced but the start and end 
-        # positions of the exons are missing, 
-        # then display an intermediate color.
-        if ( row[ 'spliced' ] == True ):
-            if ( row[ 'strand' ] == '+' ):
-                return '255,100,0'
-            elif ( row[ 'strand' ] == '-' ):
-                return '0,200,255'
-            else:
-                return '0,0,0'
-        else:
-            return GenerateBEDContentStrategy.compute_color_from_strd( row[ 'strand' ] )
         
         
-        
-    ## compute_color_from_strd
-    #  -----------------------
+    ## compute_blocks
+    #  --------------
     #
-    # This is a static method allowing to compute the RGB color 
-    # to give to the feature depending on the ORF strand.
+    # This is a static method allowing to compute the values of the 'blockCount',
+    # 'blockSizes' and 'blockStarts' columns of spliced ORFs. The lists of exon 
+    # coordinates of all the ORFs are split and expanded into one row per exon at 
+    # once, and the exons are sorted by increasing position for each ORF.
     # 
-    # @param strd: String - The ORF strand.
+    # @param spliced_orfs_df: Pandas DataFrame - The data frame of spliced ORFs, with 
+    #                                            the 'start_pos', 'splice_starts' and
+    #                                            'splice_ends' columns.
     # 
-    # @return color: String <R,G,B>- The color at RGB format.
+    # @return 3-tuple - The ( block_counts, block_sizes, block_starts ) tuple, where:
+    #                       - block_counts: Numpy array - The number of blocks of each ORF.
+    #                       - block_sizes: Numpy array - The comma-separated lists of block sizes.
+    #                       - block_starts: Numpy array - The comma-separated lists of block 
+    #                                       starts (relative to the ORF start position).
     #
     @staticmethod
-    def compute_color_from_strd( strd ):
+    def compute_blocks( spliced_orfs_df ):
+        
+        import numpy as np
+        import pandas as pd
+        
+        # Split the lists of coordinates and expand them into one row per exon
+        exon_starts = spliced_orfs_df[ 'splice_starts' ].str.split( Constants.ORF_SPLICING_COORD_SEPARATOR )
+        exon_ends = spliced_orfs_df[ 'splice_ends' ].str.split( Constants.ORF_SPLICING_COORD_SEPARATOR )
+        
+        block_counts = exon_starts.str.len().values
+        orf_indexes = np.repeat( np.arange( spliced_orfs_df.shape[ 0 ] ), block_counts )
+        exon_starts = np.concatenate( exon_starts.values ).astype( np.int64 )
+        exon_ends = np.concatenate( exon_ends.values ).astype( np.int64 )
+        
+        # The exon coordinates of the ORFs located on the minus strand are 
+        # registered from the highest to the lowest position, hence get the 
+        # lowest and highest position of each exon and sort the exons by
+        # increasing position for each ORF
+        lowest_pos = np.minimum( exon_starts, exon_ends )
+        highest_pos = np.maximum( exon_starts, exon_ends )
+        exon_order = np.lexsort( ( lowest_pos, orf_indexes ) )
+        ( orf_indexes, lowest_pos, highest_pos ) = ( orf_indexes[ exon_order ], lowest_pos[ exon_order ], highest_pos[ exon_order ] )
+        
+        # Compute the sizes and the positions relative to the start position 
+        # (which may correspond to the actual stop of the ORF)
+        sizes = pd.Series( ( highest_pos - lowest_pos + 1 ).astype( str ) )
+        rel_starts = pd.Series( ( lowest_pos - spliced_orfs_df[ 'start_pos' ].values.astype( np.int64 )[ orf_indexes ] ).astype( str ) )
         
-        if ( strd == '+' ):
-            return GenerateBEDContentStrategy.BED_DEFAULT_RGB_PLUS_STRAND 
-        elif ( strd == '-' ):
-            return GenerateBEDContentStrategy.BED_DEFAULT_RGB_MINUS_STRAND
-        else:
-            return '0,0,0'
+        # Build the comma-separated lists for each ORF
+        block_sizes = sizes.groupby( orf_indexes, sort = True ).agg( lambda x: ','.join( x ) ).values
+        block_starts = rel_starts.groupby( orf_indexes, sort = True ).agg( lambda x: ','.join( x ) ).values
+        
+        return ( block_counts, block_sizes, block_starts )
         
         
         
-    ## compute_block_starts
-    #  --------------------
+    ## join_columns
+    #  ------------
     #
-    # This is a static method allowing to compute the value
-    # of the 'blockStarts' column for a row of the data 
-    # frame containing information related to spliced ORFs.
+    # This is a static method allowing to join the values of several 
+    # columns of a data frame into tab-separated strings.
     # 
-    # @param row: Pandas Series - A row from the 'spliced ORFs'
-    #                             Pandas data frame.
+    # @param df: Pandas DataFrame - The data frame.
+    # @param columns: List - The list of columns to join (in this order).
     # 
-    # @return block_starts: String - The blockStarts value.
+    # @return Pandas Series - The tab-separated strings.
     #
     @staticmethod
-    def compute_block_starts( row ):
-        
-        # Get the appropriate exon start positions, depending on the ORF strand
-        if ( row[ 'strand' ] == '+' ):
-            block_starts = row[ 'splice_starts' ].split( Constants.ORF_SPLICING_COORD_SEPARATOR )
-            
-        else:
-            block_starts = row[ 'splice_ends' ].split( Constants.ORF_SPLICING_COORD_SEPARATOR )
-            # Get the position in the increasing order
-            block_starts.reverse()
-            
-        # Compute the positions relative to the start position 
-        # (which may correspond to the actual stop of the ORF)
-        block_starts = map( lambda x: str( int( x ) - int( row[ 'start_pos' ] ) ),
-                            block_starts )
+    def join_columns( df, columns ):
         
-        # Build a string of the start positions
-        block_starts = ','.join( block_starts )
+        joined_columns = df[ columns[ 0 ] ].astype( str )
+        for col in columns[ 1: ]:
+            joined_columns = joined_columns + '\t' + df[ col ].astype( str )
         
-        return block_starts
+        return joined_columns
         
         
         
-    ## compute_block_sizes
-    #  -------------------
+    ## update_bed_indexes
+    #  ------------------
     #
-    # This is a static method allowing to compute the value
-    # of the 'blockSizes' column for a row of the data 
-    # frame containing information related to spliced ORFs.
+    # This method allows to compute the index of each line of the UTBEDContent 
+    # table, such as the lines are ordered by chromosome, then start and stop 
+    # positions, then name. Only the indexes that changed are updated.
     # 
-    # @param row: Pandas Series - A row from the 'spliced ORFs'
-    #                             Pandas data frame.
+    # @return Integer - The number of lines which index has been updated.
+    #
+    @RunTelemetry.timed_stage()
+    def update_bed_indexes( self ):
+        
+        import numpy as np
+        import pandas as pd
+        
+        bed_index_query = SQLManagerPRO.get_instance().get_session().query( 
+                                                                            UTBEDContent.orf_id,
+                                                                            UTBEDContent.bed_index,
+                                                                            ORF.chromosome,
+                                                                            ORF.start_pos,
+                                                                            ORF.stop_pos
+                                                                          ).filter( 
+                                                                                    UTBEDContent.orf_id == ORF.id 
+                                                                                  )
+        bed_index_df = pd.read_sql( bed_index_query.statement, 
+                                    SQLManagerPRO.get_instance().get_engine() )
+        SQLManagerPRO.get_instance().close_session()
+        
+        # Reorder the rows by chromosome, then start and stop positions, then ID.
+        # This allows the features to be ordered by (in this order):
+        # - Chromosome (chrom)
+        # - Start position (chromStart)
+        # - End position (chromEnd)
+        # - ID (name)
+        bed_index_df[ self.BED_HEADER_CHROM ] = 'chr' + bed_index_df[ 'chromosome' ].astype( str )
+        bed_index_df[ self.BED_HEADER_NAME ] = 'ORF' + bed_index_df[ 'orf_id' ].astype( str )
+        bed_index_df = bed_index_df.sort_values( by = [ self.BED_HEADER_CHROM,
+                                                        'start_pos',
+                                                        'stop_pos',
+                                                        self.BED_HEADER_NAME ] )
+        bed_index_df[ 'new_bed_index' ] = np.arange( bed_index_df.shape[ 0 ] )
+        
+        # Update the indexes that changed
+        bed_index_to_update = bed_index_df[ bed_index_df[ 'bed_index' ].isnull()
+                                            | ( bed_index_df[ 'bed_index' ] != bed_index_df[ 'new_bed_index' ] ) ]
+        
+        if ( bed_index_to_update.shape[ 0 ] != 0 ):
+            update_statement = UTBEDContent.__table__.update().where( 
+                                                                        UTBEDContent.__table__.c.orf_id == bindparam( 'b_orf_id' ) 
+                                                                    ).values( 
+                                                                                bed_index = bindparam( 'b_bed_index' ) 
+                                                                            )
+            with SQLManagerPRO.get_instance().get_engine().begin() as connection:
+                connection.execute( update_statement,
+                                    [ { 'b_orf_id': int( orf_id ), 'b_bed_index': int( bed_index ) } \
+                                      for ( orf_id, bed_index ) in zip( bed_index_to_update[ 'orf_id' ], 
+                                                                        bed_index_to_update[ 'new_bed_index' ] ) ] )
+        
+        return bed_index_to_update.shape[ 0 ]
+        
+        
+        
+    ## register_changed_orfs
+    #  ---------------------
+    #
+    # This is a static method allowing to register in the UTORFChangeLog table 
+    # the ORFs for which the information stored in the UTBEDContent table needs 
+    # to be refreshed. This method is expected to be called by the strategies 
+    # updating the ORFs or the information related to them (DeltaMerge, 
+    # AnnotateORF, ComputeKozakContext).
+    # NB: The ORFs already registered are ignored.
     # 
-    # @return block_sizes: String - The blockSizes value.
+    # @param orf_ids: List / Select - The list of IDs of the ORFs, or a subquery
+    #                                 returning these IDs.
+    # @param process: String - The name of the process registering the ORFs.
     #
     @staticmethod
-    def compute_block_sizes( row ):
+    def register_changed_orfs( orf_ids, process='Undefined process' ):
         
-        # Get the lists of start and end positions of the exons
-        sp_starts = map( int,
-                         row[ 'splice_starts' ].split( Constants.ORF_SPLICING_COORD_SEPARATOR ) )
-        sp_ends = map( int, 
-                       row[ 'splice_ends' ].split( Constants.ORF_SPLICING_COORD_SEPARATOR ) )
+        engine = SQLManagerPRO.get_instance().get_engine()
         
-        # Compute the genomic lengths of the exons
-        exon_lengths = []
-        for k in range( len( sp_starts ) ):
-            exon_lengths.append( str( abs( sp_ends[ k ] - sp_starts[ k ] ) + 1 ) )
+        # Make sure the UTORFChangeLog table exists (e.g. for the 
+        # databases that have been built prior to its addition)
+        UTORFChangeLog.__table__.create( bind = engine, 
+                                         checkfirst = True )
         
-        # Reverse the order of exons for the ORFs located on the minus strand
-        if ( row[ 'strand' ] == '-' ):
-            exon_lengths.reverse()
+        insert_statement = UTORFChangeLog.__table__.insert().prefix_with( 'OR IGNORE', dialect = 'sqlite' ).prefix_with( 'IGNORE', dialect = 'mysql' )
         
-        # Build a string of the exon lengths
-        block_sizes = ','.join( exon_lengths )
+        with engine.begin() as connection:
+            if isinstance( orf_ids, list ):
+                for min_bound in xrange( 0, len( orf_ids ), Constants.MAX_COUNT_TO_INSERT ):
+                    connection.execute( insert_statement,
+                                        [ { 'orf_id': orf_id } for orf_id in orf_ids[ min_bound : min_bound + Constants.MAX_COUNT_TO_INSERT ] ] )
+            else:
+                connection.execute( insert_statement.from_select( [ 'orf_id' ], orf_ids ) )
         
-        return block_sizes
-        
\ No newline at end of file
+        Logger.get_instance().debug( 'GenerateBEDContentStrategy.register_changed_orfs(): The ORFs' +
+                                     ' updated during ' + process + ' have been registered in the' +
+                                     ' UTORFChangeLog table.' )
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 
+import heapq
 import os
 import subprocess
-import pandas as pd
+from multiprocessing import cpu_count
+from pathos.multiprocessing import ProcessingPool as Pool
+from sqlalchemy import select, and_
 
 
 from fr.tagc.uorf.core.model.PRO import *
@@ -10,13 +13,16 @@ from fr.tagc.uorf.core.model.PRO import *
 from fr.tagc.uorf.core.execution.GenerateBEDContentStrategy import GenerateBEDContentStrategy
 from fr.tagc.uorf.core.util import DefaultTemporaryFolder
 from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
 from fr.tagc.uorf.core.util.sql.SQLManagerPRO import SQLManagerPRO
 from fr.tagc.uorf.core.util.sql import SQLConstants
 from fr.tagc.uorf.core.util.option.OptionManager import OptionManager
 from fr.tagc.uorf.core.util.option import OptionConstants
 from fr.tagc.uorf.core.util.general.FileHandlerUtil import FileHandlerUtil
+from fr.tagc.uorf.core.util.general.GeneralUtil import GeneralUtil
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
 
 
 # ===============================================================================
@@ -91,6 +97,12 @@ class GenerateBEDFileStrategy( GenerateBEDContentStrategy ):
     BED_FILE_EXTENSION = '.bed'
     BIGBED_FILE_EXTENSION = '.bb'
     
+    # Extension of the temporary files containing the lines of one chromosome
+    BED_CHUNK_FILE_EXTENSION = '.bed.tmp'
+    
+    # Extension of the chromosome sizes file
+    CHROM_SIZES_FILE_EXTENSION = '.chrom.sizes'
+    
     # BED Track line 
       # Items
     BED_TRACK_LINE_ITEM_NAME = 'name'
@@ -175,7 +187,10 @@ class GenerateBEDFileStrategy( GenerateBEDContentStrategy ):
     #     - track_line: Boolean - Should a trackline be added at the beginning of the file?
     #     - non_conv_chr: Boolean - Should the ORFs on "non conventional" chromosomes be removed from the file?
     #     - convert_bigbed: Boolean - Should the bed file be converted at bigBed format?
+    #     - thread_nb: Integer - The number of threads to use to write the BED file.
     #     - common_file_path: String - The file path common to Bed, BigBed and AS files (without extension hence).
+    #     - chrom_sizes_file_path: String - The path to the chromosome sizes file used for the bigBed conversion.
+    #     - bigbed_input_file_path: String - The path to the temporary BED file used for the bigBed conversion.
     #
     def __init__( self ):
         
@@ -214,10 +229,40 @@ class GenerateBEDFileStrategy( GenerateBEDContentStrategy ):
         # Should the file be converted at bigBed format?
         self.convert_bigbed = OptionManager.get_instance().get_option( OptionConstants.OPTION_CONVERT_TO_BIGBED, 
                                                                        not_none = False )
+        
+        # Get the number of threads available
+        self.thread_nb = OptionManager.get_instance().get_option( OptionConstants.OPTION_THREAD_NB, 
+                                                                  not_none = False )
+        available_thread_nb = cpu_count()
+        if self.thread_nb:
+            try:
+                self.thread_nb = int( self.thread_nb )
+            except:
+                raise DenCellORFException( 'GenerateBEDFileStrategy: The value provided for the number of threads' +
+                                           ' needs to be an integer (provided value: ' + 
+                                           str( self.thread_nb ) + ').' )
+            else:
+                if ( self.thread_nb < 1 ):
+                    raise DenCellORFException( 'GenerateBEDFileStrategy: The value provided for the number of threads' +
+                                               ' needs to be an integer greater than 1 (provided value: ' + 
+                                               str( self.thread_nb ) + ').' )
+                    
+                if ( self.thread_nb > available_thread_nb ):
+                    Logger.get_instance().info( 'The number of threads provided (' + str( self.thread_nb ) +
+                                                ') is greater than the number of threads actually' +
+                                                ' available(' +  str( available_thread_nb ) +
+                                                '). Hence, ' + str( available_thread_nb ) +
+                                                ' threads will be used to write the BED file.' )
+                    self.thread_nb = available_thread_nb
+        else:
+            self.thread_nb = available_thread_nb
             
         # Set the file path
         self.common_file_path = os.path.join( self.output_folder, self.filename )
         
+        self.chrom_sizes_file_path = None
+        self.bigbed_input_file_path = None
+        
     
     
     ## execute
@@ -240,12 +285,16 @@ class GenerateBEDFileStrategy( GenerateBEDContentStrategy ):
                                         '\n Error code: ' + LogCodes.ERR_SQL_SESSION + '.', e)
         SQLManagerPRO.get_instance().close_session()
         
-        # Compute the content of the UTBEDContent table if necessary
+        # Compute the content of the UTBEDContent table if necessary,
+        # otherwise refresh the lines of the ORFs updated since the 
+        # last computation of the content (if any)
         utbedcontent_count = SQLManagerPRO.get_instance().get_session().query( UTBEDContent ).count()
         SQLManagerPRO.get_instance().close_session()
         if ( self.generate_bed_content
              or ( utbedcontent_count == 0 ) ):
             self.compute_bed_content()
+        else:
+            self.compute_bed_content( incremental = True )
             
         # Create the BED file
         self.write_bed_file()
@@ -261,7 +310,16 @@ class GenerateBEDFileStrategy( GenerateBEDContentStrategy ):
     #
     # This method allows to create the bed file by querying 
     # the UTBEDContent table.
+    #
+    # The lines of each chromosome are written in a separate temporary file 
+    # (sorted by increasing index of the lines) by parallel processes, and 
+    # these files are then merged (k-way merge) into the BED file. If the 
+    # BED file has to be converted at the bigBed format, the file provided 
+    # to bedToBigBed is written during the same pass.
+    #
+    # @throw DenCellORFException: When the lines of a chromosome cannot be written.
     # 
+    @RunTelemetry.timed_stage()
     def write_bed_file( self ):
         
         Logger.get_instance().info( 'Starting to build the BED file.' )
@@ -305,59 +363,63 @@ class GenerateBEDFileStrategy( GenerateBEDContentStrategy ):
                 header_list.append( str( specifier ) + '=' + str( val ) )
         header = 'track ' + ' '.join( header_list )
         
-        # If necessary, create an empty file and 
-        # add the track line at its beginning
-        if self.track_line:            
-            # Create the BED file with the header
-            try:
-                with open( bed_file_path, 'w' ) as bed_file:
-                    bed_file.write( header + '\n' )
-            except Exception as e:
-                raise DenCellORFException( 'GenerateBEDFileStrategy.execute(): An error occurred trying' +
-                                           ' to create the BED file at ' + bed_file_path + 
-                                           ' and/or writing the BED header', e )
-            else:
-                Logger.get_instance().debug( 'GenerateBEDFileStrategy.execute(): ' + 
-                                             ' An empty BED file have been created at ' + 
-                                             bed_file_path + '.' )
-            bed_file_writting_mode = 'a'
-            
-        else:
+        if ( not self.track_line ):
             Logger.get_instance().info( 'The following track line may be used in genomic browsers:\n' + 
                                         header )
-            bed_file_writting_mode = 'w'
         
         
-        # Get BED file content
-        # --------------------
+        # Write the lines of each chromosome
+        # ----------------------------------
         
-        Logger.get_instance().debug( 'Starting to compute the BED lines.' )
-        
-        if self.extend_bed:
-            bed_full_content_query = SQLManagerPRO.get_instance().get_session().query( 
-                                                                                        UTBEDContent.bed_col,
-                                                                                        UTBEDContent.bed_add_col
-                                                                                      )
-        else:
-            bed_full_content_query = SQLManagerPRO.get_instance().get_session().query(  
-                                                                                        UTBEDContent.bed_col
-                                                                                      )
+        Logger.get_instance().debug( 'Starting to write the BED lines of each chromosome.' )
         
+        # Get the list of chromosomes.
         # By default, exclude all the ORFs with "non conventional" chromosomes 
         # (i.e. mitochondrial chromosome and scaffolds)
+        chromosomes_query = SQLManagerPRO.get_instance().get_session().query( 
+                                                                                ORF.chromosome 
+                                                                            ).filter( 
+                                                                                        UTBEDContent.orf_id == ORF.id 
+                                                                                    )
         if ( not self.non_conv_chr ):
-            bed_full_content_query = bed_full_content_query.filter( 
-                                                                        ORF.chromosome.in_( self.AUTHORIZED_CHR_LIST ),
-                                                                        UTBEDContent.orf_id == ORF.id 
-                                                                    )
-            
-        # Reorder the rows by index
-        bed_full_content_query = bed_full_content_query.order_by( UTBEDContent.bed_index )
-        
-        # Get the BED lines and store them in a data frame
-        bed_full_content = bed_full_content_query.all()
+            chromosomes_query = chromosomes_query.filter( ORF.chromosome.in_( self.AUTHORIZED_CHR_LIST ) )
+        chromosomes = sorted( GeneralUtil.query_result_to_list( chromosomes_query.distinct().all() ) )
         SQLManagerPRO.get_instance().close_session()
         
+        if ( not os.path.isdir( DefaultTemporaryFolder.TEMPORARY_FOLDER ) ):
+            os.makedirs( DefaultTemporaryFolder.TEMPORARY_FOLDER )
+        
+        args_for_write = [ ( self.db_settings,
+                             chromosome,
+                             self.extend_bed,
+                             os.path.join( DefaultTemporaryFolder.TEMPORARY_FOLDER,
+                                           self.filename + '_chr' + chromosome + self.BED_CHUNK_FILE_EXTENSION ) ) \
+                           for chromosome in chromosomes ]
+        chunk_file_paths = [ args[ 3 ] for args in args_for_write ]
+        
+        thread_nb = min( self.thread_nb, max( len( args_for_write ), 1 ) )
+        Logger.get_instance().debug( 'GenerateBEDFileStrategy.write_bed_file(): The lines of ' + 
+                                     str( len( args_for_write ) ) + ' chromosomes will be written using ' + 
+                                     str( thread_nb ) + ' processes.' )
+        
+        if ( thread_nb > 1 ):
+            p = Pool( thread_nb )
+            results = p.map( GenerateBEDFileStrategy.write_chromosome_bed_file, args_for_write )
+            p.close()
+            # Wait for all processes to be completed
+            p.join()
+            # Delete the pool instance
+            p.clear()
+        else:
+            results = map( GenerateBEDFileStrategy.write_chromosome_bed_file, args_for_write )
+        
+        for ( chromosome, line_count, error_message ) in results:
+            if ( error_message != None ):
+                GenerateBEDFileStrategy.remove_files( chunk_file_paths )
+                raise DenCellORFException( 'GenerateBEDFileStrategy.write_bed_file(): An error occurred trying' +
+                                           ' to write the BED lines of the chromosome ' + chromosome + ': ' +
+                                           error_message + '\n Error code: ' + LogCodes.ERR_FILEHAND + '.' )
+        
         
         # Write the BED file
         # ------------------
@@ -367,89 +429,225 @@ class GenerateBEDFileStrategy( GenerateBEDContentStrategy ):
         if self.extend_bed:
             autosql_file_path = self.common_file_path + GenerateBEDFileStrategy.AUTOSQL_FILE_EXTENSION
             with open( autosql_file_path, 'w' ) as autosql_file:
-                autosql_file.write( GenerateBEDFileStrategy.AUTOSQL_FILE_CONTENT )        
+                autosql_file.write( GenerateBEDFileStrategy.AUTOSQL_FILE_CONTENT )
+        
+        # If the file has to be converted at bigBed format, write at the same 
+        # time the BED file that will be provided to bedToBigBed, i.e. without
+        # track line, without the lines located on chromosomes missing from the 
+        # chromosome sizes file and without strings exceeding 255 characters
+        if self.convert_bigbed:
+            chrom_sizes = self.write_chrom_sizes_file( current_annot_ucsc )
+            self.bigbed_input_file_path = os.path.join( DefaultTemporaryFolder.TEMPORARY_FOLDER,
+                                                        self.filename + '_wo_trackline' + self.BED_FILE_EXTENSION )
+            bigbed_input_file = open( self.bigbed_input_file_path, 'w' )
+        else:
+            bigbed_input_file = None
+        excluded_line_count = 0
         
+        # Merge the files of the chromosomes, such as the lines are 
+        # sorted by chromosome, then start and end positions, then name
+        try:
+            with open( bed_file_path, 'w' ) as bed_file:
+                
+                # If necessary, add the track line at the beginning of the file
+                if self.track_line:
+                    bed_file.write( header + '\n' )
+                
+                for ( sort_key, line ) in heapq.merge( *[ GenerateBEDFileStrategy.read_bed_chunk_file( file_path ) \
+                                                          for file_path in chunk_file_paths ] ):
+                    bed_file.write( line )
+                    
+                    if bigbed_input_file:
+                        if ( sort_key[ 0 ] not in chrom_sizes ):
+                            excluded_line_count += 1
+                            continue
+                        
+                        # Remove the strings exceeding 255 characters in the bed file
+                        # as BigBed do not allow to store strings longer than this
+                        if self.extend_bed:
+                            spl_line = line.rstrip( '\n' ).split( '\t' )
+                            spl_line_end = map( lambda x: x if len( x ) <= 255 else self.BIGBED_TOO_LONG_STR,
+                                                spl_line[ 12: ] )
+                            line = '\t'.join( spl_line[ :12 ] + spl_line_end ) + '\n'
+                        
+                        bigbed_input_file.write( line )
         
-        # Register the content of the BED file data frame into the file
-        with open( bed_file_path, bed_file_writting_mode ) as bed_file:
-            for bed_line in bed_full_content:
-                if self.extend_bed:
-                    bed_file.write( '\t'.join( [ bed_line[ 0 ],
-                                                 bed_line[ 1 ] ] ) + '\n' )
-                else:
-                    bed_file.write( bed_line[ 0 ] + '\n' )
+        except Exception as e:
+            raise DenCellORFException( 'GenerateBEDFileStrategy.write_bed_file(): An error occurred trying' +
+                                       ' to write the BED file at ' + bed_file_path + '.' +
+                                       '\n Error code: ' + LogCodes.ERR_FILEHAND + '.', e )
+        
+        finally:
+            if bigbed_input_file:
+                bigbed_input_file.close()
+            GenerateBEDFileStrategy.remove_files( chunk_file_paths )
+        
+        if ( excluded_line_count != 0 ):
+            Logger.get_instance().warning( str( excluded_line_count ) + ' lines of the BED file are located on' +
+                                           ' chromosomes missing from the chromosome sizes file (' +
+                                           self.chrom_sizes_file_path + '). Hence, they will not be included' +
+                                           ' in the bigBed file.' +
+                                           ' Warning code: ' + LogCodes.WARN_BED_CHROM_SIZES + '.' )
         
         Logger.get_instance().info( 'The BED file has been successfully generated and stored in the ' +
                                     self.output_folder + ' directory.' )
         
         
         
-    ## convert_bed_to_bigbed
-    #  ---------------------
+    ## write_chromosome_bed_file
+    #  -------------------------
     #
-    # This method allows to convert the bed file at the bigBed format.
+    # This is a static method that allows to write in a file the BED lines of 
+    # all the ORFs located on a chromosome, sorted by increasing index. It is 
+    # expected to be run in a separate process.
     #
-    def convert_bed_to_bigbed( self ):
+    # @param args: Tuple - The tuple of arguments, containing:
+    #                          - db_settings: Dictionary - The settings of the database.
+    #                          - chromosome: String - The name of the chromosome.
+    #                          - extend_bed: Boolean - Should the additional columns be written?
+    #                          - file_path: String - The path to the file.
+    #
+    # @return 3-tuple - The ( chromosome, line_count, error_message ) tuple, where:
+    #                       - chromosome: String - The name of the chromosome.
+    #                       - line_count: Integer - The number of lines written.
+    #                       - error_message: String - The message of the error that occurred,
+    #                                        None if the file has been successfully written.
+    #
+    @staticmethod
+    def write_chromosome_bed_file( args ):
         
-        Logger.get_instance().info( 'Starting to convert the Bed file into bigBed format.' )
+        ( db_settings, chromosome, extend_bed, file_path ) = args
         
-        # Get the appropriate UCSC genome version
-        current_annotation = SQLManagerPRO.get_instance().get_session().query( 
-                                                                                PROMetadata.value 
-                                                                               ).filter(
-                                                                                            PROMetadata.parameter == Constants.METATABLE_CURRENT_ANNOTATION
-                                                                                        ).one()
-        ucsc_genome_version = Constants.CORRESPONDING_UCSC_FROM_NCBI[ current_annotation[ 0 ] ]
-        
-        # Fetch the chromosome sizes file from UCSC
-        chrom_sizes_file_path = os.path.join( self.output_folder, 
-                                              ucsc_genome_version + '.chrom.sizes' )
-        
-        if ( not os.path.exists( chrom_sizes_file_path ) ):
-            fetch_command = [ 'fetchChromSizes', ucsc_genome_version ]
+        line_count = 0
+        
+        try:
+            # Use a new SQLManager instance, such as each process
+            # uses its own connection to the database
+            sqlmanager = SQLManagerPRO()
+            sqlmanager.set_db_settings( db_settings )
+            
+            if extend_bed:
+                bed_columns = [ UTBEDContent.bed_col, UTBEDContent.bed_add_col ]
+            else:
+                bed_columns = [ UTBEDContent.bed_col ]
             
-            with open( chrom_sizes_file_path, 'w' ) as chrom_sizes_file:
-                fetchchr = subprocess.Popen( fetch_command, 
-                                             stdout = chrom_sizes_file, 
-                                             stderr = subprocess.PIPE )
-                ( stdout, stderr ) = fetchchr.communicate()
+            bed_content_statement = select( bed_columns ).where( 
+                                                                    and_( UTBEDContent.orf_id == ORF.id,
+                                                                          ORF.chromosome == chromosome ) 
+                                                                ).order_by( 
+                                                                            UTBEDContent.bed_index 
+                                                                          )
             
-            if ( stderr != '' ):
-                Logger.get_instance().debug( 'GenerateBEDFileStrategy.convert_bed_to_bigbed(): The command ' +
-                                             ' '.join( fetch_command ) + 'returned the message:\n' + 
-                                             stderr )
-            Logger.get_instance().debug( 'The chromosome sizes file has been saved in ' + chrom_sizes_file_path + '.' )
+            connection = sqlmanager.get_engine().connect().execution_options( stream_results = True )
+            try:
+                with open( file_path, 'w' ) as chunk_file:
+                    for bed_line in connection.execute( bed_content_statement ):
+                        chunk_file.write( '\t'.join( bed_line ) + '\n' )
+                        line_count += 1
+            finally:
+                connection.close()
+                sqlmanager.get_engine().dispose()
         
-        else:
-            Logger.get_instance().debug( 'The chromosome sizes file located at ' + chrom_sizes_file_path + 
-                                         ' will be used to perform the conversion.' )
+        except Exception as e:
+            return ( chromosome, line_count, str( e ) )
         
-        # Copy the bed file and remove the track line if necessary
-        bed_file_path = self.common_file_path + self.BED_FILE_EXTENSION
-        tmp_bed_file_path = os.path.join( DefaultTemporaryFolder.TEMPORARY_FOLDER,
-                                          self.filename + '_wo_trackline' + self.BED_FILE_EXTENSION )
+        return ( chromosome, line_count, None )
+        
+        
+        
+    ## read_bed_chunk_file
+    #  -------------------
+    #
+    # This is a static method that allows to read the lines of a file
+    # written by the write_chromosome_bed_file() method, together with
+    # the key to use to sort them (chromosome, start and end positions, name).
+    #
+    # @param file_path: String - The path to the file.
+    #
+    # @return Generator - A generator of ( sort_key, line ) tuples.
+    #
+    @staticmethod
+    def read_bed_chunk_file( file_path ):
+        
+        with open( file_path, 'r' ) as chunk_file:
+            for line in chunk_file:
+                ( chrom, chrom_start, chrom_end, name ) = line.split( '\t', 4 )[ :4 ]
+                yield ( ( chrom, int( chrom_start ), int( chrom_end ), name ), line )
+        
+        
+        
+    ## remove_files
+    #  ------------
+    #
+    # This is a static method that allows to remove a list of temporary files.
+    #
+    # @param file_paths: List - The list of paths to the files.
+    #
+    @staticmethod
+    def remove_files( file_paths ):
+        
+        for file_path in file_paths:
+            if os.path.exists( file_path ):
+                os.remove( file_path )
+        
+        
+        
+    ## write_chrom_sizes_file
+    #  ----------------------
+    #
+    # This method allows to get the chromosome sizes file necessary to convert 
+    # the BED file at the bigBed format. If such a file does not yet exist in 
+    # the output folder, it is created using the chromosome sizes of the UCSC 
+    # assembly registered in the Constants.
+    #
+    # @param ucsc_genome_version: String - The UCSC assembly (e.g. hg38, mm10).
+    #
+    # @return chrom_sizes: Set - The set of chromosomes registered in the file.
+    #
+    # @throw DenCellORFException: When the chromosome sizes of the assembly are not known.
+    #
+    @RunTelemetry.timed_stage()
+    def write_chrom_sizes_file( self, ucsc_genome_version ):
+        
+        self.chrom_sizes_file_path = os.path.join( self.output_folder, 
+                                                   ucsc_genome_version + self.CHROM_SIZES_FILE_EXTENSION )
         
-        with open( bed_file_path, 'r' ) as bed_file, \
-             open( tmp_bed_file_path, 'w' ) as tmp_bed_file:
+        if os.path.exists( self.chrom_sizes_file_path ):
+            Logger.get_instance().debug( 'The chromosome sizes file located at ' + self.chrom_sizes_file_path + 
+                                         ' will be used to perform the conversion.' )
+            with open( self.chrom_sizes_file_path, 'r' ) as chrom_sizes_file:
+                chrom_sizes = set( [ line.split( '\t' )[ 0 ] for line in chrom_sizes_file if ( line.strip() != '' ) ] )
+        
+        else:
+            if ( ucsc_genome_version not in Constants.UCSC_CHROM_SIZES.keys() ):
+                raise DenCellORFException( 'GenerateBEDFileStrategy.write_chrom_sizes_file(): The sizes of the' +
+                                           ' chromosomes of the ' + ucsc_genome_version + ' assembly are not' +
+                                           ' known. Please provide the chromosome sizes file at ' + 
+                                           self.chrom_sizes_file_path + '.' )
             
-            if ( self.track_line ):
-                line = bed_file.readline()
+            with open( self.chrom_sizes_file_path, 'w' ) as chrom_sizes_file:
+                for ( chrom, chrom_size ) in Constants.UCSC_CHROM_SIZES[ ucsc_genome_version ]:
+                    chrom_sizes_file.write( chrom + '\t' + str( chrom_size ) + '\n' )
+            chrom_sizes = set( [ chrom for ( chrom, chrom_size ) in Constants.UCSC_CHROM_SIZES[ ucsc_genome_version ] ] )
             
-            line = bed_file.readline()
-            while ( line != '' ):
-                # Remove the strings exceeding 255 characters in the bed file
-                # as BigBed do not allow to store strings longer than this
-                if self.extend_bed:
-                    spl_line = line.split( '\t' )
-                    spl_line_start = spl_line[ :12 ]
-                    spl_line_end = map( lambda x: x if len( x ) <= 255 else self.BIGBED_TOO_LONG_STR,
-                                        spl_line[ 12: ] )
-                    line = '\t'.join( spl_line_start + spl_line_end )
-                
-                tmp_bed_file.write( line )
-                line = bed_file.readline()
+            Logger.get_instance().debug( 'The chromosome sizes file has been saved in ' + self.chrom_sizes_file_path + '.' )
+        
+        return chrom_sizes
         
         
+        
+    ## convert_bed_to_bigbed
+    #  ---------------------
+    #
+    # This method allows to convert the bed file at the bigBed format,
+    # using the file written for this purpose by the write_bed_file() 
+    # method.
+    #
+    @RunTelemetry.timed_stage()
+    def convert_bed_to_bigbed( self ):
+        
+        Logger.get_instance().info( 'Starting to convert the Bed file into bigBed format.' )
+        
         # Convert the bed file into bigBed format
         bigbed_file_path = self.common_file_path + self.BIGBED_FILE_EXTENSION
         
@@ -457,11 +655,11 @@ class GenerateBEDFileStrategy( GenerateBEDContentStrategy ):
             bed_to_bigbed_command = [ 'bedToBigBed', '-type=bed12+5', 
                                       '-as=' + self.common_file_path + GenerateBEDFileStrategy.AUTOSQL_FILE_EXTENSION,
                                       '-extraIndex=name,transcripts,cell_types,orf_annotations,kozak_contexts',
-                                      tmp_bed_file_path, chrom_sizes_file_path, bigbed_file_path ]
+                                      self.bigbed_input_file_path, self.chrom_sizes_file_path, bigbed_file_path ]
             
             
         else:
-            bed_to_bigbed_command = [ 'bedToBigBed', tmp_bed_file_path, chrom_sizes_file_path, bigbed_file_path ]
+            bed_to_bigbed_command = [ 'bedToBigBed', self.bigbed_input_file_path, self.chrom_sizes_file_path, bigbed_file_path ]
         
         bed_to_bigbed = subprocess.Popen( bed_to_bigbed_command, 
                                           stdout = subprocess.PIPE, 
@@ -473,6 +671,7 @@ class GenerateBEDFileStrategy( GenerateBEDContentStrategy ):
                                          ' '.join( bed_to_bigbed_command ) + 'returned the message:\n' + 
                                          stderr )
         
+        GenerateBEDFileStrategy.remove_files( [ self.bigbed_input_file_path ] )
+        
         Logger.get_instance().info( 'The BigBed file has been successfully generated and stored in the ' +
                                     self.output_folder + ' directory.' )
-        
\ No newline at end of file
@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
 
 import os
+import re
 import pandas as pd
 
 
 from fr.tagc.uorf.core.model.PRO import *
 
 from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
 from fr.tagc.uorf.core.util.sql.SQLManagerPRO import SQLManagerPRO
 from fr.tagc.uorf.core.util.sql import SQLConstants
 from fr.tagc.uorf.core.util.option.OptionManager import OptionManager
@@ -14,8 +16,10 @@ from fr.tagc.uorf.core.util.option import OptionConstants
 from fr.tagc.uorf.core.util.genetics import GeneticsConstants
 from fr.tagc.uorf.core.util.general.GeneralUtil import GeneralUtil
 from fr.tagc.uorf.core.util.general.FileHandlerUtil import FileHandlerUtil
+from fr.tagc.uorf.core.util.general.IndexedFastaWriter import IndexedFastaWriter
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
 
 
 
@@ -67,6 +71,10 @@ from fr.tagc.uorf.core.util.log.Logger import Logger
 #             - The version of the database (when available). e.g. release=1.1
 #
 # - The following line(s) contains the sequence, split every 60 characters
+#
+# By default, the FASTA file is block-gzipped (BGZF, '.fasta.gz' extension) and
+# written along with its '.fai' and '.gzi' indexes, allowing the sequences to be
+# randomly accessed (e.g. using samtools faidx).
 
 
 
@@ -83,6 +91,11 @@ from fr.tagc.uorf.core.util.log.Logger import Logger
 # the information contained either in the ORF table or in the 
 # ORFTranscriptAsso table of the PRO database.
 #
+# The entries are fetched by chunks using a server-side cursor, and the
+# headers are computed and the stop codons searched for a whole chunk
+# at once, such as the memory usage does not depend on the size of the 
+# database.
+#
 class GenerateFastaFileStrategy( object ):
     
     ## Class variables
@@ -125,6 +138,7 @@ class GenerateFastaFileStrategy( object ):
     #                          'PROT' for amino acid sequences). 
     #     - table_type: String - The name of the table to query ('ORF' or 'OTA') 
     #                            to get the sequences.
+    #     - uncompressed: Boolean - Should a plain text FASTA file be written?
     # 
     def __init__( self ):
         
@@ -182,6 +196,10 @@ class GenerateFastaFileStrategy( object ):
         # Get the option allowing to generate long headers
         self.long_header = OptionManager.get_instance().get_option( OptionConstants.OPTION_FASTA_LONG_HEADERS,
                                                                     not_none = False )        
+        
+        # Get the option allowing to write a plain text FASTA file
+        self.uncompressed = OptionManager.get_instance().get_option( OptionConstants.OPTION_FASTA_UNCOMPRESSED,
+                                                                     not_none = False )
     
         
     
@@ -256,7 +274,7 @@ class GenerateFastaFileStrategy( object ):
                                                                                 eval( 'ORF.' + self.seq_attribute_name ) 
                                                                                ).filter(
                                                                                             eval( 'ORF.' + self.seq_attribute_name ) != None
-                                                                                        )
+                                                                                        ).order_by( ORF.id )
                 
         else:
             # Get the necessary information from the ORFTranscriptAsso table
@@ -269,129 +287,113 @@ class GenerateFastaFileStrategy( object ):
                                                                                 eval( 'ORFTranscriptAsso.' + self.seq_attribute_name )
                                                                                ).filter(
                                                                                             eval( 'ORFTranscriptAsso.' + self.seq_attribute_name ) != None
-                                                                                        )
+                                                                                        ).order_by( ORFTranscriptAsso.id )
         
-        # Run the query and get the results as a Pandas data frame
-        all_orfs_df = pd.read_sql( all_orfs_query.statement,
-                                   SQLManagerPRO.get_instance().get_engine() )
-        SQLManagerPRO.get_instance().close_session()
+        # Run the query and get the results by chunks of Pandas data frames, 
+        # using a server-side cursor, and write the sequences in the file
+        fasta_writer = IndexedFastaWriter( file_path = file_path,
+                                           line_length = self.MAX_SEQ_LINE_LENGTH,
+                                           compress = ( not self.uncompressed ) )
+        total_sqce_count = 0
+        connection = SQLManagerPRO.get_instance().get_engine().connect().execution_options( stream_results = True )
+        
+        try:
+            with RunTelemetry.get_instance().stage( 'write_fasta_sequences' ):
+                for all_orfs_df in pd.read_sql( all_orfs_query.statement,
+                                                connection,
+                                                chunksize = Constants.FASTA_CHUNK_SIZE ):
+                
+                    total_sqce_count += all_orfs_df.shape[0]
+                    RunTelemetry.get_instance().add_rows( all_orfs_df.shape[0] )
+                
+                    # If the excludeSqcesWithStop option has been selected, 
+                    # then exclude from the data frame all the sequences 
+                    # that contains at least a stop
+                    if self.exclude_sqce_with_stops:
+                        contains_stop_codon = self.check_stop_codons_in_sqces( all_orfs_df[ self.seq_attribute_name ],
+                                                                               seq_type = self.seq_type )
+                        all_orfs_df = all_orfs_df[ ~ contains_stop_codon ]
+                
+                    # Build the strings that will be used 
+                    # as header lines in the FASTA file
+                    headers = self.generate_headers( all_orfs_df,
+                                                     taxon_sc_name = taxon_sc_name, 
+                                                     taxon_code = taxon_code,
+                                                     taxon_id = str( taxon_id ), 
+                                                     table = self.table_type,
+                                                     db_release = db_release,
+                                                     long_header = self.long_header )
+                
+                    # Write the sequences in the FASTA file
+                    for ( header, sequence ) in zip( headers.tolist(), all_orfs_df[ self.seq_attribute_name ].tolist() ):
+                        fasta_writer.write_sequence( header, sequence )
+                    
+        except:
+            fasta_writer.abort()
+            raise
+        
+        finally:
+            connection.close()
+            SQLManagerPRO.get_instance().close_session()
         
         # Check the query returned a result
-        total_sqce_count = all_orfs_df.shape[0]
         if ( total_sqce_count == 0 ):
+            fasta_writer.abort()
             raise DenCellORFException( 'It seems that the database you are querying do not contain any' +
                                        ' entry with sequence (' + self.seq_type + ') in its ' + 
                                        self.table_type + ' table. Hence, the generation of the fasta file' +
                                        ' has been stopped.' )
         
-        all_orfs_df = all_orfs_df.astype( str )
-        
-        # If the excludeSqcesWithStop option has been selected, 
-        # then exclude from the data frame all the sequences 
-        # that contains at least a stop, then remove it
-        if self.exclude_sqce_with_stops:
-            contains_stop_codon = all_orfs_df.apply( self.check_stop_codons_in_sqce,
-                                                     seq_type = self.seq_type,
-                                                     seq_attribute_name = self.seq_attribute_name,
-                                                     axis=1 ).to_frame()
-            contains_stop_codon = contains_stop_codon.rename( columns = { 0: 'contains_stop_codon' } )
-            all_orfs_df = pd.concat( [ all_orfs_df, contains_stop_codon ],
-                                     axis = 1 )
+        fasta_writer.close()
             
-            # Extract from the data frame the ORF for which the sequence
-            # do not contains stop codons
-            all_orfs_df = all_orfs_df[ all_orfs_df.contains_stop_codon == False ]
-            
-            Logger.get_instance().info( str( total_sqce_count - all_orfs_df.shape[0] ) +
+        if self.exclude_sqce_with_stops:
+            Logger.get_instance().info( str( total_sqce_count - fasta_writer.sequence_count ) +
                                         ' sequences (/' + str( total_sqce_count ) + 
                                         ') have been removed as they were containing stop codons' )
-            
-        
-        # For each row, build a string that will be used 
-        # as header line in the FASTA file
-        header = all_orfs_df.apply( self.generate_header, 
-                                    axis=1,
-                                    taxon_sc_name = taxon_sc_name, 
-                                    taxon_code = taxon_code,
-                                    taxon_id = str( taxon_id ), 
-                                    table = self.table_type,
-                                    db_release = db_release,
-                                    long_header = self.long_header ).to_frame()
-        header = header.rename( columns = { 0: 'header' } )
-        all_orfs_df = pd.concat( [ all_orfs_df, header ],
-                                 axis = 1 )
-
-        # Write the FASTA file one line at a time
-        with open( file_path, 'w' ) as fasta_file:
-    
-            for ( index, row ) in all_orfs_df.iterrows():
-                                
-                # Write the header line
-                fasta_file.write( '>' + row[ 'header' ] + '\n' )
                 
-                # Write the sequence line(s)
-                  # Split the sequence if it has to be written on several lines
-                full_seq = row[ self.seq_attribute_name ]
-                seq = '\n'.join( [ full_seq[ k : k + self.MAX_SEQ_LINE_LENGTH ] for k in range( 0, len( full_seq ), self.MAX_SEQ_LINE_LENGTH ) ] )
-                  # Write the sequence line(s)
-                fasta_file.write( seq + '\n' )
-                
-        Logger.get_instance().info( 'The fasta file has been created at ' + file_path + '.' )
+        Logger.get_instance().info( 'The fasta file has been created at ' + fasta_writer.file_path + '.' )
                 
         
         
         
-    ## check_stop_codons_in_sqce
-    #  -------------------------
+    ## check_stop_codons_in_sqces
+    #  --------------------------
     #
-    # This is a static method allowing to check if a a sequence
-    # contains stop codons.
+    # This is a static method allowing to check if sequences
+    # contain stop codons.
     # 
-    # @param row: Pandas Series - A row from the ORF Pandas data frame.
+    # @param sqces: Pandas Series - The sequences.
     # @param seq_type: String - The type of sequence (DNA or PROT).
-    # @param seq_attribute_name: String - The name of the attribute 
-    #                                     containing the sequence.
     # 
-    # @return stop_in_seq: Boolean - True if the sequence contains a stop codon.
+    # @return Pandas Series - A Series of booleans, True when 
+    #                         the sequence contains a stop codon.
     #
     @staticmethod
-    def check_stop_codons_in_sqce( row, seq_type, seq_attribute_name ):
-        
-        seq = row[ seq_attribute_name ]
+    def check_stop_codons_in_sqces( sqces, seq_type ):
         
         if seq_type == Constants.SEQUENCE_TYPE_PROT:
-            stop_codons_list = [ GeneticsConstants.STOP_CODON ]
+            return sqces.str.contains( GeneticsConstants.STOP_CODON, regex = False )
+        
         else:
-            stop_codons_list = GeneticsConstants.STOP_CODON_SEQUENCES
-            
-            # As the stop codons have to be found in the same frame than
-            # the start codon, split the sequence into a list of 
-            # 3-characters strings
-            seq = [ seq[ k : k+3 ] for k in range( 0, len( seq ), 3 ) ]
-            
-            # Exclude of the list the last codon of the list, 
-            # as it is expected to be a stop codon
-            seq = seq[ :-1 ]
-        
-        stop_in_seq = False
-        k = 0
-        while ( ( not stop_in_seq ) and ( k < len( stop_codons_list ) ) ):
-            stop = stop_codons_list[ k ]
-            if stop in seq:
-                stop_in_seq = True
-            k += 1
-            
-        return stop_in_seq
+            # As the stop codons have to be found in the same frame than the 
+            # start codon, look for stop codons preceded by complete codons only.
+            # The last codon of the sequence is excluded, as it is expected 
+            # to be a stop codon (hence, a stop codon has to be followed by at 
+            # least one nucleotide to be taken into account)
+            stop_in_frame_regex = ( '^(?:.{3})*?(?:' + 
+                                    '|'.join( [ re.escape( stop ) for stop in GeneticsConstants.STOP_CODON_SEQUENCES ] ) +
+                                    ').' )
+            return sqces.str.contains( stop_in_frame_regex, regex = True )
         
         
         
-    ## generate_header
-    #  ---------------
+    ## generate_headers
+    #  ----------------
     #
     # This is a static method allowing to compute 
-    # the header of a sequence.
+    # the headers of several sequences at once.
     # 
-    # @param row: Pandas Series - A row from the ORF Pandas data frame.
+    # @param df: Pandas DataFrame - The data frame of ORF (or ORFTranscriptAsso) entries.
     # @param taxon_sc_name: String - The species scientific full name (e.g. Homo sapiens).
     # @param taxon_code: String - The taxonomic code (e.g. HUMAN).
     # @param taxon_id: String - The taxonomic ID (e.g. 9606).
@@ -399,45 +401,41 @@ class GenerateFastaFileStrategy( object ):
     # @param db_release: String - The database version number.
     # @param long_header: Boolean - Should long headers be generated?
     # 
-    # @return header: String - The header value.
+    # @return header: Pandas Series - The header values.
     #
     @staticmethod
-    def generate_header( row, taxon_sc_name, taxon_code, taxon_id, table, db_release, long_header ):
+    def generate_headers( df, taxon_sc_name, taxon_code, taxon_id, table, db_release, long_header ):
         
-        header = [ GenerateFastaFileStrategy.FASTA_SOURCE_NAME ]
-        
-        # Define each part of the header
+        # Define the three first parts of the header
         if ( table == GenerateFastaFileStrategy.ORF_TABLE ):
-            header += [ 'ORF' + row[ 'id' ],
-                        'ORF' + row[ 'id' ] + '_' + taxon_code,
-                        'OS=' + taxon_sc_name,
-                        'OX=' + taxon_id,
-                        'chr=' + row[ 'chromosome' ],
-                        'strand=' + row[ 'strand' ],
-                        'start_pos=' + row[ 'start_pos' ],
-                        'stop_pos=' + row[ 'stop_pos' ],
-                        'exons=' + row[ 'spliced_parts_count' ] ]
-        
+            ids = 'ORF' + df[ 'id' ].astype( str )
         else:
-            header += [ 'OTA' + row[ 'id' ],
-                        'OTA' + row[ 'id' ] + '_' + taxon_code,
-                        'OS=' + taxon_sc_name,
-                        'OX=' + taxon_id,
-                        'rel_start_pos=' + row[ 'rel_start_pos' ],
-                        'rel_stop_pos=' + row[ 'rel_stop_pos' ],
-                        'orf_id=' + row[ 'orf_id' ],
-                        'transcript_id=' + row[ 'transcript_id' ] ]
-        
-        # Add the database url and version number if available
-        header += [ 'database=' + Constants.PROJECT_NAME,
-                    'url=' + Constants.WEBSITE_URL ]
-        if ( db_release ):
-            header.append( 'release=' + db_release )  
-        
-        # Convert the header into a string
-        header_string = '|'.join( header[0:3] )
-        if long_header:
-            header_string += ' ' + ' '.join( header[3:] )
+            ids = 'OTA' + df[ 'id' ].astype( str )
+            
+        header = GenerateFastaFileStrategy.FASTA_SOURCE_NAME + '|' + ids + '|' + ids + '_' + taxon_code
         
-        return header_string
-    
\ No newline at end of file
+        # Add the other parts of the header
+        if long_header:
+            header = header + ' OS=' + taxon_sc_name + ' OX=' + taxon_id
+            
+            if ( table == GenerateFastaFileStrategy.ORF_TABLE ):
+                header = ( header + 
+                           ' chr=' + df[ 'chromosome' ].astype( str ) +
+                           ' strand=' + df[ 'strand' ].astype( str ) +
+                           ' start_pos=' + df[ 'start_pos' ].astype( str ) +
+                           ' stop_pos=' + df[ 'stop_pos' ].astype( str ) +
+                           ' exons=' + df[ 'spliced_parts_count' ].astype( str ) )
+            else:
+                header = ( header +
+                           ' rel_start_pos=' + df[ 'rel_start_pos' ].astype( str ) +
+                           ' rel_stop_pos=' + df[ 'rel_stop_pos' ].astype( str ) +
+                           ' orf_id=' + df[ 'orf_id' ].astype( str ) +
+                           ' transcript_id=' + df[ 'transcript_id' ].astype( str ) )
+        
+            # Add the database url and version number if available
+            header = header + ' database=' + Constants.PROJECT_NAME + ' url=' + Constants.WEBSITE_URL
+            if ( db_release ):
+                header = header + ' release=' + db_release
+        
+        return header
+    
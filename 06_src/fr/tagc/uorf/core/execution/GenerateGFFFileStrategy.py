@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
 import os
+import re
+import numpy as np
 import pandas as pd
 from sqlalchemy import or_
 
@@ -8,14 +10,15 @@ from sqlalchemy import or_
 from fr.tagc.uorf.core.model.PRO import *
 
 from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
 from fr.tagc.uorf.core.util.sql.SQLManagerPRO import SQLManagerPRO
 from fr.tagc.uorf.core.util.sql import SQLConstants
 from fr.tagc.uorf.core.util.option.OptionManager import OptionManager
 from fr.tagc.uorf.core.util.option import OptionConstants
 from fr.tagc.uorf.core.util.general.FileHandlerUtil import FileHandlerUtil
-from fr.tagc.uorf.core.util.graphics.ProgressionBar import ProgressionBar
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
 
 
 # ===============================================================================
@@ -39,7 +42,7 @@ from fr.tagc.uorf.core.util.log.Logger import Logger
 #                     must be one used within Ensembl).
 # [1] source: String - Name of the current project / database.
 # [2] type: String - Type of feature (term or accession number from SOFA sequence 
-#                    ontology). Here 'ORF', 'start_codon', 'stop_codon' or 'exon'.
+#                    ontology). Here 'ORF', 'start_codon', 'stop_codon' or 'CDS'.
 # [3] start: Integer - The start position of the feature (with sequence numbering 
 #                      starting at 1).
 # [4] end: Integer - The end position of the feature (with sequence numbering 
@@ -109,6 +112,11 @@ from fr.tagc.uorf.core.util.log.Logger import Logger
 # NB: Information related to the transcripts are not integrated in 
 #     the GFF file generated.
 #
+# The features are computed using array operations on chunks of ORFs
+# fetched using a server-side cursor, and written sorted by chromosome
+# and start position, such as the file may be directly indexed and
+# displayed by genome browsers.
+#
 class GenerateGFFFileStrategy( object ):
     
     ## Class variables
@@ -150,7 +158,7 @@ class GenerateGFFFileStrategy( object ):
     GFF_TYPE_ORF = 'ORF'
     GFF_TYPE_START_CODON = 'start_codon'
     GFF_TYPE_STOP_CODON = 'stop_codon'
-    GFF_TYPE_EXON = 'exon'
+    GFF_TYPE_CDS = 'CDS'
 
    
 
@@ -243,389 +251,293 @@ class GenerateGFFFileStrategy( object ):
                                          file_path + '.' )
         
         
-        # In order to reduce the computation time, 
-        # the GFF file is build sequentially by:
-        # - Adding the following information for all the entries of the ORF table:
+        # In order to reduce the computation time and the memory usage,
+        # the entries of the ORF table are fetched by chunks, ordered by 
+        # chromosome and start position, using a server-side cursor.
+        # For each chunk, the following features are computed at once
+        # for all the ORFs (using array operations):
         #     - 1 line for the ORF (chr, start and stop positions, unique ID)
         #     - 1 line for the start codon
         #     - 1 line for the stop codon
-        # - Adding the following information only for the spliced ORFs:
-        #     - 1 line for each exon (start and end positions, unique ID of the ORF)
-        
-        # First get all the entries of the ORF table with the features
-        # usefull to build the GFF file
+        #     - 1 line for each CDS part of the ORF (i.e. 1 line for the
+        #       ORFs that are not spliced, and 1 line for each "exon" of 
+        #       the spliced ORFs)
+        # The features are then sorted by chromosome and start position, and
+        # all the features that cannot be preceded by a feature of the next 
+        # chunks are written in the file. The other ones are kept and sorted
+        # together with the features of the next chunk.
         all_orfs_query = SQLManagerPRO.get_instance().get_session().query( ORF.id, 
                                                                            ORF.chromosome, 
                                                                            ORF.strand, 
                                                                            ORF.start_pos,
-                                                                           ORF.stop_pos )
-        all_orfs_df = pd.read_sql( all_orfs_query.statement, 
-                                   SQLManagerPRO.get_instance().get_engine() )
-        SQLManagerPRO.get_instance().close_session()
-        
-        
-        # 'ORF' features
-        # --------------
-        Logger.get_instance().debug( 'Starting to compute the "ORF" features of the GFF file.' )
-        
-        # Instantiate a data frame that aims to contain the 'ORF' features
-        gff_content_orfs = all_orfs_df
-        
-        # Add the 'attributes' column to the data frame
-        attributes_col = gff_content_orfs.apply( self.compute_orf_row_attributes, axis=1 ).to_frame()
-        attributes_col = attributes_col.rename( columns = { 0: self.GFF_HEADER_ATTRIBUTES } )
-        gff_content_orfs = pd.concat( [ gff_content_orfs, attributes_col ], 
-                                      axis=1 )
-        
-        # Rename columns
-        gff_content_orfs = gff_content_orfs.rename( columns = { 'chromosome': self.GFF_HEADER_SEQID,
-                                                                 'start_pos': self.GFF_HEADER_START,
-                                                                 'stop_pos': self.GFF_HEADER_END } )
-        
-        # Add the columns with constant values
-        gff_content_orfs[ self.GFF_HEADER_SOURCE ] = self.GFF_SOURCE_NAME
-        gff_content_orfs[ self.GFF_HEADER_TYPE ] = self.GFF_TYPE_ORF
-        gff_content_orfs[ self.GFF_HEADER_SCORE ] = self.GFF_UNDEFINED_FIELD
-        gff_content_orfs[ self.GFF_HEADER_PHASE ] = self.GFF_UNDEFINED_FIELD
-        
-        # Reorder the columns of the data frame
-        # NB: An extra-column ID is left in order to allow the sorting of the rows
-        #     after the merging of all the data frames constituting the GFF file.
-        gff_content_orfs = gff_content_orfs[ self.GFF_HEADER_LIST + [ 'id' ] ]             
-                 
-         
-        # 'start_codon' features
-        # ----------------------
-        Logger.get_instance().debug( 'Starting to compute the "start_codon" features of the GFF file.' )
-        
-        # Instantiate a data frame that aims to contain the 'start_codon' features
-        gff_content_start = all_orfs_df
-        
-        # Compute the 'start', 'end' and 'attributes' columns of the data frame
-        # and add them to the data frame
-        start_col = gff_content_start.apply( self.compute_start_start, axis=1 ).to_frame()
-        start_col = start_col.rename( columns = { 0: self.GFF_HEADER_START } )
-        
-        end_col = gff_content_start.apply( self.compute_start_end, axis=1 ).to_frame()
-        end_col = end_col.rename( columns = { 0: self.GFF_HEADER_END } )
-        
-        attributes_col = gff_content_start.apply( self.compute_start_attributes, axis=1 ).to_frame()
-        attributes_col = attributes_col.rename( columns = { 0: self.GFF_HEADER_ATTRIBUTES } )
-        
-        gff_content_start = pd.concat( [ gff_content_start, start_col, end_col, attributes_col ], 
-                                       axis=1 )
-        
-        # Rename columns
-        gff_content_start = gff_content_start.rename( columns = { 'chromosome': self.GFF_HEADER_SEQID } )  
-        
-        # Add the columns with constant values
-        gff_content_start[ self.GFF_HEADER_SOURCE ] = self.GFF_SOURCE_NAME
-        gff_content_start[ self.GFF_HEADER_TYPE ] = self.GFF_TYPE_START_CODON
-        gff_content_start[ self.GFF_HEADER_SCORE ] = self.GFF_UNDEFINED_FIELD
-        gff_content_start[ self.GFF_HEADER_PHASE ] = self.GFF_UNDEFINED_FIELD
-        
-        # Select and reorder the columns of the data frame
-        gff_content_start = gff_content_start[ self.GFF_HEADER_LIST + [ 'id' ] ]                
-                 
-         
-        # 'stop_codon' features
-        # ---------------------
-        Logger.get_instance().debug( 'Starting to compute the "stop_codon" features of the GFF file.' )
+                                                                           ORF.stop_pos,
+                                                                           ORF.spliced,
+                                                                           ORF.splice_starts,
+                                                                           ORF.splice_ends ).order_by( ORF.chromosome,
+                                                                                                       ORF.start_pos,
+                                                                                                       ORF.id )
         
-        # Instantiate a data frame that aims to contain the 'stop_codon' features
-        gff_content_stop = all_orfs_df
+        connection = SQLManagerPRO.get_instance().get_engine().connect().execution_options( stream_results = True )
         
-        # Compute the 'start', 'end' and 'attributes' columns of the data frame
-        # and add them to the data frame
-        start_col = gff_content_stop.apply( self.compute_stop_start, axis=1 ).to_frame()
-        start_col = start_col.rename( columns = { 0: self.GFF_HEADER_START } )
+        pending_features = pd.DataFrame( columns = self.GFF_HEADER_LIST )
+        feature_count = 0
         
-        end_col = gff_content_stop.apply( self.compute_stop_end, axis=1 ).to_frame()
-        end_col = end_col.rename( columns = { 0: self.GFF_HEADER_END } )
-        
-        attributes_col = gff_content_stop.apply( self.compute_stop_attributes, axis=1 ).to_frame()
-        attributes_col = attributes_col.rename( columns = { 0: self.GFF_HEADER_ATTRIBUTES } )
-        
-        gff_content_stop = pd.concat( [ gff_content_stop, start_col, end_col, attributes_col ], 
-                                      axis=1 )
-        
-        # Rename columns
-        gff_content_stop = gff_content_stop.rename( columns = { 'chromosome': self.GFF_HEADER_SEQID } )
-        
-        # Add columns of fixed value
-        gff_content_stop[ self.GFF_HEADER_SOURCE ] = self.GFF_SOURCE_NAME
-        gff_content_stop[ self.GFF_HEADER_TYPE ] = self.GFF_TYPE_STOP_CODON
-        gff_content_stop[ self.GFF_HEADER_SCORE ] = self.GFF_UNDEFINED_FIELD
-        gff_content_stop[ self.GFF_HEADER_PHASE ] = self.GFF_UNDEFINED_FIELD
-        
-        # Select and reorder the columns of the data frame
-        gff_content_stop = gff_content_stop[ self.GFF_HEADER_LIST + [ 'id' ] ]
-        
-        
-        # 'exon' features
-        # ---------------
-        Logger.get_instance().debug( 'Starting to compute the "exon" features of the GFF file.' )
-        
-        # Get all the ORFs that are reported as spliced and for which the
-        # exon coordinates are provided
-        all_spliced_orfs_query = SQLManagerPRO.get_instance().get_session().query( ORF ).filter( ORF.spliced == True,
-                                                                                                 ORF.splice_starts != None,
-                                                                                                 ORF.splice_ends != None )
-        all_spliced_orfs_df = pd.read_sql( all_spliced_orfs_query.statement,
-                                           SQLManagerPRO.get_instance().get_engine() )
-        SQLManagerPRO.get_instance().close_session()
+        try:
+            for all_orfs_df in pd.read_sql( all_orfs_query.statement, 
+                                            connection,
+                                            chunksize = Constants.GFF_CHUNK_SIZE ):
+                
+                if ( all_orfs_df.shape[ 0 ] == 0 ):
+                    continue
+                
+                # Compute all the features related to the ORFs of the chunk
+                gff_content = pd.concat( [ pending_features,
+                                           self.compute_gff_features( all_orfs_df ) ],
+                                         ignore_index = True )
+                gff_content = self.sort_gff_features( gff_content )
+                
+                # As the ORFs are ordered by chromosome and start position, all the 
+                # features of the next chunks are located either on the same chromosome 
+                # than the last ORF of this chunk and after its start position, or on 
+                # the next chromosomes. Hence, all the features located before this 
+                # position may be written in the file.
+                last_chromosome = all_orfs_df[ 'chromosome' ].iloc[ -1 ]
+                last_start_pos = all_orfs_df[ 'start_pos' ].iloc[ -1 ]
+                ready_to_write = ( ( gff_content[ self.GFF_HEADER_SEQID ] != last_chromosome )
+                                   | ( gff_content[ self.GFF_HEADER_START ] <= last_start_pos ) )
+                
+                self.write_gff_features( gff_content[ ready_to_write ] )
+                feature_count += ready_to_write.sum()
+                pending_features = gff_content[ ~ ready_to_write ]
+                
+                Logger.get_instance().debug( 'GenerateGFFFileStrategy.execute(): ' + str( feature_count ) +
+                                             ' features have been written in the GFF3 file.' )
         
-        # Get the number of ORFs expected to be treated and 
-        # reset the ProgressionBar instance
-        ProgressionBar.get_instance().reset_instance( total = all_spliced_orfs_df.shape[ 0 ] )
+        finally:
+            connection.close()
+            SQLManagerPRO.get_instance().close_session()
         
-        # Instantiate an empty data frame with all the GFF columns
-        # and an additive 'id' column
-        gff_content_exons = pd.DataFrame( columns = ( self.GFF_HEADER_LIST + [ 'id' ] ) )
+        # Write the remaining features
+        self.write_gff_features( pending_features )
+        feature_count += pending_features.shape[ 0 ]
         
-        # For each ORF spliced
-        for ( index, row ) in all_spliced_orfs_df.iterrows():
-            
-            # Update and display the progression bar on the console
-            ProgressionBar.get_instance().increase_and_display()
-            
-            # Get the start and ends of all the "exons", and register 
-            # a new line in the GFF file for each of them
-            sp_starts = map( int, 
-                             row[ 'splice_starts' ].split( Constants.ORF_SPLICING_COORD_SEPARATOR ) ) 
-            sp_ends = map( int, 
-                           row[ 'splice_ends' ].split( Constants.ORF_SPLICING_COORD_SEPARATOR ) )
-            
-            # For each exon, create a new line in the GFF file
-            for k in range( int( row[ 'spliced_parts_count' ] ) ):
-                
-                # Reverse the start and stop positions for the ORFs 
-                # located on the minus strand
-                start_exon = sp_starts[ k ]
-                end_exon = sp_ends[ k ]
-                # If the exon is located on the negative strand,
-                # reverse the start and end position as the start
-                # has to be smaller than the stop in the GFF
-                if ( row[ 'strand' ]== '-' ):
-                    ( start_exon, end_exon ) = ( end_exon, start_exon )
-                
-                gff_content_exons = gff_content_exons.append( { self.GFF_HEADER_SEQID: row[ 'chromosome' ],
-                                                                self.GFF_HEADER_SOURCE: self.GFF_SOURCE_NAME,
-                                                                self.GFF_HEADER_TYPE: self.GFF_TYPE_EXON,
-                                                                self.GFF_HEADER_START: start_exon,
-                                                                self.GFF_HEADER_END: end_exon,
-                                                                self.GFF_HEADER_SCORE: self.GFF_UNDEFINED_FIELD,
-                                                                self.GFF_HEADER_STRAND: row[ 'strand' ],
-                                                                self.GFF_HEADER_PHASE: self.GFF_UNDEFINED_FIELD,
-                                                                self.GFF_HEADER_ATTRIBUTES: ( 'ID=' + str( row[ 'id' ] ) + '.' + str( k ) +
-                                                                                              ';Parent=' + str( row[ 'id' ] ) ) },
-                                                                ignore_index = True )
-        
-        
-        
-        # Merge df
-        # --------
-        # Merge all the data frames containing the data of the GFF
-        gff_full_content = pd.concat( [ gff_content_orfs, 
-                                        gff_content_start, 
-                                        gff_content_stop, 
-                                        gff_content_exons ] )
-        
-        # Reorder the rows by chromosome, then ID, then type, 
-        # then start position, then attributes.
-        # This allows the features to be ordered by (in this order):
-        # - Chromosome (seqid)
-        # - ORF to which they are related to
-        # - Type of feature (ORF, start, stop, exon)
-        # - Start position (useful for ORFs with several exons)
-        # - End position (useful for ORFs with several exons)
-        # - Attributes
-        # Hence, the features describing the features describing 
-        # the same ORF located in the same 'area' of the file.
-        gff_full_content = gff_full_content.sort_values( by = [ self.GFF_HEADER_SEQID,
-                                                                'id',
-                                                                self.GFF_HEADER_TYPE,
-                                                                self.GFF_HEADER_END,
-                                                                self.GFF_HEADER_ATTRIBUTES ] )
-        
-        # Remove the ID column which is no longer useful
-        # and not expected to be present in the GFF file
-        gff_full_content = gff_full_content.drop( [ 'id' ], axis=1 )
-        
-        
-        # Add the content of the GFF file to the file,
-        # after the prefix
-        FileHandlerUtil.pandas_df_to_csv( output_folder = self.output_folder, 
-                                          filename = self.filename,
-                                          df = gff_full_content,
-                                          file_desc = 'GFF file content',
-                                          sep = '\t',
-                                          ext = self.GFF_FILE_EXTENSION,
-                                          mode = 'a',
-                                          hdr = False )
-        
-        Logger.get_instance().info( 'The GFF file has been successfully generated and stored in the ' +
+        Logger.get_instance().info( 'The GFF file (' + str( feature_count ) + ' features) has been' +
+                                    ' successfully generated and stored in the ' +
                                     self.output_folder + ' directory.' )
         
         
         
-    ## compute_orf_row_attributes
-    #  --------------------------
+    ## compute_gff_features
+    #  --------------------
     #
-    # This is a static method allowing to compute the value
-    # of the 'attributes' column for a row of the 'ORF' 
-    # features data frame.
+    # This method allows to compute the 'ORF', 'start_codon', 'stop_codon' 
+    # and 'CDS' features of a set of ORFs.
     # 
-    # @param row: Pandas Series - A row from the ORF Pandas data frame.
+    # @param orfs_df: Pandas DataFrame - The data frame of ORFs, containing the 'id', 
+    #                                    'chromosome', 'strand', 'start_pos', 'stop_pos',
+    #                                    'spliced', 'splice_starts' and 'splice_ends' columns.
     # 
-    # @return attributes: String - The attributes value.
+    # @return Pandas DataFrame - The data frame of GFF features (unsorted).
     #
-    @staticmethod
-    def compute_orf_row_attributes( row ):
+    @RunTelemetry.timed_stage()
+    def compute_gff_features( self, orfs_df ):
         
-        attributes = 'ID=' + str( row[ 'id' ] )
+        orf_ids = orfs_df[ 'id' ].astype( str )
+        start_pos = orfs_df[ 'start_pos' ].values
+        stop_pos = orfs_df[ 'stop_pos' ].values
+        plus_strand = ( orfs_df[ 'strand' ] == '+' ).values
         
-        return attributes
+        # 'ORF' features
+        # --------------
+        gff_content_orfs = self.build_gff_features( seqids = orfs_df[ 'chromosome' ].values,
+                                                    feature_type = self.GFF_TYPE_ORF,
+                                                    starts = start_pos,
+                                                    ends = stop_pos,
+                                                    strands = orfs_df[ 'strand' ].values,
+                                                    phases = self.GFF_UNDEFINED_FIELD,
+                                                    attributes = ( 'ID=' + orf_ids ).values )
         
+        # 'start_codon' features
+        # ----------------------
+        # NB: The start codon is located at the start position for the ORFs 
+        #     located on the plus strand and at the stop position for the ORFs
+        #     located on the minus strand.
+        start_codon_starts = np.where( plus_strand, start_pos, stop_pos - 2 )
+        gff_content_start = self.build_gff_features( seqids = orfs_df[ 'chromosome' ].values,
+                                                     feature_type = self.GFF_TYPE_START_CODON,
+                                                     starts = start_codon_starts,
+                                                     ends = start_codon_starts + 2,
+                                                     strands = orfs_df[ 'strand' ].values,
+                                                     phases = self.GFF_UNDEFINED_FIELD,
+                                                     attributes = ( 'ID=' + orf_ids + '.start;Parent=' + orf_ids ).values )
         
+        # 'stop_codon' features
+        # ---------------------
+        stop_codon_starts = np.where( plus_strand, stop_pos - 2, start_pos )
+        gff_content_stop = self.build_gff_features( seqids = orfs_df[ 'chromosome' ].values,
+                                                    feature_type = self.GFF_TYPE_STOP_CODON,
+                                                    starts = stop_codon_starts,
+                                                    ends = stop_codon_starts + 2,
+                                                    strands = orfs_df[ 'strand' ].values,
+                                                    phases = self.GFF_UNDEFINED_FIELD,
+                                                    attributes = ( 'ID=' + orf_ids + '.stop;Parent=' + orf_ids ).values )
+        
+        # 'CDS' features
+        # --------------
+        gff_content_cds = self.compute_cds_features( orfs_df )
         
-    ## compute_start_attributes
-    #  ------------------------
-    #
-    # This is a static method allowing to compute the value
-    # of the 'attributes' column for a row of the 'start_codon' 
-    # features data frame.
-    # 
-    # @param row: Pandas Series - A row from the start codons
-    #                             Pandas data frame.
-    # 
-    # @return attributes: String - The attributes value.
-    #
-    @staticmethod
-    def compute_start_attributes( row ):
+        # NB: The data frames are concatenated in this order such as, for 
+        #     features starting at the same position, the ORF is always 
+        #     written before its children.
+        return pd.concat( [ gff_content_orfs, 
+                            gff_content_cds, 
+                            gff_content_start, 
+                            gff_content_stop ],
+                          ignore_index = True )
         
-        attributes = 'ID=' + str( row[ 'id' ] ) + '.start;Parent=' + str( row[ 'id' ] )
         
-        return attributes
-                
         
-    ## compute_start_start
-    #  -------------------
+    ## compute_cds_features
+    #  --------------------
     #
-    # This is a static method allowing to compute the value
-    # of the 'start' column for a row of the 'start_codon' 
-    # features data frame.
-    # 
-    # @param row: Pandas Series - A row from the start codons
-    #                             Pandas data frame.
-    # 
-    # @return start: String - The start value.
+    # This method allows to compute the 'CDS' features of a set of ORFs.
+    # The ORFs that are not spliced have one single CDS part, spanning 
+    # from their start to their stop positions. The spliced ORFs have one 
+    # CDS part for each of the "exons" registered in their splice_starts 
+    # and splice_ends attributes. All the parts of an ORF share the same 
+    # ID (as expected for discontinuous features in GFF3 files).
     #
-    @staticmethod
-    def compute_start_start( row ):
-        
-        strand = row[ 'strand' ]
-        
-        if ( strand == '+' ):
-            start = row[ 'start_pos' ]
-        elif ( strand == '-' ):
-            start = row[ 'stop_pos' ] - 2
-        
-        return start
-                
-        
-    ## compute_start_end
-    #  -----------------
-    #
-    # This is a static method allowing to compute the value
-    # of the 'end' column for a row of the 'start_codon' 
-    # features data frame.
+    # The coordinates of the exons are expanded into one row per exon at 
+    # once for all the ORFs, and the phase of each part is computed from 
+    # the cumulative length of the previous parts of the ORF (in the reading 
+    # order of the ORF).
     # 
-    # @param row: Pandas Series - A row from the start codons
-    #                             Pandas data frame.
+    # @param orfs_df: Pandas DataFrame - The data frame of ORFs.
     # 
-    # @return end: String - The end value.
+    # @return Pandas DataFrame - The data frame of 'CDS' features.
     #
-    @staticmethod
-    def compute_start_end( row ):
-        
-        strand = row[ 'strand' ]
-        
-        if ( strand == '+' ):
-            end = row[ 'start_pos' ] + 2
-        elif ( strand == '-' ):
-            end = row[ 'stop_pos' ]
-        
-        return end
-        
-        
-        
-    ## compute_stop_attributes
-    #  -----------------------
+    def compute_cds_features( self, orfs_df ):
+        
+        # Get the list of start and end positions of the parts of each ORF
+        # NB: The ORFs that are not spliced, for which the coordinates of the exons 
+        #     are missing or for which the numbers of starts and ends are not 
+        #     consistent are considered as made of one single part.
+        splice_starts = orfs_df[ 'splice_starts' ].fillna( '' )
+        splice_ends = orfs_df[ 'splice_ends' ].fillna( '' )
+        is_spliced = ( ( orfs_df[ 'spliced' ] == True )
+                       & ( splice_starts != '' )
+                       & ( splice_ends != '' )
+                       & ( splice_starts.str.count( re.escape( Constants.ORF_SPLICING_COORD_SEPARATOR ) )
+                           == splice_ends.str.count( re.escape( Constants.ORF_SPLICING_COORD_SEPARATOR ) ) ) ).values
+        
+        part_starts = pd.Series( np.where( is_spliced, 
+                                           splice_starts.values, 
+                                           orfs_df[ 'start_pos' ].astype( str ).values ) ).str.split( Constants.ORF_SPLICING_COORD_SEPARATOR )
+        part_ends = pd.Series( np.where( is_spliced, 
+                                         splice_ends.values, 
+                                         orfs_df[ 'stop_pos' ].astype( str ).values ) ).str.split( Constants.ORF_SPLICING_COORD_SEPARATOR )
+        
+        # Expand the lists into one row per part
+        part_counts = part_starts.str.len().values
+        orf_indexes = np.repeat( np.arange( orfs_df.shape[ 0 ] ), part_counts )
+        starts = np.concatenate( part_starts.values ).astype( np.int64 )
+        ends = np.concatenate( part_ends.values ).astype( np.int64 )
+        
+        # The exon coordinates of the ORFs located on the minus strand are registered
+        # from the highest to the lowest position, hence get the lowest and highest 
+        # position of each part
+        ( starts, ends ) = ( np.minimum( starts, ends ), np.maximum( starts, ends ) )
+        
+        # Compute the phase of each part, using the length of the 
+        # previous parts of the same ORF
+        lengths = ends - starts + 1
+        cumulative_lengths = np.cumsum( lengths )
+        first_part_indexes = np.cumsum( part_counts ) - part_counts
+        previous_lengths = cumulative_lengths - lengths - np.repeat( cumulative_lengths[ first_part_indexes ] - lengths[ first_part_indexes ],
+                                                                     part_counts )
+        phases = ( 3 - previous_lengths % 3 ) % 3
+        
+        orf_ids = orfs_df[ 'id' ].astype( str ).values[ orf_indexes ]
+        
+        return self.build_gff_features( seqids = orfs_df[ 'chromosome' ].values[ orf_indexes ],
+                                        feature_type = self.GFF_TYPE_CDS,
+                                        starts = starts,
+                                        ends = ends,
+                                        strands = orfs_df[ 'strand' ].values[ orf_indexes ],
+                                        phases = phases,
+                                        attributes = ( 'ID=' + pd.Series( orf_ids ) + '.cds;Parent=' + pd.Series( orf_ids ) ).values )
+        
+        
+        
+    ## build_gff_features
+    #  ------------------
     #
-    # This is a static method allowing to compute the value
-    # of the 'attributes' column for a row of the 'stop_codon' 
-    # features data frame.
+    # This method allows to build a data frame of GFF features 
+    # from the arrays of values of each column.
     # 
-    # @param row: Pandas Series - A row from the stop codons
-    #                             Pandas data frame.
+    # @param seqids: Numpy array - The chromosomes.
+    # @param feature_type: String - The type of the features.
+    # @param starts: Numpy array - The start positions.
+    # @param ends: Numpy array - The end positions.
+    # @param strands: Numpy array - The strands.
+    # @param phases: Numpy array / String - The phases.
+    # @param attributes: Numpy array - The attributes.
     # 
-    # @return attributes: String - The attributes value.
+    # @return Pandas DataFrame - The data frame of GFF features.
     #
-    @staticmethod
-    def compute_stop_attributes( row ):
+    def build_gff_features( self, seqids, feature_type, starts, ends, strands, phases, attributes ):
         
-        attributes = 'ID=' + str( row[ 'id' ] ) + '.stop;Parent=' + str( row[ 'id' ] )
+        return pd.DataFrame( { self.GFF_HEADER_SEQID: seqids,
+                               self.GFF_HEADER_SOURCE: self.GFF_SOURCE_NAME,
+                               self.GFF_HEADER_TYPE: feature_type,
+                               self.GFF_HEADER_START: starts,
+                               self.GFF_HEADER_END: ends,
+                               self.GFF_HEADER_SCORE: self.GFF_UNDEFINED_FIELD,
+                               self.GFF_HEADER_STRAND: strands,
+                               self.GFF_HEADER_PHASE: phases,
+                               self.GFF_HEADER_ATTRIBUTES: attributes },
+                             columns = self.GFF_HEADER_LIST )
         
-        return attributes
         
         
-    ## compute_stop_start
-    #  ------------------
+    ## sort_gff_features
+    #  -----------------
     #
-    # This is a static method allowing to compute the value
-    # of the 'start' column for a row of the 'stop_codon' 
-    # features data frame.
+    # This method allows to sort GFF features by chromosome and start position.
+    # The chromosomes are kept in their order of appearance in the data frame 
+    # (i.e. the order in which the ORFs have been returned by the database),
+    # and a stable sort is used, such as the features starting at the same 
+    # position are kept in their original order.
     # 
-    # @param row: Pandas Series - A row from the stop codons
-    #                             Pandas data frame.
+    # @param gff_content: Pandas DataFrame - The data frame of GFF features.
     # 
-    # @return start: String - The start value.
+    # @return Pandas DataFrame - The sorted data frame.
     #
-    @staticmethod
-    def compute_stop_start( row ):
+    def sort_gff_features( self, gff_content ):
         
-        strand = row[ 'strand' ]
+        chromosome_ranks = pd.factorize( gff_content[ self.GFF_HEADER_SEQID ] )[ 0 ].astype( np.int64 )
+        sort_keys = ( chromosome_ranks << 32 ) + gff_content[ self.GFF_HEADER_START ].values.astype( np.int64 )
         
-        if ( strand == '+' ):
-            start = row[ 'stop_pos' ] - 2
-        elif ( strand == '-' ):
-            start = row[ 'start_pos' ]
+        return gff_content.iloc[ np.argsort( sort_keys, kind = 'mergesort' ) ]
         
-        return start  
         
         
-    ## compute_stop_end
-    #  ----------------
+    ## write_gff_features
+    #  ------------------
     #
-    # This is a static method allowing to compute the value
-    # of the 'end' column for a row of the 'stop_codon' 
-    # features data frame.
+    # This method allows to append GFF features to the GFF3 file.
     # 
-    # @param row: Pandas Series - A row from the stop codons
-    #                             Pandas data frame.
-    # 
-    # @return end: String - The end value.
+    # @param gff_content: Pandas DataFrame - The data frame of GFF features.
     #
-    @staticmethod
-    def compute_stop_end( row ):
-        
-        strand = row[ 'strand' ]
-        
-        if ( strand == '+' ):
-            end = row[ 'stop_pos' ]
-        elif ( strand == '-' ):
-            end = row[ 'start_pos' ] + 2
-        
-        return end
-    
\ No newline at end of file
+    @RunTelemetry.timed_stage()
+    def write_gff_features( self, gff_content ):
+        
+        if ( gff_content.shape[ 0 ] != 0 ):
+            FileHandlerUtil.pandas_df_to_csv( output_folder = self.output_folder, 
+                                              filename = self.filename,
+                                              df = gff_content,
+                                              file_desc = 'GFF file content',
+                                              sep = '\t',
+                                              ext = self.GFF_FILE_EXTENSION,
+                                              mode = 'a',
+                                              hdr = False )
@@ -1,13 +1,11 @@
 # -*- coding: utf-8 -*-
 
 import os
-import pandas as pd
-import subprocess
 import glob
-from operator import attrgetter
+from multiprocessing import cpu_count
 
 
-from fr.tagc.uorf.core.model import *
+from fr.tagc.uorf.core.execution.stat.LogAnalyticsEngine import LogAnalyticsEngine
 
 from fr.tagc.uorf.core.util import Constants
 from fr.tagc.uorf.core.util import LogCodes
@@ -16,6 +14,7 @@ from fr.tagc.uorf.core.util.option import OptionConstants
 from fr.tagc.uorf.core.util.general.FileHandlerUtil import FileHandlerUtil
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
         
 
 ## GenerateStatFilesStrategy
@@ -41,6 +40,7 @@ class GenerateStatFilesStrategy( object ):
     # Instance variables:
     #     - force_overwrite: Boolean - Should any existing stat file be overwritten?
     #     - output_folder: String - The name of the folder where to store the generated files.
+    #     - thread_nb: Integer - The number of threads to use to scan the log files.
     #
     def __init__( self ):
         
@@ -57,6 +57,33 @@ class GenerateStatFilesStrategy( object ):
         # By default, save the file in a stat folder
         if ( not self.output_folder ):
             self.output_folder = Constants.STAT_FOLDER
+        
+        # Get the number of threads available
+        self.thread_nb = OptionManager.get_instance().get_option( OptionConstants.OPTION_THREAD_NB, 
+                                                                  not_none = False )
+        available_thread_nb = cpu_count()
+        if self.thread_nb:
+            try:
+                self.thread_nb = int( self.thread_nb )
+            except:
+                raise DenCellORFException( 'GenerateStatFilesStrategy: The value provided for the number of threads' +
+                                           ' needs to be an integer (provided value: ' + 
+                                           str( self.thread_nb ) + ').' )
+            else:
+                if ( self.thread_nb < 1 ):
+                    raise DenCellORFException( 'GenerateStatFilesStrategy: The value provided for the number of threads' +
+                                               ' needs to be an integer greater than 1 (provided value: ' + 
+                                               str( self.thread_nb ) + ').' )
+                    
+                if ( self.thread_nb > available_thread_nb ):
+                    Logger.get_instance().info( 'The number of threads provided (' + str( self.thread_nb ) +
+                                                ') is greater than the number of threads actually' +
+                                                ' available(' +  str( available_thread_nb ) +
+                                                '). Hence, ' + str( available_thread_nb ) +
+                                                ' threads will be used to scan the log files.' )
+                    self.thread_nb = available_thread_nb
+        else:
+            self.thread_nb = available_thread_nb
     
         
     
@@ -68,137 +95,82 @@ class GenerateStatFilesStrategy( object ):
     #       used in the log files.
     #     - A csv file containing the number of time each "log code" has been used 
     #       in the log files (cf. LogCode file for more information).
+    #
+    # All the log files (including the rotated and gzipped ones) are scanned 
+    # only once, in parallel, to compute both the level and the log code counts 
+    # (see the documentation of the LogAnalyticsEngine class).
     # 
     def execute( self ):
         
-        ## Compute the statistics for each existing 
-        #  logging level
-        #  --------------------------------------------
-        file_exists = os.path.exists( os.path.join( self.output_folder, 
-                                                    self.LOG_LEVEL_COUNTS_FILENAME + '.csv' ) )
-        if ( self.force_overwrite or not file_exists ):
+        generate_level_counts = ( self.force_overwrite 
+                                  or ( not os.path.exists( os.path.join( self.output_folder, 
+                                                                         self.LOG_LEVEL_COUNTS_FILENAME + '.csv' ) ) ) )
+        generate_code_counts = ( self.force_overwrite 
+                                 or ( not os.path.exists( os.path.join( self.output_folder, 
+                                                                        self.LOG_CODE_COUNTS_FILENAME + '.csv' ) ) ) )
+        
+        if ( generate_level_counts or generate_code_counts ):
             
-            Logger.get_instance().info( 'Starting to build the logging level stat file.' )
+            ## Scan the log files
+            #  ------------------
+            log_file_paths = sorted( glob.glob( Constants.PATH_LOG + '*' ) )
             
-            # For each logging level, count the number of time it has been 
-            # registered in the log files
-            logging_level_counts = {}
+            Logger.get_instance().info( 'Starting to scan the ' + str( len( log_file_paths ) ) + ' log files.' )
             
-            for level in Constants.LOG_MODES.keys():
-                
-                lvl = level.upper()
-                cat_logs = subprocess.Popen( [ 'cat' ] + glob.glob( Constants.PATH_LOG + '*' ), 
-                                             stdout = subprocess.PIPE, 
-                                             stderr = subprocess.PIPE )
-                
-                grep_level = subprocess.Popen( ['grep', lvl ],
-                                              stdin = cat_logs.stdout,
-                                              stdout = subprocess.PIPE, 
-                                              stderr = subprocess.PIPE )
-                
-                count_lines = subprocess.Popen( ['wc', '-l' ],
-                                                stdin = grep_level.stdout,
-                                                stdout = subprocess.PIPE,
-                                                stderr = subprocess.PIPE )
-                
-                ( stdout, stderr ) = count_lines.communicate()
-                
-                if stderr:
-                    Logger.get_instance().error( 'An error occurred trying to get the number of "' + lvl +
-                                                 '" lines in the log files: \n' + stderr +
-                                                 ' Error code: ' + LogCodes.ERR_SUBPROC_BASH_GREP + '.',
-                                                 ex = False )
-                elif stdout:
-                    logging_level_counts[ lvl ] = int( stdout )
-                else:
-                    Logger.get_instance().error( 'The command allowing to get the number of "' + lvl +
-                                                 '" lines in the log files returned nothing.' +
-                                                 ' Error code: ' + LogCodes.ERR_SUBPROC_BASH_EMPTY + '.',
-                                                 ex = False )
+            log_analytics_engine = LogAnalyticsEngine( log_file_paths = log_file_paths,
+                                                       levels = [ level.upper() for level in Constants.LOG_MODES.keys() ],
+                                                       thread_nb = self.thread_nb )
+            with RunTelemetry.get_instance().stage( 'scan_log_files' ):
+                errors = log_analytics_engine.scan()
+                RunTelemetry.get_instance().add_rows( log_analytics_engine.line_count )
             
-            # Seve the dictionary into a csv file
-            FileHandlerUtil.dict_to_csv( output_folder = self.output_folder, 
-                                         filename = self.LOG_LEVEL_COUNTS_FILENAME, 
-                                         dict = logging_level_counts, 
-                                         file_desc = 'Count of occurrence of each level in the log files', 
-                                         sort = False,
-                                         hdr = [ 'level', 'count' ] )        
-        
-        ## Compute the statistics for each existing 
-        #  warning and error log code
-        #  --------------------------------------------
-        file_exists = os.path.exists( os.path.join( self.output_folder, 
-                                                    self.LOG_CODE_COUNTS_FILENAME + '.csv' ) )
-        if ( self.force_overwrite or not file_exists ):
+            for ( file_path, error_message ) in errors:
+                Logger.get_instance().error( 'An error occurred trying to scan the log file ' + file_path + 
+                                             ': \n' + error_message +
+                                             ' Error code: ' + LogCodes.ERR_FILEHAND + '.',
+                                             ex = False )
             
-            Logger.get_instance().info( 'Starting to build the verbose level stat file.' )
+            Logger.get_instance().debug( 'GenerateStatFilesStrategy.execute(): ' + 
+                                         str( log_analytics_engine.line_count ) + 
+                                         ' lines have been scanned.' )
             
-            # For each log code that may be registered, count the number 
-            # of time it has been registered in the log files
-            logcode_counts = {}
-                        
-            # Get all the log codes that may be registered in log files
-            logcodes = [ c for c in dir( LogCodes) if ( not c.startswith( '_' ) ) ]
             
-            for code in logcodes:
-                
-                c = eval( 'LogCodes.' + code )
-                
-                cat_logs = subprocess.Popen( [ 'cat' ] + glob.glob( Constants.PATH_LOG + '*' ), 
-                                             stdout = subprocess.PIPE,
-                                             stderr = subprocess.PIPE )
+            ## Compute the statistics for each existing 
+            #  logging level
+            #  --------------------------------------------
+            if generate_level_counts:
                 
-                grep_code = subprocess.Popen( ['grep', c ],
-                                              stdin = cat_logs.stdout,
-                                              stdout = subprocess.PIPE,
-                                              stderr = subprocess.PIPE )
+                Logger.get_instance().info( 'Starting to build the logging level stat file.' )
                 
-                if c.startswith( LogCodes.WARN_PREFIX ):
-                    grep_code2 = subprocess.Popen( ['grep', 'Warning code:' ],
-                                                   stdin = grep_code.stdout,
-                                                   stdout = subprocess.PIPE,
-                                                   stderr = subprocess.PIPE )
-                elif c.startswith( LogCodes.ERR_PREFIX ):
-                    grep_code2 = subprocess.Popen( ['grep', 'Error code:' ],
-                                                   stdin = cat_logs.stdout,
-                                                   stdout = subprocess.PIPE,
-                                                   stderr = subprocess.PIPE )
-                else:
-                    raise DenCellORFException( 'GenerateStatFilesStrategy.execute(): The LogCode "' + c + 
-                                               '" does not start with an expected prefix.' +
-                                               ' Please contact the developer if you see this message.' )
+                # Save the dictionary into a csv file
+                FileHandlerUtil.dict_to_csv( output_folder = self.output_folder, 
+                                             filename = self.LOG_LEVEL_COUNTS_FILENAME, 
+                                             dict = log_analytics_engine.get_level_counts(), 
+                                             file_desc = 'Count of occurrence of each level in the log files', 
+                                             sort = False,
+                                             hdr = [ 'level', 'count' ] )
+            
+            
+            ## Compute the statistics for each existing 
+            #  warning and error log code
+            #  --------------------------------------------
+            if generate_code_counts:
                 
-                count_lines = subprocess.Popen( ['wc', '-l' ],
-                                                stdin = grep_code2.stdout,
-                                                stdout = subprocess.PIPE,
-                                                stderr = subprocess.PIPE )
+                Logger.get_instance().info( 'Starting to build the verbose level stat file.' )
                 
-                ( stdout, stderr ) = count_lines.communicate()
+                # Get all the log codes that may be registered in log files
+                logcodes = [ eval( 'LogCodes.' + c ) for c in dir( LogCodes ) if ( not c.startswith( '_' ) ) ]
                 
-                if stderr:
-                    Logger.get_instance().error( 'An error occurred trying to get the number of lines with' +
-                                                 ' log code "' + c + '" in the log files: \n' + stderr +
-                                                 ' Error code: ' + LogCodes.ERR_SUBPROC_BASH_GREP + '.',
-                                                 ex = False )
-                elif stdout:
-                    logcode_counts[ c ] = int( stdout )
-                else:
-                    Logger.get_instance().error( 'The command allowing to get the number of lines with' +
-                                                 ' log code "' + c + '" in the log files returned nothing.' +
-                                                 ' Error code: ' + LogCodes.ERR_SUBPROC_BASH_EMPTY + '.',
-                                                 ex = False )
-            
-            # Save the dictionary into a csv file
-            FileHandlerUtil.dict_to_csv( output_folder = self.output_folder, 
-                                         filename = self.LOG_CODE_COUNTS_FILENAME, 
-                                         dict = logcode_counts,
-                                         file_desc = ( 'Count of occurrence of each error /' +
-                                                       ' warning code in the log files' ), 
-                                         sort = True,
-                                         hdr = [ 'code', 'count' ] )
+                # Save the dictionary into a csv file
+                FileHandlerUtil.dict_to_csv( output_folder = self.output_folder, 
+                                             filename = self.LOG_CODE_COUNTS_FILENAME, 
+                                             dict = log_analytics_engine.get_log_code_counts( logcodes ),
+                                             file_desc = ( 'Count of occurrence of each error /' +
+                                                           ' warning code in the log files' ), 
+                                             sort = True,
+                                             hdr = [ 'code', 'count' ] )
             
         # Generation of statistic files is now implemented in a R package
         Logger.get_instance().info( 'Generation of statistics files from the Python interface' +
                                     ' is deprecated. Please use the "RqueryORF" package of R to' +
                                     ' generate these files.' )
-            
\ No newline at end of file
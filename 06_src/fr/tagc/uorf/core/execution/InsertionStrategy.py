@@ -7,7 +7,7 @@ from sqlalchemy import func
 
 from fr.tagc.uorf.core.model.DS import *
 
-from fr.tagc.uorf.core.execution import *
+from fr.tagc.uorf.core.execution.DatabaseCheckStrategy import DatabaseCheckStrategy
 from fr.tagc.uorf.core.execution.insertion import *
 from fr.tagc.uorf.core.execution.insertion.ParserWrapper import ParserWrapper
 
@@ -22,6 +22,7 @@ from fr.tagc.uorf.core.util.general.FileHandlerUtil import FileHandlerUtil
 from fr.tagc.uorf.core.util.graphics.ProgressionBar import ProgressionBar
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
 
 
 ## InsertionStrategy
@@ -534,6 +535,7 @@ class InsertionStrategy( object ):
     # @param objects_to_insert: List - The list of objects to insert in the database.
     # @param source: String - The name of the source from which these objects have been created.
     # 
+    @RunTelemetry.timed_stage()
     def batch_insert_to_db( self, objects_to_insert, source ):
         
         Logger.get_instance().debug( 'Starting the insertion of data from ' + source + '.' ) 
@@ -555,6 +557,7 @@ class InsertionStrategy( object ):
         # Insert the objects into the database
         SQLManagerDS.get_instance().batch_insert_to_db( objects_to_insert = objects_to_insert, 
                                                         process = source )
+        RunTelemetry.get_instance().add_rows( len( objects_to_insert ) )
         
         Logger.get_instance().debug( 'The insertion of data from ' + source + ' has finished.' )
     
\ No newline at end of file
@@ -1,10 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import os
-
-import wget
-
-import pyliftover as pylo
+import ConfigParser
 
 
 from fr.tagc.uorf.core.model.DS import *
@@ -22,6 +19,7 @@ from fr.tagc.uorf.core.util.general.FileHandlerUtil import FileHandlerUtil
 from fr.tagc.uorf.core.util.graphics.ProgressionBar import ProgressionBar
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
         
 
 ## LiftOverStrategy
@@ -64,6 +62,8 @@ class LiftOverStrategy( object ):
     # Instance variables:
     #     - configfile: String - The path to the config file.
     #     - species: String - The name of the species in the database.
+    #     - chain_file_folder: String - The folder where the chain files are looked for
+    #                                   (and downloaded if missing).
     #
     # @throw DenCellORFException: When the config file is not provided or cannot be found at the
     #                             path provided.
@@ -84,6 +84,31 @@ class LiftOverStrategy( object ):
                                        ' Please see the documentation for more information.' )
         
         self.species = None
+        
+        # Get the folder of the chain files
+        self.chain_file_folder = None
+        self.parse_config()
+    
+    
+    ## parse_config
+    #  ------------
+    #
+    # Parse the config file to retrieve the optional parameters of the strategy.
+    # 
+    def parse_config( self ):
+        
+        # Read the configfile
+        config = ConfigParser.ConfigParser()
+        config.optionxform = lambda option: option
+        config.read( self.configfile )
+        
+        # Get the folder where the chain files are located (if provided). 
+        # By default, they are downloaded in the temporary folder.
+        if config.has_option( Constants.CONFIG_SECTION_LIFTOVER_PARAMETERS, Constants.CONFIG_SECTION_LIFTOVER_PARAMETERS_ITEM_CHAIN_FILE_FOLDER ):
+            self.chain_file_folder = config.get( Constants.CONFIG_SECTION_LIFTOVER_PARAMETERS, 
+                                                 Constants.CONFIG_SECTION_LIFTOVER_PARAMETERS_ITEM_CHAIN_FILE_FOLDER )
+        else:
+            self.chain_file_folder = DefaultTemporaryFolder.TEMPORARY_FOLDER
     
         
     
@@ -192,7 +217,11 @@ class LiftOverStrategy( object ):
     #     See the Constants file for more information about the annotation version handled
     #     by the program.
     # 
+    @RunTelemetry.timed_stage()
     def convert_genomic_coordinates( self ):
+        
+        import wget
+        import pyliftover as pylo
                 
         # Get all the data sources contained in the database
         datasources = DataManager.get_instance().get_data( Constants.DM_ALL_DATASOURCES )
@@ -256,19 +285,20 @@ class LiftOverStrategy( object ):
             # Otherwise, first make sure the annotation of the data source is one expected
             elif annot in Constants.ALL_SPECIES_ANNOTATIONS:
                 
-                # Download and import the appropriate chain file (from the UCSC) 
-                # allowing the conversion of annotation version
-                Logger.get_instance().debug( 'LiftOverStrategy.convert_genomic_coordinates():' +
-                                             ' Downloading the appropriate chain file from the UCSC' +
-                                             ' to perfom the conversion of the genomic coordinates.' )
+                # Download (if it is not already in the chain file folder) and import the 
+                # appropriate chain file (from the UCSC) allowing the conversion of 
+                # annotation version
                 chain_file_url = LiftOverStrategy.CHAIN_FILE_URL[ annot ]
                 
-                if ( not os.path.exists( DefaultTemporaryFolder.TEMPORARY_FOLDER ) ):
-                    os.makedirs( DefaultTemporaryFolder.TEMPORARY_FOLDER )
+                if ( not os.path.exists( self.chain_file_folder ) ):
+                    os.makedirs( self.chain_file_folder )
                 
-                chain_file_path = os.path.join( DefaultTemporaryFolder.TEMPORARY_FOLDER, LiftOverStrategy.CHAIN_FILENAMES[ annot ] )
+                chain_file_path = os.path.join( self.chain_file_folder, LiftOverStrategy.CHAIN_FILENAMES[ annot ] )
                 
                 if ( not os.path.exists( chain_file_path ) ):
+                    Logger.get_instance().debug( 'LiftOverStrategy.convert_genomic_coordinates():' +
+                                                 ' Downloading the appropriate chain file from the UCSC' +
+                                                 ' to perfom the conversion of the genomic coordinates.' )
                     wget.download( chain_file_url, out = chain_file_path, bar = None )
                 
                 lo = pylo.LiftOver( chain_file_path )
@@ -1310,6 +1340,7 @@ class LiftOverStrategy( object ):
     # original and current genome version) for all the DSORF entries of the database.
     # The absolute difference between these lengths is then computed.
     # 
+    @RunTelemetry.timed_stage()
     def compute_dsorf_gen_len( self ):
         
         Logger.get_instance().info( 'Starting to compute the genomic lengths for all the entries' +
@@ -4,9 +4,12 @@ import ConfigParser
 import os
 import pandas as pd
 import itertools
+import subprocess
+import sys
 
 from sqlalchemy import func
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, true
+from sqlalchemy.orm import aliased
 
 from multiprocessing import cpu_count
 from pathos.multiprocessing import ProcessingPool as Pool
@@ -15,10 +18,11 @@ from pathos.multiprocessing import ProcessingPool as Pool
 from fr.tagc.uorf.core.model import *
 
 from fr.tagc.uorf.core.execution.DatabaseCheckStrategy import DatabaseCheckStrategy
+from fr.tagc.uorf.core.execution.CombineMergePartitionsStrategy import CombineMergePartitionsStrategy
+from fr.tagc.uorf.core.execution.filter.FilterPlanner import FilterPlanner
 
 from fr.tagc.uorf.core.execution.merge import *
 
-from fr.tagc.uorf.core.util import DefaultTemporaryFolder
 from fr.tagc.uorf.core.util import Constants
 from fr.tagc.uorf.core.util import LogCodes
 from fr.tagc.uorf.core.util.data.DataManager import DataManager
@@ -32,6 +36,8 @@ from fr.tagc.uorf.core.util.general.FileHandlerUtil import FileHandlerUtil
 from fr.tagc.uorf.core.util.graphics.ProgressionBar import ProgressionBar
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.log.DiagnosticsAggregator import DiagnosticsAggregator
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
 
 
 # ================================================================================
@@ -103,11 +109,28 @@ class MergeStrategy( object ):
     #                                                and min. lengths of DSORFTranscriptAsso 
     #                                                entries to belong to the same "cluster".
     #     - thread_nb: Integer (>0) - The number of threads that can be use.
+    #     - journals: Dictionary - The dictionary that associates to the name of each step of the 
+    #                              merging the MergeJournal instance used to keep track of the 
+    #                              chunks inserted in the PRO database.
+    #     - partitions: List of lists - The partitions of chromosomes when the merging is 
+    #                                   partitioned, None otherwise.
+    #     - partition_index: Integer - The index of the partition merged by this instance, None 
+    #                                  if the whole database (or all partitions) is merged.
+    #     - partition_chromosomes: List - The chromosomes of the partition merged by this instance,
+    #                                     None if the whole database is merged.
+    #     - merged_data_folder: String - The folder where the files generated during the merging 
+    #                                    (e.g. journals) are saved.
+    #     - data_sources: List - The names of the data sources which entries have to be merged,
+    #                            None if the entries of all the data sources are merged.
+    #     - existing_ota_ids: Dictionary - The dictionary that associates to the ( ORF ID, 
+    #                                      Transcript ID ) couples which ORFTranscriptAsso 
+    #                                      entry has to be re-computed the ID of this entry.
     #
     # @throw DenCellORFException: When the config file is not provided or cannot be found at the
     #                             path provided.
     # @throw DenCellORFException: If the number of threads provided is not an integer.
     # @throw DenCellORFException: If the number of threads provided is not a positive integer.
+    # @throw DenCellORFException: If a partition index is provided without partitions.
     #
     def __init__( self ):
 
@@ -163,6 +186,43 @@ class MergeStrategy( object ):
             
         Logger.get_instance().debug( 'MergeStrategy: ' + str( self.thread_nb ) + 
                                      ' threads will be used during the merging.' )
+        
+        # Instantiate the dictionary of journals used to keep track 
+        # of the chunks inserted in the PRO database
+        self.journals = {}
+        
+        # Get the partitions of chromosomes and the index of the
+        # partition to merge if a partitioned merging has been requested
+        # (see the documentation of the MergePartition class for more information)
+        partitions = OptionManager.get_instance().get_option( OptionConstants.OPTION_MERGE_PARTITIONS, 
+                                                              not_none = False )
+        if partitions:
+            self.partitions = MergePartition.parse_partitions( partitions )
+        else:
+            self.partitions = None
+        
+        partition_index = OptionManager.get_instance().get_option( OptionConstants.OPTION_MERGE_PARTITION_INDEX, 
+                                                                   not_none = False )
+        if ( partition_index != None ):
+            if ( not self.partitions ):
+                raise DenCellORFException( 'MergeStrategy: The partitions of chromosomes have to be provided' +
+                                           ' in order to merge one single partition (provided partition' +
+                                           ' index: ' + str( partition_index ) + ').' )
+            self.partition_index = MergePartition.get_partition_index( partition_index, self.partitions )
+            self.partition_chromosomes = self.partitions[ self.partition_index ]
+            Logger.get_instance().info( 'MergeStrategy: Only the partition ' + str( self.partition_index ) +
+                                        ' (chromosomes: ' + ', '.join( self.partition_chromosomes ) + 
+                                        ') will be merged.' )
+        else:
+            self.partition_index = None
+            self.partition_chromosomes = None
+            
+        self.merged_data_folder = MergePartition.get_partition_folder( self.partition_index )
+        
+        # By default, the entries of all the data sources are merged
+        # into new entries of the PRO database
+        self.data_sources = None
+        self.existing_ota_ids = {}
 
 
 
@@ -289,6 +349,8 @@ class MergeStrategy( object ):
     # @throw DenCellORFException: When the DSORF table does not contain any entry with start 
     #                             position coordinates.
     # @throw DenCellORFException: When the PRO database is not empty.
+    # @throw DenCellORFException: When some chromosomes do not belong to any partition.
+    # @throw DenCellORFException: When the merging of a partition failed.
     # 
     def execute( self ):
         
@@ -339,6 +401,17 @@ class MergeStrategy( object ):
                                        ' Make sure to use an empty PRO database prior to run the merge' +
                                        ' strategy or to use the "-f" option.' +
                                        ' Please see the documentation for more information.' )
+        
+        # Check all the chromosomes of the DSORFs belong to a partition
+        if self.partitions:
+            self.check_partitions()
+        
+        # If partitions have been provided without index, merge each of them into 
+        # its own partial PRO database and combine them into the PRO database
+        if ( self.partitions and ( self.partition_index == None ) ):
+            self.merge_partitions()
+            FilterPlanner.update_content_version()
+            return
             
         # Register the name of the DS database used to create the PRO one
         metadata_ds_db_name = PROMetadata( parameter = Constants.METATABLE_DS_ORIGIN,
@@ -364,6 +437,120 @@ class MergeStrategy( object ):
         # Clean the database by removing parent entries that have no child
         self.clean_pro_database()
         
+        # Update the content version of the PRO database, such as the key sets
+        # computed by the Filter strategy on the former content are not used
+        # NB: The content version of the partial PRO databases is not updated,
+        #     as their PROMetadata entries are combined into the PRO database
+        if ( self.partition_index == None ):
+            FilterPlanner.update_content_version()
+        
+    
+    
+    ## check_partitions
+    #  ----------------
+    #
+    # This method allows to check that each chromosome on which at least one 
+    # DSORF to merge is located belongs to a partition. As each partition only 
+    # merges the DSORFs located on its chromosomes, the DSORFs located on other
+    # chromosomes (e.g. scaffolds or contigs) would otherwise be missing from the 
+    # PRO database.
+    #
+    # @throw DenCellORFException: When some chromosomes do not belong to any partition.
+    #
+    def check_partitions( self ):
+        
+        dsorf_chromosomes_query = SQLManagerDS.get_instance().get_session().query( DSORF.chromosome ).filter( DSORF.chromosome != None,
+                                                                                                             self.get_ds_source_criterion( DSORF ) ).distinct()
+        dsorf_chromosomes = [ chromosome for ( chromosome, ) in dsorf_chromosomes_query.all() ]
+        SQLManagerDS.get_instance().close_session()
+        
+        uncovered_chromosomes = MergePartition.get_uncovered_chromosomes( self.partitions, dsorf_chromosomes )
+        
+        if ( uncovered_chromosomes != [] ):
+            raise DenCellORFException( 'MergeStrategy.check_partitions(): DSORF entries are located on' +
+                                       ' the following chromosomes, which do not belong to any partition: ' +
+                                       ', '.join( uncovered_chromosomes ) + '. Please add these chromosomes' +
+                                       ' to the partitions, as their ORFs would otherwise be missing from' +
+                                       ' the PRO database. Error code: ' + LogCodes.ERR_MERG_PARTITION + '.' )
+    
+    
+    
+    ## merge_partitions
+    #  ----------------
+    #
+    # This method allows to run the partitioned merging locally. Each partition is 
+    # merged into its own partial PRO database by a separate invocation of the program 
+    # (using the same options and the index of the partition), then the partial PRO 
+    # databases are combined into the PRO database (see the documentation of the 
+    # CombineMergePartitionsStrategy class for more information).
+    # NB: The partitions are merged concurrently, and the threads available are 
+    #     shared between them.
+    # NB: The options are the ones parsed by the OptionManager (and not the ones of 
+    #     the command line), so that this strategy may be run as a step of a pipeline.
+    # NB: Each process writes its run report in the folder of its partition, and this 
+    #     report is used to know if the merging of the partition failed (see the 
+    #     documentation of the RunTelemetry.get_report_error() method).
+    #
+    # @throw DenCellORFException: When the merging of a partition failed.
+    #
+    @RunTelemetry.timed_stage()
+    def merge_partitions( self ):
+        
+        Logger.get_instance().info( 'Starting the partitioned merging of ' + str( len( self.partitions ) ) +
+                                    ' partitions of chromosomes (' + 
+                                    ' / '.join( [ ', '.join( partition ) for partition in self.partitions ] ) +
+                                    ').' )
+        
+        thread_nb_by_partition = max( 1, self.thread_nb // len( self.partitions ) )
+        
+        # Get the options of the strategy
+        # NB: The type of database is added as it may have been set 
+        #     by the pipeline instead of being provided with the options
+        argv = OptionManager.get_instance().get_argv()
+        db_type = OptionManager.get_instance().get_option( OptionConstants.OPTION_DB_TYPE )
+        if ( db_type != None ):
+            argv += [ '--databaseType', db_type ]
+        
+        # Start the merging of each partition in a new process
+        partition_processes = []
+        for partition_index in range( len( self.partitions ) ):
+            command = ( [ sys.executable, sys.argv[ 0 ] ] + argv + 
+                        [ '--partitionIndex', str( partition_index ), 
+                          '--threads', str( thread_nb_by_partition ) ] )
+            
+            partition_folder = MergePartition.get_partition_folder( partition_index )
+            if ( not os.path.exists( partition_folder ) ):
+                os.makedirs( partition_folder )
+            report_path = os.path.join( partition_folder, Constants.MERGE_PARTITION_RUN_REPORT_FILENAME )
+            if os.path.exists( report_path ):
+                os.remove( report_path )
+            env = dict( os.environ )
+            env[ Constants.RUN_REPORT_PATH_ENV_VARIABLE ] = report_path
+            
+            partition_processes.append( ( partition_index, report_path, subprocess.Popen( command, env = env ) ) )
+            
+        # Wait for all the partitions to be merged
+        failed_partitions = []
+        for ( partition_index, report_path, partition_process ) in partition_processes:
+            if ( partition_process.wait() != 0 ):
+                error = 'The process exited with the status ' + str( partition_process.returncode ) + '.'
+            else:
+                error = RunTelemetry.get_report_error( report_path, argv[ 0 ] )
+            
+            if error:
+                failed_partitions.append( '  ' + str( partition_index ) + ': ' + error )
+        
+        if ( failed_partitions != [] ):
+            raise DenCellORFException( 'MergeStrategy.merge_partitions(): The merging of the following' +
+                                       ' partitions failed:\n' + '\n'.join( failed_partitions ) + 
+                                       '\n Please see the log of these processes for more information.' +
+                                       ' Error code: ' + LogCodes.ERR_SUBPROC + '.' )
+            
+        Logger.get_instance().info( 'All the partitions have been merged.' )
+        
+        # Combine the partial PRO databases into the PRO database
+        CombineMergePartitionsStrategy().execute()
+    
     
     
     ## copy_conserved_tables
@@ -378,6 +565,7 @@ class MergeStrategy( object ):
     #
     # NB: For some of these entries, only a part of the attributes is copied.
     # 
+    @RunTelemetry.timed_stage()
     def copy_conserved_tables( self ):
         
         ## Copy all the entries of:
@@ -394,7 +582,10 @@ class MergeStrategy( object ):
         objects_to_insert = []
                     
         # Copy all the Metadata entries
-        ds_metadata_all = SQLManagerDS.get_instance().get_session().query( Metadata ).all()
+        # NB: The records of the build nodes are specific to the DS
+        #     database and are thus not copied (see the documentation 
+        #     of the BuildRunner class)
+        ds_metadata_all = SQLManagerDS.get_instance().get_session().query( Metadata ).filter( ~Metadata.parameter.startswith( Constants.METATABLE_BUILD_PREFIX ) ).all()
         
         for ds_metadata in ds_metadata_all:
             pro_metadata = PROMetadata( parameter = ds_metadata.parameter,
@@ -441,6 +632,7 @@ class MergeStrategy( object ):
     # This methods aims to merge the similar entries of the DSORF table 
     # (DS database) into new entries of the ORF table (PRO database).
     #
+    @RunTelemetry.timed_stage()
     def merge_dsorfs( self ):
         
         Logger.get_instance().info( 'Starting to merge the entries of the DSORF table.')
@@ -483,6 +675,7 @@ class MergeStrategy( object ):
                                                                                                             DSORF.splice_starts != None,
                                                                                                             DSORF.splice_ends != None
                                                                                                         )
+        grouped_dsorf_wo_any_null_base_query = self.filter_dsorf_query( grouped_dsorf_wo_any_null_base_query )
         
         # If necessary, filter out all the DSORF entries that have a difference
         # between their genomic lengths exceeding the provided threshold
@@ -529,8 +722,10 @@ class MergeStrategy( object ):
         # For each group of DSORF to merge, run the MergeDSORF.merge_exact_same_dsorf()
         # static method that will instantiate all the appropriate ORF and ORFDSAsso to 
         # insert in the PRO database
+        # NB: The progression is increased by the workers and displayed while waiting for them
         m = MergeDSORF()
-        all_objects_to_insert = p.map( m.merge_exact_same_dsorf, grouped_dsorf_wo_any_null_all )
+        with ProgressionBar.get_instance():
+            all_objects_to_insert = p.map( m.merge_exact_same_dsorf, grouped_dsorf_wo_any_null_all )
         p.close()
         # Wait for all processes to be completed
         p.join()
@@ -538,8 +733,6 @@ class MergeStrategy( object ):
         # Get the new objects to add to the session
         for obj_to_insert in all_objects_to_insert:
             
-            ProgressionBar.get_instance().increase_and_display()
-            
             # Parse the output of the MergeDSORF.merge_exact_same_dsorf() method
             # and add the entries to the list to insert to the database
             ( new_objects, processed_ids ) = obj_to_insert
@@ -549,6 +742,14 @@ class MergeStrategy( object ):
         
         # Delete the pool instance
         p.clear()  
+        
+        # Merge the new ORFs with the ones that may already exist in the PRO database
+        objects_to_insert = self.merge_with_existing_entries( objects_to_insert = objects_to_insert,
+                                                              entity_class = ORF,
+                                                              key_attributes = MergeStrategy.ATTRIBUTES_FOR_MERGING_SAME_DSORF,
+                                                              lookup_attribute = 'start_pos',
+                                                              asso_class = ORFDSAsso,
+                                                              asso_fk_attribute = 'orf_id' )
             
         # Insert the newly created objects in the database
         self.batch_insert_to_PRO_db( objects_to_insert = objects_to_insert,
@@ -604,6 +805,7 @@ class MergeStrategy( object ):
                                                                                                                            DSORF.splice_ends != None ),
                                                                                                                      DSORF.spliced == False )                                                                                                                     
                                                                                                             )
+        grouped_dsorf_wo_null_base_query = self.filter_dsorf_query( grouped_dsorf_wo_null_base_query )
         
         # If necessary, filter out all the DSORF entries that have a difference
         # between their genomic lengths exceeding the provided threshold
@@ -725,6 +927,7 @@ class MergeStrategy( object ):
                            strand = orf_strand,
                            start_pos = orf_start_pos,
                            stop_pos = orf_stop_pos,
+                           bin = GeneticsUtil.get_genomic_bin( orf_start_pos, orf_stop_pos ),
                            spliced = orf_spliced,
                            spliced_parts_count = orf_spliced_parts_count,
                            splice_starts = orf_splice_starts,
@@ -779,7 +982,7 @@ class MergeStrategy( object ):
         Logger.get_instance().debug( 'MergeStrategy.merge_dsorfs(): Querying the DS database' +
                                      ' to regroup the similar ORFs together.')
         
-        grouped_dsorf_all = SQLManagerDS.get_instance().get_session().query( 
+        grouped_dsorf_query = SQLManagerDS.get_instance().get_session().query( 
                                                                                 DSORF.chromosome,
                                                                                 DSORF.strand,
                                                                                 DSORF.start_pos,
@@ -802,7 +1005,8 @@ class MergeStrategy( object ):
                                                                                                                 and_( DSORF.start_pos != None, DSORF.stop_pos != None )
                                                                                                             )
                                                                                                     )
-                                                                                            ).group_by(
+                                                                                            )
+        grouped_dsorf_all = self.filter_dsorf_query( grouped_dsorf_query ).group_by(
                                                                                                         DSORF.chromosome,
                                                                                                         DSORF.strand,
                                                                                                         DSORF.start_pos,
@@ -917,6 +1121,7 @@ class MergeStrategy( object ):
     # This methods aims to merge the similar entries of the DSTranscript table 
     # (DS database) into new entries of the Transcript table (PRO database).
     # 
+    @RunTelemetry.timed_stage()
     def merge_dstranscripts( self ):
         
         Logger.get_instance().info( 'Starting to merge the entries of the DSTranscript table.')
@@ -954,7 +1159,9 @@ class MergeStrategy( object ):
                                                                                             func.group_concat( DSTranscript.data_source ),
                                                                                             func.count( DSTranscript.id )
                                                                                         ).filter(
-                                                                                                    DSTranscript.transcript_id.notlike( Constants.PREFIX_FAKE_TRANSCRIPT + '%' )
+                                                                                                    DSTranscript.transcript_id.notlike( Constants.PREFIX_FAKE_TRANSCRIPT + '%' ),
+                                                                                                    self.get_dstranscript_partition_criterion( DSTranscript.transcript_id ),
+                                                                                                    self.get_ds_source_criterion( DSTranscript )
                                                                                                 ).group_by(
                                                                                                             DSTranscript.transcript_id,
                                                                                                             DSTranscript.gene_id
@@ -1040,6 +1247,8 @@ class MergeStrategy( object ):
                                      strand = transcript_val.get( 'strand' ),
                                      start_pos = transcript_val.get( 'start_pos' ),
                                      end_pos = transcript_val.get( 'end_pos' ),
+                                     bin = GeneticsUtil.get_genomic_bin( transcript_val.get( 'start_pos' ),
+                                                                         transcript_val.get( 'end_pos' ) ),
                                      cds_start_pos = transcript_val.get( 'cds_start_pos' ),
                                      cds_stop_pos = transcript_val.get( 'cds_stop_pos' ),
                                      rna_biotype = transcript_val.get( 'rna_biotype' ),
@@ -1083,6 +1292,15 @@ class MergeStrategy( object ):
                     all_gene_ids_for_transcript.append( transcript_val.get( 'gene_id' ) )
         
         
+        # Merge the new transcripts with the ones that may already exist in the PRO database
+        objects_to_insert = self.merge_with_existing_entries( objects_to_insert = objects_to_insert,
+                                                              entity_class = Transcript,
+                                                              key_attributes = [ 'transcript_id', 'gene_id' ],
+                                                              lookup_attribute = 'transcript_id',
+                                                              asso_class = TranscriptDSAsso,
+                                                              asso_fk_attribute = 'transcript_id',
+                                                              att_to_check = MergeStrategy.ATT_TO_CHECK_FOR_MERGING_SAME_DSTRANSCRIPT )
+        
         # Insert the newly created objects in the database
         self.batch_insert_to_PRO_db( objects_to_insert = objects_to_insert, 
                                      filename = 'transcripts_with_same_off_id',
@@ -1126,7 +1344,9 @@ class MergeStrategy( object ):
                                                                                                 func.group_concat( DSTranscript.data_source ),
                                                                                                 func.count( DSTranscript.id )
                                                                                             ).filter(
-                                                                                                        DSTranscript.transcript_id.like( Constants.PREFIX_FAKE_TRANSCRIPT + '%' )
+                                                                                                        DSTranscript.transcript_id.like( Constants.PREFIX_FAKE_TRANSCRIPT + '%' ),
+                                                                                                        self.get_dstranscript_partition_criterion( DSTranscript.gene_id ),
+                                                                                                        self.get_ds_source_criterion( DSTranscript )
                                                                                                     ).group_by(
                                                                                                                 DSTranscript.gene_id,
                                                                                                                 DSTranscript.strand,
@@ -1242,6 +1462,8 @@ class MergeStrategy( object ):
                                          strand = transcript_val.get( 'strand' ),
                                          start_pos = transcript_val.get( 'start_pos' ),
                                          end_pos = transcript_val.get( 'end_pos' ),
+                                         bin = GeneticsUtil.get_genomic_bin( transcript_val.get( 'start_pos' ),
+                                                                             transcript_val.get( 'end_pos' ) ),
                                          cds_start_pos = transcript_val.get( 'cds_start_pos' ),
                                          cds_stop_pos = transcript_val.get( 'cds_stop_pos' ),
                                          rna_biotype = transcript_val.get( 'rna_biotype' ),
@@ -1285,6 +1507,7 @@ class MergeStrategy( object ):
     # create one single entry associated with the couple in the ORFTranscriptAsso 
     # table (PRO database).
     # 
+    @RunTelemetry.timed_stage()
     def merge_dsorftranscriptasso( self ):
         
         Logger.get_instance().info( 'Starting to merge the entries of the DSORFTranscriptAsso table.' )
@@ -1361,7 +1584,13 @@ class MergeStrategy( object ):
         
         
         # Get all the DSORFTranscriptAsso entries (DS database)
-        dsota_query = SQLManagerDS.get_instance().get_session().query( DSORFTranscriptAsso )
+        # NB: If the merging is partitioned, only the entries related 
+        #     to the DSORFs of the partition are considered
+        # NB: If only the entries of some data sources are merged, only the 
+        #     entries provided by these data sources are considered
+        dsota_query = SQLManagerDS.get_instance().get_session().query( DSORFTranscriptAsso ).filter( self.get_ds_source_criterion( DSORFTranscriptAsso ) )
+        if self.partition_chromosomes:
+            dsota_query = dsota_query.filter( DSORFTranscriptAsso.uniq_orf_id.in_( self.get_partition_dsorf_ids_query() ) )
         dsota_all = dsota_query.all()
         SQLManagerDS.get_instance().close_session()
         
@@ -1432,7 +1661,7 @@ class MergeStrategy( object ):
         try:
             FileHandlerUtil.save_obj_to_file( objects_to_save = all_existing_orf_tr_asso_ids, 
                                               filename = Constants.ALL_EXISTING_ORF_TR_ASSO_IDS_FILENAME, 
-                                              output_folder = Constants.MERGED_DATA_FOLDER )
+                                              output_folder = self.merged_data_folder )
         except Exception as e:
             Logger.get_instance().error( 'An error occurred trying to save the dictionary that associates' +
                                          ' to each (ORF ID (PRO), Transcript ID (PRO) ) couple the IDs of' +
@@ -1515,6 +1744,7 @@ class MergeStrategy( object ):
     #     DataManager in order to work properly. See the documentation of the 
     #     get_dsorftranscriptasso_to_merge() method for more information.
     # 
+    @RunTelemetry.timed_stage()
     def merge_dsota( self ):
         
         # NB: This step is multi-processed
@@ -1564,14 +1794,10 @@ class MergeStrategy( object ):
         ProgressionBar.get_instance().display()
         
         
-        # During the merging of the DSORFTranscriptAsso entries, a consensus of the
-        # amino acid and nucleic sequences needs to be computed. As this step uses
-        # MUSCLE, it needs to write the sequences and alignment in a fasta file. 
-        # Hence, the fasta files are saved in a temporary folder. In order to avoid 
-        # any conflict related to the creation of the directory by the first parallel 
-        # processes at the same time, this folder is created prior to run the processes.
-        if ( not os.path.exists( DefaultTemporaryFolder.TEMPORARY_FOLDER ) ):
-            os.makedirs( DefaultTemporaryFolder.TEMPORARY_FOLDER )
+        # NB: During the merging of the DSORFTranscriptAsso entries, a consensus of 
+        #     the amino acid and nucleic sequences may be computed. This step does
+        #     not use any temporary file (see the documentation of the 
+        #     SequenceConsensusEngine class for more information).
             
         # Instantiate the list of tuple-embedded arguments necessary 
         # to create the new PRO entries 
@@ -1581,24 +1807,52 @@ class MergeStrategy( object ):
         
         # If there is any entry existing in the ORFTranscriptAsso table, 
         # get the value of the highest ID
+        # NB: If the merging is partitioned, the IDs start at the lower
+        #     bound of the range of IDs allocated to the partition
+        if ( self.partition_index != None ):
+            ( min_ota_id, max_allowed_ota_id ) = MergePartition.get_ota_id_bounds( self.partition_index )
+        else:
+            ( min_ota_id, max_allowed_ota_id ) = ( 1, None )
+            
         ota_count = SQLManagerPRO.get_instance().get_session().query( ORFTranscriptAsso ).count()
         if ( ota_count != 0 ):
             max_ota_id = SQLManagerPRO.get_instance().get_session().query( func.max( ORFTranscriptAsso.id ) ).one()[0]
-            ota_id = max_ota_id + 1
+            ota_id = max( max_ota_id + 1, min_ota_id )
         else:
-            ota_id = 1
+            ota_id = min_ota_id
+        
+        # NB: The ( ORF, Transcript ) couples registered in the existing_ota_ids 
+        #     dictionary keep the ID of their previous ORFTranscriptAsso entry
+        new_couple_count = len( [ orf_tr_asso for orf_tr_asso in all_existing_orf_tr_asso_dict.keys() \
+                                  if ( orf_tr_asso not in self.existing_ota_ids ) ] )
+        
+        if ( ( max_allowed_ota_id != None )
+             and ( ( ota_id + new_couple_count - 1 ) > max_allowed_ota_id ) ):
+            raise DenCellORFException( 'MergeStrategy.merge_dsota(): The number of ( ORF, Transcript )' +
+                                       ' couples of the partition ' + str( self.partition_index ) + 
+                                       ' (' + str( len( all_existing_orf_tr_asso_dict ) ) + ') exceeds the' +
+                                       ' range of ORFTranscriptAsso IDs allocated to it (' +
+                                       str( min_ota_id ) + '-' + str( max_allowed_ota_id ) + ').' +
+                                       ' Please split this partition into smaller ones.' )
         
         for ( orf_tr_asso, dsorftranscriptasso_list ) in all_existing_orf_tr_asso_dict.items():
+            
+            existing_ota_id = self.existing_ota_ids.get( orf_tr_asso )
+            if ( existing_ota_id != None ):
+                new_ota_id = existing_ota_id
+            else:
+                new_ota_id = ota_id
+                ota_id += 1
+                
             # Append to the list the tuple required by the MergeDSOTA.merge_dsota() method
             # (see the documentation of this method for more information)
-            args_for_merging_list.append( ( ota_id,
+            args_for_merging_list.append( ( new_ota_id,
                                             orf_tr_asso, 
                                             dsorftranscriptasso_list,
                                             self.check_dsota_coherence,
                                             self.compute_consensus,
                                             self.sqce_consensus_ambig_threshold,
                                             self.max_len_diff_dsota_clust ) )
-            ota_id += 1
         
         
         # Split the list into sublists of defined sizes, such as processes
@@ -1623,15 +1877,28 @@ class MergeStrategy( object ):
             # to the database
             objects_to_insert = []
                     
-            # For each group of DSORFTranscriptAsso to merge, run the MergeDSOTA.merge_dsota() 
-            # static method that will instantiate all the appropriate objects to insert in the 
-            # PRO database
+            # Regroup the groups of DSORFTranscriptAsso to merge into smaller batches, 
+            # such as the statistics of all the groups of a batch are computed at once
+            # and the serialization overhead of the pool is reduced
+            args_for_merging_batches = [ args_for_merging_sublist[ min_bound : min_bound + 
+                                                                   Constants.MERGE_DSOTA_BATCH_SIZE ] \
+                                         for min_bound in xrange( 0, 
+                                                                  len( args_for_merging_sublist ), 
+                                                                  Constants.MERGE_DSOTA_BATCH_SIZE ) ]
+            
+            # For each batch of groups of DSORFTranscriptAsso to merge, run the 
+            # MergeDSOTA.merge_dsota_batch() static method that will instantiate 
+            # all the appropriate objects to insert in the PRO database
+            # NB: The progression is increased by the workers and displayed while waiting for them
             m = MergeDSOTA()
-            all_objects_to_insert = p.map( m.merge_dsota, args_for_merging_sublist )
+            with ProgressionBar.get_instance():
+                all_objects_to_insert = p.map( m.merge_dsota_batch, args_for_merging_batches )
             p.close()
             # Wait for all processes to be completed
             p.join()
             
+            all_objects_to_insert = itertools.chain.from_iterable( all_objects_to_insert )
+            
         
             # Get the new objects to add to the session
             for obj_to_insert_sublist in all_objects_to_insert:
@@ -1671,20 +1938,33 @@ class MergeStrategy( object ):
                     
                 # Log the messages instantiated during the execution 
                 # of the MergeDSOTA.merge_dsota() method
+                # NB: The messages instantiated for each DSORFTranscriptAsso entry 
+                #     by the coherence check are provided as ( code, source, ID, 
+                #     message, args ) tuples and aggregated (see the documentation 
+                #     of the DiagnosticsAggregator class).
                 for warning_message in warning_messages_to_log:
-                    Logger.get_instance().warning( warning_message )
+                    if isinstance( warning_message, tuple ):
+                        DiagnosticsAggregator.get_instance().record( *warning_message )
+                    else:
+                        Logger.get_instance().warning( warning_message )
                     
                 for error_message in error_messages_to_log:
-                    Logger.get_instance().error( error_message, ex = None)
+                    if isinstance( error_message, tuple ):
+                        DiagnosticsAggregator.get_instance().record( *error_message, level = Constants.MODE_ERROR )
+                    else:
+                        Logger.get_instance().error( error_message, ex = None)
                     
-            # Display the progression on the terminal
-            ProgressionBar.get_instance().increase_and_display( add_val = Constants.MAX_POOL_SIZE )
-            
             # Insert the new objects in the PRO database and commit the changes
+            # NB: The ( ORF, Transcript ) couples processed and the IDs of the new 
+            #     ORFTranscriptAsso are registered in the journal with the objects, 
+            #     so the ResumeMerge strategy may skip or replay this chunk.
             self.batch_insert_to_PRO_db( objects_to_insert = objects_to_insert,
-                                         filename = 'orftranscriptasso',
-                                         process = 'grouping DSORFTranscriptAsso entries' )
+                                         filename = Constants.MERGE_JOURNAL_OTA,
+                                         process = 'grouping DSORFTranscriptAsso entries',
+                                         group_keys = [ args[ 1 ] for args in args_for_merging_sublist ],
+                                         entry_ids = [ args[ 0 ] for args in args_for_merging_sublist ] )
             SQLManagerPRO.get_instance().close_session()
+            RunTelemetry.get_instance().add_rows( len( args_for_merging_sublist ) )
             
             # Restart the pool
             p.restart()
@@ -1710,6 +1990,7 @@ class MergeStrategy( object ):
     # @throw DenCellORFException: When an exception has been raised trying to delete the 
     #                             entries of the Transcript table without children.
     # 
+    @RunTelemetry.timed_stage()
     def clean_pro_database( self ):
         
         Logger.get_instance().info( 'Starting to clean the PRO database.')
@@ -1759,53 +2040,200 @@ class MergeStrategy( object ):
     #  ----------------------
     #
     # This method allows to insert a list of objects in the PRO database. 
+    # The objects are first registered as a new chunk in the journal of the step
+    # (see the documentation of the MergeJournal class for more information), then
+    # they are inserted in the database and the chunk is marked as committed in the
+    # journal.
     # 
     # @param objects_to_insert: List - The list of objects to insert in the database.
-    # @param filename: String - The name of the filename where data are saved.
+    # @param filename: String - The name of the journal where data are saved.
     # @param process: String - The name of the process that generated these objects.
     #                          'Undefined process' by default.
+    # @param group_keys: List - The list of keys of the groups of entries that have been 
+    #                           merged to compute the objects. None by default.
+    # @param entry_ids: List - The list of IDs of the new entries of the chunk. None by default.
     # 
-    def batch_insert_to_PRO_db( self, objects_to_insert, filename, process='Undefined process' ):
+    def batch_insert_to_PRO_db( self, objects_to_insert, filename, process='Undefined process', \
+                                group_keys=None, entry_ids=None ):
         
-        # Save into a temporary file the data that should be inserted.
-        self.save_list_of_obj( objects_to_insert = objects_to_insert, 
-                               filename = filename )
+        # Register the data that should be inserted in the journal.
+        chunk_id = None
+        try:
+            journal = self.get_journal( filename )
+            chunk_id = journal.append_chunk( objects_to_insert = objects_to_insert,
+                                             group_keys = group_keys,
+                                             entry_ids = entry_ids )
+        except Exception as e:
+            Logger.get_instance().error( 'MergeStrategy.batch_insert_to_PRO_db():' +
+                                         ' An error occurred trying to save data from ' + 
+                                         process + ' in the ' + filename + ' journal: \n' + str( e ) +
+                                         '\n Error code: ' + LogCodes.ERR_FILEHAND + '.',
+                                         ex = False )
             
         # Insert the objects in the database
         SQLManagerPRO.get_instance().batch_insert_to_db( objects_to_insert = objects_to_insert, 
                                                          process = process )
+        
+        # Register the successful insertion in the journal
+        if chunk_id:
+            try:
+                journal.mark_committed( chunk_id )
+            except Exception as e:
+                Logger.get_instance().error( 'MergeStrategy.batch_insert_to_PRO_db():' +
+                                             ' An error occurred trying to register the insertion of' +
+                                             ' data from ' + process + ' in the ' + filename +
+                                             ' journal: \n' + str( e ) +
+                                             '\n Error code: ' + LogCodes.ERR_FILEHAND + '.',
+                                             ex = False )
+    
     
     
+    ## get_journal
+    #  -----------
+    #
+    # This method allows to get the journal of a step of the merging.
+    # The first time a journal is requested, all its previous records are 
+    # removed, unless it has been registered in the journals dictionary 
+    # (e.g. by the ResumeMerge strategy).
+    # 
+    # @param name: String - The name of the journal.
+    #
+    # @return MergeJournal - The journal.
+    # 
+    def get_journal( self, name ):
+        
+        journal = self.journals.get( name )
+        
+        if ( not journal ):
+            journal = MergeJournal( name, self.merged_data_folder )
+            journal.reset()
+            self.journals[ name ] = journal
+            
+        return journal
+    
     
     
-    ## save_list_of_obj
-    #  ----------------
+    ## merge_with_existing_entries
+    #  ---------------------------
     #
-    # This is a static method that allows to save in a file a list of objects
-    # expected to be added or that have been added to the PRO database.
+    # This method allows to merge the new ORF or Transcript entries with the 
+    # ones that already exist in the PRO database prior to insert them.
+    # As the PRO database is expected to be empty prior to run the Merge 
+    # strategy, this method returns the list of objects unchanged. It is 
+    # overridden by the strategies merging entries into an existing PRO 
+    # database (e.g. DeltaMerge).
+    # 
+    # @param objects_to_insert: List - The list of new objects (entries and association 
+    #                                  entries) to insert in the database.
+    # @param entity_class: Class - The class of the entries (ORF or Transcript).
+    # @param key_attributes: List - The attributes that have to be equal for two 
+    #                               entries to be merged together.
+    # @param lookup_attribute: String - The attribute used to query the existing entries.
+    # @param asso_class: Class - The class of the association entries (ORFDSAsso or 
+    #                            TranscriptDSAsso).
+    # @param asso_fk_attribute: String - The attribute of the association entries 
+    #                                    referencing the entries.
+    # @param att_to_check: List - The attributes which values need to be checked prior 
+    #                             to merge two entries together. None by default
+    #                             (no attribute to check).
     #
-    # NB: So far there is NOT any strategy that allows to use these files 
-    #     to retry the insertion of data into the PRO database if it failed. 
-    #     Nevertheless, if necessary it would be feasible to create a new 
-    #     strategy similar to the InsertionStrategy that uses the content 
-    #     of these file to retry the insertion into the PRO database; saving
-    #     the computation time if the merging occurred successfully but an 
-    #     exception has been raised during the insertion into the database.
+    # @return List - The list of objects to insert in the database.
     # 
-    # @param objects_to_insert: List - The list of objects to insert in the database.
-    # @param filename: String - The name of the filename where data are saved.
+    def merge_with_existing_entries( self, objects_to_insert, entity_class, key_attributes, lookup_attribute, \
+                                     asso_class, asso_fk_attribute, att_to_check=None ):
+        
+        return objects_to_insert
+    
+    
+    
+    ## filter_dsorf_query
+    #  ------------------
+    #
+    # This method allows to restrict a query on the DSORF table to the 
+    # entries located on the chromosomes of the partition being merged 
+    # and provided by the data sources being merged.
+    # 
+    # @param query: Query - The query on the DSORF table.
+    #
+    # @return Query - The filtered query (or the query provided if the merging
+    #                 is neither partitioned nor restricted to some data sources).
     # 
-    @staticmethod
-    def save_list_of_obj( objects_to_insert, filename ):
+    def filter_dsorf_query( self, query ):
         
-        try:
-            FileHandlerUtil.save_obj_to_file( objects_to_save = objects_to_insert,
-                                              filename = 'objects_from_' + filename,
-                                              output_folder = Constants.MERGED_DATA_FOLDER )
-        except Exception as e:
-            Logger.get_instance().error( 'MergeStrategy.batch_insert_to_PRO_db():' +
-                                         ' An error occurred trying to save data from ' + 
-                                         process + ': \n' + str( e ) +
-                                         '\n Error code: ' + LogCodes.ERR_FILEHAND + '.',
-                                         ex = False )
-    
\ No newline at end of file
+        if self.partition_chromosomes:
+            query = query.filter( DSORF.chromosome.in_( self.partition_chromosomes ) )
+        
+        return query.filter( self.get_ds_source_criterion( DSORF ) )
+    
+    
+    
+    ## get_ds_source_criterion
+    #  -----------------------
+    #
+    # This method allows to get the criterion restricting a query on a 
+    # table of the DS database to the entries provided by the data sources
+    # being merged.
+    # 
+    # @param table_class: Class - The class of the table (DS model), which has
+    #                             to define a data_source attribute.
+    #
+    # @return Criterion - The criterion to use to filter the query (always true if 
+    #                     the entries of all the data sources are merged).
+    # 
+    def get_ds_source_criterion( self, table_class ):
+        
+        if self.data_sources:
+            return table_class.data_source.in_( self.data_sources )
+        
+        else:
+            return true()
+    
+    
+    
+    ## get_partition_dsorf_ids_query
+    #  -----------------------------
+    #
+    # This method allows to get a query on the IDs of the DSORF 
+    # entries located on the chromosomes of the partition being merged.
+    # 
+    # @return Query - The query on the DSORF IDs.
+    # 
+    def get_partition_dsorf_ids_query( self ):
+        
+        return SQLManagerDS.get_instance().get_session().query( DSORF.id ).filter( DSORF.chromosome.in_( self.partition_chromosomes ) )
+    
+    
+    
+    ## get_dstranscript_partition_criterion
+    #  ------------------------------------
+    #
+    # This method allows to get the criterion restricting a query on the DSTranscript 
+    # table to the groups of entries related to the partition being merged, i.e. the 
+    # entries that share the value of the attribute provided (e.g. official ID or gene 
+    # ID) with at least one DSTranscript associated with a DSORF of the partition.
+    # NB: As entire groups of DSTranscripts are selected, a group may be merged in 
+    #     several partitions. As the ID of the Transcript created is computed from the 
+    #     IDs of the DSTranscripts merged, it is however the same in all partitions.
+    # 
+    # @param attribute: InstrumentedAttribute - The attribute of the DSTranscript 
+    #                                           used to regroup the entries.
+    #
+    # @return Criterion - The criterion to use to filter the query (always true if 
+    #                     the merging is not partitioned).
+    # 
+    def get_dstranscript_partition_criterion( self, attribute ):
+        
+        if self.partition_chromosomes:
+            partition_dstranscript = aliased( DSTranscript )
+            partition_dstranscript_att_query = SQLManagerDS.get_instance().get_session().query( 
+                                                                                                    getattr( partition_dstranscript, attribute.key ) 
+                                                                                                ).join( 
+                                                                                                        DSORFTranscriptAsso, 
+                                                                                                        DSORFTranscriptAsso.transcript_id == partition_dstranscript.id 
+                                                                                                    ).filter( 
+                                                                                                                DSORFTranscriptAsso.uniq_orf_id.in_( self.get_partition_dsorf_ids_query() ) 
+                                                                                                            )
+            return attribute.in_( partition_dstranscript_att_query )
+        
+        else:
+            return true()
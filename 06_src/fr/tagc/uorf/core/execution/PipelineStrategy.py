@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shlex
+import time
+
+
+from fr.tagc.uorf.core.execution.dbcheck.CheckDatabase import CheckDatabase
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
+from fr.tagc.uorf.core.util.sql.SQLManagerDS import SQLManagerDS
+from fr.tagc.uorf.core.util.sql.SQLManagerPRO import SQLManagerPRO
+from fr.tagc.uorf.core.util.sql.SQLManagerFILT import SQLManagerFILT
+from fr.tagc.uorf.core.util.option.OptionManager import OptionManager
+from fr.tagc.uorf.core.util.option import OptionConstants
+from fr.tagc.uorf.core.util.exception import *
+from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.log.DiagnosticsAggregator import DiagnosticsAggregator
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
+
+
+## PipelineStrategy
+#  ================
+#
+# This class is a strategy aiming to run several strategies (the steps of the
+# pipeline) one after the other, in the same process.
+#
+# The steps are listed in a pipeline file, one strategy followed by its options
+# per line, with the same syntax as the command line, e.g.:
+#     # Build the DS database
+#     Insertion -c $CONFIGFILE_PATH
+#     LiftOver -c $CONFIGFILE_PATH
+# The empty lines and the comments (starting with '#') are ignored, and the
+# environment variables are expanded. All the lines are checked before the first
+# step is run.
+#
+# As the steps are run in the same process, the program and the modules are loaded
+# once, the engines of the databases and the data stored by the singletons (e.g.
+# the DataManager, the Ensembl databases indexed by pyensembl) are shared by the
+# steps, and a database already checked by a previous step is not checked again
+# (unless it has to be overwritten). The sessions to the databases are closed
+# after each step.
+#
+# The level of verbosity may be set for a step (using the -v option), in which case
+# it is only used during this step and the level of the pipeline is restored at the
+# end of the step. Otherwise, the step uses the level of verbosity of the pipeline.
+#
+# Each step is measured as a stage of the run report (named after the strategy,
+# followed by the number of the run when the strategy is run several times).
+#
+class PipelineStrategy( object ):
+
+    ## Constructor of PipelineStrategy
+    #  -------------------------------
+    #
+    # Instance variables:
+    #     - pipeline_file: String - The path to the pipeline file.
+    #     - db_type: String - The type of database used by all the steps.
+    #     - steps: List - The list of steps of the pipeline, as tuples containing:
+    #                         - The name of the step (String).
+    #                         - The name of the strategy (String).
+    #                         - The arguments of the step, i.e. the strategy followed by its options (List).
+    #                         - The number of the line of the pipeline file defining the step (Integer).
+    #                         - The level of verbosity of the step (String), None if the step
+    #                           uses the level of the pipeline.
+    #
+    # @throw DenCellORFException: When the pipeline file cannot be found.
+    # @throw DenCellORFException: When a line of the pipeline file is not valid.
+    #
+    def __init__( self ):
+
+        # Get the pipeline file
+        self.pipeline_file = OptionManager.get_instance().get_option( OptionConstants.OPTION_PIPELINE_FILE,
+                                                                      not_none = True )
+        if ( not os.path.exists( self.pipeline_file ) ):
+            raise DenCellORFException( 'PipelineStrategy: No pipeline file may be found at the path provided (' +
+                                       self.pipeline_file + ').' )
+
+        # Get the type of database
+        # NB: As the model of the databases may only be loaded once,
+        #     all the steps have to use the same type of database
+        self.db_type = OptionManager.get_instance().get_option( OptionConstants.OPTION_DB_TYPE,
+                                                                not_none = False )
+
+        # Parse and check the steps of the pipeline
+        self.steps = self.parse_pipeline_file()
+
+
+
+    ## parse_pipeline_file
+    #  -------------------
+    #
+    # This method allows to parse the pipeline file and to check the options
+    # provided for each step.
+    #
+    # @return steps: List - The list of steps of the pipeline (see the
+    #                       documentation of the constructor).
+    #
+    # @throw DenCellORFException: When a line of the pipeline file is not valid.
+    # @throw DenCellORFException: When the pipeline file does not contain any step.
+    #
+    def parse_pipeline_file( self ):
+
+        steps = []
+        run_counts = {}
+
+        with open( self.pipeline_file, 'r' ) as pipeline_file:
+            for ( line_nb, line ) in enumerate( pipeline_file, 1 ):
+
+                line = line.strip()
+                if ( ( not line ) or line.startswith( Constants.PIPELINE_COMMENT_CHAR ) ):
+                    continue
+
+                line_error = ( 'PipelineStrategy.parse_pipeline_file(): The line ' + str( line_nb ) +
+                               ' of the pipeline file (' + line + ') is not valid: ' )
+
+                # Get the strategy and its options
+                try:
+                    argv = shlex.split( os.path.expandvars( line ), comments = True )
+                except ValueError as e:
+                    raise DenCellORFException( line_error + str( e ) + '.' +
+                                               '\n Error code: ' + LogCodes.ERR_PIPELINE_FILE + '.' )
+
+                strategy = argv[ 0 ]
+                if ( strategy not in OptionConstants.STRATEGIES_LIST ):
+                    raise DenCellORFException( line_error + 'the strategy has to be one of ' +
+                                               ', '.join( OptionConstants.STRATEGIES_LIST ) + '.' +
+                                               '\n Error code: ' + LogCodes.ERR_PIPELINE_FILE + '.' )
+                if ( strategy in OptionConstants.STRATEGIES_NOT_ALLOWED_IN_PIPELINE ):
+                    raise DenCellORFException( line_error + 'the ' + strategy + ' strategy cannot be' +
+                                               ' run as a step of a pipeline.' +
+                                               '\n Error code: ' + LogCodes.ERR_PIPELINE_FILE + '.' )
+
+                # Check the options of the step
+                # NB: The option parser exits the program when the options are not valid
+                # NB: The level of verbosity has no default value here, in order to know
+                #     if it has been set for the step
+                option_parser = OptionManager.build_option_parser( strategy )
+                option_parser.set_default( OptionConstants.OPTION_VERBOSITY, None )
+                try:
+                    ( opts, args ) = option_parser.parse_args( argv[ 1: ] )
+                except SystemExit:
+                    raise DenCellORFException( line_error + 'the options provided are not valid' +
+                                               ' (see the usage above).' +
+                                               '\n Error code: ' + LogCodes.ERR_PIPELINE_FILE + '.' )
+
+                step_db_type = vars( opts ).get( OptionConstants.OPTION_DB_TYPE )
+                if ( ( step_db_type != None ) and ( step_db_type != self.db_type ) ):
+                    raise DenCellORFException( line_error + 'the type of database of the step (' +
+                                               step_db_type + ') has to be the one of the pipeline (' +
+                                               str( self.db_type ) + ').' +
+                                               '\n Error code: ' + LogCodes.ERR_PIPELINE_FILE + '.' )
+
+                step_verbosity = vars( opts ).get( OptionConstants.OPTION_VERBOSITY )
+                if ( ( step_verbosity != None ) and ( step_verbosity not in Constants.LOG_MODES.keys() ) ):
+                    raise DenCellORFException( line_error + 'the level of verbosity has to be one of ' +
+                                               ', '.join( Constants.LOG_MODES.keys() ) + '.' +
+                                               '\n Error code: ' + LogCodes.ERR_PIPELINE_FILE + '.' )
+
+                # Name the step after the strategy
+                run_counts[ strategy ] = run_counts.get( strategy, 0 ) + 1
+                if ( run_counts[ strategy ] == 1 ):
+                    step_name = strategy
+                else:
+                    step_name = strategy + Constants.PIPELINE_STEP_RUN_SEPARATOR + str( run_counts[ strategy ] )
+
+                steps.append( ( step_name, strategy, argv, line_nb, step_verbosity ) )
+
+        if ( not steps ):
+            raise DenCellORFException( 'PipelineStrategy.parse_pipeline_file(): The pipeline file (' +
+                                       self.pipeline_file + ') does not contain any step.' +
+                                       '\n Error code: ' + LogCodes.ERR_PIPELINE_FILE + '.' )
+
+        return steps
+
+
+
+    ## execute
+    #  -------
+    #
+    # Execute the strategy to run the steps of the pipeline.
+    #
+    # @throw DenCellORFException: When an exception has been raised during a step.
+    #
+    def execute( self ):
+
+        Logger.get_instance().info( 'The pipeline contains ' + str( len( self.steps ) ) + ' steps: ' +
+                                    ', '.join( [ step[ 0 ] for step in self.steps ] ) + '.' )
+
+        step_wall_times = []
+        pipeline_log_mode = Logger.get_instance().mode
+
+        for ( step_name, strategy, argv, line_nb, step_verbosity ) in self.steps:
+
+            Logger.get_instance().info( 'Starting the step ' + step_name + ' of the pipeline.' )
+
+            # Set the options of the step
+            OptionManager.get_instance().initialize( argv )
+            if ( OptionManager.get_instance().get_option( OptionConstants.OPTION_DB_TYPE ) == None ):
+                OptionManager.get_instance().set_option( OptionConstants.OPTION_DB_TYPE, self.db_type )
+
+            # Set the level of verbosity of the step
+            if ( step_verbosity != None ):
+                Logger.get_instance().set_mode( Constants.LOG_MODES[ step_verbosity ] )
+
+            # Run the strategy
+            start_time = time.time()
+            try:
+                with RunTelemetry.get_instance().stage( step_name ):
+                    OptionManager.load_strategy_class( strategy )().execute()
+            except Exception as e:
+                raise DenCellORFException( 'PipelineStrategy.execute(): An error occurred during the step ' +
+                                           step_name + ' (line ' + str( line_nb ) + ' of the pipeline file).' +
+                                           '\n Error code: ' + LogCodes.ERR_PIPELINE_STEP + '.', e )
+            finally:
+                # Log the summary of the warnings aggregated during the step
+                DiagnosticsAggregator.get_instance().flush( step_name + ' step' )
+
+                # Close the sessions to the databases (the engines are kept), so that
+                # the next step does not use the objects loaded by the current one
+                for sqlmanager in [ SQLManagerDS, SQLManagerPRO, SQLManagerFILT ]:
+                    sqlmanager.get_instance().close_session()
+
+                # Restore the level of verbosity of the pipeline
+                Logger.get_instance().set_mode( pipeline_log_mode )
+
+            step_wall_times.append( ( step_name, time.time() - start_time ) )
+            Logger.get_instance().info( 'The step ' + step_name + ' has been completed in ' +
+                                        '%.1f' % step_wall_times[ -1 ][ 1 ] + ' s.' )
+
+            # Check again the databases replaced by the step
+            if ( strategy in OptionConstants.STRATEGIES_INVALIDATING_DATABASE_CHECKS ):
+                CheckDatabase.reset_checked_databases()
+
+        # Log the duration of the steps
+        Logger.get_instance().info( 'The pipeline has been completed. Duration of the steps:\n' +
+                                    '\n'.join( [ ( '  ' + step_name + ': ' + '%.1f' % wall_time + ' s' )
+                                                 for ( step_name, wall_time ) in step_wall_times ] ) )
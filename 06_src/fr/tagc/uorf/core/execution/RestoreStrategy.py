@@ -2,9 +2,16 @@
 
 import os
 
+from multiprocessing import cpu_count
+
 
 from fr.tagc.uorf.core.model import *
 
+from fr.tagc.uorf.core.execution.backup.BackupFile import BackupFile
+from fr.tagc.uorf.core.execution.backup.BackupManifest import BackupManifest
+from fr.tagc.uorf.core.execution.backup.RestoreEngine import RestoreEngine
+from fr.tagc.uorf.core.execution.filter.FilterPlanner import FilterPlanner
+
 from fr.tagc.uorf.core.util import Constants
 from fr.tagc.uorf.core.util import LogCodes
 from fr.tagc.uorf.core.util.sql.SQLManagerDS import SQLManagerDS
@@ -17,6 +24,7 @@ from fr.tagc.uorf.core.util.general.FileHandlerUtil import FileHandlerUtil
 from fr.tagc.uorf.core.util.graphics.ProgressionBar import ProgressionBar
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
         
 
 ## RestoreStrategy
@@ -25,6 +33,16 @@ from fr.tagc.uorf.core.util.log.Logger import Logger
 # This class is a strategy aiming to restore a database using 
 # the files created with the Backup strategy.
 #
+# The backup files are read chunk by chunk and loaded using bulk inserts, 
+# the tables that do not depend on each other being restored in parallel
+# (see the documentation of the RestoreEngine class for more information).
+# When the input folder contains incremental backups, the database is
+# restored at the time of the most recent one (or of the one selected), 
+# from the files of the chain of backups referenced by its manifest, unless
+# no backup has been selected and a more recent full backup exists.
+# The files generated by former versions of the Backup strategy (pickled 
+# lists of objects) remain supported.
+#
 class RestoreStrategy( object ):
         
     ## Class variables
@@ -58,8 +76,11 @@ class RestoreStrategy( object ):
     #     - db_model: String - The name of the database model to use (PRO / DS).
     #     - input_folder: String - The path of the folder where to find the data previously saved.
     #     - file_prefix: String - The eventual prefix added to the file names. 
+    #     - backup_id: String - The identifier of the incremental backup to restore.
+    #     - thread_nb: Integer - The number of threads that can be used.
     #
     # @throw DenCellORFException: When the provided database model is not one of those known.
+    # @throw DenCellORFException: When the number of threads provided is not valid.
     #
     def __init__( self ):
         
@@ -98,6 +119,37 @@ class RestoreStrategy( object ):
         # Get the eventual prefix added to the file names
         self.file_prefix = OptionManager.get_instance().get_option( OptionConstants.OPTION_FILE_PREFIX, 
                                                                     not_none = False )
+        
+        # Get the eventual identifier of the incremental backup to restore
+        self.backup_id = OptionManager.get_instance().get_option( OptionConstants.OPTION_BACKUP_ID, 
+                                                                  not_none = False )
+        
+        # Get the number of threads available
+        self.thread_nb = OptionManager.get_instance().get_option( OptionConstants.OPTION_THREAD_NB, 
+                                                                  not_none = False )
+        available_thread_nb = cpu_count()
+        if self.thread_nb:
+            try:
+                self.thread_nb = int( self.thread_nb )
+            except:
+                raise DenCellORFException( 'RestoreStrategy: The value provided for the number of threads' +
+                                           ' needs to be an integer (provided value: ' + 
+                                           str( self.thread_nb ) + ').' )
+            else:
+                if ( self.thread_nb < 1 ):
+                    raise DenCellORFException( 'RestoreStrategy: The value provided for the number of threads' +
+                                               ' needs to be an integer greater than 1 (provided value: ' + 
+                                               str( self.thread_nb ) + ').' )
+                    
+                if ( self.thread_nb > available_thread_nb ):
+                    Logger.get_instance().info( 'The number of threads provided (' + str( self.thread_nb ) +
+                                                ') is greater than the number of threads actually' +
+                                                ' available(' +  str( available_thread_nb ) +
+                                                '). Hence, ' + str( available_thread_nb ) +
+                                                ' threads will be used for the restoration.' )
+                    self.thread_nb = available_thread_nb
+        else:
+            self.thread_nb = available_thread_nb
             
     
     ## execute
@@ -106,12 +158,7 @@ class RestoreStrategy( object ):
     # Execute the strategy to restore the database.
     # 
     # @throw DenCellORFException: When a session to the database cannot be created.
-    # @throw DenCellORFException: When an exception has been raised trying to load the
-    #                             content of a file (generated by the Backup strategy).
-    # @throw DenCellORFException: When an exception has been raised trying to insert
-    #                             an entry into a table of the database.
-    # @throw DenCellORFException: When an exception has been raised trying to commit
-    #                             session.
+    # @throw DenCellORFException: When an exception has been raised trying to restore a table.
     # 
     def execute( self ):
         
@@ -152,70 +199,172 @@ class RestoreStrategy( object ):
         # Get the appropriate order in which the tables needs to be filled in
         order_of_insertion = eval( 'self.' + self.db_model + '_ORDER_OF_INSERTION' )
         
-        # For each table of the list, get the corresponding file, 
-        # upload the content and insert the data in the database
-        for tablename in order_of_insertion:
-            
-            Logger.get_instance().debug( 'Starting to load and insert the data saved from the table ' + 
-                                         tablename + '.' )
-            
-            # Get the name of the file (without its extension)
-            if self.file_prefix:
-                filename = self.file_prefix + tablename
-            else:
-                filename = tablename
-            
-            # Get the content of the file
-            try:
-                objects_to_insert = FileHandlerUtil.get_obj_from_file( input_folder = self.input_folder, 
-                                                                       filename = filename )
-            except Exception as e:
-                raise DenCellORFException( 'A error occurred trying to import the objects to insert in the ' +
-                                           tablename + 'table.' )
-            
-            Logger.get_instance().debug( str( len( objects_to_insert ) ) + ' entries are expected' +
-                                         ' to be inserted into the ' + tablename + ' table.' )
-               
-            # Insert the data 
-            # NB: Using the add_all() method of the session does not work (probably because
-            #     the objects saved in the file were mapped to the session). Hence, it is 
-            #     necessary to add the objects one at a time using the merge method.
-            
-            # Get the number total number of elements expected to be treated and
-            # reset the ProgressionBar instance to follow the progression
-            ProgressionBar.get_instance().reset_instance( total = len( objects_to_insert ) )
+        # Get the manifest of the incremental backup to restore, if any
+        manifest = self.get_manifest( order_of_insertion )
+        if ( manifest != None ):
+            Logger.get_instance().info( 'The database will be restored from the incremental backup ' + 
+                                        manifest.backup_id + '.' )
+        
+        # Group the tables into levels of insertion, such as the tables of a same
+        # level do not depend on each other and can be restored concurrently
+        restore_engine = RestoreEngine( db_model = self.db_model,
+                                        db_settings = self.db_settings,
+                                        thread_nb = self.thread_nb )
+        insertion_levels = RestoreEngine.get_insertion_levels( order_of_insertion )
+        
+        for level in insertion_levels:
             
-            for entry in objects_to_insert:
+            Logger.get_instance().debug( 'Starting to load and insert the data saved from the tables ' + 
+                                         ', '.join( level ) + '.' )
             
-                # Update and display the progression bar on the console
-                ProgressionBar.get_instance().increase_and_display()
-
-                try:
-                    self.get_sqlmanager_instance().get_session().merge( entry )
-                except Exception as e:
-                    raise DenCellORFException( 'An error occurred trying to insert the data into the ' +
-                                               tablename + ' table. Please make sure the backup occurred' +
-                                               ' successfully', e )
+            # Get the files from which the tables have to be restored
+            backup_files = {}
+            legacy_tables = []
+            for tablename in level:
+                
+                # Get the name of the file (without its extension)
+                if self.file_prefix:
+                    filename = self.file_prefix + tablename
+                else:
+                    filename = tablename
+                
+                # Restore the table from the chain of incremental backups, from
+                # the chunked backup file if it exists, otherwise from the file
+                # generated by former versions of the strategy
+                file_path = BackupFile.get_file_path( self.input_folder, filename )
+                if ( ( manifest != None ) and ( tablename in manifest.tables ) ):
+                    backup_files[ tablename ] = manifest.get_chunk_sources( tablename )
+                elif os.path.exists( file_path ):
+                    backup_files[ tablename ] = [ ( file_path, None ) ]
+                else:
+                    legacy_tables.append( ( tablename, filename ) )
+                    
+            if backup_files:
+                self.get_sqlmanager_instance().close_session()
+                restore_engine.restore_tables( backup_files )
             
-            # Commit the session
-            try:
-                self.get_sqlmanager_instance().commit()
-            except Exception as e:
-                raise DenCellORFException( 'An error occurred trying to commit changes after insertion' +
-                                           ' of data in the ' + tablename + ' table.' +
-                                           '\n Error code: ' + LogCodes.ERR_SQL_SESSION + '.' )
+            for ( tablename, filename ) in legacy_tables:
+                self.restore_table_from_legacy_file( tablename, filename )
                 
-            entry_count = self.get_sqlmanager_instance().get_session().query( eval( tablename ) ).count()
-            Logger.get_instance().debug( str( entry_count ) + ' entries have been successfully added' +
-                                         ' to the ' + tablename + ' table.' )
-            self.get_sqlmanager_instance().close_session()
+                entry_count = self.get_sqlmanager_instance().get_session().query( eval( tablename ) ).count()
+                Logger.get_instance().debug( str( entry_count ) + ' entries have been successfully added' +
+                                             ' to the ' + tablename + ' table.' )
+                self.get_sqlmanager_instance().close_session()
+        
+        # Update the content version of the PRO database, such as the key sets
+        # computed by the Filter strategy on the former content are not used
+        if ( self.db_model == OptionConstants.DATABASE_DECLARATIVE_PRO ):
+            FilterPlanner.update_content_version()
         
         # Log the end of the restoration
         Logger.get_instance().info( 'Restoration of the database has finished.' )
             
     
     
-    ## get_sqlmanager_instance
+    ## get_manifest
+    #  ------------
+    #
+    # This method allows to get the manifest of the incremental backup to restore.
+    # When the identifier of a backup has been provided, its manifest is always used.
+    # Otherwise, the manifest of the most recent incremental backup is only used if 
+    # it is more recent than all the files of the full backup saved in the same folder,
+    # as the database has otherwise to be restored from these files.
+    #
+    # @param order_of_insertion: List - The names of the tables to restore.
+    #
+    # @return manifest: BackupManifest - The manifest, or None if the database 
+    #                                    has to be restored from the full backup.
+    #
+    def get_manifest( self, order_of_insertion ):
+        
+        manifest = BackupManifest.load( folder = self.input_folder,
+                                        file_prefix = self.file_prefix,
+                                        backup_id = self.backup_id )
+        
+        if ( ( manifest == None ) or ( self.backup_id != None ) ):
+            return manifest
+        
+        manifest_mtime = os.path.getmtime( BackupManifest.get_manifest_path( self.input_folder,
+                                                                             self.file_prefix,
+                                                                             manifest.backup_id ) )
+        
+        for tablename in order_of_insertion:
+            file_path = BackupFile.get_file_path( self.input_folder,
+                                                  ( self.file_prefix if self.file_prefix else '' ) + tablename )
+            if ( os.path.exists( file_path ) and ( os.path.getmtime( file_path ) > manifest_mtime ) ):
+                Logger.get_instance().info( 'The full backup saved in the folder ' + self.input_folder +
+                                            ' is more recent than the incremental backup ' + 
+                                            manifest.backup_id + ', hence the database will be restored' +
+                                            ' from the full backup.' )
+                return None
+        
+        return manifest
+    
+    
+    
+    ## restore_table_from_legacy_file
+    #  ------------------------------
+    #
+    # This method allows to restore the content of a table from a file 
+    # generated by former versions of the Backup strategy (i.e. a file
+    # containing the pickled list of all the objects of the table).
+    #
+    # @param tablename: String - The name of the class of the table.
+    # @param filename: String - The name of the file (without its extension).
+    # 
+    # @throw DenCellORFException: When an exception has been raised trying to load the
+    #                             content of the file.
+    # @throw DenCellORFException: When an exception has been raised trying to insert
+    #                             an entry into a table of the database.
+    # @throw DenCellORFException: When an exception has been raised trying to commit
+    #                             session.
+    #
+    @RunTelemetry.timed_stage()
+    def restore_table_from_legacy_file( self, tablename, filename ):
+        
+        # Get the content of the file
+        try:
+            objects_to_insert = FileHandlerUtil.get_obj_from_file( input_folder = self.input_folder, 
+                                                                   filename = filename )
+        except Exception as e:
+            raise DenCellORFException( 'A error occurred trying to import the objects to insert in the ' +
+                                       tablename + 'table.' )
+        
+        Logger.get_instance().debug( str( len( objects_to_insert ) ) + ' entries are expected' +
+                                     ' to be inserted into the ' + tablename + ' table.' )
+        
+        # Insert the data 
+        # NB: Using the add_all() method of the session does not work (probably because
+        #     the objects saved in the file were mapped to the session). Hence, it is 
+        #     necessary to add the objects one at a time using the merge method.
+        
+        # Get the number total number of elements expected to be treated and
+        # reset the ProgressionBar instance to follow the progression
+        ProgressionBar.get_instance().reset_instance( total = len( objects_to_insert ) )
+        
+        for entry in objects_to_insert:
+        
+            # Update and display the progression bar on the console
+            ProgressionBar.get_instance().increase_and_display()
+        
+            try:
+                self.get_sqlmanager_instance().get_session().merge( entry )
+            except Exception as e:
+                raise DenCellORFException( 'An error occurred trying to insert the data into the ' +
+                                           tablename + ' table. Please make sure the backup occurred' +
+                                           ' successfully', e )
+        
+        # Commit the session
+        try:
+            self.get_sqlmanager_instance().commit()
+        except Exception as e:
+            raise DenCellORFException( 'An error occurred trying to commit changes after insertion' +
+                                       ' of data in the ' + tablename + ' table.' +
+                                       '\n Error code: ' + LogCodes.ERR_SQL_SESSION + '.' )
+            
+    
+    
+            ## get_sqlmanager_instance
     #  -----------------------
     #
     # Return the appropriate SQLManager instance.
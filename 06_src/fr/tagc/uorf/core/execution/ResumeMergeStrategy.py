@@ -5,6 +5,8 @@ from fr.tagc.uorf.core.model import *
 
 from fr.tagc.uorf.core.execution.DatabaseCheckStrategy import DatabaseCheckStrategy
 from fr.tagc.uorf.core.execution.MergeStrategy import MergeStrategy
+from fr.tagc.uorf.core.execution.filter.FilterPlanner import FilterPlanner
+from fr.tagc.uorf.core.execution.merge.MergeJournal import MergeJournal
 
 from fr.tagc.uorf.core.util import Constants
 from fr.tagc.uorf.core.util import LogCodes
@@ -36,6 +38,10 @@ from fr.tagc.uorf.core.util.log.Logger import Logger
 #   NB: Resuming at this stage assumes that the dictionary that associates to each unique 
 #       ( ORF ID (PRO), Transcript ID (PRO) ) couples to the list of all the DSORFTranscriptAsso 
 #       (DS) that are related to it has already been successfully computed and saved.
+#   NB: At this stage, the journal of the merging is used to skip all the chunks of 
+#       ( ORF ID (PRO), Transcript ID (PRO) ) couples already processed and to replay
+#       the chunks for which the insertion in the PRO database has not been completed
+#       (see the documentation of the MergeJournal class for more information).
 # - After having successfully computed and inserted the content of the ORFTranscriptAsso
 #   table.
 #
@@ -92,6 +98,7 @@ class ResumeMergeStrategy( MergeStrategy ):
     #
     # @throw DenCellORFException - When the name of the step at which resume the merging
     #                              is unknown.
+    # @throw DenCellORFException - When partitions are provided without partition index.
     #
     def __init__( self ):
 
@@ -105,6 +112,12 @@ class ResumeMergeStrategy( MergeStrategy ):
                                        self.resume_at_stage + ') is not allowed.' +
                                        ' Please use one of the following list: ' +
                                        ', '.join( ResumeMergeStrategy.RESUME_STAGES_LIST ) + '.' )
+        
+        # The merging of a partitioned database has to be resumed one partition at a time
+        if ( self.partitions and ( self.partition_index == None ) ):
+            raise DenCellORFException( 'The merging of a partitioned database has to be resumed for' +
+                                       ' each partition separately. Please provide the index of the' +
+                                       ' partition to resume.' )
     
     
     
@@ -274,6 +287,10 @@ class ResumeMergeStrategy( MergeStrategy ):
             except Exception as e:
                 raise DenCellORFException( 'ResumeMergeStrategy.execute(): An error occurred trying to' +
                                            ' clean the database after merging.', e )
+        
+        # Update the content version of the PRO database, such as the key sets
+        # computed by the Filter strategy on the former content are not used
+        FilterPlanner.update_content_version()
                 
                 
     
@@ -335,7 +352,7 @@ class ResumeMergeStrategy( MergeStrategy ):
         # Get the dictionary that associates to each unique ( ORF ID (PRO), 
         # Transcript ID (PRO) ) couple that exists the list of the IDs of 
         # all the DSORFTranscriptAsso (DS) that are related to it 
-        all_existing_orf_tr_asso_ids = FileHandlerUtil.get_obj_from_file( input_folder = Constants.MERGED_DATA_FOLDER,
+        all_existing_orf_tr_asso_ids = FileHandlerUtil.get_obj_from_file( input_folder = self.merged_data_folder,
                                                                           filename = Constants.ALL_EXISTING_ORF_TR_ASSO_IDS_FILENAME )
         
         # Convert the dictionary in order to change the list of IDs
@@ -355,10 +372,37 @@ class ResumeMergeStrategy( MergeStrategy ):
         # been started once and failed, then remove from the list 
         # all the (ORF ID, Transcript ID) couples already processed 
         if ( self.resume_at_stage == ResumeMergeStrategy.RESUME_DURING_OTA ):
-            all_processed_ota = SQLManagerPRO.get_instance().get_session().query( ORFTranscriptAsso ).all()
-            SQLManagerPRO.get_instance().close_session()
             
-            all_processed_ids = [ ( ota.orf_id, ota.transcript_id ) for ota in all_processed_ota ]
+            journal = MergeJournal( Constants.MERGE_JOURNAL_OTA, self.merged_data_folder )
+            chunks = journal.recover()
+            
+            # If the journal of the merging is available, replay the chunks that 
+            # have not been successfully inserted and skip all the couples 
+            # registered in the journal
+            if chunks:
+                all_processed_ids = set()
+                replayed_chunk_count = 0
+                
+                for chunk in chunks:
+                    if ( not chunk.get( 'committed' ) ):
+                        self.replay_chunk( journal, chunk )
+                        replayed_chunk_count += 1
+                    all_processed_ids.update( chunk.get( 'group_keys' ) )
+                
+                # Keep using the same journal for the remaining couples
+                self.journals[ Constants.MERGE_JOURNAL_OTA ] = journal
+                
+                Logger.get_instance().debug( 'ResumeMergeStrategy.import_dsorftranscriptasso_to_merge(): ' +
+                                             str( len( chunks ) ) + ' chunks have been found in the journal' +
+                                             ' (' + str( replayed_chunk_count ) + ' of them have been' +
+                                             ' replayed).' )
+            
+            # Otherwise, get the list of couples already processed from the database
+            else:
+                all_processed_ota = SQLManagerPRO.get_instance().get_session().query( ORFTranscriptAsso ).all()
+                SQLManagerPRO.get_instance().close_session()
+                
+                all_processed_ids = set( [ ( ota.orf_id, ota.transcript_id ) for ota in all_processed_ota ] )
             
             existing_orf_tr_asso_all_to_process = { key : val \
                                                     for ( key, val ) in existing_orf_tr_asso_all.items() \
@@ -367,10 +411,63 @@ class ResumeMergeStrategy( MergeStrategy ):
             existing_orf_tr_asso_all = existing_orf_tr_asso_all_to_process
             
             Logger.get_instance().debug( 'ResumeMergeStrategy.import_dsorftranscriptasso_to_merge(): ' +
-                                         str( len( all_processed_ota ) ) + ' couples have already been' +
+                                         str( len( all_processed_ids ) ) + ' couples have already been' +
                                          ' processed and ' + str( len( existing_orf_tr_asso_all.keys() ) ) + 
                                          ' remains to be processed.' )
         
         # Store the dictionary in the DataManager main dictionary
         DataManager.get_instance().store_data( Constants.DM_ALL_EXISTING_ORF_TR_ASSO_DICT, existing_orf_tr_asso_all )
-        
\ No newline at end of file
+                
+        
+    
+    ## replay_chunk
+    #  ------------
+    #
+    # This method allows to insert in the PRO database the objects of a chunk registered 
+    # in the journal for which the insertion has not been completed. 
+    # The ORFTranscriptAsso entries (and their children) which IDs have been registered
+    # with the chunk (and that could have been partially inserted) are first removed from 
+    # the database, then all the objects of the chunk are inserted, except the catalog 
+    # entries that already exist in the database.
+    # 
+    # @param journal: MergeJournal - The journal.
+    # @param chunk: Dictionary - The chunk, as returned by the MergeJournal.recover() method.
+    #
+    # @throw DenCellORFException: When an exception has been raised trying to remove the 
+    #                             entries partially inserted.
+    # 
+    def replay_chunk( self, journal, chunk ):
+        
+        Logger.get_instance().debug( 'ResumeMergeStrategy.replay_chunk(): Replaying the chunk ' + 
+                                     chunk.get( 'chunk_id' ) + ' of the journal ' + 
+                                     journal.file_path + '.' )
+        
+        # Remove the entries that could have been partially inserted
+        entry_ids = chunk.get( 'entry_ids' )
+        if entry_ids:
+            try:
+                for ota_child_table in [ ORFTranscriptAssoDSAsso, CellContext, ProvidedCategory, FLOSSClass ]:
+                    SQLManagerPRO.get_instance().get_session().query( ota_child_table ).filter( ota_child_table.orftranscriptasso_id.in_( entry_ids ) ).delete( synchronize_session = False )
+                SQLManagerPRO.get_instance().get_session().query( ORFTranscriptAsso ).filter( ORFTranscriptAsso.id.in_( entry_ids ) ).delete( synchronize_session = False )
+            except Exception as e:
+                raise DenCellORFException( 'ResumeMergeStrategy.replay_chunk(): An error occurred trying' +
+                                           ' to delete the ' + str( len( entry_ids ) ) + ' ORFTranscriptAsso' +
+                                           ' entries registered with the chunk.', e )
+            else:
+                SQLManagerPRO.get_instance().commit()
+                SQLManagerPRO.get_instance().close_session()
+        
+        # Get the catalog entries already existing in the database
+        existing_catalog_entries = set()
+        for catalog_table in [ CellContextCatalog, ProvidedCategoryCatalog, FLOSSClassCatalog ]:
+            existing_catalog_entries.update( SQLManagerPRO.get_instance().get_session().query( catalog_table ).all() )
+        SQLManagerPRO.get_instance().close_session()
+        
+        # Insert the objects of the chunk
+        objects_to_insert = [ obj for obj in journal.load_chunk_objects( chunk ) \
+                              if ( obj not in existing_catalog_entries ) ]
+        
+        SQLManagerPRO.get_instance().batch_insert_to_db( objects_to_insert = objects_to_insert, 
+                                                         process = 'replaying a chunk of the journal' )
+        
+        journal.mark_committed( chunk.get( 'chunk_id' ) )
@@ -0,0 +1,471 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import pickle
+import time
+
+from pathos.multiprocessing import ProcessingPool as Pool
+from sqlalchemy import select
+
+
+from fr.tagc.uorf.core.execution.backup.BackupFile import BackupFile
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
+from fr.tagc.uorf.core.util.sql.SQLManagerDS import SQLManagerDS
+from fr.tagc.uorf.core.util.sql.SQLManagerPRO import SQLManagerPRO
+from fr.tagc.uorf.core.util.sql.SQLManagerFILT import SQLManagerFILT
+from fr.tagc.uorf.core.util.exception import *
+from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
+
+
+## BackupEngine
+#  ============
+#
+# This class allows to save the content of the tables of a database into
+# backup files (see the documentation of the BackupFile class for more
+# information about the format of these files).
+#
+# The content of each table is streamed from the database using a server-side
+# cursor, ordered by primary key, and written by chunks of fixed size, such as
+# the memory usage does not depend on the size of the tables. As the tables are
+# independent from each other, they are saved in parallel by several processes,
+# each of them using its own connection to the database.
+#
+# In incremental mode, the rows of each table are grouped into ranges of consecutive
+# values of the first column of the primary key (integer identifiers), and a hash of
+# the content of each range is computed. Only the ranges for which the hash changed
+# since the previous backup are saved (one chunk per range), and the locations of
+# all the ranges are recorded in a manifest (see the documentation of the
+# BackupManifest class). The rows of the tables for which the first column of the
+# primary key is not an integer are grouped into ranges of consecutive rows (in the
+# order of the primary key), such as the memory usage remains bounded.
+#
+# NB: This class has been optimized for multi-processing.
+#
+class BackupEngine( object ):
+
+    ## Constructor of BackupEngine
+    #  ---------------------------
+    #
+    # Instance variables:
+    #     - db_model: String - The name of the database model (PRO / DS / FILT).
+    #     - db_settings: Dictionary - The settings of the database.
+    #     - output_folder: String - The path of the folder where to save the files.
+    #     - file_prefix: String - The prefix to add to the file names.
+    #     - thread_nb: Integer - The number of processes that can be used.
+    #     - chunk_size: Integer - The number of rows saved in each chunk.
+    #
+    # @param db_model: String - The name of the database model (PRO / DS / FILT).
+    # @param db_settings: Dictionary - The settings of the database.
+    # @param output_folder: String - The path of the folder where to save the files.
+    # @param file_prefix: String - The prefix to add to the file names. None by default.
+    # @param thread_nb: Integer - The number of processes that can be used. 1 by default.
+    # @param chunk_size: Integer - The number of rows saved in each chunk.
+    #                              Constants.BACKUP_CHUNK_SIZE by default.
+    #
+    def __init__( self, db_model, db_settings, output_folder, file_prefix=None, thread_nb=1,
+                  chunk_size=Constants.BACKUP_CHUNK_SIZE ):
+
+        self.db_model = db_model
+        self.db_settings = db_settings
+        self.output_folder = output_folder
+        self.file_prefix = file_prefix
+        self.thread_nb = thread_nb
+        self.chunk_size = chunk_size
+
+
+
+    ## get_filename
+    #  ------------
+    #
+    # This method allows to get the name of the file in which a table is saved.
+    #
+    # @param class_name: String - The name of the class of the table.
+    #
+    # @return String - The name of the file (without extension).
+    #
+    def get_filename( self, class_name ):
+
+        if self.file_prefix:
+            return ( self.file_prefix + class_name )
+        else:
+            return class_name
+
+
+
+    ## backup_tables
+    #  -------------
+    #
+    # This method allows to save the content of several tables.
+    #
+    # @param table_classes: Dictionary - The dictionary that associates to the name
+    #                                    of each class of the model its table name.
+    # @param manifest: BackupManifest - The manifest of the current backup, when running
+    #                                   an incremental backup. None by default.
+    # @param previous_manifest: BackupManifest - The manifest of the previous backup, when
+    #                                            running an incremental backup. None by default.
+    #
+    # @return summaries: List - The list of the summaries of the backup of each table
+    #                           (see the documentation of the backup_table() method).
+    #
+    # @throw DenCellORFException: When the backup of a table failed.
+    #
+    @RunTelemetry.timed_stage()
+    def backup_tables( self, table_classes, manifest=None, previous_manifest=None ):
+
+        if ( manifest == None ):
+            backup_function = BackupEngine.backup_table
+            args_for_backup = [ ( self.db_model,
+                                  self.db_settings,
+                                  class_name,
+                                  table_classes[ class_name ],
+                                  BackupFile.get_file_path( self.output_folder, self.get_filename( class_name ) ),
+                                  self.chunk_size ) for class_name in sorted( table_classes.keys() ) ]
+        else:
+            backup_function = BackupEngine.backup_table_incremental
+            args_for_backup = [ ( self.db_model,
+                                  self.db_settings,
+                                  class_name,
+                                  table_classes[ class_name ],
+                                  manifest.get_table_file_path( class_name ),
+                                  self.chunk_size,
+                                  manifest.range_size,
+                                  manifest.backup_id,
+                                  ( previous_manifest.get_table_ranges( class_name ) if previous_manifest else {} ) ) \
+                                for class_name in sorted( table_classes.keys() ) ]
+
+        thread_nb = min( self.thread_nb, len( args_for_backup ) )
+        Logger.get_instance().debug( 'BackupEngine.backup_tables(): ' + str( len( args_for_backup ) ) +
+                                     ' tables will be saved using ' + str( thread_nb ) + ' processes.' )
+
+        if ( thread_nb > 1 ):
+            p = Pool( thread_nb )
+            results = p.map( backup_function, args_for_backup )
+            p.close()
+            # Wait for all processes to be completed
+            p.join()
+            # Delete the pool instance
+            p.clear()
+        else:
+            results = map( backup_function, args_for_backup )
+
+        summaries = []
+        for ( summary, error_message ) in results:
+            if ( error_message != None ):
+                raise DenCellORFException( 'BackupEngine.backup_tables(): An error occurred trying to' +
+                                           ' save the ' + summary[ 'table_name' ] + ' table: ' +
+                                           error_message +
+                                           '\n Error code: ' + LogCodes.ERR_BACKUP + '.' )
+            if ( manifest != None ):
+                manifest.tables[ summary[ 'class_name' ] ] = summary.pop( 'ranges' )
+            BackupEngine.log_summary( summary )
+            RunTelemetry.get_instance().add_rows( summary[ 'row_count' ] )
+            summaries.append( summary )
+
+        return summaries
+
+
+
+    ## backup_table
+    #  ------------
+    #
+    # This is a static method that allows to save the content of one table
+    # into a backup file. It is expected to be run in a separate process.
+    #
+    # @param args: Tuple - The tuple of arguments, containing:
+    #                          - db_model: String - The name of the database model.
+    #                          - db_settings: Dictionary - The settings of the database.
+    #                          - class_name: String - The name of the class of the table.
+    #                          - table_name: String - The name of the table.
+    #                          - file_path: String - The path to the backup file.
+    #                          - chunk_size: Integer - The number of rows saved in each chunk.
+    #
+    # @return 2-tuple - The ( summary, error_message ) tuple, where:
+    #                       - summary: Dictionary - The summary of the backup, with the 'class_name',
+    #                                  'table_name', 'file_path', 'row_count', 'chunk_count',
+    #                                  'file_size' and 'elapsed_time' keys.
+    #                       - error_message: String - The message of the error that occurred,
+    #                                        None if the backup has been successful.
+    #
+    @staticmethod
+    def backup_table( args ):
+
+        ( db_model, db_settings, class_name, table_name, file_path, chunk_size ) = args
+
+        summary = { 'class_name': class_name,
+                    'table_name': table_name,
+                    'file_path': file_path,
+                    'row_count': 0,
+                    'chunk_count': 0,
+                    'file_size': 0,
+                    'elapsed_time': 0 }
+
+        start_time = time.time()
+        backup_file = BackupFile( file_path )
+
+        try:
+            # Use a new SQLManager instance, such as each process
+            # uses its own connection to the database
+            sqlmanager = BackupEngine.get_sqlmanager( db_model, db_settings )
+            table = sqlmanager.get_declarative_base().metadata.tables[ table_name ]
+
+            backup_file.open_for_writing( db_model = db_model,
+                                          table_name = class_name,
+                                          columns = [ ( column.name, column.type.__class__.__name__ ) \
+                                                      for column in table.columns ] )
+
+            # Stream the content of the table using a server-side cursor
+            connection = sqlmanager.get_engine().connect()
+            try:
+                query = select( [ table ] ).order_by( *table.primary_key.columns )
+                result = connection.execution_options( stream_results = True ).execute( query )
+                rows = result.fetchmany( chunk_size )
+                while ( len( rows ) != 0 ):
+                    backup_file.write_chunk( [ tuple( row ) for row in rows ] )
+                    rows = result.fetchmany( chunk_size )
+                result.close()
+
+            finally:
+                connection.close()
+                sqlmanager.get_engine().dispose()
+
+            backup_file.close_writing()
+
+        except Exception as e:
+            backup_file.abort_writing()
+            return ( summary, str( e ) )
+
+        summary[ 'row_count' ] = backup_file.row_count
+        summary[ 'chunk_count' ] = backup_file.chunk_count
+        summary[ 'file_size' ] = os.path.getsize( file_path )
+        summary[ 'elapsed_time' ] = time.time() - start_time
+
+        return ( summary, None )
+
+
+
+    ## backup_table_incremental
+    #  ------------------------
+    #
+    # This is a static method that allows to save the ranges of one table
+    # that changed since the previous backup. It is expected to be run in
+    # a separate process.
+    #
+    # @param args: Tuple - The tuple of arguments, containing:
+    #                          - db_model: String - The name of the database model.
+    #                          - db_settings: Dictionary - The settings of the database.
+    #                          - class_name: String - The name of the class of the table.
+    #                          - table_name: String - The name of the table.
+    #                          - file_path: String - The path to the backup file.
+    #                          - chunk_size: Integer - The number of rows fetched at once.
+    #                          - range_size: Integer - The number of consecutive primary
+    #                                        key values of each range.
+    #                          - backup_id: String - The identifier of the current backup.
+    #                          - previous_ranges: Dictionary - The ranges of the table recorded
+    #                                             in the manifest of the previous backup.
+    #
+    # @return 2-tuple - The ( summary, error_message ) tuple, where:
+    #                       - summary: Dictionary - The summary of the backup (see the documentation
+    #                                  of the backup_table() method), with the additional 'range_count',
+    #                                  'changed_range_count' and 'ranges' keys ('ranges' being the
+    #                                  dictionary of ranges of the table to record in the manifest).
+    #                       - error_message: String - The message of the error that occurred,
+    #                                        None if the backup has been successful.
+    #
+    @staticmethod
+    def backup_table_incremental( args ):
+
+        ( db_model, db_settings, class_name, table_name, file_path,
+          chunk_size, range_size, backup_id, previous_ranges ) = args
+
+        summary = { 'class_name': class_name,
+                    'table_name': table_name,
+                    'file_path': file_path,
+                    'row_count': 0,
+                    'chunk_count': 0,
+                    'file_size': 0,
+                    'elapsed_time': 0,
+                    'range_count': 0,
+                    'changed_range_count': 0,
+                    'ranges': {} }
+
+        start_time = time.time()
+        backup_file = BackupFile( file_path )
+
+        try:
+            sqlmanager = BackupEngine.get_sqlmanager( db_model, db_settings )
+            table = sqlmanager.get_declarative_base().metadata.tables[ table_name ]
+            columns = [ ( column.name, column.type.__class__.__name__ ) for column in table.columns ]
+
+            # Get the position of the first column of the primary key
+            range_column_index = [ column.name for column in table.columns ].index( list( table.primary_key.columns )[ 0 ].name )
+
+            connection = sqlmanager.get_engine().connect()
+            try:
+                query = select( [ table ] ).order_by( *table.primary_key.columns )
+                result = connection.execution_options( stream_results = True ).execute( query )
+
+                # As the rows are ordered by primary key, the rows
+                # of a same range are fetched consecutively
+                range_key = None
+                range_rows = []
+                row_index = 0
+                rows = result.fetchmany( chunk_size )
+                while ( len( rows ) != 0 ):
+                    for row in rows:
+                        row = tuple( row )
+                        row_range_key = BackupEngine.get_range_key( row[ range_column_index ], row_index, range_size )
+                        row_index += 1
+                        if ( ( row_range_key != range_key ) and ( len( range_rows ) != 0 ) ):
+                            BackupEngine.save_range( backup_file, db_model, class_name, columns, backup_id,
+                                                     range_key, range_rows, previous_ranges, summary )
+                            range_rows = []
+                        range_key = row_range_key
+                        range_rows.append( row )
+                    rows = result.fetchmany( chunk_size )
+                result.close()
+
+                if ( len( range_rows ) != 0 ):
+                    BackupEngine.save_range( backup_file, db_model, class_name, columns, backup_id,
+                                             range_key, range_rows, previous_ranges, summary )
+
+            finally:
+                connection.close()
+                sqlmanager.get_engine().dispose()
+
+            # Only keep the file if at least one range changed
+            if ( backup_file.file != None ):
+                backup_file.close_writing()
+                summary[ 'file_size' ] = os.path.getsize( file_path )
+
+        except Exception as e:
+            backup_file.abort_writing()
+            return ( summary, str( e ) )
+
+        summary[ 'chunk_count' ] = backup_file.chunk_count
+        summary[ 'elapsed_time' ] = time.time() - start_time
+
+        return ( summary, None )
+
+
+
+    ## get_range_key
+    #  -------------
+    #
+    # This is a static method that allows to get the key of the range
+    # to which a row belongs. The ranges are defined by the value of 
+    # the first column of the primary key when it is an integer, and
+    # by the position of the row (in the order of the primary key) 
+    # otherwise.
+    #
+    # @param value: Object - The value of the first column of the primary key.
+    # @param row_index: Integer - The position of the row in the table.
+    # @param range_size: Integer - The number of consecutive values (or rows) of each range.
+    #
+    # @return Integer - The key of the range.
+    #
+    @staticmethod
+    def get_range_key( value, row_index, range_size ):
+
+        if ( isinstance( value, ( int, long ) ) and ( not isinstance( value, bool ) ) ):
+            return ( value // range_size )
+        else:
+            return ( row_index // range_size )
+
+
+
+    ## save_range
+    #  ----------
+    #
+    # This is a static method that allows to compute the hash of a range of rows
+    # and to save it in the backup file if it changed since the previous backup.
+    #
+    # @param backup_file: BackupFile - The backup file of the table.
+    # @param db_model: String - The name of the database model.
+    # @param class_name: String - The name of the class of the table.
+    # @param columns: List - The list of columns of the table, as ( name, type ) tuples.
+    # @param backup_id: String - The identifier of the current backup.
+    # @param range_key: Integer - The key of the range.
+    # @param range_rows: List - The rows of the range.
+    # @param previous_ranges: Dictionary - The ranges of the table recorded in the
+    #                                      manifest of the previous backup.
+    # @param summary: Dictionary - The summary of the backup of the table, updated
+    #                              by this method.
+    #
+    @staticmethod
+    def save_range( backup_file, db_model, class_name, columns, backup_id, range_key, range_rows, previous_ranges, summary ):
+
+        range_hash = hashlib.sha1()
+        for row in range_rows:
+            range_hash.update( pickle.dumps( row, pickle.HIGHEST_PROTOCOL ) )
+        range_hash = range_hash.hexdigest()
+
+        summary[ 'row_count' ] += len( range_rows )
+        summary[ 'range_count' ] += 1
+
+        previous_range = previous_ranges.get( range_key )
+        if ( ( previous_range != None ) and ( previous_range[ 0 ] == range_hash ) ):
+            # Keep the location of the range saved during a previous backup
+            summary[ 'ranges' ][ range_key ] = previous_range
+
+        else:
+            if ( backup_file.file == None ):
+                backup_file.open_for_writing( db_model = db_model,
+                                              table_name = class_name,
+                                              columns = columns )
+            backup_file.write_chunk( range_rows )
+            summary[ 'ranges' ][ range_key ] = ( range_hash, len( range_rows ), backup_id, backup_file.chunk_count - 1 )
+            summary[ 'changed_range_count' ] += 1
+
+
+
+    ## get_sqlmanager
+    #  --------------
+    #
+    # This is a static method that allows to get a new SQLManager instance
+    # connected to the database.
+    #
+    # @param db_model: String - The name of the database model (PRO / DS / FILT).
+    # @param db_settings: Dictionary - The settings of the database.
+    #
+    # @return sqlmanager: SQLManager - The new SQLManager instance.
+    #
+    @staticmethod
+    def get_sqlmanager( db_model, db_settings ):
+
+        sqlmanager = eval( 'SQLManager' + db_model )()
+        sqlmanager.set_db_settings( db_settings )
+
+        return sqlmanager
+
+
+
+    ## log_summary
+    #  -----------
+    #
+    # This is a static method that allows to log the summary of the backup of a table.
+    #
+    # @param summary: Dictionary - The summary of the backup of the table.
+    #
+    @staticmethod
+    def log_summary( summary ):
+
+        elapsed_time = max( summary[ 'elapsed_time' ], 0.001 )
+        file_size_mb = summary[ 'file_size' ] / ( 1024.0 * 1024.0 )
+
+        if ( 'range_count' in summary ):
+            changed_ranges = ( str( summary[ 'changed_range_count' ] ) + ' / ' +
+                               str( summary[ 'range_count' ] ) + ' ranges changed, ' )
+        else:
+            changed_ranges = ''
+
+        Logger.get_instance().info( 'The ' + summary[ 'table_name' ] + ' table has been saved: ' +
+                                    str( summary[ 'row_count' ] ) + ' entries, ' + changed_ranges +
+                                    str( summary[ 'chunk_count' ] ) + ' chunks, ' +
+                                    '%.2f' % file_size_mb + ' MB written in ' +
+                                    '%.1f' % elapsed_time + ' s (' +
+                                    '%.0f' % ( summary[ 'row_count' ] / elapsed_time ) + ' entries/s, ' +
+                                    '%.2f' % ( file_size_mb / elapsed_time ) + ' MB/s).' )
@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
+from fr.tagc.uorf.core.util.general.RecordFileUtil import RecordFileUtil
+from fr.tagc.uorf.core.util.exception import *
+
+
+## BackupFile
+#  ==========
+#
+# This class allows to write and read the files generated by the Backup strategy.
+#
+# Each file contains the content of one single table, and is made of successive
+# records (see the documentation of the RecordFileUtil class):
+# - The first record (RECORD_HEADER) describes the content of the file (version of
+#   the format, database model, name of the table and list of its columns).
+# - The following records (RECORD_CHUNK) each contain a chunk of rows of the table,
+#   saved by columns (i.e. one list of values per column). Only built-in Python
+#   values are saved, such as the files do not depend on the version of SQLAlchemy.
+# - The last record (RECORD_FOOTER) contains the total number of rows and chunks,
+#   and allows to check the file is complete.
+# The file is written under a temporary name and only renamed once complete.
+#
+class BackupFile( object ):
+
+    ## Class variables
+    #  ---------------
+    #
+    # Version of the format
+    FORMAT_VERSION = 1
+
+    # Record types
+    RECORD_HEADER = 1
+    RECORD_CHUNK = 2
+    RECORD_FOOTER = 3
+
+    # Suffix of the file while it is written
+    TMP_SUFFIX = '.tmp'
+
+
+    ## Constructor of BackupFile
+    #  -------------------------
+    #
+    # Instance variables:
+    #     - file_path: String - The path to the file.
+    #     - file: File - The file currently opened.
+    #     - row_count: Integer - The number of rows written in the file.
+    #     - chunk_count: Integer - The number of chunks written in the file.
+    #
+    # @param file_path: String - The path to the file.
+    #
+    def __init__( self, file_path ):
+
+        self.file_path = file_path
+        self.file = None
+        self.row_count = 0
+        self.chunk_count = 0
+
+
+
+    ## get_file_path
+    #  -------------
+    #
+    # This is a static method that allows to get the path to a backup file.
+    #
+    # @param folder: String - The folder containing the file.
+    # @param filename: String - The name of the file (without extension).
+    #
+    # @return String - The path to the file.
+    #
+    @staticmethod
+    def get_file_path( folder, filename ):
+
+        return os.path.join( folder, filename ) + Constants.BACKUP_FILES_EXTENSION
+
+
+
+    # ===============================================================================
+    # Methods related to the writing of the file
+    # ===============================================================================
+
+    ## open_for_writing
+    #  ----------------
+    #
+    # This method allows to create the file and to write its header.
+    #
+    # @param db_model: String - The name of the database model (PRO / DS / FILT).
+    # @param table_name: String - The name of the table.
+    # @param columns: List - The list of columns of the table, as ( name, type ) tuples.
+    #
+    def open_for_writing( self, db_model, table_name, columns ):
+
+        folder = os.path.dirname( self.file_path )
+        if ( folder and ( not os.path.isdir( folder ) ) ):
+            os.makedirs( folder )
+
+        self.file = open( self.file_path + BackupFile.TMP_SUFFIX, 'wb' )
+        self.row_count = 0
+        self.chunk_count = 0
+
+        self.write_record( BackupFile.RECORD_HEADER,
+                           { 'format_version': BackupFile.FORMAT_VERSION,
+                             'db_model': db_model,
+                             'table_name': table_name,
+                             'columns': columns } )
+
+
+
+    ## write_record
+    #  ------------
+    #
+    # This method allows to append a record to the file.
+    #
+    # @param record_type: Integer - The type of record.
+    # @param content: Object - The content of the record (any object that can be pickled).
+    #
+    # @return Integer - The number of bytes written.
+    #
+    def write_record( self, record_type, content ):
+
+        record = RecordFileUtil.pack_record( record_type, content, Constants.BACKUP_COMPRESSION_LEVEL )
+
+        self.file.write( record )
+
+        return len( record )
+
+
+
+    ## write_chunk
+    #  -----------
+    #
+    # This method allows to append a chunk of rows to the file.
+    #
+    # @param rows: List - The list of rows (tuples of values, in the order of the columns).
+    #
+    def write_chunk( self, rows ):
+
+        if ( len( rows ) == 0 ):
+            return
+
+        # Save the values by columns
+        columns = [ list( column_values ) for column_values in zip( *rows ) ]
+
+        self.write_record( BackupFile.RECORD_CHUNK, columns )
+        self.row_count += len( rows )
+        self.chunk_count += 1
+
+
+
+    ## close_writing
+    #  -------------
+    #
+    # This method allows to write the footer of the file, to close it and
+    # to rename it with its definitive name.
+    #
+    def close_writing( self ):
+
+        self.write_record( BackupFile.RECORD_FOOTER,
+                           { 'row_count': self.row_count,
+                             'chunk_count': self.chunk_count } )
+        self.file.flush()
+        os.fsync( self.file.fileno() )
+        self.file.close()
+        self.file = None
+
+        if os.path.exists( self.file_path ):
+            os.remove( self.file_path )
+        os.rename( self.file_path + BackupFile.TMP_SUFFIX, self.file_path )
+
+
+
+    ## abort_writing
+    #  -------------
+    #
+    # This method allows to close and remove an incomplete file.
+    #
+    def abort_writing( self ):
+
+        if ( self.file != None ):
+            self.file.close()
+            self.file = None
+
+        if os.path.exists( self.file_path + BackupFile.TMP_SUFFIX ):
+            os.remove( self.file_path + BackupFile.TMP_SUFFIX )
+
+
+
+    # ===============================================================================
+    # Methods related to the reading of the file
+    # ===============================================================================
+
+    ## read_record
+    #  -----------
+    #
+    # This static method allows to read the record located at the current
+    # position of an opened backup file.
+    #
+    # @param backup_file: File - The backup file opened in binary mode.
+    # @param load_content: Boolean - Should the content of the record be loaded?
+    #                                True by default.
+    # @param check_payload: Boolean - Should the payload be read and checked when the
+    #                                 content is not loaded? True by default.
+    #
+    # @return 2-tuple / None - The ( record type, content ) tuple (the content is None if
+    #                          load_content is False), or None if the end of the file
+    #                          has been reached.
+    #
+    # @throw DenCellORFException: When the record is incomplete or corrupted.
+    #
+    @staticmethod
+    def read_record( backup_file, load_content=True, check_payload=True ):
+
+        offset = backup_file.tell()
+        record = RecordFileUtil.read_record( backup_file, load_content, check_payload )
+
+        if ( ( record == None ) and ( offset < os.fstat( backup_file.fileno() ).st_size ) ):
+            raise DenCellORFException( 'BackupFile.read_record(): The file ' + backup_file.name +
+                                       ' is incomplete or corrupted.' +
+                                       ' Error code: ' + LogCodes.ERR_BACKUP_FILE + '.' )
+
+        return record
+
+
+
+    ## read_header
+    #  -----------
+    #
+    # This method allows to get the header of the file.
+    #
+    # @return header: Dictionary - The header of the file, with the 'format_version',
+    #                              'db_model', 'table_name' and 'columns' keys.
+    #
+    # @throw DenCellORFException: When the file does not start with a header.
+    # @throw DenCellORFException: When the version of the format is not supported.
+    #
+    def read_header( self ):
+
+        with open( self.file_path, 'rb' ) as backup_file:
+            record = BackupFile.read_record( backup_file )
+
+        if ( ( record == None ) or ( record[ 0 ] != BackupFile.RECORD_HEADER ) ):
+            raise DenCellORFException( 'BackupFile.read_header(): The file ' + self.file_path +
+                                       ' is not a valid backup file.' +
+                                       ' Error code: ' + LogCodes.ERR_BACKUP_FILE + '.' )
+
+        header = record[ 1 ]
+        if ( header.get( 'format_version' ) != BackupFile.FORMAT_VERSION ):
+            raise DenCellORFException( 'BackupFile.read_header(): The version of the format of the file ' +
+                                       self.file_path + ' (' + str( header.get( 'format_version' ) ) +
+                                       ') is not supported.' +
+                                       ' Error code: ' + LogCodes.ERR_BACKUP_FILE + '.' )
+
+        return header
+
+
+
+    ## verify
+    #  ------
+    #
+    # This method allows to check the file is complete and not corrupted, i.e. that
+    # the checksums of all its records are valid and that its footer is consistent
+    # with the chunks it contains, without loading the chunks.
+    #
+    # @return footer: Dictionary - The footer of the file, with the 'row_count'
+    #                              and 'chunk_count' keys.
+    #
+    # @throw DenCellORFException: When the file is incomplete or corrupted.
+    #
+    def verify( self ):
+
+        chunk_count = 0
+
+        with open( self.file_path, 'rb' ) as backup_file:
+
+            # Skip the header
+            BackupFile.read_record( backup_file )
+
+            while True:
+
+                # Only the checksums of the chunks are checked
+                offset = backup_file.tell()
+                record = BackupFile.read_record( backup_file, load_content = False )
+
+                if ( record == None ):
+                    raise DenCellORFException( 'BackupFile.verify(): The file ' + self.file_path +
+                                               ' is incomplete (the footer is missing).' +
+                                               ' Error code: ' + LogCodes.ERR_BACKUP_FILE + '.' )
+
+                if ( record[ 0 ] == BackupFile.RECORD_CHUNK ):
+                    chunk_count += 1
+
+                elif ( record[ 0 ] == BackupFile.RECORD_FOOTER ):
+                    backup_file.seek( offset )
+                    footer = BackupFile.read_record( backup_file )[ 1 ]
+                    if ( footer[ 'chunk_count' ] != chunk_count ):
+                        raise DenCellORFException( 'BackupFile.verify(): The file ' + self.file_path +
+                                                   ' is corrupted (' + str( chunk_count ) + ' chunks have' +
+                                                   ' been found whilst ' + str( footer[ 'chunk_count' ] ) +
+                                                   ' chunks were expected).' +
+                                                   ' Error code: ' + LogCodes.ERR_BACKUP_FILE + '.' )
+                    if ( backup_file.read( 1 ) != '' ):
+                        raise DenCellORFException( 'BackupFile.verify(): The file ' + self.file_path +
+                                                   ' is corrupted (data found after the footer).' +
+                                                   ' Error code: ' + LogCodes.ERR_BACKUP_FILE + '.' )
+                    return footer
+
+
+
+    ## iter_chunks
+    #  -----------
+    #
+    # This method allows to iterate over the chunks of rows of the file.
+    # When only some of the chunks are requested, the other chunks are skipped
+    # using the headers of their records, without reading their payload.
+    #
+    # @param chunk_indexes: Set - The indexes of the chunks to load (None to load all
+    #                             the chunks of the file). None by default.
+    #
+    # @return Generator - A generator of lists of rows (tuples of values, in the
+    #                     order of the columns provided in the header).
+    #
+    # @throw DenCellORFException: When the file is incomplete or corrupted.
+    #
+    def iter_chunks( self, chunk_indexes=None ):
+
+        row_count = 0
+        chunk_count = 0
+
+        with open( self.file_path, 'rb' ) as backup_file:
+
+            # Skip the header
+            BackupFile.read_record( backup_file )
+
+            while True:
+
+                # Read the header of the record, and its payload if the record is
+                # not a chunk that has to be skipped
+                offset = backup_file.tell()
+                record = BackupFile.read_record( backup_file, load_content = False, check_payload = False )
+
+                if ( record == None ):
+                    raise DenCellORFException( 'BackupFile.iter_chunks(): The file ' + self.file_path +
+                                               ' is incomplete (the footer is missing).' +
+                                               ' Error code: ' + LogCodes.ERR_BACKUP_FILE + '.' )
+
+                record_type = record[ 0 ]
+
+                if ( record_type == BackupFile.RECORD_CHUNK ):
+                    chunk_index = chunk_count
+                    chunk_count += 1
+                    if ( ( chunk_indexes != None ) and ( chunk_index not in chunk_indexes ) ):
+                        continue
+
+                    backup_file.seek( offset )
+                    rows = zip( *BackupFile.read_record( backup_file )[ 1 ] )
+                    row_count += len( rows )
+                    yield rows
+
+                elif ( record_type == BackupFile.RECORD_FOOTER ):
+                    backup_file.seek( offset )
+                    content = BackupFile.read_record( backup_file )[ 1 ]
+                    # NB: The number of rows may only be checked when all the chunks have been loaded
+                    if ( ( content[ 'chunk_count' ] != chunk_count )
+                         or ( ( chunk_indexes == None ) and ( content[ 'row_count' ] != row_count ) ) ):
+                        raise DenCellORFException( 'BackupFile.iter_chunks(): The file ' + self.file_path +
+                                                   ' is corrupted (' + str( chunk_count ) + ' chunks and ' +
+                                                   str( row_count ) + ' rows have been read whilst ' +
+                                                   str( content[ 'chunk_count' ] ) + ' chunks and ' +
+                                                   str( content[ 'row_count' ] ) + ' rows were expected).' +
+                                                   ' Error code: ' + LogCodes.ERR_BACKUP_FILE + '.' )
+                    return
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import time
+
+
+from fr.tagc.uorf.core.execution.backup.BackupFile import BackupFile
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
+from fr.tagc.uorf.core.util.exception import *
+
+
+## BackupManifest
+#  ==============
+#
+# This class allows to write and read the manifests of the incremental backups.
+#
+# During an incremental backup, the rows of each table are grouped into ranges
+# of consecutive primary key values (see the documentation of the BackupEngine
+# class), and a hash of the content of each range is computed. Only the ranges
+# for which the hash changed since the previous backup are saved, each of them
+# as one chunk of the backup file of the table generated during this run.
+#
+# The manifest of a backup records, for each range of each table, its hash, its
+# number of rows and the location of its content (identifier of the backup and
+# index of the chunk in the backup file). As the locations of the unchanged
+# ranges are copied from the previous manifest, the manifest of a backup is
+# sufficient to reassemble the content of the database at the time of this
+# backup, from the files of the chain of backups it refers to.
+#
+class BackupManifest( object ):
+
+    ## Class variables
+    #  ---------------
+    #
+    # Version of the format
+    FORMAT_VERSION = 1
+
+
+    ## Constructor of BackupManifest
+    #  -----------------------------
+    #
+    # Instance variables:
+    #     - folder: String - The folder containing the files of the backups.
+    #     - file_prefix: String - The prefix added to the file names.
+    #     - backup_id: String - The identifier of the backup.
+    #     - parent_id: String - The identifier of the previous backup (None if there is none).
+    #     - db_model: String - The name of the database model (PRO / DS / FILT).
+    #     - range_size: Integer - The number of consecutive primary key values of each range.
+    #     - tables: Dictionary - The dictionary that associates to the name of each class
+    #                            the dictionary of its ranges, where the keys are the range
+    #                            keys and the values ( hash, row count, backup ID, chunk index )
+    #                            tuples.
+    #
+    # @param folder: String - The folder containing the files of the backups.
+    # @param file_prefix: String - The prefix added to the file names.
+    # @param backup_id: String - The identifier of the backup.
+    # @param parent_id: String - The identifier of the previous backup.
+    # @param db_model: String - The name of the database model.
+    # @param range_size: Integer - The number of consecutive primary key values of each range.
+    #                              Constants.BACKUP_INCREMENTAL_RANGE_SIZE by default.
+    #
+    def __init__( self, folder, file_prefix, backup_id, parent_id, db_model,
+                  range_size=Constants.BACKUP_INCREMENTAL_RANGE_SIZE ):
+
+        self.folder = folder
+        self.file_prefix = ( file_prefix if file_prefix else '' )
+        self.backup_id = backup_id
+        self.parent_id = parent_id
+        self.db_model = db_model
+        self.range_size = range_size
+        self.tables = {}
+
+
+
+    ## new_backup_id
+    #  -------------
+    #
+    # This is a static method that allows to get the identifier of a new backup.
+    #
+    # @param existing_ids: List - The list of identifiers of the existing backups.
+    #
+    # @return backup_id: String - The identifier of the backup (made from the current time).
+    #
+    @staticmethod
+    def new_backup_id( existing_ids ):
+
+        backup_id = time.strftime( Constants.BACKUP_ID_FORMAT )
+
+        # Make sure the identifier is unique and more recent
+        # than the identifiers of the existing backups
+        suffix = 0
+        unique_id = backup_id
+        while ( ( unique_id in existing_ids )
+                or ( ( len( existing_ids ) != 0 ) and ( unique_id < existing_ids[ -1 ] ) ) ):
+            suffix += 1
+            unique_id = backup_id + '_' + str( suffix )
+
+        return unique_id
+
+
+
+    ## get_manifest_path
+    #  -----------------
+    #
+    # This is a static method that allows to get the path to the manifest of a backup.
+    #
+    # @param folder: String - The folder containing the files of the backups.
+    # @param file_prefix: String - The prefix added to the file names.
+    # @param backup_id: String - The identifier of the backup.
+    #
+    # @return String - The path to the manifest.
+    #
+    @staticmethod
+    def get_manifest_path( folder, file_prefix, backup_id ):
+
+        return ( os.path.join( folder,
+                               ( file_prefix if file_prefix else '' ) + Constants.BACKUP_MANIFEST_FILENAME_PREFIX + backup_id )
+                 + Constants.BACKUP_MANIFEST_FILES_EXTENSION )
+
+
+
+    ## list_backup_ids
+    #  ---------------
+    #
+    # This is a static method that allows to get the identifiers of all the
+    # backups for which a manifest exists in a folder.
+    #
+    # @param folder: String - The folder containing the files of the backups.
+    # @param file_prefix: String - The prefix added to the file names.
+    #
+    # @return List - The list of identifiers of the backups, from the oldest to the most recent.
+    #
+    @staticmethod
+    def list_backup_ids( folder, file_prefix ):
+
+        if ( not os.path.isdir( folder ) ):
+            return []
+
+        manifest_prefix = ( file_prefix if file_prefix else '' ) + Constants.BACKUP_MANIFEST_FILENAME_PREFIX
+
+        backup_ids = []
+        for filename in os.listdir( folder ):
+            if ( filename.startswith( manifest_prefix )
+                 and filename.endswith( Constants.BACKUP_MANIFEST_FILES_EXTENSION ) ):
+                backup_ids.append( filename[ len( manifest_prefix ) : - len( Constants.BACKUP_MANIFEST_FILES_EXTENSION ) ] )
+
+        return sorted( backup_ids )
+
+
+
+    ## load
+    #  ----
+    #
+    # This is a static method that allows to load the manifest of a backup.
+    #
+    # @param folder: String - The folder containing the files of the backups.
+    # @param file_prefix: String - The prefix added to the file names.
+    # @param backup_id: String - The identifier of the backup. If None, the manifest
+    #                            of the most recent backup is loaded. None by default.
+    #
+    # @return BackupManifest - The manifest, or None if there is no backup in the folder.
+    #
+    # @throw DenCellORFException: When the manifest of the backup provided does not exist.
+    # @throw DenCellORFException: When the manifest cannot be read.
+    #
+    @staticmethod
+    def load( folder, file_prefix, backup_id=None ):
+
+        if ( backup_id == None ):
+            backup_ids = BackupManifest.list_backup_ids( folder, file_prefix )
+            if ( len( backup_ids ) == 0 ):
+                return None
+            backup_id = backup_ids[ -1 ]
+
+        manifest_path = BackupManifest.get_manifest_path( folder, file_prefix, backup_id )
+        if ( not os.path.exists( manifest_path ) ):
+            raise DenCellORFException( 'BackupManifest.load(): There is no manifest for the backup ' +
+                                       backup_id + ' in the folder ' + folder + '.' +
+                                       ' Error code: ' + LogCodes.ERR_BACKUP_MANIFEST + '.' )
+
+        try:
+            with open( manifest_path, 'rb' ) as manifest_file:
+                content = pickle.load( manifest_file )
+        except Exception as e:
+            raise DenCellORFException( 'BackupManifest.load(): An error occurred trying to read the' +
+                                       ' manifest ' + manifest_path + '.' +
+                                       ' Error code: ' + LogCodes.ERR_BACKUP_MANIFEST + '.', e )
+
+        if ( content.get( 'format_version' ) != BackupManifest.FORMAT_VERSION ):
+            raise DenCellORFException( 'BackupManifest.load(): The version of the format of the manifest ' +
+                                       manifest_path + ' (' + str( content.get( 'format_version' ) ) +
+                                       ') is not supported.' +
+                                       ' Error code: ' + LogCodes.ERR_BACKUP_MANIFEST + '.' )
+
+        manifest = BackupManifest( folder = folder,
+                                   file_prefix = file_prefix,
+                                   backup_id = content[ 'backup_id' ],
+                                   parent_id = content[ 'parent_id' ],
+                                   db_model = content[ 'db_model' ],
+                                   range_size = content[ 'range_size' ] )
+        manifest.tables = content[ 'tables' ]
+
+        return manifest
+
+
+
+    ## save
+    #  ----
+    #
+    # This method allows to save the manifest. The manifest is written under
+    # a temporary name and only renamed once complete.
+    #
+    def save( self ):
+
+        manifest_path = BackupManifest.get_manifest_path( self.folder, self.file_prefix, self.backup_id )
+
+        content = { 'format_version': BackupManifest.FORMAT_VERSION,
+                    'backup_id': self.backup_id,
+                    'parent_id': self.parent_id,
+                    'db_model': self.db_model,
+                    'range_size': self.range_size,
+                    'tables': self.tables }
+
+        with open( manifest_path + BackupFile.TMP_SUFFIX, 'wb' ) as manifest_file:
+            pickle.dump( content, manifest_file, pickle.HIGHEST_PROTOCOL )
+            manifest_file.flush()
+            os.fsync( manifest_file.fileno() )
+
+        if os.path.exists( manifest_path ):
+            os.remove( manifest_path )
+        os.rename( manifest_path + BackupFile.TMP_SUFFIX, manifest_path )
+
+
+
+    ## get_table_file_path
+    #  -------------------
+    #
+    # This method allows to get the path to the file in which the ranges of
+    # a table that changed during a backup of the chain are saved.
+    #
+    # @param class_name: String - The name of the class of the table.
+    # @param backup_id: String - The identifier of the backup. If None, the identifier
+    #                            of the current backup is used. None by default.
+    #
+    # @return String - The path to the file.
+    #
+    def get_table_file_path( self, class_name, backup_id=None ):
+
+        if ( backup_id == None ):
+            backup_id = self.backup_id
+
+        return BackupFile.get_file_path( self.folder, self.file_prefix + class_name + '_' + backup_id )
+
+
+
+    ## get_table_ranges
+    #  ----------------
+    #
+    # This method allows to get the ranges of a table recorded in the manifest.
+    #
+    # @param class_name: String - The name of the class of the table.
+    #
+    # @return Dictionary - The dictionary of ranges of the table (empty if the
+    #                      table is not recorded in the manifest).
+    #
+    def get_table_ranges( self, class_name ):
+
+        return self.tables.get( class_name, {} )
+
+
+
+    ## get_chunk_sources
+    #  -----------------
+    #
+    # This method allows to get the list of files and chunks that have to be
+    # read to reassemble the content of a table.
+    #
+    # @param class_name: String - The name of the class of the table.
+    #
+    # @return List - The list of ( file path, set of chunk indexes ) tuples,
+    #                from the oldest to the most recent backup.
+    #
+    # @throw DenCellORFException: When a file of the chain is missing.
+    #
+    def get_chunk_sources( self, class_name ):
+
+        chunks_by_backup = {}
+        for ( range_hash, row_count, backup_id, chunk_index ) in self.get_table_ranges( class_name ).values():
+            chunks_by_backup.setdefault( backup_id, set() ).add( chunk_index )
+
+        chunk_sources = []
+        for backup_id in sorted( chunks_by_backup.keys() ):
+            file_path = self.get_table_file_path( class_name, backup_id )
+            if ( not os.path.exists( file_path ) ):
+                raise DenCellORFException( 'BackupManifest.get_chunk_sources(): The file ' + file_path +
+                                           ', required to restore the ' + class_name + ' table from the' +
+                                           ' backup ' + self.backup_id + ', is missing.' +
+                                           ' Error code: ' + LogCodes.ERR_BACKUP_MANIFEST + '.' )
+            chunk_sources.append( ( file_path, chunks_by_backup[ backup_id ] ) )
+
+        return chunk_sources
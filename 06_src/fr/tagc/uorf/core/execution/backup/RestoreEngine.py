@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+from pathos.multiprocessing import ProcessingPool as Pool
+
+
+from fr.tagc.uorf.core.model import *
+
+from fr.tagc.uorf.core.execution.backup.BackupFile import BackupFile
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
+from fr.tagc.uorf.core.util.sql.SQLManagerDS import SQLManagerDS
+from fr.tagc.uorf.core.util.sql.SQLManagerPRO import SQLManagerPRO
+from fr.tagc.uorf.core.util.sql.SQLManagerFILT import SQLManagerFILT
+from fr.tagc.uorf.core.util.sql import SQLConstants
+from fr.tagc.uorf.core.util.exception import *
+from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
+
+
+## RestoreEngine
+#  =============
+#
+# This class allows to restore the content of the tables of a database
+# from the backup files generated by the BackupEngine.
+#
+# The content of a table may be read from one single backup file, or from
+# several files in the case of incremental backups (see the documentation of
+# the BackupManifest class).
+#
+# The files of a table are entirely checked (checksums of the records and
+# footer) before any change is made to the table. Then, the rows of each
+# file are read chunk by chunk and inserted using bulk inserts (one
+# executemany per chunk) instead of ORM objects, in one single transaction
+# per table. During the loading of a table, the foreign key checks are
+# disabled for the connection and the secondary indexes of the table are
+# dropped, then rebuilt once its rows have been inserted (or if the loading
+# failed).
+#
+# The tables are grouped into levels of insertion, such as the tables of a
+# level only reference the tables of previous levels. The tables of a same
+# level are restored in parallel by several processes, each of them using
+# its own connection to the database.
+#
+# NB: This class has been optimized for multi-processing. Nevertheless, as
+#     SQLite does not allow concurrent writes, the tables of SQLite databases
+#     are always restored sequentially.
+#
+class RestoreEngine( object ):
+
+    ## Constructor of RestoreEngine
+    #  ----------------------------
+    #
+    # Instance variables:
+    #     - db_model: String - The name of the database model (PRO / DS / FILT).
+    #     - db_settings: Dictionary - The settings of the database.
+    #     - thread_nb: Integer - The number of processes that can be used.
+    #
+    # @param db_model: String - The name of the database model (PRO / DS / FILT).
+    # @param db_settings: Dictionary - The settings of the database.
+    # @param thread_nb: Integer - The number of processes that can be used. 1 by default.
+    #
+    def __init__( self, db_model, db_settings, thread_nb=1 ):
+
+        self.db_model = db_model
+        self.db_settings = db_settings
+        self.thread_nb = thread_nb
+
+
+
+    ## get_insertion_levels
+    #  --------------------
+    #
+    # This is a static method that allows to group the tables into levels of
+    # insertion, such as each table is only referencing (by foreign keys)
+    # tables of the previous levels.
+    #
+    # @param order_of_insertion: List - The list of names of the classes of
+    #                                   the tables, in the order of insertion.
+    #
+    # @return levels: List - The list of levels, where each level is a list
+    #                        of names of classes (keeping the original order).
+    #
+    @staticmethod
+    def get_insertion_levels( order_of_insertion ):
+
+        # Get the name of the class corresponding to each table
+        class_names = {}
+        for class_name in order_of_insertion:
+            class_names[ eval( class_name ).__tablename__ ] = class_name
+
+        # Compute the level of each table
+        table_levels = {}
+        for class_name in order_of_insertion:
+            referenced_classes = [ class_names.get( fk.column.table.name ) for fk in eval( class_name ).__table__.foreign_keys ]
+            referenced_levels = [ table_levels[ cl ] for cl in referenced_classes \
+                                  if ( ( cl in table_levels ) and ( cl != class_name ) ) ]
+            table_levels[ class_name ] = ( ( max( referenced_levels ) + 1 ) if referenced_levels else 0 )
+
+        levels = [ [] for k in range( max( table_levels.values() ) + 1 ) ] if table_levels else []
+        for class_name in order_of_insertion:
+            levels[ table_levels[ class_name ] ].append( class_name )
+
+        return levels
+
+
+
+    ## restore_tables
+    #  --------------
+    #
+    # This method allows to restore the content of several tables, which
+    # have no mutual dependencies.
+    #
+    # @param table_files: Dictionary - The dictionary that associates to the name of
+    #                                  each class the list of ( file path, set of chunk
+    #                                  indexes ) tuples from which the table has to be
+    #                                  restored (the set of chunk indexes being None to
+    #                                  restore all the chunks of the file).
+    #
+    # @return summaries: List - The list of the summaries of the restoration of each table
+    #                           (see the documentation of the restore_table() method).
+    #
+    # @throw DenCellORFException: When the restoration of a table failed.
+    #
+    @RunTelemetry.timed_stage()
+    def restore_tables( self, table_files ):
+
+        args_for_restore = [ ( self.db_model,
+                               self.db_settings,
+                               class_name,
+                               eval( class_name ).__tablename__,
+                               table_files[ class_name ] ) for class_name in table_files.keys() ]
+
+        # SQLite does not allow concurrent writes on a same database
+        if ( self.db_settings.get( Constants.DB_SETTINGS_DB_TYPE ) == SQLConstants.DB_TYPE_SQLITE ):
+            thread_nb = 1
+        else:
+            thread_nb = min( self.thread_nb, len( args_for_restore ) )
+        Logger.get_instance().debug( 'RestoreEngine.restore_tables(): ' + str( len( args_for_restore ) ) +
+                                     ' tables will be restored using ' + str( thread_nb ) + ' processes.' )
+
+        if ( thread_nb > 1 ):
+            p = Pool( thread_nb )
+            results = p.map( RestoreEngine.restore_table, args_for_restore )
+            p.close()
+            # Wait for all processes to be completed
+            p.join()
+            # Delete the pool instance
+            p.clear()
+        else:
+            results = map( RestoreEngine.restore_table, args_for_restore )
+
+        summaries = []
+        for ( summary, error_message ) in results:
+            if ( error_message != None ):
+                raise DenCellORFException( 'RestoreEngine.restore_tables(): An error occurred trying to' +
+                                           ' restore the ' + summary[ 'class_name' ] + ' table from the file ' +
+                                           summary[ 'file_path' ] + ': ' + error_message +
+                                           '\n Error code: ' + LogCodes.ERR_BACKUP + '.' )
+            RestoreEngine.log_summary( summary )
+            RunTelemetry.get_instance().add_rows( summary[ 'row_count' ] )
+            summaries.append( summary )
+
+        return summaries
+
+
+
+    ## restore_table
+    #  -------------
+    #
+    # This is a static method that allows to restore the content of one table
+    # from backup files. It is expected to be run in a separate process.
+    #
+    # @param args: Tuple - The tuple of arguments, containing:
+    #                          - db_model: String - The name of the database model.
+    #                          - db_settings: Dictionary - The settings of the database.
+    #                          - class_name: String - The name of the class of the table.
+    #                          - table_name: String - The name of the table.
+    #                          - chunk_sources: List - The list of ( file path, set of chunk
+    #                                           indexes ) tuples to restore.
+    #
+    # @return 2-tuple - The ( summary, error_message ) tuple, where:
+    #                       - summary: Dictionary - The summary of the restoration, with the 'class_name',
+    #                                  'table_name', 'file_path', 'row_count', 'index_count' and
+    #                                  'elapsed_time' keys.
+    #                       - error_message: String - The message of the error that occurred,
+    #                                        None if the restoration has been successful.
+    #
+    @staticmethod
+    def restore_table( args ):
+
+        ( db_model, db_settings, class_name, table_name, chunk_sources ) = args
+
+        summary = { 'class_name': class_name,
+                    'table_name': table_name,
+                    'file_path': ', '.join( [ file_path for ( file_path, chunk_indexes ) in chunk_sources ] ),
+                    'row_count': 0,
+                    'index_count': 0,
+                    'elapsed_time': 0 }
+
+        start_time = time.time()
+
+        try:
+            # Use a new SQLManager instance, such as each process
+            # uses its own connection to the database
+            sqlmanager = eval( 'SQLManager' + db_model )()
+            sqlmanager.set_db_settings( db_settings )
+            table = sqlmanager.get_declarative_base().metadata.tables[ table_name ]
+            table_columns = dict( [ ( column.name, column.key ) for column in table.columns ] )
+
+            # Check all the files are complete and not corrupted
+            # before making any change to the table
+            backup_files = []
+            for ( file_path, chunk_indexes ) in chunk_sources:
+                backup_file = BackupFile( file_path )
+                header = backup_file.read_header()
+                backup_file.verify()
+
+                # Get the index of the columns of the file that still exist in the model
+                # NB: The columns that no longer exist in the model are ignored
+                columns_to_restore = [ ( index, table_columns[ column_name ] ) \
+                                       for ( index, ( column_name, column_type ) ) in enumerate( header[ 'columns' ] ) \
+                                       if ( column_name in table_columns ) ]
+                backup_files.append( ( backup_file, chunk_indexes, columns_to_restore ) )
+
+            connection = sqlmanager.get_engine().connect()
+            try:
+                RestoreEngine.set_foreign_key_checks( connection, sqlmanager.db_type, enabled = False )
+
+                # Drop the secondary indexes of the table during the loading
+                dropped_indexes = []
+                try:
+                    for index in table.indexes:
+                        index.drop( bind = connection )
+                        dropped_indexes.append( index )
+
+                    # Insert the rows, chunk by chunk, in one single transaction
+                    # such as no row is kept if the loading of the table fails
+                    insert_statement = table.insert()
+                    row_count = 0
+                    transaction = connection.begin()
+                    try:
+                        for ( backup_file, chunk_indexes, columns_to_restore ) in backup_files:
+                            # NB: The chunks that are not requested (e.g. for an incremental
+                            #     backup) are skipped without being loaded
+                            for rows in backup_file.iter_chunks( chunk_indexes ):
+                                connection.execute( insert_statement,
+                                                    [ dict( [ ( key, row[ index ] ) for ( index, key ) in columns_to_restore ] ) \
+                                                      for row in rows ] )
+                                row_count += len( rows )
+                        transaction.commit()
+                    except:
+                        transaction.rollback()
+                        raise
+                    summary[ 'row_count' ] = row_count
+
+                finally:
+                    # Rebuild the secondary indexes, including when the loading failed
+                    for index in dropped_indexes:
+                        index.create( bind = connection )
+                    summary[ 'index_count' ] = len( dropped_indexes )
+
+                    RestoreEngine.set_foreign_key_checks( connection, sqlmanager.db_type, enabled = True )
+
+            finally:
+                connection.close()
+                sqlmanager.get_engine().dispose()
+
+        except Exception as e:
+            return ( summary, str( e ) )
+
+        summary[ 'elapsed_time' ] = time.time() - start_time
+
+        return ( summary, None )
+
+
+
+    ## set_foreign_key_checks
+    #  ----------------------
+    #
+    # This is a static method that allows to enable or disable the checks of
+    # foreign keys (and of unique keys for MySQL) for a connection.
+    #
+    # @param connection: Connection - The connection to the database.
+    # @param db_type: String - The type of database (SQLite / MySQL).
+    # @param enabled: Boolean - Should the checks be enabled?
+    #
+    @staticmethod
+    def set_foreign_key_checks( connection, db_type, enabled ):
+
+        if ( db_type == SQLConstants.DB_TYPE_MYSQL ):
+            connection.execute( 'SET FOREIGN_KEY_CHECKS = ' + ( '1' if enabled else '0' ) )
+            connection.execute( 'SET UNIQUE_CHECKS = ' + ( '1' if enabled else '0' ) )
+
+        elif ( db_type == SQLConstants.DB_TYPE_SQLITE ):
+            connection.execute( 'PRAGMA foreign_keys = ' + ( 'ON' if enabled else 'OFF' ) )
+
+
+
+    ## log_summary
+    #  -----------
+    #
+    # This is a static method that allows to log the summary of the restoration of a table.
+    #
+    # @param summary: Dictionary - The summary of the restoration of the table.
+    #
+    @staticmethod
+    def log_summary( summary ):
+
+        elapsed_time = max( summary[ 'elapsed_time' ], 0.001 )
+
+        Logger.get_instance().info( 'The ' + summary[ 'class_name' ] + ' table has been restored: ' +
+                                    str( summary[ 'row_count' ] ) + ' entries inserted and ' +
+                                    str( summary[ 'index_count' ] ) + ' indexes rebuilt in ' +
+                                    '%.1f' % elapsed_time + ' s (' +
+                                    '%.0f' % ( summary[ 'row_count' ] / elapsed_time ) + ' entries/s).' )
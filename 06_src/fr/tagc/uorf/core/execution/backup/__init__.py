@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+
+from BackupFile import BackupFile
+from BackupEngine import BackupEngine
+from BackupManifest import BackupManifest
+from RestoreEngine import RestoreEngine
@@ -0,0 +1,620 @@
+# -*- coding: utf-8 -*-
+
+import glob
+import gzip
+import json
+import os
+import resource
+import shutil
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
+from fr.tagc.uorf.core.util.sql import SQLConstants
+from fr.tagc.uorf.core.util.exception import *
+from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
+
+
+## BenchmarkRunner
+#  ===============
+#
+# This class allows to benchmark the strategies on a synthetic dataset
+# (see the documentation of the SyntheticDataGenerator class).
+#
+# Each step of the benchmark runs one strategy in a separate process (as the
+# program would be run by the user), so that the wall time, the CPU time and
+# the peak memory (resident set size) of the whole process are measured. The
+# run report written by the process (see the documentation of the RunTelemetry
+# class) is kept in the results, and is used to detect the steps that failed.
+#
+# Each step reads the databases in a given state (e.g. 'merged' for the
+# ComputeMissingInfo strategy) and may produce a new state. The databases of
+# each state are saved as snapshots in the dataset folder, so that each step
+# may be run (or repeated) on the same databases, and that the databases built
+# by a run are reused by the next ones. When the snapshot of the input state
+# of a requested step is missing, the steps producing it are run first.
+#
+# The benchmark runs offline: the ComputeMissingInfo strategy is run without
+# downloading the missing information and the ComputeRelCoord strategy (which
+# needs R and the Ensembl annotation packages) is not run. Instead, the
+# information they would have provided are read from the fixture files of
+# the dataset and written in the PRO database (this is not timed).
+#
+# The time spent by the process outside of the execution of the strategy
+# (start of the interpreter, imports, parsing of the options, instantiation
+# of the strategy and writing of the run report) is reported as the startup
+# time of the step. The DatabaseCheck step, which runs a short strategy, allows
+# to follow the startup time of the program for the short invocations.
+#
+# The median of the measures of each step is compared to the baseline
+# recorded for the dataset. A step is considered as regressing when its wall
+# time, its startup time or its peak memory exceeds the baseline of more than
+# the relative and absolute tolerances defined in the Constants.
+#
+class BenchmarkRunner( object ):
+
+    ## Class variables
+    #  ---------------
+    #
+    # Steps of the benchmark, as ( name, strategy, arguments, input state, output state )
+    # tuples. In the arguments, '{config}', '{db_folder}', '{db_name}' and '{export_folder}'
+    # are replaced by the path to the config file, the database folder, the name of the
+    # PRO database and the folder where the exported files are saved.
+    STEPS = [ ( 'Insertion', 'Insertion', [ '-c', '{config}', '-f' ], None, 'inserted' ),
+              ( 'LiftOver', 'LiftOver', [ '-c', '{config}' ], 'inserted', 'lifted' ),
+              ( 'Merge', 'Merge', [ '-c', '{config}', '-f', '-s' ], 'lifted', 'merged' ),
+              ( 'ComputeMissingInfo', 'ComputeMissingInfo', [ '-c', '{config}' ], 'merged', 'completed' ),
+              ( 'ComputeKozakContext', 'ComputeKozakContext', [ '-c', '{config}' ], 'completed', 'kozak' ),
+              ( 'AnnotateORF', 'AnnotateORF', [ '-c', '{config}', '-s', '-a' ], 'kozak', 'annotated' ),
+              ( 'Filter', 'Filter', [ '-c', '{config}', '-f' ], 'annotated', None ),
+              ( 'DatabaseCheck', 'DatabaseCheck', [ '-c', '{config}' ], 'annotated', None ),
+              ( 'GenerateBEDContent', 'GenerateBEDContent', [ '-N', '{db_name}', '-F', '{db_folder}' ], 'annotated', 'bed_content' ),
+              ( 'GenerateBEDFile', 'GenerateBEDFile', [ '-N', '{db_name}', '-F', '{db_folder}', '-o', '{export_folder}', '-e' ], 'bed_content', None ),
+              ( 'GenerateGFFFile', 'GenerateGFFFile', [ '-N', '{db_name}', '-F', '{db_folder}', '-o', '{export_folder}' ], 'bed_content', None ),
+              ( 'GenerateFastaFile', 'GenerateFastaFile', [ '-N', '{db_name}', '-F', '{db_folder}', '-o', '{export_folder}', '-l' ], 'bed_content', None ) ]
+    STEP_NAMES = [ step[ 0 ] for step in STEPS ]
+
+    # Steps accepting the number of threads option
+    STEPS_USING_THREADS = [ 'Merge', 'GenerateBEDFile' ]
+
+    # Step after which the fixtures are written in the PRO database
+    STEP_BEFORE_FIXTURES = 'ComputeMissingInfo'
+
+    # Name of the file saving the state of the databases of the work folder
+    STATE_FILENAME = '.state'
+
+    # Metrics measured for each run, and metrics compared to the baselines
+    # (as ( metric, relative tolerance, absolute tolerance ) tuples)
+    MEASURED_METRICS = [ 'wall_time', 'startup_time', 'cpu_time', 'peak_rss_mb' ]
+    COMPARED_METRICS = [ ( 'wall_time', Constants.BENCHMARK_TIME_TOLERANCE, Constants.BENCHMARK_TIME_MIN_DIFF ),
+                         ( 'startup_time', Constants.BENCHMARK_STARTUP_TOLERANCE, Constants.BENCHMARK_STARTUP_MIN_DIFF ),
+                         ( 'peak_rss_mb', Constants.BENCHMARK_MEMORY_TOLERANCE, Constants.BENCHMARK_MEMORY_MIN_DIFF ) ]
+
+
+    ## Constructor of BenchmarkRunner
+    #  ------------------------------
+    #
+    # Instance variables:
+    #     - manifest: Dictionary - The manifest of the dataset.
+    #     - dataset_folder: String - The folder of the dataset.
+    #     - benchmark_folder: String - The folder where the results and baselines are saved.
+    #     - verbosity: String - The level of verbosity of the strategies run.
+    #     - thread_nb: Integer - The number of threads used by the strategies (or None).
+    #     - repeats: Integer - The number of times each step is run.
+    #     - db_folder: String - The folder of the databases used by the steps.
+    #     - snapshot_folder: String - The folder where the snapshots of the databases are saved.
+    #     - export_folder: String - The folder where the files exported by the steps are saved.
+    #     - log_folder: String - The folder where the outputs of the steps are saved.
+    #     - results: Dictionary - The results of the last run (kept when a step failed).
+    #
+    # @param manifest: Dictionary - The manifest of the dataset (see SyntheticDataGenerator).
+    # @param dataset_folder: String - The folder of the dataset.
+    # @param benchmark_folder: String - The folder where the results and baselines are saved.
+    # @param verbosity: String - The level of verbosity of the strategies run.
+    # @param thread_nb: Integer - The number of threads used by the strategies (or None).
+    # @param repeats: Integer - The number of times each step is run.
+    #
+    def __init__( self, manifest, dataset_folder, benchmark_folder, verbosity, thread_nb, repeats ):
+
+        self.manifest = manifest
+        self.dataset_folder = dataset_folder
+        self.benchmark_folder = benchmark_folder
+        self.verbosity = verbosity
+        self.thread_nb = thread_nb
+        self.repeats = repeats
+
+        self.db_folder = manifest[ 'database_folder' ]
+        self.snapshot_folder = os.path.join( dataset_folder, 'databases' )
+        self.export_folder = os.path.join( dataset_folder, 'work', 'exports' )
+        self.log_folder = os.path.join( dataset_folder, 'work', 'logs' )
+
+        self.results = {}
+
+
+
+    ## plan
+    #  ----
+    #
+    # This method allows to get the list of steps to run in order to benchmark
+    # the requested steps, i.e. the requested steps and the steps producing the
+    # missing snapshots of their input states.
+    #
+    # @param step_names: List - The names of the steps to benchmark.
+    #
+    # @return List - The list of the steps to run (in order).
+    #
+    def plan( self, step_names ):
+
+        producers = dict( [ ( step[ 4 ], step ) for step in BenchmarkRunner.STEPS if step[ 4 ] ] )
+
+        needed = set( step_names )
+        for step in reversed( BenchmarkRunner.STEPS ):
+            input_state = step[ 3 ]
+            if ( ( step[ 0 ] in needed )
+                 and ( input_state != None )
+                 and ( not os.path.exists( self.get_snapshot_path( input_state ) ) ) ):
+                needed.add( producers[ input_state ][ 0 ] )
+
+        return [ step for step in BenchmarkRunner.STEPS if ( step[ 0 ] in needed ) ]
+
+
+
+    ## run
+    #  ---
+    #
+    # This method allows to run the steps and to measure them.
+    #
+    # @param step_names: List - The names of the steps to benchmark.
+    # @param rebuild: Boolean - Should the snapshots of the databases be built again?
+    #
+    # @return Dictionary - The results of the benchmark, where the keys are the
+    #                      names of the requested steps, and the values the medians
+    #                      of their measures (or the error if the step failed).
+    #
+    # @throw DenCellORFException: When a step failed.
+    #
+    def run( self, step_names, rebuild=False ):
+
+        if ( rebuild and os.path.exists( self.snapshot_folder ) ):
+            shutil.rmtree( self.snapshot_folder )
+
+        for folder in [ self.db_folder, self.snapshot_folder, self.export_folder, self.log_folder ]:
+            if ( not os.path.exists( folder ) ):
+                os.makedirs( folder )
+
+        steps = self.plan( step_names )
+        Logger.get_instance().info( 'The following steps will be run: ' +
+                                    ', '.join( [ step[ 0 ] for step in steps ] ) + '.' )
+
+        self.results = {}
+        results = self.results
+        for ( name, strategy, args, input_state, output_state ) in steps:
+
+            # The steps only run to produce the snapshots are run once
+            repeats = ( self.repeats if ( name in step_names ) else 1 )
+
+            runs = []
+            for repeat in range( repeats ):
+                self.restore_snapshot( input_state )
+
+                Logger.get_instance().info( 'Running the step ' + name + ' (' + str( repeat + 1 ) +
+                                            ' / ' + str( repeats ) + ').' )
+                measure = self.run_step( name, strategy, args, repeat )
+                runs.append( measure )
+
+                if ( measure[ 'error' ] != None ):
+                    results[ name ] = measure
+                    raise DenCellORFException( 'BenchmarkRunner.run(): The step ' + name + ' failed: ' +
+                                               measure[ 'error' ] + ' Please see the output of the step (' +
+                                               measure[ 'log_file' ] + ') and the log files for more information.' +
+                                               '\n Error code: ' + LogCodes.ERR_BENCHMARK_STEP + '.' )
+
+                # Complete the PRO database with the information
+                # that cannot be computed offline
+                if ( name == BenchmarkRunner.STEP_BEFORE_FIXTURES ):
+                    self.apply_fixtures()
+
+                self.set_current_state( output_state if output_state else input_state )
+
+                # Save the snapshot of the output state after the first run
+                if ( ( output_state != None )
+                     and ( not os.path.exists( self.get_snapshot_path( output_state ) ) ) ):
+                    self.save_snapshot( output_state )
+
+            if ( name in step_names ):
+                results[ name ] = BenchmarkRunner.summarize_runs( runs )
+                Logger.get_instance().info( 'Step ' + name + ': ' + '%.2f' % results[ name ][ 'wall_time' ] +
+                                            ' s (startup: ' + '%.2f' % results[ name ][ 'startup_time' ] +
+                                            ' s, CPU: ' + '%.2f' % results[ name ][ 'cpu_time' ] + ' s, peak memory: ' +
+                                            '%.1f' % results[ name ][ 'peak_rss_mb' ] + ' MB).' )
+
+        return results
+
+
+
+    ## run_step
+    #  --------
+    #
+    # This method allows to run a strategy in a separate process and to measure it.
+    #
+    # @param name: String - The name of the step.
+    # @param strategy: String - The name of the strategy.
+    # @param args: List - The arguments of the strategy.
+    # @param repeat: Integer - The index of the run.
+    #
+    # @return Dictionary - The measures of the run (wall time, CPU time, peak memory,
+    #                      exit status, run report and error if the step failed).
+    #
+    def run_step( self, name, strategy, args, repeat ):
+
+        values = { 'config': self.manifest[ 'config_file' ],
+                   'db_folder': self.db_folder,
+                   'db_name': Constants.BENCHMARK_PRO_DB_NAME,
+                   'export_folder': self.export_folder }
+        command = ( [ sys.executable, sys.argv[ 0 ], strategy, '-v', self.verbosity, '-T', SQLConstants.DB_TYPE_SQLITE ] +
+                    [ arg.format( **values ) for arg in args ] )
+        if ( ( self.thread_nb != None ) and ( name in BenchmarkRunner.STEPS_USING_THREADS ) ):
+            command += [ '-t', str( self.thread_nb ) ]
+
+        # Use the pyensembl cache of the dataset
+        env = dict( os.environ )
+        env[ 'PYENSEMBL_CACHE_DIR' ] = self.manifest[ 'pyensembl_cache' ]
+
+        # Remove the report of the previous run
+        if os.path.exists( Constants.PATH_RUN_REPORT ):
+            os.remove( Constants.PATH_RUN_REPORT )
+
+        log_file_path = os.path.join( self.log_folder, name + '_' + str( repeat ) + '.log' )
+        Logger.get_instance().debug( 'BenchmarkRunner.run_step(): Running ' + ' '.join( command ) + '.' )
+
+        start_time = time.time()
+        with open( log_file_path, 'w' ) as log_file:
+            process = subprocess.Popen( command, stdout = log_file, stderr = subprocess.STDOUT, env = env )
+            # NB: The process is awaited using wait4 in order to
+            #     get the resources it used (and its children)
+            ( pid, status, rusage ) = os.wait4( process.pid, 0 )
+        wall_time = time.time() - start_time
+        process.returncode = ( os.WEXITSTATUS( status ) if os.WIFEXITED( status ) else -os.WTERMSIG( status ) )
+
+        measure = { 'wall_time': wall_time,
+                    'startup_time': None,
+                    'cpu_time': rusage.ru_utime + rusage.ru_stime,
+                    'peak_rss_mb': rusage.ru_maxrss / 1024.0,
+                    'exit_status': process.returncode,
+                    'log_file': log_file_path,
+                    'report': None,
+                    'error': None }
+
+        # Read the run report
+        if os.path.exists( Constants.PATH_RUN_REPORT ):
+            with open( Constants.PATH_RUN_REPORT, 'r' ) as report_file:
+                measure[ 'report' ] = json.load( report_file )
+
+        if ( process.returncode != 0 ):
+            measure[ 'error' ] = 'The process exited with the status ' + str( process.returncode ) + '.'
+        else:
+            measure[ 'error' ] = RunTelemetry.get_report_error( Constants.PATH_RUN_REPORT, strategy )
+
+        # The startup time is the time spent out of the stage of the strategy
+        if ( measure[ 'report' ] != None ):
+            strategy_stages = [ stage for stage in measure[ 'report' ].get( 'stages', [] )
+                                      if ( stage[ 'stage' ] == strategy ) ]
+            if strategy_stages:
+                measure[ 'startup_time' ] = max( wall_time - strategy_stages[ 0 ][ 'wall_time' ], 0 )
+
+        return measure
+
+
+
+    ## summarize_runs
+    #  --------------
+    #
+    # This is a static method that allows to compute the medians of the measures of several runs.
+    #
+    # @param runs: List - The measures of the runs.
+    #
+    # @return Dictionary - The medians of the measures, the measures of each run
+    #                      and the run report of the median run.
+    #
+    @staticmethod
+    def summarize_runs( runs ):
+
+        summary = { 'runs': len( runs ) }
+        for metric in BenchmarkRunner.MEASURED_METRICS:
+            values = sorted( [ run[ metric ] for run in runs ] )
+            middle = len( values ) // 2
+            if ( len( values ) % 2 == 1 ):
+                summary[ metric ] = values[ middle ]
+            else:
+                summary[ metric ] = ( values[ middle - 1 ] + values[ middle ] ) / 2.0
+            summary[ metric + '_values' ] = [ run[ metric ] for run in runs ]
+
+        median_run = sorted( runs, key = lambda run: run[ 'wall_time' ] )[ ( len( runs ) - 1 ) // 2 ]
+        summary[ 'report' ] = median_run[ 'report' ]
+
+        return summary
+
+
+
+    ## get_snapshot_path
+    #  -----------------
+    #
+    # @param state: String - The state of the databases.
+    #
+    # @return String - The folder of the snapshot of the databases in this state.
+    #
+    def get_snapshot_path( self, state ):
+
+        return os.path.join( self.snapshot_folder, state )
+
+
+
+    ## get_current_state
+    #  -----------------
+    #
+    # @return String - The state of the databases of the work folder (or None if unknown).
+    #
+    def get_current_state( self ):
+
+        state_file_path = os.path.join( self.db_folder, BenchmarkRunner.STATE_FILENAME )
+        if os.path.exists( state_file_path ):
+            with open( state_file_path, 'r' ) as state_file:
+                return state_file.read().strip()
+
+        return None
+
+
+
+    ## set_current_state
+    #  -----------------
+    #
+    # @param state: String - The state of the databases of the work folder (or None if unknown).
+    #
+    def set_current_state( self, state ):
+
+        state_file_path = os.path.join( self.db_folder, BenchmarkRunner.STATE_FILENAME )
+        if ( state == None ):
+            if os.path.exists( state_file_path ):
+                os.remove( state_file_path )
+        else:
+            with open( state_file_path, 'w' ) as state_file:
+                state_file.write( state )
+
+
+
+    ## save_snapshot
+    #  -------------
+    #
+    # This method allows to save the snapshot of the databases of the work folder.
+    #
+    # @param state: String - The state of the databases.
+    #
+    def save_snapshot( self, state ):
+
+        snapshot_path = self.get_snapshot_path( state )
+        temporary_path = snapshot_path + '.tmp'
+        if os.path.exists( temporary_path ):
+            shutil.rmtree( temporary_path )
+        os.makedirs( temporary_path )
+
+        for db_file in glob.glob( os.path.join( self.db_folder, '*' + SQLConstants.SQLITE_EXTENSION ) ):
+            shutil.copy2( db_file, temporary_path )
+
+        # NB: The snapshot is renamed once complete, so that
+        #     an incomplete snapshot is never used
+        os.rename( temporary_path, snapshot_path )
+
+
+
+    ## restore_snapshot
+    #  ----------------
+    #
+    # This method allows to restore the databases of the work folder in the
+    # provided state (or to remove them if no state is provided).
+    #
+    # @param state: String - The state of the databases (or None).
+    #
+    def restore_snapshot( self, state ):
+
+        for db_file in glob.glob( os.path.join( self.db_folder, '*' + SQLConstants.SQLITE_EXTENSION ) ):
+            os.remove( db_file )
+        self.set_current_state( None )
+
+        if ( state != None ):
+            for db_file in glob.glob( os.path.join( self.get_snapshot_path( state ), '*' + SQLConstants.SQLITE_EXTENSION ) ):
+                shutil.copy2( db_file, self.db_folder )
+            self.set_current_state( state )
+
+
+
+    ## apply_fixtures
+    #  --------------
+    #
+    # This method allows to write in the PRO database the information that
+    # would have been downloaded by the ComputeMissingInfo strategy (transcript
+    # coordinates and sequences, ORF sequences) and the relative coordinates that
+    # would have been computed by the ComputeRelCoord strategy.
+    #
+    def apply_fixtures( self ):
+
+        db_path = os.path.join( self.db_folder, Constants.BENCHMARK_PRO_DB_NAME + SQLConstants.SQLITE_EXTENSION )
+        connection = sqlite3.connect( db_path )
+        try:
+            cursor = connection.cursor()
+
+            with gzip.open( self.manifest[ 'transcript_fixture' ], 'rb' ) as fixture_file:
+                fixture_file.readline()
+                cursor.executemany( 'UPDATE Transcript SET strand = ?, start_pos = ?, end_pos = ?, bin = ?,' +
+                                    ' cds_start_pos = ?, cds_stop_pos = ?, sequence = ? WHERE transcript_id = ?',
+                                    ( BenchmarkRunner.get_fixture_values( line, [ 1, 2, 3, 4, 5, 6, 7, 0 ] )
+                                      for line in fixture_file ) )
+
+            with gzip.open( self.manifest[ 'orf_transcript_fixture' ], 'rb' ) as fixture_file:
+                fixture_file.readline()
+                rows = [ BenchmarkRunner.get_fixture_values( line, range( 8 ) ) for line in fixture_file ]
+
+            cursor.executemany( 'UPDATE ORF SET sequence = ? WHERE chromosome = ? AND strand = ?' +
+                                ' AND start_pos = ? AND stop_pos = ? AND sequence IS NULL',
+                                ( [ row[ 7 ] ] + row[ 0 : 4 ] for row in rows ) )
+            cursor.executemany( 'UPDATE ORFTranscriptAsso SET rel_start_pos = ?, rel_stop_pos = ?' +
+                                ' WHERE orf_id IN ( SELECT id FROM ORF WHERE chromosome = ? AND strand = ?' +
+                                ' AND start_pos = ? AND stop_pos = ? )' +
+                                ' AND transcript_id IN ( SELECT id FROM Transcript WHERE transcript_id = ? )',
+                                ( row[ 5 : 7 ] + row[ 0 : 5 ] for row in rows ) )
+            connection.commit()
+
+        except Exception as e:
+            raise DenCellORFException( 'BenchmarkRunner.apply_fixtures(): An error occurred trying to write' +
+                                       ' the fixtures in the PRO database (' + db_path + ').', e )
+        finally:
+            connection.close()
+
+
+
+    ## get_fixture_values
+    #  ------------------
+    #
+    # This is a static method that allows to get the values of a line of a fixture file.
+    #
+    # @param line: String - The line of the fixture file.
+    # @param indexes: List - The indexes of the values to return.
+    #
+    # @return List - The values (None for the empty ones).
+    #
+    @staticmethod
+    def get_fixture_values( line, indexes ):
+
+        values = line.rstrip( '\n' ).split( '\t' )
+        return [ ( values[ i ] if ( values[ i ] != '' ) else None ) for i in indexes ]
+
+
+
+    ## get_baseline_path
+    #  -----------------
+    #
+    # @return String - The path to the baseline file of the dataset.
+    #
+    def get_baseline_path( self ):
+
+        return os.path.join( self.benchmark_folder, Constants.BENCHMARK_BASELINES_FOLDER_NAME,
+                             os.path.basename( self.dataset_folder ) + '.json' )
+
+
+
+    ## compare_to_baseline
+    #  -------------------
+    #
+    # This method allows to compare the results to the baseline of the dataset
+    # and to log a comparison table.
+    #
+    # @param results: Dictionary - The results of the benchmark.
+    #
+    # @return Tuple - The comparison of each step ( dictionary where the keys are the
+    #                 step names and the values dictionaries of ( baseline, current,
+    #                 ratio ) ) and the list of ( step, metric ) tuples that regressed.
+    #
+    def compare_to_baseline( self, results ):
+
+        baseline_path = self.get_baseline_path()
+        if os.path.exists( baseline_path ):
+            with open( baseline_path, 'r' ) as baseline_file:
+                baseline = json.load( baseline_file )
+        else:
+            baseline = {}
+
+        comparison = {}
+        regressions = []
+        table = [ 'Step'.ljust( 22 ) + 'Metric'.ljust( 14 ) + 'Baseline'.rjust( 12 ) +
+                  'Current'.rjust( 12 ) + 'Ratio'.rjust( 8 ) ]
+
+        for name in BenchmarkRunner.STEP_NAMES:
+            if ( name not in results ):
+                continue
+
+            comparison[ name ] = {}
+            for ( metric, relative_tolerance, absolute_tolerance ) in BenchmarkRunner.COMPARED_METRICS:
+                current = results[ name ][ metric ]
+                reference = baseline.get( name, {} ).get( metric )
+                ratio = ( float( current ) / reference if reference else None )
+                comparison[ name ][ metric ] = { 'baseline': reference, 'current': current, 'ratio': ratio }
+
+                flag = ''
+                if ( ( reference != None )
+                     and ( current > reference * ( 1 + relative_tolerance ) )
+                     and ( current - reference >= absolute_tolerance ) ):
+                    regressions.append( ( name, metric ) )
+                    flag = '  REGRESSION'
+
+                table.append( name.ljust( 22 ) + metric.ljust( 14 ) +
+                              ( '-' if ( reference == None ) else '%.2f' % reference ).rjust( 12 ) +
+                              ( '%.2f' % current ).rjust( 12 ) +
+                              ( '-' if ( ratio == None ) else '%.2f' % ratio ).rjust( 8 ) + flag )
+
+        Logger.get_instance().info( 'Comparison with the baseline (' + baseline_path + '):\n' + '\n'.join( table ) )
+
+        return ( comparison, regressions )
+
+
+
+    ## update_baseline
+    #  ---------------
+    #
+    # This method allows to save the results of the steps as baseline of the
+    # dataset (the baselines of the other steps are kept).
+    #
+    # @param results: Dictionary - The results of the benchmark.
+    # @param only_missing: Boolean - Should only the missing baselines be saved? False by default.
+    #
+    def update_baseline( self, results, only_missing=False ):
+
+        baseline_path = self.get_baseline_path()
+        if os.path.exists( baseline_path ):
+            with open( baseline_path, 'r' ) as baseline_file:
+                baseline = json.load( baseline_file )
+        else:
+            baseline = {}
+            if ( not os.path.exists( os.path.dirname( baseline_path ) ) ):
+                os.makedirs( os.path.dirname( baseline_path ) )
+
+        updated_steps = []
+        for ( name, result ) in results.items():
+            if ( ( result.get( 'error' ) == None ) and ( ( not only_missing ) or ( name not in baseline ) ) ):
+                baseline[ name ] = dict( [ ( metric, result[ metric ] ) for metric in BenchmarkRunner.MEASURED_METRICS ] )
+                baseline[ name ][ 'date' ] = str( datetime.now() )
+                updated_steps.append( name )
+
+        if updated_steps:
+            with open( baseline_path, 'w' ) as baseline_file:
+                json.dump( baseline, baseline_file, indent = 2, sort_keys = True )
+            Logger.get_instance().info( 'The baseline of the steps ' + ', '.join( sorted( updated_steps ) ) +
+                                        ' has been saved in ' + baseline_path + '.' )
+
+
+
+    ## save_results
+    #  ------------
+    #
+    # This method allows to save the results of the benchmark in a JSON file.
+    #
+    # @param content: Dictionary - The content to save.
+    #
+    # @return String - The path to the file.
+    #
+    def save_results( self, content ):
+
+        results_folder = os.path.join( self.benchmark_folder, Constants.BENCHMARK_RESULTS_FOLDER_NAME )
+        if ( not os.path.exists( results_folder ) ):
+            os.makedirs( results_folder )
+
+        results_path = os.path.join( results_folder, os.path.basename( self.dataset_folder ) + '_' +
+                                     datetime.now().strftime( '%Y%m%d_%H%M%S' ) + '.json' )
+        with open( results_path, 'w' ) as results_file:
+            json.dump( content, results_file, indent = 2, sort_keys = True )
+
+        return results_path
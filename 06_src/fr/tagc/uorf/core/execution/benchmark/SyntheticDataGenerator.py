@@ -0,0 +1,1085 @@
+# -*- coding: utf-8 -*-
+
+import ConfigParser
+import gzip
+import json
+import math
+import os
+import random
+import shutil
+from datetime import datetime
+
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util.genetics import GeneticsConstants
+from fr.tagc.uorf.core.util.genetics.GeneticsUtil import GeneticsUtil
+from fr.tagc.uorf.core.util.exception import *
+from fr.tagc.uorf.core.util.log.Logger import Logger
+
+
+## SyntheticDataGenerator
+#  ======================
+#
+# This class allows to generate a synthetic (but realistic) dataset of a
+# given scale (number of ORFs), in order to benchmark the strategies
+# without any access to the network. The dataset contains:
+#     - A genome (FASTA file and chromosome sizes) and its annotation, saved
+#       as a pyensembl cache (GTF and cDNA, ncRNA and peptide FASTA files)
+#       for the Ensembl releases used by the parsers (90 for GRCh38 and 74
+#       for GRCh37), so that pyensembl never needs to download anything.
+#     - A chain file allowing to convert the GRCh37 (hg19) coordinates into
+#       GRCh38 coordinates.
+#     - A gene list at the format of the HGNCGeneList parser and two data
+#       sources at the formats of the sORFs_org_Human (GRCh38) and of the
+#       Mackowiak2015 (GRCh37) parsers.
+#     - A BED file of regions to use for filtering.
+#     - Fixture files containing the information usually downloaded from
+#       Ensembl by the ComputeMissingInfo strategy (transcript information and
+#       sequences) or computed by the ComputeRelCoord strategy (relative
+#       coordinates of the ORFs on the transcripts), as this last one
+#       requires R and the Ensembl annotation packages.
+#     - A config file allowing to run the strategies on the dataset.
+#
+# Each gene has one single transcript (60% of protein coding transcripts,
+# 40% of lincRNAs) containing ORFS_PER_TRANSCRIPT ORFs.
+# On protein coding transcripts, the ORF located in the middle of the
+# transcript is the annotated CDS, the others are upstream and downstream
+# ORFs. The ORFs overlapping exon-exon junctions are spliced. The genes are
+# distributed on the chromosomes according to their actual lengths.
+#
+# The generation is fully determined by the scale and the seed, hence a
+# dataset is generated once and saved in its own folder. The manifest of
+# the dataset is written at the end of the generation, so that a dataset
+# which generation has been interrupted is generated again.
+#
+class SyntheticDataGenerator( object ):
+
+    ## Class variables
+    #  ---------------
+    #
+    # Version of the generator. Please increase this number each time
+    # the content of the datasets generated is changed.
+    GENERATOR_VERSION = 1
+
+    # Name of the manifest file
+    MANIFEST_FILENAME = 'manifest.json'
+
+    # Chromosomes and their lengths in the GRCh38 assembly (in Mb),
+    # used to distribute the genes on the chromosomes
+    CHROMOSOME_LENGTHS = [ ( '1', 248.9 ), ( '2', 242.2 ), ( '3', 198.3 ), ( '4', 190.2 ),
+                           ( '5', 181.5 ), ( '6', 170.8 ), ( '7', 159.3 ), ( '8', 145.1 ),
+                           ( '9', 138.4 ), ( '10', 133.8 ), ( '11', 135.1 ), ( '12', 133.3 ),
+                           ( '13', 114.4 ), ( '14', 107.0 ), ( '15', 102.0 ), ( '16', 90.3 ),
+                           ( '17', 83.3 ), ( '18', 80.4 ), ( '19', 58.6 ), ( '20', 64.4 ),
+                           ( '21', 46.7 ), ( '22', 50.8 ), ( 'X', 156.0 ), ( 'Y', 57.2 ) ]
+
+    # Ensembl releases used by the parsers, and corresponding
+    # names of the files expected in the pyensembl cache
+    GRCH38_RELEASE = '90'
+    GRCH37_RELEASE = '74'
+    PYENSEMBL_FILENAMES = { Constants.ANNOTATION_VERSION_GRCH38: { 'gtf': 'Homo_sapiens.GRCh38.90.gtf.gz',
+                                                                   'cdna': 'Homo_sapiens.GRCh38.cdna.all.fa.gz',
+                                                                   'ncrna': 'Homo_sapiens.GRCh38.ncrna.fa.gz',
+                                                                   'pep': 'Homo_sapiens.GRCh38.pep.all.fa.gz' },
+                            Constants.ANNOTATION_VERSION_GRCH37: { 'gtf': 'Homo_sapiens.GRCh37.74.gtf.gz',
+                                                                   'cdna': 'Homo_sapiens.GRCh37.74.cdna.all.fa.gz',
+                                                                   'ncrna': 'Homo_sapiens.GRCh37.74.ncrna.fa.gz',
+                                                                   'pep': 'Homo_sapiens.GRCh37.74.pep.all.fa.gz' } }
+
+    # Name of the chain file expected by the LiftOver strategy
+    CHAIN_FILENAME = 'hg19ToHg38.over.chain.gz'
+    # Shift of the GRCh37 coordinates compared to the GRCh38 ones, and size of
+    # the gap inserted in the middle of each chromosome of the GRCh37 assembly
+    GRCH37_OFFSET = 10000
+    GRCH37_GAP = 1000
+
+    # Names of the data sources and of the gene list generated
+    GENE_LIST_NAME = 'HGNCGeneList'
+    SORFS_ORG_NAME = 'sORFs_org_Human'
+    MACKOWIAK_NAME = 'Mackowiak2015'
+
+    # Headers of the data source files
+    HGNC_HEADERS = [ 'HGNC ID', 'Chromosome', 'Approved symbol', 'Alias symbol', 'Previous symbol',
+                     'Ensembl gene ID', 'NCBI gene ID' ]
+    SORFS_ORG_HEADERS = [ 'Sorf ID', 'Chromosome', 'Ensembl transcript ID', 'Strand', 'Sorf start',
+                          'Sorf end', 'Spliced', 'Spliced start parts', 'Spliced stop parts', 'Cell line',
+                          'Transcript sequence', 'AA-sequence', 'Annotation', 'Biotype', 'Sorf length',
+                          'Orfscore', 'PhastCon', 'FLOSS score', 'Floss-Classification' ]
+    MACKOWIAK_HEADERS = [ 'orfID', '#chrom', 'gene_name', 'transcriptID', 'other_transcriptIDs', 'strand',
+                          'CDS_start', 'CDS_end', 'transcript_start', 'transcript_end', 'sequence',
+                          'sORF_type', 'length', 'phyloCSF_score', 'phastcons_conserved_elements_overlap' ]
+
+    # Headers of the fixture files
+    TRANSCRIPT_FIXTURE_HEADERS = [ 'transcript_id', 'strand', 'start_pos', 'end_pos', 'bin',
+                                   'cds_start_pos', 'cds_stop_pos', 'sequence' ]
+    ORF_TRANSCRIPT_FIXTURE_HEADERS = [ 'chromosome', 'strand', 'start_pos', 'stop_pos', 'transcript_id',
+                                       'rel_start_pos', 'rel_stop_pos', 'sequence' ]
+
+    # Biotypes of the transcripts
+    BIOTYPE_PROTEIN_CODING = 'protein_coding'
+    BIOTYPE_LINCRNA = 'lincRNA'
+
+    # Categories of the ORFs, as provided by each data source
+    # (dictionary associating the location of the ORF on the
+    # transcript to the category provided by the data source)
+    SORFS_ORG_CATEGORIES = { 'upstream': '5UTR', 'cds': 'annotated', 'downstream': '3UTR', 'lincRNA': 'lncrna' }
+    MACKOWIAK_CATEGORIES = { 'upstream': 'uORF', 'downstream': 'dORF', 'lincRNA': 'lincRNA' }
+
+    # Cell lines in which the ORFs are detected
+    CELL_LINES = [ 'HEK293', 'K562', 'HeLa', 'MCF7', 'A549' ]
+    FLOSS_CLASSES = [ 'Good', 'Extreme', 'Not in cutoff range' ]
+
+    # Properties of the transcripts generated
+    ORFS_PER_TRANSCRIPT = 5
+    PROTEIN_CODING_RATE = 0.6
+      # Lengths of the short ORFs and CDS (in amino acids)
+    SORF_LENGTH_RANGE = ( 10, 100 )
+    CDS_LENGTH_RANGE = ( 100, 300 )
+      # Lengths of the UTRs, of the spacers between the ORFs, of the introns
+      # and of the intergenic regions (in nucleotides)
+    UTR_LENGTH_RANGE = ( 20, 80 )
+    SPACER_LENGTH_RANGE = ( 10, 40 )
+    INTRON_LENGTH_RANGE = ( 60, 400 )
+    INTERGENIC_LENGTH_RANGE = ( 50, 500 )
+      # Number of exons of the transcripts
+    EXON_COUNT_RANGE = ( 1, 3 )
+      # Minimal length of the exons (in nucleotides)
+    EXON_MIN_LENGTH = 20
+
+    # Probabilities for an ORF to be reported by the data sources
+    # (each ORF is reported at least by one source) and for an ORF
+    # reported by sORFs.org to be detected in a second cell line
+    SORFS_ORG_RATE = 0.8
+    MACKOWIAK_RATE = 0.5
+    SECOND_CELL_LINE_RATE = 0.3
+    # Probability for the gene symbol to be missing in Mackowiak2015 file
+    MACKOWIAK_MISSING_SYMBOL_RATE = 0.1
+
+    # Sizes of the pools of random bases and codons (used to generate quickly
+    # the sequences by slicing them at random positions)
+    BASE_POOL_SIZE = 2 ** 20
+    CODON_POOL_SIZE = 2 ** 18
+
+    # Number of nucleotides per line in the FASTA files
+    FASTA_LINE_LENGTH = 60
+
+    # Complementary bases
+    COMPLEMENT = { 'A': 'T', 'C': 'G', 'G': 'C', 'T': 'A' }
+
+
+    ## Constructor of SyntheticDataGenerator
+    #  -------------------------------------
+    #
+    # Instance variables:
+    #     - scale: Integer - The number of ORFs to generate.
+    #     - seed: Integer - The seed of the random generator.
+    #     - dataset_folder: String - The folder where the dataset is saved.
+    #     - random: Random - The random generator.
+    #     - base_pool: String - The pool of random bases.
+    #     - codon_pool: String - The pool of random sense codons.
+    #     - aa_pool: String - The translation of the pool of codons.
+    #     - files: Dictionary - The handles of the files opened during the generation.
+    #     - genome_buffer: String - The sequence of the current chromosome not yet written
+    #                               in the genome FASTA file.
+    #     - chromosome_sizes: List - The list of ( chromosome, GRCh38 length, GRCh37 breakpoint )
+    #                                tuples of the chromosomes generated.
+    #     - counts: Dictionary - The number of entries generated (genes, ORFs, rows of the sources).
+    #
+    # @param folder: String - The folder where the datasets are saved.
+    # @param scale: Integer - The number of ORFs to generate.
+    # @param seed: Integer - The seed of the random generator.
+    #
+    def __init__( self, folder, scale, seed ):
+
+        self.scale = scale
+        self.seed = seed
+        self.dataset_folder = os.path.join( folder, SyntheticDataGenerator.get_dataset_name( scale, seed ) )
+
+        self.random = None
+        self.base_pool = None
+        self.codon_pool = None
+        self.aa_pool = None
+        self.files = {}
+        self.genome_buffer = ''
+        self.chromosome_sizes = []
+        self.counts = {}
+
+
+
+    ## get_dataset_name
+    #  ----------------
+    #
+    # This is a static method that returns the name of the folder of a dataset.
+    #
+    # @param scale: Integer - The number of ORFs of the dataset.
+    # @param seed: Integer - The seed used to generate the dataset.
+    #
+    # @return String - The name of the dataset.
+    #
+    @staticmethod
+    def get_dataset_name( scale, seed ):
+
+        return str( scale ) + '_seed' + str( seed )
+
+
+
+    ## get_path
+    #  --------
+    #
+    # This method returns the path to a file or folder of the dataset.
+    #
+    # @param *args: Strings - The components of the path, relative to the dataset folder.
+    #
+    # @return String - The absolute path.
+    #
+    def get_path( self, *args ):
+
+        return os.path.join( self.dataset_folder, *args )
+
+
+
+    ## load_manifest
+    #  -------------
+    #
+    # This method allows to load the manifest of the dataset.
+    #
+    # @return Dictionary - The content of the manifest, or None if the dataset
+    #                      has not been (entirely) generated by the current
+    #                      version of the generator.
+    #
+    def load_manifest( self ):
+
+        manifest_path = self.get_path( SyntheticDataGenerator.MANIFEST_FILENAME )
+        if ( not os.path.exists( manifest_path ) ):
+            return None
+
+        try:
+            with open( manifest_path, 'r' ) as manifest_file:
+                manifest = json.load( manifest_file )
+        except Exception as e:
+            Logger.get_instance().warning( 'SyntheticDataGenerator.load_manifest(): The manifest of the' +
+                                           ' dataset ' + self.dataset_folder + ' cannot be read (' +
+                                           str( e ) + '). Hence, the dataset will be generated again.' )
+            return None
+
+        if ( manifest.get( 'generator_version' ) != SyntheticDataGenerator.GENERATOR_VERSION ):
+            return None
+
+        return manifest
+
+
+
+    ## generate
+    #  --------
+    #
+    # This method allows to generate the dataset, unless it has already been
+    # generated by the current version of the generator.
+    #
+    # @param force_overwrite: Boolean - Should the dataset be generated again
+    #                                   even if it already exists? False by default.
+    #
+    # @return Dictionary - The manifest of the dataset.
+    #
+    # @throw DenCellORFException: When an error occurred during the generation.
+    #
+    def generate( self, force_overwrite=False ):
+
+        if ( not force_overwrite ):
+            manifest = self.load_manifest()
+            if manifest:
+                Logger.get_instance().info( 'The synthetic dataset ' + self.dataset_folder +
+                                            ' has already been generated.' )
+                return manifest
+
+        Logger.get_instance().info( 'Generating the synthetic dataset ' + self.dataset_folder +
+                                    ' (' + str( self.scale ) + ' ORFs, seed: ' + str( self.seed ) + ').' )
+        start_time = datetime.now()
+
+        if os.path.exists( self.dataset_folder ):
+            shutil.rmtree( self.dataset_folder )
+
+        self.random = random.Random( self.seed )
+        self.counts = { 'genes': 0, 'orfs': 0, 'spliced_orfs': 0,
+                        SyntheticDataGenerator.SORFS_ORG_NAME: 0,
+                        SyntheticDataGenerator.MACKOWIAK_NAME: 0 }
+        self.chromosome_sizes = []
+        self.init_pools()
+
+        try:
+            self.open_files()
+
+            # Distribute the transcripts on the chromosomes and generate them
+            transcript_count = int( math.ceil( float( self.scale ) / SyntheticDataGenerator.ORFS_PER_TRANSCRIPT ) )
+            for ( chromosome, chr_transcript_count ) in self.distribute_transcripts( transcript_count ):
+                if ( chr_transcript_count > 0 ):
+                    self.generate_chromosome( chromosome, chr_transcript_count )
+
+        except Exception as e:
+            raise DenCellORFException( 'SyntheticDataGenerator.generate(): An error occurred trying to' +
+                                       ' generate the synthetic dataset ' + self.dataset_folder + '.', e )
+        finally:
+            self.close_files()
+
+        # Write the files depending on the chromosome sizes
+        self.write_chain_file()
+        self.write_chromosome_sizes()
+        self.write_filter_regions()
+
+        # Link the sequences of the GRCh37 pyensembl cache
+        # to the ones of the GRCh38 cache
+        for sequence_type in [ 'cdna', 'ncrna', 'pep' ]:
+            SyntheticDataGenerator.link_file( self.get_pyensembl_file( Constants.ANNOTATION_VERSION_GRCH38, sequence_type ),
+                                              self.get_pyensembl_file( Constants.ANNOTATION_VERSION_GRCH37, sequence_type ) )
+
+        config_path = self.write_config_file()
+
+        # Write the manifest of the dataset
+        manifest = { 'generator_version': SyntheticDataGenerator.GENERATOR_VERSION,
+                     'scale': self.scale,
+                     'seed': self.seed,
+                     'generation_date': str( datetime.now() ),
+                     'counts': self.counts,
+                     'config_file': config_path,
+                     'database_folder': self.get_database_folder(),
+                     'pyensembl_cache': self.get_path( 'pyensembl_cache' ),
+                     'transcript_fixture': self.get_path( 'fixtures', 'transcripts.tsv.gz' ),
+                     'orf_transcript_fixture': self.get_path( 'fixtures', 'orf_transcript_coordinates.tsv.gz' ) }
+        with open( self.get_path( SyntheticDataGenerator.MANIFEST_FILENAME ), 'w' ) as manifest_file:
+            json.dump( manifest, manifest_file, indent = 2, sort_keys = True )
+
+        Logger.get_instance().info( 'The synthetic dataset ' + self.dataset_folder + ' has been generated in ' +
+                                    str( datetime.now() - start_time ) + ' (' + str( self.counts[ 'genes' ] ) +
+                                    ' genes, ' + str( self.counts[ 'orfs' ] ) + ' ORFs).' )
+
+        return manifest
+
+
+
+    ## get_database_folder
+    #  -------------------
+    #
+    # @return String - The folder of the SQLite databases built from the dataset.
+    #
+    def get_database_folder( self ):
+
+        return self.get_path( 'work', 'databases' )
+
+
+
+    ## get_pyensembl_file
+    #  ------------------
+    #
+    # This method returns the path of a file of the pyensembl cache.
+    #
+    # @param annotation_version: String - The annotation version (GRCh38 or GRCh37).
+    # @param file_type: String - The type of file (gtf, cdna, ncrna or pep).
+    #
+    # @return String - The path to the file.
+    #
+    def get_pyensembl_file( self, annotation_version, file_type ):
+
+        if ( annotation_version == Constants.ANNOTATION_VERSION_GRCH38 ):
+            release = SyntheticDataGenerator.GRCH38_RELEASE
+        else:
+            release = SyntheticDataGenerator.GRCH37_RELEASE
+
+        return self.get_path( 'pyensembl_cache', 'pyensembl', annotation_version, 'ensembl' + release,
+                              SyntheticDataGenerator.PYENSEMBL_FILENAMES[ annotation_version ][ file_type ] )
+
+
+
+    ## init_pools
+    #  ----------
+    #
+    # This method allows to initialize the pools of random bases and codons.
+    #
+    def init_pools( self ):
+
+        bases = 'ACGT'
+        self.base_pool = ''.join( [ bases[ self.random.getrandbits( 2 ) ] for i in xrange( SyntheticDataGenerator.BASE_POOL_SIZE ) ] )
+
+        sense_codons = sorted( [ codon for ( codon, aa ) in GeneticsConstants.GENETIC_CODE_DNA_SINGLE_LETTER.items()
+                                       if ( aa != GeneticsConstants.STOP_CODON ) ] )
+        codons = [ self.random.choice( sense_codons ) for i in xrange( SyntheticDataGenerator.CODON_POOL_SIZE ) ]
+        self.codon_pool = ''.join( codons )
+        self.aa_pool = ''.join( [ GeneticsConstants.GENETIC_CODE_DNA_SINGLE_LETTER[ codon ] for codon in codons ] )
+
+
+
+    ## random_sequence
+    #  ---------------
+    #
+    # @param length: Integer - The length of the sequence.
+    #
+    # @return String - A random nucleic sequence.
+    #
+    def random_sequence( self, length ):
+
+        offset = self.random.randint( 0, SyntheticDataGenerator.BASE_POOL_SIZE - length )
+        return self.base_pool[ offset : offset + length ]
+
+
+
+    ## random_orf
+    #  ----------
+    #
+    # This method allows to generate a random ORF (starting with an ATG
+    # codon and ending with a stop codon).
+    #
+    # @param aa_length: Integer - The length of the ORF in amino acids (stop codon excluded).
+    #
+    # @return Tuple - The nucleic sequence of the ORF and its amino acid sequence
+    #                 (stop codon excluded).
+    #
+    def random_orf( self, aa_length ):
+
+        offset = self.random.randint( 0, SyntheticDataGenerator.CODON_POOL_SIZE - aa_length )
+        nt_sequence = ( 'ATG' + self.codon_pool[ 3 * offset : 3 * ( offset + aa_length - 1 ) ] +
+                        self.random.choice( GeneticsConstants.STOP_CODON_SEQUENCES ) )
+        aa_sequence = 'M' + self.aa_pool[ offset : offset + aa_length - 1 ]
+
+        return ( nt_sequence, aa_sequence )
+
+
+
+    ## reverse_complement
+    #  ------------------
+    #
+    # @param sequence: String - A nucleic sequence.
+    #
+    # @return String - The reverse complement of the sequence.
+    #
+    @staticmethod
+    def reverse_complement( sequence ):
+
+        return ''.join( [ SyntheticDataGenerator.COMPLEMENT[ base ] for base in reversed( sequence ) ] )
+
+
+
+    ## distribute_transcripts
+    #  ----------------------
+    #
+    # This method allows to distribute the transcripts on the chromosomes,
+    # according to the lengths of the chromosomes.
+    #
+    # @param transcript_count: Integer - The total number of transcripts.
+    #
+    # @return List - The list of ( chromosome, number of transcripts ) tuples.
+    #
+    def distribute_transcripts( self, transcript_count ):
+
+        total_length = sum( [ length for ( chromosome, length ) in SyntheticDataGenerator.CHROMOSOME_LENGTHS ] )
+        shares = [ ( chromosome, transcript_count * length / total_length )
+                   for ( chromosome, length ) in SyntheticDataGenerator.CHROMOSOME_LENGTHS ]
+        counts = [ int( share ) for ( chromosome, share ) in shares ]
+
+        # Give the remaining transcripts to the chromosomes
+        # with the largest remainders
+        remainders = sorted( range( len( shares ) ), key = lambda i: shares[ i ][ 1 ] - counts[ i ], reverse = True )
+        for i in remainders[ : transcript_count - sum( counts ) ]:
+            counts[ i ] += 1
+
+        return [ ( shares[ i ][ 0 ], counts[ i ] ) for i in range( len( shares ) ) ]
+
+
+
+    ## open_files
+    #  ----------
+    #
+    # This method allows to create the folders of the dataset, to open
+    # the files written during the generation and to write their headers.
+    #
+    def open_files( self ):
+
+        for folder in [ self.get_path( 'genome' ), self.get_path( 'sources' ), self.get_path( 'fixtures' ),
+                        self.get_path( 'chain' ), self.get_database_folder(),
+                        os.path.dirname( self.get_pyensembl_file( Constants.ANNOTATION_VERSION_GRCH38, 'gtf' ) ),
+                        os.path.dirname( self.get_pyensembl_file( Constants.ANNOTATION_VERSION_GRCH37, 'gtf' ) ) ]:
+            if ( not os.path.exists( folder ) ):
+                os.makedirs( folder )
+
+        # NB: The compressed files are written with a low compression level,
+        #     as the generation time matters more than their size
+        self.files[ 'genome' ] = open( self.get_path( 'genome', 'GRCh38.fa' ), 'w' )
+        for ( annotation_version, key ) in [ ( Constants.ANNOTATION_VERSION_GRCH38, 'gtf' ),
+                                             ( Constants.ANNOTATION_VERSION_GRCH37, 'gtf37' ) ]:
+            self.files[ key ] = gzip.open( self.get_pyensembl_file( annotation_version, 'gtf' ), 'wb', 1 )
+            self.files[ key ].write( '#!genome-build ' + annotation_version + '\n' )
+        for sequence_type in [ 'cdna', 'ncrna', 'pep' ]:
+            self.files[ sequence_type ] = gzip.open( self.get_pyensembl_file( Constants.ANNOTATION_VERSION_GRCH38, sequence_type ), 'wb', 1 )
+
+        for ( key, headers ) in [ ( SyntheticDataGenerator.GENE_LIST_NAME, SyntheticDataGenerator.HGNC_HEADERS ),
+                                  ( SyntheticDataGenerator.SORFS_ORG_NAME, SyntheticDataGenerator.SORFS_ORG_HEADERS ),
+                                  ( SyntheticDataGenerator.MACKOWIAK_NAME, SyntheticDataGenerator.MACKOWIAK_HEADERS ) ]:
+            self.files[ key ] = open( self.get_path( 'sources', key + '.tsv' ), 'w' )
+            self.files[ key ].write( '\t'.join( headers ) + '\n' )
+
+        for ( key, filename, headers ) in [ ( 'transcript_fixture', 'transcripts.tsv.gz', SyntheticDataGenerator.TRANSCRIPT_FIXTURE_HEADERS ),
+                                            ( 'orf_transcript_fixture', 'orf_transcript_coordinates.tsv.gz', SyntheticDataGenerator.ORF_TRANSCRIPT_FIXTURE_HEADERS ) ]:
+            self.files[ key ] = gzip.open( self.get_path( 'fixtures', filename ), 'wb', 1 )
+            self.files[ key ].write( '\t'.join( headers ) + '\n' )
+
+
+
+    ## close_files
+    #  -----------
+    #
+    # This method allows to close all the files opened during the generation.
+    #
+    def close_files( self ):
+
+        for handle in self.files.values():
+            handle.close()
+        self.files = {}
+
+
+
+    ## write_row
+    #  ---------
+    #
+    # This method allows to write a row in a tab-separated file.
+    #
+    # @param key: String - The key of the file in the files dictionary.
+    # @param values: List - The values of the row.
+    #
+    def write_row( self, key, values ):
+
+        self.files[ key ].write( '\t'.join( [ ( '' if ( value == None ) else str( value ) ) for value in values ] ) + '\n' )
+
+
+
+    ## append_genome_sequence
+    #  ----------------------
+    #
+    # This method allows to add a sequence at the end of the current
+    # chromosome, and to write all the complete lines in the genome file.
+    #
+    # @param sequence: String - The sequence to add.
+    #
+    def append_genome_sequence( self, sequence ):
+
+        self.genome_buffer += sequence
+        line_length = SyntheticDataGenerator.FASTA_LINE_LENGTH
+        complete_length = len( self.genome_buffer ) - ( len( self.genome_buffer ) % line_length )
+        if ( complete_length > 0 ):
+            self.files[ 'genome' ].write( '\n'.join( [ self.genome_buffer[ i : i + line_length ]
+                                                       for i in xrange( 0, complete_length, line_length ) ] ) + '\n' )
+            self.genome_buffer = self.genome_buffer[ complete_length : ]
+
+
+
+    ## write_fasta_entry
+    #  -----------------
+    #
+    # This method allows to write an entry in a FASTA file.
+    #
+    # @param key: String - The key of the file in the files dictionary.
+    # @param header: String - The header of the entry (without '>').
+    # @param sequence: String - The sequence.
+    #
+    def write_fasta_entry( self, key, header, sequence ):
+
+        line_length = SyntheticDataGenerator.FASTA_LINE_LENGTH
+        self.files[ key ].write( '>' + header + '\n' +
+                                 '\n'.join( [ sequence[ i : i + line_length ] for i in xrange( 0, len( sequence ), line_length ) ] ) +
+                                 '\n' )
+
+
+
+    ## generate_chromosome
+    #  -------------------
+    #
+    # This method allows to generate the genes of a chromosome and to write
+    # the corresponding lines in all the files of the dataset.
+    #
+    # @param chromosome: String - The name of the chromosome.
+    # @param transcript_count: Integer - The number of transcripts to generate.
+    #
+    def generate_chromosome( self, chromosome, transcript_count ):
+
+        self.files[ 'genome' ].write( '>' + chromosome + '\n' )
+        self.genome_buffer = ''
+
+        # Length of the chromosome generated so far
+        chr_length = 0
+        # Position (in the GRCh38 assembly, after which the gap of the
+        # GRCh37 assembly is inserted) and the corresponding shift
+        breakpoint = None
+        grch37_shift = SyntheticDataGenerator.GRCH37_OFFSET
+
+        for i in xrange( transcript_count ):
+
+            # Add an intergenic region prior to the gene
+            intergenic_length = self.random.randint( *SyntheticDataGenerator.INTERGENIC_LENGTH_RANGE )
+            self.append_genome_sequence( self.random_sequence( intergenic_length ) )
+            chr_length += intergenic_length
+
+            # Generate the gene and write it
+            gene = self.generate_gene( chromosome, gene_start = chr_length + 1 )
+            self.append_genome_sequence( gene[ 'genomic_sequence' ] )
+            chr_length += len( gene[ 'genomic_sequence' ] )
+            self.write_gene( gene, grch37_shift )
+
+            # Insert the gap of the GRCh37 assembly in the intergenic
+            # region following the gene in the middle of the chromosome
+            if ( i == transcript_count // 2 ):
+                breakpoint = chr_length + SyntheticDataGenerator.INTERGENIC_LENGTH_RANGE[ 0 ] // 2
+                grch37_shift += SyntheticDataGenerator.GRCH37_GAP
+
+        # Add an intergenic region at the end of the chromosome
+        intergenic_length = self.random.randint( *SyntheticDataGenerator.INTERGENIC_LENGTH_RANGE )
+        self.append_genome_sequence( self.random_sequence( intergenic_length ) )
+        chr_length += intergenic_length
+
+        if self.genome_buffer:
+            self.files[ 'genome' ].write( self.genome_buffer + '\n' )
+            self.genome_buffer = ''
+
+        self.chromosome_sizes.append( ( chromosome, chr_length, breakpoint ) )
+
+
+
+    ## generate_gene
+    #  -------------
+    #
+    # This method allows to generate a gene (and its single transcript).
+    #
+    # @param chromosome: String - The name of the chromosome.
+    # @param gene_start: Integer - The genomic position of the first nucleotide of the gene (1-based).
+    #
+    # @return Dictionary - The description of the gene.
+    #
+    def generate_gene( self, chromosome, gene_start ):
+
+        self.counts[ 'genes' ] += 1
+        gene_nb = self.counts[ 'genes' ]
+
+        gene = { 'chromosome': chromosome,
+                 'gene_id': 'ENSG9%010d' % gene_nb,
+                 'transcript_id': 'ENST9%010d' % gene_nb,
+                 'protein_id': 'ENSP9%010d' % gene_nb,
+                 'exon_id_prefix': 'ENSE9%08d' % gene_nb,
+                 'symbol': 'SYN' + str( gene_nb ),
+                 'hgnc_id': 'HGNC:' + str( 900000 + gene_nb ),
+                 'ncbi_id': str( 900000000 + gene_nb ),
+                 'strand': self.random.choice( [ '+', '-' ] ),
+                 'start': gene_start }
+
+        if ( self.random.random() < SyntheticDataGenerator.PROTEIN_CODING_RATE ):
+            gene[ 'biotype' ] = SyntheticDataGenerator.BIOTYPE_PROTEIN_CODING
+            cds_index = SyntheticDataGenerator.ORFS_PER_TRANSCRIPT // 2
+        else:
+            gene[ 'biotype' ] = SyntheticDataGenerator.BIOTYPE_LINCRNA
+            cds_index = None
+
+        # Build the mature transcript, made of the 5'UTR, of the ORFs
+        # (separated by spacers) and of the 3'UTR
+        sequence_parts = [ self.random_sequence( self.random.randint( *SyntheticDataGenerator.UTR_LENGTH_RANGE ) ) ]
+        tr_length = len( sequence_parts[ 0 ] )
+        orfs = []
+        for orf_index in range( SyntheticDataGenerator.ORFS_PER_TRANSCRIPT ):
+            if ( orf_index > 0 ):
+                spacer = self.random_sequence( self.random.randint( *SyntheticDataGenerator.SPACER_LENGTH_RANGE ) )
+                sequence_parts.append( spacer )
+                tr_length += len( spacer )
+
+            if ( cds_index == None ):
+                location = 'lincRNA'
+            elif ( orf_index < cds_index ):
+                location = 'upstream'
+            elif ( orf_index == cds_index ):
+                location = 'cds'
+            else:
+                location = 'downstream'
+
+            if ( location == 'cds' ):
+                aa_length = self.random.randint( *SyntheticDataGenerator.CDS_LENGTH_RANGE )
+            else:
+                aa_length = self.random.randint( *SyntheticDataGenerator.SORF_LENGTH_RANGE )
+            ( nt_sequence, aa_sequence ) = self.random_orf( aa_length )
+
+            orfs.append( { 'location': location,
+                           'rel_start': tr_length,
+                           'rel_end': tr_length + len( nt_sequence ),
+                           'sequence': nt_sequence,
+                           'sequence_aa': aa_sequence } )
+            sequence_parts.append( nt_sequence )
+            tr_length += len( nt_sequence )
+
+        sequence_parts.append( self.random_sequence( self.random.randint( *SyntheticDataGenerator.UTR_LENGTH_RANGE ) ) )
+        gene[ 'sequence' ] = ''.join( sequence_parts )
+        tr_length = len( gene[ 'sequence' ] )
+
+        # Split the transcript into exons (as relative 0-based half-open
+        # intervals) and compute their positions on the pre-mRNA
+        exon_count = self.random.randint( *SyntheticDataGenerator.EXON_COUNT_RANGE )
+        min_length = SyntheticDataGenerator.EXON_MIN_LENGTH
+        cuts = set()
+        while ( len( cuts ) < exon_count - 1 ):
+            cuts.add( self.random.randint( min_length, tr_length - min_length ) )
+        cuts = [ 0 ] + sorted( cuts ) + [ tr_length ]
+
+        exons = []
+        pre_mrna_parts = []
+        pre_mrna_length = 0
+        for k in range( len( cuts ) - 1 ):
+            if ( k > 0 ):
+                intron_length = self.random.randint( *SyntheticDataGenerator.INTRON_LENGTH_RANGE )
+                pre_mrna_parts.append( 'GT' + self.random_sequence( intron_length - 4 ) + 'AG' )
+                pre_mrna_length += intron_length
+            exons.append( ( cuts[ k ], cuts[ k + 1 ], pre_mrna_length ) )
+            pre_mrna_parts.append( gene[ 'sequence' ][ cuts[ k ] : cuts[ k + 1 ] ] )
+            pre_mrna_length += cuts[ k + 1 ] - cuts[ k ]
+
+        pre_mrna = ''.join( pre_mrna_parts )
+        gene[ 'exons' ] = exons
+        gene[ 'end' ] = gene_start + pre_mrna_length - 1
+        if ( gene[ 'strand' ] == '+' ):
+            gene[ 'genomic_sequence' ] = pre_mrna
+        else:
+            gene[ 'genomic_sequence' ] = SyntheticDataGenerator.reverse_complement( pre_mrna )
+
+        # Compute the genomic blocks of the exons and of the ORFs
+        gene[ 'exon_blocks' ] = [ self.get_genomic_blocks( gene, start, end )[ 0 ] for ( start, end, pre_start ) in exons ]
+        for orf in orfs:
+            orf[ 'blocks' ] = self.get_genomic_blocks( gene, orf[ 'rel_start' ], orf[ 'rel_end' ] )
+        gene[ 'orfs' ] = orfs
+
+        return gene
+
+
+
+    ## get_genomic_blocks
+    #  ------------------
+    #
+    # This method allows to get the genomic coordinates of a region of
+    # the transcript, split by the exon-exon junctions.
+    #
+    # @param gene: Dictionary - The description of the gene.
+    # @param rel_start: Integer - The relative position of the first nucleotide
+    #                             of the region (0-based).
+    # @param rel_end: Integer - The relative position following the last nucleotide
+    #                           of the region (0-based).
+    #
+    # @return List - The list of ( genomic position of the first nucleotide, genomic
+    #                position of the last nucleotide ) tuples of each block (1-based,
+    #                in the order of the transcript, i.e. with decreasing positions on
+    #                the minus strand).
+    #
+    def get_genomic_blocks( self, gene, rel_start, rel_end ):
+
+        blocks = []
+        for ( exon_start, exon_end, pre_start ) in gene[ 'exons' ]:
+            block_start = max( rel_start, exon_start )
+            block_end = min( rel_end, exon_end )
+            if ( block_start < block_end ):
+                first = pre_start + block_start - exon_start
+                last = pre_start + block_end - 1 - exon_start
+                if ( gene[ 'strand' ] == '+' ):
+                    blocks.append( ( gene[ 'start' ] + first, gene[ 'start' ] + last ) )
+                else:
+                    blocks.append( ( gene[ 'end' ] - first, gene[ 'end' ] - last ) )
+
+        return blocks
+
+
+
+    ## write_gene
+    #  ----------
+    #
+    # This method allows to write the lines related to a gene in the
+    # annotation, sequence, source and fixture files.
+    #
+    # @param gene: Dictionary - The description of the gene.
+    # @param grch37_shift: Integer - The difference between the GRCh37 and GRCh38
+    #                                coordinates of the gene.
+    #
+    def write_gene( self, gene, grch37_shift ):
+
+        chromosome = gene[ 'chromosome' ]
+        strand = gene[ 'strand' ]
+        is_coding = ( gene[ 'biotype' ] == SyntheticDataGenerator.BIOTYPE_PROTEIN_CODING )
+
+        # Write the annotation of the gene
+        self.write_gtf_lines( gene, grch37_shift )
+
+        # Write the sequences of the transcript (and of the protein)
+        location = ( 'chromosome:' + Constants.ANNOTATION_VERSION_GRCH38 + ':' + chromosome + ':' +
+                     str( gene[ 'start' ] ) + ':' + str( gene[ 'end' ] ) + ':' + ( '1' if ( strand == '+' ) else '-1' ) )
+        biotypes = ' gene_biotype:' + gene[ 'biotype' ] + ' transcript_biotype:' + gene[ 'biotype' ]
+        self.write_fasta_entry( ( 'cdna' if is_coding else 'ncrna' ),
+                                gene[ 'transcript_id' ] + ( ' cdna ' if is_coding else ' ncrna ' ) + location +
+                                ' gene:' + gene[ 'gene_id' ] + biotypes + ' gene_symbol:' + gene[ 'symbol' ],
+                                gene[ 'sequence' ] )
+
+        # Write the gene in the gene list
+        self.write_row( SyntheticDataGenerator.GENE_LIST_NAME,
+                        [ gene[ 'hgnc_id' ], chromosome, gene[ 'symbol' ], None, None, gene[ 'gene_id' ], gene[ 'ncbi_id' ] ] )
+
+        # Write the transcript fixture
+        cds_start_pos = None
+        cds_stop_pos = None
+        if is_coding:
+            cds_orf = [ orf for orf in gene[ 'orfs' ] if ( orf[ 'location' ] == 'cds' ) ][ 0 ]
+            cds_positions = [ pos for block in cds_orf[ 'blocks' ] for pos in block ]
+            cds_start_pos = min( cds_positions )
+            cds_stop_pos = max( cds_positions )
+            self.write_fasta_entry( 'pep',
+                                    gene[ 'protein_id' ] + ' pep ' + location + ' gene:' + gene[ 'gene_id' ] +
+                                    ' transcript:' + gene[ 'transcript_id' ] + biotypes + ' gene_symbol:' + gene[ 'symbol' ],
+                                    cds_orf[ 'sequence_aa' ] )
+
+        self.write_row( 'transcript_fixture',
+                        [ gene[ 'transcript_id' ], strand, gene[ 'start' ], gene[ 'end' ],
+                          GeneticsUtil.get_genomic_bin( gene[ 'start' ], gene[ 'end' ] ),
+                          cds_start_pos, cds_stop_pos, gene[ 'sequence' ] ] )
+
+        # Write the ORFs in the data sources and the fixtures
+        for orf in gene[ 'orfs' ]:
+            self.write_orf( gene, orf, grch37_shift )
+
+
+
+    ## write_gtf_lines
+    #  ---------------
+    #
+    # This method allows to write the lines of a gene in the GTF files
+    # of the GRCh38 and GRCh37 annotations.
+    #
+    # @param gene: Dictionary - The description of the gene.
+    # @param grch37_shift: Integer - The difference between the GRCh37 and GRCh38
+    #                                coordinates of the gene.
+    #
+    def write_gtf_lines( self, gene, grch37_shift ):
+
+        gene_attributes = ( 'gene_id "' + gene[ 'gene_id' ] + '"; gene_version "1"; gene_name "' + gene[ 'symbol' ] +
+                            '"; gene_source "ensembl"; gene_biotype "' + gene[ 'biotype' ] + '";' )
+        transcript_attributes = ( gene_attributes[ : -1 ] + '; transcript_id "' + gene[ 'transcript_id' ] +
+                                  '"; transcript_version "1"; transcript_name "' + gene[ 'symbol' ] +
+                                  '-201"; transcript_source "ensembl"; transcript_biotype "' + gene[ 'biotype' ] + '";' )
+
+        # Features described as ( feature, start, end, frame, attributes )
+        features = [ ( 'gene', gene[ 'start' ], gene[ 'end' ], '.', gene_attributes ),
+                     ( 'transcript', gene[ 'start' ], gene[ 'end' ], '.', transcript_attributes ) ]
+
+        for ( exon_nb, block ) in enumerate( gene[ 'exon_blocks' ], 1 ):
+            features.append( ( 'exon', min( block ), max( block ), '.',
+                               transcript_attributes[ : -1 ] + '; exon_number "' + str( exon_nb ) +
+                               '"; exon_id "' + gene[ 'exon_id_prefix' ] + '%02d' % exon_nb + '"; exon_version "1";' ) )
+
+        if ( gene[ 'biotype' ] == SyntheticDataGenerator.BIOTYPE_PROTEIN_CODING ):
+            cds_orf = [ orf for orf in gene[ 'orfs' ] if ( orf[ 'location' ] == 'cds' ) ][ 0 ]
+            protein_attributes = transcript_attributes[ : -1 ] + '; protein_id "' + gene[ 'protein_id' ] + '"; protein_version "1";'
+
+            # The CDS features exclude the stop codon
+            cds_blocks = self.get_genomic_blocks( gene, cds_orf[ 'rel_start' ], cds_orf[ 'rel_end' ] - 3 )
+            cds_length = 0
+            for block in cds_blocks:
+                features.append( ( 'CDS', min( block ), max( block ), str( ( 3 - cds_length % 3 ) % 3 ), protein_attributes ) )
+                cds_length += max( block ) - min( block ) + 1
+
+            for ( feature, rel_start ) in [ ( 'start_codon', cds_orf[ 'rel_start' ] ),
+                                            ( 'stop_codon', cds_orf[ 'rel_end' ] - 3 ) ]:
+                for block in self.get_genomic_blocks( gene, rel_start, rel_start + 3 ):
+                    features.append( ( feature, min( block ), max( block ), '0', transcript_attributes ) )
+
+        for ( key, shift ) in [ ( 'gtf', 0 ), ( 'gtf37', grch37_shift ) ]:
+            self.files[ key ].write( ''.join( [ '\t'.join( [ gene[ 'chromosome' ], 'ensembl', feature,
+                                                             str( start + shift ), str( end + shift ), '.',
+                                                             gene[ 'strand' ], frame, attributes ] ) + '\n'
+                                                for ( feature, start, end, frame, attributes ) in features ] ) )
+
+
+
+    ## write_orf
+    #  ---------
+    #
+    # This method allows to write an ORF in the data sources and in the fixture files.
+    #
+    # @param gene: Dictionary - The description of the gene.
+    # @param orf: Dictionary - The description of the ORF.
+    # @param grch37_shift: Integer - The difference between the GRCh37 and GRCh38
+    #                                coordinates of the gene.
+    #
+    def write_orf( self, gene, orf, grch37_shift ):
+
+        self.counts[ 'orfs' ] += 1
+        orf_nb = self.counts[ 'orfs' ]
+
+        chromosome = gene[ 'chromosome' ]
+        strand = gene[ 'strand' ]
+        blocks = orf[ 'blocks' ]
+        positions = [ pos for block in blocks for pos in block ]
+        start_pos = min( positions )
+        stop_pos = max( positions )
+        spliced = ( len( blocks ) > 1 )
+        if spliced:
+            self.counts[ 'spliced_orfs' ] += 1
+        aa_length = len( orf[ 'sequence_aa' ] )
+
+        # Choose the data sources reporting the ORF (Mackowiak et al.
+        # only report unspliced short ORFs)
+        in_mackowiak = ( ( not spliced )
+                         and ( orf[ 'location' ] in SyntheticDataGenerator.MACKOWIAK_CATEGORIES )
+                         and ( self.random.random() < SyntheticDataGenerator.MACKOWIAK_RATE ) )
+        in_sorfs_org = ( ( not in_mackowiak ) or ( self.random.random() < SyntheticDataGenerator.SORFS_ORG_RATE ) )
+
+        if in_sorfs_org:
+            cell_lines = self.random.sample( SyntheticDataGenerator.CELL_LINES,
+                                             ( 2 if ( self.random.random() < SyntheticDataGenerator.SECOND_CELL_LINE_RATE ) else 1 ) )
+            for ( k, cell_line ) in enumerate( cell_lines ):
+                self.counts[ SyntheticDataGenerator.SORFS_ORG_NAME ] += 1
+                self.write_row( SyntheticDataGenerator.SORFS_ORG_NAME,
+                                [ 'SORF' + str( orf_nb ) + '_' + str( k ), chromosome, gene[ 'transcript_id' ],
+                                  ( '1' if ( strand == '+' ) else '-1' ), start_pos, stop_pos,
+                                  ( 'Yes' if spliced else 'No' ),
+                                  Constants.ORF_SPLICING_COORD_SEPARATOR.join( [ str( block[ 0 ] ) for block in blocks ] ),
+                                  Constants.ORF_SPLICING_COORD_SEPARATOR.join( [ str( block[ 1 ] ) for block in blocks ] ),
+                                  cell_line, orf[ 'sequence' ], orf[ 'sequence_aa' ] + GeneticsConstants.STOP_CODON,
+                                  SyntheticDataGenerator.SORFS_ORG_CATEGORIES[ orf[ 'location' ] ], gene[ 'biotype' ],
+                                  aa_length + 1, '%.3f' % self.random.uniform( 0, 60 ),
+                                  '%.3f' % self.random.random(), '%.3f' % self.random.uniform( 0, 1.5 ),
+                                  self.random.choice( SyntheticDataGenerator.FLOSS_CLASSES ) ] )
+
+        if in_mackowiak:
+            self.counts[ SyntheticDataGenerator.MACKOWIAK_NAME ] += 1
+            grch37_start = start_pos + grch37_shift
+            grch37_stop = stop_pos + grch37_shift
+            symbol = ( None if ( self.random.random() < SyntheticDataGenerator.MACKOWIAK_MISSING_SYMBOL_RATE ) else gene[ 'symbol' ] )
+            self.write_row( SyntheticDataGenerator.MACKOWIAK_NAME,
+                            [ 'MACK' + str( orf_nb ), 'chr' + chromosome, symbol, gene[ 'transcript_id' ] + '.1', None,
+                              strand, grch37_start - 1, grch37_stop,
+                              gene[ 'start' ] + grch37_shift - 1, gene[ 'end' ] + grch37_shift,
+                              orf[ 'sequence_aa' ], SyntheticDataGenerator.MACKOWIAK_CATEGORIES[ orf[ 'location' ] ],
+                              aa_length, '%.3f' % self.random.uniform( -20, 20 ), '%.3f' % self.random.random() ] )
+
+        # Write the relative coordinates of the ORF on its transcript (1-based)
+        self.write_row( 'orf_transcript_fixture',
+                        [ chromosome, strand, start_pos, stop_pos, gene[ 'transcript_id' ],
+                          orf[ 'rel_start' ] + 1, orf[ 'rel_end' ], orf[ 'sequence' ] ] )
+
+
+
+    ## write_chain_file
+    #  ----------------
+    #
+    # This method allows to write the chain file allowing to convert the GRCh37
+    # (hg19) coordinates into GRCh38 (hg38) coordinates. For each chromosome,
+    # the GRCh37 coordinates are shifted of GRCH37_OFFSET and a gap of GRCH37_GAP
+    # nucleotides is inserted after the breakpoint.
+    #
+    def write_chain_file( self ):
+
+        offset = SyntheticDataGenerator.GRCH37_OFFSET
+        gap = SyntheticDataGenerator.GRCH37_GAP
+
+        with gzip.open( self.get_path( 'chain', SyntheticDataGenerator.CHAIN_FILENAME ), 'wb' ) as chain_file:
+            for ( chain_id, ( chromosome, length, breakpoint ) ) in enumerate( self.chromosome_sizes, 1 ):
+                chr_name = 'chr' + chromosome
+                t_size = length + offset + gap
+                chain_file.write( ' '.join( [ 'chain', str( length ), chr_name, str( t_size ), '+', str( offset ),
+                                              str( t_size ), chr_name, str( length ), '+', '0', str( length ),
+                                              str( chain_id ) ] ) + '\n' )
+                chain_file.write( str( breakpoint ) + '\t' + str( gap ) + '\t0\n' )
+                chain_file.write( str( length - breakpoint ) + '\n\n' )
+
+
+
+    ## write_chromosome_sizes
+    #  ----------------------
+    #
+    # This method allows to write the sizes of the chromosomes of the genome.
+    #
+    def write_chromosome_sizes( self ):
+
+        with open( self.get_path( 'genome', 'GRCh38.chrom.sizes' ), 'w' ) as sizes_file:
+            for ( chromosome, length, breakpoint ) in self.chromosome_sizes:
+                sizes_file.write( 'chr' + chromosome + '\t' + str( length ) + '\n' )
+
+
+
+    ## write_filter_regions
+    #  --------------------
+    #
+    # This method allows to write the BED file used to filter the ORFs
+    # (the first half of each chromosome).
+    #
+    def write_filter_regions( self ):
+
+        with open( self.get_path( 'sources', 'filter_regions.bed' ), 'w' ) as bed_file:
+            for ( chromosome, length, breakpoint ) in self.chromosome_sizes:
+                bed_file.write( 'chr' + chromosome + '\t0\t' + str( length // 2 ) + '\n' )
+
+
+
+    ## link_file
+    #  ---------
+    #
+    # This is a static method that allows to create a hard link
+    # to a file (or to copy it if the link cannot be created).
+    #
+    # @param source: String - The path to the file.
+    # @param destination: String - The path of the link.
+    #
+    @staticmethod
+    def link_file( source, destination ):
+
+        if os.path.exists( destination ):
+            os.remove( destination )
+        try:
+            os.link( source, destination )
+        except OSError:
+            shutil.copyfile( source, destination )
+
+
+
+    ## write_config_file
+    #  -----------------
+    #
+    # This method allows to write the config file allowing to run
+    # the strategies on the dataset.
+    #
+    # @return String - The path to the config file.
+    #
+    def write_config_file( self ):
+
+        config = ConfigParser.ConfigParser()
+        config.optionxform = lambda option: option
+
+        config.add_section( Constants.CONFIG_SECTION_DATABASE )
+        for ( item, value ) in [ ( Constants.CONFIG_SECTION_DATABASE_ITEM_DS_DB_NAME, Constants.BENCHMARK_DS_DB_NAME ),
+                                 ( Constants.CONFIG_SECTION_DATABASE_ITEM_PRO_DB_NAME, Constants.BENCHMARK_PRO_DB_NAME ),
+                                 ( Constants.CONFIG_SECTION_DATABASE_ITEM_FILT_DB_NAME, Constants.BENCHMARK_FILT_DB_NAME ),
+                                 ( Constants.CONFIG_SECTION_DATABASE_ITEM_SPECIES, Constants.HSAPIENS ),
+                                 ( Constants.CONFIG_SECTION_DATABASE_ITEM_DB_FOLDER, self.get_database_folder() ) ]:
+            config.set( Constants.CONFIG_SECTION_DATABASE, item, value )
+
+        config.add_section( Constants.CONFIG_SECTION_GENE_LIST )
+        config.set( Constants.CONFIG_SECTION_GENE_LIST, SyntheticDataGenerator.GENE_LIST_NAME,
+                    self.get_path( 'sources', SyntheticDataGenerator.GENE_LIST_NAME + '.tsv' ) )
+        config.add_section( Constants.CONFIG_SECTION_GENE_LIST_ORDER_OF_INSERTION )
+        config.set( Constants.CONFIG_SECTION_GENE_LIST_ORDER_OF_INSERTION,
+                    Constants.CONFIG_SECTION_GENE_LIST_ORDER_OF_INSERTION_ITEM_ORDER,
+                    SyntheticDataGenerator.GENE_LIST_NAME )
+
+        config.add_section( Constants.CONFIG_SECTION_DATASOURCE )
+        for source in [ SyntheticDataGenerator.SORFS_ORG_NAME, SyntheticDataGenerator.MACKOWIAK_NAME ]:
+            config.set( Constants.CONFIG_SECTION_DATASOURCE, source, self.get_path( 'sources', source + '.tsv' ) )
+        config.add_section( Constants.CONFIG_SECTION_DATA_ORDER_OF_INSERTION )
+        config.set( Constants.CONFIG_SECTION_DATA_ORDER_OF_INSERTION, Constants.CONFIG_SECTION_ORDER_OF_INSERTION_ITEM_ORDER,
+                    ', '.join( [ SyntheticDataGenerator.SORFS_ORG_NAME, SyntheticDataGenerator.MACKOWIAK_NAME ] ) )
+
+        config.add_section( Constants.CONFIG_SECTION_LIFTOVER_PARAMETERS )
+        config.set( Constants.CONFIG_SECTION_LIFTOVER_PARAMETERS, Constants.CONFIG_SECTION_LIFTOVER_PARAMETERS_ITEM_CHAIN_FILE_FOLDER,
+                    self.get_path( 'chain' ) )
+
+        config.add_section( Constants.CONFIG_SECTION_FILTER )
+        config.set( Constants.CONFIG_SECTION_FILTER, Constants.CONFIG_SECTION_FILTER_ITEM_TYPE, Constants.FILTER_INTERSECTION )
+        config.set( Constants.CONFIG_SECTION_FILTER, Constants.CONFIG_SECTION_FILTER_ITEM_REGION,
+                    self.get_path( 'sources', 'filter_regions.bed' ) )
+
+        config_path = self.get_path( 'benchmark.config' )
+        with open( config_path, 'w' ) as config_file:
+            config.write( config_file )
+
+        return config_path
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from SyntheticDataGenerator import SyntheticDataGenerator
+from BenchmarkRunner import BenchmarkRunner
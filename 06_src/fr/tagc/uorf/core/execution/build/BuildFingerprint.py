@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+
+import ConfigParser
+import hashlib
+import json
+import os
+
+from sqlalchemy import select, func, literal_column
+
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
+from fr.tagc.uorf.core.util.sql import SQLConstants
+from fr.tagc.uorf.core.util.exception import *
+
+
+## BuildFingerprint
+#  ================
+#
+# This class contains the static methods allowing to compute the fingerprints
+# of the nodes of a build, i.e. digests of:
+#     - The version of the source code.
+#     - The sections of the config file used by the strategies (including the
+#       size and the date of modification of the files they refer to).
+#     - The checksums of the resources (tables, groups of columns and folders)
+#       read and written by the strategies.
+#
+# The checksums of the tables are computed by the MySQL server (using the
+# MD5 function on the values of each row) or, for SQLite databases, by
+# reading the rows ordered by primary key.
+#
+class BuildFingerprint( object ):
+
+    ## Class variables
+    #  ---------------
+    #
+    # Size of the chunks read to compute the checksums of the files (in bytes)
+    FILE_CHUNK_SIZE = 1024 * 1024
+
+    # Folder of the source code of the program
+    SOURCE_FOLDER = os.path.abspath( os.path.join( os.path.dirname( __file__ ), '..', '..', '..' ) )
+
+
+    ## digest
+    #  ------
+    #
+    # This is a static method that allows to compute the digest of a value.
+    #
+    # @param value - Any value that may be serialized in JSON.
+    #
+    # @return String - The SHA-1 digest of the value (hexadecimal).
+    #
+    @staticmethod
+    def digest( value ):
+
+        return hashlib.sha1( json.dumps( value, sort_keys = True ) ).hexdigest()
+
+
+
+    ## get_code_version
+    #  ----------------
+    #
+    # This is a static method that allows to compute the version of the source code,
+    # as the digest of the content of its Python files.
+    #
+    # @return String - The version of the source code.
+    #
+    @staticmethod
+    def get_code_version():
+
+        code_hash = hashlib.sha1()
+
+        for ( folder, subfolders, filenames ) in os.walk( BuildFingerprint.SOURCE_FOLDER ):
+            subfolders.sort()
+            for filename in sorted( filenames ):
+                if ( ( not filename.endswith( '.py' ) )
+                     or ( filename in Constants.BUILD_CODE_VERSION_EXCLUDED_FILES ) ):
+                    continue
+
+                file_path = os.path.join( folder, filename )
+                code_hash.update( os.path.relpath( file_path, BuildFingerprint.SOURCE_FOLDER ) )
+                with open( file_path, 'rb' ) as source_file:
+                    code_hash.update( source_file.read() )
+
+        return code_hash.hexdigest()
+
+
+
+    ## get_config_digest
+    #  -----------------
+    #
+    # This is a static method that allows to compute the digest of sections of the config
+    # file. The items of the DATABASE section related to the connection to the MySQL server
+    # are ignored, and the values referring to existing files are completed with the size
+    # and the date of modification of the file (e.g. the files of the data sources).
+    #
+    # @param config: ConfigParser - The config file.
+    # @param sections: List - The names of the sections.
+    #
+    # @return String - The digest of the sections.
+    #
+    @staticmethod
+    def get_config_digest( config, sections ):
+
+        content = {}
+
+        for section in sections:
+            if ( not config.has_section( section ) ):
+                continue
+
+            content[ section ] = {}
+            for ( item, value ) in config.items( section, raw = True ):
+                if ( ( section == Constants.CONFIG_SECTION_DATABASE )
+                     and ( item in Constants.BUILD_CONFIG_IGNORED_ITEMS ) ):
+                    continue
+
+                path = os.path.expandvars( value )
+                if os.path.isfile( path ):
+                    file_stat = os.stat( path )
+                    content[ section ][ item ] = [ value, file_stat.st_size, int( file_stat.st_mtime ) ]
+                else:
+                    content[ section ][ item ] = value
+
+        return BuildFingerprint.digest( content )
+
+
+
+    ## read_config
+    #  -----------
+    #
+    # This is a static method that allows to read the config file.
+    #
+    # @param config_file: String - The path to the config file.
+    #
+    # @return ConfigParser - The config file.
+    #
+    @staticmethod
+    def read_config( config_file ):
+
+        config = ConfigParser.ConfigParser()
+        config.optionxform = lambda option: option
+        config.read( config_file )
+
+        return config
+
+
+
+    ## get_table_checksum
+    #  ------------------
+    #
+    # This is a static method that allows to compute the checksum of columns of a table.
+    # The build records and the content version (which changes each time a strategy
+    # writes in the database, even if the content is the same) saved in the metadata
+    # tables are not taken into account.
+    #
+    # @param sqlmanager: SQLManager - The SQLManager instance connected to the database.
+    # @param table_name: String - The name of the table.
+    # @param columns: List - The names of the columns (the primary key is always included).
+    #
+    # @return String - The checksum of the columns.
+    #
+    # @throw DenCellORFException: When the checksum cannot be computed.
+    #
+    @staticmethod
+    def get_table_checksum( sqlmanager, table_name, columns ):
+
+        table = sqlmanager.get_declarative_base().metadata.tables[ table_name ]
+
+        primary_key = [ column.name for column in table.primary_key.columns ]
+        columns = primary_key + [ column for column in columns if ( column not in primary_key ) ]
+
+        if ( 'parameter' in primary_key ):
+            condition = ( ( ~table.c.parameter.startswith( Constants.METATABLE_BUILD_PREFIX ) )
+                          & ( table.c.parameter != Constants.METATABLE_CONTENT_VERSION ) )
+        else:
+            condition = None
+
+        try:
+            if ( sqlmanager.db_type == SQLConstants.DB_TYPE_MYSQL ):
+                # Compute the checksum on the server, as the number of rows and
+                # the exclusive or of the (first 64 bits of the) MD5 of the rows
+                row_values = ', '.join( [ ( 'COALESCE( `' + column + '`, \'' +
+                                            Constants.BUILD_CHECKSUM_NULL_VALUE + '\' )' )
+                                          for column in columns ] )
+                row_hash = ( 'BIT_XOR( CAST( CONV( LEFT( MD5( CONCAT_WS( \'|\', ' + row_values +
+                             ' ) ), 16 ), 16, 10 ) AS UNSIGNED ) )' )
+                query = select( [ func.count(), literal_column( row_hash ) ] ).select_from( table )
+                if ( condition != None ):
+                    query = query.where( condition )
+
+                ( row_count, row_xor ) = sqlmanager.get_engine().execute( query ).fetchone()
+                checksum = str( row_count ) + '-' + str( row_xor )
+
+            else:
+                # Read the rows ordered by primary key
+                query = select( [ table.c[ column ] for column in columns ] )
+                if ( condition != None ):
+                    query = query.where( condition )
+                query = query.order_by( *[ table.c[ column ] for column in primary_key ] )
+
+                table_hash = hashlib.sha1()
+                row_count = 0
+                connection = sqlmanager.get_engine().connect().execution_options( stream_results = True )
+                try:
+                    for row in connection.execute( query ):
+                        table_hash.update( repr( tuple( row ) ) )
+                        row_count += 1
+                finally:
+                    connection.close()
+                checksum = str( row_count ) + '-' + table_hash.hexdigest()
+
+        except Exception as e:
+            raise DenCellORFException( 'BuildFingerprint.get_table_checksum(): An error occurred trying' +
+                                       ' to compute the checksum of the ' + table_name + ' table of the ' +
+                                       sqlmanager.get_db_name() + ' database.' +
+                                       '\n Error code: ' + LogCodes.ERR_BUILD_FINGERPRINT + '.', e )
+
+        return checksum
+
+
+
+    ## get_folder_checksum
+    #  -------------------
+    #
+    # This is a static method that allows to compute the checksum of the files of a folder.
+    #
+    # @param folder: String - The path to the folder.
+    #
+    # @return String - The checksum of the names and contents of the files
+    #                  (or None if the folder does not exist).
+    #
+    @staticmethod
+    def get_folder_checksum( folder ):
+
+        if ( not os.path.isdir( folder ) ):
+            return None
+
+        folder_hash = hashlib.sha1()
+
+        for ( subfolder, subfolders, filenames ) in os.walk( folder ):
+            subfolders.sort()
+            for filename in sorted( filenames ):
+                file_path = os.path.join( subfolder, filename )
+                folder_hash.update( os.path.relpath( file_path, folder ) )
+                with open( file_path, 'rb' ) as exported_file:
+                    chunk = exported_file.read( BuildFingerprint.FILE_CHUNK_SIZE )
+                    while chunk:
+                        folder_hash.update( chunk )
+                        chunk = exported_file.read( BuildFingerprint.FILE_CHUNK_SIZE )
+
+        return folder_hash.hexdigest()
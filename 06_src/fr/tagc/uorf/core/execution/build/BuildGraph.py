@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util.option import OptionConstants
+
+
+## BuildGraph
+#  ==========
+#
+# This class describes the strategies run to build the databases and to export
+# their content (the nodes of the build), and the dependencies between them.
+#
+# Each node declares the resources it reads (inputs) and writes (outputs). A resource
+# is either a table of a database (e.g. 'DS:DSORF'), a group of columns of a table
+# (e.g. 'PRO:ORFTranscriptAsso.kozak', see the COLUMN_GROUPS), or a folder of exported
+# files (e.g. 'FILE:bed'). The resource of a table covers its rows and the columns
+# that do not belong to any of its groups of columns.
+#
+# The nodes are declared in the order of the full build (see the full_build.sh
+# script), except for the release version of the PRO database, which is declared
+# as soon as the metadata of the PRO database have been completed (so that the
+# exports reading the metadata do not have to wait for the strategies computing
+# the relative coordinates, the Kozak contexts and the ORF annotations).
+# A node depends on the nodes declared before it that:
+#     - write a resource it reads (read after write).
+#     - write a resource it writes (write after write).
+#     - read a resource it writes (write after read).
+# Hence, the nodes that only read the resources written by the same nodes
+# (e.g. ComputeKozakContext and AnnotateORF) do not depend on each other
+# and may be run at the same time.
+#
+# NB: The UTORFChangeLog table, that registers the ORFs updated by the strategies,
+#     is not a resource of the build (it is not used when the content of the
+#     UTBEDContent table is fully computed, which is the case during a build).
+#
+class BuildGraph( object ):
+
+    ## Class variables
+    #  ---------------
+    #
+    # Groups of columns, as a dictionary that associates to each table
+    # a dictionary associating to the name of each group its columns
+    COLUMN_GROUPS = { 'PRO:Transcript': { 'rel_coord': [ 'rel_cds_start_pos', 'rel_cds_stop_pos' ] },
+                      'PRO:ORFTranscriptAsso': { 'rel_coord': [ 'rel_start_pos', 'rel_stop_pos' ],
+                                                 'kozak': [ 'start_codon_seq', 'start_flanking_seq',
+                                                            'kozak_context', 'kozak_context_comp' ] } }
+
+    # Resources of the DS database
+    DS_METADATA = [ 'DS:Metadata' ]
+    DS_TABLES = [ 'DS:SpeciesCatalog', 'DS:DataSource', 'DS:Gene', 'DS:GeneAlias', 'DS:UTGeneFromAlias',
+                  'DS:UTDSTranscriptGeneConflict', 'DS:DSORF', 'DS:DSTranscript', 'DS:DSORFTranscriptAsso' ]
+
+    # Resources of the PRO database
+    PRO_METADATA = [ 'PRO:PROMetadata' ]
+    PRO_TABLES = [ 'PRO:PROSpeciesCatalog', 'PRO:PROGene', 'PRO:PROGeneAlias',
+                   'PRO:ORF', 'PRO:Transcript', 'PRO:Transcript.rel_coord',
+                   'PRO:ORFTranscriptAsso', 'PRO:ORFTranscriptAsso.rel_coord', 'PRO:ORFTranscriptAsso.kozak',
+                   'PRO:ORFDSAsso', 'PRO:TranscriptDSAsso', 'PRO:ORFTranscriptAssoDSAsso',
+                   'PRO:CellContext', 'PRO:CellContextCatalog', 'PRO:ProvidedCategory', 'PRO:ProvidedCategoryCatalog',
+                   'PRO:FLOSSClass', 'PRO:FLOSSClassCatalog', 'PRO:UTRNABiotypeCatalog',
+                   'PRO:ORFCategory', 'PRO:ORFCategoryCatalog', 'PRO:ORFAnnotation', 'PRO:ORFAnnotationCatalog',
+                   'PRO:UTBEDContent' ]
+
+    # Nodes of the build, as ( name, strategy, arguments, connection, inputs, outputs,
+    # config sections, record database ) tuples, where:
+    #     - In the arguments, '{config}', '{release}', '{ds_db_name}', '{pro_db_name}', '{bed_folder}',
+    #       '{gff_folder}' and '{fasta_folder}' are replaced by the path to the config file, the
+    #       release number, the names of the DS and PRO databases and the folders of the exported files.
+    #     - The connection is the model of the database whose connection options (name, folder, host,
+    #       port, user and password) have to be added to the arguments (for the strategies that do not
+    #       use the config file), or None.
+    #     - The config sections are the sections of the config file used by the strategy.
+    #     - The record database is the model of the database in which the fingerprint of the node
+    #       is saved (see the documentation of the BuildRunner class).
+    # NB: The strategies building the databases (Insertion and Merge) overwrite the
+    #     existing database, and the strategies completing them re-compute the existing
+    #     information, so that the nodes give the same results when they are run again.
+    NODES = [ ( 'Insertion', 'Insertion', [ '-c', '{config}', '-f' ], None,
+                [],
+                DS_METADATA + DS_TABLES,
+                [ Constants.CONFIG_SECTION_DATABASE, Constants.CONFIG_SECTION_GENE_LIST,
+                  Constants.CONFIG_SECTION_GENE_LIST_ORDER_OF_INSERTION, Constants.CONFIG_SECTION_DATASOURCE,
+                  Constants.CONFIG_SECTION_DATA_ORDER_OF_INSERTION ],
+                OptionConstants.DATABASE_DECLARATIVE_DS ),
+              ( 'LiftOver', 'LiftOver', [ '-c', '{config}' ], None,
+                DS_METADATA + [ 'DS:DataSource', 'DS:Gene', 'DS:DSORF', 'DS:DSTranscript' ],
+                DS_METADATA + [ 'DS:DSORF', 'DS:DSTranscript' ],
+                [ Constants.CONFIG_SECTION_DATABASE, Constants.CONFIG_SECTION_LIFTOVER_PARAMETERS ],
+                OptionConstants.DATABASE_DECLARATIVE_DS ),
+              ( 'AddReleaseVersion_DS', 'AddReleaseVersion', [ '-M', 'DS', '-r', '{release}', '-d', '{ds_db_name}', '-f' ],
+                OptionConstants.DATABASE_DECLARATIVE_DS,
+                [],
+                DS_METADATA,
+                [],
+                OptionConstants.DATABASE_DECLARATIVE_DS ),
+              ( 'Merge', 'Merge', [ '-c', '{config}', '-f', '-s' ], None,
+                DS_METADATA + DS_TABLES,
+                PRO_METADATA + PRO_TABLES,
+                [ Constants.CONFIG_SECTION_DATABASE, Constants.CONFIG_SECTION_MERGE_PARAMETERS ],
+                OptionConstants.DATABASE_DECLARATIVE_PRO ),
+              ( 'ComputeMissingInfo', 'ComputeMissingInfo', [ '-c', '{config}', '-d' ], None,
+                PRO_METADATA + [ 'PRO:ORF', 'PRO:Transcript', 'PRO:ORFTranscriptAsso', 'PRO:CellContext',
+                                 'PRO:CellContextCatalog', 'PRO:UTRNABiotypeCatalog' ],
+                PRO_METADATA + [ 'PRO:ORF', 'PRO:Transcript', 'PRO:ORFTranscriptAsso', 'PRO:CellContext',
+                                 'PRO:CellContextCatalog', 'PRO:UTRNABiotypeCatalog' ],
+                [ Constants.CONFIG_SECTION_DATABASE, Constants.CONFIG_SECTION_COMPUTE_MISSING_INFO_PARAMETERS ],
+                OptionConstants.DATABASE_DECLARATIVE_PRO ),
+              ( 'AddReleaseVersion_PRO', 'AddReleaseVersion', [ '-M', 'PRO', '-r', '{release}', '-d', '{pro_db_name}', '-f' ],
+                OptionConstants.DATABASE_DECLARATIVE_PRO,
+                [],
+                PRO_METADATA,
+                [],
+                OptionConstants.DATABASE_DECLARATIVE_PRO ),
+              ( 'ComputeRelCoord', 'ComputeRelCoord', [ '-c', '{config}', '-f' ], None,
+                PRO_METADATA + [ 'PRO:ORF', 'PRO:Transcript', 'PRO:ORFTranscriptAsso' ],
+                [ 'PRO:Transcript.rel_coord', 'PRO:ORFTranscriptAsso.rel_coord' ],
+                [ Constants.CONFIG_SECTION_DATABASE ],
+                OptionConstants.DATABASE_DECLARATIVE_PRO ),
+              ( 'ComputeKozakContext', 'ComputeKozakContext', [ '-c', '{config}', '-f' ], None,
+                [ 'PRO:Transcript', 'PRO:ORFTranscriptAsso', 'PRO:ORFTranscriptAsso.rel_coord' ],
+                [ 'PRO:ORFTranscriptAsso.rel_coord', 'PRO:ORFTranscriptAsso.kozak' ],
+                [ Constants.CONFIG_SECTION_DATABASE ],
+                OptionConstants.DATABASE_DECLARATIVE_PRO ),
+              ( 'AnnotateORF', 'AnnotateORF', [ '-c', '{config}', '-f', '-s', '-a' ], None,
+                [ 'PRO:ORF', 'PRO:Transcript', 'PRO:ORFTranscriptAsso', 'PRO:ProvidedCategory' ],
+                [ 'PRO:ORFCategory', 'PRO:ORFCategoryCatalog', 'PRO:ORFAnnotation', 'PRO:ORFAnnotationCatalog' ],
+                [ Constants.CONFIG_SECTION_DATABASE, Constants.CONFIG_SECTION_ANNOTATE_ORF_PARAMETERS ],
+                OptionConstants.DATABASE_DECLARATIVE_PRO ),
+              ( 'GenerateBEDContent', 'GenerateBEDContent', [], OptionConstants.DATABASE_DECLARATIVE_PRO,
+                [ 'PRO:ORF', 'PRO:Transcript', 'PRO:ORFTranscriptAsso', 'PRO:ORFTranscriptAsso.kozak',
+                  'PRO:CellContext', 'PRO:ORFAnnotation' ],
+                [ 'PRO:UTBEDContent' ],
+                [],
+                OptionConstants.DATABASE_DECLARATIVE_PRO ),
+              ( 'GenerateBEDFile', 'GenerateBEDFile', [ '-o', '{bed_folder}', '-e', '-g' ],
+                OptionConstants.DATABASE_DECLARATIVE_PRO,
+                PRO_METADATA + [ 'PRO:ORF', 'PRO:UTBEDContent' ],
+                [ 'FILE:bed' ],
+                [],
+                OptionConstants.DATABASE_DECLARATIVE_PRO ),
+              ( 'GenerateGFFFile', 'GenerateGFFFile', [ '-o', '{gff_folder}' ],
+                OptionConstants.DATABASE_DECLARATIVE_PRO,
+                [ 'PRO:ORF' ],
+                [ 'FILE:gff' ],
+                [],
+                OptionConstants.DATABASE_DECLARATIVE_PRO ),
+              ( 'GenerateFastaFile', 'GenerateFastaFile', [ '-o', '{fasta_folder}', '-l' ],
+                OptionConstants.DATABASE_DECLARATIVE_PRO,
+                PRO_METADATA + [ 'PRO:PROSpeciesCatalog', 'PRO:ORF' ],
+                [ 'FILE:fasta' ],
+                [],
+                OptionConstants.DATABASE_DECLARATIVE_PRO ) ]
+
+
+    ## Constructor of BuildGraph
+    #  -------------------------
+    #
+    # Instance variables:
+    #     - nodes: Dictionary - The nodes of the graph, where the keys are their names.
+    #     - node_names: List - The names of the nodes (in the order of their declaration).
+    #     - dependencies: Dictionary - The names of the nodes on which each node depends.
+    #     - input_writers: Dictionary - For each node, a dictionary that associates to each
+    #                                   of its inputs the name of the last node writing it
+    #                                   before it (or None if no node writes it).
+    #     - final_writers: Dictionary - The name of the last node writing each resource.
+    #
+    # @param nodes: List - The nodes of the graph (see the NODES class variable).
+    #                      BuildGraph.NODES by default.
+    #
+    def __init__( self, nodes=None ):
+
+        if ( nodes == None ):
+            nodes = BuildGraph.NODES
+
+        self.nodes = dict( [ ( node[ 0 ], node ) for node in nodes ] )
+        self.node_names = [ node[ 0 ] for node in nodes ]
+
+        self.dependencies = {}
+        self.input_writers = {}
+        self.final_writers = {}
+
+        for node in nodes:
+            ( name, strategy, args, connection, inputs, outputs, config_sections, record_db ) = node
+
+            self.dependencies[ name ] = set()
+            self.input_writers[ name ] = {}
+
+            for previous_name in self.node_names[ : self.node_names.index( name ) ]:
+                previous_inputs = self.nodes[ previous_name ][ 4 ]
+                previous_outputs = self.nodes[ previous_name ][ 5 ]
+
+                if ( set( inputs ).intersection( previous_outputs )
+                     or set( outputs ).intersection( previous_outputs )
+                     or set( outputs ).intersection( previous_inputs ) ):
+                    self.dependencies[ name ].add( previous_name )
+
+            for resource in inputs:
+                self.input_writers[ name ][ resource ] = self.final_writers.get( resource )
+
+            for resource in outputs:
+                self.final_writers[ resource ] = name
+
+
+
+    ## get_descendants
+    #  ---------------
+    #
+    # This method allows to get the nodes depending (directly or not) on a node.
+    #
+    # @param name: String - The name of the node.
+    #
+    # @return Set - The names of the nodes depending on the node.
+    #
+    def get_descendants( self, name ):
+
+        descendants = set()
+        for node_name in self.node_names:
+            if self.dependencies[ node_name ].intersection( descendants.union( [ name ] ) ):
+                descendants.add( node_name )
+
+        return descendants
+
+
+
+    ## get_ready_nodes
+    #  ---------------
+    #
+    # This method allows to get the nodes that may be started,
+    # i.e. the nodes whose dependencies have all been completed.
+    #
+    # @param completed: Set - The names of the nodes completed.
+    # @param started: Set - The names of the nodes started (including the completed ones).
+    #
+    # @return List - The names of the nodes that may be started (in the order of their declaration).
+    #
+    def get_ready_nodes( self, completed, started ):
+
+        return [ name for name in self.node_names
+                      if ( ( name not in started ) and self.dependencies[ name ].issubset( completed ) ) ]
+
+
+
+    ## get_resource_databases
+    #  ----------------------
+    #
+    # This is a static method that allows to get the models of the databases of resources.
+    #
+    # @param resources: List - The names of the resources.
+    #
+    # @return Set - The models of the databases (DS / PRO) of the resources that are tables.
+    #
+    @staticmethod
+    def get_resource_databases( resources ):
+
+        databases = set()
+        for resource in resources:
+            database = resource.split( Constants.BUILD_RESOURCE_DATABASE_SEPARATOR )[ 0 ]
+            if ( database != Constants.BUILD_RESOURCE_FILE_PREFIX ):
+                databases.add( database )
+
+        return databases
+
+
+
+    ## get_resource_columns
+    #  --------------------
+    #
+    # This is a static method that allows to get the table and the columns covered by a resource.
+    #
+    # @param resource: String - The name of the resource (a table or a group of columns).
+    # @param all_columns: List - The names of all the columns of the table.
+    #
+    # @return Tuple - The name of the table and the list of columns covered by the resource.
+    #
+    @staticmethod
+    def get_resource_columns( resource, all_columns ):
+
+        ( table_resource, sep, group ) = resource.partition( Constants.BUILD_RESOURCE_GROUP_SEPARATOR )
+        table = table_resource.split( Constants.BUILD_RESOURCE_DATABASE_SEPARATOR )[ 1 ]
+        groups = BuildGraph.COLUMN_GROUPS.get( table_resource, {} )
+
+        if group:
+            columns = groups[ group ]
+        else:
+            grouped_columns = sum( groups.values(), [] )
+            columns = [ column for column in all_columns if ( column not in grouped_columns ) ]
+
+        return ( table, columns )
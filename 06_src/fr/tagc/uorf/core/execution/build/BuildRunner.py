@@ -0,0 +1,744 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+
+from fr.tagc.uorf.core.model import *
+
+from fr.tagc.uorf.core.execution.build.BuildGraph import BuildGraph
+from fr.tagc.uorf.core.execution.build.BuildFingerprint import BuildFingerprint
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
+from fr.tagc.uorf.core.util.sql import SQLConstants
+from fr.tagc.uorf.core.util.sql.SQLManagerDS import SQLManagerDS
+from fr.tagc.uorf.core.util.sql.SQLManagerPRO import SQLManagerPRO
+from fr.tagc.uorf.core.util.option import OptionConstants
+from fr.tagc.uorf.core.util.exception import *
+from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
+
+
+## BuildRunner
+#  ===========
+#
+# This class allows to run the nodes of a build (see the documentation of the
+# BuildGraph class), running at the same time the nodes that do not depend on
+# each other, and skipping the nodes that are up to date.
+#
+# Each node runs one strategy in a separate process (as the program would be run
+# by the user), and its output is saved in a log file. The run report written by
+# the process (see the documentation of the RunTelemetry class) is used to detect
+# the nodes that failed.
+#
+# Once a node has been completed, its fingerprint and the checksums of its outputs
+# are saved in the metadata table of its record database (as the 'build_node_'
+# parameter followed by the name of the node). The parameters starting with 'build_'
+# are specific to the database that contains them, and are thus neither copied from the
+# DS database into the PRO database, nor from the PRO database into the FILT database.
+# The fingerprint of a node is the digest of:
+#     - The strategy and its arguments.
+#     - The sections of the config file used by the strategy.
+#     - The version of the source code (which is also saved in the PROMetadata table).
+#     - For each input, the checksum recorded by the last node writing it (or the
+#       checksum of the resource when no node of the build writes it).
+# A node is up to date, and is skipped, when its recorded fingerprint is the one
+# computed and when the resources for which it is the last writer have not been
+# modified since it has been run. As the fingerprints use the checksums of the
+# inputs rather than the fingerprints of the upstream nodes, the nodes whose
+# inputs are the same after an upstream node has been run again are skipped.
+#
+# NB: As SQLite does not allow several processes to write in the same database,
+#     the nodes writing in a SQLite database are never run at the same time as
+#     other nodes using this database, and the records are only saved when no
+#     node running uses the record database.
+#
+class BuildRunner( object ):
+
+    ## Class variables
+    #  ---------------
+    #
+    # Status of the nodes
+    STATUS_UP_TO_DATE = 'up to date'
+    STATUS_TO_RUN = 'to run'
+    STATUS_PENDING = 'pending (depends on nodes to run)'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+
+    # Options of the strategies allowing to connect to the databases
+    CONNECTION_OPTIONS = [ ( '-N', Constants.DB_SETTINGS_DB_NAME ),
+                           ( '-F', Constants.DB_SETTINGS_DB_FOLDER ),
+                           ( '-H', Constants.DB_SETTINGS_MYSQL_HOST ),
+                           ( '-P', Constants.DB_SETTINGS_MYSQL_PORT ),
+                           ( '-u', Constants.DB_SETTINGS_MYSQL_USER ),
+                           ( '-p', Constants.DB_SETTINGS_MYSQL_PASSWD ) ]
+    PASSWORD_OPTION = '-p'
+
+
+    ## Constructor of BuildRunner
+    #  --------------------------
+    #
+    # Instance variables:
+    #     - graph: BuildGraph - The graph of the nodes of the build.
+    #     - config_file: String - The path to the config file.
+    #     - config: ConfigParser - The config file.
+    #     - db_type: String - The type of the databases.
+    #     - db_settings: Dictionary - The settings of the DS and PRO databases (where
+    #                                 the keys are the models of the databases).
+    #     - verbosity: String - The level of verbosity of the strategies run.
+    #     - jobs: Integer - The maximal number of nodes run at the same time.
+    #     - force_overwrite: Boolean - Should the nodes up to date be run?
+    #     - log_folder: String - The folder where the outputs of the nodes are saved.
+    #     - report_folder: String - The folder where the run reports of the nodes are saved.
+    #     - values: Dictionary - The values used to format the arguments of the nodes.
+    #     - code_version: String - The version of the source code.
+    #     - versions: Dictionary - The checksums of the outputs of the nodes completed or up to
+    #                              date, as ( node name, resource ) - checksum pairs.
+    #     - results: Dictionary - The status and the duration of each node.
+    #
+    # @param graph: BuildGraph - The graph of the nodes of the build.
+    # @param config_file: String - The path to the config file.
+    # @param db_settings: Dictionary - The settings of the DS and PRO databases.
+    # @param verbosity: String - The level of verbosity of the strategies run.
+    # @param jobs: Integer - The maximal number of nodes run at the same time.
+    # @param release: String - The release number declared in the metadata tables.
+    # @param output_folder: String - The folder where the exported files and the outputs
+    #                                of the nodes are saved.
+    # @param force_overwrite: Boolean - Should the nodes up to date be run?
+    #
+    def __init__( self, graph, config_file, db_settings, verbosity, jobs, release, output_folder, force_overwrite ):
+
+        self.graph = graph
+        self.config_file = config_file
+        self.config = BuildFingerprint.read_config( config_file )
+        self.db_settings = db_settings
+        self.db_type = db_settings[ OptionConstants.DATABASE_DECLARATIVE_DS ][ Constants.DB_SETTINGS_DB_TYPE ]
+        self.verbosity = verbosity
+        self.jobs = jobs
+        self.force_overwrite = force_overwrite
+
+        self.log_folder = os.path.join( output_folder, Constants.BUILD_LOGS_FOLDER_NAME )
+        self.report_folder = os.path.join( output_folder, Constants.BUILD_REPORTS_FOLDER_NAME )
+
+        self.values = { 'config': config_file,
+                        'release': release,
+                        'ds_db_name': db_settings[ OptionConstants.DATABASE_DECLARATIVE_DS ][ Constants.DB_SETTINGS_DB_NAME ],
+                        'pro_db_name': db_settings[ OptionConstants.DATABASE_DECLARATIVE_PRO ][ Constants.DB_SETTINGS_DB_NAME ],
+                        'bed_folder': os.path.join( output_folder, os.path.basename( Constants.BED_FOLDER ) ),
+                        'gff_folder': os.path.join( output_folder, os.path.basename( Constants.GFF_FOLDER ) ),
+                        'fasta_folder': os.path.join( output_folder, os.path.basename( Constants.FASTA_FOLDER ) ) }
+
+        self.code_version = BuildFingerprint.get_code_version()
+
+        self.versions = {}
+        self.results = {}
+
+
+
+    ## plan
+    #  ----
+    #
+    # This method allows to get the status of the nodes without running them.
+    # The nodes depending on nodes that have to be run are pending, as they
+    # can only be checked once these nodes have been run.
+    #
+    # @return List - The names of the nodes and their status, as ( name, status, reason ) tuples.
+    #
+    def plan( self ):
+
+        plan = []
+        not_up_to_date = set()
+
+        for name in self.graph.node_names:
+            if self.graph.dependencies[ name ].intersection( not_up_to_date ):
+                plan.append( ( name, BuildRunner.STATUS_PENDING, None ) )
+                not_up_to_date.add( name )
+                continue
+
+            ( up_to_date, reason ) = self.check_up_to_date( name, self.compute_fingerprint( name ) )
+            if up_to_date:
+                plan.append( ( name, BuildRunner.STATUS_UP_TO_DATE, None ) )
+            else:
+                plan.append( ( name, BuildRunner.STATUS_TO_RUN, reason ) )
+                not_up_to_date.add( name )
+
+        self.release_databases()
+
+        return plan
+
+
+
+    ## run
+    #  ---
+    #
+    # This method allows to run the nodes of the build.
+    #
+    # @return Dictionary - The status and the duration of each node.
+    #
+    # @throw DenCellORFException: When a node failed.
+    #
+    def run( self ):
+
+        for folder in [ self.log_folder, self.report_folder ]:
+            if ( not os.path.exists( folder ) ):
+                os.makedirs( folder )
+
+        self.results = {}
+        completed = set()
+        started = set()
+        running = {}
+        finished = {}
+        failed = []
+
+        while True:
+
+            # Complete the nodes that have been run successfully
+            # NB: On SQLite, the checksums of the outputs and the record of a node
+            #     may only be computed and saved once the nodes writing in the same
+            #     databases (or using the record database) have been run
+            for name in finished.keys():
+                if self.can_complete( name, running.keys() ):
+                    ( fingerprint, wall_time ) = finished.pop( name )
+                    self.complete_node( name, fingerprint )
+                    Logger.get_instance().info( 'The node ' + name + ' has been completed in ' +
+                                                '%.1f' % wall_time + ' s.' )
+                    self.results[ name ] = { 'status': BuildRunner.STATUS_COMPLETED, 'wall_time': wall_time }
+                    completed.add( name )
+
+            # Start the nodes whose dependencies have been completed
+            # NB: As skipping a node may allow other nodes to start,
+            #     the nodes ready are searched again after each skip
+            node_skipped = True
+            while ( node_skipped and ( not failed ) ):
+                node_skipped = False
+
+                for name in self.graph.get_ready_nodes( completed, started ):
+                    if ( len( running ) >= self.jobs ):
+                        break
+                    if ( not self.can_run_together( name, running.keys() ) ):
+                        continue
+
+                    started.add( name )
+                    fingerprint = self.compute_fingerprint( name )
+                    ( up_to_date, reason ) = self.check_up_to_date( name, fingerprint )
+                    self.release_databases()
+
+                    if up_to_date:
+                        Logger.get_instance().info( 'The node ' + name + ' is up to date.' )
+                        self.results[ name ] = { 'status': BuildRunner.STATUS_UP_TO_DATE, 'wall_time': 0 }
+                        completed.add( name )
+                        node_skipped = True
+                        break
+
+                    Logger.get_instance().info( 'Starting the node ' + name + ' (' + reason + ').' )
+                    running[ name ] = self.start_node( name, fingerprint )
+
+            if ( not running ):
+                if finished:
+                    continue
+                break
+
+            time.sleep( Constants.BUILD_POLL_INTERVAL )
+
+            # Check the nodes running
+            for name in running.keys():
+                ( process, log_file, report_path, start_time, fingerprint ) = running[ name ]
+                if ( process.poll() == None ):
+                    continue
+
+                del running[ name ]
+                log_file.close()
+                wall_time = time.time() - start_time
+
+                error = self.get_node_error( name, process, report_path )
+                if error:
+                    Logger.get_instance().error( 'The node ' + name + ' failed: ' + error + ' Please see the' +
+                                                 ' output of the node (' + log_file.name + ') and the log files' +
+                                                 ' for more information.', ex = False )
+                    self.results[ name ] = { 'status': BuildRunner.STATUS_FAILED, 'wall_time': wall_time }
+                    failed.append( name )
+                else:
+                    finished[ name ] = ( fingerprint, wall_time )
+
+        if failed:
+            not_run = [ name for name in self.graph.node_names if ( name not in started ) ]
+            raise DenCellORFException( 'BuildRunner.run(): The following nodes failed: ' + ', '.join( failed ) +
+                                       '. The following nodes have not been run: ' +
+                                       ( ', '.join( not_run ) if not_run else 'none' ) + '. The nodes completed' +
+                                       ' will be skipped when the build is run again.' +
+                                       '\n Error code: ' + LogCodes.ERR_BUILD_NODE + '.' )
+
+        self.save_code_version()
+
+        return self.results
+
+
+
+    ## can_run_together
+    #  ----------------
+    #
+    # This method allows to know if a node may be run while other nodes are running.
+    # On SQLite, the nodes writing in a database cannot be run at the same time as
+    # the other nodes using this database.
+    #
+    # @param name: String - The name of the node.
+    # @param running_names: List - The names of the nodes running.
+    #
+    # @return Boolean - May the node be run?
+    #
+    def can_run_together( self, name, running_names ):
+
+        if ( self.db_type != SQLConstants.DB_TYPE_SQLITE ):
+            return True
+
+        ( node_used, node_written ) = self.get_node_databases( name )
+        for running_name in running_names:
+            ( running_used, running_written ) = self.get_node_databases( running_name )
+            if ( node_written.intersection( running_used ) or running_written.intersection( node_used ) ):
+                return False
+
+        return True
+
+
+
+    ## can_complete
+    #  ------------
+    #
+    # This method allows to know if a node that has been run may be completed while
+    # other nodes are running. On SQLite, the checksums of its outputs cannot be
+    # computed while other nodes write in their databases, and its record cannot be
+    # saved while other nodes use its record database.
+    #
+    # @param name: String - The name of the node.
+    # @param running_names: List - The names of the nodes running.
+    #
+    # @return Boolean - May the node be completed?
+    #
+    def can_complete( self, name, running_names ):
+
+        if ( self.db_type != SQLConstants.DB_TYPE_SQLITE ):
+            return True
+
+        record_db = self.graph.nodes[ name ][ 7 ]
+        output_databases = BuildGraph.get_resource_databases( self.graph.nodes[ name ][ 5 ] )
+        for running_name in running_names:
+            ( running_used, running_written ) = self.get_node_databases( running_name )
+            if ( running_written.intersection( output_databases ) or ( record_db in running_used ) ):
+                return False
+
+        return True
+
+
+
+    ## get_node_databases
+    #  ------------------
+    #
+    # @param name: String - The name of the node.
+    #
+    # @return Tuple - The models of the databases used (including the record database of
+    #                 the node) and written by the strategy of the node (Sets).
+    #
+    def get_node_databases( self, name ):
+
+        ( name, strategy, args, connection, inputs, outputs, config_sections, record_db ) = self.graph.nodes[ name ]
+
+        written = BuildGraph.get_resource_databases( outputs )
+        used = BuildGraph.get_resource_databases( inputs ).union( written ).union( [ record_db ] )
+
+        return ( used, written )
+
+
+
+    ## compute_fingerprint
+    #  -------------------
+    #
+    # This method allows to compute the fingerprint of a node.
+    # The nodes writing its inputs have to be completed.
+    #
+    # @param name: String - The name of the node.
+    #
+    # @return String - The fingerprint of the node.
+    #
+    def compute_fingerprint( self, name ):
+
+        ( name, strategy, args, connection, inputs, outputs, config_sections, record_db ) = self.graph.nodes[ name ]
+
+        input_versions = {}
+        for resource in inputs:
+            writer = self.graph.input_writers[ name ][ resource ]
+            if ( writer != None ):
+                input_versions[ resource ] = self.versions.get( ( writer, resource ) )
+            else:
+                input_versions[ resource ] = self.get_resource_checksum( resource )
+
+        # NB: The path to the config file is not taken into account,
+        #     as the content of the sections used is
+        return BuildFingerprint.digest( { 'strategy': strategy,
+                                          'arguments': self.format_args( args, dict( self.values, config = '' ) ),
+                                          'config': BuildFingerprint.get_config_digest( self.config, config_sections ),
+                                          'code_version': self.code_version,
+                                          'inputs': input_versions } )
+
+
+
+    ## check_up_to_date
+    #  ----------------
+    #
+    # This method allows to know if a node is up to date. If so, the checksums
+    # of its outputs are registered as the versions of the resources it writes.
+    #
+    # @param name: String - The name of the node.
+    # @param fingerprint: String - The fingerprint of the node.
+    #
+    # @return Tuple - Is the node up to date (Boolean) and, if not, the reason (String).
+    #
+    def check_up_to_date( self, name, fingerprint ):
+
+        if self.force_overwrite:
+            return ( False, 'the run of all the nodes has been requested' )
+
+        record = self.get_record( name )
+        if ( record == None ):
+            return ( False, 'no previous run recorded' )
+
+        ( recorded_fingerprint, recorded_outputs ) = record
+        if ( recorded_fingerprint != fingerprint ):
+            return ( False, 'its inputs, its parameters or the source code have changed' )
+
+        outputs = self.graph.nodes[ name ][ 5 ]
+        for resource in outputs:
+            if ( resource not in recorded_outputs ):
+                return ( False, 'no checksum recorded for the output ' + resource )
+
+            # Check the resources it is the last node to write have not been modified since
+            if ( ( self.graph.final_writers[ resource ] == name )
+                 and ( self.get_resource_checksum( resource ) != recorded_outputs[ resource ] ) ):
+                return ( False, 'the output ' + resource + ' has been modified' )
+
+        for resource in outputs:
+            self.versions[ ( name, resource ) ] = recorded_outputs[ resource ]
+
+        return ( True, None )
+
+
+
+    ## complete_node
+    #  -------------
+    #
+    # This method allows to register the checksums of the outputs of a node
+    # that has been run, and to save its record.
+    #
+    # @param name: String - The name of the node.
+    # @param fingerprint: String - The fingerprint of the node.
+    #
+    def complete_node( self, name, fingerprint ):
+
+        outputs = {}
+        for resource in self.graph.nodes[ name ][ 5 ]:
+            outputs[ resource ] = self.get_resource_checksum( resource )
+            self.versions[ ( name, resource ) ] = outputs[ resource ]
+
+        self.save_record( name, fingerprint, outputs )
+        self.release_databases()
+
+
+
+    ## start_node
+    #  ----------
+    #
+    # This method allows to run the strategy of a node in a separate process.
+    #
+    # @param name: String - The name of the node.
+    # @param fingerprint: String - The fingerprint of the node.
+    #
+    # @return Tuple - The process, the log file (opened), the path to the run report,
+    #                 the start time and the fingerprint of the node.
+    #
+    def start_node( self, name, fingerprint ):
+
+        ( name, strategy, args, connection, inputs, outputs, config_sections, record_db ) = self.graph.nodes[ name ]
+
+        command = ( [ sys.executable, sys.argv[ 0 ], strategy, '-v', self.verbosity, '-T', self.db_type ] +
+                    self.format_args( args, self.values ) )
+        if ( connection != None ):
+            for ( option, setting ) in BuildRunner.CONNECTION_OPTIONS:
+                value = self.db_settings[ connection ].get( setting )
+                if ( value != None ):
+                    command += [ option, str( value ) ]
+
+        # Create the folders of the exported files
+        for resource in outputs:
+            if resource.startswith( Constants.BUILD_RESOURCE_FILE_PREFIX + Constants.BUILD_RESOURCE_DATABASE_SEPARATOR ):
+                folder = self.get_export_folder( resource )
+                if ( not os.path.exists( folder ) ):
+                    os.makedirs( folder )
+
+        # Write the run report of the process in a file of its own,
+        # as several processes may be running at the same time
+        report_path = os.path.join( self.report_folder, name + '.json' )
+        if os.path.exists( report_path ):
+            os.remove( report_path )
+        env = dict( os.environ )
+        env[ Constants.RUN_REPORT_PATH_ENV_VARIABLE ] = report_path
+
+        printable_command = list( command )
+        if ( BuildRunner.PASSWORD_OPTION in printable_command[ : -1 ] ):
+            printable_command[ printable_command.index( BuildRunner.PASSWORD_OPTION ) + 1 ] = '***'
+        Logger.get_instance().debug( 'BuildRunner.start_node(): Running ' + ' '.join( printable_command ) + '.' )
+
+        log_file = open( os.path.join( self.log_folder, name + '.log' ), 'w' )
+        process = subprocess.Popen( command, stdout = log_file, stderr = subprocess.STDOUT, env = env )
+
+        return ( process, log_file, report_path, time.time(), fingerprint )
+
+
+
+    ## get_node_error
+    #  --------------
+    #
+    # This method allows to know if the process of a node failed (see the
+    # documentation of the RunTelemetry.get_report_error() method).
+    #
+    # @param name: String - The name of the node.
+    # @param process: Popen - The process of the node (terminated).
+    # @param report_path: String - The path to the run report of the process.
+    #
+    # @return String - The error (or None if the node succeeded).
+    #
+    def get_node_error( self, name, process, report_path ):
+
+        if ( process.returncode != 0 ):
+            return 'The process exited with the status ' + str( process.returncode ) + '.'
+
+        return RunTelemetry.get_report_error( report_path, self.graph.nodes[ name ][ 1 ] )
+
+
+
+    ## format_args
+    #  -----------
+    #
+    # This is a static method that allows to format the arguments of a node.
+    #
+    # @param args: List - The arguments of the node.
+    # @param values: Dictionary - The values used to format the arguments.
+    #
+    # @return List - The arguments formatted.
+    #
+    @staticmethod
+    def format_args( args, values ):
+
+        return [ arg.format( **values ) for arg in args ]
+
+
+
+    ## get_export_folder
+    #  -----------------
+    #
+    # @param resource: String - The name of a resource that is a folder of exported files.
+    #
+    # @return String - The path to the folder.
+    #
+    def get_export_folder( self, resource ):
+
+        kind = resource.split( Constants.BUILD_RESOURCE_DATABASE_SEPARATOR )[ 1 ]
+
+        return self.values[ kind + '_folder' ]
+
+
+
+    ## get_sqlmanager
+    #  --------------
+    #
+    # This method allows to get the SQLManager instance connected to a database.
+    #
+    # @param model: String - The model of the database (DS / PRO).
+    #
+    # @return SQLManager - The SQLManager instance (or None if the database does not exist).
+    #
+    def get_sqlmanager( self, model ):
+
+        if ( model == OptionConstants.DATABASE_DECLARATIVE_DS ):
+            sqlmanager = SQLManagerDS.get_instance()
+        else:
+            sqlmanager = SQLManagerPRO.get_instance()
+
+        sqlmanager.set_db_settings( self.db_settings[ model ] )
+        if ( not sqlmanager.db_exists() ):
+            return None
+
+        return sqlmanager
+
+
+
+    ## release_databases
+    #  -----------------
+    #
+    # This method allows to close the sessions and the connections to the databases,
+    # so that the strategies run in other processes may replace them.
+    #
+    def release_databases( self ):
+
+        for sqlmanager in [ SQLManagerDS.get_instance(), SQLManagerPRO.get_instance() ]:
+            sqlmanager.close_session()
+            if ( sqlmanager.engine != None ):
+                sqlmanager.engine.dispose()
+
+
+
+    ## get_resource_checksum
+    #  ---------------------
+    #
+    # This method allows to compute the checksum of a resource.
+    #
+    # @param resource: String - The name of the resource.
+    #
+    # @return String - The checksum of the resource (or None if it does not exist).
+    #
+    def get_resource_checksum( self, resource ):
+
+        database = resource.split( Constants.BUILD_RESOURCE_DATABASE_SEPARATOR )[ 0 ]
+        if ( database == Constants.BUILD_RESOURCE_FILE_PREFIX ):
+            return BuildFingerprint.get_folder_checksum( self.get_export_folder( resource ) )
+
+        sqlmanager = self.get_sqlmanager( database )
+        if ( sqlmanager == None ):
+            return None
+
+        table_name = resource.split( Constants.BUILD_RESOURCE_DATABASE_SEPARATOR )[ 1 ].split( Constants.BUILD_RESOURCE_GROUP_SEPARATOR )[ 0 ]
+        all_columns = sqlmanager.get_declarative_base().metadata.tables[ table_name ].columns.keys()
+        ( table_name, columns ) = BuildGraph.get_resource_columns( resource, all_columns )
+
+        # NB: When the checksum cannot be computed (e.g. when the table does not exist),
+        #     the resource is considered as missing, so that the nodes using it are run
+        try:
+            return BuildFingerprint.get_table_checksum( sqlmanager, table_name, columns )
+        except DenCellORFException as e:
+            Logger.get_instance().debug( e.get_message() )
+            return None
+
+
+
+    ## get_metadata_class
+    #  ------------------
+    #
+    # @param model: String - The model of the database (DS / PRO).
+    #
+    # @return The class of the metadata table of the database (Metadata / PROMetadata).
+    #
+    @staticmethod
+    def get_metadata_class( model ):
+
+        if ( model == OptionConstants.DATABASE_DECLARATIVE_PRO ):
+            return PROMetadata
+        else:
+            return Metadata
+
+
+
+    ## get_record
+    #  ----------
+    #
+    # This method allows to get the record of the previous run of a node.
+    #
+    # @param name: String - The name of the node.
+    #
+    # @return Tuple - The fingerprint of the node (String) and the checksums of its
+    #                 outputs (Dictionary), or None if no run has been recorded.
+    #
+    def get_record( self, name ):
+
+        record_db = self.graph.nodes[ name ][ 7 ]
+        sqlmanager = self.get_sqlmanager( record_db )
+        if ( sqlmanager == None ):
+            return None
+
+        metadata_class = BuildRunner.get_metadata_class( record_db )
+        try:
+            record = sqlmanager.get_session().query( metadata_class ).filter( metadata_class.parameter == ( Constants.METATABLE_BUILD_NODE_PREFIX + name ) ).first()
+            if ( record == None ):
+                return None
+            return ( record.value, json.loads( record.description )[ 'outputs' ] )
+        except Exception as e:
+            Logger.get_instance().debug( 'BuildRunner.get_record(): The record of the node ' + name +
+                                         ' cannot be read: ' + str( e ) )
+            return None
+        finally:
+            sqlmanager.close_session()
+
+
+
+    ## save_record
+    #  -----------
+    #
+    # This method allows to save the record of the run of a node.
+    #
+    # @param name: String - The name of the node.
+    # @param fingerprint: String - The fingerprint of the node.
+    # @param outputs: Dictionary - The checksums of the outputs of the node.
+    #
+    # @throw DenCellORFException: When the record cannot be saved.
+    #
+    def save_record( self, name, fingerprint, outputs ):
+
+        record_db = self.graph.nodes[ name ][ 7 ]
+        description = json.dumps( { 'outputs': outputs,
+                                    'code_version': self.code_version,
+                                    'date': str( datetime.now() ) }, sort_keys = True )
+
+        self.save_metadata( record_db, Constants.METATABLE_BUILD_NODE_PREFIX + name, fingerprint, description )
+
+
+
+    ## save_code_version
+    #  -----------------
+    #
+    # This method allows to save the version of the source code in the PROMetadata table.
+    #
+    # @throw DenCellORFException: When the version cannot be saved.
+    #
+    def save_code_version( self ):
+
+        self.save_metadata( OptionConstants.DATABASE_DECLARATIVE_PRO, Constants.METATABLE_BUILD_CODE_VERSION,
+                            self.code_version, Constants.METATABLE_BUILD_CODE_VERSION_DESCRIPTION )
+        self.release_databases()
+
+
+
+    ## save_metadata
+    #  -------------
+    #
+    # This method allows to save (or to update) an entry of a metadata table.
+    #
+    # @param model: String - The model of the database (DS / PRO).
+    # @param parameter: String - The parameter of the entry.
+    # @param value: String - The value of the entry.
+    # @param description: String - The description of the entry.
+    #
+    # @throw DenCellORFException: When the database does not exist.
+    # @throw DenCellORFException: When the entry cannot be saved.
+    #
+    def save_metadata( self, model, parameter, value, description ):
+
+        sqlmanager = self.get_sqlmanager( model )
+        if ( sqlmanager == None ):
+            raise DenCellORFException( 'BuildRunner.save_metadata(): The ' + model + ' database does not exist,' +
+                                       ' hence the ' + parameter + ' entry cannot be saved in its metadata table.' +
+                                       '\n Error code: ' + LogCodes.ERR_BUILD_NODE + '.' )
+
+        metadata_class = BuildRunner.get_metadata_class( model )
+        try:
+            sqlmanager.get_session().merge( metadata_class( parameter = parameter,
+                                                            value = value,
+                                                            description = description ) )
+            sqlmanager.commit()
+        except Exception as e:
+            raise DenCellORFException( 'BuildRunner.save_metadata(): An error occurred trying to save the ' +
+                                       parameter + ' entry in the metadata table of the ' + model + ' database.' +
+                                       '\n Error code: ' + LogCodes.ERR_BUILD_NODE + '.', e )
+        finally:
+            sqlmanager.close_session()
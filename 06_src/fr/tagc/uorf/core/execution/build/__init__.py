@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+
+from BuildGraph import BuildGraph
+from BuildFingerprint import BuildFingerprint
+from BuildRunner import BuildRunner
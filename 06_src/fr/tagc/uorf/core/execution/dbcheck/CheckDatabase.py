@@ -35,6 +35,12 @@ class CheckDatabase( object ):
     # General constants
     STRATEGIES_ALLOWING_FORCE_OVERWRITE = OptionConstants.STRATEGIES_ALLOWING_FORCE_OVERWRITE
     
+    # Dictionary that associates to the name of each class inheriting from 
+    # CheckDatabase the URL and the species of the last database it checked
+    # NB: When several strategies are run in the same process (see the Pipeline
+    #     strategy), this allows to not check the same database several times.
+    checked_databases = {}
+    
     
     ## Constructor of CheckDatabase
     #  ----------------------------
@@ -181,6 +187,13 @@ class CheckDatabase( object ):
             if OptionManager.get_instance().get_option( OptionConstants.OPTION_FORCE_OVERWRITE, not_none = False ):
                 self.force_overwrite = True
         
+        # If the database has already been checked by the current process 
+        # (and the SQLManager still uses it), there is no need to check it again
+        if ( ( not self.force_overwrite ) and self.is_already_checked() ):
+            Logger.get_instance().info( 'The database ' + self.get_SQLManager_instance().db_path + 
+                                        ' has already been checked and will be used.' )
+            return None
+        
         # Build the database
         self.get_SQLManager_instance().build_database( db_settings = self.db_settings,  
                                                        species = self.species,
@@ -243,6 +256,47 @@ class CheckDatabase( object ):
         
         # Close the session to the database
         self.get_SQLManager_instance().close_session()
+        
+        # Register the database as checked
+        CheckDatabase.checked_databases[ self.classname ] = ( self.get_SQLManager_instance().db_url, self.species )
+    
+    
+    
+    ## is_already_checked
+    #  ------------------
+    #
+    # This method allows to know if the database has already been checked by the 
+    # current process and if the SQLManager instance is still connected to it.
+    #
+    # @return Boolean - Has the database already been checked?
+    #
+    def is_already_checked( self ):
+        
+        checked_database = CheckDatabase.checked_databases.get( self.classname )
+        if ( checked_database == None ):
+            return False
+        
+        # Compute the URL of the database from its settings
+        # NB: If the SQLManager instance was connected to another database, 
+        #     its engine is closed when its settings are updated
+        sqlmanager = self.get_SQLManager_instance()
+        sqlmanager.set_db_settings( self.db_settings )
+        
+        return ( ( sqlmanager.engine != None ) 
+                 and ( checked_database == ( sqlmanager.db_url, self.species ) ) )
+    
+    
+    
+    ## reset_checked_databases
+    #  -----------------------
+    #
+    # This is a static method that allows to forget the databases already checked, 
+    # so that they are checked again (e.g. after they have been replaced).
+    #
+    @staticmethod
+    def reset_checked_databases():
+        
+        CheckDatabase.checked_databases = {}
     
     
     
@@ -4,9 +4,11 @@
 from fr.tagc.uorf.core.model import *
 
 from fr.tagc.uorf.core.execution.dbcheck.CheckDatabase import CheckDatabase
+from fr.tagc.uorf.core.execution.merge.MergePartition import MergePartition
 
 from fr.tagc.uorf.core.util import Constants
 from fr.tagc.uorf.core.util.sql.SQLManagerPRO import SQLManagerPRO
+from fr.tagc.uorf.core.util.option.OptionManager import OptionManager
 from fr.tagc.uorf.core.util.option import OptionConstants
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
@@ -47,6 +49,9 @@ class CheckPRODatabase( CheckDatabase ):
     #
     # This method allows to get the name of the PRO database from the config file and 
     # to store it in the db_settings dictionary of the object.
+    # NB: If a partition index has been provided to a strategy performing a partitioned
+    #     merging, the name of the partial PRO database of this partition is used instead
+    #     (see the documentation of the MergePartition class for more information).
     #
     # @throw DenCellORFException: When database name cannot be found in the config file.
     #
@@ -60,6 +65,14 @@ class CheckPRODatabase( CheckDatabase ):
             raise DenCellORFException( 'The PRO database name (' + 
                                        Constants.CONFIG_SECTION_DATABASE_ITEM_PRO_NAME +
                                        ' item) has to be provided in the config file.' )
+        
+        # Use the partial PRO database if a partition has been selected
+        if ( OptionManager.get_instance().get_strategy() in OptionConstants.STRATEGIES_USING_MERGE_PARTITION_DB ):
+            partition_index = OptionManager.get_instance().get_option( OptionConstants.OPTION_MERGE_PARTITION_INDEX, 
+                                                                       not_none = False )
+            if ( partition_index != None ):
+                self.db_settings[ Constants.DB_SETTINGS_DB_NAME ] = MergePartition.get_partial_db_name( self.db_settings[ Constants.DB_SETTINGS_DB_NAME ],
+                                                                                                        partition_index )
     
     
     
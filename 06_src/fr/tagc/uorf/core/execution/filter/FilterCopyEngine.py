@@ -0,0 +1,496 @@
+# -*- coding: utf-8 -*-
+
+from sqlalchemy import text
+
+
+from fr.tagc.uorf.core.model import *
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util.sql import SQLConstants
+from fr.tagc.uorf.core.util.sql.SQLManagerPRO import SQLManagerPRO
+from fr.tagc.uorf.core.util.sql.SQLManagerFILT import SQLManagerFILT
+from fr.tagc.uorf.core.util.exception import *
+from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
+
+
+## FilterCopyEngine
+#  ================
+#
+# This class allows to copy the content of the PRO database related to
+# a set of keys (genes or ORFTranscriptAsso entries) into the FILT database,
+# without instantiating any ORM object.
+# The copy is performed on the database server, using one single connection
+# to the FILT database:
+# - For SQLite databases, the PRO database file is attached to the connection.
+# - For MySQL databases, the tables of the PRO database are accessed using
+#   cross-schema statements (both databases have thus to be hosted by the
+#   same server).
+# The keys selected by the filter are first materialized into temporary tables
+# (key sets), the keys of the related tables (genes, transcripts, ORFs and
+# ORFTranscriptAsso) are then computed from them, and each table of the FILT
+# database is finally filled in with one single "INSERT INTO ... SELECT" statement,
+# in an order respecting the foreign key constraints.
+#
+class FilterCopyEngine( object ):
+
+    ## Class variables
+    #  ---------------
+    #
+    # Alias of the PRO database attached to the SQLite connection
+    PRO_DB_ALIAS = 'pro_db'
+
+    # Names of the temporary tables containing the key sets
+    KEYSET_GENE = 'filt_keyset_gene'
+    KEYSET_TRANSCRIPT = 'filt_keyset_transcript'
+    KEYSET_ORF = 'filt_keyset_orf'
+    KEYSET_OTA = 'filt_keyset_ota'
+
+    # Table and column used to define the type of the column of each key set
+    KEYSET_COLUMNS = { KEYSET_GENE: ( PROGene, 'gene_id' ),
+                       KEYSET_TRANSCRIPT: ( Transcript, 'id' ),
+                       KEYSET_ORF: ( ORF, 'id' ),
+                       KEYSET_OTA: ( ORFTranscriptAsso, 'id' ) }
+
+    # Tables to copy using the key sets (parent tables first), as
+    # ( table, column, key set ) tuples. The entries of the table which
+    # value of the column belongs to the key set are copied.
+    KEYSET_COPY_PLAN = [ ( PROGene, 'gene_id', KEYSET_GENE ),
+                         ( PROGeneAlias, 'gene_id', KEYSET_GENE ),
+                         ( ORF, 'id', KEYSET_ORF ),
+                         ( ORFDSAsso, 'orf_id', KEYSET_ORF ),
+                         ( Transcript, 'id', KEYSET_TRANSCRIPT ),
+                         ( TranscriptDSAsso, 'transcript_id', KEYSET_TRANSCRIPT ),
+                         ( ORFTranscriptAsso, 'id', KEYSET_OTA ),
+                         ( ORFTranscriptAssoDSAsso, 'orftranscriptasso_id', KEYSET_OTA ) ]
+
+    # Catalogs and related ORFTranscriptAsso children to copy, as
+    # ( catalog table, catalog column, child table, child column ) tuples.
+    # The entries of the catalog used by at least one child are copied.
+    CATALOG_COPY_PLAN = [ ( CellContextCatalog, 'context', CellContext, 'cell_context' ),
+                          ( ProvidedCategoryCatalog, 'category', ProvidedCategory, 'provided_category' ),
+                          ( FLOSSClassCatalog, 'floss_class', FLOSSClass, 'floss_class' ),
+                          ( ORFCategoryCatalog, 'category', ORFCategory, 'orf_category' ),
+                          ( ORFAnnotationCatalog, 'annotation', ORFAnnotation, 'orf_annotation' ) ]
+
+
+    ## Constructor of FilterCopyEngine
+    #  -------------------------------
+    #
+    # Instance variables:
+    #     - db_type: String - The type of the databases (SQLite or MySQL).
+    #     - connection: Connection - The SQLAlchemy connection to the FILT database.
+    #     - keyset_names: List - The names of the key sets created on the connection.
+    #
+    # @throw DenCellORFException: When the PRO and FILT databases do not have the same type.
+    # @throw DenCellORFException: When the PRO and FILT MySQL databases are not hosted by
+    #                             the same server.
+    #
+    def __init__( self ):
+
+        pro_manager = SQLManagerPRO.get_instance()
+        filt_manager = SQLManagerFILT.get_instance()
+
+        if ( pro_manager.db_type != filt_manager.db_type ):
+            raise DenCellORFException( 'FilterCopyEngine: The PRO and FILT databases need to be of' +
+                                       ' the same type (PRO: ' + str( pro_manager.db_type ) +
+                                       ', FILT: ' + str( filt_manager.db_type ) + ').' )
+
+        if ( ( pro_manager.db_type == SQLConstants.DB_TYPE_MYSQL )
+             and ( pro_manager.db_uri != filt_manager.db_uri ) ):
+            raise DenCellORFException( 'FilterCopyEngine: The PRO and FILT MySQL databases need to be' +
+                                       ' hosted by the same server and accessed with the same user.' )
+
+        self.db_type = pro_manager.db_type
+        self.connection = None
+        self.keyset_names = []
+
+
+
+    ## open
+    #  ----
+    #
+    # This method allows to open the connection to the FILT database
+    # and to make the PRO database reachable from this connection.
+    #
+    def open( self ):
+
+        # Close the sessions to both databases as the connection
+        # may require exclusive accesses to the SQLite files
+        SQLManagerPRO.get_instance().close_session()
+        SQLManagerFILT.get_instance().close_session()
+
+        self.connection = SQLManagerFILT.get_instance().get_engine().connect()
+
+        if ( self.db_type == SQLConstants.DB_TYPE_SQLITE ):
+            self.connection.execute( text( 'ATTACH DATABASE :db_path AS ' + FilterCopyEngine.PRO_DB_ALIAS ),
+                                     db_path = SQLManagerPRO.get_instance().db_path )
+
+        # Create the (empty) key sets
+        for ( keyset_name, ( table_class, column ) ) in FilterCopyEngine.KEYSET_COLUMNS.items():
+            self.create_keyset( keyset_name, table_class, column )
+
+
+
+    ## close
+    #  -----
+    #
+    # This method allows to remove the key sets and to close the connection.
+    #
+    def close( self ):
+
+        if ( self.connection != None ):
+
+            for keyset_name in self.keyset_names:
+                self.drop_keyset( keyset_name )
+            self.keyset_names = []
+
+            if ( self.db_type == SQLConstants.DB_TYPE_SQLITE ):
+                self.connection.execute( 'DETACH DATABASE ' + FilterCopyEngine.PRO_DB_ALIAS )
+
+            self.connection.close()
+            self.connection = None
+
+
+
+    ## create_keyset
+    #  -------------
+    #
+    # This method allows to create a new (empty) key set. If a key set
+    # with the same name already exists, it is replaced.
+    #
+    # @param keyset_name: String - The name of the key set.
+    # @param table_class: Class - The class of the table (PRO model) defining the type of the keys.
+    # @param column: String - The column of the table defining the type of the keys.
+    #
+    def create_keyset( self, keyset_name, table_class, column ):
+
+        self.drop_keyset( keyset_name )
+
+        # NB: The key set is created from the table it refers to, such as
+        #     the column has the same type and collation as the original one
+        self.connection.execute( 'CREATE TEMPORARY TABLE ' + self.quote( keyset_name ) + ' AS' +
+                                 ' SELECT ' + self.quote( column ) + ' AS key_value' +
+                                 ' FROM ' + self.pro_table( table_class ) + ' WHERE 1 = 0' )
+        self.connection.execute( 'CREATE INDEX ' + self.quote( keyset_name + '_idx' ) +
+                                 ' ON ' + self.quote( keyset_name ) + ' ( key_value )' )
+
+        if ( keyset_name not in self.keyset_names ):
+            self.keyset_names.append( keyset_name )
+
+
+
+    ## create_region_set
+    #  -----------------
+    #
+    # This method allows to create a new (empty) temporary table aiming to contain
+    # genomic regions, as ( chromosome, bin, region_start, region_end ) rows. If a
+    # table with the same name already exists, it is replaced.
+    #
+    # @param region_set_name: String - The name of the table.
+    #
+    def create_region_set( self, region_set_name ):
+
+        self.drop_keyset( region_set_name )
+
+        # NB: The table is created from the ORF table, such as the columns
+        #     have the same type and collation as the original ones
+        self.connection.execute( 'CREATE TEMPORARY TABLE ' + self.quote( region_set_name ) + ' AS' +
+                                 ' SELECT ' + self.quote( 'chromosome' ) + ', ' + self.quote( 'bin' ) + ',' +
+                                 ' ' + self.quote( 'start_pos' ) + ' AS region_start,' +
+                                 ' ' + self.quote( 'stop_pos' ) + ' AS region_end' +
+                                 ' FROM ' + self.pro_table( ORF ) + ' WHERE 1 = 0' )
+        self.connection.execute( 'CREATE INDEX ' + self.quote( region_set_name + '_idx' ) +
+                                 ' ON ' + self.quote( region_set_name ) +
+                                 ' ( ' + self.quote( 'chromosome' ) + ', ' + self.quote( 'bin' ) + ' )' )
+
+        if ( region_set_name not in self.keyset_names ):
+            self.keyset_names.append( region_set_name )
+
+
+
+    ## load_region_set
+    #  ---------------
+    #
+    # This method allows to insert genomic regions into a region set.
+    #
+    # @param region_set_name: String - The name of the table.
+    # @param regions: List - The list of regions to insert, as 
+    #                        ( chromosome, bin, region_start, region_end ) tuples.
+    #
+    def load_region_set( self, region_set_name, regions ):
+
+        if ( len( regions ) != 0 ):
+            self.connection.execute( text( 'INSERT INTO ' + self.quote( region_set_name ) +
+                                           ' ( ' + self.quote( 'chromosome' ) + ', ' + self.quote( 'bin' ) +
+                                           ', region_start, region_end )' +
+                                           ' VALUES ( :chromosome, :bin, :region_start, :region_end )' ),
+                                     [ { 'chromosome': chromosome,
+                                         'bin': bin,
+                                         'region_start': region_start,
+                                         'region_end': region_end } for ( chromosome, bin, region_start, region_end ) in regions ] )
+
+        Logger.get_instance().debug( 'FilterCopyEngine.load_region_set(): ' + str( len( regions ) ) +
+                                     ' regions have been loaded into the ' + region_set_name + ' table.' )
+
+
+
+    ## drop_keyset
+    #  -----------
+    #
+    # This method allows to remove a key set if it exists.
+    #
+    # @param keyset_name: String - The name of the key set.
+    #
+    def drop_keyset( self, keyset_name ):
+
+        if ( self.db_type == SQLConstants.DB_TYPE_SQLITE ):
+            self.connection.execute( 'DROP TABLE IF EXISTS temp.' + self.quote( keyset_name ) )
+        else:
+            self.connection.execute( 'DROP TEMPORARY TABLE IF EXISTS ' + self.quote( keyset_name ) )
+
+
+
+    ## quote
+    #  -----
+    #
+    # This method allows to quote an identifier according to the SQL dialect.
+    #
+    # @param name: String - The identifier (e.g. table or column name).
+    #
+    # @return String - The quoted identifier.
+    #
+    def quote( self, name ):
+
+        return self.connection.dialect.identifier_preparer.quote_identifier( name )
+
+
+
+    ## pro_table
+    #  ---------
+    #
+    # This method allows to get the name of a table of the PRO
+    # database, qualified for being used from the FILT connection.
+    #
+    # @param table_class: Class - The class of the table (PRO model).
+    #
+    # @return String - The qualified name of the table.
+    #
+    def pro_table( self, table_class ):
+
+        if ( self.db_type == SQLConstants.DB_TYPE_SQLITE ):
+            pro_schema = FilterCopyEngine.PRO_DB_ALIAS
+        else:
+            pro_schema = SQLManagerPRO.get_instance().get_db_name()
+
+        return self.quote( pro_schema ) + '.' + self.quote( table_class.__tablename__ )
+
+
+
+    ## get_insert_prefix
+    #  -----------------
+    #
+    # This method allows to get the beginning of the statement inserting the
+    # entries of a table of the PRO database into the same table of the FILT
+    # database. The entries already existing in the FILT database are ignored.
+    #
+    # @param table_class: Class - The class of the table (PRO model).
+    # @param alias: String - The alias used for the PRO table in the SELECT clause.
+    #
+    # @return String - The "INSERT INTO ... SELECT ... FROM" statement.
+    #
+    def get_insert_prefix( self, table_class, alias ):
+
+        column_names = [ self.quote( column.name ) for column in table_class.__table__.columns ]
+
+        if ( self.db_type == SQLConstants.DB_TYPE_SQLITE ):
+            insert_statement = 'INSERT OR IGNORE INTO '
+        else:
+            insert_statement = 'INSERT IGNORE INTO '
+
+        return ( insert_statement + self.quote( table_class.__tablename__ ) +
+                 ' ( ' + ', '.join( column_names ) + ' )' +
+                 ' SELECT ' + ', '.join( [ alias + '.' + column_name for column_name in column_names ] ) +
+                 ' FROM ' + self.pro_table( table_class ) + ' ' + alias )
+
+
+
+    ## load_keyset
+    #  -----------
+    #
+    # This method allows to insert a list of keys into a key set.
+    #
+    # @param keyset_name: String - The name of the key set.
+    # @param keys: List - The list of keys to insert.
+    #
+    def load_keyset( self, keyset_name, keys ):
+
+        keys = set( keys )
+        if ( len( keys ) != 0 ):
+            self.connection.execute( text( 'INSERT INTO ' + self.quote( keyset_name ) +
+                                           ' ( key_value ) VALUES ( :key_value )' ),
+                                     [ { 'key_value': key } for key in keys ] )
+
+        Logger.get_instance().debug( 'FilterCopyEngine.load_keyset(): ' + str( len( keys ) ) +
+                                     ' keys have been loaded into the ' + keyset_name + ' key set.' )
+
+
+
+    ## fill_keyset
+    #  -----------
+    #
+    # This method allows to insert into a key set the (distinct) keys
+    # returned by a SELECT statement.
+    #
+    # @param keyset_name: String - The name of the key set.
+    # @param select_statement: String - The SELECT statement returning one single column.
+    #
+    def fill_keyset( self, keyset_name, select_statement ):
+
+        self.connection.execute( 'INSERT INTO ' + self.quote( keyset_name ) + ' ( key_value )' +
+                                 ' SELECT DISTINCT selected_keys.key_value FROM ( ' + select_statement +
+                                 ' ) selected_keys WHERE selected_keys.key_value IS NOT NULL' )
+
+
+
+    ## read_keyset
+    #  -----------
+    #
+    # This method allows to get the content of a key set.
+    #
+    # @param keyset_name: String - The name of the key set.
+    #
+    # @return List - The list of keys.
+    #
+    def read_keyset( self, keyset_name ):
+
+        result = self.connection.execute( 'SELECT key_value FROM ' + self.quote( keyset_name ) )
+
+        return [ row[ 0 ] for row in result ]
+
+
+
+    ## get_keyset_join
+    #  ---------------
+    #
+    # This method allows to get the clause joining a table with a key set.
+    #
+    # @param keyset_name: String - The name of the key set.
+    # @param alias: String - The alias of the table to join.
+    # @param column: String - The column of the table to join.
+    #
+    # @return String - The JOIN clause.
+    #
+    def get_keyset_join( self, keyset_name, alias, column ):
+
+        return ( ' JOIN ' + self.quote( keyset_name ) + ' ON ' + self.quote( keyset_name ) + '.key_value = ' +
+                 alias + '.' + self.quote( column ) )
+
+
+
+    ## copy_table
+    #  ----------
+    #
+    # This method allows to copy all the entries of a table
+    # of the PRO database into the FILT database.
+    # NB: The records of the build nodes saved in the PROMetadata table are 
+    #     specific to the PRO database and are thus not copied (see the 
+    #     documentation of the BuildRunner class).
+    #
+    # @param table_class: Class - The class of the table (PRO model).
+    #
+    def copy_table( self, table_class ):
+
+        insert_query = self.get_insert_prefix( table_class, 't' )
+
+        if ( table_class == PROMetadata ):
+            insert_query += ( ' WHERE SUBSTR( t.' + self.quote( 'parameter' ) + ', 1, ' + 
+                              str( len( Constants.METATABLE_BUILD_PREFIX ) ) + ' ) <> \'' + 
+                              Constants.METATABLE_BUILD_PREFIX + '\'' )
+
+        self.connection.execute( insert_query )
+
+
+
+    ## copy_filtered_tables
+    #  --------------------
+    #
+    # This method allows to compute the key sets related to the one provided by
+    # the filter (genes or ORFTranscriptAsso) and to copy all the related entries
+    # of the PRO database into the FILT database.
+    #
+    # @param from_keyset: String - The name of the key set filled in by the filter
+    #                              (KEYSET_GENE or KEYSET_OTA).
+    #
+    # @throw DenCellORFException: When the key set provided is not allowed.
+    # @throw DenCellORFException: When an exception has been raised trying to copy the entries.
+    #
+    @RunTelemetry.timed_stage()
+    def copy_filtered_tables( self, from_keyset ):
+
+        transaction = self.connection.begin()
+
+        try:
+            # Compute the transcripts and ORFTranscriptAsso related to the genes
+            if ( from_keyset == FilterCopyEngine.KEYSET_GENE ):
+                self.fill_keyset( FilterCopyEngine.KEYSET_TRANSCRIPT,
+                                  'SELECT t.' + self.quote( 'id' ) + ' AS key_value' +
+                                  ' FROM ' + self.pro_table( Transcript ) + ' t' +
+                                  self.get_keyset_join( FilterCopyEngine.KEYSET_GENE, 't', 'gene_id' ) )
+                self.fill_keyset( FilterCopyEngine.KEYSET_OTA,
+                                  'SELECT ota.' + self.quote( 'id' ) + ' AS key_value' +
+                                  ' FROM ' + self.pro_table( ORFTranscriptAsso ) + ' ota' +
+                                  self.get_keyset_join( FilterCopyEngine.KEYSET_TRANSCRIPT, 'ota', 'transcript_id' ) )
+
+            # Compute the transcripts and genes related to the ORFTranscriptAsso
+            elif ( from_keyset == FilterCopyEngine.KEYSET_OTA ):
+                self.fill_keyset( FilterCopyEngine.KEYSET_TRANSCRIPT,
+                                  'SELECT ota.' + self.quote( 'transcript_id' ) + ' AS key_value' +
+                                  ' FROM ' + self.pro_table( ORFTranscriptAsso ) + ' ota' +
+                                  self.get_keyset_join( FilterCopyEngine.KEYSET_OTA, 'ota', 'id' ) )
+                self.fill_keyset( FilterCopyEngine.KEYSET_GENE,
+                                  'SELECT t.' + self.quote( 'gene_id' ) + ' AS key_value' +
+                                  ' FROM ' + self.pro_table( Transcript ) + ' t' +
+                                  self.get_keyset_join( FilterCopyEngine.KEYSET_TRANSCRIPT, 't', 'id' ) )
+
+            else:
+                raise DenCellORFException( 'FilterCopyEngine.copy_filtered_tables(): The key set ' +
+                                           str( from_keyset ) + ' cannot be used to filter the' +
+                                           ' PRO database.' )
+
+            # Compute the ORFs related to the ORFTranscriptAsso
+            self.fill_keyset( FilterCopyEngine.KEYSET_ORF,
+                              'SELECT ota.' + self.quote( 'orf_id' ) + ' AS key_value' +
+                              ' FROM ' + self.pro_table( ORFTranscriptAsso ) + ' ota' +
+                              self.get_keyset_join( FilterCopyEngine.KEYSET_OTA, 'ota', 'id' ) )
+
+            # Copy the entries related to the key sets
+            for ( table_class, column, keyset_name ) in FilterCopyEngine.KEYSET_COPY_PLAN:
+                self.connection.execute( self.get_insert_prefix( table_class, 't' ) +
+                                         self.get_keyset_join( keyset_name, 't', column ) )
+                Logger.get_instance().debug( 'FilterCopyEngine.copy_filtered_tables(): The entries' +
+                                             ' of the ' + table_class.__tablename__ + ' table have' +
+                                             ' been copied.' )
+
+            # Copy the catalogs and the children of the ORFTranscriptAsso entries
+            for ( catalog_class, catalog_column, child_class, child_column ) in FilterCopyEngine.CATALOG_COPY_PLAN:
+                self.connection.execute( self.get_insert_prefix( catalog_class, 'cat' ) +
+                                         ' WHERE cat.' + self.quote( catalog_column ) + ' IN (' +
+                                         ' SELECT DISTINCT child.' + self.quote( child_column ) +
+                                         ' FROM ' + self.pro_table( child_class ) + ' child' +
+                                         self.get_keyset_join( FilterCopyEngine.KEYSET_OTA, 'child', 'orftranscriptasso_id' ) +
+                                         ' )' )
+                self.connection.execute( self.get_insert_prefix( child_class, 't' ) +
+                                         self.get_keyset_join( FilterCopyEngine.KEYSET_OTA, 't', 'orftranscriptasso_id' ) )
+                Logger.get_instance().debug( 'FilterCopyEngine.copy_filtered_tables(): The entries' +
+                                             ' of the ' + catalog_class.__tablename__ + ' and ' +
+                                             child_class.__tablename__ + ' tables have been copied.' )
+
+        except Exception as e:
+            transaction.rollback()
+            raise DenCellORFException( 'FilterCopyEngine.copy_filtered_tables(): An error occurred' +
+                                       ' trying to copy the entries of the PRO database into the' +
+                                       ' FILT database. Hence, the changes have been roll backed.', e )
+
+        else:
+            transaction.commit()
@@ -0,0 +1,476 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import uuid
+from sqlalchemy import text
+
+
+from fr.tagc.uorf.core.model import *
+
+from fr.tagc.uorf.core.execution.filter.FilterCopyEngine import FilterCopyEngine
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
+from fr.tagc.uorf.core.util.sql import SQLConstants
+from fr.tagc.uorf.core.util.sql.SQLManagerPRO import SQLManagerPRO
+from fr.tagc.uorf.core.util.general.FileHandlerUtil import FileHandlerUtil
+from fr.tagc.uorf.core.util.genetics.GeneticsUtil import GeneticsUtil
+from fr.tagc.uorf.core.util.exception import *
+from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
+
+
+## FilterPlanner
+#  =============
+#
+# This class allows to compile a combination of filtering criteria (gene list,
+# cell contexts, ORF categories, ORF annotations and genomic regions) into the computation of one
+# single key set, used by the FilterCopyEngine to copy the related content of the
+# PRO database into the FILT database.
+#
+# The planner proceeds in two steps:
+# - For each criterion, the values provided are loaded into a temporary table, and
+#   the keys selected by the criterion (genes for the gene list, ORFs for the genomic
+#   regions, ORFTranscriptAsso for the other criteria) are computed on the database 
+#   server, using a join with the table of values ('union') or an aggregation keeping 
+#   the keys associated with all the values ('intersection'). The ORFs overlapping the
+#   genomic regions are selected using the genomic bins (see the documentation of the
+#   GeneticsUtil.get_genomic_bin() method), such as the query only performs range scans
+#   of the index on the chromosome, bin and positions of the ORF table. Genomic regions 
+#   are always used as an union. These intermediate key sets are cached on the
+#   disk, using a fingerprint of the criterion (database, criterion, type of filtering
+#   and values), such as the FILT databases built with overlapping criteria reuse them.
+#   A cached key set is only used if the content of the PRO database did not change
+#   since its computation, i.e. if the content version saved in the PROMetadata table
+#   is the same (see the update_content_version() method).
+# - All the intermediate key sets are then intersected with one single query.
+#   When the gene list is the only criterion, the genes selected are used as is
+#   (i.e. including the genes that are not related to any ORF). Otherwise, the
+#   ORFTranscriptAsso entries that respect all the criteria are selected.
+#
+class FilterPlanner( object ):
+
+    ## Class variables
+    #  ---------------
+    #
+    # Criteria of filtering
+    CRITERION_GENE = 'gene'
+    CRITERION_CELL_CONTEXT = 'cell_context'
+    CRITERION_ORF_CATEGORY = 'orf_category'
+    CRITERION_ORF_ANNOTATION = 'orf_annotation'
+    CRITERION_REGION = 'region'
+
+    # Definition of the criteria, as ( table, value column, key column, key set ) tuples.
+    # The criterion selects the value of the key column of the entries of the table
+    # which value column belongs to the list of values provided. The key set is the
+    # key set of the FilterCopyEngine to which the keys selected belong.
+    # NB: The values of the region criterion are ( chromosome, start, end ) tuples.
+    CRITERIA = { CRITERION_GENE: ( PROGeneAlias, 'alias', 'gene_id', FilterCopyEngine.KEYSET_GENE ),
+                 CRITERION_CELL_CONTEXT: ( CellContext, 'cell_context', 'orftranscriptasso_id', FilterCopyEngine.KEYSET_OTA ),
+                 CRITERION_ORF_CATEGORY: ( ORFCategory, 'orf_category', 'orftranscriptasso_id', FilterCopyEngine.KEYSET_OTA ),
+                 CRITERION_ORF_ANNOTATION: ( ORFAnnotation, 'orf_annotation', 'orftranscriptasso_id', FilterCopyEngine.KEYSET_OTA ),
+                 CRITERION_REGION: ( ORF, None, 'id', FilterCopyEngine.KEYSET_ORF ) }
+
+    # Prefixes of the names of the temporary tables used by the planner
+    VALUES_KEYSET_PREFIX = 'filt_values_'
+    CRITERION_KEYSET_PREFIX = 'filt_criterion_'
+
+
+    ## Constructor of FilterPlanner
+    #  ----------------------------
+    #
+    # Instance variables:
+    #     - copy_engine: FilterCopyEngine - The (opened) engine used to copy the data.
+    #     - cache_folder: String - The folder where the key sets are cached.
+    #                              None to do not use any cache.
+    #     - criteria: List - The list of criteria to apply, as
+    #                        ( criterion, filtering type, values ) tuples.
+    #
+    # @param copy_engine: FilterCopyEngine - The (opened) engine used to copy the data.
+    # @param cache_folder: String - The folder where the key sets are cached.
+    #                               Constants.FILTER_KEYSET_CACHE_FOLDER by default.
+    #
+    def __init__( self, copy_engine, cache_folder=Constants.FILTER_KEYSET_CACHE_FOLDER ):
+
+        self.copy_engine = copy_engine
+        self.cache_folder = cache_folder
+        self.criteria = []
+
+
+
+    ## add_criterion
+    #  -------------
+    #
+    # This method allows to add a criterion to the plan.
+    #
+    # @param criterion: String - The criterion (one of the CRITERION_* class variables).
+    # @param values: List - The list of values to use to filter the database.
+    # @param filt_type: String - The type of filtering (Constants.FILTER_UNION or
+    #                            Constants.FILTER_INTERSECTION). Union by default.
+    #
+    # @throw DenCellORFException: When the criterion is not allowed.
+    #
+    def add_criterion( self, criterion, values, filt_type=Constants.FILTER_UNION ):
+
+        if ( criterion not in FilterPlanner.CRITERIA.keys() ):
+            raise DenCellORFException( 'FilterPlanner.add_criterion(): The criterion ' + str( criterion ) +
+                                       ' is not allowed.' )
+
+        self.criteria.append( ( criterion, filt_type, sorted( set( values ) ) ) )
+
+
+
+    ## execute
+    #  -------
+    #
+    # This method allows to compute the key sets related to all the criteria,
+    # to intersect them and to copy the related content of the PRO database
+    # into the FILT database.
+    #
+    # @throw DenCellORFException: When no criterion has been provided.
+    #
+    def execute( self ):
+
+        if ( self.criteria == [] ):
+            raise DenCellORFException( 'FilterPlanner.execute(): At least one criterion has to be' +
+                                       ' provided to filter the PRO database.' )
+
+        # Compute the key set of each criterion
+        criterion_keysets = []
+        for ( criterion_index, criterion ) in enumerate( self.criteria ):
+            keyset_name = FilterPlanner.CRITERION_KEYSET_PREFIX + str( criterion_index )
+            self.compute_criterion_keyset( criterion, keyset_name )
+            criterion_keysets.append( ( keyset_name, FilterPlanner.CRITERIA[ criterion[ 0 ] ][ 3 ] ) )
+
+        # If the gene list is the only criterion, copy the entries related to these genes
+        if ( ( len( criterion_keysets ) == 1 )
+             and ( criterion_keysets[ 0 ][ 1 ] == FilterCopyEngine.KEYSET_GENE ) ):
+            self.copy_engine.fill_keyset( FilterCopyEngine.KEYSET_GENE,
+                                          'SELECT key_value FROM ' + self.copy_engine.quote( criterion_keysets[ 0 ][ 0 ] ) )
+            self.copy_engine.copy_filtered_tables( FilterCopyEngine.KEYSET_GENE )
+
+        # Otherwise, compute the ORFTranscriptAsso entries selected by all
+        # the criteria and copy the entries related to them
+        else:
+            quote = self.copy_engine.quote
+            select_statement = ( 'SELECT ota.' + quote( 'id' ) + ' AS key_value' +
+                                 ' FROM ' + self.copy_engine.pro_table( ORFTranscriptAsso ) + ' ota' )
+            transcript_joined = False
+
+            for ( keyset_name, target_keyset ) in criterion_keysets:
+                if ( target_keyset == FilterCopyEngine.KEYSET_OTA ):
+                    select_statement += self.copy_engine.get_keyset_join( keyset_name, 'ota', 'id' )
+
+                elif ( target_keyset == FilterCopyEngine.KEYSET_ORF ):
+                    select_statement += self.copy_engine.get_keyset_join( keyset_name, 'ota', 'orf_id' )
+
+                else:
+                    if ( not transcript_joined ):
+                        select_statement += ( ' JOIN ' + self.copy_engine.pro_table( Transcript ) + ' t' +
+                                              ' ON t.' + quote( 'id' ) + ' = ota.' + quote( 'transcript_id' ) )
+                        transcript_joined = True
+                    select_statement += self.copy_engine.get_keyset_join( keyset_name, 't', 'gene_id' )
+
+            self.copy_engine.fill_keyset( FilterCopyEngine.KEYSET_OTA, select_statement )
+            self.copy_engine.copy_filtered_tables( FilterCopyEngine.KEYSET_OTA )
+
+
+
+    ## compute_criterion_keyset
+    #  ------------------------
+    #
+    # This method allows to fill in the key set of a criterion, either using
+    # the cached key set when it is still valid, or by computing it on the
+    # database server (and caching it).
+    #
+    # @param criterion: Tuple - The criterion, as ( criterion, filtering type, values ) tuple.
+    # @param keyset_name: String - The name of the key set to fill in.
+    #
+    @RunTelemetry.timed_stage()
+    def compute_criterion_keyset( self, criterion, keyset_name ):
+
+        ( criterion_name, filt_type, values ) = criterion
+        ( table_class, value_column, key_column, target_keyset ) = FilterPlanner.CRITERIA[ criterion_name ]
+
+        self.copy_engine.create_keyset( keyset_name, table_class, key_column )
+
+        fingerprint = self.get_fingerprint( criterion )
+        content_version = self.get_content_version()
+
+        # Use the cached key set if it has been computed on the same content
+        cached_keys = self.get_cached_keys( fingerprint, content_version )
+        if ( cached_keys != None ):
+            self.copy_engine.load_keyset( keyset_name, cached_keys )
+            Logger.get_instance().debug( 'FilterPlanner.compute_criterion_keyset(): The key set of the' +
+                                         ' criterion ' + criterion_name + ' has been loaded from the cache (' +
+                                         fingerprint + ').' )
+            return
+
+        # Otherwise, load the values into a temporary table
+        # and compute the keys selected by the criterion
+        values_keyset_name = keyset_name.replace( FilterPlanner.CRITERION_KEYSET_PREFIX,
+                                                  FilterPlanner.VALUES_KEYSET_PREFIX )
+        if ( criterion_name == FilterPlanner.CRITERION_REGION ):
+            self.copy_engine.create_region_set( values_keyset_name )
+            self.copy_engine.load_region_set( values_keyset_name, self.get_binned_regions( values ) )
+        else:
+            self.copy_engine.create_keyset( values_keyset_name, table_class, value_column )
+            self.copy_engine.load_keyset( values_keyset_name, values )
+
+        self.copy_engine.fill_keyset( keyset_name,
+                                      self.get_criterion_select( criterion, values_keyset_name ) )
+        self.copy_engine.drop_keyset( values_keyset_name )
+
+        # Cache the keys
+        self.save_cached_keys( fingerprint, content_version, self.copy_engine.read_keyset( keyset_name ) )
+
+
+
+    ## get_criterion_select
+    #  --------------------
+    #
+    # This method allows to get the SELECT statement returning the keys
+    # selected by a criterion.
+    #
+    # @param criterion: Tuple - The criterion, as ( criterion, filtering type, values ) tuple.
+    # @param values_keyset_name: String - The name of the temporary table containing the values.
+    #
+    # @return String - The SELECT statement.
+    #
+    def get_criterion_select( self, criterion, values_keyset_name ):
+
+        ( criterion_name, filt_type, values ) = criterion
+        ( table_class, value_column, key_column, target_keyset ) = FilterPlanner.CRITERIA[ criterion_name ]
+        quote = self.copy_engine.quote
+
+        # Select the ORFs overlapping at least one of the regions. The equality on the 
+        # chromosome and bin allows to restrict the search to the few ORFs that may 
+        # overlap the region, the overlap being then checked using the positions.
+        if ( criterion_name == FilterPlanner.CRITERION_REGION ):
+            return ( 'SELECT orf.' + quote( 'id' ) + ' AS key_value' +
+                     ' FROM ' + quote( values_keyset_name ) + ' r' +
+                     ' JOIN ' + self.copy_engine.pro_table( ORF ) + ' orf' +
+                     ' ON orf.' + quote( 'chromosome' ) + ' = r.' + quote( 'chromosome' ) +
+                     ' AND orf.' + quote( 'bin' ) + ' = r.' + quote( 'bin' ) +
+                     ' AND orf.' + quote( 'start_pos' ) + ' <= r.region_end' +
+                     ' AND orf.' + quote( 'stop_pos' ) + ' >= r.region_start' )
+
+        select_statement = ( 'SELECT child.' + quote( key_column ) + ' AS key_value' +
+                             ' FROM ' + self.copy_engine.pro_table( table_class ) + ' child' +
+                             self.copy_engine.get_keyset_join( values_keyset_name, 'child', value_column ) )
+
+        # When the type of filtering is 'intersection', only keep the keys
+        # associated with all the values of the list
+        if ( ( filt_type == Constants.FILTER_INTERSECTION ) and ( len( values ) > 1 ) ):
+            select_statement += ( ' GROUP BY child.' + quote( key_column ) +
+                                  ' HAVING COUNT( DISTINCT child.' + quote( value_column ) + ' ) = ' +
+                                  str( len( values ) ) )
+
+        return select_statement
+
+
+
+    ## get_binned_regions
+    #  ------------------
+    #
+    # This method allows to get, for each genomic region, one row
+    # per genomic bin that may contain an ORF overlapping it.
+    #
+    # @param regions: List - The list of regions, as ( chromosome, start, end ) tuples
+    #                        (1-based coordinates, end included).
+    #
+    # @return binned_regions: List - The list of ( chromosome, bin, start, end ) tuples.
+    #
+    def get_binned_regions( self, regions ):
+
+        binned_regions = []
+        for ( chromosome, start_pos, end_pos ) in regions:
+            for genomic_bin in GeneticsUtil.get_overlapping_genomic_bins( start_pos, end_pos ):
+                binned_regions.append( ( chromosome, genomic_bin, start_pos, end_pos ) )
+
+        return binned_regions
+
+
+
+    ## get_fingerprint
+    #  ---------------
+    #
+    # This method allows to get the fingerprint of a criterion, i.e. a hash
+    # of the PRO database location, the criterion, the type of filtering and
+    # the values.
+    #
+    # @param criterion: Tuple - The criterion, as ( criterion, filtering type, values ) tuple.
+    #
+    # @return String - The fingerprint.
+    #
+    def get_fingerprint( self, criterion ):
+
+        ( criterion_name, filt_type, values ) = criterion
+
+        pro_manager = SQLManagerPRO.get_instance()
+        if ( pro_manager.db_type == SQLConstants.DB_TYPE_SQLITE ):
+            db_location = os.path.abspath( pro_manager.db_path )
+        else:
+            db_location = str( pro_manager.db_uri ) + '/' + str( pro_manager.db_path )
+
+        # NB: The type of filtering has no effect on criteria with one single value
+        if ( len( values ) <= 1 ):
+            filt_type = Constants.FILTER_UNION
+
+        criterion_description = repr( ( pro_manager.db_type, db_location, criterion_name, filt_type, values ) )
+
+        return hashlib.sha1( criterion_description ).hexdigest()
+
+
+
+    ## get_content_version
+    #  -------------------
+    #
+    # This method allows to get the content version of the PRO database, i.e. 
+    # the stamp saved in the PROMetadata table by the last strategy that modified
+    # its content (see the update_content_version() method). 
+    # NB: This only requires to read one single entry of the PROMetadata table, 
+    #     whatever the size of the tables queried by the criteria.
+    #
+    # @return String - The content version, or None if it has never been saved.
+    #
+    def get_content_version( self ):
+
+        result = self.copy_engine.connection.execute( text( 'SELECT ' + self.copy_engine.quote( 'value' ) +
+                                                            ' FROM ' + self.copy_engine.pro_table( PROMetadata ) +
+                                                            ' WHERE ' + self.copy_engine.quote( 'parameter' ) +
+                                                            ' = :parameter' ),
+                                                      parameter = Constants.METATABLE_CONTENT_VERSION ).fetchone()
+
+        if ( result == None ):
+            return None
+        else:
+            return result[ 0 ]
+
+
+
+    ## update_content_version
+    #  ----------------------
+    #
+    # This is a static method that allows to save a new content version in the
+    # PROMetadata table of the PRO database and to remove the key sets cached by
+    # the planner. This method is expected to be called by the strategies that 
+    # modify the content of the tables queried by the criteria (Merge, DeltaMerge, 
+    # Restore, AnnotateORF, ComputeMissingInfo).
+    #
+    # @param cache_folder: String - The folder where the key sets are cached.
+    #                               Constants.FILTER_KEYSET_CACHE_FOLDER by default.
+    #
+    # @throw DenCellORFException: When the content version cannot be saved.
+    #
+    @staticmethod
+    def update_content_version( cache_folder=Constants.FILTER_KEYSET_CACHE_FOLDER ):
+
+        try:
+            SQLManagerPRO.get_instance().get_session().merge( PROMetadata( parameter = Constants.METATABLE_CONTENT_VERSION,
+                                                                           value = uuid.uuid4().hex,
+                                                                           description = Constants.METATABLE_CONTENT_VERSION_DESCRIPTION ) )
+            SQLManagerPRO.get_instance().commit()
+        except Exception as e:
+            raise DenCellORFException( 'FilterPlanner.update_content_version(): An error occurred trying to' +
+                                       ' save the content version in the PROMetadata table.' +
+                                       '\n Error code: ' + LogCodes.ERR_SQL_SESSION + '.', e )
+        finally:
+            SQLManagerPRO.get_instance().close_session()
+
+        FilterPlanner.clear_cache( cache_folder )
+
+
+
+    ## clear_cache
+    #  -----------
+    #
+    # This is a static method that allows to remove all the key sets
+    # cached by the planner (e.g. when the content of a PRO database has
+    # been modified or replaced).
+    #
+    # @param cache_folder: String - The folder where the key sets are cached.
+    #                               Constants.FILTER_KEYSET_CACHE_FOLDER by default.
+    #
+    @staticmethod
+    def clear_cache( cache_folder=Constants.FILTER_KEYSET_CACHE_FOLDER ):
+
+        if ( not os.path.isdir( cache_folder ) ):
+            return
+
+        cached_filenames = [ filename for filename in os.listdir( cache_folder )
+                                      if filename.startswith( Constants.FILTER_KEYSET_CACHE_FILENAME_PREFIX ) ]
+        for filename in cached_filenames:
+            os.remove( os.path.join( cache_folder, filename ) )
+
+        Logger.get_instance().debug( 'FilterPlanner.clear_cache(): ' + str( len( cached_filenames ) ) +
+                                     ' key sets have been removed from the cache.' )
+
+
+
+    ## get_cached_keys
+    #  ---------------
+    #
+    # This method allows to get the keys of a cached key set.
+    #
+    # @param fingerprint: String - The fingerprint of the criterion.
+    # @param content_version: String - The current content version of the PRO database.
+    #
+    # @return List - The list of keys, or None if there is no valid key set in the cache.
+    #
+    def get_cached_keys( self, fingerprint, content_version ):
+
+        filename = Constants.FILTER_KEYSET_CACHE_FILENAME_PREFIX + fingerprint
+
+        if ( ( self.cache_folder == None )
+             or ( content_version == None )
+             or ( not os.path.exists( os.path.join( self.cache_folder, filename ) +
+                                      Constants.DENCELLORF_FILES_EXTENSION ) ) ):
+            return None
+
+        try:
+            cached_keyset = FileHandlerUtil.get_obj_from_file( input_folder = self.cache_folder,
+                                                               filename = filename )
+        except DenCellORFException as e:
+            Logger.get_instance().warning( 'The key set cached in the file ' + filename +
+                                           ' cannot be loaded and will be computed again.' +
+                                           ' Error: ' + e.get_message() +
+                                           ' Warning code: ' + LogCodes.WARN_FILT_KEYSET_CACHE + '.' )
+            return None
+
+        if ( cached_keyset.get( 'content_version' ) != content_version ):
+            Logger.get_instance().debug( 'FilterPlanner.get_cached_keys(): The key set cached in the' +
+                                         ' file ' + filename + ' is outdated and will be computed again.' )
+            return None
+
+        return cached_keyset[ 'keys' ]
+
+
+
+    ## save_cached_keys
+    #  ----------------
+    #
+    # This method allows to save a key set in the cache.
+    #
+    # NB: The key set is not cached if the content version of the PRO database 
+    #     is unknown, as its validity could not be checked.
+    #
+    # @param fingerprint: String - The fingerprint of the criterion.
+    # @param content_version: String - The content version of the PRO database.
+    # @param keys: List - The list of keys.
+    #
+    def save_cached_keys( self, fingerprint, content_version, keys ):
+
+        if ( ( self.cache_folder == None ) or ( content_version == None ) ):
+            return
+
+        try:
+            FileHandlerUtil.save_obj_to_file( objects_to_save = { 'content_version': content_version,
+                                                                  'keys': keys },
+                                              filename = Constants.FILTER_KEYSET_CACHE_FILENAME_PREFIX + fingerprint,
+                                              output_folder = self.cache_folder )
+        except DenCellORFException as e:
+            Logger.get_instance().warning( 'The key set computed for the fingerprint ' + fingerprint +
+                                           ' cannot be cached. Error: ' + e.get_message() +
+                                           ' Warning code: ' + LogCodes.WARN_FILT_KEYSET_CACHE + '.' )
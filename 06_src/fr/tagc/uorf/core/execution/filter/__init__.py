@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from FilterCopyEngine import FilterCopyEngine
+from FilterPlanner import FilterPlanner
@@ -511,14 +511,12 @@ class ParserStrategy( object ):
             else:
                 # If requested, log the recovery of the gene symbol from the transcript ID
                 if log_warning:
-                    Logger.get_instance().warning( 'There was no gene associated with the ORF with original ID "' + 
-                                                   orf_id + '" in ' + self.data_source + 
-                                                   ' but the transcript associated with this ORF ("' +
-                                                   transcript_id + 
-                                                   '") has been found associated with the gene symbol "' +
-                                                   symbol + '" in the Ensembl database.' +
-                                                   ' Hence, this ORF will be associated with this gene.' +
-                                                   ' Warning code: ' + LogCodes.WARN_ORFASSO_GENE_FROM_TR_ID + '.' )
+                    DiagnosticsAggregator.get_instance().record( LogCodes.WARN_ORFASSO_GENE_FROM_TR_ID, self.data_source, orf_id,
+                                                                 'There was no gene associated with the ORF with original ID "%s" in %s' +
+                                                                 ' but the transcript associated with this ORF ("%s") has been found' +
+                                                                 ' associated with the gene symbol "%s" in the Ensembl database.' +
+                                                                 ' Hence, this ORF will be associated with this gene.',
+                                                                 ( orf_id, self.data_source, transcript_id, symbol ) )
         
         # Otherwise, set the symbol to None
         else:
@@ -566,26 +564,24 @@ class ParserStrategy( object ):
         # (on an "unknown" chromosome)
         if ParserStrategy.is_empty( chr_name ):
             symbol = Constants.PREFIX_UNKNOWN_GENE + 'chr_UNKNOWN'
-            Logger.get_instance().warning( 'There was no gene associated with the ORF with original ID "' + 
-                                           orf_id + '" in ' + self.data_source +
-                                           ' and the chromosome name is not known.' +
-                                           ' Hence, this ORF will be associated with the "unknown" gene "' + 
-                                           symbol + '".' +
-                                           ' Warning code: ' + LogCodes.WARN_ORFASSO_GENE_UNKN_MISCHR + '.' )
+            DiagnosticsAggregator.get_instance().record( LogCodes.WARN_ORFASSO_GENE_UNKN_MISCHR, self.data_source, orf_id,
+                                                         'There was no gene associated with the ORF with original ID "%s" in %s' +
+                                                         ' and the chromosome name is not known.' +
+                                                         ' Hence, this ORF will be associated with the "unknown" gene "%s".',
+                                                         ( orf_id, self.data_source, symbol ) )
         
         # Otherwise, try to get the symbol from the ORF coordinates
         else:            
             # If the ORF strand is missing, create an "unknown gene" (on the provided chromosome)
             if ParserStrategy.is_empty( val = orf_strand, empty_val = Constants.EMPTY_VALUES_WO_DASH ):
                 symbol = Constants.PREFIX_UNKNOWN_GENE + 'chr_' + chr_name
-                Logger.get_instance().warning( 'There was no gene associated with the ORF with original ID "' + 
-                                               orf_id + '" in ' + self.data_source +
-                                               ' and the strand of this ORF was missing, so overlapping' +
-                                               ' genes or lncRNAs cannot be found in the Ensembl database' +
-                                               ' using the ORF coordinates.' +
-                                               ' Hence, this ORF will be associated with the "unknown"' +
-                                               ' gene "' + symbol + '".' +
-                                               ' Warning code: ' + LogCodes.WARN_ORFASSO_GENE_UNKN_MISSTRAND + '.' )
+                DiagnosticsAggregator.get_instance().record( LogCodes.WARN_ORFASSO_GENE_UNKN_MISSTRAND, self.data_source, orf_id,
+                                                             'There was no gene associated with the ORF with original ID "%s" in %s' +
+                                                             ' and the strand of this ORF was missing, so overlapping' +
+                                                             ' genes or lncRNAs cannot be found in the Ensembl database' +
+                                                             ' using the ORF coordinates.' +
+                                                             ' Hence, this ORF will be associated with the "unknown" gene "%s".',
+                                                             ( orf_id, self.data_source, symbol ) )
                 
             # Otherwise, try to get the gene(s) or lncRNA(s) overlapping with the ORF coordinates
             else:
@@ -603,13 +599,12 @@ class ParserStrategy( object ):
                     symbol = genes_at_loc[ 0 ]
                     # Only log this operation if required
                     if log_single_symb_from_pos:
-                        Logger.get_instance().warning( 'There was no gene associated with the ORF with' +
-                                                       ' original ID "' + orf_id + '" in ' + self.data_source +
-                                                       ', but the ORF coordinates have been found' +
-                                                       ' overlapping the gene "' + symbol + 
-                                                       '" in the Ensembl database.' +
-                                                       ' Hence, the ORF will be associated with this gene.' +
-                                                       ' Warning code: ' + LogCodes.WARN_ORFASSO_GENE_SING + '.' )
+                        DiagnosticsAggregator.get_instance().record( LogCodes.WARN_ORFASSO_GENE_SING, self.data_source, orf_id,
+                                                                     'There was no gene associated with the ORF with original ID "%s" in %s' +
+                                                                     ', but the ORF coordinates have been found overlapping the gene "%s"' +
+                                                                     ' in the Ensembl database.' +
+                                                                     ' Hence, the ORF will be associated with this gene.',
+                                                                     ( orf_id, self.data_source, symbol ) )
                 
                 # If there are several genes overlapping with these coordinates, concatenate them to create a gene id
                 elif ( len( genes_at_loc) > 1 ):
@@ -626,14 +621,12 @@ class ParserStrategy( object ):
                                    genes_at_loc[ 0 ] + '_to_' + genes_at_loc[ -1 ] + 
                                    '_chr' + chr_name )
                         
-                    Logger.get_instance().warning( 'There was no gene associated with the ORF with original ID "' +
-                                                   orf_id + '" in ' + self.data_source +
-                                                   ' but the ORF coordinates have been found overlapping' +
-                                                   ' with the following genes "' + 
-                                                   ', '.join( genes_at_loc ) + '" in the Ensembl database.' +
-                                                   ' Hence, this ORF will be associated with the "overlapping" gene "' + 
-                                                   symbol + '".' +
-                                                   ' Warning code: ' + LogCodes.WARN_ORFASSO_GENE_SEV + '.' )
+                    DiagnosticsAggregator.get_instance().record( LogCodes.WARN_ORFASSO_GENE_SEV, self.data_source, orf_id,
+                                                                 'There was no gene associated with the ORF with original ID "%s" in %s' +
+                                                                 ' but the ORF coordinates have been found overlapping with the' +
+                                                                 ' following genes "%s" in the Ensembl database.' +
+                                                                 ' Hence, this ORF will be associated with the "overlapping" gene "%s".',
+                                                                 ( orf_id, self.data_source, ', '.join( genes_at_loc ), symbol ) )
                 
                 # Otherwise, if there is no gene overlapping with these coordinates,
                 # try check the lncRNAs that may be overlapping with these coordinates. 
@@ -644,14 +637,13 @@ class ParserStrategy( object ):
                      # If there is one single lncRNA overlapping with these coordinates, get it
                     if ( len( lncRNAs_at_loc ) == 1 ):
                         symbol = lncRNAs_at_loc[ 0 ]
-                        Logger.get_instance().warning( 'There was no gene associated with the ORF with original ID "' + 
-                                                       orf_id + '" in ' + self.data_source +
-                                                       ' nor overlapping with these coordinates,' +
-                                                       ' but the ORF coordinates have been found overlapping' +
-                                                       ' with the lncRNA "' + symbol + '" in the Ensembl database.' +
-                                                       ' Hence, the ORF will be associated with this lncRNA' +
-                                                       ' (registered as an entry in the Gene table).' + 
-                                                       ' Warning code: ' + LogCodes.WARN_ORFASSO_GENE_LNCR_SING + '.' )
+                        DiagnosticsAggregator.get_instance().record( LogCodes.WARN_ORFASSO_GENE_LNCR_SING, self.data_source, orf_id,
+                                                                     'There was no gene associated with the ORF with original ID "%s" in %s' +
+                                                                     ' nor overlapping with these coordinates, but the ORF coordinates' +
+                                                                     ' have been found overlapping with the lncRNA "%s" in the Ensembl' +
+                                                                     ' database. Hence, the ORF will be associated with this lncRNA' +
+                                                                     ' (registered as an entry in the Gene table).',
+                                                                     ( orf_id, self.data_source, symbol ) )
                         
                     # If there are several lncRNAs overlapping with these coordinates, 
                     # concatenate them to create a gene id
@@ -670,26 +662,23 @@ class ParserStrategy( object ):
                                        lncRNAs_at_loc[ 0 ] + '_to_' + lncRNAs_at_loc[ -1 ] + 
                                        '_chr' + chr_name )
                         
-                        Logger.get_instance().warning( 'There was no gene associated with the ORF with original ID "' + 
-                                                       orf_id + '" in ' + self.data_source +
-                                                       ' nor overlapping with these coordinates,' +
-                                                       ' but the ORF coordinates have been found overlapping' +
-                                                       ' with the following lncRNAs "' +
-                                                       ', '.join( lncRNAs_at_loc ) + '" in the Ensembl database.' +
-                                                       ' Hence, this ORF will be associated with "' + symbol + 
-                                                       '" (registered as an entry in the Gene table).' +
-                                                       ' Warning code: ' + LogCodes.WARN_ORFASSO_GENE_LNCR_SEV + '.' )
+                        DiagnosticsAggregator.get_instance().record( LogCodes.WARN_ORFASSO_GENE_LNCR_SEV, self.data_source, orf_id,
+                                                                     'There was no gene associated with the ORF with original ID "%s" in %s' +
+                                                                     ' nor overlapping with these coordinates, but the ORF coordinates' +
+                                                                     ' have been found overlapping with the following lncRNAs "%s" in' +
+                                                                     ' the Ensembl database. Hence, this ORF will be associated with "%s"' +
+                                                                     ' (registered as an entry in the Gene table).',
+                                                                     ( orf_id, self.data_source, ', '.join( lncRNAs_at_loc ), symbol ) )
                 
                     # Otherwise, if there is no gene nor lncRNAs overlapping with these coordinates, create an "intergenic" gene. 
                     else:
                         symbol = Constants.PREFIX_INTERGENIC_GENE + 'chr' + chr_name
-                        Logger.get_instance().warning( 'There was no gene associated with the ORF with original ID "' + 
-                                                       orf_id + '" in ' + self.data_source +
-                                                       ' and no gene nor lncRNA has been found overlapping' +
-                                                       ' the ORF coordinates in the Ensembl database.' +
-                                                       ' Hence, this ORF will be associated with the "intergenic" gene "' + 
-                                                       symbol + '".' +
-                                                       ' Warning code: ' + LogCodes.WARN_ORFASSO_GENE_INTERG + '.' )
+                        DiagnosticsAggregator.get_instance().record( LogCodes.WARN_ORFASSO_GENE_INTERG, self.data_source, orf_id,
+                                                                     'There was no gene associated with the ORF with original ID "%s" in %s' +
+                                                                     ' and no gene nor lncRNA has been found overlapping the ORF' +
+                                                                     ' coordinates in the Ensembl database.' +
+                                                                     ' Hence, this ORF will be associated with the "intergenic" gene "%s".',
+                                                                     ( orf_id, self.data_source, symbol ) )
         
         return symbol
 
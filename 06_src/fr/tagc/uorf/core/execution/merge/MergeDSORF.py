@@ -6,6 +6,7 @@ from fr.tagc.uorf.core.util import Constants
 from fr.tagc.uorf.core.util import LogCodes
 from fr.tagc.uorf.core.util.data.DataManager import DataManager
 from fr.tagc.uorf.core.util.general.GeneralUtil import GeneralUtil
+from fr.tagc.uorf.core.util.genetics.GeneticsUtil import GeneticsUtil
 from fr.tagc.uorf.core.util.graphics.ProgressionBar import ProgressionBar
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
@@ -83,6 +84,7 @@ class MergeDSORF( object ):
                    strand = orf_strand,
                    start_pos = orf_start_pos,
                    stop_pos = orf_stop_pos,
+                   bin = GeneticsUtil.get_genomic_bin( orf_start_pos, orf_stop_pos ),
                    spliced = orf_spliced,
                    spliced_parts_count = orf_spliced_parts_count,
                    splice_starts = orf_splice_starts,
@@ -99,6 +101,9 @@ class MergeDSORF( object ):
                                    data_source = orf_related_datasources[ k ],
                                    ambiguous = False )
             objects_to_insert.append( orfdsasso )
+        
+        # Increase the progression count (shared with the main process)
+        ProgressionBar.get_instance().increase()
             
         return ( objects_to_insert, processed_ids )
         
@@ -9,6 +9,7 @@ from fr.tagc.uorf.core.util import Constants
 from fr.tagc.uorf.core.util import LogCodes
 from fr.tagc.uorf.core.util.genetics.GeneticsUtil import GeneticsUtil
 from fr.tagc.uorf.core.util.general.GeneralUtil import GeneralUtil
+from fr.tagc.uorf.core.util.graphics.ProgressionBar import ProgressionBar
 from fr.tagc.uorf.core.util.exception import *
 
 
@@ -33,6 +34,20 @@ class MergeDSOTA( object ):
                                                   'orf_score', 'phylocsf', 'phastcons', 'floss', 
                                                   'floss_class' ]
     
+    # List of numerical attributes for which the minimal, maximal and median values
+    # have to be computed when merging several DSORFTranscriptAsso entries together,
+    # associated with the function to use to convert their values
+    DSORFTRANSCRIPTASSO_NUMERICAL_ATTRIBUTES = [ ( 'orf_length', 'int' ),
+                                                 ( 'orf_length_nt', 'int' ),
+                                                 ( 'orf_score', 'float' ),
+                                                 ( 'phylocsf', 'float' ),
+                                                 ( 'phastcons', 'float' ),
+                                                 ( 'floss', 'float' ) ]
+    
+    # Key used to store the "clusters" in the dictionaries 
+    # returned by the compute_dsota_summaries() method
+    DSOTA_SUMMARY_CLUSTERS = 'clusters'
+    
     # List of values for the Kozak context attributes to consider as true or false
     KOZAK_CTXT_TRUE = [ '1', True ]
     KOZAK_CTXT_FALSE = [ '0', False ]
@@ -64,6 +79,97 @@ class MergeDSOTA( object ):
     # Methods related to merge the DSORFTranscriptAsso entries
     # =============================================================================== 
     
+    ## merge_dsota_batch
+    #  -----------------
+    #
+    # This static method allows to merge several groups of entries from 
+    # the DSORFTranscriptAsso table of the DS database at once.
+    # The coherence of the DSORFTranscriptAsso entries is first checked (when 
+    # requested), then the summaries of the numerical attributes and the "clusters" 
+    # of all the groups that contain several DSORFTranscriptAsso are computed 
+    # together (see the documentation of the compute_dsota_summaries() method for 
+    # more information). Finally, each group is merged using the merge_dsota() 
+    # method.
+    # 
+    # @param args_for_merging_batch: List of 7-tuples - The list of arguments to provide to the 
+    #                                                   merge_dsota() method for each group. See the 
+    #                                                   documentation of this method for more information.
+    #    
+    # @return all_objects_to_insert: List of 6-tuples - The list of 6-elements tuples returned by the 
+    #                                                   merge_dsota() method for each group, in the 
+    #                                                   order of the groups provided. The error and 
+    #                                                   warning messages raised by the coherence check
+    #                                                   of each group are included in its tuple.
+    #
+    @staticmethod
+    def merge_dsota_batch( args_for_merging_batch ):
+        
+        all_args_checked = []
+        all_check_messages = []
+        
+        # When the checkDSOTA option has been selected, check the coherence 
+        # of the DSORFTranscriptAsso entries of each group
+        for args_for_merging in args_for_merging_batch:
+            
+            ( ota_id,
+              orf_tr_asso,
+              dsorftranscriptasso_list,
+              check_dsota_coherence,
+              compute_consensus,
+              sqce_consensus_ambig_threshold,
+              max_len_diff_dsota_clust ) = args_for_merging
+              
+            if check_dsota_coherence:
+                ( dsorftranscriptasso_list,
+                  error_messages_to_log,
+                  warning_messages_to_log ) = MergeDSOTA.check_dsota_list_coherence( dsorftranscriptasso_list )
+            else:
+                error_messages_to_log = []
+                warning_messages_to_log = []
+            
+            all_args_checked.append( ( ota_id, orf_tr_asso, dsorftranscriptasso_list, False,
+                                       compute_consensus, sqce_consensus_ambig_threshold,
+                                       max_len_diff_dsota_clust ) )
+            all_check_messages.append( ( error_messages_to_log, warning_messages_to_log ) )
+        
+        # Compute at once the summaries of all the groups 
+        # that contains several DSORFTranscriptAsso entries
+        multi_positions = [ k for k in range( len( all_args_checked ) ) if ( len( all_args_checked[ k ][ 2 ] ) > 1 ) ]
+        all_summaries = [ None ] * len( all_args_checked )
+        
+        if multi_positions:
+            max_len_diff_dsota_clust = all_args_checked[ multi_positions[ 0 ] ][ 6 ]
+            summaries = MergeDSOTA.compute_dsota_summaries( list_of_dsota_lists = [ all_args_checked[ k ][ 2 ] for k in multi_positions ],
+                                                            max_len_diff_dsota_clust = max_len_diff_dsota_clust )
+            for ( k, summary ) in zip( multi_positions, summaries ):
+                all_summaries[ k ] = summary
+        
+        # Merge each group of DSORFTranscriptAsso entries
+        all_objects_to_insert = []
+        
+        for k in range( len( all_args_checked ) ):
+            
+            ( objects_to_insert, 
+              cell_ctxt_catalog_to_insert,
+              provided_cat_catalog_to_insert,
+              floss_class_catelog_to_insert,
+              error_messages_to_log,
+              warning_messages_to_log ) = MergeDSOTA.merge_dsota( all_args_checked[ k ], all_summaries[ k ] )
+            
+            ( check_error_messages, check_warning_messages ) = all_check_messages[ k ]
+            
+            all_objects_to_insert.append( ( objects_to_insert, cell_ctxt_catalog_to_insert, 
+                                            provided_cat_catalog_to_insert, floss_class_catelog_to_insert,
+                                            check_error_messages + error_messages_to_log, 
+                                            check_warning_messages + warning_messages_to_log ) )
+        
+        # Increase the progression count (shared with the main process)
+        ProgressionBar.get_instance().increase( add_val = len( args_for_merging_batch ) )
+        
+        return all_objects_to_insert
+    
+    
+    
     ## merge_dsota
     #  -----------
     #
@@ -88,6 +194,10 @@ class MergeDSOTA( object ):
     #                                - max_len_diff_dsota_clust: Integer (>0) - The maximal difference between the 
     #                                                            max. and min. lengths of DSORFTranscriptAsso 
     #                                                            entries to belong to the same "cluster".
+    # @param dsota_summary: Dictionary - The summary of the numerical attributes and the "clusters" of the
+    #                                    DSORFTranscriptAsso entries of the group, as returned by the 
+    #                                    compute_dsota_summaries() method. If None, the summary is computed
+    #                                    by the method when necessary. None by default.
     #    
     # @return 6-tuple - A 6-elements tuple that contains the following information:
     #                     - objects_to_insert: List - The list of new objects to insert and that CAN NOT be
@@ -108,7 +218,7 @@ class MergeDSOTA( object ):
     #                                                       must be logged at the warning level.
     #
     @staticmethod
-    def merge_dsota( args_for_merging ):
+    def merge_dsota( args_for_merging, dsota_summary=None ):
         
         # Parse the arguments
         ( ota_id,
@@ -154,12 +264,9 @@ class MergeDSOTA( object ):
         # NB: See the documentation of the check_dsorftrasso_coherence() method
         #     for more information.
         if check_dsota_coherence:
-            dsorftranscriptasso_updated_list = []
-            for dsorftranscriptasso in dsorftranscriptasso_list:
-                ( checked_dsota, checked_error_to_log, checked_warning_to_log ) = MergeDSOTA.check_dsorftrasso_coherence( dsorftranscriptasso )
-                dsorftranscriptasso_updated_list.append( checked_dsota )
-                error_messages_to_log += checked_error_to_log
-                warning_messages_to_log += checked_warning_to_log
+            ( dsorftranscriptasso_updated_list,
+              error_messages_to_log,
+              warning_messages_to_log ) = MergeDSOTA.check_dsota_list_coherence( dsorftranscriptasso_list )
         else:
             dsorftranscriptasso_updated_list = dsorftranscriptasso_list
             
@@ -345,23 +452,16 @@ class MergeDSOTA( object ):
         else:
             ## Build a dictionary that contains as keys the name of the attributes 
             #  to merge and as values the actual value(s) for the related attribute
-            dsorftranscriptasso_dict = {}
+            dsorftranscriptasso_dict = MergeDSOTA.get_dsota_att_values( dsorftranscriptasso_updated_list )
             
-            for att in MergeDSOTA.DSORFTRANSCRIPTASSO_ATTRIBUTES_TO_COMPARE:
-                
-                dsorftranscriptasso_dict[ att ] = []
-                
-                for dsorftranscriptasso in dsorftranscriptasso_updated_list:
-                    att_value = getattr( dsorftranscriptasso, att )
-                    
-                    # Store the value in the list only if it is not None and not ambiguous
-                    if ( ( att_value != None )
-                         and ( att_value != Constants.DENCELLORFOBJ_AMBIGUOUS_ATT ) ):
-                        dsorftranscriptasso_dict.get( att ).append( att_value )
-                        
-                # Remove the empty lists from the dictionary
-                if ( dsorftranscriptasso_dict.get( att ) == [] ):
-                    del dsorftranscriptasso_dict[ att ]
+            ## Get the minimal, maximal and median values of the numerical attributes
+            #  and the "clusters" of DSORFTranscriptAsso entries if they have not been 
+            #  provided (e.g. when the group is not merged with the merge_dsota_batch() 
+            #  method). See the documentation of the compute_dsota_summaries() method 
+            #  for more information.
+            if ( dsota_summary == None ):
+                dsota_summary = MergeDSOTA.compute_dsota_summaries( list_of_dsota_lists = [ dsorftranscriptasso_updated_list ],
+                                                                    max_len_diff_dsota_clust = max_len_diff_dsota_clust )[ 0 ]
                     
             
             ## Merge the DSORFTranscriptAsso together
@@ -391,8 +491,7 @@ class MergeDSOTA( object ):
                 if compute_consensus:
                     sqce_nt_consensus = GeneticsUtil.find_sqce_consensus( list_of_sequences = dsorftranscriptasso_dict.get( 'raw_sequence' ), 
                                                                           sqce_type = Constants.SEQUENCE_TYPE_DNA, 
-                                                                          threshold = sqce_consensus_ambig_threshold,
-                                                                          fasta_end_name = str( ota_id ) + '_nt' )
+                                                                          threshold = sqce_consensus_ambig_threshold )
                 # Otherwise, instead of the sequence, store the number of sequences 
                 # that would have been used to compute the consensus
                 else:
@@ -405,8 +504,7 @@ class MergeDSOTA( object ):
                 if compute_consensus:
                     sqce_aa_consensus = GeneticsUtil.find_sqce_consensus( list_of_sequences = dsorftranscriptasso_dict.get( 'raw_sequence_aa' ),
                                                                           sqce_type = Constants.SEQUENCE_TYPE_PROT,
-                                                                          threshold = sqce_consensus_ambig_threshold,
-                                                                          fasta_end_name = str( ota_id ) + '_aa' )
+                                                                          threshold = sqce_consensus_ambig_threshold )
                 # Otherwise, instead of the sequence, store the number of sequences 
                 # that would have been used to compute the consensus
                 else:
@@ -458,42 +556,42 @@ class MergeDSOTA( object ):
             
             # Compute the values of the amino acid ORF lengths
             orf_length_values_list = dsorftranscriptasso_dict.get( 'orf_length' )
-            ( length_aa_min, length_aa_max, length_aa_median ) = GeneralUtil.min_max_median_of_list( list_of_values = orf_length_values_list, fct = 'int' )
+            ( length_aa_min, length_aa_max, length_aa_median ) = dsota_summary.get( 'orf_length' )
             length_aa_values = GeneralUtil.list_to_string( list_to_convert = orf_length_values_list,
                                                            sep = Constants.OTA_LIST_VALUES_SEPARATOR,
                                                            not_none = False )
                                     
             # Compute the values of the nucleic ORF lengths
             orf_length_nt_values_list = dsorftranscriptasso_dict.get( 'orf_length_nt' )
-            ( length_nt_min, length_nt_max, length_nt_median ) = GeneralUtil.min_max_median_of_list( list_of_values = orf_length_nt_values_list, fct = 'int' )
+            ( length_nt_min, length_nt_max, length_nt_median ) = dsota_summary.get( 'orf_length_nt' )
             length_nt_values = GeneralUtil.list_to_string( list_to_convert = orf_length_nt_values_list,
                                                            sep = Constants.OTA_LIST_VALUES_SEPARATOR,
                                                            not_none = False )
             
             # Compute the values for the ORF scores
             orfscore_values_list = dsorftranscriptasso_dict.get( 'orf_score' )
-            ( orfscore_min, orfscore_max, orfscore_median ) = GeneralUtil.min_max_median_of_list( list_of_values = orfscore_values_list, fct = 'float' )
+            ( orfscore_min, orfscore_max, orfscore_median ) = dsota_summary.get( 'orf_score' )
             orfscore_values = GeneralUtil.list_to_string( list_to_convert = orfscore_values_list,
                                                           sep = Constants.OTA_LIST_VALUES_SEPARATOR,
                                                           not_none = False )
                       
             # Compute the values for the PhyloCSF scores
             phylocsf_values_list = dsorftranscriptasso_dict.get( 'phylocsf' )
-            ( phylocsf_min, phylocsf_max, phylocsf_median ) = GeneralUtil.min_max_median_of_list( list_of_values = phylocsf_values_list, fct = 'float' )
+            ( phylocsf_min, phylocsf_max, phylocsf_median ) = dsota_summary.get( 'phylocsf' )
             phylocsf_values = GeneralUtil.list_to_string( list_to_convert = phylocsf_values_list,
                                                           sep = Constants.OTA_LIST_VALUES_SEPARATOR,
                                                           not_none = False )
             
             # Compute the values for the PhastCons scores
             phastcons_values_list = dsorftranscriptasso_dict.get( 'phastcons' )
-            ( phastcons_min, phastcons_max, phastcons_median ) = GeneralUtil.min_max_median_of_list( list_of_values = phastcons_values_list, fct = 'float' )
+            ( phastcons_min, phastcons_max, phastcons_median ) = dsota_summary.get( 'phastcons' )
             phastcons_values = GeneralUtil.list_to_string( list_to_convert = phastcons_values_list,
                                                            sep = Constants.OTA_LIST_VALUES_SEPARATOR,
                                                            not_none = False )
             
             # Compute the values for the FLOSS scores
             floss_values_list = dsorftranscriptasso_dict.get( 'floss' )
-            ( floss_min, floss_max, floss_median ) = GeneralUtil.min_max_median_of_list( list_of_values = floss_values_list, fct = 'float' )
+            ( floss_min, floss_max, floss_median ) = dsota_summary.get( 'floss' )
             floss_values = GeneralUtil.list_to_string( list_to_convert = floss_values_list,
                                                        sep = Constants.OTA_LIST_VALUES_SEPARATOR,
                                                        not_none = False )
@@ -507,13 +605,13 @@ class MergeDSOTA( object ):
             #  NB: This guess is performed using only the amino acid length as this 
             #      is the most often provided feature and one of the most relevant 
             #      (with the sequences) to do this.
-            #  NB: See the documentation of the find_best_dsota_subpop() method for
-            #      more information.
+            #  NB: These "clusters" have been computed at the same time as the summary 
+            #      of the numerical attributes. See the documentation of the 
+            #      compute_length_clusters() method for more information.
             orf_length_list = dsorftranscriptasso_dict.get( 'orf_length' )
             
             if orf_length_list:
-                list_of_clusters = MergeDSOTA.find_best_dsota_subpop( dsorftranscriptasso_updated_list,
-                                                                      max_len_diff_dsota_clust )
+                list_of_clusters = dsota_summary.get( MergeDSOTA.DSOTA_SUMMARY_CLUSTERS )
                 
                 # Get the number of ORF amino acid lengths that have actually been 
                 # used to compute the "clusters"
@@ -700,6 +798,10 @@ class MergeDSOTA( object ):
     # - The agreement between the nucleic and amino acid lengths.
     # If there is conflicting information, a warning is logged and the 
     # concerned attributes are removed from the entry.
+    # NB: As this method is run for each DSORFTranscriptAsso entry, the messages
+    #     are provided as ( code, source, ID, message template, arguments ) tuples,
+    #     in order to be aggregated (see the documentation of the DiagnosticsAggregator
+    #     class) rather than logged one by one.
     #
     # @param dsorftranscriptasso: DSORFTranscriptAsso - The entry to check.
     #
@@ -738,12 +840,10 @@ class MergeDSOTA( object ):
                                                                   to_stop = False )
             except TranslateDNAException as e:
                 translated_sequence = e.get_aa_seq()
-                error_messages_to_log.append( 'The length of the nucleic sequence of the' +
-                                              ' DSORFTranscriptAsso with ID "' + str( dsorftranscriptasso.id ) + 
-                                              '" is not a multiple of three. Hence, the sequence has been' +
-                                              ' translated ignoring the last ' + str( e.get_remainder() ) + 
-                                              ' nucleotides.' +
-                                              ' Warning code: ' + LogCodes.WARN_TRANSL_SEQSIZE_NOT3 + '.' )
+                error_messages_to_log.append( ( LogCodes.WARN_TRANSL_SEQSIZE_NOT3, 'MergeDSOTA.check_dsorftrasso_coherence', dsorftranscriptasso.id,
+                                                'The length of the nucleic sequence of the DSORFTranscriptAsso with ID "%s" is not a' +
+                                                ' multiple of three. Hence, the sequence has been translated ignoring the last %s nucleotides.',
+                                                ( dsorftranscriptasso.id, e.get_remainder() ) ) )
             
             
             
@@ -781,13 +881,11 @@ class MergeDSOTA( object ):
                     remove_both_sequence = True
             
             if remove_both_sequence:
-                warning_messages_to_log.append( 'The nucleic and amino acid sequences of the' +
-                                                ' DSORFTranscriptAsso with ID "' + 
-                                                str( dsorftranscriptasso.id ) + 
-                                                '" do not agree with each other. Hence, these sequences' +
-                                                ' will not be considered to create the ORFTranscriptAsso' +
-                                                ' entries (in the PRO database).'  +
-                                                ' Warning code: ' + LogCodes.WARN_DCORF_DSOTA_CONFL_SEQ + '.' )
+                warning_messages_to_log.append( ( LogCodes.WARN_DCORF_DSOTA_CONFL_SEQ, 'MergeDSOTA.check_dsorftrasso_coherence', dsorftranscriptasso.id,
+                                                  'The nucleic and amino acid sequences of the DSORFTranscriptAsso with ID "%s" do not' +
+                                                  ' agree with each other. Hence, these sequences will not be considered to create the' +
+                                                  ' ORFTranscriptAsso entries (in the PRO database).',
+                                                  ( dsorftranscriptasso.id, ) ) )
                 
                 dsorftranscriptasso.raw_sequence = None
                 dsorftranscriptasso.raw_sequence_aa = None
@@ -804,12 +902,10 @@ class MergeDSOTA( object ):
                                                                                   to_stop = False )
             except TranslateDNAException as e:
                 dsorftranscriptasso.raw_sequence_aa = e.get_aa_seq()
-                warning_messages_to_log.append( 'The length of the nucleic sequence of the' +
-                                                ' DSORFTranscriptAsso with ID "' + str( dsorftranscriptasso.id ) + 
-                                                '" is not a multiple of three. Hence, the sequence has been' +
-                                                ' translated ignoring the last ' + str( e.get_remainder() ) + 
-                                                ' nucleotides.' +
-                                                ' Warning code: ' + LogCodes.WARN_TRANSL_SEQSIZE_NOT3 + '.' )
+                warning_messages_to_log.append( ( LogCodes.WARN_TRANSL_SEQSIZE_NOT3, 'MergeDSOTA.check_dsorftrasso_coherence', dsorftranscriptasso.id,
+                                                  'The length of the nucleic sequence of the DSORFTranscriptAsso with ID "%s" is not a' +
+                                                  ' multiple of three. Hence, the sequence has been translated ignoring the last %s nucleotides.',
+                                                  ( dsorftranscriptasso.id, e.get_remainder() ) ) )
             
         
         ## Compare the nucleic sequence and its length        
@@ -821,14 +917,11 @@ class MergeDSOTA( object ):
             length_nt = int( length_nt )
             
             if ( length_sequence_nt != length_nt ):
-                warning_messages_to_log.append( 'The provided nucleic length (' + str( length_nt ) + 
-                                                ') and the length of the nucleic sequence (' + 
-                                                str( length_sequence_nt ) + 
-                                                ') of the DSORFTranscriptAsso with ID "' + 
-                                                str( dsorftranscriptasso.id ) + '" are not the same.' +
-                                                ' Hence, this length and this sequence will not be considered' +
-                                                ' to create the ORFTranscriptAsso entries (in the PRO database).'  +
-                                                ' Warning code: ' + LogCodes.WARN_DCORF_DSOTA_CONFL_NTLEN + '.' )
+                warning_messages_to_log.append( ( LogCodes.WARN_DCORF_DSOTA_CONFL_NTLEN, 'MergeDSOTA.check_dsorftrasso_coherence', dsorftranscriptasso.id,
+                                                  'The provided nucleic length (%s) and the length of the nucleic sequence (%s) of the' +
+                                                  ' DSORFTranscriptAsso with ID "%s" are not the same. Hence, this length and this sequence' +
+                                                  ' will not be considered to create the ORFTranscriptAsso entries (in the PRO database).',
+                                                  ( length_nt, length_sequence_nt, dsorftranscriptasso.id ) ) )
                 
                 dsorftranscriptasso.raw_sequence = None
                 dsorftranscriptasso.orf_length_nt = None
@@ -848,14 +941,11 @@ class MergeDSOTA( object ):
             length_aa = int( length_aa )
             
             if ( length_sequence_aa != length_aa ):
-                warning_messages_to_log.append( 'The provided amino acid length (' + str( length_aa ) + 
-                                                ') and the length of the amino acid sequence (' + 
-                                                str( length_sequence_aa ) + 
-                                                ') of the DSORFTranscriptAsso with ID "' + 
-                                                str( dsorftranscriptasso.id ) + '" are not the same.' +
-                                                ' Hence, this length and this sequence will not be considered' +
-                                                ' to create the ORFTranscriptAsso entries (in the PRO database).' +
-                                                ' Warning code: ' + LogCodes.WARN_DCORF_DSOTA_CONFL_AALEN + '.' ) 
+                warning_messages_to_log.append( ( LogCodes.WARN_DCORF_DSOTA_CONFL_AALEN, 'MergeDSOTA.check_dsorftrasso_coherence', dsorftranscriptasso.id,
+                                                  'The provided amino acid length (%s) and the length of the amino acid sequence (%s) of the' +
+                                                  ' DSORFTranscriptAsso with ID "%s" are not the same. Hence, this length and this sequence' +
+                                                  ' will not be considered to create the ORFTranscriptAsso entries (in the PRO database).',
+                                                  ( length_aa, length_sequence_aa, dsorftranscriptasso.id ) ) )
                 
                 dsorftranscriptasso.raw_sequence_aa = None
                 dsorftranscriptasso.orf_length = None
@@ -876,13 +966,11 @@ class MergeDSOTA( object ):
             length_aa_in_nt = int( ( length_aa + 1 ) * 3 )
             
             if ( length_nt != length_aa_in_nt ):
-                warning_messages_to_log.append( 'The provided amino acid length (' + str( length_aa ) + 
-                                                ') and nucleic length (' + str( length_nt ) +
-                                                + ') of the DSORFTranscriptAsso with ID "' + 
-                                                str( dsorftranscriptasso.id ) + '" do not agree with each' +
-                                                ' other. Hence, these lengths will not be considered' +
-                                                ' to create the ORFTranscriptAsso entries (in the PRO database).' +
-                                                ' Warning code: ' + LogCodes.WARN_DCORF_DSOTA_CONFL_AANTLEN + '.' ) 
+                warning_messages_to_log.append( ( LogCodes.WARN_DCORF_DSOTA_CONFL_AANTLEN, 'MergeDSOTA.check_dsorftrasso_coherence', dsorftranscriptasso.id,
+                                                  'The provided amino acid length (%s) and nucleic length (%s) of the DSORFTranscriptAsso' +
+                                                  ' with ID "%s" do not agree with each other. Hence, these lengths will not be considered' +
+                                                  ' to create the ORFTranscriptAsso entries (in the PRO database).',
+                                                  ( length_aa, length_nt, dsorftranscriptasso.id ) ) )
                 
                 dsorftranscriptasso.orf_length_nt = None
                 dsorftranscriptasso.orf_length = None
@@ -903,12 +991,159 @@ class MergeDSOTA( object ):
         
     
     
-    ## find_best_dsota_subpop
-    #  ----------------------
+        
+    
+    
+    ## check_dsota_list_coherence
+    #  --------------------------
+    #
+    # This is a static method that allows to check the coherence of the data 
+    # contained in each DSORFTranscriptAsso of a list.
+    # NB: See the documentation of the check_dsorftrasso_coherence() method
+    #     for more information.
+    #
+    # @param dsorftranscriptasso_list: List of DSORFTranscriptAsso - The list of entries to check.
+    #
+    # @return 3-tuple - A 3-elements tuple that contains the following information:
+    #                     - dsorftranscriptasso_updated_list: List of DSORFTranscriptAsso - The list 
+    #                                                         of updated entries.
+    #                     - error_messages_to_log: List - The list of messages instantiated by the process and that
+    #                                                     must be logged at the error level.
+    #                     - warning_messages_to_log: List - The list of messages instantiated by the process and that
+    #                                                       must be logged at the warning level.
+    # 
+    @staticmethod
+    def check_dsota_list_coherence( dsorftranscriptasso_list ):
+        
+        dsorftranscriptasso_updated_list = []
+        error_messages_to_log = []
+        warning_messages_to_log = []
+        
+        for dsorftranscriptasso in dsorftranscriptasso_list:
+            ( checked_dsota, checked_error_to_log, checked_warning_to_log ) = MergeDSOTA.check_dsorftrasso_coherence( dsorftranscriptasso )
+            dsorftranscriptasso_updated_list.append( checked_dsota )
+            error_messages_to_log += checked_error_to_log
+            warning_messages_to_log += checked_warning_to_log
+            
+        return ( dsorftranscriptasso_updated_list, error_messages_to_log, warning_messages_to_log )
+        
+    
+    
+    ## get_dsota_att_values
+    #  --------------------
+    #
+    # This is a static method that allows to build a dictionary that contains 
+    # as keys the name of the attributes to merge and as values the list of 
+    # values provided for the attribute by the DSORFTranscriptAsso entries.
+    # The missing (None) and ambiguous values are not registered, and the 
+    # attributes for which there is no value are not included in the dictionary.
+    #
+    # @param dsorftranscriptasso_list: List of DSORFTranscriptAsso - The list of entries.
+    #
+    # @return dsorftranscriptasso_dict: Dictionary - The dictionary that associates to each 
+    #                                                attribute the list of its values.
+    # 
+    @staticmethod
+    def get_dsota_att_values( dsorftranscriptasso_list ):
+        
+        dsorftranscriptasso_dict = {}
+            
+        for att in MergeDSOTA.DSORFTRANSCRIPTASSO_ATTRIBUTES_TO_COMPARE:
+            
+            dsorftranscriptasso_dict[ att ] = []
+            
+            for dsorftranscriptasso in dsorftranscriptasso_list:
+                att_value = getattr( dsorftranscriptasso, att )
+                
+                # Store the value in the list only if it is not None and not ambiguous
+                if ( ( att_value != None )
+                     and ( att_value != Constants.DENCELLORFOBJ_AMBIGUOUS_ATT ) ):
+                    dsorftranscriptasso_dict.get( att ).append( att_value )
+                    
+            # Remove the empty lists from the dictionary
+            if ( dsorftranscriptasso_dict.get( att ) == [] ):
+                del dsorftranscriptasso_dict[ att ]
+        
+        return dsorftranscriptasso_dict
+        
+    
+    
+    ## compute_dsota_summaries
+    #  -----------------------
+    #
+    # This is a static method that allows to compute, for several groups of 
+    # DSORFTranscriptAsso entries at once:
+    # - The minimal, maximal and median values of each of the numerical attributes
+    #   (amino acid and nucleic lengths, ORF score, PhyloCSF, PhastCons and FLOSS
+    #   scores). For each attribute, the values of all the groups are regrouped in 
+    #   a single array in order to perform a grouped computation (see the documentation 
+    #   of the GeneralUtil.min_max_median_by_group() method for more information).
+    # - The "clusters" of DSORFTranscriptAsso entries based on their amino acid 
+    #   length (see the documentation of the compute_length_clusters() method for 
+    #   more information). These are only computed when at least one entry of the 
+    #   group has an amino acid length.
+    #
+    # @param list_of_dsota_lists: List of lists of DSORFTranscriptAsso - The groups of 
+    #                                                                    DSORFTranscriptAsso.
+    # @param max_len_diff_dsota_clust: Integer (>0) - The maximal difference between the max. and
+    #                                                 min. lengths of DSORFTranscriptAsso entries 
+    #                                                 to belong to the same "cluster".
+    #
+    # @return summaries: List of dictionaries - For each group, a dictionary that associates to the 
+    #                                           name of each numerical attribute a ( min, max, median )
+    #                                           tuple, and to the DSOTA_SUMMARY_CLUSTERS key the list 
+    #                                           of "clusters" (or None).
+    # 
+    @staticmethod
+    def compute_dsota_summaries( list_of_dsota_lists, max_len_diff_dsota_clust ):
+        
+        all_att_values = [ MergeDSOTA.get_dsota_att_values( dsota_list ) for dsota_list in list_of_dsota_lists ]
+        
+        summaries = [ {} for k in range( len( list_of_dsota_lists ) ) ]
+        
+        # Compute the minimal, maximal and median values 
+        # of the numerical attributes for all the groups
+        for ( att, fct ) in MergeDSOTA.DSORFTRANSCRIPTASSO_NUMERICAL_ATTRIBUTES:
+            
+            att_min_max_median = GeneralUtil.min_max_median_by_group( groups_of_values = [ att_values.get( att ) for att_values in all_att_values ],
+                                                                      fct = fct )
+            
+            for k in range( len( summaries ) ):
+                summaries[ k ][ att ] = att_min_max_median[ k ]
+        
+        # Compute the "clusters" based on the amino acid lengths
+        for k in range( len( summaries ) ):
+            if all_att_values[ k ].get( 'orf_length' ):
+                summaries[ k ][ MergeDSOTA.DSOTA_SUMMARY_CLUSTERS ] = MergeDSOTA.compute_length_clusters( list_of_dsota_lists[ k ],
+                                                                                                         max_len_diff_dsota_clust )
+            else:
+                summaries[ k ][ MergeDSOTA.DSOTA_SUMMARY_CLUSTERS ] = None
+        
+        return summaries
+        
+    
+    
+    ## compute_length_clusters
+    #  -----------------------
     #
     # This method allows to compute "clusters" of DSORFTranscriptAsso entries
     # according to their similarity in amino acid ORF length.
     # 
+    # The lengths are sorted once, and the "clusters" are then computed as ranges 
+    # of this sorted array: While the difference between the maximal and minimal 
+    # lengths of a range exceeds the threshold, the range is split at the highest 
+    # difference(s) between consecutive values (see the documentation of the 
+    # split_sorted_lengths() method for more information).
+    # NB: The first split is performed using the default threshold 
+    #     (DEFAULT_MAX_LEN_DIFF_FOR_DSOTA_CLUSTERS) whilst all the next ones use the
+    #     provided threshold, such as the "clusters" are the same as the ones 
+    #     historically computed for the existing releases of the database.
+    # NB: If the list has been split, the DSORFTranscriptAsso missing their amino 
+    #     acid length are not included in any of the "clusters". Otherwise, all 
+    #     the entries belong to the same unique "cluster".
+    # NB: In each "cluster", the DSORFTranscriptAsso are ordered by increasing 
+    #     length and then by order in the list.
+    # 
     # @param dsorftranscriptasso_list: List - The list of DSORFTranscriptAsso objects from which the 
     #                                         clusters have to be computed.
     # @param max_len_diff_dsota_clust: Integer - The maximal length difference allowed between
@@ -918,40 +1153,66 @@ class MergeDSOTA( object ):
     #                                       the entries defining the "cluster".
     #
     @staticmethod
-    def find_best_dsota_subpop( dsorftranscriptasso_list, max_len_diff_dsota_clust ):
-                
-        # Compute the best "clusters" of DSORFTranscriptAsso 
-        # based upon the ORF amino acid length
-        # NB: See the documentation of the split_dsota_using_length()
-        #     method for more information.
-        prev_all_sublists = dsorftranscriptasso_list
-        all_sublists = MergeDSOTA.split_dsota_using_length( prev_all_sublists )
+    def compute_length_clusters( dsorftranscriptasso_list, max_len_diff_dsota_clust ):
         
-        # While this is still possible to identify several clusters 
-        # according to the method used, run the process
-        while ( all_sublists != prev_all_sublists ):
-            
-            prev_all_sublists = all_sublists
+        import numpy as np
+        
+        # Get the positions in the list of the entries that have a length,
+        # and sort these entries by length
+        # NB: As the sorting algorithm is stable, the entries sharing
+        #     the same length are kept in the order of the list.
+        positions_with_length = [ k for k in range( len( dsorftranscriptasso_list ) ) \
+                                  if ( dsorftranscriptasso_list[ k ].orf_length != None ) ]
+        lengths = np.array( [ int( dsorftranscriptasso_list[ k ].orf_length ) for k in positions_with_length ] )
+        sorted_positions = np.argsort( lengths, kind = 'mergesort' )
+        sorted_lengths = lengths[ sorted_positions ]
+        
+        # Compute the ranges of the sorted array that define the "clusters"
+        all_bounds = []
+        first_bounds = MergeDSOTA.split_sorted_lengths( sorted_lengths = sorted_lengths,
+                                                        start = 0,
+                                                        end = len( sorted_lengths ),
+                                                        max_len_diff = Constants.DEFAULT_MAX_LEN_DIFF_FOR_DSOTA_CLUSTERS )
+        
+        bounds_to_split = first_bounds[ ::-1 ]
+        while bounds_to_split:
+            ( start, end ) = bounds_to_split.pop()
+            sub_bounds = MergeDSOTA.split_sorted_lengths( sorted_lengths = sorted_lengths,
+                                                          start = start, 
+                                                          end = end, 
+                                                          max_len_diff = max_len_diff_dsota_clust )
+            if ( len( sub_bounds ) == 1 ):
+                all_bounds.append( ( start, end ) )
+            else:
+                bounds_to_split += sub_bounds[ ::-1 ]
+        
+        # If the list has never been split, all the DSORFTranscriptAsso 
+        # belong to the same unique "cluster"
+        if ( len( all_bounds ) == 1 ):
+            all_sublists = [ dsorftranscriptasso_list ]
+        
+        # Otherwise, recover the DSORFTranscriptAsso corresponding to each range
+        else:
             all_sublists = []
-            
-            for sublist in prev_all_sublists:
-                all_sublists += MergeDSOTA.split_dsota_using_length( dsorftranscriptasso_list = sublist, 
-                                                                        max_len_diff = max_len_diff_dsota_clust )
-                    
+            for ( start, end ) in all_bounds:
+                all_sublists.append( [ dsorftranscriptasso_list[ positions_with_length[ pos ] ] for pos in sorted_positions[ start : end ] ] )
+        
         return all_sublists
         
     
     
-    ## split_dsota_using_length
-    #  ------------------------
+    ## split_sorted_lengths
+    #  --------------------
     #
-    # This is a static method that allows to split a list of DSORFTranscriptAsso 
-    # entries into several sublists if the differences between amino acid ORF 
-    # length exceed a threshold. If there are DSORFTranscriptAsso missing their 
-    # ORF lengths, then they are not considered to build in the "clusters".
+    # This is a static method that allows to split a range of a sorted array of 
+    # lengths into several ranges if the difference between the maximal and minimal 
+    # lengths of the range exceeds a threshold. The range is then split at each 
+    # position where the difference between two consecutive values equals the 
+    # highest difference.
     # 
-    # @param dsorftranscriptasso_list: List of DSORFTranscriptAsso - The list of DSORFTranscriptAsso 
-    #                                                                instances to split into clusters.
+    # @param sorted_lengths: Numpy array - The array of lengths, sorted by increasing values.
+    # @param start: Integer - The index of the first element of the range (included).
+    # @param end: Integer - The index of the last element of the range (excluded).
     # @param max_len_diff: Integer - The maximal difference between the maximal and minimal lengths 
     #                                of DSORFTranscriptAsso so they belong to the same group (value 
     #                                included).
@@ -959,75 +1220,23 @@ class MergeDSOTA( object ):
     #                                     as being part of two different "clusters" if the difference of 
     #                                     their length exceed 4.
     #
-    # @return sublists_dsota: List of list of DSORFTranscriptAsso - The list of DSORFTranscriptAsso 
-    #                                                               objects grouped by similar lengths.
+    # @return List of 2-tuples - The list of ( start, end ) ranges.
     #
     @staticmethod
-    def split_dsota_using_length( dsorftranscriptasso_list, max_len_diff=Constants.DEFAULT_MAX_LEN_DIFF_FOR_DSOTA_CLUSTERS ):
-        
-        # Build a dictionary that associate to each DSORFTranscriptAsso 
-        # its length when it is provided
-        length_dict = {}
-        for dsorftranscriptasso in dsorftranscriptasso_list:
-            # Fill in the dictionary if the DSORFTranscriptAsso has a length
-            if ( dsorftranscriptasso.orf_length != None ):
-                length_dict[ dsorftranscriptasso ] = int( dsorftranscriptasso.orf_length )
+    def split_sorted_lengths( sorted_lengths, start, end, max_len_diff ):
         
-        # Get the sorted list of lengths and get the maximal and minimal values for these lengths
-        length_list_sorted = sorted( length_dict.values() )
-        max_len = max( length_list_sorted )
-        min_len = min( length_list_sorted )
+        # If the difference between the maximal and minimal length does not exceed 
+        # the threshold, all the entries of the range belong to the same "cluster"
+        if ( ( sorted_lengths[ end - 1 ] - sorted_lengths[ start ] ) <= max_len_diff ):
+            return [ ( start, end ) ]
         
-        # If the absolute difference between the maximal and minimal length is
-        # higher than the threshold, then one may consider the ORF should not 
-        # have been merged. Then, regroup the DSORFTranscriptAsso that belong 
-        # to the "same group".
-        if ( abs( max_len - min_len ) > max_len_diff ):
-            
-            # Compute the difference between each consecutive value
-            list_of_length_diff = []
-            
-            for k in range( len( length_list_sorted ) - 1 ):
-                list_of_length_diff.append( length_list_sorted[ k + 1 ] - length_list_sorted[ k ] )
-                
-            # Find the highest difference(s) in the list
-            max_diff = max( list_of_length_diff )
-            
-            # Split the list of lengths into several lists, using the maximal difference
-            # as the point of separation
-            sublists_of_lengths = [ [] ]
-            list_nb = 0
-            
-            for k in range( len( length_list_sorted ) ):
-                
-                sublists_of_lengths[ list_nb ].append( length_list_sorted[ k ] )
-                
-                if ( ( k < len( list_of_length_diff )
-                       and ( list_of_length_diff[ k ] == max_diff ) ) ):
-                    list_nb += 1
-                    sublists_of_lengths.append( [] )
+        # Otherwise, compute the difference between each consecutive value,
+        # and split the range at each position of the highest difference
+        import numpy as np
+        length_diffs = np.diff( sorted_lengths[ start : end ] )
+        split_positions = ( start + 1 + np.flatnonzero( length_diffs == length_diffs.max() ) ).tolist()
         
-            # Recover the DSORFTranscriptAsso corresponding to these lengths
-            # Instantiate an empty list that aims to receive the lists of "clusters"
-            sublists_dsota = []
-            
-            for sublist in sublists_of_lengths:
-                
-                # Get a list of unique values
-                subls = list( set( sublist ) )
-                
-                all_corresp_dsota = []
-                
-                for dsota_len_subls in subls:
-                    # Get all DSORFTranscriptAsso belonging to this sublist
-                    corresponding_dsota = [ dsota for ( dsota, dsota_len ) in length_dict.items() if ( dsota_len == dsota_len_subls ) ]
-                    all_corresp_dsota += corresponding_dsota
-                
-                sublists_dsota.append( all_corresp_dsota )
+        bounds = [ start ] + split_positions + [ end ]
         
-        # Otherwise, all the DSORFTranscriptAsso belong to the same unique "cluster"
-        else:
-            sublists_dsota = [ dsorftranscriptasso_list ]
+        return [ ( bounds[ k ], bounds[ k + 1 ] ) for k in range( len( bounds ) - 1 ) ]
         
-        return sublists_dsota
-        
\ No newline at end of file
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+
+import os
+import uuid
+
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
+from fr.tagc.uorf.core.util.general.RecordFileUtil import RecordFileUtil
+from fr.tagc.uorf.core.util.exception import *
+from fr.tagc.uorf.core.util.log.Logger import Logger
+
+
+## MergeJournal
+#  ============
+#
+# This class allows to keep track, in an append-only file (journal), of the
+# "chunks" of objects computed during the merging and inserted in the PRO
+# database. Each chunk is registered in the journal (with the objects it
+# contains, the keys of the groups of entries that have been merged to compute
+# these objects and the IDs of the new entries) prior to be inserted in the
+# database, and a commit record is appended to the journal once the insertion
+# has been successfully completed.
+# Hence, if the merging fails, the journal allows to:
+# - Skip all the groups of entries that belong to a committed chunk.
+# - Replay in the PRO database the chunks that have been registered but for
+#   which the insertion has not been completed, without having to compute
+#   their content again.
+#
+# The journal is a binary file made of successive records (see the documentation
+# of the RecordFileUtil class). Each chunk is registered as two consecutive records,
+# the first one (RECORD_CHUNK) containing the description of the chunk and the second
+# one (RECORD_CHUNK_OBJECTS) containing its objects, such as the journal may be
+# recovered without loading the objects. An incomplete record at the end of the
+# file (e.g. if the program has been killed whilst writing it) is discarded when
+# the journal is recovered.
+#
+class MergeJournal( object ):
+
+    ## Class variables
+    #  ---------------
+    #
+    # Record types
+    RECORD_CHUNK = 1
+    RECORD_COMMIT = 2
+    RECORD_CHUNK_OBJECTS = 3
+
+
+    ## Constructor of MergeJournal
+    #  ---------------------------
+    #
+    # Instance variables:
+    #     - name: String - The name of the journal.
+    #     - folder: String - The folder where the journal file is saved.
+    #     - file_path: String - The path to the journal file.
+    #
+    # @param name: String - The name of the journal (usually, the name of the step of
+    #                       the merging for which the chunks are registered).
+    # @param folder: String - The folder where the journal file is saved.
+    #                         Constants.MERGED_DATA_FOLDER by default.
+    #
+    def __init__( self, name, folder=Constants.MERGED_DATA_FOLDER ):
+
+        self.name = name
+        self.folder = folder
+        self.file_path = os.path.join( folder,
+                                       name + Constants.MERGE_JOURNAL_FILES_EXTENSION )
+
+
+
+    ## reset
+    #  -----
+    #
+    # This method allows to remove all the records of the journal.
+    #
+    def reset( self ):
+
+        if not os.path.isdir( self.folder ):
+            os.makedirs( self.folder )
+
+        with open( self.file_path, 'wb' ):
+            pass
+
+
+
+    ## write_record
+    #  ------------
+    #
+    # This method allows to append one or several records to the journal.
+    # NB: The file is synchronized on disk once the records have been written.
+    #
+    # @param record_type: Integer - The type of record.
+    # @param content: Object - The content of the record (any object that can be pickled).
+    # @param next_records: List - The list of ( record type, content ) tuples of the records
+    #                             to write after this one. None by default
+    #                             (no record to write after this one).
+    #
+    def write_record( self, record_type, content, next_records=None ):
+
+        if ( next_records == None ):
+            next_records = []
+
+        with open( self.file_path, 'ab' ) as journal_file:
+            journal_file.write( RecordFileUtil.pack_record( record_type, content ) )
+            for ( next_record_type, next_content ) in next_records:
+                journal_file.write( RecordFileUtil.pack_record( next_record_type, next_content ) )
+            journal_file.flush()
+            os.fsync( journal_file.fileno() )
+
+
+
+    ## append_chunk
+    #  ------------
+    #
+    # This method allows to register in the journal a chunk of objects expected
+    # to be inserted in the PRO database.
+    #
+    # @param objects_to_insert: List - The list of objects to insert in the database.
+    # @param group_keys: List - The list of keys of the groups of entries that have been merged
+    #                           to compute the objects. None by default.
+    # @param entry_ids: List - The list of IDs of the new entries of the chunk.
+    #                           None by default.
+    #
+    # @return chunk_id: String - The unique ID of the chunk.
+    #
+    def append_chunk( self, objects_to_insert, group_keys=None, entry_ids=None ):
+
+        chunk_id = uuid.uuid4().hex
+
+        self.write_record( record_type = MergeJournal.RECORD_CHUNK,
+                           content = { 'chunk_id': chunk_id,
+                                       'group_keys': group_keys,
+                                       'entry_ids': entry_ids },
+                           next_records = [ ( MergeJournal.RECORD_CHUNK_OBJECTS, objects_to_insert ) ] )
+
+        return chunk_id
+
+
+
+    ## mark_committed
+    #  --------------
+    #
+    # This method allows to register in the journal that the objects
+    # of a chunk have been successfully inserted in the PRO database.
+    #
+    # @param chunk_id: String - The unique ID of the chunk.
+    #
+    def mark_committed( self, chunk_id ):
+
+        self.write_record( record_type = MergeJournal.RECORD_COMMIT,
+                           content = chunk_id )
+
+
+
+    ## recover
+    #  -------
+    #
+    # This method allows to get the list of chunks registered in the journal.
+    # If the last record of the journal is incomplete or corrupted, it is
+    # removed from the file, such as new records could be appended to it.
+    # NB: In order to limit the memory usage, the records containing the objects
+    #     of the chunks are skipped without being loaded (see the load_chunk_objects()
+    #     method).
+    #
+    # @return chunks: List of dictionaries - The list of chunks registered in the journal, in
+    #                                        the order they have been registered. Each chunk is
+    #                                        described by a dictionary with the 'chunk_id',
+    #                                        'group_keys', 'entry_ids', 'objects_offset' and
+    #                                        'committed' keys. An empty list is returned if the
+    #                                        journal does not exist.
+    #
+    def recover( self ):
+
+        chunks = []
+        committed_chunk_ids = set()
+
+        if not os.path.exists( self.file_path ):
+            return chunks
+
+        with open( self.file_path, 'rb' ) as journal_file:
+
+            offset = journal_file.tell()
+            record = RecordFileUtil.read_record( journal_file )
+
+            while ( record != None ):
+
+                ( record_type, content ) = record
+
+                if ( record_type == MergeJournal.RECORD_CHUNK ):
+                    # Skip the objects of the chunk, making sure they have been
+                    # entirely written, otherwise the chunk is discarded
+                    objects_offset = journal_file.tell()
+                    objects_record = RecordFileUtil.read_record( journal_file,
+                                                                 load_content = False,
+                                                                 check_payload = False )
+                    if ( ( objects_record == None )
+                         or ( objects_record[ 0 ] != MergeJournal.RECORD_CHUNK_OBJECTS ) ):
+                        break
+
+                    chunks.append( { 'chunk_id': content.get( 'chunk_id' ),
+                                     'group_keys': content.get( 'group_keys' ),
+                                     'entry_ids': content.get( 'entry_ids' ),
+                                     'objects_offset': objects_offset } )
+
+                elif ( record_type == MergeJournal.RECORD_COMMIT ):
+                    committed_chunk_ids.add( content )
+
+                offset = journal_file.tell()
+                record = RecordFileUtil.read_record( journal_file )
+
+            file_size = os.fstat( journal_file.fileno() ).st_size
+
+        # Remove the incomplete record at the end of the file if necessary
+        if ( offset < file_size ):
+            Logger.get_instance().warning( 'MergeJournal.recover(): The last record of the journal ' +
+                                           self.file_path + ' is incomplete and has been discarded (' +
+                                           str( file_size - offset ) + ' bytes).' +
+                                           ' Warning code: ' + LogCodes.WARN_MERG_JOURNAL_TRUNC + '.' )
+            with open( self.file_path, 'r+b' ) as journal_file:
+                journal_file.truncate( offset )
+
+        for chunk in chunks:
+            chunk[ 'committed' ] = ( chunk.get( 'chunk_id' ) in committed_chunk_ids )
+
+        return chunks
+
+
+
+    ## load_chunk_objects
+    #  ------------------
+    #
+    # This method allows to get the objects of a chunk registered in the journal.
+    # NB: The checksum of the record containing the objects is checked at this step.
+    #
+    # @param chunk: Dictionary - The chunk, as returned by the recover() method.
+    #
+    # @return List - The list of objects of the chunk.
+    #
+    # @throw DenCellORFException: When the record of the chunk cannot be read.
+    #
+    def load_chunk_objects( self, chunk ):
+
+        with open( self.file_path, 'rb' ) as journal_file:
+            journal_file.seek( chunk.get( 'objects_offset' ) )
+            record = RecordFileUtil.read_record( journal_file )
+
+        if ( ( record == None ) or ( record[ 0 ] != MergeJournal.RECORD_CHUNK_OBJECTS ) ):
+            raise DenCellORFException( 'MergeJournal.load_chunk_objects(): The chunk ' +
+                                       str( chunk.get( 'chunk_id' ) ) + ' could not be read from the' +
+                                       ' journal ' + self.file_path + '.' +
+                                       ' Error code: ' + LogCodes.ERR_FILEHAND + '.' )
+
+        return record[ 1 ]
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util.exception import *
+
+
+## MergePartition
+#  ==============
+#
+# This class contains static methods related to the partitioned merging.
+#
+# When the merging is partitioned, the chromosomes are split into several
+# sets (partitions), and each partition is merged independently into its
+# own partial PRO database (e.g. by separate processes or by separate
+# invocations of the program on several nodes). As the merging is keyed by
+# genomic coordinates, two DSORF entries located on different chromosomes
+# can never be merged together, and the partitions can thus be merged
+# without any communication between them:
+# - The IDs of the ORF and Transcript entries are computed from the IDs of
+#   the DS entries merged together, and are thus consistent between the
+#   partitions.
+# - The IDs of the ORFTranscriptAsso entries are computed from a counter
+#   starting at the lower bound of the range of IDs allocated to the partition.
+# The partial PRO databases are then concatenated into the PRO database by the
+# CombineMergePartitions strategy.
+#
+class MergePartition( object ):
+
+    ## parse_partitions
+    #  ----------------
+    #
+    # This is a static method that allows to get the list of partitions from the
+    # string provided as option. The partitions have to be separated by semicolons
+    # and the chromosomes of each partition by commas (e.g. '1,2,3;4,5;X,Y,MT').
+    #
+    # @param partitions_str: String - The string defining the partitions.
+    #
+    # @return partitions: List of lists - The list of partitions, where each partition
+    #                                     is the list of the chromosome names it contains.
+    #
+    # @throw DenCellORFException: When a partition does not contain any chromosome.
+    # @throw DenCellORFException: When a chromosome belongs to several partitions.
+    #
+    @staticmethod
+    def parse_partitions( partitions_str ):
+
+        partitions = []
+        all_chromosomes = set()
+
+        for partition_str in partitions_str.split( Constants.MERGE_PARTITION_SEPARATOR ):
+
+            partition = [ chr_name.strip() for chr_name in partition_str.split( Constants.MERGE_PARTITION_CHR_SEPARATOR ) \
+                          if ( chr_name.strip() != '' ) ]
+
+            if ( partition == [] ):
+                raise DenCellORFException( 'MergePartition.parse_partitions(): The partition ' +
+                                           str( len( partitions ) ) + ' does not contain any chromosome' +
+                                           ' (provided partitions: ' + partitions_str + ').' )
+
+            duplicated_chromosomes = all_chromosomes.intersection( partition )
+            if ( len( duplicated_chromosomes ) != 0 ):
+                raise DenCellORFException( 'MergePartition.parse_partitions(): The following chromosomes' +
+                                           ' have been found in several partitions: ' +
+                                           ', '.join( sorted( duplicated_chromosomes ) ) +
+                                           '. Each chromosome has to belong to one single partition.' )
+
+            all_chromosomes.update( partition )
+            partitions.append( partition )
+
+        return partitions
+
+
+
+    ## get_uncovered_chromosomes
+    #  -------------------------
+    #
+    # This is a static method that allows to get the chromosomes that
+    # do not belong to any partition.
+    #
+    # @param partitions: List of lists - The list of partitions.
+    # @param chromosomes: List - The names of the chromosomes to cover.
+    #
+    # @return List - The sorted list of the chromosomes that do not belong to any partition.
+    #
+    @staticmethod
+    def get_uncovered_chromosomes( partitions, chromosomes ):
+
+        partitioned_chromosomes = set( [ chr_name for partition in partitions for chr_name in partition ] )
+
+        return sorted( set( chromosomes ).difference( partitioned_chromosomes ) )
+
+
+
+    ## get_partition_index
+    #  -------------------
+    #
+    # This is a static method that allows to check and convert the
+    # index of a partition provided as option.
+    #
+    # @param partition_index: String - The index of the partition (starting at 0).
+    # @param partitions: List of lists - The list of partitions.
+    #
+    # @return Integer - The index of the partition.
+    #
+    # @throw DenCellORFException: When the index is not an integer.
+    # @throw DenCellORFException: When there is no partition with this index.
+    #
+    @staticmethod
+    def get_partition_index( partition_index, partitions ):
+
+        try:
+            partition_index = int( partition_index )
+        except:
+            raise DenCellORFException( 'MergePartition.get_partition_index(): The index of the partition' +
+                                       ' needs to be an integer (provided value: ' +
+                                       str( partition_index ) + ').' )
+
+        if ( ( partition_index < 0 ) or ( partition_index >= len( partitions ) ) ):
+            raise DenCellORFException( 'MergePartition.get_partition_index(): The index of the partition' +
+                                       ' needs to be an integer between 0 and ' + str( len( partitions ) - 1 ) +
+                                       ' (provided value: ' + str( partition_index ) + ').' )
+
+        return partition_index
+
+
+
+    ## get_partial_db_name
+    #  -------------------
+    #
+    # This is a static method that allows to get the name of the
+    # partial PRO database of a partition.
+    #
+    # @param db_name: String - The name of the PRO database.
+    # @param partition_index: Integer - The index of the partition.
+    #
+    # @return String - The name of the partial PRO database.
+    #
+    @staticmethod
+    def get_partial_db_name( db_name, partition_index ):
+
+        return db_name + Constants.MERGE_PARTITION_DB_SUFFIX + str( partition_index )
+
+
+
+    ## get_partition_folder
+    #  --------------------
+    #
+    # This is a static method that allows to get the folder where the files
+    # generated during the merging of a partition (e.g. journals) are saved.
+    #
+    # @param partition_index: Integer - The index of the partition. None by default.
+    #
+    # @return String - The path to the folder (Constants.MERGED_DATA_FOLDER if
+    #                  the partition index is None).
+    #
+    @staticmethod
+    def get_partition_folder( partition_index=None ):
+
+        if ( partition_index == None ):
+            return Constants.MERGED_DATA_FOLDER
+
+        else:
+            return os.path.join( Constants.MERGED_DATA_FOLDER,
+                                 Constants.MERGE_PARTITION_FOLDER_PREFIX + str( partition_index ) )
+
+
+
+    ## get_ota_id_bounds
+    #  -----------------
+    #
+    # This is a static method that allows to get the range of IDs
+    # allocated to the ORFTranscriptAsso entries of a partition.
+    #
+    # @param partition_index: Integer - The index of the partition.
+    #
+    # @return 2-tuple - The minimal and maximal IDs (included) of the range.
+    #
+    @staticmethod
+    def get_ota_id_bounds( partition_index ):
+
+        min_ota_id = partition_index * Constants.MERGE_PARTITION_OTA_ID_RANGE + 1
+        max_ota_id = ( partition_index + 1 ) * Constants.MERGE_PARTITION_OTA_ID_RANGE
+
+        return ( min_ota_id, max_ota_id )
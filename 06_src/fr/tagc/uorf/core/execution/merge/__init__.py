@@ -2,3 +2,5 @@
 
 from MergeDSORF import MergeDSORF
 from MergeDSOTA import MergeDSOTA
+from MergeJournal import MergeJournal
+from MergePartition import MergePartition
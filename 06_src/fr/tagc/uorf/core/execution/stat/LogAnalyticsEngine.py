@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import re
+import time
+from collections import Counter
+
+from pathos.multiprocessing import ProcessingPool as Pool
+
+
+from fr.tagc.uorf.core.util import LogCodes
+from fr.tagc.uorf.core.util.exception import *
+
+
+## LogAnalyticsEngine
+#  ==================
+#
+# This class allows to count the occurrences of the logging levels and of
+# the log codes (cf. LogCodes file) in a set of log files.
+#
+# Each log file is read exactly once, and the levels and log codes of each
+# line are found using one single compiled regular expression. The log files
+# may be compressed with gzip (files with the .gz extension) and are scanned
+# in parallel by several processes, each of them returning the counts of its
+# file. These counts are then summed up.
+#
+# As the log files were previously counted with grep, a line is counted once
+# for each distinct level it contains, and a log code is counted for each line
+# that contains a warning (resp. error) code which includes this log code
+# (e.g. a line with the code 'WSplicMiss' is counted for 'WSplic' too).
+# The summary lines of the warnings aggregated during the execution (see the
+# documentation of the DiagnosticsAggregator class) are counted for the number
+# of occurrences they summarize.
+#
+class LogAnalyticsEngine( object ):
+
+    ## Class variables
+    #  ---------------
+    #
+    # Extension of the compressed log files
+    GZIP_FILE_EXTENSION = '.gz'
+
+    # Labels preceding the log codes in the log files
+    WARNING_CODE_LABEL = 'Warning'
+    ERROR_CODE_LABEL = 'Error'
+
+    # Regular expression allowing to find the log codes and the number of 
+    # occurrences of the aggregated warnings (the levels are added to this 
+    # expression at runtime)
+    LOG_CODE_REGEX = '(' + WARNING_CODE_LABEL + '|' + ERROR_CODE_LABEL + ') code: ([A-Za-z0-9_]+)(?:\\. Occurrences: ([0-9]+))?'
+
+
+    ## Constructor of LogAnalyticsEngine
+    #  ---------------------------------
+    #
+    # Instance variables:
+    #     - log_file_paths: List - The list of paths to the log files.
+    #     - levels: List - The list of logging levels to count (e.g. 'INFO').
+    #     - thread_nb: Integer - The number of processes that can be used.
+    #     - line_count: Integer - The total number of lines scanned.
+    #     - level_counts: Counter - The number of lines containing each level.
+    #     - code_token_counts: Counter - The number of lines containing each ( label, code )
+    #                                    tuple, where label is 'Warning' or 'Error'.
+    #
+    # @param log_file_paths: List - The list of paths to the log files.
+    # @param levels: List - The list of logging levels to count.
+    # @param thread_nb: Integer - The number of processes that can be used. 1 by default.
+    #
+    def __init__( self, log_file_paths, levels, thread_nb=1 ):
+
+        self.log_file_paths = log_file_paths
+        self.levels = levels
+        self.thread_nb = thread_nb
+
+        self.line_count = 0
+        self.level_counts = Counter()
+        self.code_token_counts = Counter()
+
+
+
+    ## scan
+    #  ----
+    #
+    # This method allows to scan all the log files and to sum up their counts.
+    #
+    # @return errors: List - The list of ( file path, error message ) tuples of
+    #                        the files that could not be scanned.
+    #
+    def scan( self ):
+
+        pattern = '(' + '|'.join( [ re.escape( level ) for level in self.levels ] ) + ')|' + LogAnalyticsEngine.LOG_CODE_REGEX
+        args_for_scan = [ ( file_path, pattern ) for file_path in self.log_file_paths ]
+
+        thread_nb = min( self.thread_nb, len( args_for_scan ) )
+        if ( thread_nb > 1 ):
+            p = Pool( thread_nb )
+            results = p.map( LogAnalyticsEngine.scan_log_file, args_for_scan )
+            p.close()
+            # Wait for all processes to be completed
+            p.join()
+            # Delete the pool instance
+            p.clear()
+        else:
+            results = map( LogAnalyticsEngine.scan_log_file, args_for_scan )
+
+        errors = []
+        for ( file_path, line_count, level_counts, code_token_counts, error_message ) in results:
+            if ( error_message != None ):
+                errors.append( ( file_path, error_message ) )
+            else:
+                self.line_count += line_count
+                self.level_counts.update( level_counts )
+                self.code_token_counts.update( code_token_counts )
+
+        return errors
+
+
+
+    ## scan_log_file
+    #  -------------
+    #
+    # This is a static method that allows to count the levels and log codes
+    # of one log file. It is expected to be run in a separate process.
+    #
+    # @param args: Tuple - The tuple of arguments, containing:
+    #                          - file_path: String - The path to the log file.
+    #                          - pattern: String - The regular expression matching the levels
+    #                                     (first group), the log codes (second and third groups)
+    #                                     and the number of occurrences (fourth group).
+    #
+    # @return 5-tuple - The ( file_path, line_count, level_counts, code_token_counts, error_message )
+    #                   tuple, where:
+    #                       - file_path: String - The path to the log file.
+    #                       - line_count: Integer - The number of lines of the file.
+    #                       - level_counts: Counter - The number of lines containing each level.
+    #                       - code_token_counts: Counter - The number of lines containing each
+    #                                            ( label, code ) tuple.
+    #                       - error_message: String - The message of the error that occurred,
+    #                                        None if the file has been successfully scanned.
+    #
+    @staticmethod
+    def scan_log_file( args ):
+
+        ( file_path, pattern ) = args
+
+        regex = re.compile( pattern )
+        line_count = 0
+        level_counts = Counter()
+        code_token_counts = Counter()
+
+        try:
+            if file_path.endswith( LogAnalyticsEngine.GZIP_FILE_EXTENSION ):
+                log_file = gzip.open( file_path, 'rb' )
+            else:
+                log_file = open( file_path, 'r' )
+
+            try:
+                for line in log_file:
+                    line_count += 1
+
+                    matches = regex.findall( line )
+                    if ( len( matches ) == 0 ):
+                        continue
+
+                    # Each level and code is counted once per line,
+                    # or for the number of occurrences summarized by the line
+                    level_counts.update( set( [ level for ( level, label, code, occurrences ) in matches if level ] ) )
+                    code_tokens = {}
+                    for ( level, label, code, occurrences ) in matches:
+                        if label:
+                            code_tokens[ ( label, code ) ] = ( int( occurrences ) if occurrences else 1 )
+                    code_token_counts.update( code_tokens )
+            finally:
+                log_file.close()
+
+        except Exception as e:
+            return ( file_path, line_count, None, None, str( e ) )
+
+        return ( file_path, line_count, level_counts, code_token_counts, None )
+
+
+
+    ## get_level_counts
+    #  ----------------
+    #
+    # This method allows to get the number of lines containing each level.
+    #
+    # @return Dictionary - The dictionary that associates to each level its count.
+    #
+    def get_level_counts( self ):
+
+        return dict( [ ( level, self.level_counts[ level ] ) for level in self.levels ] )
+
+
+
+    ## get_log_code_counts
+    #  -------------------
+    #
+    # This method allows to get the number of lines containing each log code.
+    #
+    # @param log_codes: List - The list of log codes to count.
+    #
+    # @return log_code_counts: Dictionary - The dictionary that associates to each log code its count.
+    #
+    # @throw DenCellORFException: When a log code does not start with an expected prefix.
+    #
+    def get_log_code_counts( self, log_codes ):
+
+        log_code_counts = {}
+
+        for log_code in log_codes:
+
+            if log_code.startswith( LogCodes.WARN_PREFIX ):
+                label = LogAnalyticsEngine.WARNING_CODE_LABEL
+            elif log_code.startswith( LogCodes.ERR_PREFIX ):
+                label = LogAnalyticsEngine.ERROR_CODE_LABEL
+            else:
+                raise DenCellORFException( 'LogAnalyticsEngine.get_log_code_counts(): The LogCode "' + log_code +
+                                           '" does not start with an expected prefix.' +
+                                           ' Please contact the developer if you see this message.' )
+
+            log_code_counts[ log_code ] = sum( [ count for ( ( token_label, token_code ), count ) in self.code_token_counts.items() \
+                                                 if ( ( token_label == label ) and ( log_code in token_code ) ) ] )
+
+        return log_code_counts
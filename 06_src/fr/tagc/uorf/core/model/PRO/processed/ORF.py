@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from sqlalchemy import Column, Integer, String, Text, Boolean
-from sqlalchemy import PrimaryKeyConstraint, UniqueConstraint
+from sqlalchemy import PrimaryKeyConstraint, UniqueConstraint, Index
 from sqlalchemy.orm import relationship, backref
 
 
@@ -20,6 +20,8 @@ from fr.tagc.uorf.core.util.sql.SQLCollationManager import SQLCollationManager
 #     - strand: String - The strand (+/-) in which the ORF is encoded (in the current genome version).
 #     - start_pos: Integer - The genomic coordinates of the start codon (in the current genome version).
 #     - stop_pos: Integer - The genomic coordinates of the stop codon (in the current genome version).
+#     - bin: Integer - The genomic bin of the ORF (UCSC binning scheme), used to query the ORFs
+#                      overlapping a genomic region.
 #     - spliced: Boolean - Is the ORF spliced?
 #     - spliced_parts_count: Integer - The number of "exons" in the ORF.
 #     - splice_starts: String - The genomic coordinates of the starts of the several "exons" of the ORF 
@@ -41,6 +43,7 @@ class ORF( BasePRO ):
     strand = Column( String( 2, collation = SQLCollationManager.get_instance().get_db_collation() ) )
     start_pos = Column( Integer )
     stop_pos = Column( Integer )
+    bin = Column( Integer )
     spliced = Column( Boolean )
     spliced_parts_count = Column( Integer )
     splice_starts = Column( String( Constants.MAX_LEN_STRING, collation = SQLCollationManager.get_instance().get_db_collation()  ) )
@@ -57,6 +60,7 @@ class ORF( BasePRO ):
                         UniqueConstraint( 'chromosome', 'strand', 'start_pos', 'stop_pos', 
                                           'spliced', 'splice_starts', 'splice_ends', 
                                           'spliced_parts_count' ),
+                        Index( 'ORF_region_idx', 'chromosome', 'bin', 'start_pos', 'stop_pos' ),
                     )
 
     # Define one-to-many relationship
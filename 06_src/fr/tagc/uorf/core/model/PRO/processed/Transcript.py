@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from sqlalchemy import Column, Integer, String, Text, Boolean
-from sqlalchemy import PrimaryKeyConstraint, ForeignKey, UniqueConstraint
+from sqlalchemy import PrimaryKeyConstraint, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship, backref
 
 
@@ -28,6 +28,8 @@ from fr.tagc.uorf.core.util.log.Logger import Logger
 #                            (in the current annotation version).
 #     - end_pos: Integer - The genomic coordinates of the last nucleotide of the transcript
 #                          (in the current annotation version).
+#     - bin: Integer - The genomic bin of the transcript (UCSC binning scheme), used to query 
+#                      the transcripts overlapping a genomic region.
 #     - sequence: Text - The sequence of nucleotides get using the genomic coordinates 
 #                        (in the current annotation version).
 #     - cds_start_pos: Integer - The genomic coordinates of the start codon of the CDS 
@@ -54,6 +56,7 @@ class Transcript( BasePRO ):
     strand = Column( String( 2, collation = SQLCollationManager.get_instance().get_db_collation() ) )
     start_pos = Column( Integer )
     end_pos = Column( Integer )
+    bin = Column( Integer )
     sequence = Column( Text( SQLConstants.MAX_LEN_TEXT, collation = SQLCollationManager.get_instance().get_db_collation() ) )
     cds_start_pos = Column( Integer )
     cds_stop_pos = Column( Integer )
@@ -68,6 +71,7 @@ class Transcript( BasePRO ):
     __table_args__ = (
                         PrimaryKeyConstraint( 'id' ),
                         UniqueConstraint( 'transcript_id', 'gene_id' ),
+                        Index( 'Transcript_region_idx', 'bin', 'start_pos', 'end_pos' ),
                     )
 
     # Define the one-to-many relationship
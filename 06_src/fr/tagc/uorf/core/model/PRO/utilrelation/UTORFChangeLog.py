@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+from sqlalchemy import Column, Integer
+
+
+from fr.tagc.uorf.core.util.sql.Base import BasePRO
+
+
+## UTORFChangeLog
+#  ==============
+#
+# Each UTORFChangeLog contains:
+#     - orf_id: Integer - The ID of an ORF entry for which the information stored in 
+#                         the UTBEDContent table needs to be refreshed.
+#
+# NB: There is no foreign key to the ORF table, such as the IDs of the ORFs
+#     removed since their registration are kept in the table (the UTBEDContent
+#     entries related to these ORFs being removed during the refresh).
+#
+class UTORFChangeLog( BasePRO ):
+    
+    # =============================================================================
+    # /!\ This table is filled during the DeltaMerge, AnnotateORF and 
+    #     ComputeKozakContext steps, and emptied during the GenerateBEDContent step.
+    # =============================================================================
+    
+    __tablename__ = 'UTORFChangeLog'
+    
+    orf_id = Column( Integer, 
+                     primary_key = True,
+                     autoincrement = False )
+    
+
+
+    ## __eq__
+    #  ------
+    #
+    # Tests the equality between two instances of this class.
+    # Two instances are considered equals if their primary keys are all equals.
+    #
+    # @param other: UTORFChangeLog - Another UTORFChangeLog object to compare to this object.
+    #
+    # @return Boolean - Are this object and 'other' equal?
+    #
+    def __eq__( self, other ):
+        
+        # Check if other object is of the same class
+        if ( type( other ) != type( self ) ):
+            return False
+        
+        # Check if the two instances may be considered equal
+        elif ( self.orf_id == other.orf_id ):
+            return True
+        
+        else:
+            return False
+
+
+    ## __hash__
+    #  --------
+    #
+    # Returns the hash value of a UTORFChangeLog object.
+    # The hash value of an instance is computed using its primary key attribute.
+    #
+    # @return the hash value of the UTORFChangeLog object.
+    #
+    def __hash__( self ):
+        
+        return hash( self.orf_id )
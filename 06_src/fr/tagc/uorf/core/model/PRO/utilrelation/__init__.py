@@ -2,3 +2,4 @@
 
 from UTRNABiotypeCatalog import UTRNABiotypeCatalog
 from UTBEDContent import UTBEDContent
+from UTORFChangeLog import UTORFChangeLog
@@ -62,6 +62,13 @@ CONFIG_SECTION_DATA_ORDER_OF_INSERTION = 'DATA_ORDER_OF_INSERTION'
 CONFIG_SECTION_ORDER_OF_INSERTION_ITEM_ORDER = 'DATA_INSERTION_ORDER'
 
 
+# LiftOver strategy
+CONFIG_SECTION_LIFTOVER_PARAMETERS = 'LIFTOVER_PARAMETERS'
+
+  # Folder where the chain files are located (or have to be downloaded)
+CONFIG_SECTION_LIFTOVER_PARAMETERS_ITEM_CHAIN_FILE_FOLDER = 'CHAIN_FILE_FOLDER'
+
+
 # Merge strategy
 CONFIG_SECTION_MERGE_PARAMETERS = 'MERGE_PARAMETERS'
 
@@ -110,6 +117,9 @@ CONFIG_SECTION_FILTER_ITEM_ORF_CAT = 'ORF_CATEGORY_FILTER'
   # List of ORF annotations to use for filtering
 CONFIG_SECTION_FILTER_ITEM_ORF_ANNOT = 'ORF_ANNOTATION_FILTER'
 
+  # Genomic regions (BED file) to use for filtering
+CONFIG_SECTION_FILTER_ITEM_REGION = 'REGION_FILTER'
+
 
 # ===============================================================================
 # DataManager constants
@@ -227,6 +237,37 @@ CORRESPONDING_UCSC_FROM_NCBI = { ncbi_annot: ucsc_annot
                                 for ( ucsc_annot, ncbi_annot ) in CORRESPONDING_NCBI_FROM_UCSC.items() }
 
 
+# Sizes of the chromosomes of the UCSC assemblies (as provided in the <assembly>.chrom.sizes
+# files of the UCSC), necessary to convert the BED files at the bigBed format.
+# NB: Only the primary chromosomes are registered (i.e. the scaffolds are not).
+UCSC_CHROM_SIZES = { ANNOTATION_VERSION_HG19: [ ( 'chr1', 249250621 ), ( 'chr2', 243199373 ), ( 'chr3', 198022430 ),
+                                                ( 'chr4', 191154276 ), ( 'chr5', 180915260 ), ( 'chr6', 171115067 ),
+                                                ( 'chr7', 159138663 ), ( 'chr8', 146364022 ), ( 'chr9', 141213431 ),
+                                                ( 'chr10', 135534747 ), ( 'chr11', 135006516 ), ( 'chr12', 133851895 ),
+                                                ( 'chr13', 115169878 ), ( 'chr14', 107349540 ), ( 'chr15', 102531392 ),
+                                                ( 'chr16', 90354753 ), ( 'chr17', 81195210 ), ( 'chr18', 78077248 ),
+                                                ( 'chr19', 59128983 ), ( 'chr20', 63025520 ), ( 'chr21', 48129895 ),
+                                                ( 'chr22', 51304566 ), ( 'chrX', 155270560 ), ( 'chrY', 59373566 ),
+                                                ( 'chrM', 16571 ) ],
+                     ANNOTATION_VERSION_HG38: [ ( 'chr1', 248956422 ), ( 'chr2', 242193529 ), ( 'chr3', 198295559 ),
+                                                ( 'chr4', 190214555 ), ( 'chr5', 181538259 ), ( 'chr6', 170805979 ),
+                                                ( 'chr7', 159345973 ), ( 'chr8', 145138636 ), ( 'chr9', 138394717 ),
+                                                ( 'chr10', 133797422 ), ( 'chr11', 135086622 ), ( 'chr12', 133275309 ),
+                                                ( 'chr13', 114364328 ), ( 'chr14', 107043718 ), ( 'chr15', 101991189 ),
+                                                ( 'chr16', 90338345 ), ( 'chr17', 83257441 ), ( 'chr18', 80373285 ),
+                                                ( 'chr19', 58617616 ), ( 'chr20', 64444167 ), ( 'chr21', 46709983 ),
+                                                ( 'chr22', 50818468 ), ( 'chrX', 156040895 ), ( 'chrY', 57227415 ),
+                                                ( 'chrM', 16569 ) ],
+                     ANNOTATION_VERSION_MM10: [ ( 'chr1', 195471971 ), ( 'chr2', 182113224 ), ( 'chr3', 160039680 ),
+                                                ( 'chr4', 156508116 ), ( 'chr5', 151834684 ), ( 'chr6', 149736546 ),
+                                                ( 'chr7', 145441459 ), ( 'chr8', 129401213 ), ( 'chr9', 124595110 ),
+                                                ( 'chr10', 130694993 ), ( 'chr11', 122082543 ), ( 'chr12', 120129022 ),
+                                                ( 'chr13', 120421639 ), ( 'chr14', 124902244 ), ( 'chr15', 104043685 ),
+                                                ( 'chr16', 98207768 ), ( 'chr17', 94987271 ), ( 'chr18', 90702639 ),
+                                                ( 'chr19', 61431566 ), ( 'chrX', 171031299 ), ( 'chrY', 91744698 ),
+                                                ( 'chrM', 16299 ) ] }
+
+
 # Current annotation versions
 CURRENT_NCBI_ANNOTATION = { HSAPIENS : ANNOTATION_VERSION_GRCH38,
                             MMUSCULUS : ANNOTATION_VERSION_GRCM38 }
@@ -270,6 +311,12 @@ DB_SETTINGS_DB_FOLDER = 'db_folder'
 # ===============================================================================
 
 PATH_LOG = os.path.join( DefaultOutputFolder.OUTPUT_FOLDER, 'execution.log' )
+# Extension of the log file at JSON-lines format (one JSON object per record),
+# which replaces the extension of the main log file (e.g. execution.jsonl)
+# NB: This file must not start with the name of the main log file,
+#     as all the files starting with this name are parsed by the
+#     GenerateStatFiles strategy
+LOG_JSON_FILE_EXTENSION = '.jsonl'
 
 LOG_APPEND = 'a'
 LOG_NO_APPEND = 'w'
@@ -278,6 +325,15 @@ LOG_DEFAULT = LOG_APPEND
 LOG_SIZE_MAX = 1000000
 LOG_MAX_FILES_NB = 1000
 
+# Maximum number of records waiting to be written by the background thread
+LOG_QUEUE_MAX_SIZE = 100000
+
+# Aggregated warnings
+#  - Maximum number of entry IDs kept as examples for each log code and source
+DIAGNOSTICS_SAMPLE_SIZE = 5
+#  - File in which the full messages of the aggregated warnings may be written
+PATH_LOG_DETAILS = os.path.join( DefaultOutputFolder.OUTPUT_FOLDER, 'warningdetails.tsv.gz' )
+
 MODE_DEBUG = logging.DEBUG
 MODE_INFO = logging.INFO
 MODE_WARNING = logging.WARNING
@@ -304,6 +360,8 @@ LOG_MODES = { LOG_MODE_DEBUG : MODE_DEBUG,
 
 PATH_GENEREF_LOG = os.path.join( DefaultOutputFolder.OUTPUT_FOLDER,
                                  'generefwarnings.log' )
+PATH_GENEREF_LOG_JSON = os.path.join( DefaultOutputFolder.OUTPUT_FOLDER,
+                                      'generefwarnings.jsonl' )
 
 GENEREF_LOG_APPEND = 'a'
 GENEREF_LOG_NO_APPEND = 'w'
@@ -313,6 +371,132 @@ GENEREF_LOG_SIZE_MAX = 1000000
 GENEREF_LOG_MAX_FILES_NB = 1000
 
 
+# ===============================================================================
+# Constants relative to the run telemetry
+# ===============================================================================
+
+# Machine-readable report of the run (JSON)
+# NB: The path may be set using an environment variable, so that several
+#     processes run at the same time (see the Build strategy) do not write
+#     their report in the same file
+RUN_REPORT_PATH_ENV_VARIABLE = 'DENCELLORF_RUN_REPORT'
+PATH_RUN_REPORT = os.environ.get( RUN_REPORT_PATH_ENV_VARIABLE,
+                                  os.path.join( DefaultOutputFolder.OUTPUT_FOLDER, 'runreport.json' ) )
+
+# Folder where the profiling statistics of the stages are saved
+PROFILE_FOLDER = os.path.join( DefaultOutputFolder.OUTPUT_FOLDER, 'profiles' )
+# Value of the profile option allowing to profile all the stages
+PROFILE_ALL_STAGES = 'all'
+# Separator of the stages in the profile option
+PROFILE_STAGE_SEPARATOR = ','
+# Key used to sort the profiling statistics and number of lines written
+PROFILE_SORT_KEY = 'cumulative'
+PROFILE_STATS_LINES_NB = 50
+
+
+# ===============================================================================
+# Constants relative to the progression bar
+# ===============================================================================
+
+# Length of the bar (number of characters)
+PROGRESS_BAR_LENGTH = 50
+# Minimum time between two displays of the bar on the console (in seconds)
+PROGRESS_BAR_REFRESH_INTERVAL = 0.25
+# Minimum time between two progression logs, when the standard output
+# is not a terminal (e.g. in batch jobs) (in seconds)
+PROGRESS_LOG_INTERVAL = 60
+
+
+# ===============================================================================
+# Constants relative to the benchmarks
+# ===============================================================================
+
+# Folder where the synthetic datasets, the results and the baselines are saved
+BENCHMARK_FOLDER = os.path.join( DefaultOutputFolder.OUTPUT_FOLDER, 'benchmark' )
+BENCHMARK_DATASETS_FOLDER_NAME = 'datasets'
+BENCHMARK_RESULTS_FOLDER_NAME = 'results'
+BENCHMARK_BASELINES_FOLDER_NAME = 'baselines'
+
+# Names of the databases built from the synthetic datasets
+BENCHMARK_DS_DB_NAME = 'Benchmark_DS'
+BENCHMARK_PRO_DB_NAME = 'Benchmark_PRO'
+BENCHMARK_FILT_DB_NAME = 'Benchmark_FILT'
+
+# Separator of the values provided as lists (scales, steps)
+BENCHMARK_LIST_SEPARATOR = ','
+# Default scales (number of ORFs) of the synthetic datasets, and bounds allowed
+BENCHMARK_DEFAULT_SCALES = [ 10000 ]
+BENCHMARK_MIN_SCALE = 10000
+BENCHMARK_MAX_SCALE = 10000000
+# Default seed of the random generator used to build the synthetic datasets
+BENCHMARK_DEFAULT_SEED = 1
+# Default number of times each step is run (the median of the runs is kept)
+BENCHMARK_DEFAULT_REPEATS = 1
+
+# Relative (fraction of the baseline) and absolute tolerances 
+# above which a step is considered as regressing
+  # Wall time (in seconds)
+BENCHMARK_TIME_TOLERANCE = 0.2
+BENCHMARK_TIME_MIN_DIFF = 2
+  # Startup time (in seconds)
+BENCHMARK_STARTUP_TOLERANCE = 0.2
+BENCHMARK_STARTUP_MIN_DIFF = 0.5
+  # Peak memory (in MB)
+BENCHMARK_MEMORY_TOLERANCE = 0.2
+BENCHMARK_MEMORY_MIN_DIFF = 50
+
+
+# ===============================================================================
+# Constants relative to the pipelines
+# ===============================================================================
+
+# Character starting the comments in the pipeline files
+PIPELINE_COMMENT_CHAR = '#'
+# Separator between the name of a strategy run several times in a
+# pipeline and the number of the run (used to name the telemetry stages)
+PIPELINE_STEP_RUN_SEPARATOR = '_'
+
+
+# ===============================================================================
+# Constants relative to the builds
+# ===============================================================================
+
+# Folder where the outputs of the nodes of the build and their run reports are saved
+BUILD_FOLDER = os.path.join( DefaultOutputFolder.OUTPUT_FOLDER, 'build' )
+BUILD_LOGS_FOLDER_NAME = 'logs'
+BUILD_REPORTS_FOLDER_NAME = 'reports'
+
+# Default number of nodes run at the same time
+BUILD_DEFAULT_JOBS_NB = 3
+# Time between two checks of the nodes running (in seconds)
+BUILD_POLL_INTERVAL = 1
+
+# Default release number declared in the metadata tables
+BUILD_DEFAULT_RELEASE_NB = '1.0'
+
+# Separators used in the names of the resources read and written by the nodes
+# (e.g. 'PRO:ORFTranscriptAsso.kozak' for a group of columns of a table)
+BUILD_RESOURCE_DATABASE_SEPARATOR = ':'
+BUILD_RESOURCE_GROUP_SEPARATOR = '.'
+# Prefix of the resources that are folders of exported files (e.g. 'FILE:bed')
+BUILD_RESOURCE_FILE_PREFIX = 'FILE'
+
+# Value used in the checksums for the NULL values
+BUILD_CHECKSUM_NULL_VALUE = '<NULL>'
+
+# Items of the DATABASE section of the config file that are not taken into
+# account in the fingerprints of the nodes (they do not change the content
+# of the databases)
+BUILD_CONFIG_IGNORED_ITEMS = [ CONFIG_SECTION_DATABASE_ITEM_USER_NAME,
+                               CONFIG_SECTION_DATABASE_ITEM_USER_PASSWD,
+                               CONFIG_SECTION_DATABASE_ITEM_HOST_IP,
+                               CONFIG_SECTION_DATABASE_ITEM_PORT ]
+
+# Files of the source code that are not taken into account in
+# the code version (as they may be edited prior to run the program)
+BUILD_CODE_VERSION_EXCLUDED_FILES = [ 'DefaultOutputFolder.py', 'DefaultTemporaryFolder.py' ]
+
+
 # ===============================================================================
 # Constants relative to the files created by the program
 # ===============================================================================
@@ -338,9 +522,18 @@ ANNOTATE_DATA_FOLDER = os.path.join( DefaultOutputFolder.OUTPUT_FOLDER,
 BACKUP_DATA_FOLDER = os.path.join( DefaultOutputFolder.OUTPUT_FOLDER,
                                    '.backup' )
 
+FILTER_KEYSET_CACHE_FOLDER = os.path.join( DefaultOutputFolder.OUTPUT_FOLDER,
+                                           '.filter_keysets' )
+
 # Extension to use for the file generated by the program
 # and that may be read by the program
 DENCELLORF_FILES_EXTENSION = '.dcorf'
+# Extension to use for the journals of the merging step
+MERGE_JOURNAL_FILES_EXTENSION = '.dcorfj'
+# Extension to use for the files generated by the Backup strategy
+BACKUP_FILES_EXTENSION = '.dcorfb'
+# Extension to use for the manifests of the incremental backups
+BACKUP_MANIFEST_FILES_EXTENSION = '.dcorfm'
 
 # Folder where to save files generated by the program
 # and that may be used for analysis
@@ -373,6 +566,10 @@ DEFAULT_FASTA_FILENAME = PROJECT_NAME
 
   # Default filename related to Merge strategy
 ALL_EXISTING_ORF_TR_ASSO_IDS_FILENAME = 'all_existing_orf_tr_asso_ids'
+  # Name of the journal of the merging of DSORFTranscriptAsso entries
+MERGE_JOURNAL_OTA = 'orftranscriptasso'
+  # Default filename related to DeltaMerge strategy
+DELTA_MERGE_TO_RECOMPUTE_FILENAME = 'delta_merge_to_recompute'
 
 
 # ===============================================================================
@@ -385,6 +582,35 @@ MAX_COUNT_TO_INSERT = 50000
 # Maximum number of objects that can be updated in a same commit
 MAX_COMMIT_BATCH_SIZE = 10000
 
+# Number of rows saved in each chunk of the files generated by the Backup strategy
+BACKUP_CHUNK_SIZE = 50000
+
+# Level of compression (zlib) of the chunks of the files generated by the Backup strategy
+BACKUP_COMPRESSION_LEVEL = 6
+
+# Number of entries fetched at once from the database to write the FASTA file
+FASTA_CHUNK_SIZE = 20000
+
+# Level of compression (zlib) of the blocks of the block-gzipped (BGZF) files
+BGZF_COMPRESSION_LEVEL = 6
+
+# Number of ORF entries fetched at once from the database to write the GFF3 file
+GFF_CHUNK_SIZE = 50000
+
+# Number of ORF entries fetched at once from the database to compute the content of the UTBEDContent table
+BED_CONTENT_CHUNK_SIZE = 50000
+# Maximum number of ORF IDs used in the "IN" clauses of the queries performed
+# to refresh the content of the UTBEDContent table (incremental mode)
+BED_CONTENT_QUERY_BATCH_SIZE = 500
+
+# Number of consecutive primary key values (or rows, for the tables which primary key
+# is not an integer) hashed together (range) during incremental backups
+BACKUP_INCREMENTAL_RANGE_SIZE = 50000
+# Prefix of the names of the manifest files of the incremental backups
+BACKUP_MANIFEST_FILENAME_PREFIX = 'manifest_'
+# Format of the identifiers of the incremental backups
+BACKUP_ID_FORMAT = '%Y%m%d%H%M%S'
+
 # Maximum number of characters that may be stored in a string
 # NB: Please, note that this number should never exceed 300. By default, use 250.
 MAX_LEN_STRING = 300
@@ -407,6 +633,25 @@ REPLACE_TOO_LONG_TEXT = 'TOO_LONG'
 ## Merge strategy
 # Maximum number of process that can be run in the same pool
 MAX_POOL_SIZE = 20000
+# Number of groups of DSORFTranscriptAsso merged by each process of the pool
+MERGE_DSOTA_BATCH_SIZE = 500
+# Separators used to define the partitions of a partitioned merging
+# (e.g. '1,2,3;4,5;X,Y,MT')
+MERGE_PARTITION_SEPARATOR = ';'
+MERGE_PARTITION_CHR_SEPARATOR = ','
+# Suffix added to the name of the PRO database to get the name 
+# of the partial PRO database of a partition
+MERGE_PARTITION_DB_SUFFIX = '_part'
+# Prefix of the folders where the files related to a partition are saved
+MERGE_PARTITION_FOLDER_PREFIX = 'partition_'
+# Name of the run report of the process merging a partition
+# (saved in the folder of the partition)
+MERGE_PARTITION_RUN_REPORT_FILENAME = 'runreport.json'
+# Number of ORFTranscriptAsso IDs allocated to each partition
+MERGE_PARTITION_OTA_ID_RANGE = 50000000
+# Maximum number of values used in the "IN" clauses of the queries 
+# performed on the PRO database during an incremental merging
+DELTA_MERGE_QUERY_BATCH_SIZE = 500
 # Default threshold for absolute difference in genomic lengths
 DEFAULT_MERGE_GEN_LEN_DIFF_THRESHOLD = 1
 
@@ -492,6 +737,14 @@ METATABLE_DATABASE_VERSION_NUMBER = 'db_version_number'
 METATABLE_DS_ORIGIN = 'ds_db_origin'
 METATABLE_DS_ORIGIN_DESCRIPTION = 'Name of the DS database used'
 
+METATABLE_CONTENT_VERSION = 'content_version'
+METATABLE_CONTENT_VERSION_DESCRIPTION = 'Stamp updated each time the content of the database is modified'
+
+METATABLE_BUILD_PREFIX = 'build_'
+METATABLE_BUILD_NODE_PREFIX = METATABLE_BUILD_PREFIX + 'node_'
+METATABLE_BUILD_CODE_VERSION = METATABLE_BUILD_PREFIX + 'code_version'
+METATABLE_BUILD_CODE_VERSION_DESCRIPTION = 'Version of the source code used by the last build'
+
 
 # ===============================================================================
 # Constants relative to the sequences
@@ -508,9 +761,13 @@ SEQUENCE_AMBIGUOUS_PROT_AA = 'X'
 # Default value for the threshold to use when computing the consensus sequence
 DEFAULT_SQCE_CONSENSUS_AMBIG_THRESHOLD = float( 2 ) / float( 3 )
 
+# Maximal number of consensus sequences memoized by each process
+# (cf. SequenceConsensusEngine class for more information)
+MAX_SQCE_CONSENSUS_CACHE_SIZE = 200000
+
 # Default value for the maximal difference between the max. and min. lengths of
-# DSORFTranscriptAsso to make them belong to the same group (cf. MergeStrategy
-# split_dsota_using_length() method for more information)
+# DSORFTranscriptAsso to make them belong to the same group (cf. MergeDSOTA
+# compute_length_clusters() method for more information)
 DEFAULT_MAX_LEN_DIFF_FOR_DSOTA_CLUSTERS = 3
 
 
@@ -769,4 +1026,11 @@ FILTER_INTERSECTION = 'intersection'
 
   # Union
 FILTER_UNION = 'union'
+
+# Prefix of the files in which the key sets computed by
+# the filter planner are cached
+FILTER_KEYSET_CACHE_FILENAME_PREFIX = 'keyset_'
+
+# Lines of the BED files that do not contain any region (headers)
+FILTER_BED_HEADER_PREFIXES = ( '#', 'track', 'browser' )
   
\ No newline at end of file
@@ -135,6 +135,10 @@ WARN_MERG_CONFL_TR =WARN_MERG_CONFL + 'Tr'
     ## Warnings related to conflicting information between the Genes associated to the
     #  DSTranscript merged
 WARN_MERG_CONFL_GENE_ASSO_TR =WARN_MERG_CONFL + 'GeneAssoTr'
+  ## Warnings related to the journal of the merging step
+WARN_MERG_JOURNAL = WARN_MERG + 'Journal'
+    ## Warnings related to incomplete records of the journal
+WARN_MERG_JOURNAL_TRUNC = WARN_MERG_JOURNAL + 'Trunc'
     
 
 # Warnings related to the relative coordinates
@@ -160,6 +164,12 @@ WARN_ORFANNOT_CONFL = WARN_ORFANNOT + 'Confl'
 WARN_ORFANNOT_CONFL_STRD = WARN_ORFANNOT_CONFL + 'Strd'
 
 
+# Warnings related to the filtering
+WARN_FILT = WARN_PREFIX + 'Filt'
+  ## Warnings related to the cache of the key sets
+WARN_FILT_KEYSET_CACHE = WARN_FILT + 'KeysetCache'
+
+
 # Warnings related to the metadata
 WARN_META = WARN_PREFIX + 'Meta'
   ## Warning related to the Ensembl Release
@@ -168,6 +178,12 @@ WARN_META_ENSEMBL_RELEASE = WARN_META + 'EnsemblRelease'
 WARN_META_ENSEMBL_RELEASE_CONFL = WARN_META_ENSEMBL_RELEASE + 'Confl'
 
 
+# Warnings related to the BED and bigBed files
+WARN_BED = WARN_PREFIX + 'BED'
+  ## Warnings related to chromosomes missing from the chromosome sizes file
+WARN_BED_CHROM_SIZES = WARN_BED + 'ChromSizes'
+
+
 # Warnings related Ensembl queries
 WARN_ENSEMBL = WARN_PREFIX + 'Ensembl'
   ## Warnings related to transcripts
@@ -216,12 +232,24 @@ ERR_SQL_SESSION = ERR_SQL + 'Session'
   ## Errors related to SQLite files
 ERR_SQL_FILE = ERR_SQL + 'File'
 
+# Errors related to the merging of data
+ERR_MERG = ERR_PREFIX + 'Merg'
+  ## Errors related to chromosomes not covered by the partitions of a partitioned merging
+ERR_MERG_PARTITION = ERR_MERG + 'Partition'
+
 # Errors related to DatabaseCheck
 ERR_DBCHECK = ERR_PREFIX + 'DBCheck'
 
 # Errors related to file handling
 ERR_FILEHAND = ERR_PREFIX + 'FileHand'
 
+# Errors related to the backup and restoration of databases
+ERR_BACKUP = ERR_PREFIX + 'Backup'
+  ## Errors related to incomplete or corrupted backup files
+ERR_BACKUP_FILE = ERR_BACKUP + 'File'
+  ## Errors related to missing or invalid manifests of incremental backups
+ERR_BACKUP_MANIFEST = ERR_BACKUP + 'Manifest'
+
 
 # Errors related to lift over (conversion of genomic coordinates from a version to another)
 ERR_LIFTOV = ERR_PREFIX + 'LiftOver'
@@ -265,3 +293,27 @@ ERR_SUBPROC_BASH = ERR_SUBPROC + 'Bash'
 ERR_SUBPROC_BASH_GREP = ERR_SUBPROC_BASH + 'Grep'
     ### The execution of bash command returned nothing
 ERR_SUBPROC_BASH_EMPTY = ERR_SUBPROC_BASH + 'Empty'
+
+
+# Errors related to the benchmarks
+ERR_BENCHMARK = ERR_PREFIX + 'Benchmark'
+  ## Errors related to the execution of a benchmarked strategy
+ERR_BENCHMARK_STEP = ERR_BENCHMARK + 'Step'
+  ## Errors related to performance regressions (compared to the baseline)
+ERR_BENCHMARK_REGRESSION = ERR_BENCHMARK + 'Regression'
+
+
+# Errors related to the pipelines
+ERR_PIPELINE = ERR_PREFIX + 'Pipeline'
+  ## Errors related to the content of the pipeline file
+ERR_PIPELINE_FILE = ERR_PIPELINE + 'File'
+  ## Errors related to the execution of a step of the pipeline
+ERR_PIPELINE_STEP = ERR_PIPELINE + 'Step'
+
+
+# Errors related to the builds
+ERR_BUILD = ERR_PREFIX + 'Build'
+  ## Errors related to the execution of a node of the build
+ERR_BUILD_NODE = ERR_BUILD + 'Node'
+  ## Errors related to the fingerprints of the nodes
+ERR_BUILD_FINGERPRINT = ERR_BUILD + 'Fingerprint'
@@ -1,6 +1,5 @@
 # -*- coding: utf-8 -*-
 
-from pyensembl import EnsemblRelease
 from fr.tagc.uorf.core.util.exception.DenCellORFException import DenCellORFException
 from fr.tagc.uorf.core.util.log.Logger import Logger
 
@@ -13,6 +12,15 @@ from fr.tagc.uorf.core.util.log.Logger import Logger
 #
 class EnsemblUtil( object ):
     
+    ## Class variables
+    #  ---------------
+    #
+    # Dictionary that associates to each species and annotation version
+    # the EnsemblRelease object already downloaded and indexed
+    # NB: When several strategies are run in the same process (see the
+    #     Pipeline strategy), this allows to index the database once.
+    ensembl_dbs = {}
+    
     
     ## get_ensembl_db
     #  --------------
@@ -36,10 +44,17 @@ class EnsemblUtil( object ):
     @staticmethod
     def get_ensembl_db( sp, annotation_version ):
         
+        # Return the database if it has already been downloaded and indexed
+        ensembl_db = EnsemblUtil.ensembl_dbs.get( ( sp, str( annotation_version ) ) )
+        if ( ensembl_db != None ):
+            return ensembl_db
+        
         Logger.get_instance().debug( 'EnsemblUtil.get_ensembl_db(): Downloading and indexing the Ensembl' +
                                      ' database release ' + str( annotation_version ) + 
                                      ' for ' + sp + '.' )
         
+        from pyensembl import EnsemblRelease
+        
         ensembl_db = EnsemblRelease( release = annotation_version,
                                      species = sp )
         
@@ -63,5 +78,7 @@ class EnsemblUtil( object ):
             raise DenCellORFException( 'EnsemblUtil.get_ensembl_db(): An error occurred trying to' +
                                        ' index the Ensembl database using pyensembl.', e )
         
+        EnsemblUtil.ensembl_dbs[ ( sp, str( annotation_version ) ) ] = ensembl_db
+        
         return ensembl_db
     
\ No newline at end of file
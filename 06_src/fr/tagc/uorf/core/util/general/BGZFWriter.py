@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+import os
+import struct
+import zlib
+
+
+from fr.tagc.uorf.core.util import Constants
+
+
+## BGZFWriter
+#  ==========
+#
+# This class allows to write block-gzipped (BGZF) files, i.e. files made of a
+# series of gzip members (blocks) of at most 64 kB of uncompressed data, as
+# produced by bgzip. Such files can be decompressed by any gzip tool, and can
+# be randomly accessed by the tools of the htslib suite (e.g. samtools faidx)
+# using the .gzi index generated by this class.
+#
+# See the SAM/BAM format specification for more information about the format.
+#
+class BGZFWriter( object ):
+
+    ## Class variables
+    #  ---------------
+    #
+    # Maximum size of the uncompressed data of a block
+    # NB: This is the value used by htslib, such as the compressed
+    #     data always fits in a block even if it is not compressible
+    MAX_BLOCK_DATA_SIZE = 0xff00
+
+    # Format of the header of a block (gzip header with the 'BC' extra subfield)
+    # (ID1, ID2, CM, FLG, MTIME, XFL, OS, XLEN, SI1, SI2, SLEN, BSIZE)
+    BLOCK_HEADER_FORMAT = '<BBBBIBBHBBHH'
+    # Format of the footer of a block (CRC32, ISIZE)
+    BLOCK_FOOTER_FORMAT = '<II'
+    BLOCK_OVERHEAD_SIZE = struct.calcsize( BLOCK_HEADER_FORMAT ) + struct.calcsize( BLOCK_FOOTER_FORMAT )
+
+    # Empty block marking the end of the file
+    EOF_BLOCK = '\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00\x42\x43\x02\x00\x1b\x00\x03\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+
+    # Extension of the index file
+    INDEX_FILE_EXTENSION = '.gzi'
+
+
+    ## Constructor of BGZFWriter
+    #  -------------------------
+    #
+    # Instance variables:
+    #     - file_path: String - The path to the file.
+    #     - compression_level: Integer - The level of compression (zlib).
+    #     - file: File - The file currently opened.
+    #     - buffer: List - The data not yet written in a block.
+    #     - buffer_size: Integer - The size of the data not yet written in a block.
+    #     - compressed_offset: Integer - The number of bytes written in the file.
+    #     - uncompressed_offset: Integer - The number of bytes of data written in the blocks.
+    #     - block_offsets: List - The list of ( compressed offset, uncompressed offset )
+    #                             tuples of the beginning of each block (except the first one).
+    #
+    # @param file_path: String - The path to the file.
+    # @param compression_level: Integer - The level of compression (zlib).
+    #                                     Constants.BGZF_COMPRESSION_LEVEL by default.
+    #
+    def __init__( self, file_path, compression_level=Constants.BGZF_COMPRESSION_LEVEL ):
+
+        self.file_path = file_path
+        self.compression_level = compression_level
+        self.file = open( file_path, 'wb' )
+        self.buffer = []
+        self.buffer_size = 0
+        self.compressed_offset = 0
+        self.uncompressed_offset = 0
+        self.block_offsets = []
+
+
+
+    ## write
+    #  -----
+    #
+    # This method allows to write data in the file.
+    #
+    # @param data: String - The data to write.
+    #
+    def write( self, data ):
+
+        self.buffer.append( data )
+        self.buffer_size += len( data )
+
+        if ( self.buffer_size >= BGZFWriter.MAX_BLOCK_DATA_SIZE ):
+            data = ''.join( self.buffer )
+            k = 0
+            while ( ( len( data ) - k ) >= BGZFWriter.MAX_BLOCK_DATA_SIZE ):
+                self.write_block( data[ k : k + BGZFWriter.MAX_BLOCK_DATA_SIZE ] )
+                k += BGZFWriter.MAX_BLOCK_DATA_SIZE
+            self.buffer = [ data[ k: ] ]
+            self.buffer_size = len( data ) - k
+
+
+
+    ## tell
+    #  ----
+    #
+    # This method allows to get the current position in the uncompressed data.
+    #
+    # @return Integer - The number of bytes of data written since the opening of the file.
+    #
+    def tell( self ):
+
+        return ( self.uncompressed_offset + self.buffer_size )
+
+
+
+    ## write_block
+    #  -----------
+    #
+    # This method allows to compress and write one block of data.
+    #
+    # @param data: String - The data of the block (of at most MAX_BLOCK_DATA_SIZE bytes).
+    #
+    def write_block( self, data ):
+
+        compressor = zlib.compressobj( self.compression_level, zlib.DEFLATED, -zlib.MAX_WBITS )
+        compressed_data = compressor.compress( data ) + compressor.flush()
+
+        block_size = len( compressed_data ) + BGZFWriter.BLOCK_OVERHEAD_SIZE
+        header = struct.pack( BGZFWriter.BLOCK_HEADER_FORMAT,
+                              31, 139, 8, 4, 0, 0, 255, 6, 66, 67, 2, block_size - 1 )
+        footer = struct.pack( BGZFWriter.BLOCK_FOOTER_FORMAT,
+                              zlib.crc32( data ) & 0xffffffff,
+                              len( data ) )
+
+        self.file.write( header + compressed_data + footer )
+
+        self.compressed_offset += block_size
+        self.uncompressed_offset += len( data )
+        self.block_offsets.append( ( self.compressed_offset, self.uncompressed_offset ) )
+
+
+
+    ## close
+    #  -----
+    #
+    # This method allows to write the remaining data, the end of file block
+    # and the .gzi index of the file.
+    #
+    def close( self ):
+
+        data = ''.join( self.buffer )
+        if ( len( data ) != 0 ):
+            self.write_block( data )
+        self.buffer = []
+        self.buffer_size = 0
+
+        self.file.write( BGZFWriter.EOF_BLOCK )
+        self.file.close()
+
+        # Write the index
+        with open( self.file_path + BGZFWriter.INDEX_FILE_EXTENSION, 'wb' ) as index_file:
+            index_file.write( struct.pack( '<Q', len( self.block_offsets ) ) )
+            for ( compressed_offset, uncompressed_offset ) in self.block_offsets:
+                index_file.write( struct.pack( '<QQ', compressed_offset, uncompressed_offset ) )
+
+
+
+    ## abort
+    #  -----
+    #
+    # This method allows to close and remove an incomplete file.
+    #
+    def abort( self ):
+
+        self.file.close()
+        for file_path in [ self.file_path, self.file_path + BGZFWriter.INDEX_FILE_EXTENSION ]:
+            if os.path.exists( file_path ):
+                os.remove( file_path )
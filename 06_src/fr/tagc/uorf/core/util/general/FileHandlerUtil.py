@@ -3,7 +3,6 @@
 import os
 import pickle
 import csv
-import pandas as pd
 
 
 from fr.tagc.uorf.core.util import DefaultOutputFolder
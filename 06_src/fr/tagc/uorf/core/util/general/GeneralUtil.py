@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
-import pandas as pd
 import math
+import sys
 
 from statistics import median
 
@@ -31,9 +31,14 @@ class GeneralUtil( object ):
     @staticmethod
     def is_empty( val, empty_val = Constants.EMPTY_VALUES ):
         
+        # NB: pandas is not imported by this method. The missing values specific to
+        #     pandas (e.g. NaT) may only be provided if it has already been imported
+        #     (e.g. by a parser).
+        pd = sys.modules.get( 'pandas' )
+        
         if ( ( val in empty_val ) 
-             or ( pd.isna( val ) )
-             or ( isinstance( val, float ) and ( math.isnan( val ) ) ) ):
+             or ( isinstance( val, float ) and ( math.isnan( val ) ) )
+             or ( ( pd != None ) and ( pd.isna( val ) ) ) ):
             return True
         
         else:
@@ -286,4 +291,97 @@ class GeneralUtil( object ):
             median_val = median( list_of_values )            
             
         return( min_val, max_val, median_val )        
+    
+    
+    
+    ## min_max_median_by_group
+    #  -----------------------
+    #
+    # This static method allows to get the minimal, maximal and median values 
+    # of several lists at once. All the values are regrouped in a single array,
+    # which is sorted once by group and by value, allowing to get the minimal, 
+    # maximal and median values of each group from the boundaries of the groups.
+    # It may convert all the values into a particular type (integer or float) 
+    # if necessary.
+    # NB: The values returned for each group are the same as the ones returned 
+    #     by the min_max_median_of_list() method.
+    #
+    # @param groups_of_values: List of lists - The lists from which get the maximum, minimum and median.
+    #                                          These lists have to be lists of string, integer or float.
+    #                                          None and empty lists are allowed.
+    # @param fct: String - The function to apply on each element of the lists ('int' or 'float'). 
+    #                      None by default.
+    #
+    # @return min_max_median_list: List of 3-tuples - The ( min_val, max_val, median_val ) tuple of each 
+    #                                                 group, in the order of the groups provided. 
+    #                                                 ( None, None, None ) is returned for the empty groups.
+    #
+    # @throw DenCellORFException: When the provided function is not one of those expected.
+    # @throw DenCellORFException: When the lists does contains objects which are not integer of float.
+    # 
+    @staticmethod            
+    def min_max_median_by_group( groups_of_values, fct=None ):
+        
+        min_max_median_list = [ ( None, None, None ) ] * len( groups_of_values )
+        
+        # Regroup all the values in a single list and keep
+        # track of the group to which each value belongs
+        all_values = []
+        all_groups = []
+        for ( group_nb, list_of_values ) in enumerate( groups_of_values ):
+            if ( ( list_of_values != None ) and ( len( list_of_values ) > 0 ) ):
+                all_values += list_of_values
+                all_groups += [ group_nb ] * len( list_of_values )
+        
+        if ( len( all_values ) == 0 ):
+            return min_max_median_list
+        
+        if fct:
+            # Raise an exception if the provided function is not allowed
+            if ( fct not in [ 'int', 'float' ] ):
+                raise DenCellORFException( 'GeneralUtil.min_max_median_by_group(): the function' +
+                                           ' provided to convert the element of the lists (' +
+                                           str( fct ) + ') is not one of those authorized.' +
+                                           " It has to be 'int' or 'float'." )
+            
+            all_values = map( eval( fct ), all_values )
+        
+        elif any( [ isinstance( val, str ) for val in all_values ] ):
+            raise DenCellORFException( 'GeneralUtil.min_max_median_by_group(): The provided lists' + 
+                                       ' contain strings. The elements of the lists need to be' +
+                                       ' provided as integer or float, or the "fct" option of the' +
+                                       ' method needs to be used.' )
+        
+        import numpy as np
+        
+        # Sort the values by group and then by value
+        all_values = np.array( all_values )
+        all_groups = np.array( all_groups )
+        sorted_indexes = np.lexsort( ( all_values, all_groups ) )
+        sorted_values = all_values[ sorted_indexes ]
+        
+        # Get the first position and the size of each group in the sorted array
+        ( group_nbs, starts, counts ) = np.unique( all_groups[ sorted_indexes ],
+                                                  return_index = True,
+                                                  return_counts = True )
+        
+        # Get the minimal and maximal values of each group
+        min_values = sorted_values[ starts ].tolist()
+        max_values = sorted_values[ starts + counts - 1 ].tolist()
+        
+        # Get the median of each group
+        # NB: When the group contains an odd number of values, the median is the 
+        #     middle value, otherwise it is the mean of the two middle values.
+        lower_middles = sorted_values[ starts + ( counts - 1 ) // 2 ].tolist()
+        upper_middles = sorted_values[ starts + counts // 2 ].tolist()
+        
+        for k in range( len( group_nbs ) ):
+            if ( counts[ k ] % 2 == 1 ):
+                median_val = lower_middles[ k ]
+            else:
+                median_val = ( lower_middles[ k ] + upper_middles[ k ] ) / 2.0
+                
+            min_max_median_list[ group_nbs[ k ] ] = ( min_values[ k ], max_values[ k ], median_val )
+        
+        return min_max_median_list
     
\ No newline at end of file
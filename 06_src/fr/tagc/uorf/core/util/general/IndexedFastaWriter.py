@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+
+from fr.tagc.uorf.core.util.general.BGZFWriter import BGZFWriter
+
+
+## IndexedFastaWriter
+#  ==================
+#
+# This class allows to write a FASTA file, sequence by sequence, and to build
+# at the same time its .fai index (as generated by samtools faidx). The FASTA
+# file may be block-gzipped (BGZF), in which case a .gzi index is also written,
+# allowing the tools of the htslib suite to randomly access the sequences.
+#
+# Each line of the .fai index contains the name of the sequence (i.e. the first
+# word of its header), its length, the offset of its first base in the
+# (uncompressed) file, the number of bases per line and the number of bytes per line.
+#
+class IndexedFastaWriter( object ):
+
+    ## Class variables
+    #  ---------------
+    #
+    # Extension of the index file
+    INDEX_FILE_EXTENSION = '.fai'
+
+    # Extension of the block-gzipped files
+    BGZF_FILE_EXTENSION = '.gz'
+
+
+    ## Constructor of IndexedFastaWriter
+    #  ---------------------------------
+    #
+    # Instance variables:
+    #     - file_path: String - The path to the FASTA file.
+    #     - line_length: Integer - The maximum number of characters of the sequence per line.
+    #     - compress: Boolean - Is the file block-gzipped?
+    #     - file: BGZFWriter / File - The file currently opened.
+    #     - index_file: File - The .fai index file currently opened.
+    #     - sequence_count: Integer - The number of sequences written.
+    #
+    # @param file_path: String - The path to the FASTA file (without the .gz extension).
+    # @param line_length: Integer - The maximum number of characters of the sequence per line.
+    # @param compress: Boolean - Should the file be block-gzipped? True by default.
+    #
+    def __init__( self, file_path, line_length, compress=True ):
+
+        self.compress = compress
+        if compress:
+            self.file_path = file_path + IndexedFastaWriter.BGZF_FILE_EXTENSION
+            self.file = BGZFWriter( self.file_path )
+        else:
+            self.file_path = file_path
+            self.file = open( self.file_path, 'wb' )
+
+        self.line_length = line_length
+        self.index_file = open( self.file_path + IndexedFastaWriter.INDEX_FILE_EXTENSION, 'wb' )
+        self.sequence_count = 0
+
+
+
+    ## write_sequence
+    #  --------------
+    #
+    # This method allows to write a sequence in the FASTA file and in its index.
+    #
+    # @param header: String - The header of the sequence (without the leading '>').
+    # @param sequence: String - The sequence.
+    #
+    def write_sequence( self, header, sequence ):
+
+        if isinstance( header, unicode ):
+            header = header.encode( 'utf-8' )
+        if isinstance( sequence, unicode ):
+            sequence = sequence.encode( 'utf-8' )
+
+        self.file.write( '>' + header + '\n' )
+        offset = self.file.tell()
+
+        # Split the sequence if it has to be written on several lines
+        self.file.write( '\n'.join( [ sequence[ k : k + self.line_length ] for k in range( 0, len( sequence ), self.line_length ) ] ) + '\n' )
+
+        self.index_file.write( '\t'.join( [ header.split()[ 0 ],
+                                            str( len( sequence ) ),
+                                            str( offset ),
+                                            str( self.line_length ),
+                                            str( self.line_length + 1 ) ] ) + '\n' )
+        self.sequence_count += 1
+
+
+
+    ## close
+    #  -----
+    #
+    # This method allows to close the FASTA file and its index(es).
+    #
+    def close( self ):
+
+        self.file.close()
+        self.index_file.close()
+
+
+
+    ## abort
+    #  -----
+    #
+    # This method allows to close and remove the FASTA file and its index(es).
+    #
+    def abort( self ):
+
+        if self.compress:
+            self.file.abort()
+        else:
+            self.file.close()
+            if os.path.exists( self.file_path ):
+                os.remove( self.file_path )
+
+        self.index_file.close()
+        if os.path.exists( self.file_path + IndexedFastaWriter.INDEX_FILE_EXTENSION ):
+            os.remove( self.file_path + IndexedFastaWriter.INDEX_FILE_EXTENSION )
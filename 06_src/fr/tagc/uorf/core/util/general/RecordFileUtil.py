@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import struct
+import zlib
+
+
+## RecordFileUtil
+#  ==============
+#
+# This class contains the static methods allowing to write and read the binary
+# files made of successive records (e.g. the journals of the Merge strategy and
+# the files of the Backup strategy).
+#
+# Each record is made of a header (record type, length and CRC32 checksum of the
+# payload) followed by the payload (a zlib-compressed pickle). Hence, the header
+# of a record allows to check its payload or to skip it without loading it.
+#
+class RecordFileUtil( object ):
+
+    ## Class variables
+    #  ---------------
+    #
+    # Format of the record headers
+    # ( record type, payload length, payload CRC32 )
+    HEADER_FORMAT = '>BII'
+    HEADER_SIZE = struct.calcsize( HEADER_FORMAT )
+
+    # Default level of compression of the payloads
+    DEFAULT_COMPRESSION_LEVEL = 6
+
+
+    ## pack_record
+    #  -----------
+    #
+    # This is a static method that allows to get the bytes of a record.
+    #
+    # @param record_type: Integer - The type of record.
+    # @param content: Object - The content of the record (any object that can be pickled).
+    # @param compression_level: Integer - The level of compression of the payload.
+    #                                     DEFAULT_COMPRESSION_LEVEL by default.
+    #
+    # @return String - The header followed by the payload of the record.
+    #
+    @staticmethod
+    def pack_record( record_type, content, compression_level=DEFAULT_COMPRESSION_LEVEL ):
+
+        payload = zlib.compress( pickle.dumps( content, pickle.HIGHEST_PROTOCOL ), compression_level )
+        header = struct.pack( RecordFileUtil.HEADER_FORMAT,
+                              record_type,
+                              len( payload ),
+                              zlib.crc32( payload ) & 0xffffffff )
+
+        return ( header + payload )
+
+
+
+    ## read_record
+    #  -----------
+    #
+    # This is a static method that allows to read the record located at the
+    # current position of an opened file.
+    #
+    # When the content is not loaded, the payload may either be read in order
+    # to check its CRC32 checksum (without decompressing it), or skipped.
+    #
+    # @param record_file: File - The file opened in binary mode.
+    # @param load_content: Boolean - Should the content of the record be loaded?
+    #                                True by default.
+    # @param check_payload: Boolean - Should the payload be read and checked when the
+    #                                 content is not loaded? True by default.
+    #
+    # @return 2-tuple / None - The ( record type, content ) tuple (the content is None if
+    #                          load_content is False), or None if there is no complete
+    #                          and valid record at this position (including when the end
+    #                          of the file has been reached).
+    #
+    @staticmethod
+    def read_record( record_file, load_content=True, check_payload=True ):
+
+        header = record_file.read( RecordFileUtil.HEADER_SIZE )
+        if ( len( header ) < RecordFileUtil.HEADER_SIZE ):
+            return None
+
+        ( record_type, payload_length, payload_crc ) = struct.unpack( RecordFileUtil.HEADER_FORMAT, header )
+
+        # Skip the payload, making sure it is complete
+        if ( ( not load_content ) and ( not check_payload ) ):
+            payload_end = record_file.tell() + payload_length
+            if ( payload_end > os.fstat( record_file.fileno() ).st_size ):
+                return None
+            record_file.seek( payload_end )
+            return ( record_type, None )
+
+        payload = record_file.read( payload_length )
+        if ( ( len( payload ) < payload_length )
+             or ( ( zlib.crc32( payload ) & 0xffffffff ) != payload_crc ) ):
+            return None
+
+        if load_content:
+            content = pickle.loads( zlib.decompress( payload ) )
+        else:
+            content = None
+
+        return ( record_type, content )
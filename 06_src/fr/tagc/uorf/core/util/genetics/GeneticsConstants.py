@@ -58,3 +58,30 @@ GENETIC_CODE_DNA_SINGLE_LETTER = {
 
 # List of stop codon nucleic sequences
 STOP_CODON_SEQUENCES = [ 'TAA', 'TGA', 'TAG' ]
+
+
+
+# ===============================================================================
+# Genomic binning
+# ===============================================================================
+
+'''
+    The genomic features (ORFs, transcripts) are assigned to the smallest bin 
+    fully containing them, using the standard binning scheme of the UCSC genome 
+    browser (see Kent et al., Genome Research, 2002). The bins are organized in
+    5 levels, from 128 kb bins (level 4) to one single 512 Mb bin (level 0), each
+    bin of a level containing 8 bins of the next level.
+'''
+
+# Number of bits of the positions ignored to compute the bins of the finest level (128 kb)
+GENOMIC_BIN_FIRST_SHIFT = 17
+
+# Number of bits to shift to go from a level to the next coarser one
+GENOMIC_BIN_NEXT_SHIFT = 3
+
+# Offsets of the bins of each level, from the finest to the coarsest
+GENOMIC_BIN_OFFSETS = [ 512 + 64 + 8 + 1, 64 + 8 + 1, 8 + 1, 1, 0 ]
+
+# Maximal position (0-based, exclusive) covered by the binning scheme.
+# The features ending after this position are assigned to the bin 0.
+GENOMIC_BIN_MAX_POSITION = 2 ** 29
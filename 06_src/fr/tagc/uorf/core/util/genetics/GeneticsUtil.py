@@ -1,21 +1,12 @@
 # -*- coding: utf-8 -*-
 
-import os
-
 from collections import Counter
 
-from Bio.Alphabet import generic_dna, generic_protein
-from Bio.Seq import Seq
-from Bio.SeqRecord import SeqRecord
-from Bio import SeqIO, AlignIO
-from Bio.Align.Applications import MuscleCommandline
-from Bio.Align import AlignInfo
-
 
-from fr.tagc.uorf.core.util import DefaultTemporaryFolder
 from fr.tagc.uorf.core.util import Constants
 from fr.tagc.uorf.core.util import LogCodes
 from fr.tagc.uorf.core.util.genetics import GeneticsConstants
+from fr.tagc.uorf.core.util.genetics.SequenceConsensusEngine import SequenceConsensusEngine
 from fr.tagc.uorf.core.util.exception.DenCellORFException import DenCellORFException
 from fr.tagc.uorf.core.util.exception.geneticsexception.TranslateDNAException import TranslateDNAException
 from fr.tagc.uorf.core.util.log.Logger import Logger
@@ -69,6 +60,9 @@ class GeneticsUtil( object ):
             dna_seq = dna_seq[ : -remainder ]
             
         # Translate the DNA sequence into protein using Biopython
+        from Bio.Alphabet import generic_dna
+        from Bio.Seq import Seq
+        
         dna_sequence = Seq( dna_seq, generic_dna )
         aa_seq = str( dna_sequence.translate( table = 1, 
                                               stop_symbol = stop_codon, 
@@ -101,7 +95,10 @@ class GeneticsUtil( object ):
     #
     # This is a static method that allows to find a consensus
     # from several DNA or protein sequences.
-    # This sequence uses MUSCLE algorithm to compute the consensus.
+    # The consensus is computed by the SequenceConsensusEngine, which directly 
+    # computes it when all the sequences have the same length, and uses MUSCLE 
+    # algorithm to align the sequences otherwise (see the documentation of this
+    # class for more information).
     # 
     # @param list_of_sequences: List of strings - The list of sequences that needs 
     #                                             to be use to find the consensus.
@@ -115,7 +112,6 @@ class GeneticsUtil( object ):
     #                           to get the letter 'X' at a given place to include this letter at this 
     #                           place in the consensus; otherwise the ambiguous letter will be added 
     #                           at this place.
-    # @param fasta_end_name: String - The string to add at the end of the fasta file name (Optional).
     #
     # @return str( consensus ) - The consensus sequence computed.
     # 
@@ -123,59 +119,11 @@ class GeneticsUtil( object ):
     #
     @staticmethod
     def find_sqce_consensus( list_of_sequences, sqce_type=Constants.SEQUENCE_TYPE_DNA, \
-                             threshold=Constants.DEFAULT_SQCE_CONSENSUS_AMBIG_THRESHOLD, \
-                             fasta_end_name = '' ):
-                
-        if ( sqce_type == Constants.SEQUENCE_TYPE_DNA ):
-            alphabet = generic_dna
-            ambiguous = Constants.SEQUENCE_AMBIGUOUS_DNA_BASE
-            
-        elif ( sqce_type == Constants.SEQUENCE_TYPE_PROT ):
-            alphabet = generic_protein
-            ambiguous = Constants.SEQUENCE_AMBIGUOUS_PROT_AA
-        
-        else:
-            raise DenCellORFException( 'MergeStrategy.find_sqce_consensus(): The type of sequence provided' +
-                                       ' has to be ' + Constants.SEQUENCE_TYPE_DNA + ' or ' +
-                                       Constants.SEQUENCE_TYPE_PROT + 
-                                       ' (provided type: ' + str( sqce_type ) + ').' )
-        
-        # Store the input sequences in a fasta file in order to run Muscle
-        input_sequences = ( SeqRecord( Seq( s, alphabet) ) for s in list_of_sequences )
-        
-        if ( not os.path.exists( DefaultTemporaryFolder.TEMPORARY_FOLDER ) ):
-            os.makedirs( DefaultTemporaryFolder.TEMPORARY_FOLDER )
-            
-        input_sequences_file = os.path.join( DefaultTemporaryFolder.TEMPORARY_FOLDER, 
-                                             'input_sequences' + fasta_end_name + '.fasta' )
-        SeqIO.write( input_sequences, input_sequences_file, 'fasta' )
-        
-        
-        # Perform the multiple sequences alignment and 
-        # store the output in a fasta file
-        aligned_sequences_file = os.path.join( DefaultTemporaryFolder.TEMPORARY_FOLDER, 
-                                               'aligned_sequences' + fasta_end_name + '.fasta' )
-        muscle_cline = MuscleCommandline( cmd = '/bin/muscle',
-                                          input = input_sequences_file,
-                                          out = aligned_sequences_file )
+                             threshold=Constants.DEFAULT_SQCE_CONSENSUS_AMBIG_THRESHOLD ):
         
-        ( stdout, stderr ) = muscle_cline()
-        
-        
-        # Read the fasta file containing aligned sequences
-        align = AlignIO.read( aligned_sequences_file, 'fasta' )
-        
-        summary_align = AlignInfo.SummaryInfo( align )
-        
-        
-        # Compute the consensus
-        consensus = summary_align.gap_consensus( threshold = threshold, 
-                                                 ambiguous = ambiguous )
-        
-        
-        # Remove the temporary fasta files
-        os.remove( input_sequences_file )
-        os.remove( aligned_sequences_file )
+        consensus = SequenceConsensusEngine.get_instance().find_consensus( list_of_sequences = list_of_sequences,
+                                                                           sqce_type = sqce_type,
+                                                                           threshold = threshold )
         
         return str( consensus )
 
@@ -258,3 +206,83 @@ class GeneticsUtil( object ):
             consensus = ''.join( nt_consensus )
             
         return consensus
+
+
+    
+    ## get_genomic_bin
+    #  ---------------
+    #
+    # This is a static method that allows to get the genomic bin of a feature,
+    # i.e. the smallest bin of the UCSC binning scheme that fully contains it
+    # (see the documentation of the GeneticsConstants module for more information).
+    # 
+    # @param start_pos: Integer - The genomic coordinates of the first nucleotide 
+    #                             of the feature (1-based).
+    # @param end_pos: Integer - The genomic coordinates of the last nucleotide 
+    #                           of the feature (1-based, included).
+    #
+    # @return Integer - The genomic bin of the feature, or None if one of the
+    #                   coordinates is missing.
+    #
+    @staticmethod
+    def get_genomic_bin( start_pos, end_pos ):
+        
+        if ( ( start_pos == None ) or ( end_pos == None ) ):
+            return None
+        
+        # Convert the coordinates into 0-based, half-open coordinates
+        bin_start = min( start_pos, end_pos ) - 1
+        bin_end = max( start_pos, end_pos )
+        
+        if ( bin_end > GeneticsConstants.GENOMIC_BIN_MAX_POSITION ):
+            return 0
+        
+        start_bin = max( bin_start, 0 ) >> GeneticsConstants.GENOMIC_BIN_FIRST_SHIFT
+        end_bin = ( bin_end - 1 ) >> GeneticsConstants.GENOMIC_BIN_FIRST_SHIFT
+        
+        for bin_offset in GeneticsConstants.GENOMIC_BIN_OFFSETS:
+            if ( start_bin == end_bin ):
+                return ( bin_offset + start_bin )
+            start_bin >>= GeneticsConstants.GENOMIC_BIN_NEXT_SHIFT
+            end_bin >>= GeneticsConstants.GENOMIC_BIN_NEXT_SHIFT
+        
+        return 0
+
+
+    
+    ## get_overlapping_genomic_bins
+    #  ----------------------------
+    #
+    # This is a static method that allows to get the list of all the genomic bins
+    # that may contain a feature overlapping the region provided.
+    # 
+    # @param start_pos: Integer - The genomic coordinates of the first nucleotide 
+    #                             of the region (1-based).
+    # @param end_pos: Integer - The genomic coordinates of the last nucleotide 
+    #                           of the region (1-based, included).
+    #
+    # @return overlapping_bins: List - The list of genomic bins.
+    #
+    @staticmethod
+    def get_overlapping_genomic_bins( start_pos, end_pos ):
+        
+        # Convert the coordinates into 0-based, half-open coordinates,
+        # restricted to the positions covered by the binning scheme
+        bin_start = max( min( start_pos, end_pos ) - 1, 0 )
+        bin_end = min( max( start_pos, end_pos ), GeneticsConstants.GENOMIC_BIN_MAX_POSITION )
+        
+        # NB: The bin 0 contains all the features ending after the maximal
+        #     position, hence it is always returned
+        if ( bin_start >= bin_end ):
+            return [ 0 ]
+        
+        start_bin = bin_start >> GeneticsConstants.GENOMIC_BIN_FIRST_SHIFT
+        end_bin = ( bin_end - 1 ) >> GeneticsConstants.GENOMIC_BIN_FIRST_SHIFT
+        
+        overlapping_bins = []
+        for bin_offset in GeneticsConstants.GENOMIC_BIN_OFFSETS:
+            overlapping_bins += range( bin_offset + start_bin, bin_offset + end_bin + 1 )
+            start_bin >>= GeneticsConstants.GENOMIC_BIN_NEXT_SHIFT
+            end_bin >>= GeneticsConstants.GENOMIC_BIN_NEXT_SHIFT
+        
+        return overlapping_bins
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import subprocess
+
+from collections import Counter
+from StringIO import StringIO
+
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
+from fr.tagc.uorf.core.util.exception.DenCellORFException import DenCellORFException
+
+
+## SequenceConsensusEngine
+#  =======================
+#
+# This class is a singleton allowing to compute consensus of DNA
+# or protein sequences without using any temporary file:
+# - When all the sequences of a group have the same length (which is
+#   the most frequent case for ORF sequences), the consensus is directly
+#   computed column by column, without performing any alignment.
+# - Otherwise, the sequences are aligned by a MUSCLE process fed
+#   through its standard input, and the alignment is read from its
+#   standard output.
+# The consensus computed are memoized in a dictionary using as key a hash
+# of the sorted list of sequences (i.e. of the multiset of sequences), the
+# type of sequences and the threshold used, such as the consensus of a same
+# group of sequences is only computed once by process.
+# NB: As each process of a pool gets its own copy of the instance, this
+#     class does not need to access any shared resource.
+#
+class SequenceConsensusEngine( object ):
+
+    __instance = None
+
+    ## Class variables
+    #  ---------------
+    #
+    # Command to use to run MUSCLE
+    MUSCLE_CMD = [ '/bin/muscle', '-quiet' ]
+
+
+    ## Constructor of SequenceConsensusEngine
+    #  --------------------------------------
+    #
+    # Instance variables:
+    #     - consensus_cache: Dictionary - The dictionary that associates to the key
+    #                                     of each group of sequences its consensus.
+    #
+    def __init__( self ):
+
+        self.consensus_cache = {}
+
+
+    ## get_instance
+    #  ------------
+    #
+    # First time create an instance of SequenceConsensusEngine, then return this instance.
+    #
+    # @return the singleton instance
+    #
+    @staticmethod
+    def get_instance():
+
+        if ( SequenceConsensusEngine.__instance == None ):
+            SequenceConsensusEngine.__instance = SequenceConsensusEngine()
+
+        return SequenceConsensusEngine.__instance
+
+
+
+    ## get_ambiguous_letter
+    #  --------------------
+    #
+    # This is a static method that allows to get the letter to use
+    # for an ambiguous position of the consensus.
+    #
+    # @param sqce_type: String - The type of sequence. Should equal 'DNA' or 'PROT'.
+    #
+    # @return String - The ambiguous letter.
+    #
+    # @throw DenCellORFException: When the provided sequence type is not 'DNA' or 'PROT'.
+    #
+    @staticmethod
+    def get_ambiguous_letter( sqce_type ):
+
+        if ( sqce_type == Constants.SEQUENCE_TYPE_DNA ):
+            return Constants.SEQUENCE_AMBIGUOUS_DNA_BASE
+
+        elif ( sqce_type == Constants.SEQUENCE_TYPE_PROT ):
+            return Constants.SEQUENCE_AMBIGUOUS_PROT_AA
+
+        else:
+            raise DenCellORFException( 'SequenceConsensusEngine.get_ambiguous_letter(): The type of' +
+                                       ' sequence provided has to be ' + Constants.SEQUENCE_TYPE_DNA +
+                                       ' or ' + Constants.SEQUENCE_TYPE_PROT +
+                                       ' (provided type: ' + str( sqce_type ) + ').' )
+
+
+
+    ## get_cache_key
+    #  -------------
+    #
+    # This is a static method that allows to compute the key used to
+    # memoize the consensus of a group of sequences.
+    #
+    # @param list_of_sequences: List of strings - The list of sequences.
+    # @param sqce_type: String - The type of sequence.
+    # @param threshold: Float - The threshold used to compute the consensus.
+    #
+    # @return Tuple - The key of the group of sequences.
+    #
+    @staticmethod
+    def get_cache_key( list_of_sequences, sqce_type, threshold ):
+
+        sqce_hash = hashlib.sha1( '\n'.join( sorted( list_of_sequences ) ) ).hexdigest()
+
+        return ( sqce_type, threshold, sqce_hash )
+
+
+
+    ## find_consensus
+    #  --------------
+    #
+    # This method allows to find a consensus from several DNA or protein sequences.
+    #
+    # @param list_of_sequences: List of strings - The list of sequences that needs
+    #                                             to be use to find the consensus.
+    # @param sqce_type: String - The type of sequence to compare. Should equal 'DNA' or 'PROT'.
+    # @param threshold: Float - The threshold value required to add a particular letter to the
+    #                           sequence (see the documentation of the column_consensus() method
+    #                           for more information).
+    #
+    # @return consensus: String - The consensus sequence computed.
+    #
+    # @throw DenCellORFException: When the provided sequence type is not 'DNA' or 'PROT'.
+    #
+    def find_consensus( self, list_of_sequences, sqce_type, threshold ):
+
+        ambiguous = SequenceConsensusEngine.get_ambiguous_letter( sqce_type )
+
+        list_of_sequences = [ str( s ) for s in list_of_sequences ]
+
+        # Get the consensus from the cache if it has already been computed
+        cache_key = SequenceConsensusEngine.get_cache_key( list_of_sequences, sqce_type, threshold )
+        consensus = self.consensus_cache.get( cache_key )
+
+        if ( consensus != None ):
+            return consensus
+
+        # If all the sequences have the same length, directly compute
+        # the consensus without performing the alignment
+        if ( len( set( [ len( s ) for s in list_of_sequences ] ) ) == 1 ):
+            aligned_sequences = list_of_sequences
+
+        # Otherwise, align the sequences first
+        else:
+            aligned_sequences = self.align_sequences( list_of_sequences )
+
+        consensus = SequenceConsensusEngine.column_consensus( aligned_sequences = aligned_sequences,
+                                                              threshold = threshold,
+                                                              ambiguous = ambiguous )
+
+        # Store the consensus in the cache, after having
+        # emptied it if it reached its maximal size
+        if ( len( self.consensus_cache ) >= Constants.MAX_SQCE_CONSENSUS_CACHE_SIZE ):
+            self.consensus_cache = {}
+        self.consensus_cache[ cache_key ] = consensus
+
+        return consensus
+
+
+
+    ## align_sequences
+    #  ---------------
+    #
+    # This method allows to perform the multiple alignment of several sequences
+    # using MUSCLE. The sequences are provided to the process through its standard
+    # input (in fasta format) and the alignment is read from its standard output.
+    #
+    # @param list_of_sequences: List of strings - The list of sequences to align.
+    #
+    # @return List of strings - The list of aligned sequences.
+    #
+    # @throw DenCellORFException: When MUSCLE exits with an error.
+    #
+    def align_sequences( self, list_of_sequences ):
+
+        input_fasta = ''.join( [ '>' + str( k ) + '\n' + list_of_sequences[ k ] + '\n' \
+                                 for k in range( len( list_of_sequences ) ) ] )
+
+        muscle_process = subprocess.Popen( SequenceConsensusEngine.MUSCLE_CMD,
+                                           stdin = subprocess.PIPE,
+                                           stdout = subprocess.PIPE,
+                                           stderr = subprocess.PIPE )
+        ( stdout, stderr ) = muscle_process.communicate( input_fasta )
+
+        if ( muscle_process.returncode != 0 ):
+            raise DenCellORFException( 'SequenceConsensusEngine.align_sequences(): MUSCLE exited with' +
+                                       ' the return code ' + str( muscle_process.returncode ) +
+                                       ' when trying to align ' + str( len( list_of_sequences ) ) +
+                                       ' sequences. \n' + str( stderr ) +
+                                       ' Error code: ' + LogCodes.ERR_SUBPROC_BASH + '.' )
+
+        from Bio import SeqIO
+        
+        return [ str( record.seq ) for record in SeqIO.parse( StringIO( stdout ), 'fasta' ) ]
+
+
+
+    ## column_consensus
+    #  ----------------
+    #
+    # This is a static method that allows to compute the consensus of sequences
+    # of same length (either aligned sequences or sequences of equal lengths),
+    # column by column.
+    # For each position, the letter found the highest number of times is added to
+    # the consensus if its proportion is higher or equal to the threshold and if
+    # there is no other letter found the same number of times. Otherwise, the
+    # ambiguous letter is added at this position.
+    # NB: This gives the same result as the gap_consensus() method of the
+    #     Bio.Align.AlignInfo.SummaryInfo class.
+    #
+    # @param aligned_sequences: List of strings - The list of sequences.
+    # @param threshold: Float - The threshold value required to add a particular letter to the
+    #                           sequence, i.e. the proportion of sequences of the list that needs
+    #                           to contain the letter at a particular place to consider it as part
+    #                           of the consensus.
+    # @param ambiguous: String - The letter to use for an ambiguous position.
+    #
+    # @return String - The consensus sequence.
+    #
+    @staticmethod
+    def column_consensus( aligned_sequences, threshold, ambiguous ):
+
+        consensus = []
+
+        for column in zip( *aligned_sequences ):
+
+            letter_counts = Counter( column ).most_common( 2 )
+            ( max_letter, max_count ) = letter_counts[ 0 ]
+
+            if ( ( ( len( letter_counts ) == 1 ) or ( letter_counts[ 1 ][ 1 ] != max_count ) )
+                 and ( ( float( max_count ) / float( len( column ) ) ) >= threshold ) ):
+                consensus.append( max_letter )
+            else:
+                consensus.append( ambiguous )
+
+        return ''.join( consensus )
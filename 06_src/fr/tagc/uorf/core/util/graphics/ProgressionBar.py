@@ -1,7 +1,15 @@
 # -*- coding: utf-8 -*-
 
+import multiprocessing
+import os
 import sys
+import threading
 import time
+from datetime import timedelta
+
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util.log.Logger import Logger
 
 
 ## ProgressionBar
@@ -9,125 +17,288 @@ import time
 #
 # This class is a singleton allowing to display a progression bar on the console.
 #
+# The bar displays the percentage of completion, the number of rows processed,
+# the throughput (rows per second) and the estimated time remaining. In order
+# not to slow down the loops over a large number of rows, the bar is displayed
+# at most every Constants.PROGRESS_BAR_REFRESH_INTERVAL seconds (and when the
+# process is completed). When the standard output is not a terminal (e.g. in
+# batch jobs), the progression is logged (info level) at most every
+# Constants.PROGRESS_LOG_INTERVAL seconds instead.
+#
+# The increments of the processes forked by the program (e.g. by the workers of
+# the pools) are added to a shared memory counter, hence the progression may be
+# increased from any process using the increase() method (the increments of the
+# main process are counted locally). Only the main process displays the bar.
+# To follow the progression while the main process waits for the workers, the
+# instance may be used as a context manager, e.g.:
+#     with ProgressionBar.get_instance():
+#         results = p.map( function, args )
+# in which case the bar is displayed by a background thread.
+#
 class ProgressionBar( object ):
-        
+
     __instance = None
-    
+
+    ## Class variables
+    #  ---------------
+    #
+    # Shared memory counter storing the increments of the forked processes
+    # NB: This counter is instantiated when the module is imported (by the main
+    #     process), so it is inherited by all the processes forked later.
+    shared_count = multiprocessing.Value( 'l', 0 )
+
+    # ID of the main process (the only one displaying the bar)
+    main_pid = os.getpid()
+
+
     ## Constructor of ProgressionBar
     #  -----------------------------
     #
     # Instance variable:
-    #     - progression_count: Integer - The value at which the process is considered completed.
-    #     - total: Integer - The current value of the process.
+    #     - local_count: Integer - The progression count of the main process.
+    #     - total_row_count: Integer - The value at which the process is considered completed.
+    #     - start_count: Integer - The progression count when the progression started to be followed.
+    #     - start_time: Float - The time at which the progression started to be followed.
+    #     - last_display_time: Float - The time at which the progression has been displayed for the last time
+    #                                  (or started to be followed).
+    #     - finished: Boolean - Has the completion of the process already been displayed?
+    #     - is_tty: Boolean - Is the standard output a terminal?
+    #     - display_interval: Float - The minimum time between two displays (in seconds).
+    #     - display_lock: Lock - The lock preventing two threads to display the bar at the same time.
+    #     - display_thread: Thread - The background thread displaying the bar (if running).
+    #     - stop_event: Event - The event used to stop the background thread.
     #
     # @param progress: Integer - The current value of the process. Equals 0 by default.
-    # @param total: Integer - The value at which the process is considered finished. 
+    # @param total: Integer - The value at which the process is considered finished.
     #                         Equals 1 by default.
     #
     def __init__( self, progress=0, total=1 ):
-        
-        self.progression_count = progress
-        self.total_row_count = total
-            
+
+        self.is_tty = sys.stdout.isatty()
+        self.display_interval = ( Constants.PROGRESS_BAR_REFRESH_INTERVAL if self.is_tty else Constants.PROGRESS_LOG_INTERVAL )
+        self.display_lock = threading.Lock()
+        self.display_thread = None
+        self.stop_event = threading.Event()
+
+        self.reset_instance( progress = progress, total = total )
+
+
+    ## progression_count
+    #  -----------------
+    #
+    # The current value of the process (increments of the main process
+    # and of the forked processes).
+    #
+    @property
+    def progression_count( self ):
+
+        return self.local_count + ProgressionBar.shared_count.value
+
 
     ## increase_and_display
     #  --------------------
     #
-    # This method allows to increase the progression count of the provided value 
-    # (or one by default) and to display the progression bar on the console.
+    # This method allows to increase the progression count of the provided value
+    # (or one by default) and to display the progression bar on the console
+    # (if it has not been displayed recently).
     #
     # @param add_val: Integer - The value to add to the progression count.
     #                           Equals 1 by default.
     #
-    def increase_and_display( self, add_val=1 ): 
-        
+    def increase_and_display( self, add_val=1 ):
+
         self.increase( add_val = add_val )
         self.display()
-            
+
 
     ## increase
     #  --------
     #
-    # This method allows to increase the progression count of 
+    # This method allows to increase the progression count of
     # the provided value (or one if no value if provided).
+    # It may be called from any process.
     #
-    # @param add_val: Integer - The value to add to the progression count. 
+    # @param add_val: Integer - The value to add to the progression count.
     #                           Equals 1 by default.
     #
     def increase( self, add_val=1 ):
-        
-        self.progression_count += add_val
-        
-        
+
+        if ( os.getpid() == ProgressionBar.main_pid ):
+            self.local_count += add_val
+        else:
+            with ProgressionBar.shared_count.get_lock():
+                ProgressionBar.shared_count.value += add_val
+
+
     ## display
     #  -------
     #
-    # This method allows to display a progression bar on the console.
+    # This method allows to display a progression bar on the console (or to log
+    # the progression if the standard output is not a terminal), if it has not
+    # been displayed for a while or if the process is completed.
+    # Nothing is displayed by the processes forked by the program.
+    #
+    # @param force: Boolean - Should the bar be displayed even if it has been
+    #                         displayed recently? False by default.
     #
-    def display( self ):
-        
-        # Set the bar length
-        bar_length = 50
-        status = ''
-        
+    def display( self, force=False ):
+
+        if self.finished:
+            return
+
+        # Check as quickly as possible if the bar has been displayed recently
+        now = time.time()
+        if ( ( not force )
+             and ( ( now - self.last_display_time ) < self.display_interval )
+             and ( self.local_count < self.total_row_count ) ):
+            return
+
+        if ( os.getpid() != ProgressionBar.main_pid ):
+            return
+
+        progression_count = self.progression_count
+
         if ( self.total_row_count > 0 ):
-            progress = float( self.progression_count ) / float( self.total_row_count )
+            progress = min( float( progression_count ) / float( self.total_row_count ), 1 )
         else:
             progress = 1
-        
-        # If the process is finished, set the progress variable to 1
-        if ( progress >= 1 ):
-            progress = 1
-        
-        # Get the size of the block corresponding to the accomplished process
-        block = int( round( bar_length * progress ) )
-        
-        # Create the progression bar
-        # This will display the bar on a new line and add '=' 
-        # for the part of the process which is completed.
-        # Return to the line if the process is finished.
-        text = "\r[{}] {:.0f} % ".format( '=' * block + ' ' * ( bar_length - block ),
-                                           round( progress * 100, 0 ) )
-        
-        # Display the bar on the console and flush it
-        sys.stdout.write( text )
-        sys.stdout.flush()
-        
-        # If the process has finished, let the progression bar at 100% 
-        # and go to the next line
-        if ( progress == 1 ):
-            sys.stdout.write( '\n' )
-            
+
+        with self.display_lock:
+            if self.finished:
+                return
+            self.last_display_time = now
+
+            # Compute the throughput and the estimated time remaining
+            elapsed_time = now - self.start_time
+            processed_count = progression_count - self.start_count
+            if ( ( elapsed_time > 0 ) and ( processed_count > 0 ) ):
+                throughput = processed_count / elapsed_time
+                eta = str( timedelta( seconds = int( max( self.total_row_count - progression_count, 0 ) / throughput ) ) )
+            else:
+                throughput = 0
+                eta = '-'
+
+            details = '{}/{} | {:.1f} rows/s | ETA {}'.format( progression_count, self.total_row_count,
+                                                                 throughput, eta )
+
+            if self.is_tty:
+                # Get the size of the block corresponding to the accomplished process
+                block = int( round( Constants.PROGRESS_BAR_LENGTH * progress ) )
+
+                # Create the progression bar
+                # This will display the bar on the same line and add '='
+                # for the part of the process which is completed.
+                text = '\r[{}] {:.0f} % | {} '.format( '=' * block + ' ' * ( Constants.PROGRESS_BAR_LENGTH - block ),
+                                                       round( progress * 100, 0 ), details )
+
+                # Display the bar on the console and flush it
+                sys.stdout.write( text )
+
+                # If the process has finished, let the progression bar at 100%
+                # and go to the next line
+                if ( progress == 1 ):
+                    sys.stdout.write( '\n' )
+                sys.stdout.flush()
+
+            # NB: The completion of the processes shorter than the logging
+            #     interval is not logged, to avoid flooding the log files
+            elif ( ( progress < 1 ) or ( elapsed_time >= Constants.PROGRESS_LOG_INTERVAL ) ):
+                Logger.get_instance().info( 'Progression: %.0f %% (%s).', round( progress * 100, 0 ), details )
+
+            if ( progress == 1 ):
+                self.finished = True
+
 
     ## get_instance
     #  ------------
     #
-    # First time create an instance of ProgressionBar, 
+    # First time create an instance of ProgressionBar,
     # then return this instance.
     #
     # @return the singleton instance.
     #
     @staticmethod
     def get_instance():
-        
+
         if ( ProgressionBar.__instance == None ):
             ProgressionBar.__instance = ProgressionBar()
 
         return ProgressionBar.__instance
-            
+
 
     ## reset_instance
     #  --------------
     #
     # This method allows to reset the attributes of the ProgressionBar instance.
     #
-    # @param progress: Integer - The current value of the process. 
+    # @param progress: Integer - The current value of the process.
     #                            Equals 0 by default.
-    # @param total: Integer - The value at which the process is considered completed. 
+    # @param total: Integer - The value at which the process is considered completed.
     #                         Equals 1 by default.
     #
-    def reset_instance( self, progress=0, total=1): 
-         
-        self.progression_count = progress
+    def reset_instance( self, progress=0, total=1 ):
+
+        self.local_count = progress
+        with ProgressionBar.shared_count.get_lock():
+            ProgressionBar.shared_count.value = 0
         self.total_row_count = total
-        
\ No newline at end of file
+
+        self.start_count = progress
+        self.start_time = time.time()
+        self.last_display_time = self.start_time
+        self.finished = False
+
+
+    ## display_periodically
+    #  --------------------
+    #
+    # This method is run by the background thread. It displays the
+    # progression until the stop event is set.
+    #
+    def display_periodically( self ):
+
+        while ( not self.stop_event.wait( Constants.PROGRESS_BAR_REFRESH_INTERVAL ) ):
+            self.display()
+
+
+    ## __enter__
+    #  ---------
+    #
+    # This method allows to start the background thread displaying the progression
+    # (e.g. while the main process waits for the workers of a pool).
+    #
+    # @return self
+    #
+    def __enter__( self ):
+
+        if ( ( os.getpid() == ProgressionBar.main_pid ) and ( self.display_thread == None ) ):
+            self.stop_event.clear()
+            self.display_thread = threading.Thread( target = self.display_periodically,
+                                                    name = 'ProgressionBar' )
+            self.display_thread.daemon = True
+            self.display_thread.start()
+
+        return self
+
+
+    ## __exit__
+    #  --------
+    #
+    # This method allows to stop the background thread displaying
+    # the progression and to display the current progression.
+    #
+    # @param exc_type: Class - The class of the exception raised (if any).
+    # @param exc_value: Exception - The exception raised (if any).
+    # @param traceback: Traceback - The traceback of the exception (if any).
+    #
+    # @return False
+    #
+    def __exit__( self, exc_type, exc_value, traceback ):
+
+        if ( self.display_thread != None ):
+            self.stop_event.set()
+            self.display_thread.join()
+            self.display_thread = None
+            self.display( force = True )
+
+        return False
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+import atexit
+import logging
+import os
+import Queue
+import threading
+
+
+from fr.tagc.uorf.core.util import Constants
+
+
+## AsyncLogWriter
+#  ==============
+#
+# This class is a logging handler which puts the records it receives in a
+# queue, from which a background thread takes them and hands them to the
+# actual handlers (log files, console...). Hence, the records are formatted
+# and written outside of the thread that logged them.
+#
+# NB: - The message of a record is only built (i.e. its template formatted with
+#       its arguments) by the background thread, hence the arguments provided
+#       to the logger should not be modified after the call.
+#     - The background thread does not exist in the processes forked by the
+#       program (e.g. by multiprocessing pools). In these processes, the
+#       records are handed to the handlers synchronously, and the locks of
+#       the handlers (which may have been held by the background thread
+#       when the process has been forked) are re-created.
+#     - The remaining records are written when the program exits.
+#
+class AsyncLogWriter( logging.Handler ):
+
+    ## Constructor of AsyncLogWriter
+    #  -----------------------------
+    #
+    # Instance variables:
+    #     - target_handlers: List - The list of handlers to which the records are handed.
+    #     - queue: Queue - The queue of records waiting to be written.
+    #     - pid: Integer - The ID of the process in which the background thread runs.
+    #     - lock_pid: Integer - The ID of the process in which the locks of the handlers
+    #                           have been created.
+    #     - thread: Thread - The background thread writing the records.
+    #
+    # @param target_handlers: List - The list of handlers to which the records are handed.
+    # @param queue_size: Integer - The maximum number of records waiting to be written (when
+    #                              the queue is full, the thread logging a record waits).
+    #                              Constants.LOG_QUEUE_MAX_SIZE by default.
+    #
+    def __init__( self, target_handlers, queue_size=Constants.LOG_QUEUE_MAX_SIZE ):
+
+        logging.Handler.__init__( self )
+
+        self.target_handlers = target_handlers
+        self.queue = Queue.Queue( queue_size )
+        self.pid = os.getpid()
+        self.lock_pid = self.pid
+
+        self.thread = threading.Thread( target = self.write_records,
+                                        name = 'AsyncLogWriter' )
+        self.thread.daemon = True
+        self.thread.start()
+
+        # Make sure all the records are written when the program exits
+        atexit.register( self.close )
+
+
+
+    ## handle
+    #  ------
+    #
+    # This method overrides the logging.Handler.handle() method in order to
+    # re-create the locks of this handler and of the target handlers the first 
+    # time a record is handled by a forked process, prior to acquire them.
+    #
+    # @param record: LogRecord - The record.
+    #
+    def handle( self, record ):
+
+        if ( os.getpid() != self.lock_pid ):
+            self.createLock()
+            for handler in self.target_handlers:
+                handler.createLock()
+            self.lock_pid = os.getpid()
+
+        return logging.Handler.handle( self, record )
+
+
+
+    ## emit
+    #  ----
+    #
+    # This method allows to add a record to the queue.
+    #
+    # @param record: LogRecord - The record.
+    #
+    def emit( self, record ):
+
+        if ( ( os.getpid() != self.pid ) or ( not self.thread.is_alive() ) ):
+            self.dispatch( record )
+        else:
+            self.queue.put( record )
+
+
+
+    ## dispatch
+    #  --------
+    #
+    # This method allows to hand a record to all the target handlers
+    # for which the level of the record is high enough.
+    #
+    # @param record: LogRecord - The record.
+    #
+    def dispatch( self, record ):
+
+        for handler in self.target_handlers:
+            if ( record.levelno >= handler.level ):
+                handler.handle( record )
+
+
+
+    ## write_records
+    #  -------------
+    #
+    # This method is run by the background thread. It takes the records
+    # from the queue and hands them to the target handlers, until it
+    # receives None.
+    #
+    def write_records( self ):
+
+        while True:
+            record = self.queue.get()
+            if ( record == None ):
+                break
+
+            try:
+                self.dispatch( record )
+            except Exception:
+                self.handleError( record )
+
+
+
+    ## set_level
+    #  ---------
+    #
+    # This method allows to set the level of this handler and of all the target handlers.
+    #
+    # @param level: Integer - The logging level.
+    #
+    def set_level( self, level ):
+
+        self.setLevel( level )
+        for handler in self.target_handlers:
+            handler.setLevel( level )
+
+
+
+    ## close
+    #  -----
+    #
+    # This method allows to write the remaining records, to stop the
+    # background thread and to close all the target handlers.
+    #
+    def close( self ):
+
+        if ( ( os.getpid() == self.pid ) and self.thread.is_alive() ):
+            self.queue.put( None )
+            self.thread.join()
+
+        for handler in self.target_handlers:
+            handler.close()
+
+        logging.Handler.close( self )
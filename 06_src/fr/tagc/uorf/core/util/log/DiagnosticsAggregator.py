@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import logging
+import random
+
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util.log.Logger import Logger
+
+
+## DiagnosticsAggregator
+#  =====================
+#
+# This class is a singleton which allows to aggregate the warnings (and errors)
+# raised for each row processed in the hot loops of the program (e.g. for each
+# ORF parsed or annotated), instead of logging one full message per row.
+#
+# The occurrences are counted by log code (cf. LogCodes file) and source (e.g.
+# the data source or the method which raised the warning), and for each of these
+# ( code, source ) pairs, a bounded sample of the IDs of the entries concerned
+# is kept (reservoir sampling, so each entry has the same probability to be
+# part of the sample).
+# A summary table (one line per code and source) is logged in the main logger
+# when the flush() method is called, i.e. at the end of each strategy.
+#
+# If requested, the full message of each occurrence is also written in a
+# separate gzip-compressed file (tab-separated values).
+#
+class DiagnosticsAggregator( object ):
+
+    __instance = None
+
+
+    ## Constructor of DiagnosticsAggregator
+    #  ------------------------------------
+    #
+    # Instance variables:
+    #     - sample_size: Integer - The maximum number of entry IDs kept for each ( code, source ) pair.
+    #     - counts: Dictionary - The dictionary that associates to each ( code, source ) pair
+    #                            its number of occurrences.
+    #     - samples: Dictionary - The dictionary that associates to each ( code, source ) pair
+    #                             the list of IDs sampled.
+    #     - levels: Dictionary - The dictionary that associates to each ( code, source ) pair
+    #                            the highest logging level at which it has been recorded.
+    #     - details_file_path: String - The path to the file where the full messages have to
+    #                                   be written (None if they do not have to be written).
+    #     - details_file: File - The details file currently opened.
+    #     - random: Random - The random number generator used to sample the IDs.
+    #
+    # @param sample_size: Integer - The maximum number of entry IDs kept for each ( code, source )
+    #                               pair. Constants.DIAGNOSTICS_SAMPLE_SIZE by default.
+    #
+    def __init__( self, sample_size=Constants.DIAGNOSTICS_SAMPLE_SIZE ):
+
+        self.sample_size = sample_size
+        self.counts = {}
+        self.samples = {}
+        self.levels = {}
+        self.details_file_path = None
+        self.details_file = None
+        self.random = random.Random()
+
+
+    ## get_instance
+    #  ------------
+    #
+    # First time create an instance of DiagnosticsAggregator,
+    # then return this instance.
+    #
+    # @return the singleton instance.
+    #
+    @staticmethod
+    def get_instance():
+
+        if ( DiagnosticsAggregator.__instance == None ):
+            DiagnosticsAggregator.__instance = DiagnosticsAggregator()
+
+        return DiagnosticsAggregator.__instance
+
+
+    ## set_details_file_path
+    #  ---------------------
+    #
+    # This method allows to request the full messages to be written in a
+    # gzip-compressed file. The messages are appended to the file if it
+    # already exists.
+    #
+    # @param file_path: String - The path to the details file
+    #                            (None to stop writing the messages).
+    #
+    def set_details_file_path( self, file_path ):
+
+        self.close_details_file()
+        self.details_file_path = file_path
+
+
+    ## record
+    #  ------
+    #
+    # This method allows to record one occurrence of a warning (or error).
+    #
+    # @param code: String - The log code (cf. LogCodes file).
+    # @param source: String - The source of the warning (e.g. the data source).
+    # @param entity_id: String / Integer - The ID of the entry concerned.
+    # @param message: String - The full message (or message template). It is only
+    #                          used (and formatted) when the details file is written.
+    #                          None by default.
+    # @param args: Tuple - The arguments of the message template. Empty by default.
+    # @param level: Integer - The logging level. Constants.MODE_WARNING by default.
+    #
+    def record( self, code, source, entity_id, message=None, args=(), level=Constants.MODE_WARNING ):
+
+        key = ( code, source )
+
+        count = self.counts.get( key, 0 ) + 1
+        self.counts[ key ] = count
+
+        if ( level > self.levels.get( key, 0 ) ):
+            self.levels[ key ] = level
+
+        # Keep a uniform sample of the IDs (reservoir sampling)
+        sample = self.samples.get( key )
+        if ( sample == None ):
+            sample = []
+            self.samples[ key ] = sample
+
+        if ( count <= self.sample_size ):
+            sample.append( entity_id )
+        else:
+            k = self.random.randint( 0, count - 1 )
+            if ( k < self.sample_size ):
+                sample[ k ] = entity_id
+
+        if ( self.details_file_path and ( message != None ) ):
+            self.write_details( code, source, entity_id, message, args, level )
+
+
+    ## write_details
+    #  -------------
+    #
+    # This method allows to write the full message of an occurrence in the details file.
+    #
+    # @param code: String - The log code.
+    # @param source: String - The source of the warning.
+    # @param entity_id: String / Integer - The ID of the entry concerned.
+    # @param message: String - The message (or message template).
+    # @param args: Tuple - The arguments of the message template.
+    # @param level: Integer - The logging level.
+    #
+    def write_details( self, code, source, entity_id, message, args, level ):
+
+        if ( self.details_file == None ):
+            self.details_file = gzip.open( self.details_file_path, 'ab' )
+
+        if args:
+            message = message % args
+
+        line = '\t'.join( [ logging.getLevelName( level ),
+                            code,
+                            str( source ),
+                            str( entity_id ),
+                            message.replace( '\t', ' ' ).replace( '\n', ' ' ) ] ) + '\n'
+        if isinstance( line, unicode ):
+            line = line.encode( 'utf-8' )
+        self.details_file.write( line )
+
+
+    ## close_details_file
+    #  ------------------
+    #
+    # This method allows to close the details file if it is opened.
+    #
+    def close_details_file( self ):
+
+        if ( self.details_file != None ):
+            self.details_file.close()
+            self.details_file = None
+
+
+    ## flush
+    #  -----
+    #
+    # This method allows to log the summary table of the occurrences recorded
+    # since the last flush (one line per code and source, logged at the highest
+    # level recorded for this pair), and to reset the counters.
+    #
+    # @param title: String - The title of the summary (e.g. 'AnnotateORF strategy').
+    #
+    def flush( self, title ):
+
+        self.close_details_file()
+
+        if ( len( self.counts ) == 0 ):
+            return
+
+        Logger.get_instance().warning( 'Summary of the warnings aggregated during the execution of the ' + title +
+                                       ' (' + str( sum( self.counts.values() ) ) + ' occurrences' +
+                                       ( ', full messages written in ' + self.details_file_path if self.details_file_path else '' ) +
+                                       '):' )
+
+        for key in sorted( self.counts.keys() ):
+            ( code, source ) = key
+            sample = self.samples[ key ]
+            Logger.get_instance().log( self.levels[ key ],
+                                       '%s :: %s :: Examples of entries concerned (IDs): %s.',
+                                       args = ( title, source, ', '.join( [ str( id ) for id in sample ] ) ),
+                                       code = code,
+                                       ids = sample,
+                                       count = self.counts[ key ] )
+
+        self.counts = {}
+        self.samples = {}
+        self.levels = {}
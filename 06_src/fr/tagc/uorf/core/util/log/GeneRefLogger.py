@@ -6,6 +6,8 @@ from logging.handlers import RotatingFileHandler
 
 from fr.tagc.uorf.core.util import Constants
 from fr.tagc.uorf.core.util.exception.DenCellORFException import DenCellORFException
+from fr.tagc.uorf.core.util.log.AsyncLogWriter import AsyncLogWriter
+from fr.tagc.uorf.core.util.log.JsonLinesFormatter import JsonLinesFormatter
 from fr.tagc.uorf.core.util.log.Logger import Logger
 
 
@@ -17,6 +19,9 @@ from fr.tagc.uorf.core.util.log.Logger import Logger
 #
 # /!\ There is one single logging level for this logger: WARNING.
 # NB: Logs created with this logger are not displayed on the console.
+#     As for the main logger, the messages may be provided as templates with 
+#     their arguments and the IDs of the related entities (see the documentation 
+#     of the Logger class), and each record is also written in a JSON-lines file.
 #
 class GeneRefLogger( object ):
 
@@ -32,10 +37,13 @@ class GeneRefLogger( object ):
     # @param log_path: String - The path to the log file.
     # @param writing_mode: String - The writing mode (overwrite file or append).
     #                               Constants.GENEREF_LOG_DEFAULT by default.
+    # @param json_log_path: String - The path to the JSON-lines log file.
+    #                                Constants.PATH_GENEREF_LOG_JSON by default.
     #
-    def __init__( self, log_path=Constants.PATH_GENEREF_LOG, writing_mode=Constants.GENEREF_LOG_DEFAULT ):
+    def __init__( self, log_path=Constants.PATH_GENEREF_LOG, writing_mode=Constants.GENEREF_LOG_DEFAULT,
+                  json_log_path=Constants.PATH_GENEREF_LOG_JSON ):
         
-        self.logg = GeneRefLogger.set_logger( log_path, writing_mode )
+        self.logg = GeneRefLogger.set_logger( log_path, writing_mode, json_log_path )
         
         # Log the instantiation of this logger in the main logger
         Logger.get_instance().warning( 'A warning related to gene references has been raised' +
@@ -52,11 +60,12 @@ class GeneRefLogger( object ):
     #
     # @param log_path: String - The path to the log file.
     # @param writing_mode: String - The writing mode (overwrite file or append).
+    # @param json_log_path: String - The path to the JSON-lines log file.
     #
     # @return logger - The logger instance.
     #
     @staticmethod
-    def set_logger( log_path, writing_mode ):
+    def set_logger( log_path, writing_mode, json_log_path ):
                 
         # Reinitialize log file
         ERROR_FILE = open( log_path, writing_mode )
@@ -82,8 +91,20 @@ class GeneRefLogger( object ):
         # Set the level of the handler
         generef_file_handler.setLevel( logging.INFO )
         generef_file_handler.setFormatter( formatter )
-        # Add this handler to the logger
-        logger.addHandler( generef_file_handler )
+        
+        # Set a second handler to write the records at JSON-lines format
+        generef_json_file_handler = RotatingFileHandler( json_log_path, 
+                                                         'a', 
+                                                         Constants.GENEREF_LOG_SIZE_MAX, 
+                                                         Constants.GENEREF_LOG_MAX_FILES_NB )
+        generef_json_file_handler.setLevel( logging.INFO )
+        generef_json_file_handler.setFormatter( JsonLinesFormatter() )
+        
+        # Add these handlers to the logger, through a handler writing 
+        # the records in a background thread
+        async_writer = AsyncLogWriter( [ generef_file_handler, generef_json_file_handler ] )
+        async_writer.setLevel( logging.INFO )
+        logger.addHandler( async_writer )
         
         return logger
 
@@ -109,17 +130,40 @@ class GeneRefLogger( object ):
         return GeneRefLogger.__instance
 
 
+    ## log_warning
+    #  -----------
+    #
+    # Log a warning of the provided category. The message is only formatted 
+    # (with its arguments) by the thread writing the records.
+    #
+    # @param category: String - The category of the warning (added as prefix).
+    # @param message: String - The message (or message template) to log.
+    # @param args: Tuple - The arguments of the message template.
+    # @param ids: Dictionary / List - The IDs of the entities related to the message.
+    #                                 None by default.
+    #
+    def log_warning( self, category, message, args, ids=None ):
+        
+        self.logg.warning( category + ' :: ' + message, *args,
+                           extra = { 'log_category': category,
+                                     'entity_ids': ids,
+                                     'log_template': message } )
+
+
     ## crossref_warning
     #  ----------------
     #
     # Log cross reference errors.
     # It adds the 'CROSSREF WARNING' prefix.
     #
-    # @param message: String - The message to log.
+    # @param message: String - The message (or message template) to log.
+    # @param args: The arguments of the message template.
+    # @param ids: Dictionary / List - The IDs of the entities related to the message.
+    #                                 None by default.
     #
-    def crossref_warning( self, message ):
+    def crossref_warning( self, message, *args, **kwargs ):
         
-        self.logg.warning( 'CROSSREF WARNING :: ' + message )
+        self.log_warning( 'CROSSREF WARNING', message, args, kwargs.get( 'ids' ) )
 
 
     ## gene_search
@@ -128,11 +172,14 @@ class GeneRefLogger( object ):
     # Log warnings raised during gene search.
     # It adds the 'GENE SEARCH' prefix.
     #
-    # @param message: String - The message to log.
+    # @param message: String - The message (or message template) to log.
+    # @param args: The arguments of the message template.
+    # @param ids: Dictionary / List - The IDs of the entities related to the message.
+    #                                 None by default.
     #
-    def gene_search_warning( self, message ):
+    def gene_search_warning( self, message, *args, **kwargs ):
         
-        self.logg.warning( 'GENE SEARCH :: ' + message )
+        self.log_warning( 'GENE SEARCH', message, args, kwargs.get( 'ids' ) )
 
 
     ## gene_update
@@ -141,11 +188,14 @@ class GeneRefLogger( object ):
     # Log warnings raised during gene search.
     # It adds the 'GENE UPDATE' prefix.
     #
-    # @param message: String - The message to log.
+    # @param message: String - The message (or message template) to log.
+    # @param args: The arguments of the message template.
+    # @param ids: Dictionary / List - The IDs of the entities related to the message.
+    #                                 None by default.
     #
-    def gene_update_warning( self, message ):
+    def gene_update_warning( self, message, *args, **kwargs ):
         
-        self.logg.warning( 'GENE UPDATE :: ' + message )
+        self.log_warning( 'GENE UPDATE', message, args, kwargs.get( 'ids' ) )
 
 
     ## missing_ref
@@ -154,10 +204,14 @@ class GeneRefLogger( object ):
     # Log missing reference errors.
     # It adds the 'MISSING REFERENCE' prefix.
     #
-    # @param message: String - The message to log.
+    # @param message: String - The message (or message template) to log.
+    # @param args: The arguments of the message template.
+    # @param ids: Dictionary / List - The IDs of the entities related to the message.
+    #                                 None by default.
     #
-    def missing_ref_warning( self, message ):
-        self.logg.warning( 'MISSING REFERENCE :: ' + message )
+    def missing_ref_warning( self, message, *args, **kwargs ):
+        
+        self.log_warning( 'MISSING REFERENCE', message, args, kwargs.get( 'ids' ) )
 
 
     ## new_entry
@@ -170,11 +224,14 @@ class GeneRefLogger( object ):
     # NB: All entries created during the insertion of the main cross references 
     #     (gene lists) are not logged here. 
     #
-    # @param message: String - The message to log.
+    # @param message: String - The message (or message template) to log.
+    # @param args: The arguments of the message template.
+    # @param ids: Dictionary / List - The IDs of the entities related to the message.
+    #                                 None by default.
     #
-    def new_entry_warning( self, message ):
+    def new_entry_warning( self, message, *args, **kwargs ):
         
-        self.logg.warning( 'NEW ENTRY :: ' + message )
+        self.log_warning( 'NEW ENTRY', message, args, kwargs.get( 'ids' ) )
 
 
     ## conflict_info
@@ -183,11 +240,14 @@ class GeneRefLogger( object ):
     # Log warnings raised when conflicting information have been found.
     # It adds the 'CONFLICTING INFO' prefix.
     #
-    # @param message: String - The message to log.
+    # @param message: String - The message (or message template) to log.
+    # @param args: The arguments of the message template.
+    # @param ids: Dictionary / List - The IDs of the entities related to the message.
+    #                                 None by default.
     #
-    def conflict_info_warning( self, message ):
+    def conflict_info_warning( self, message, *args, **kwargs ):
         
-        self.logg.warning( 'CONFLICTING INFO :: ' + message )
+        self.log_warning( 'CONFLICTING INFO', message, args, kwargs.get( 'ids' ) )
 
 
     ## close
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+
+
+## JsonLinesFormatter
+#  ==================
+#
+# This class is a logging formatter which formats each record as one JSON
+# object (JSON-lines format), allowing to analyze the logs without parsing
+# the human-readable messages.
+#
+# Each JSON object contains the following keys:
+#     - time: String - The time at which the record has been created.
+#     - level: String - The logging level (e.g. 'WARNING').
+#     - category: String - The category of the record (e.g. 'CROSSREF WARNING'), if any.
+#     - code: String - The log code (cf. LogCodes file), if any.
+#     - ids: Dictionary / List - The IDs of the entities related to the record, if any.
+#     - count: Integer - The number of occurrences summarized by the record, if any.
+#     - template: String - The message template.
+#     - message: String - The message (i.e. the template formatted with its arguments).
+#     - exception: String - The exception information, if any.
+#
+class JsonLinesFormatter( logging.Formatter ):
+
+    ## format
+    #  ------
+    #
+    # This method allows to format a record as a JSON object.
+    #
+    # @param record: LogRecord - The record.
+    #
+    # @return String - The JSON object (on one single line).
+    #
+    def format( self, record ):
+
+        json_record = { 'time': self.formatTime( record ),
+                        'level': record.levelname,
+                        'category': getattr( record, 'log_category', None ),
+                        'code': getattr( record, 'log_code', None ),
+                        'ids': getattr( record, 'entity_ids', None ),
+                        'count': getattr( record, 'log_count', None ),
+                        'template': getattr( record, 'log_template', record.msg ),
+                        'message': record.getMessage() }
+
+        if record.exc_info:
+            json_record[ 'exception' ] = self.formatException( record.exc_info )
+
+        return json.dumps( json_record, default = str )
@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 
 import logging
+import os
 from logging.handlers import RotatingFileHandler
 
 
 from fr.tagc.uorf.core.util import Constants
 from fr.tagc.uorf.core.util.exception.DenCellORFException import DenCellORFException
+from fr.tagc.uorf.core.util.log.AsyncLogWriter import AsyncLogWriter
+from fr.tagc.uorf.core.util.log.JsonLinesFormatter import JsonLinesFormatter
 
 
 ## Logger
@@ -23,6 +26,15 @@ from fr.tagc.uorf.core.util.exception.DenCellORFException import DenCellORFExcep
 # ERROR and CRITICAL level log also the stacktrace.
 # By default, the logging mode is set to INFO.
 #
+# The messages may be provided as templates (using the '%' formatting) with
+# their arguments, a log code and the IDs of the related entities, e.g.:
+#     Logger.get_instance().warning( 'The ORF %s is located on the %s strand.', orf_id, strand,
+#                                    code = LogCodes.WARN_XXX, ids = { 'ORF': orf_id } )
+# Such messages are only formatted if the level is enabled, and by the background 
+# thread writing the records (see the documentation of the AsyncLogWriter class).
+# Each record is written both in the human-readable log file and, as one JSON 
+# object, in the JSON-lines log file.
+#
 class Logger( object ):
 
     __instance = None
@@ -39,13 +51,39 @@ class Logger( object ):
     # @param mode: String - The logging's level.
     # @param writing_mode: String - The writing mode (overwrite file or append).
     #                               Constants.LOG_DEFAULT by default.
+    # @param json_log_path: String - The path to the JSON-lines log file. By default, it is
+    #                                the path to the log file with the extension replaced
+    #                                (see the get_json_log_path() method).
     #
-    def __init__( self, log_path=Constants.PATH_LOG, mode=Constants.MODE_INFO, writing_mode=Constants.LOG_DEFAULT ):
+    def __init__( self, log_path=Constants.PATH_LOG, mode=Constants.MODE_INFO, writing_mode=Constants.LOG_DEFAULT,
+                  json_log_path=None ):
+        
+        if ( json_log_path == None ):
+            json_log_path = Logger.get_json_log_path( log_path )
         
-        self.logg = Logger.set_logger( log_path, mode, writing_mode )
+        self.logg = Logger.set_logger( log_path, mode, writing_mode, json_log_path )
         self.mode = mode
 
 
+    ## get_json_log_path
+    #  -----------------
+    #
+    # This is a static method that allows to get the path to the JSON-lines log 
+    # file associated with a log file, i.e. the path to the log file with its 
+    # extension replaced by Constants.LOG_JSON_FILE_EXTENSION.
+    # NB: When the log file has no extension, the JSON-lines log file starts with 
+    #     its name, and is thus scanned by the GenerateStatFiles strategy.
+    #
+    # @param log_path: String - The path to the log file.
+    #
+    # @return String - The path to the JSON-lines log file.
+    #
+    @staticmethod
+    def get_json_log_path( log_path ):
+        
+        return ( os.path.splitext( log_path )[ 0 ] + Constants.LOG_JSON_FILE_EXTENSION )
+
+
     ## set_logger
     #  ---------
     #
@@ -54,11 +92,12 @@ class Logger( object ):
     # @param log_path: String - The path to the log file.
     # @param mode: String - The logging's level.
     # @param writing_mode: String - The writing mode (overwrite file or append).
+    # @param json_log_path: String - The path to the JSON-lines log file.
     #
     # @return logger - The logger instance.
     #
     @staticmethod
-    def set_logger( log_path, mode, writing_mode ):
+    def set_logger( log_path, mode, writing_mode, json_log_path ):
 
         # Reinitialize log file
         ERROR_FILE = open( log_path, writing_mode )
@@ -85,14 +124,24 @@ class Logger( object ):
         # Set the level of the handler
         file_handler.setLevel( mode )
         file_handler.setFormatter( formatter )
-        # Add this handler to the logger
-        logger.addHandler( file_handler )
-
-        # Set a second handler to print the messages logged on the console
+        
+        # Set a second handler to write the records at JSON-lines format
+        json_file_handler = RotatingFileHandler( json_log_path, 
+                                                 'a', 
+                                                 Constants.LOG_SIZE_MAX, 
+                                                 Constants.LOG_MAX_FILES_NB )
+        json_file_handler.setLevel( mode )
+        json_file_handler.setFormatter( JsonLinesFormatter() )
+
+        # Set a third handler to print the messages logged on the console
         steam_handler = logging.StreamHandler()
         steam_handler.setLevel( mode )
-        # Add this handler to the logger
-        logger.addHandler( steam_handler )
+        
+        # Add these handlers to the logger, through a handler writing 
+        # the records in a background thread
+        async_writer = AsyncLogWriter( [ file_handler, json_file_handler, steam_handler ] )
+        async_writer.setLevel( mode )
+        logger.addHandler( async_writer )
 
         return logger
 
@@ -107,14 +156,17 @@ class Logger( object ):
     # @param logging_mode: Logging - The logging's level.
     # @param writing_mode: String - The writing mode (overwrite file or append).
     #                               Constants.LOG_DEFAULT by default.
+    # @param json_log_path: String - The path to the JSON-lines log file. By default, it is
+    #                                derived from the path to the log file.
     #
     # @return the logger instance.
     #
     @staticmethod
-    def get_instance( log_path=Constants.PATH_LOG, logging_mode=Constants.MODE_INFO, writing_mode=Constants.LOG_DEFAULT ):
+    def get_instance( log_path=Constants.PATH_LOG, logging_mode=Constants.MODE_INFO, writing_mode=Constants.LOG_DEFAULT,
+                      json_log_path=None ):
         
         if ( Logger.__instance == None ):
-            Logger.__instance = Logger( log_path, logging_mode, writing_mode )
+            Logger.__instance = Logger( log_path, logging_mode, writing_mode, json_log_path )
 
         return Logger.__instance
 
@@ -142,22 +194,67 @@ class Logger( object ):
             # Reset the level of logger and handlers
             self.logg.setLevel( logging_mode )
             for hdl in self.logg.handlers:
-                hdl.setLevel( logging_mode )
+                if isinstance( hdl, AsyncLogWriter ):
+                    hdl.set_level( logging_mode )
+                else:
+                    hdl.setLevel( logging_mode )
 
         return None
 
 
+    ## log
+    #  ---
+    #
+    # Log a message at the provided level. The message is only formatted 
+    # (with its arguments) if the level is enabled.
+    #
+    # @param level: Integer - The logging level.
+    # @param message: String - The message (or message template) to log.
+    # @param args: Tuple - The arguments of the message template. Empty by default.
+    # @param code: String - The log code (cf. LogCodes file). If provided, it is added 
+    #                       at the end of the message. None by default.
+    # @param ids: Dictionary / List - The IDs of the entities related to the message.
+    #                                 None by default.
+    # @param ex: Boolean - Does exception information have to be added to the log?
+    #                      False by default.
+    # @param count: Integer - The number of occurrences summarized by this message (see the 
+    #                         DiagnosticsAggregator class). If provided with a code, it is 
+    #                         added after the code. None by default.
+    #
+    def log( self, level, message, args=(), code=None, ids=None, ex=False, count=None ):
+        
+        if ( not self.logg.isEnabledFor( level ) ):
+            return
+        
+        template = message
+        if code:
+            if ( level >= Constants.MODE_ERROR ):
+                message = message + ' Error code: ' + code + '.'
+            else:
+                message = message + ' Warning code: ' + code + '.'
+            if ( count != None ):
+                message = message + ' Occurrences: ' + str( count ) + '.'
+        
+        self.logg.log( level, message, *args, 
+                       exc_info = ex,
+                       extra = { 'log_code': code,
+                                 'entity_ids': ids,
+                                 'log_template': template,
+                                 'log_count': count } )
+
+
     ## debug
     #  -----
     #
     # Log at debug level.
     #
-    # @param message: String - The message to log.
+    # @param message: String - The message (or message template) to log.
+    # @param args: The arguments of the message template.
+    # @param kwargs: The code and ids keyword arguments (see the log() method).
     #
-    def debug( self, message ):
+    def debug( self, message, *args, **kwargs ):
         
-        if ( self.mode == Constants.MODE_DEBUG ):
-            self.logg.debug( message )
+        self.log( Constants.MODE_DEBUG, message, args, **kwargs )
 
 
     ## info
@@ -165,13 +262,13 @@ class Logger( object ):
     #
     # Log at info level.
     #
-    # @param message: String - The message to log.
+    # @param message: String - The message (or message template) to log.
+    # @param args: The arguments of the message template.
+    # @param kwargs: The code and ids keyword arguments (see the log() method).
     #
-    def info( self, message ):
+    def info( self, message, *args, **kwargs ):
         
-        if ( ( self.mode == Constants.MODE_DEBUG )
-             or ( self.mode == Constants.MODE_INFO ) ):
-                self.logg.info( message )
+        self.log( Constants.MODE_INFO, message, args, **kwargs )
 
 
     ## warning
@@ -179,14 +276,13 @@ class Logger( object ):
     #
     # Log at warning level.
     #
-    # @param message: String - The message to log.
+    # @param message: String - The message (or message template) to log.
+    # @param args: The arguments of the message template.
+    # @param kwargs: The code and ids keyword arguments (see the log() method).
     #
-    def warning( self, message ):
+    def warning( self, message, *args, **kwargs ):
         
-        if ( ( self.mode == Constants.MODE_DEBUG )
-             or ( self.mode == Constants.MODE_INFO )
-             or ( self.mode == Constants.MODE_WARNING ) ):
-                self.logg.warning( message )
+        self.log( Constants.MODE_WARNING, message, args, **kwargs )
 
 
     ## error
@@ -194,24 +290,15 @@ class Logger( object ):
     #
     # Log at error level.
     #
-    # @param message: String - The message to log.
-    # @param ex: Boolean - Does exception information have to be added to the log?
-    #                      True by default.
+    # @param message: String - The message (or message template) to log.
+    # @param args: The arguments of the message template.
+    # @param kwargs: The code, ids and ex keyword arguments (see the log() method).
+    #                Exception information is added to the log by default (ex=True).
     #
-    def error( self, message, ex=True ):
-
-        if ex:
-            if ( ( self.mode == Constants.MODE_DEBUG )
-                 or ( self.mode == Constants.MODE_INFO )
-                 or ( self.mode == Constants.MODE_WARNING )
-                 or ( self.mode == Constants.MODE_ERROR ) ):
-                    self.logg.error( message, exc_info=True )
-        else:
-            if ( ( self.mode == Constants.MODE_DEBUG )
-                 or ( self.mode == Constants.MODE_INFO )
-                 or ( self.mode == Constants.MODE_WARNING )
-                 or ( self.mode == Constants.MODE_ERROR ) ):
-                    self.logg.error( message )
+    def error( self, message, *args, **kwargs ):
+        
+        kwargs.setdefault( 'ex', True )
+        self.log( Constants.MODE_ERROR, message, args, **kwargs )
 
 
     ## critical
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
 
+from AsyncLogWriter import AsyncLogWriter
+from DiagnosticsAggregator import DiagnosticsAggregator
 from GeneRefLogger import GeneRefLogger
+from JsonLinesFormatter import JsonLinesFormatter
 from Logger import Logger
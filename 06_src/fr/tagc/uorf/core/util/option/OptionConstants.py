@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import os
+
+
 from fr.tagc.uorf.core.util import Constants
 from fr.tagc.uorf.core.util.sql import SQLConstants
 
@@ -14,6 +17,9 @@ OPTION_CONFIG_FILE_PATH = 'configfile_path'
 OPTION_FORCE_OVERWRITE = 'force_overwrite'
 OPTION_VERBOSITY = 'verbosity'
 OPTION_THREAD_NB = 'thread_nb'
+OPTION_LOG_DETAILS = 'log_details'
+OPTION_PROFILE = 'profile'
+OPTION_SQL_STATS = 'sql_stats'
 
 # Options allowing the connection to the database
 OPTION_DB_NAME = 'database_name'
@@ -33,6 +39,8 @@ OPTION_DATABASE_MODEL = 'database_model'
 OPTION_CHECK_DSOTA_COHERENCE = 'check_dsota_coherence'
 OPTION_COMPUTE_SQCE_CONSENSUS = 'compute_sqce_consensus'
 OPTION_RESUME_STEP_NAME = 'resume_after_step_name'
+OPTION_MERGE_PARTITIONS = 'merge_partitions'
+OPTION_MERGE_PARTITION_INDEX = 'merge_partition_index'
 
 # Options related to ComputeMissingInfo strategy
 OPTION_DOWNLOAD_MISSING_INFO = 'download_missing_info'
@@ -48,9 +56,14 @@ OPTION_DB_RELEASE_DESC = 'database_release_version_description'
 # Options related to Backup strategy
 OPTION_OUTPUT_FOLDER = 'output_folder'
 OPTION_FILE_PREFIX = 'file_prefix'
+OPTION_INCREMENTAL_BACKUP = 'incremental_backup'
 
 # Options related to Restore strategy
 OPTION_INPUT_FOLDER = 'input_folder'
+OPTION_BACKUP_ID = 'backup_id'
+
+# Options related to GenerateBEDContent strategy
+OPTION_BED_INCREMENTAL = 'bed_incremental'
 
 # Options related to GenerateBEDFile strategy
 OPTION_BED_FILENAME = 'bed_filename'
@@ -73,10 +86,25 @@ OPTION_FASTA_SEQ_TYPE = 'fasta_sequence_type'
 OPTION_FASTA_QUERY_TABLE = 'fasta_query_table'
 OPTION_FASTA_EXCLUDE_SQCES_WITH_STOP = 'fasta_exclude_sqces_with_stop'
 OPTION_FASTA_LONG_HEADERS = 'fasta_long_headers'
+OPTION_FASTA_UNCOMPRESSED = 'fasta_uncompressed'
 
 # Options related to AssessDatabaseContent strategy
 OPTION_ASSESS_FILENAME = 'assess_filename'
 
+# Options related to Benchmark strategy
+OPTION_BENCHMARK_SCALES = 'benchmark_scales'
+OPTION_BENCHMARK_SEED = 'benchmark_seed'
+OPTION_BENCHMARK_STEPS = 'benchmark_steps'
+OPTION_BENCHMARK_REPEATS = 'benchmark_repeats'
+OPTION_BENCHMARK_UPDATE_BASELINE = 'benchmark_update_baseline'
+
+# Options related to Pipeline strategy
+OPTION_PIPELINE_FILE = 'pipeline_file'
+
+# Options related to Build strategy
+OPTION_BUILD_JOBS = 'build_jobs'
+OPTION_BUILD_DRY_RUN = 'build_dry_run'
+
 
 # ===============================================================================
 # Definition of the options
@@ -94,6 +122,12 @@ OPTION_SUBLIST_VERBOSITY =          [ '-v', '--verbosity', 'store', 'string', OP
 OPTION_SUBLIST_CONFIGFILE =         [ '-c', '--configfile', 'store', 'string', OPTION_CONFIG_FILE_PATH, None, 'The path to the config file to use.' ]
   # Number of threads
 OPTION_NUMBER_OF_THREADS =          [ '-t', '--threads', 'store', 'string', OPTION_THREAD_NB, None, 'The number of threads that can be used.' ]
+  # Full messages of the aggregated warnings
+OPTION_SUBLIST_LOG_DETAILS =        [ '-w', '--warningDetails', 'store_true', None, OPTION_LOG_DETAILS, False, 'Write the full message of each warning aggregated during the execution in a compressed file (' + os.path.basename( Constants.PATH_LOG_DETAILS ) + ').' ]
+  # Profiling of the stages
+OPTION_SUBLIST_PROFILE =            [ '-O', '--profile', 'store', 'string', OPTION_PROFILE, None, 'The names of the stages to profile (e.g. merge_dsota), as a comma-separated list, or "' + Constants.PROFILE_ALL_STAGES + '" to profile all of them. The statistics are saved in the ' + os.path.basename( Constants.PROFILE_FOLDER ) + ' folder.' ]
+  # Statistics about the SQL statements
+OPTION_SUBLIST_SQL_STATS =          [ '-Q', '--sqlStats', 'store_true', None, OPTION_SQL_STATS, False, 'Monitor the SQL statements executed (count, latency, rows and calling function of each statement shape, N+1 query candidates) and add their statistics to the run report (' + os.path.basename( Constants.PATH_RUN_REPORT ) + ').' ]
   # Connection parameters
 OPTION_SUBLIST_DATABASE_NAME =      [ '-N', '--databaseName', 'store', 'string', OPTION_DB_NAME, None, 'The name of the database to use.' ]
 OPTION_SUBLIST_DATABASE_FOLDER =    [ '-F', '--databaseFolder', 'store', 'string', OPTION_DB_FOLDER, None, 'The folder of the database (for SQLite databases only).' ]
@@ -103,23 +137,33 @@ OPTION_SUBLIST_DATABASE_USER =      [ '-u', '--databaseUser', 'store', 'string',
 OPTION_SUBLIST_DATABASE_PASSWD =    [ '-p', '--databasePassword', 'store', 'string', OPTION_DB_MYSQL_PASSWD, None, 'The password to use to connect to MySQL server (for MySQL databases only).' ]
   # Database model (PRO / DS)
 OPTION_SUBLIST_DATABASE_MODEL =     [ '-M', '--databaseModel', 'store', 'string', OPTION_DATABASE_MODEL, None, 'The schema of database used (PRO / DS).' ]
+  # Partitioned merging
+OPTION_SUBLIST_MERGE_PARTITIONS =   [ '-k', '--partitions', 'store', 'string', OPTION_MERGE_PARTITIONS, None, 'The partitions of chromosomes to merge independently, separated by "' + Constants.MERGE_PARTITION_SEPARATOR + '" (the chromosomes of each partition being separated by "' + Constants.MERGE_PARTITION_CHR_SEPARATOR + '", e.g. "1,2,3;4,5;X,Y,MT"). Please see the documentation for more information.' ]
+OPTION_SUBLIST_MERGE_PARTITION_INDEX = [ '-i', '--partitionIndex', 'store', 'string', OPTION_MERGE_PARTITION_INDEX, None, 'The index (starting at 0) of the partition to merge into its own partial PRO database. If partitions are provided without index, all the partitions are merged by separate processes and combined into the PRO database.' ]
 
 # List of available options for each strategy
 OPTION_LIST = {  'DatabaseCheck' : [
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
                     OPTION_SUBLIST_CONFIGFILE,
                     [ '-f', '--forceOverwrite', 'store_true', None, OPTION_FORCE_OVERWRITE, False, 'Delete any existing DS and PRO database(s) and build a new one prior to run the strategy.']
                 ],
                 'Insertion': [
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
+                    OPTION_SUBLIST_LOG_DETAILS,
                     OPTION_SUBLIST_CONFIGFILE,
                     [ '-f', '--forceOverwrite', 'store_true', None, OPTION_FORCE_OVERWRITE, False, 'Delete any existing database and build a new one prior to run the strategy.']
                 ],
                 'Deletion': [
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
                     OPTION_SUBLIST_DATABASE_NAME,
                     OPTION_SUBLIST_DATABASE_FOLDER,
                     OPTION_SUBLIST_DATABASE_HOST,
@@ -131,6 +175,9 @@ OPTION_LIST = {  'DatabaseCheck' : [
                 'ForceInsertion': [
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
+                    OPTION_SUBLIST_LOG_DETAILS,
                     OPTION_SUBLIST_DATABASE_NAME,
                     OPTION_SUBLIST_DATABASE_FOLDER,
                     OPTION_SUBLIST_DATABASE_HOST,
@@ -142,29 +189,64 @@ OPTION_LIST = {  'DatabaseCheck' : [
                 'LiftOver': [
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
                     OPTION_SUBLIST_CONFIGFILE
                 ],
                 'Merge': [
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
+                    OPTION_SUBLIST_LOG_DETAILS,
                     OPTION_SUBLIST_CONFIGFILE,
                     OPTION_NUMBER_OF_THREADS,
                     [ '-f', '--forceOverwrite', 'store_true', None, OPTION_FORCE_OVERWRITE, False, 'Delete any existing database and build a new one prior to run the strategy.'],
                     [ '-d', '--checkDSOTA', 'store_true', None, OPTION_CHECK_DSOTA_COHERENCE, False, 'Should the content of the DSORFTranscriptAsso table need to be check prior to run the strategy? Please note that selecting this option may be highly time-consuming.' ],
-                    [ '-s', '--computeConsensus', 'store_true', None, OPTION_COMPUTE_SQCE_CONSENSUS, False, 'Should a consensus of the DSORFTranscriptAsso sequences be computed? Please note that selecting this option may be highly time-consuming.' ]
+                    [ '-s', '--computeConsensus', 'store_true', None, OPTION_COMPUTE_SQCE_CONSENSUS, False, 'Should a consensus of the DSORFTranscriptAsso sequences be computed? Please note that selecting this option may be highly time-consuming.' ],
+                    OPTION_SUBLIST_MERGE_PARTITIONS,
+                    OPTION_SUBLIST_MERGE_PARTITION_INDEX
                 ],
                 'ResumeMerge': [
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
+                    OPTION_SUBLIST_LOG_DETAILS,
+                    OPTION_SUBLIST_CONFIGFILE,
+                    OPTION_NUMBER_OF_THREADS,
+                    [ '-d', '--checkDSOTA', 'store_true', None, OPTION_CHECK_DSOTA_COHERENCE, False, 'Should the content of the DSORFTranscriptAsso table need to be check prior to run the strategy? Please note that selecting this option may be highly time-consuming.' ],
+                    [ '-s', '--computeConsensus', 'store_true', None, OPTION_COMPUTE_SQCE_CONSENSUS, False, 'Should a consensus of the DSORFTranscriptAsso sequences be computed? Please note that selecting this option may be highly time-consuming.' ],
+                    [ '-a', '--resumeAtStep', 'store', 'string', OPTION_RESUME_STEP_NAME, None, 'The name of the last step that has been completed successfully (after_conserved, after_orf, after_transcript, after_ota_id_asso, during_ota, after_ota). Please see the documentation for more information.' ],
+                    OPTION_SUBLIST_MERGE_PARTITIONS,
+                    OPTION_SUBLIST_MERGE_PARTITION_INDEX
+                ],
+                'DeltaMerge': [
+                    OPTION_SUBLIST_DATABASE_TYPE,
+                    OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
+                    OPTION_SUBLIST_LOG_DETAILS,
                     OPTION_SUBLIST_CONFIGFILE,
                     OPTION_NUMBER_OF_THREADS,
                     [ '-d', '--checkDSOTA', 'store_true', None, OPTION_CHECK_DSOTA_COHERENCE, False, 'Should the content of the DSORFTranscriptAsso table need to be check prior to run the strategy? Please note that selecting this option may be highly time-consuming.' ],
                     [ '-s', '--computeConsensus', 'store_true', None, OPTION_COMPUTE_SQCE_CONSENSUS, False, 'Should a consensus of the DSORFTranscriptAsso sequences be computed? Please note that selecting this option may be highly time-consuming.' ],
-                    [ '-a', '--resumeAtStep', 'store', 'string', OPTION_RESUME_STEP_NAME, None, 'The name of the last step that has been completed successfully (after_conserved, after_orf, after_transcript, after_ota_id_asso, during_ota, after_ota). Please see the documentation for more information.' ]
+                    [ '-n', '--newDataSources', 'store', 'string', OPTION_SOURCE_NAME, None, 'The name of the new data source(s) to merge into the existing PRO database (comma-separated list).' ]
+                ],
+                'CombineMergePartitions': [
+                    OPTION_SUBLIST_DATABASE_TYPE,
+                    OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
+                    OPTION_SUBLIST_CONFIGFILE,
+                    [ '-f', '--forceOverwrite', 'store_true', None, OPTION_FORCE_OVERWRITE, False, 'Delete any existing PRO database and build a new one prior to run the strategy.'],
+                    OPTION_SUBLIST_MERGE_PARTITIONS
                 ],
                 'ComputeMissingInfo': [
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
                     OPTION_SUBLIST_CONFIGFILE,
                     [ '-f', '--forceOverwrite', 'store_true', None, OPTION_FORCE_OVERWRITE, False, 'Delete all the entries of the ORFCategory and ORFCategoryCatalog tables (PRO database) prior to run the strategy.'],
                     [ '-d', '--downloadMissingInfo', 'store_true', None, OPTION_DOWNLOAD_MISSING_INFO, False, 'Download the missing information (such as ORF and Transcript sequences) from Ensembl database. Please note that selecting this option may be highly time-consuming.' ]
@@ -172,6 +254,8 @@ OPTION_LIST = {  'DatabaseCheck' : [
                 'ComputeRelCoord': [
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
                     OPTION_SUBLIST_CONFIGFILE,
                     OPTION_NUMBER_OF_THREADS,
                     [ '-f', '--forceOverwrite', 'store_true', None, OPTION_FORCE_OVERWRITE, False, 'Should any existing relative coordinates be re-computed?' ]
@@ -179,12 +263,18 @@ OPTION_LIST = {  'DatabaseCheck' : [
                 'ComputeKozakContext': [
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
+                    OPTION_SUBLIST_LOG_DETAILS,
                     OPTION_SUBLIST_CONFIGFILE,
                     [ '-f', '--forceOverwrite', 'store_true', None, OPTION_FORCE_OVERWRITE, False, 'Should any existing computed Kozak context be re-computed?' ]
                 ],
                 'AnnotateORF': [
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
+                    OPTION_SUBLIST_LOG_DETAILS,
                     OPTION_SUBLIST_CONFIGFILE,
                     [ '-f', '--forceOverwrite', 'store_true', None, OPTION_FORCE_OVERWRITE, False, 'Delete all the entries of the ORFCategory and ORFCategoryCatalog and/or of the ORFAnnotation and ORFAnnotationCatalog tables (PRO database, depending on the other selected options) prior to run the strategy.'],
                     [ '-s', '--computeCatFromSource', 'store_true', None, OPTION_ANNOTATE_ORF_FROM_PROV, False, 'Compute the ORF categories from the categories provided by the datasource (ORFCatagory table)?' ],
@@ -193,6 +283,8 @@ OPTION_LIST = {  'DatabaseCheck' : [
                 'AddReleaseVersion': [ 
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
                     OPTION_SUBLIST_DATABASE_NAME,
                     OPTION_SUBLIST_DATABASE_FOLDER,
                     OPTION_SUBLIST_DATABASE_HOST,
@@ -207,6 +299,8 @@ OPTION_LIST = {  'DatabaseCheck' : [
                 'Backup': [
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
                     OPTION_SUBLIST_DATABASE_NAME,
                     OPTION_SUBLIST_DATABASE_FOLDER,
                     OPTION_SUBLIST_DATABASE_HOST,
@@ -215,11 +309,15 @@ OPTION_LIST = {  'DatabaseCheck' : [
                     OPTION_SUBLIST_DATABASE_PASSWD,
                     OPTION_SUBLIST_DATABASE_MODEL,
                     [ '-o', '--outputFolder', 'store', 'string', OPTION_OUTPUT_FOLDER, None, 'The absolute path to the folder in which the files have to be saved.' ],
-                    [ '-x', '--filePrefix', 'store', 'string', OPTION_FILE_PREFIX, None, 'The prefix for file names where data is saved.' ]
+                    [ '-x', '--filePrefix', 'store', 'string', OPTION_FILE_PREFIX, None, 'The prefix for file names where data is saved.' ],
+                    [ '-I', '--incremental', 'store_true', None, OPTION_INCREMENTAL_BACKUP, False, 'Only save the ranges of entries that changed since the last incremental backup saved in the output folder.' ],
+                    OPTION_NUMBER_OF_THREADS
                 ],
                 'Restore': [
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
                     OPTION_SUBLIST_DATABASE_NAME,
                     OPTION_SUBLIST_DATABASE_FOLDER,
                     OPTION_SUBLIST_DATABASE_HOST,
@@ -229,11 +327,15 @@ OPTION_LIST = {  'DatabaseCheck' : [
                     OPTION_SUBLIST_DATABASE_MODEL,
                     [ '-f', '--forceOverwrite', 'store_true', None, OPTION_FORCE_OVERWRITE, False, 'Does the program has to re-initialize the provided database prior the restoration? This will erase any existing data.'],
                     [ '-i', '--inputFolder', 'store', 'string', OPTION_INPUT_FOLDER, None, 'The absolute path to the folder in which the files are located.' ],
-                    [ '-x', '--filePrefix', 'store', 'string', OPTION_FILE_PREFIX, None, 'The prefix used when generated the files with the Restore strategy.' ]
+                    [ '-x', '--filePrefix', 'store', 'string', OPTION_FILE_PREFIX, None, 'The prefix used when generated the files with the Restore strategy.' ],
+                    [ '-b', '--backupId', 'store', 'string', OPTION_BACKUP_ID, None, 'The identifier of the incremental backup to restore (by default, the most recent one).' ],
+                    OPTION_NUMBER_OF_THREADS
                 ],
                 'AssessDatabaseContent': [       
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
                     OPTION_SUBLIST_DATABASE_NAME,
                     OPTION_SUBLIST_DATABASE_FOLDER,
                     OPTION_SUBLIST_DATABASE_HOST,
@@ -247,16 +349,21 @@ OPTION_LIST = {  'DatabaseCheck' : [
                 'GenerateBEDContent': [             
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
                     OPTION_SUBLIST_DATABASE_NAME,
                     OPTION_SUBLIST_DATABASE_FOLDER,
                     OPTION_SUBLIST_DATABASE_HOST,
                     OPTION_SUBLIST_DATABASE_PORT,
                     OPTION_SUBLIST_DATABASE_USER,
-                    OPTION_SUBLIST_DATABASE_PASSWD
+                    OPTION_SUBLIST_DATABASE_PASSWD,
+                    [ '-i', '--incremental', 'store_true', None, OPTION_BED_INCREMENTAL, False, 'Only refresh the lines of the ORFs that have been updated (by DeltaMerge, AnnotateORF or ComputeKozakContext) since the last computation of the content. The full content is computed if the UTBEDContent table is empty.' ]
                 ],
                 'GenerateBEDFile': [             
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
                     OPTION_SUBLIST_DATABASE_NAME,
                     OPTION_SUBLIST_DATABASE_FOLDER,
                     OPTION_SUBLIST_DATABASE_HOST,
@@ -269,11 +376,14 @@ OPTION_LIST = {  'DatabaseCheck' : [
                     [ '-l', '--trackLine', 'store_true', None, OPTION_BED_TRACK_LINE, False, 'Should the track line be included at the beginning of the file?' ],
                     [ '-n', '--includeNonConventionalChr', 'store_true', None, OPTION_BED_NON_CONV_CHR, False, 'Should the ORFs located on "non conventional" chromosomes (e.g. mitochondrial, scaffold) be included in the file?' ],
                     [ '-e', '--extendBed', 'store_true', None, OPTION_BED_EXTENDED, False, 'Should the bed file be extended (12+ format)?' ],
-                    [ '-g', '--bigBed', 'store_true', None, OPTION_CONVERT_TO_BIGBED, False, 'Should the BED file be converted at bigBed format?' ]
+                    [ '-g', '--bigBed', 'store_true', None, OPTION_CONVERT_TO_BIGBED, False, 'Should the BED file be converted at bigBed format?' ],
+                    OPTION_NUMBER_OF_THREADS
                 ],
                 'GenerateTrackDbFile': [             
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
                     OPTION_SUBLIST_DATABASE_NAME,
                     OPTION_SUBLIST_DATABASE_FOLDER,
                     OPTION_SUBLIST_DATABASE_HOST,
@@ -287,6 +397,8 @@ OPTION_LIST = {  'DatabaseCheck' : [
                 'GenerateGFFFile': [             
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
                     OPTION_SUBLIST_DATABASE_NAME,
                     OPTION_SUBLIST_DATABASE_FOLDER,
                     OPTION_SUBLIST_DATABASE_HOST,
@@ -299,6 +411,8 @@ OPTION_LIST = {  'DatabaseCheck' : [
                 'GenerateFastaFile': [             
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
                     OPTION_SUBLIST_DATABASE_NAME,
                     OPTION_SUBLIST_DATABASE_FOLDER,
                     OPTION_SUBLIST_DATABASE_HOST,
@@ -311,24 +425,100 @@ OPTION_LIST = {  'DatabaseCheck' : [
                     [ '-l', '--longHeader', 'store_true', None, OPTION_FASTA_LONG_HEADERS, False, 'Use this option to get more informative fasta headers. By default, the headers only contain the ORF or OTA ID and the taxonomic code. \
                                                                                                    By selecting this option, additionnal information, such as start and stop positions of the ORF or database release will be added. Please see the documentation for more information.' ],
                     [ '-o', '--outputFolder', 'store', 'string', OPTION_OUTPUT_FOLDER, None, 'The absolute path to the folder in which the GFF file has to be saved.' ],
-                    [ '-a', '--fastaFilename', 'store', 'string', OPTION_FASTA_FILENAME, None, 'The name for the FASTA file generated (DenCellORF_ORF by default, without ".fa" or ".fasta").' ]
+                    [ '-a', '--fastaFilename', 'store', 'string', OPTION_FASTA_FILENAME, None, 'The name for the FASTA file generated (DenCellORF_ORF by default, without ".fa" or ".fasta").' ],
+                    [ '-c', '--uncompressed', 'store_true', None, OPTION_FASTA_UNCOMPRESSED, False, 'Write a plain text FASTA file instead of a block-gzipped (BGZF) one.' ]
                 ],
                 'GenerateStatFiles': [        
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
                     [ '-o', '--outputFolder', 'store', 'string', OPTION_OUTPUT_FOLDER, None, 'The absolute path to the folder in which all the files generated have to be saved.' ],
-                    [ '-f', '--forceOverwrite', 'store_true', None, OPTION_FORCE_OVERWRITE, False, 'Does the program has to overwrite the existing files? If not selected, all the files that have already been generated will not be generated again.']
+                    [ '-f', '--forceOverwrite', 'store_true', None, OPTION_FORCE_OVERWRITE, False, 'Does the program has to overwrite the existing files? If not selected, all the files that have already been generated will not be generated again.'],
+                    OPTION_NUMBER_OF_THREADS
                 ],
                 'Filter': [
                     OPTION_SUBLIST_DATABASE_TYPE,
                     OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
                     OPTION_SUBLIST_CONFIGFILE,
                     [ '-f', '--forceOverwrite', 'store_true', None, OPTION_FORCE_OVERWRITE, False, 'Delete any existing FILT database (PRO model) and build a new one prior to run the strategy.']
+                ],
+                'Benchmark': [
+                    OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
+                    [ '-s', '--scales', 'store', 'string', OPTION_BENCHMARK_SCALES, None, 'The numbers of ORFs of the synthetic datasets to use, separated by "' + Constants.BENCHMARK_LIST_SEPARATOR + '" (e.g. 1e4,1e5). Each number has to be between ' + str( Constants.BENCHMARK_MIN_SCALE ) + ' and ' + str( Constants.BENCHMARK_MAX_SCALE ) + '. By default, ' + ', '.join( map( str, Constants.BENCHMARK_DEFAULT_SCALES ) ) + '.' ],
+                    [ '-e', '--seed', 'store', 'string', OPTION_BENCHMARK_SEED, None, 'The seed used to generate the synthetic datasets. By default, ' + str( Constants.BENCHMARK_DEFAULT_SEED ) + '.' ],
+                    [ '-S', '--steps', 'store', 'string', OPTION_BENCHMARK_STEPS, None, 'The names of the strategies to benchmark, separated by "' + Constants.BENCHMARK_LIST_SEPARATOR + '". By default, all the strategies that can be benchmarked.' ],
+                    [ '-n', '--repeats', 'store', 'string', OPTION_BENCHMARK_REPEATS, None, 'The number of times each strategy has to be run (the median of the measures is reported). By default, ' + str( Constants.BENCHMARK_DEFAULT_REPEATS ) + '.' ],
+                    [ '-o', '--outputFolder', 'store', 'string', OPTION_OUTPUT_FOLDER, None, 'The absolute path to the folder in which the datasets, the results and the baselines have to be saved.' ],
+                    [ '-u', '--updateBaseline', 'store_true', None, OPTION_BENCHMARK_UPDATE_BASELINE, False, 'Replace the baselines of the datasets by the results of the benchmark.' ],
+                    [ '-f', '--forceOverwrite', 'store_true', None, OPTION_FORCE_OVERWRITE, False, 'Generate again the synthetic datasets and their databases.' ],
+                    OPTION_NUMBER_OF_THREADS
+                ],
+                'Pipeline': [
+                    OPTION_SUBLIST_DATABASE_TYPE,
+                    OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
+                    OPTION_SUBLIST_LOG_DETAILS,
+                    [ '-i', '--pipelineFile', 'store', 'string', OPTION_PIPELINE_FILE, None, 'The path to the file listing the strategies to run (one strategy followed by its options per line, in the order in which the strategies have to be run).' ]
+                ],
+                'Build': [
+                    OPTION_SUBLIST_DATABASE_TYPE,
+                    OPTION_SUBLIST_VERBOSITY,
+                    OPTION_SUBLIST_PROFILE,
+                    OPTION_SUBLIST_SQL_STATS,
+                    OPTION_SUBLIST_LOG_DETAILS,
+                    OPTION_SUBLIST_CONFIGFILE,
+                    [ '-o', '--outputFolder', 'store', 'string', OPTION_OUTPUT_FOLDER, None, 'The absolute path to the folder in which the exported files and the outputs of the strategies have to be saved.' ],
+                    [ '-j', '--jobs', 'store', 'string', OPTION_BUILD_JOBS, None, 'The maximal number of strategies run at the same time (' + str( Constants.BUILD_DEFAULT_JOBS_NB ) + ' by default).' ],
+                    [ '-r', '--releaseNumber', 'store', 'string', OPTION_DB_RELEASE_NB, None, 'The number of the version declared in the metadata tables (' + Constants.BUILD_DEFAULT_RELEASE_NB + ' by default).' ],
+                    [ '-f', '--forceOverwrite', 'store_true', None, OPTION_FORCE_OVERWRITE, False, 'Run all the strategies, including the ones that are up to date.' ],
+                    [ '-n', '--dryRun', 'store_true', None, OPTION_BUILD_DRY_RUN, False, 'Only log the strategies that are up to date and the ones that have to be run.' ]
                 ]
                }
 
 # List of available strategies
 STRATEGIES_LIST = OPTION_LIST.keys()
 
+# Modules of the strategies (the class of each strategy is named
+# after the strategy followed by the 'Strategy' suffix)
+# NB: Only the module of the strategy requested is imported, 
+#     in order to speed up the start of the program. For the same
+#     reason, the heavy third-party packages (numpy, pandas, Biopython,
+#     pyensembl, pyliftover, wget) are imported by the functions using
+#     them rather than at the top of the modules, such as they are only
+#     loaded by the strategies that actually need them.
+STRATEGY_MODULES = { 'AddReleaseVersion':      'fr.tagc.uorf.core.execution.AddReleaseVersionStrategy',
+                    'AnnotateORF':            'fr.tagc.uorf.core.execution.AnnotateORFStrategy',
+                    'AssessDatabaseContent':  'fr.tagc.uorf.core.execution.AssessDatabaseContentStrategy',
+                    'Backup':                 'fr.tagc.uorf.core.execution.BackupStrategy',
+                    'Benchmark':              'fr.tagc.uorf.core.execution.BenchmarkStrategy',
+                    'Build':                  'fr.tagc.uorf.core.execution.BuildStrategy',
+                    'CombineMergePartitions': 'fr.tagc.uorf.core.execution.CombineMergePartitionsStrategy',
+                    'ComputeKozakContext':    'fr.tagc.uorf.core.execution.ComputeKozakContextStrategy',
+                    'ComputeMissingInfo':     'fr.tagc.uorf.core.execution.ComputeMissingInfoStrategy',
+                    'ComputeRelCoord':        'fr.tagc.uorf.core.execution.ComputeRelCoordStrategy',
+                    'DatabaseCheck':          'fr.tagc.uorf.core.execution.DatabaseCheckStrategy',
+                    'Deletion':               'fr.tagc.uorf.core.execution.DeletionStrategy',
+                    'DeltaMerge':             'fr.tagc.uorf.core.execution.DeltaMergeStrategy',
+                    'Filter':                 'fr.tagc.uorf.core.execution.FilterStrategy',
+                    'ForceInsertion':         'fr.tagc.uorf.core.execution.ForceInsertionStrategy',
+                    'GenerateBEDContent':     'fr.tagc.uorf.core.execution.GenerateBEDContentStrategy',
+                    'GenerateBEDFile':        'fr.tagc.uorf.core.execution.GenerateBEDFileStrategy',
+                    'GenerateFastaFile':      'fr.tagc.uorf.core.execution.GenerateFastaFileStrategy',
+                    'GenerateGFFFile':        'fr.tagc.uorf.core.execution.GenerateGFFFileStrategy',
+                    'GenerateStatFiles':      'fr.tagc.uorf.core.execution.GenerateStatFilesStrategy',
+                    'GenerateTrackDbFile':    'fr.tagc.uorf.core.execution.GenerateTrackDbFileStrategy',
+                    'Insertion':              'fr.tagc.uorf.core.execution.InsertionStrategy',
+                    'LiftOver':               'fr.tagc.uorf.core.execution.LiftOverStrategy',
+                    'Merge':                  'fr.tagc.uorf.core.execution.MergeStrategy',
+                    'Pipeline':               'fr.tagc.uorf.core.execution.PipelineStrategy',
+                    'Restore':                'fr.tagc.uorf.core.execution.RestoreStrategy',
+                    'ResumeMerge':            'fr.tagc.uorf.core.execution.ResumeMergeStrategy' }
+
 
 # ===============================================================================
 # DatabaseCheck strategy
@@ -338,22 +528,38 @@ STRATEGIES_LIST = OPTION_LIST.keys()
 # and for which the "-f" option is authorized
 STRATEGIES_ALLOWING_FORCE_OVERWRITE = [ 'DatabaseCheck' ]
 STRATEGIES_ALLOWING_FORCE_OVERWRITE_ON_DS_DB = STRATEGIES_ALLOWING_FORCE_OVERWRITE + [ 'Insertion' ]
-STRATEGIES_ALLOWING_FORCE_OVERWRITE_ON_PRO_DB = STRATEGIES_ALLOWING_FORCE_OVERWRITE + [ 'Merge' ]
+STRATEGIES_ALLOWING_FORCE_OVERWRITE_ON_PRO_DB = STRATEGIES_ALLOWING_FORCE_OVERWRITE + [ 'Merge', 'CombineMergePartitions' ]
 STRATEGIES_ALLOWING_FORCE_OVERWRITE_ON_FILT_DB = STRATEGIES_ALLOWING_FORCE_OVERWRITE + [ 'Filter' ]
 
 # List of strategies that have to check the DS database
 STRATEGIES_CHECKING_DS_DATABASE = [ 'DatabaseCheck', 'Insertion', 'LiftOver', 'Merge', 
-                                    'ResumeMerge', 'Backup' ]
+                                    'ResumeMerge', 'DeltaMerge', 'Backup' ]
 
 # List of strategies that have to check the PRO database
-STRATEGIES_CHECKING_PRO_DATABASE = [ 'DatabaseCheck', 'Merge', 'ResumeMerge', 'ComputeMissingInfo', 
-                                     'ComputeRelCoord', 'ComputeKozakContext', 'AnnotateORF', 
-                                     'Filter', 'Backup' ]
+STRATEGIES_CHECKING_PRO_DATABASE = [ 'DatabaseCheck', 'Merge', 'ResumeMerge', 'DeltaMerge', 'CombineMergePartitions',
+                                     'ComputeMissingInfo', 'ComputeRelCoord', 'ComputeKozakContext', 
+                                     'AnnotateORF', 'Filter', 'Backup' ]
+
+# List of strategies for which the PRO database checked is the 
+# partial PRO database of a partition when a partition index is provided
+STRATEGIES_USING_MERGE_PARTITION_DB = [ 'Merge', 'ResumeMerge' ]
 
 # List of strategies that have to check the FILT database
 STRATEGIES_CHECKING_FILT_DATABASE = [ 'Filter', 'Backup'  ]
 
 
+# ===============================================================================
+# Pipeline strategy
+# ===============================================================================
+
+# List of strategies that cannot be run as a step of a pipeline
+STRATEGIES_NOT_ALLOWED_IN_PIPELINE = [ 'Pipeline', 'Build' ]
+
+# List of strategies after which the databases have to be checked again
+# by the next steps of the pipeline (as they replace the databases)
+STRATEGIES_INVALIDATING_DATABASE_CHECKS = [ 'Restore' ]
+
+
 # ===============================================================================
 # Database models
 # ===============================================================================
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import importlib
 from os.path import sys
 from optparse import OptionParser
 
@@ -28,6 +29,7 @@ class OptionManager( object ):
     #    - optionDict: Dict - A dictionary of options provided by the user.
     #    - optionParser: OptionParser - The option parser object.
     #    - args: args - The arguments of the option parser.
+    #    - argv: List - The arguments parsed (the strategy followed by its options).
     #
     def __init__( self ):
         
@@ -35,6 +37,7 @@ class OptionManager( object ):
         self.optionDict = None
         self.optionParser = None
         self.args = None
+        self.argv = None
         
 
     ## initialize
@@ -43,12 +46,19 @@ class OptionManager( object ):
     # This method allows to initialize the manager with by parsing the options 
     # provided in the command line.
     # 
+    # @param argv: List - The arguments to parse (the strategy followed by its options).
+    #                     The arguments of the command line are used by default.
+    # 
     # @throw DenCellORFException: When the strategy selected is not an existing one.
     #
-    def initialize( self ):
+    def initialize( self, argv=None ):
+        
+        if ( argv == None ):
+            argv = sys.argv[ 1: ]
+        self.argv = list( argv )
         
         # Get the main keyword that defines the strategy
-        self.strategy = sys.argv[1]
+        self.strategy = argv[0]
         
         # If the strategy is not known, check if the user asked the help.
         # Otherwise, raise a DenCellORFException.
@@ -76,18 +86,10 @@ class OptionManager( object ):
         Logger.get_instance().info( 'Selected strategy: ' + self.strategy )
         
         # Build an option parser to collect the option values
-        self.optionParser = OptionParser()
-        for current_prop_list in OptionConstants.OPTION_LIST[ self.strategy ]:
-            self.optionParser.add_option( current_prop_list[0],
-                                          current_prop_list[1],
-                                          action = current_prop_list[2],
-                                          type = current_prop_list[3],
-                                          dest = current_prop_list[4],
-                                          default = current_prop_list[5],
-                                          help = current_prop_list[6] )
+        self.optionParser = OptionManager.build_option_parser( self.strategy )
                 
         # Get the various option values into a dictionary
-        (opts, args) = self.optionParser.parse_args()
+        (opts, args) = self.optionParser.parse_args( argv )
         self.optionDict = vars( opts )
         self.args = args
         
@@ -98,6 +100,58 @@ class OptionManager( object ):
         Logger.get_instance().info( '---' )
         
 
+    ## build_option_parser
+    #  -------------------
+    #
+    # This is a static method that allows to build the parser of the options
+    # of a strategy.
+    #
+    # @param strategy: String - The name of the strategy.
+    #
+    # @return OptionParser - The option parser.
+    #
+    @staticmethod
+    def build_option_parser( strategy ):
+        
+        option_parser = OptionParser()
+        for current_prop_list in OptionConstants.OPTION_LIST[ strategy ]:
+            option_parser.add_option( current_prop_list[0],
+                                      current_prop_list[1],
+                                      action = current_prop_list[2],
+                                      type = current_prop_list[3],
+                                      dest = current_prop_list[4],
+                                      default = current_prop_list[5],
+                                      help = current_prop_list[6] )
+        
+        return option_parser
+    
+    
+    ## load_strategy_class
+    #  -------------------
+    #
+    # This is a static method that allows to import the module of a strategy 
+    # and to get its class.
+    #
+    # @param strategy: String - The name of the strategy.
+    #
+    # @return Class - The class of the strategy.
+    #
+    # @throw DenCellORFException: When the strategy is not registered.
+    #
+    @staticmethod
+    def load_strategy_class( strategy ):
+        
+        strategy_module_name = OptionConstants.STRATEGY_MODULES.get( strategy )
+        if ( strategy_module_name == None ):
+            raise DenCellORFException( 'OptionManager.load_strategy_class(): The strategy ' + strategy +
+                                       ' is not registered. The following strategies are available: ' +
+                                       ', '.join( OptionConstants.STRATEGIES_LIST ) + '.' )
+        
+        strategy_module = importlib.import_module( strategy_module_name )
+        
+        return getattr( strategy_module, strategy + 'Strategy' )
+
+
     ## get_strategy
     #  ------------
     #
@@ -110,6 +164,20 @@ class OptionManager( object ):
         return self.strategy
 
 
+    ## get_argv
+    #  --------
+    #
+    # This method returns the arguments parsed by the manager (i.e. the arguments 
+    # of the command line, or the ones of the current step when the strategy is 
+    # run as a step of a pipeline).
+    #
+    # @return List - The strategy followed by its options.
+    #
+    def get_argv( self ):
+
+        return list( self.argv )
+
+
     ## get_option
     #  ----------
     #
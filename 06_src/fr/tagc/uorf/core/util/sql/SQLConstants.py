@@ -64,3 +64,22 @@ RANGE_OPTIMIZER_MAX_MEM_SIZE = 0
 MYSQL_MAX_ALLOWED_PACKET = 1073741824
   # Value for the group_concat_max_len
 MYSQL_GROUP_CONCAT_MAX_LEN = 18446744073709551615
+
+
+# ===============================================================================
+# Monitoring of the SQL statements executed
+# ===============================================================================
+
+# Maximum number of latencies kept for each statement shape to compute the percentiles
+SQL_MONITOR_LATENCY_SAMPLE_SIZE = 1000
+# Percentiles of latency computed for each statement shape
+SQL_MONITOR_PERCENTILES = [ 50, 95, 99 ]
+# Maximum number of statements (raw SQL) for which the shape is cached
+SQL_MONITOR_SHAPE_CACHE_SIZE = 10000
+# Number of statement shapes and calling functions provided in the report
+SQL_MONITOR_REPORT_LINES_NB = 25
+# Minimum number of executions of the same SELECT statement shape by the same
+# calling function for it to be flagged as a N+1 query candidate
+SQL_MONITOR_N_PLUS_ONE_MIN_COUNT = 100
+# Name of the section of the run report
+SQL_MONITOR_REPORT_SECTION = 'sql'
@@ -19,6 +19,7 @@ from fr.tagc.uorf.core.model import *
 from fr.tagc.uorf.core.util import Constants
 from fr.tagc.uorf.core.util import LogCodes
 from fr.tagc.uorf.core.util.sql import SQLConstants
+from fr.tagc.uorf.core.util.sql.SQLQueryMonitor import SQLQueryMonitor
 from fr.tagc.uorf.core.util.option.OptionManager import OptionManager
 from fr.tagc.uorf.core.util.option import OptionConstants
 from fr.tagc.uorf.core.util.general.GeneralUtil import GeneralUtil
@@ -96,6 +97,8 @@ class SQLManager( object ):
     @abstractmethod
     def set_db_settings( self, db_settings ):
         
+        previous_db_url = self.db_url
+        
         # Store the settings of the database
         self.db_settings = db_settings
         
@@ -148,6 +151,15 @@ class SQLManager( object ):
                 
         # Create the database URL
         self.create_db_url()
+        
+        # If the settings point to another database than the one the engine has 
+        # been created for (e.g. when several strategies are run in the same 
+        # process), close the session and the engine, so that they are created 
+        # again using the new URL when needed
+        if ( ( self.engine != None ) and ( self.db_url != previous_db_url ) ):
+            self.close_session()
+            self.engine.dispose()
+            self.engine = None
     
     
     
@@ -655,6 +667,13 @@ class SQLManager( object ):
                         cursor = dbapi_connection.cursor()
                         cursor.execute( 'SET group_concat_max_len = ' + str( SQLConstants.MYSQL_GROUP_CONCAT_MAX_LEN ) )
                         cursor.close()
+                    
+                    # Set the maximum memory allowed for the range optimizer
+                    @event.listens_for( engine, 'connect' )
+                    def set_range_optimizer_max_mem_size( dbapi_connection, connection_record ):
+                        cursor = dbapi_connection.cursor()
+                        cursor.execute( 'SET GLOBAL range_optimizer_max_mem_size = ' + str( SQLConstants.RANGE_OPTIMIZER_MAX_MEM_SIZE ) )
+                        cursor.close()  
                         
                 elif ( self.db_type == SQLConstants.DB_TYPE_SQLITE ):
                     engine = create_engine( self.db_url, encoding='utf-8', pool_pre_ping=True )
@@ -666,13 +685,9 @@ class SQLManager( object ):
                         cursor.execute( 'PRAGMA foreign_keys=ON' )
                         cursor.close()
                     
-                # Set the maximum memory allowed for the range optimizer
-                @event.listens_for( engine, 'connect' )
-                def set_range_optimizer_max_mem_size( dbapi_connection, connection_record ):
-                    cursor = dbapi_connection.cursor()
-                    cursor.execute( 'SET GLOBAL range_optimizer_max_mem_size = ' + str( SQLConstants.RANGE_OPTIMIZER_MAX_MEM_SIZE ) )
-                    cursor.close()  
-                    
+                # If requested, monitor the statements executed
+                SQLQueryMonitor.get_instance().attach( engine )
+                
             
             else:
                 engine = None
@@ -683,6 +698,10 @@ class SQLManager( object ):
                                        ' database types: ' + ', '.join( SQLConstants.AUTORIZED_DB_TYPES ) + 
                                        '). Please see the documentation for more information.' )
             
+        # Release the connections of the previous engine (if any)
+        if ( self.engine != None ):
+            self.engine.dispose()
+        
         self.engine = engine
             
 
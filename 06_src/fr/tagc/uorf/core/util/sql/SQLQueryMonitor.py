@@ -0,0 +1,440 @@
+# -*- coding: utf-8 -*-
+
+import os
+import random
+import re
+import sys
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+
+
+from fr.tagc.uorf.core.util.sql import SQLConstants
+from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
+
+
+## SQLQueryMonitor
+#  ===============
+#
+# This class is a singleton which allows to monitor the SQL statements executed
+# by the program, in order to find the statements and the parts of the program
+# that dominate the time spent querying the databases.
+#
+# When it is enabled, listeners are attached to the SQLAlchemy engines created
+# by the SQLManager instances (see the SQLManager.create_engine() method). Each
+# statement executed is then normalized into a "shape" (the literal values are
+# replaced by a '?' and the lists of values by a single '?') and the following
+# statistics are aggregated by statement shape and by calling function (i.e.
+# the first function of the program outside of the SQL managers):
+#     - The number of executions.
+#     - The total latency and the percentiles of latency (computed from a bounded
+#       sample of the latencies, kept using reservoir sampling).
+#     - The number of rows, as reported by the database driver (the drivers that
+#       do not report the number of rows of the SELECT statements, like sqlite3,
+#       only provide the number of rows updated).
+#
+# The SELECT statements with the same shape executed a large number of times by
+# the same calling function (typically, one query per entry processed in a loop)
+# are flagged as N+1 query candidates.
+#
+# NB: The statements executed in the processes forked by the program (e.g. by
+#     multiprocessing pools) are not taken into account.
+#
+class SQLQueryMonitor( object ):
+
+    __instance = None
+
+    ## Class variables
+    #  ---------------
+    #
+    # Regular expressions used to normalize the statements
+    #     - Literal strings
+    STRING_LITERAL_REGEX = re.compile( r"'(?:[^']|'')*'" )
+    #     - Literal numbers
+    NUMBER_LITERAL_REGEX = re.compile( r'\b[0-9]+(?:\.[0-9]+)?\b' )
+    #     - Lists of values / placeholders (e.g. 'IN (?, ?, ?)')
+    VALUE_LIST_REGEX = re.compile( r'\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))+\s*\)' )
+    #     - Blank characters
+    BLANK_REGEX = re.compile( r'\s+' )
+
+    # Key used to store the start times of the statements in the connection info
+    START_TIME_KEY = 'sql_monitor_start_times'
+
+    # Label used for the statements executed outside of the program functions
+    UNKNOWN_CALLER = 'Unknown'
+
+
+    ## Constructor of SQLQueryMonitor
+    #  ------------------------------
+    #
+    # Instance variables:
+    #     - enabled: Boolean - Is the monitoring enabled?
+    #     - package_folder: String - The folder of the program (used to find the calling functions).
+    #     - sql_folder: String - The folder of the SQL managers (ignored to find the calling functions).
+    #     - statements: Dictionary - The dictionary that associates to each statement shape its statistics.
+    #     - callers: Dictionary - The dictionary that associates to each calling function its statistics.
+    #     - shape_cache: Dictionary - The dictionary that associates to the raw statements their shape.
+    #     - caller_cache: Dictionary - The dictionary that associates to the code objects of the
+    #                                  functions their label (or None if they are not part of the program).
+    #     - random: Random - The random number generator used to sample the latencies.
+    #
+    def __init__( self ):
+
+        self.enabled = False
+
+        self.sql_folder = os.path.dirname( os.path.abspath( __file__ ) )
+        self.package_folder = os.path.dirname( os.path.dirname( os.path.dirname( self.sql_folder ) ) )
+
+        self.statements = {}
+        self.callers = {}
+        self.shape_cache = {}
+        self.caller_cache = {}
+        self.random = random.Random()
+
+
+    ## get_instance
+    #  ------------
+    #
+    # First time create an instance of SQLQueryMonitor,
+    # then return this instance.
+    #
+    # @return the singleton instance.
+    #
+    @staticmethod
+    def get_instance():
+
+        if ( SQLQueryMonitor.__instance == None ):
+            SQLQueryMonitor.__instance = SQLQueryMonitor()
+
+        return SQLQueryMonitor.__instance
+
+
+    ## enable
+    #  ------
+    #
+    # This method allows to enable the monitoring of the engines created from now.
+    #
+    def enable( self ):
+
+        self.enabled = True
+
+
+    ## attach
+    #  ------
+    #
+    # This method allows to attach the listeners to an engine,
+    # if the monitoring is enabled.
+    #
+    # @param engine: Engine - The SQLAlchemy engine.
+    #
+    def attach( self, engine ):
+
+        if ( self.enabled and ( engine != None ) ):
+            event.listen( engine, 'before_cursor_execute', self.before_cursor_execute )
+            event.listen( engine, 'after_cursor_execute', self.after_cursor_execute )
+            event.listen( engine, 'handle_error', self.handle_error )
+
+
+    ## before_cursor_execute
+    #  ---------------------
+    #
+    # This method is called by SQLAlchemy before a statement is executed.
+    # It saves the time at which the execution starts.
+    #
+    # @param conn: Connection - The connection.
+    # @param cursor: Cursor - The DBAPI cursor.
+    # @param statement: String - The statement.
+    # @param parameters: Tuple / Dictionary - The parameters of the statement.
+    # @param context: ExecutionContext - The execution context.
+    # @param executemany: Boolean - Is the statement executed with several sets of parameters?
+    #
+    def before_cursor_execute( self, conn, cursor, statement, parameters, context, executemany ):
+
+        conn.info.setdefault( SQLQueryMonitor.START_TIME_KEY, [] ).append( time.time() )
+
+
+    ## after_cursor_execute
+    #  --------------------
+    #
+    # This method is called by SQLAlchemy after a statement has been executed.
+    # It records the execution in the statistics.
+    #
+    # @param conn: Connection - The connection.
+    # @param cursor: Cursor - The DBAPI cursor.
+    # @param statement: String - The statement.
+    # @param parameters: Tuple / Dictionary - The parameters of the statement.
+    # @param context: ExecutionContext - The execution context.
+    # @param executemany: Boolean - Is the statement executed with several sets of parameters?
+    #
+    def after_cursor_execute( self, conn, cursor, statement, parameters, context, executemany ):
+
+        start_times = conn.info.get( SQLQueryMonitor.START_TIME_KEY )
+        if ( not start_times ):
+            return
+
+        latency = time.time() - start_times.pop()
+
+        rows = getattr( cursor, 'rowcount', -1 )
+        if ( ( rows == None ) or ( rows < 0 ) ):
+            rows = 0
+
+        self.record( statement = statement,
+                     caller = self.get_caller(),
+                     latency = latency,
+                     rows = rows )
+
+
+    ## handle_error
+    #  ------------
+    #
+    # This method is called by SQLAlchemy when an exception is raised
+    # during the execution of a statement. It discards the start time
+    # saved for this statement.
+    #
+    # @param exception_context: ExceptionContext - The context of the exception.
+    #
+    def handle_error( self, exception_context ):
+
+        conn = exception_context.connection
+        if ( conn != None ):
+            start_times = conn.info.get( SQLQueryMonitor.START_TIME_KEY )
+            if start_times:
+                start_times.pop()
+
+
+    ## get_shape
+    #  ---------
+    #
+    # This method allows to get the shape of a statement, i.e. the
+    # statement without its literal values.
+    #
+    # @param statement: String - The statement.
+    #
+    # @return shape: String - The shape of the statement.
+    #
+    def get_shape( self, statement ):
+
+        shape = self.shape_cache.get( statement )
+
+        if ( shape == None ):
+            shape = SQLQueryMonitor.STRING_LITERAL_REGEX.sub( '?', statement )
+            shape = SQLQueryMonitor.NUMBER_LITERAL_REGEX.sub( '?', shape )
+            shape = SQLQueryMonitor.VALUE_LIST_REGEX.sub( '(?)', shape )
+            shape = SQLQueryMonitor.BLANK_REGEX.sub( ' ', shape ).strip()
+
+            if ( len( self.shape_cache ) < SQLConstants.SQL_MONITOR_SHAPE_CACHE_SIZE ):
+                self.shape_cache[ statement ] = shape
+
+        return shape
+
+
+    ## get_caller
+    #  ----------
+    #
+    # This method allows to get the function of the program that
+    # executed the current statement, i.e. the first function of
+    # the call stack defined in the program, outside of the
+    # SQL managers.
+    #
+    # @return String - The calling function (as 'Module.function').
+    #
+    def get_caller( self ):
+
+        frame = sys._getframe( 1 )
+
+        while ( frame != None ):
+            code = frame.f_code
+
+            if ( code in self.caller_cache ):
+                caller = self.caller_cache[ code ]
+            else:
+                file_path = os.path.abspath( code.co_filename )
+                if ( file_path.startswith( self.package_folder )
+                     and ( not file_path.startswith( self.sql_folder ) ) ):
+                    caller = os.path.splitext( os.path.basename( file_path ) )[ 0 ] + '.' + code.co_name
+                else:
+                    caller = None
+                self.caller_cache[ code ] = caller
+
+            if ( caller != None ):
+                return caller
+
+            frame = frame.f_back
+
+        return SQLQueryMonitor.UNKNOWN_CALLER
+
+
+    ## record
+    #  ------
+    #
+    # This method allows to record the execution of a statement.
+    #
+    # @param statement: String - The statement.
+    # @param caller: String - The calling function.
+    # @param latency: Float - The latency (in seconds).
+    # @param rows: Integer - The number of rows reported by the driver.
+    #
+    def record( self, statement, caller, latency, rows ):
+
+        shape = self.get_shape( statement )
+
+        # Statistics of the statement shape
+        stats = self.statements.get( shape )
+        if ( stats == None ):
+            stats = { 'count': 0,
+                      'total_time': 0.,
+                      'rows': 0,
+                      'latencies': [],
+                      'callers': {} }
+            self.statements[ shape ] = stats
+
+        stats[ 'count' ] += 1
+        stats[ 'total_time' ] += latency
+        stats[ 'rows' ] += rows
+        stats[ 'callers' ][ caller ] = stats[ 'callers' ].get( caller, 0 ) + 1
+
+        # Keep a uniform sample of the latencies (reservoir sampling)
+        latencies = stats[ 'latencies' ]
+        if ( stats[ 'count' ] <= SQLConstants.SQL_MONITOR_LATENCY_SAMPLE_SIZE ):
+            latencies.append( latency )
+        else:
+            k = self.random.randint( 0, stats[ 'count' ] - 1 )
+            if ( k < SQLConstants.SQL_MONITOR_LATENCY_SAMPLE_SIZE ):
+                latencies[ k ] = latency
+
+        # Statistics of the calling function
+        caller_stats = self.callers.get( caller )
+        if ( caller_stats == None ):
+            caller_stats = { 'count': 0,
+                             'total_time': 0.,
+                             'rows': 0,
+                             'statements': set() }
+            self.callers[ caller ] = caller_stats
+
+        caller_stats[ 'count' ] += 1
+        caller_stats[ 'total_time' ] += latency
+        caller_stats[ 'rows' ] += rows
+        caller_stats[ 'statements' ].add( shape )
+
+
+    ## get_percentile
+    #  --------------
+    #
+    # This is a static method that allows to compute a percentile
+    # of a list of values (nearest-rank method).
+    #
+    # @param sorted_values: List - The values, sorted in ascending order.
+    # @param percentile: Integer - The percentile (between 0 and 100).
+    #
+    # @return Float - The percentile (None if the list is empty).
+    #
+    @staticmethod
+    def get_percentile( sorted_values, percentile ):
+
+        if ( not sorted_values ):
+            return None
+
+        rank = int( round( percentile / 100. * ( len( sorted_values ) - 1 ) ) )
+        return sorted_values[ rank ]
+
+
+    ## get_n_plus_one_candidates
+    #  -------------------------
+    #
+    # This method allows to get the SELECT statement shapes executed at least
+    # SQLConstants.SQL_MONITOR_N_PLUS_ONE_MIN_COUNT times by the same calling
+    # function.
+    #
+    # @return candidates: List - The list of N+1 query candidates (dictionaries),
+    #                            sorted by decreasing number of executions.
+    #
+    def get_n_plus_one_candidates( self ):
+
+        candidates = []
+
+        for ( shape, stats ) in self.statements.items():
+            if ( not shape.upper().startswith( 'SELECT' ) ):
+                continue
+
+            for ( caller, count ) in stats[ 'callers' ].items():
+                if ( count >= SQLConstants.SQL_MONITOR_N_PLUS_ONE_MIN_COUNT ):
+                    candidates.append( OrderedDict( [ ( 'caller', caller ),
+                                                      ( 'count', count ),
+                                                      ( 'estimated_total_time', stats[ 'total_time' ] * count / stats[ 'count' ] ),
+                                                      ( 'statement', shape ) ] ) )
+
+        candidates.sort( key = lambda candidate: candidate[ 'count' ], reverse = True )
+
+        return candidates
+
+
+    ## get_report
+    #  ----------
+    #
+    # This method allows to get the statistics of the statements executed.
+    #
+    # @return report: OrderedDict - The statistics (JSON serializable).
+    #
+    def get_report( self ):
+
+        statements_report = []
+        for ( shape, stats ) in sorted( self.statements.items(),
+                                        key = lambda item: item[ 1 ][ 'total_time' ],
+                                        reverse = True )[ : SQLConstants.SQL_MONITOR_REPORT_LINES_NB ]:
+            latencies = sorted( stats[ 'latencies' ] )
+
+            statement_report = OrderedDict( [ ( 'statement', shape ),
+                                              ( 'count', stats[ 'count' ] ),
+                                              ( 'total_time', stats[ 'total_time' ] ),
+                                              ( 'mean_time', stats[ 'total_time' ] / stats[ 'count' ] ) ] )
+            for percentile in SQLConstants.SQL_MONITOR_PERCENTILES:
+                statement_report[ 'p' + str( percentile ) + '_time' ] = SQLQueryMonitor.get_percentile( latencies, percentile )
+            statement_report[ 'rows' ] = stats[ 'rows' ]
+            statement_report[ 'callers' ] = stats[ 'callers' ]
+
+            statements_report.append( statement_report )
+
+        callers_report = []
+        for ( caller, stats ) in sorted( self.callers.items(),
+                                         key = lambda item: item[ 1 ][ 'total_time' ],
+                                         reverse = True )[ : SQLConstants.SQL_MONITOR_REPORT_LINES_NB ]:
+            callers_report.append( OrderedDict( [ ( 'caller', caller ),
+                                                  ( 'count', stats[ 'count' ] ),
+                                                  ( 'total_time', stats[ 'total_time' ] ),
+                                                  ( 'rows', stats[ 'rows' ] ),
+                                                  ( 'distinct_statements', len( stats[ 'statements' ] ) ) ] ) )
+
+        report = OrderedDict( [ ( 'statements_nb', sum( [ stats[ 'count' ] for stats in self.statements.values() ] ) ),
+                                ( 'distinct_statements_nb', len( self.statements ) ),
+                                ( 'total_time', sum( [ stats[ 'total_time' ] for stats in self.statements.values() ] ) ),
+                                ( 'statements', statements_report ),
+                                ( 'callers', callers_report ),
+                                ( 'n_plus_one_candidates', self.get_n_plus_one_candidates() ) ] )
+
+        return report
+
+
+    ## add_to_report
+    #  -------------
+    #
+    # This method allows to add the statistics of the statements executed to
+    # the run report and to log a short summary (including the N+1 query
+    # candidates), if the monitoring is enabled.
+    #
+    def add_to_report( self ):
+
+        if ( not self.enabled ):
+            return
+
+        report = self.get_report()
+        RunTelemetry.get_instance().add_report_section( SQLConstants.SQL_MONITOR_REPORT_SECTION, report )
+
+        Logger.get_instance().info( '%s SQL statements (%s distinct shapes) have been executed in %.2f seconds.',
+                                    report[ 'statements_nb' ], report[ 'distinct_statements_nb' ], report[ 'total_time' ] )
+
+        for candidate in report[ 'n_plus_one_candidates' ]:
+            Logger.get_instance().info( 'Possible N+1 query: the following statement has been executed %s times' +
+                                        ' by %s: %s',
+                                        candidate[ 'count' ], candidate[ 'caller' ], candidate[ 'statement' ] )
@@ -0,0 +1,407 @@
+# -*- coding: utf-8 -*-
+
+import cProfile
+import functools
+import json
+import os
+import pstats
+import re
+import time
+from collections import OrderedDict
+
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util.telemetry.TelemetryStage import TelemetryStage
+
+
+## RunTelemetry
+#  ============
+#
+# This class is a singleton which allows to measure the named stages of the
+# program (e.g. the merging of the DSORF entries) and to write a machine-readable
+# report (JSON) of the run.
+#
+# A stage may be measured using:
+#     - the stage() method as a context manager, e.g.:
+#           with RunTelemetry.get_instance().stage( 'download_orf_sequences' ):
+#               ...
+#     - the timed_stage() decorator, e.g.:
+#           @RunTelemetry.timed_stage()
+#           def merge_dsorfs( self ):
+#               ...
+# The stages may be nested, in which case they are identified by their path
+# (e.g. 'Merge/merge_dsota'). When a stage is run several times, its record
+# accumulates all the executions. The number of rows processed by the current
+# stage may be increased using the add_rows() method.
+#
+# For each stage, the report provides the number of calls, the wall time, the
+# CPU time (of the process and of its terminated child processes, e.g. the
+# workers of the pools), the peak resident set size (of the process and of its
+# largest child process), the number of rows processed and the throughput.
+#
+# Stages may also be profiled (cProfile). The statistics of each profiled
+# stage are saved in the profiles folder, both raw (.prof file, that may be
+# loaded with pstats or snakeviz) and sorted (.txt file).
+# NB: As only one profiler may be active at a time, the stages nested in a
+#     profiled stage are not profiled separately.
+#
+class RunTelemetry( object ):
+
+    __instance = None
+
+    ## Class variables
+    #  ---------------
+    #
+    # Extensions of the profiling statistics files
+    PROFILE_FILE_EXTENSION = '.prof'
+    PROFILE_STATS_FILE_EXTENSION = '.txt'
+
+    # Separator of the stage names in the path
+    STAGE_PATH_SEPARATOR = '/'
+
+
+    ## Constructor of RunTelemetry
+    #  ---------------------------
+    #
+    # Instance variables:
+    #     - start_time: Float - The time at which the instance has been created.
+    #     - stages: OrderedDict - The dictionary that associates to each stage path its record
+    #                             (dictionary), in the order the stages have been entered.
+    #     - active_stages: List - The stack of stages currently running.
+    #     - profiled_stages: List - The list of names of the stages to profile
+    #                               (None if no stage has to be profiled).
+    #     - profile_folder: String - The folder where the profiling statistics are saved.
+    #     - profilers: OrderedDict - The dictionary that associates to each stage path its profiler.
+    #     - report_sections: OrderedDict - The dictionary of additional sections of the report
+    #                                      (see the add_report_section() method).
+    #
+    def __init__( self ):
+
+        self.start_time = time.time()
+        self.stages = OrderedDict()
+        self.active_stages = []
+        self.profiled_stages = None
+        self.profile_folder = None
+        self.profilers = OrderedDict()
+        self.report_sections = OrderedDict()
+
+
+    ## get_instance
+    #  ------------
+    #
+    # First time create an instance of RunTelemetry,
+    # then return this instance.
+    #
+    # @return the singleton instance.
+    #
+    @staticmethod
+    def get_instance():
+
+        if ( RunTelemetry.__instance == None ):
+            RunTelemetry.__instance = RunTelemetry()
+
+        return RunTelemetry.__instance
+
+
+    ## timed_stage
+    #  -----------
+    #
+    # This is a static method that allows to get a decorator measuring
+    # each call to the decorated function as a stage.
+    #
+    # @param name: String - The name of the stage. If None, the name of
+    #                       the function is used. None by default.
+    #
+    # @return Function - The decorator.
+    #
+    @staticmethod
+    def timed_stage( name=None ):
+
+        def decorator( function ):
+
+            stage_name = ( name if name else function.__name__ )
+
+            @functools.wraps( function )
+            def timed_function( *args, **kwargs ):
+                with RunTelemetry.get_instance().stage( stage_name ):
+                    return function( *args, **kwargs )
+
+            return timed_function
+
+        return decorator
+
+
+    ## set_profiled_stages
+    #  -------------------
+    #
+    # This method allows to request some stages to be profiled.
+    #
+    # @param stage_names: List - The list of names of the stages to profile
+    #                            (Constants.PROFILE_ALL_STAGES to profile all of them).
+    # @param profile_folder: String - The folder where the statistics have to be saved.
+    #                                 Constants.PROFILE_FOLDER by default.
+    #
+    def set_profiled_stages( self, stage_names, profile_folder=Constants.PROFILE_FOLDER ):
+
+        self.profiled_stages = [ name.strip() for name in stage_names if name.strip() ]
+        self.profile_folder = profile_folder
+
+
+    ## stage
+    #  -----
+    #
+    # This method allows to get a context manager measuring a stage.
+    #
+    # @param name: String - The name of the stage.
+    # @param rows: Integer - The number of rows processed during the stage,
+    #                        if already known. 0 by default.
+    #
+    # @return TelemetryStage - The context manager.
+    #
+    def stage( self, name, rows=0 ):
+
+        return TelemetryStage( self, name, rows )
+
+
+    ## add_rows
+    #  --------
+    #
+    # This method allows to increase the number of rows processed by
+    # the stage currently running (if any).
+    #
+    # @param row_count: Integer - The number of rows to add.
+    #
+    def add_rows( self, row_count ):
+
+        if self.active_stages:
+            self.active_stages[ -1 ].add_rows( row_count )
+
+
+    ## enter_stage
+    #  -----------
+    #
+    # This method is called by the TelemetryStage instances when they are entered.
+    #
+    # @param stage: TelemetryStage - The stage.
+    #
+    # @return path: String - The path of the stage.
+    #
+    def enter_stage( self, stage ):
+
+        if self.active_stages:
+            path = self.active_stages[ -1 ].path + RunTelemetry.STAGE_PATH_SEPARATOR + stage.name
+        else:
+            path = stage.name
+
+        if ( path not in self.stages ):
+            self.stages[ path ] = OrderedDict( [ ( 'stage', path ),
+                                                 ( 'depth', len( self.active_stages ) ),
+                                                 ( 'calls', 0 ),
+                                                 ( 'failed_calls', 0 ),
+                                                 ( 'wall_time', 0. ),
+                                                 ( 'cpu_time', 0. ),
+                                                 ( 'cpu_time_children', 0. ),
+                                                 ( 'peak_rss_mb', 0. ),
+                                                 ( 'peak_rss_children_mb', 0. ),
+                                                 ( 'rows', 0 ),
+                                                 ( 'rows_per_second', None ) ] )
+
+        self.active_stages.append( stage )
+
+        return path
+
+
+    ## exit_stage
+    #  ----------
+    #
+    # This method is called by the TelemetryStage instances when they are exited,
+    # in order to add the measurements to the record of the stage.
+    #
+    # @param stage: TelemetryStage - The stage.
+    # @param wall_time: Float - The wall time elapsed (in seconds).
+    # @param cpu_time: Float - The CPU time used by the process (in seconds).
+    # @param cpu_time_children: Float - The CPU time used by the child processes
+    #                                   terminated during the stage (in seconds).
+    # @param peak_rss: Integer - The peak resident set size of the process (in kB).
+    # @param peak_rss_children: Integer - The peak resident set size of the largest
+    #                                     terminated child process (in kB).
+    # @param failed: Boolean - Has an exception been raised during the stage?
+    #
+    def exit_stage( self, stage, wall_time, cpu_time, cpu_time_children, peak_rss, peak_rss_children, failed ):
+
+        if ( self.active_stages and ( self.active_stages[ -1 ] is stage ) ):
+            self.active_stages.pop()
+
+        record = self.stages[ stage.path ]
+        record[ 'calls' ] += 1
+        if failed:
+            record[ 'failed_calls' ] += 1
+        record[ 'wall_time' ] += wall_time
+        record[ 'cpu_time' ] += cpu_time
+        record[ 'cpu_time_children' ] += cpu_time_children
+        record[ 'peak_rss_mb' ] = max( record[ 'peak_rss_mb' ], peak_rss / 1024. )
+        record[ 'peak_rss_children_mb' ] = max( record[ 'peak_rss_children_mb' ], peak_rss_children / 1024. )
+        record[ 'rows' ] += stage.rows
+        if ( ( record[ 'rows' ] > 0 ) and ( record[ 'wall_time' ] > 0 ) ):
+            record[ 'rows_per_second' ] = record[ 'rows' ] / record[ 'wall_time' ]
+
+
+    ## get_profiler
+    #  ------------
+    #
+    # This method allows to get the profiler to use for a stage.
+    #
+    # @param stage: TelemetryStage - The stage (already entered).
+    #
+    # @return Profile - The profiler of the stage (the same one for all the executions
+    #                   of the stage), or None if the stage has not to be profiled.
+    #
+    def get_profiler( self, stage ):
+
+        if ( ( not self.profiled_stages )
+             or ( ( Constants.PROFILE_ALL_STAGES not in self.profiled_stages )
+                  and ( stage.name not in self.profiled_stages ) ) ):
+            return None
+
+        # Do not profile a stage nested in a profiled stage
+        for active_stage in self.active_stages:
+            if ( ( active_stage is not stage ) and ( active_stage.profiler != None ) ):
+                return None
+
+        profiler = self.profilers.get( stage.path )
+        if ( profiler == None ):
+            profiler = cProfile.Profile()
+            self.profilers[ stage.path ] = profiler
+
+        return profiler
+
+
+    ## add_report_section
+    #  ------------------
+    #
+    # This method allows to add a section to the report (e.g. statistics
+    # about the SQL statements executed during the run).
+    #
+    # @param name: String - The name of the section.
+    # @param content: Dictionary / List - The content of the section (JSON serializable).
+    #
+    def add_report_section( self, name, content ):
+
+        self.report_sections[ name ] = content
+
+
+    ## get_report
+    #  ----------
+    #
+    # This method allows to get the report of the run.
+    #
+    # @param strategy: String - The name of the strategy run.
+    #
+    # @return report: OrderedDict - The report.
+    #
+    def get_report( self, strategy ):
+
+        end_time = time.time()
+
+        report = OrderedDict( [ ( 'strategy', strategy ),
+                                ( 'start_time', time.strftime( '%Y-%m-%dT%H:%M:%S', time.localtime( self.start_time ) ) ),
+                                ( 'end_time', time.strftime( '%Y-%m-%dT%H:%M:%S', time.localtime( end_time ) ) ),
+                                ( 'wall_time', end_time - self.start_time ),
+                                ( 'stages', self.stages.values() ) ] )
+
+        if self.profilers:
+            report[ 'profiles' ] = [ self.get_profile_file_path( path ) for path in self.profilers.keys() ]
+
+        for ( name, content ) in self.report_sections.items():
+            report[ name ] = content
+
+        return report
+
+
+    ## get_profile_file_path
+    #  ---------------------
+    #
+    # This method allows to get the path to the file where the raw
+    # profiling statistics of a stage are saved.
+    #
+    # @param path: String - The path of the stage.
+    #
+    # @return String - The path to the file.
+    #
+    def get_profile_file_path( self, path ):
+
+        filename = re.sub( '[^A-Za-z0-9_.-]', '_', path.replace( RunTelemetry.STAGE_PATH_SEPARATOR, '.' ) )
+        return os.path.join( self.profile_folder, filename + RunTelemetry.PROFILE_FILE_EXTENSION )
+
+
+    ## write_profiles
+    #  --------------
+    #
+    # This method allows to save the statistics of all the profiled stages.
+    #
+    def write_profiles( self ):
+
+        if ( not self.profilers ):
+            return
+
+        if ( not os.path.exists( self.profile_folder ) ):
+            os.makedirs( self.profile_folder )
+
+        for ( path, profiler ) in self.profilers.items():
+            profile_file_path = self.get_profile_file_path( path )
+            profiler.dump_stats( profile_file_path )
+
+            with open( profile_file_path[ : -len( RunTelemetry.PROFILE_FILE_EXTENSION ) ] +
+                       RunTelemetry.PROFILE_STATS_FILE_EXTENSION, 'w' ) as stats_file:
+                stats = pstats.Stats( profiler, stream = stats_file )
+                stats.sort_stats( Constants.PROFILE_SORT_KEY ).print_stats( Constants.PROFILE_STATS_LINES_NB )
+
+
+    ## write_report
+    #  ------------
+    #
+    # This method allows to write the report of the run (JSON) and
+    # the statistics of the profiled stages.
+    #
+    # @param strategy: String - The name of the strategy run.
+    # @param file_path: String - The path to the report file. Constants.PATH_RUN_REPORT by default.
+    #
+    def write_report( self, strategy, file_path=Constants.PATH_RUN_REPORT ):
+
+        self.write_profiles()
+
+        with open( file_path, 'w' ) as report_file:
+            json.dump( self.get_report( strategy ), report_file, indent = 2, default = str )
+
+
+    ## get_report_error
+    #  ----------------
+    #
+    # This is a static method that allows to know, from its run report, if a
+    # program run in another process failed. As the program exits normally
+    # when a critical error occurs, a missing report, a failed stage or a
+    # missing stage of the strategy means that the strategy failed.
+    #
+    # @param report_path: String - The path to the run report of the process.
+    # @param strategy: String - The name of the strategy run by the process.
+    #
+    # @return String - The error (or None if the strategy succeeded).
+    #
+    @staticmethod
+    def get_report_error( report_path, strategy ):
+
+        if ( not os.path.exists( report_path ) ):
+            return 'The process did not write any run report.'
+
+        with open( report_path, 'r' ) as report_file:
+            report = json.load( report_file )
+
+        failed_stages = [ stage[ 'stage' ] for stage in report.get( 'stages', [] )
+                                           if ( stage.get( 'failed_calls', 0 ) > 0 ) ]
+        if failed_stages:
+            return 'The following stages failed: ' + ', '.join( failed_stages ) + '.'
+
+        if ( strategy not in [ stage[ 'stage' ] for stage in report.get( 'stages', [] ) ] ):
+            return 'The run report does not contain the stage of the strategy.'
+
+        return None
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+import os
+import resource
+import time
+
+
+## TelemetryStage
+#  ==============
+#
+# This class is a context manager allowing to measure one execution of a
+# named stage of the program (see the documentation of the RunTelemetry class).
+#
+# When the stage is entered, the wall time and the CPU time of the process
+# (and of its terminated child processes) are saved. When the stage is exited,
+# the elapsed times, the peak resident set size and the number of rows
+# processed are added to the record of the stage in the RunTelemetry instance.
+#
+class TelemetryStage( object ):
+
+    ## Constructor of TelemetryStage
+    #  -----------------------------
+    #
+    # Instance variables:
+    #     - telemetry: RunTelemetry - The RunTelemetry instance recording the stage.
+    #     - name: String - The name of the stage.
+    #     - path: String - The path of the stage (names of the enclosing stages
+    #                      and of this stage), defined when the stage is entered.
+    #     - rows: Integer - The number of rows processed during the stage.
+    #     - profiler: Profile - The profiler used for this stage (None if the
+    #                           stage is not profiled).
+    #     - start_wall_time: Float - The wall time at which the stage has been entered.
+    #     - start_cpu_times: Tuple - The ( process CPU time, children CPU time )
+    #                                tuple when the stage has been entered.
+    #
+    # @param telemetry: RunTelemetry - The RunTelemetry instance recording the stage.
+    # @param name: String - The name of the stage.
+    # @param rows: Integer - The number of rows processed during the stage, if
+    #                        already known. 0 by default.
+    #
+    def __init__( self, telemetry, name, rows=0 ):
+
+        self.telemetry = telemetry
+        self.name = name
+        self.path = None
+        self.rows = rows
+        self.profiler = None
+        self.start_wall_time = None
+        self.start_cpu_times = None
+
+
+
+    ## get_cpu_times
+    #  -------------
+    #
+    # This is a static method that allows to get the CPU time (user and
+    # system) used by the process and by its terminated child processes.
+    #
+    # @return Tuple - The ( process CPU time, children CPU time ) tuple (in seconds).
+    #
+    @staticmethod
+    def get_cpu_times():
+
+        times = os.times()
+        return ( ( times[ 0 ] + times[ 1 ] ), ( times[ 2 ] + times[ 3 ] ) )
+
+
+
+    ## add_rows
+    #  --------
+    #
+    # This method allows to increase the number of rows processed during the stage.
+    #
+    # @param row_count: Integer - The number of rows to add.
+    #
+    def add_rows( self, row_count ):
+
+        self.rows += row_count
+
+
+
+    ## __enter__
+    #  ---------
+    #
+    # This method allows to start the measurement of the stage.
+    #
+    # @return self
+    #
+    def __enter__( self ):
+
+        self.path = self.telemetry.enter_stage( self )
+
+        self.profiler = self.telemetry.get_profiler( self )
+        if ( self.profiler != None ):
+            self.profiler.enable()
+
+        self.start_cpu_times = TelemetryStage.get_cpu_times()
+        self.start_wall_time = time.time()
+
+        return self
+
+
+
+    ## __exit__
+    #  --------
+    #
+    # This method allows to stop the measurement of the stage and to
+    # record it. Exceptions raised during the stage are not caught.
+    #
+    # @param exc_type: Class - The class of the exception raised during the stage (if any).
+    # @param exc_value: Exception - The exception raised during the stage (if any).
+    # @param traceback: Traceback - The traceback of the exception (if any).
+    #
+    # @return False
+    #
+    def __exit__( self, exc_type, exc_value, traceback ):
+
+        wall_time = time.time() - self.start_wall_time
+        end_cpu_times = TelemetryStage.get_cpu_times()
+
+        if ( self.profiler != None ):
+            self.profiler.disable()
+
+        self.telemetry.exit_stage( stage = self,
+                                   wall_time = wall_time,
+                                   cpu_time = end_cpu_times[ 0 ] - self.start_cpu_times[ 0 ],
+                                   cpu_time_children = end_cpu_times[ 1 ] - self.start_cpu_times[ 1 ],
+                                   peak_rss = resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss,
+                                   peak_rss_children = resource.getrusage( resource.RUSAGE_CHILDREN ).ru_maxrss,
+                                   failed = ( exc_type != None ) )
+
+        return False
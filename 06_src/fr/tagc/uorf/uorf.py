@@ -3,10 +3,10 @@
 from datetime import datetime
 
 
-# NB: The following modules are not imported at the beginning of the file 
-#     but during the execution of the main function:
-#         - execution module: from fr.tagc.uorf.core.execution import *
-#     Please see the main function for more information.
+# NB: The modules of the strategies are not imported at the beginning of the file 
+#     but during the execution of the main function, and only the module of the 
+#     strategy requested is imported. Please see the load_strategy_class() method 
+#     of the OptionManager and the main function for more information.
 
 from fr.tagc.uorf.core.util import Constants
 from fr.tagc.uorf.core.util.option.OptionManager import OptionManager
@@ -14,6 +14,9 @@ from fr.tagc.uorf.core.util.sql.SQLCollationManager import SQLCollationManager
 from fr.tagc.uorf.core.util.option import OptionConstants
 from fr.tagc.uorf.core.util.exception import *
 from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.log.DiagnosticsAggregator import DiagnosticsAggregator
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
+from fr.tagc.uorf.core.util.sql.SQLQueryMonitor import SQLQueryMonitor
 
 
 ## DenCellORF
@@ -39,7 +42,7 @@ class DenCellORF( object ):
         
         if ( strategy_command != None ):
             try:
-                strategy = eval( strategy_command + 'Strategy()' )
+                strategy = OptionManager.load_strategy_class( strategy_command )()
             except Exception as e:
                 raise DenCellORFException( 'DenCellORF.execute(): An error occurred during the' +
                                            ' instantiation of the strategy: ' + str( e ) )
@@ -50,10 +53,23 @@ class DenCellORF( object ):
                                             '. See the documentation for more information.' )
         
         try:
-            strategy.execute()
+            with RunTelemetry.get_instance().stage( strategy_command ):
+                strategy.execute()
         except Exception as e:
             raise DenCellORFException( 'DenCellORF.execute(): An error occurred during the execution'+
                                        ' of the program.', e )
+        finally:
+            # Log the summary of the warnings aggregated during the execution of the strategy
+            DiagnosticsAggregator.get_instance().flush( strategy_command + ' strategy' )
+            
+            # Write the report of the run (duration, memory and throughput of each stage,
+            # statistics about the SQL statements if requested)
+            try:
+                SQLQueryMonitor.get_instance().add_to_report()
+                RunTelemetry.get_instance().write_report( strategy_command )
+            except Exception as e:
+                Logger.get_instance().error( 'DenCellORF.execute(): An error occurred trying to write' +
+                                             ' the run report: ' + str( e ), ex = False )
 
 
 
@@ -86,13 +102,25 @@ if __name__ == '__main__':
                                             '. Please see the documentation for more information.' )
         Logger.get_instance().set_mode( Constants.LOG_MODES[ verbosity_level ] )
         
+        # If requested, write the full messages of the aggregated warnings in a separate file
+        if OptionManager.get_instance().get_option( OptionConstants.OPTION_LOG_DETAILS ):
+            DiagnosticsAggregator.get_instance().set_details_file_path( Constants.PATH_LOG_DETAILS )
+        
+        # If requested, profile the selected stages
+        profiled_stages = OptionManager.get_instance().get_option( OptionConstants.OPTION_PROFILE )
+        if profiled_stages:
+            RunTelemetry.get_instance().set_profiled_stages( profiled_stages.split( Constants.PROFILE_STAGE_SEPARATOR ) )
+        
+        # If requested, monitor the SQL statements executed
+        if OptionManager.get_instance().get_option( OptionConstants.OPTION_SQL_STATS ):
+            SQLQueryMonitor.get_instance().enable()
+        
         # Get the type of database, in order to set the appropriate collation for strings
         SQLCollationManager.get_instance().set_db_collation( OptionManager.get_instance().get_option( OptionConstants.OPTION_DB_TYPE ) )
-        # NB: The execution module is only imported after this step in order to allow a 
-        #     "dynamic" creation of the model (classes inheriting from SQLAlchemy Base). 
-        #     Indeed, once the model has been loaded, this is not possible to update the
-        #     collation of the columns.
-        from fr.tagc.uorf.core.execution import *
+        # NB: The module of the strategy is only imported after this step (when the strategy 
+        #     is instantiated) in order to allow a "dynamic" creation of the model (classes 
+        #     inheriting from SQLAlchemy Base). Indeed, once the model has been loaded, this 
+        #     is not possible to update the collation of the columns.
         
         # Instantiate DenCellORF
         DenCellORF = DenCellORF()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+
+from fr.tagc.uorf.core.execution.merge.MergePartition import MergePartition
+
+from fr.tagc.uorf.core.util.exception import *
+
+
+## TestMergePartition
+#  ==================
+#
+# This class contains the tests of the MergePartition class.
+#
+# These tests may be run from the source folder using:
+#     python -m unittest discover test
+#
+class TestMergePartition( unittest.TestCase ):
+
+    ## test_parse_partitions
+    #  ---------------------
+    #
+    # Parse the partitions provided as option.
+    #
+    def test_parse_partitions( self ):
+
+        self.assertEqual( MergePartition.parse_partitions( '1, 2;X' ), [ [ '1', '2' ], [ 'X' ] ] )
+
+        self.assertRaises( DenCellORFException, MergePartition.parse_partitions, '1;;X' )
+        self.assertRaises( DenCellORFException, MergePartition.parse_partitions, '1,2;2,X' )
+
+
+    ## test_uncovered_chromosomes
+    #  --------------------------
+    #
+    # Get the chromosomes that do not belong to any partition.
+    #
+    def test_uncovered_chromosomes( self ):
+
+        partitions = MergePartition.parse_partitions( '1;2,X' )
+
+        self.assertEqual( MergePartition.get_uncovered_chromosomes( partitions, [ '1', '2', 'GL000220.1', 'Y' ] ),
+                          [ 'GL000220.1', 'Y' ] )
+        self.assertEqual( MergePartition.get_uncovered_chromosomes( partitions, [ '1', 'X' ] ), [] )
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+
+from fr.tagc.uorf.core.execution.MergeStrategy import MergeStrategy
+from fr.tagc.uorf.core.execution.dbcheck.CheckDatabase import CheckDatabase
+from fr.tagc.uorf.core.execution.dbcheck.CheckDSDatabase import CheckDSDatabase
+from fr.tagc.uorf.core.model.DS import *
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
+from fr.tagc.uorf.core.util.sql.SQLManagerDS import SQLManagerDS
+from fr.tagc.uorf.core.util.option.OptionManager import OptionManager
+from fr.tagc.uorf.core.util.exception import *
+
+
+## TestMergeStrategy
+#  =================
+#
+# This class contains the tests of the partitioned merging performed by
+# the MergeStrategy class.
+#
+# These tests may be run from the source folder using:
+#     python -m unittest discover test
+#
+class TestMergeStrategy( unittest.TestCase ):
+
+    ## Class variables
+    #  ---------------
+    #
+    # Name of the data source of the DSORFs
+    DATA_SOURCE = 'source'
+
+    # Chromosomes on which the DSORFs are located
+    DSORF_CHROMOSOMES = [ '1', '2', 'GL000220.1' ]
+
+
+    ## setUp
+    #  -----
+    #
+    # Create the config file in a temporary folder and fill in the
+    # DS database with one data source and one DSORF on each chromosome.
+    #
+    def setUp( self ):
+
+        self.folder = tempfile.mkdtemp()
+
+        os.makedirs( os.path.join( self.folder, 'db' ) )
+        self.config_file = os.path.join( self.folder, 'config.ini' )
+        with open( self.config_file, 'w' ) as config_file:
+            config_file.write( '[' + Constants.CONFIG_SECTION_DATABASE + ']\n' +
+                               Constants.CONFIG_SECTION_DATABASE_ITEM_SPECIES + ' = Hsapiens\n' +
+                               Constants.CONFIG_SECTION_DATABASE_ITEM_DB_FOLDER + ' = ' +
+                               os.path.join( self.folder, 'db' ) + '\n' +
+                               Constants.CONFIG_SECTION_DATABASE_ITEM_DS_DB_NAME + ' = ds\n' +
+                               Constants.CONFIG_SECTION_DATABASE_ITEM_PRO_DB_NAME + ' = pro\n' )
+
+        OptionManager.get_instance().initialize( [ 'Merge', '-c', self.config_file, '-T', 'SQLite' ] )
+        CheckDSDatabase().execute()
+
+        SQLManagerDS.get_instance().get_session().add( DataSource( name = TestMergeStrategy.DATA_SOURCE ) )
+        SQLManagerDS.get_instance().commit()
+
+        dsorfs = []
+        for ( dsorf_id, chromosome ) in enumerate( TestMergeStrategy.DSORF_CHROMOSOMES ):
+            dsorfs.append( DSORF( id = dsorf_id + 1,
+                                  data_source = TestMergeStrategy.DATA_SOURCE,
+                                  chromosome = chromosome,
+                                  raw_strand = '+',
+                                  raw_start_pos = 100,
+                                  raw_stop_pos = 200,
+                                  spliced = False ) )
+        SQLManagerDS.get_instance().get_session().add_all( dsorfs )
+        SQLManagerDS.get_instance().commit()
+        SQLManagerDS.get_instance().close_session()
+
+
+    ## tearDown
+    #  --------
+    #
+    def tearDown( self ):
+
+        CheckDatabase.reset_checked_databases()
+        shutil.rmtree( self.folder )
+
+
+    ## get_merge_strategy
+    #  ------------------
+    #
+    # Instantiate the MergeStrategy using the partitions provided.
+    #
+    # @param partitions: String - The partitions of chromosomes.
+    #
+    # @return MergeStrategy - The strategy.
+    #
+    def get_merge_strategy( self, partitions ):
+
+        OptionManager.get_instance().initialize( [ 'Merge', '-c', self.config_file, '-T', 'SQLite',
+                                                   '-k', partitions ] )
+        return MergeStrategy()
+
+
+    ## test_partitions_missing_chromosome
+    #  ----------------------------------
+    #
+    # Check the partitioned merging is stopped when a DSORF is
+    # located on a chromosome that does not belong to any partition.
+    #
+    def test_partitions_missing_chromosome( self ):
+
+        merge_strategy = self.get_merge_strategy( '1;2' )
+
+        with self.assertRaises( DenCellORFException ) as context:
+            merge_strategy.check_partitions()
+
+        self.assertIn( 'GL000220.1', str( context.exception ) )
+        self.assertIn( LogCodes.ERR_MERG_PARTITION, str( context.exception ) )
+
+
+    ## test_partitions_covering_chromosomes
+    #  ------------------------------------
+    #
+    # Check the partitioned merging is allowed when each DSORF
+    # is located on a chromosome that belongs to a partition.
+    #
+    def test_partitions_covering_chromosomes( self ):
+
+        merge_strategy = self.get_merge_strategy( '1;2,GL000220.1' )
+        merge_strategy.check_partitions()
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+
+from fr.tagc.uorf.core.execution import GenerateStatFilesStrategy as GenerateStatFilesStrategyModule
+from fr.tagc.uorf.core.execution.GenerateStatFilesStrategy import GenerateStatFilesStrategy
+from fr.tagc.uorf.core.execution.PipelineStrategy import PipelineStrategy
+from fr.tagc.uorf.core.execution.dbcheck.CheckDatabase import CheckDatabase
+from fr.tagc.uorf.core.execution.dbcheck.CheckPRODatabase import CheckPRODatabase
+
+from fr.tagc.uorf.core.util import Constants
+from fr.tagc.uorf.core.util import LogCodes
+from fr.tagc.uorf.core.util.sql.SQLManagerPRO import SQLManagerPRO
+from fr.tagc.uorf.core.util.option.OptionManager import OptionManager
+from fr.tagc.uorf.core.util.log.Logger import Logger
+from fr.tagc.uorf.core.util.telemetry.RunTelemetry import RunTelemetry
+
+
+## TestPipelineStrategy
+#  ====================
+#
+# This class contains the tests of the PipelineStrategy class.
+#
+# The log files are scanned by the GenerateStatFiles strategy using a pool
+# of processes, hence running this strategy several times in the same
+# pipeline allows to check that the steps do not reuse a pool closed by a
+# previous step (the pools are cached by pathos).
+#
+# The DatabaseCheck strategy is used to check that a database already
+# checked by a step is not checked again by the next ones.
+#
+# These tests may be run from the source folder using:
+#     python -m unittest discover test
+#
+class TestPipelineStrategy( unittest.TestCase ):
+
+    ## Class variables
+    #  ---------------
+    #
+    # Number of processes used by each step
+    THREAD_NB = 2
+    
+    # Log code written in the log files to scan
+    LOG_CODE = LogCodes.WARN_RELCOORD_CONFL_STARTCODON
+
+
+    ## setUp
+    #  -----
+    #
+    # Create the log files to scan, the pipeline file and the config file
+    # in a temporary folder.
+    #
+    def setUp( self ):
+
+        self.folder = tempfile.mkdtemp()
+
+        self.path_log = Constants.PATH_LOG
+        Constants.PATH_LOG = os.path.join( self.folder, 'execution.log' )
+        for suffix in [ '', '.1' ]:
+            with open( Constants.PATH_LOG + suffix, 'w' ) as log_file:
+                log_file.write( 'INFO - Starting.\n' +
+                                'WARNING - A warning. Warning code: ' + TestPipelineStrategy.LOG_CODE + '.\n' )
+
+        # Make sure the steps use a pool, whatever the number of CPUs
+        self.cpu_count = GenerateStatFilesStrategyModule.cpu_count
+        GenerateStatFilesStrategyModule.cpu_count = lambda: TestPipelineStrategy.THREAD_NB
+
+        self.output_folders = [ os.path.join( self.folder, 'stat' + str( step_nb ) ) for step_nb in range( 2 ) ]
+        self.pipeline_file = os.path.join( self.folder, 'pipeline.txt' )
+        with open( self.pipeline_file, 'w' ) as pipeline_file:
+            for output_folder in self.output_folders:
+                pipeline_file.write( 'GenerateStatFiles -f -t ' + str( TestPipelineStrategy.THREAD_NB ) +
+                                     ' -o ' + output_folder + '\n' )
+        
+        os.makedirs( os.path.join( self.folder, 'db' ) )
+        self.config_file = os.path.join( self.folder, 'config.ini' )
+        with open( self.config_file, 'w' ) as config_file:
+            config_file.write( '[' + Constants.CONFIG_SECTION_DATABASE + ']\n' +
+                               Constants.CONFIG_SECTION_DATABASE_ITEM_SPECIES + ' = Hsapiens\n' +
+                               Constants.CONFIG_SECTION_DATABASE_ITEM_DB_FOLDER + ' = ' + 
+                               os.path.join( self.folder, 'db' ) + '\n' +
+                               Constants.CONFIG_SECTION_DATABASE_ITEM_DS_DB_NAME + ' = ds\n' +
+                               Constants.CONFIG_SECTION_DATABASE_ITEM_PRO_DB_NAME + ' = pro\n' )
+
+
+    ## tearDown
+    #  --------
+    #
+    def tearDown( self ):
+
+        Constants.PATH_LOG = self.path_log
+        GenerateStatFilesStrategyModule.cpu_count = self.cpu_count
+        CheckDatabase.reset_checked_databases()
+        shutil.rmtree( self.folder )
+    
+    
+    ## get_stage_calls
+    #  ---------------
+    #
+    # Get the number of times a stage has been run by the process.
+    #
+    # @param stage_path: String - The path of the stage.
+    #
+    # @return Integer - The number of calls of the stage.
+    #
+    def get_stage_calls( self, stage_path ):
+        
+        stage_record = RunTelemetry.get_instance().stages.get( stage_path )
+        if ( stage_record == None ):
+            return 0
+        else:
+            return stage_record[ 'calls' ]
+    
+    
+    ## read_csv
+    #  --------
+    #
+    # Read a csv file saved by the GenerateStatFiles strategy.
+    #
+    # @param file_path: String - The path to the file.
+    #
+    # @return Dictionary - The dictionary associating to each key its count.
+    #
+    def read_csv( self, file_path ):
+        
+        with open( file_path, 'r' ) as csv_file:
+            rows = list( csv.reader( csv_file ) )
+        
+        return dict( [ ( key, int( count ) ) for ( key, count ) in rows[ 1: ] ] )
+
+
+    ## test_pooled_steps
+    #  -----------------
+    #
+    # Run two steps using a pool of the same size in the same pipeline.
+    #
+    def test_pooled_steps( self ):
+
+        OptionManager.get_instance().initialize( [ 'Pipeline', '-i', self.pipeline_file ] )
+        pipeline = PipelineStrategy()
+
+        step_names = [ 'GenerateStatFiles', 'GenerateStatFiles' + Constants.PIPELINE_STEP_RUN_SEPARATOR + '2' ]
+        self.assertEqual( [ step[ 0 ] for step in pipeline.steps ], step_names )
+
+        stage_paths = ( step_names +
+                        [ ( step_name + RunTelemetry.STAGE_PATH_SEPARATOR + 'scan_log_files' ) for step_name in step_names ] )
+        stage_calls = dict( [ ( stage_path, self.get_stage_calls( stage_path ) ) for stage_path in stage_paths ] )
+
+        pipeline.execute()
+
+        # Each step has scanned the 4 lines of the log files
+        for output_folder in self.output_folders:
+            level_counts = self.read_csv( os.path.join( output_folder, 
+                                                        GenerateStatFilesStrategy.LOG_LEVEL_COUNTS_FILENAME + '.csv' ) )
+            self.assertEqual( level_counts[ 'INFO' ], 2 )
+            self.assertEqual( level_counts[ 'WARNING' ], 2 )
+            self.assertEqual( level_counts[ 'ERROR' ], 0 )
+
+            code_counts = self.read_csv( os.path.join( output_folder, 
+                                                       GenerateStatFilesStrategy.LOG_CODE_COUNTS_FILENAME + '.csv' ) )
+            self.assertEqual( code_counts[ TestPipelineStrategy.LOG_CODE ], 2 )
+            self.assertEqual( code_counts[ LogCodes.ERR_PIPELINE_STEP ], 0 )
+
+        # Each step has been measured once
+        for step_name in step_names:
+            self.assertEqual( self.get_stage_calls( step_name ), stage_calls[ step_name ] + 1 )
+            self.assertGreater( RunTelemetry.get_instance().stages[ step_name ][ 'wall_time' ], 0 )
+
+            scan_stage_path = step_name + RunTelemetry.STAGE_PATH_SEPARATOR + 'scan_log_files'
+            self.assertEqual( self.get_stage_calls( scan_stage_path ), stage_calls[ scan_stage_path ] + 1 )
+            self.assertEqual( RunTelemetry.get_instance().stages[ scan_stage_path ][ 'rows' ],
+                              4 * ( stage_calls[ scan_stage_path ] + 1 ) )
+
+
+    ## test_database_checked_once
+    #  --------------------------
+    #
+    # Run two steps checking the same databases, the first one with its own
+    # level of verbosity, and check the databases are only built by the first one.
+    #
+    def test_database_checked_once( self ):
+
+        pipeline_file = os.path.join( self.folder, 'pipeline_dbcheck.txt' )
+        with open( pipeline_file, 'w' ) as pipeline_file_handle:
+            pipeline_file_handle.write( 'DatabaseCheck -c ' + self.config_file + ' -v ' + Constants.LOG_MODE_DEBUG + '\n' +
+                                        'DatabaseCheck -c ' + self.config_file + '\n' )
+
+        OptionManager.get_instance().initialize( [ 'Pipeline', '-i', pipeline_file, '-T', 'SQLite' ] )
+        pipeline = PipelineStrategy()
+        steps = pipeline.steps
+
+        self.assertEqual( [ step[ 4 ] for step in steps ], [ Constants.LOG_MODE_DEBUG, None ] )
+
+        # Register the level of verbosity used each time the PRO database is built
+        sqlmanager = SQLManagerPRO.get_instance()
+        build_database = sqlmanager.build_database
+        build_log_modes = []
+        def build_database_spy( *args, **kwargs ):
+            build_log_modes.append( Logger.get_instance().mode )
+            return build_database( *args, **kwargs )
+        sqlmanager.build_database = build_database_spy
+
+        pipeline_log_mode = Logger.get_instance().mode
+        try:
+            # The first step checks the database using its own level of verbosity
+            pipeline.steps = steps[ :1 ]
+            pipeline.execute()
+            self.assertTrue( CheckPRODatabase().is_already_checked() )
+            self.assertEqual( build_log_modes, [ Constants.MODE_DEBUG ] )
+            self.assertEqual( Logger.get_instance().mode, pipeline_log_mode )
+
+            # The second step does not check the database again
+            pipeline.steps = steps[ 1: ]
+            pipeline.execute()
+            self.assertEqual( build_log_modes, [ Constants.MODE_DEBUG ] )
+            self.assertEqual( Logger.get_instance().mode, pipeline_log_mode )
+
+        finally:
+            del sqlmanager.build_database
+
+
+
+if __name__ == '__main__':
+    unittest.main()